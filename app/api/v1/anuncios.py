@@ -11,6 +11,9 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.services.activity_feed import activity_feed
+from app.services.notification_hooks import AnnouncementNotifications
+from app.services.outbox import CANAL_EMAIL, outbox
 
 router = APIRouter(prefix="/anuncios", tags=["Anúncios e Comunicados"])
 
@@ -197,8 +200,27 @@ async def criar_anuncio(
             "user_id": user_id,
         },
     )
-    await db.commit()
     r = result.fetchone()
+
+    # Push e e-mail pelo outbox, na mesma transação do comunicado
+    if dados.send_push:
+        await AnnouncementNotifications.on_create(
+            db, tenant_id, {"id": r.id, "title": r.title, "summary": r.summary or r.content[:100]}, user_id
+        )
+    if dados.send_email:
+        emails = await db.execute(
+            text("SELECT email FROM users WHERE tenant_id = :tid AND is_active = TRUE AND id != :uid"),
+            {"tid": tenant_id, "uid": user_id},
+        )
+        await outbox.enqueue_many(
+            db,
+            CANAL_EMAIL,
+            [{"to": row.email, "subject": f"Comunicado: {r.title}", "body": r.content} for row in emails.fetchall()],
+            tenant_id=tenant_id,
+        )
+    await db.commit()
+    await activity_feed.publish(tenant_id, "comunicado", r.id, r.title, r.created_at)
+
     return AnuncioResponse(
         id=r.id,
         title=r.title,
@@ -0,0 +1,24 @@
+"""
+Entrega dos arquivos de upload
+
+Montado na raiz (/uploads), fora de API_PREFIX, para manter as URLs gravadas
+no banco pelos endpoints de upload. O corpo sai pelo nginx (X-Accel-Redirect)
+ou em blocos pelo worker; ver app/services/file_delivery.py.
+"""
+
+from fastapi import APIRouter, Request
+
+from app.core.exceptions import NotFoundError
+from app.services.file_delivery import file_delivery
+
+router = APIRouter(prefix="/uploads", tags=["Arquivos"])
+
+
+@router.api_route("/{caminho:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def baixar_arquivo(caminho: str, request: Request):
+    """Arquivo de upload, com cache, requisições condicionais e Range"""
+    arquivo = file_delivery.resolve(caminho)
+    if arquivo is None:
+        raise NotFoundError("Arquivo não encontrado")
+    file_delivery.authorize(request, arquivo)
+    return file_delivery.respond(request, arquivo)
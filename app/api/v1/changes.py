@@ -0,0 +1,42 @@
+"""
+Detecção de mudanças - versões dos dados do condomínio por domínio
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db
+from app.models.user import User
+from app.schemas.changes import ChangesResponse
+from app.services.data_versions import DATA_DOMAINS, data_version_service
+
+router = APIRouter(prefix="/changes", tags=["Mudanças"])
+
+
+@router.get("", response_model=ChangesResponse)
+async def listar_mudancas(
+    since: Optional[str] = Query(None, description="Cursor da consulta anterior (ex.: visitas:12,encomendas:40)"),
+    domains: Optional[str] = Query(None, description="Domínios separados por vírgula (padrão: todos)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Domínios do condomínio do usuário que mudaram desde o cursor.
+
+    Sem cursor, todos os domínios com alguma escrita aparecem em `changed`.
+    O cliente refaz só as consultas dos domínios em `changed` e guarda o
+    `cursor` da resposta para a próxima chamada.
+    """
+    selected = None
+    if domains:
+        selected = [domain.strip() for domain in domains.split(",") if domain.strip()]
+        invalid = [domain for domain in selected if domain not in DATA_DOMAINS]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Domínios inválidos: {', '.join(invalid)}. Use: {', '.join(DATA_DOMAINS)}",
+            )
+
+    return await data_version_service.changes(db, current_user.tenant_id, since, selected)
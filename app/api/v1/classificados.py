@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import UPLOAD_BASE_DIR
+from app.core.serialization import FastJSONResponse, RowEncoder
 from app.database import get_db
 from app.models.classificados import (
     ClassificadoAnuncio,
@@ -31,7 +32,10 @@ from app.schemas.classificados import (
     VendedorPerfil,
 )
 
-router = APIRouter(prefix="/classificados", tags=["Classificados"])
+router = APIRouter(prefix="/classificados", tags=["Classificados"], default_response_class=FastJSONResponse)
+
+# Listagens: objetos ORM (com imagens) direto para JSON, sem construir AnuncioResponse por item
+_anuncios = RowEncoder(AnuncioResponse)
 
 UPLOAD_DIR = os.path.join(UPLOAD_BASE_DIR, "classificados")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -161,30 +165,10 @@ async def listar_anuncios(
     pages = (total + limit - 1) // limit if total > 0 else 1
     items = []
     for anuncio in anuncios:
-        imagens = [
-            ImagemResponse(id=img.id, url=img.url, ordem=img.ordem, created_at=img.created_at)
-            for img in anuncio.imagens
-        ]
         is_fav = await check_is_favorito(db, anuncio.id, USER_ID_TEMP)
-        items.append(
-            AnuncioResponse(
-                id=anuncio.id,
-                morador_id=anuncio.morador_id,
-                titulo=anuncio.titulo,
-                descricao=anuncio.descricao,
-                preco=anuncio.preco,
-                categoria=anuncio.categoria,
-                condicao=anuncio.condicao,
-                status=anuncio.status,
-                visualizacoes=anuncio.visualizacoes,
-                created_at=anuncio.created_at,
-                updated_at=anuncio.updated_at,
-                imagens=imagens,
-                is_favorito=is_fav,
-            )
-        )
+        items.append(_anuncios.encode(anuncio, is_favorito=is_fav))
 
-    return AnuncioListResponse(items=items, total=total, page=page, pages=pages)
+    return FastJSONResponse({"items": items, "total": total, "page": page, "pages": pages})
 
 
 @router.get("/meus/anuncios", response_model=AnuncioListResponse)
@@ -216,31 +200,9 @@ async def meus_anuncios(
     anuncios = result.scalars().all()
 
     pages = (total + limit - 1) // limit if total > 0 else 1
-    items = []
-    for anuncio in anuncios:
-        imagens = [
-            ImagemResponse(id=img.id, url=img.url, ordem=img.ordem, created_at=img.created_at)
-            for img in anuncio.imagens
-        ]
-        items.append(
-            AnuncioResponse(
-                id=anuncio.id,
-                morador_id=anuncio.morador_id,
-                titulo=anuncio.titulo,
-                descricao=anuncio.descricao,
-                preco=anuncio.preco,
-                categoria=anuncio.categoria,
-                condicao=anuncio.condicao,
-                status=anuncio.status,
-                visualizacoes=anuncio.visualizacoes,
-                created_at=anuncio.created_at,
-                updated_at=anuncio.updated_at,
-                imagens=imagens,
-                is_favorito=False,
-            )
-        )
+    items = [_anuncios.encode(anuncio, is_favorito=False) for anuncio in anuncios]
 
-    return AnuncioListResponse(items=items, total=total, page=page, pages=pages)
+    return FastJSONResponse({"items": items, "total": total, "page": page, "pages": pages})
 
 
 @router.get("/meus/estatisticas")
@@ -324,28 +286,8 @@ async def meus_favoritos(tenant_id: int = Query(1, description="ID do condomíni
         )
         anuncio = anuncio_result.scalar_one_or_none()
         if anuncio and not anuncio.deleted_at:
-            imagens = [
-                ImagemResponse(id=img.id, url=img.url, ordem=img.ordem, created_at=img.created_at)
-                for img in anuncio.imagens
-            ]
-            items.append(
-                AnuncioResponse(
-                    id=anuncio.id,
-                    morador_id=anuncio.morador_id,
-                    titulo=anuncio.titulo,
-                    descricao=anuncio.descricao,
-                    preco=anuncio.preco,
-                    categoria=anuncio.categoria,
-                    condicao=anuncio.condicao,
-                    status=anuncio.status,
-                    visualizacoes=anuncio.visualizacoes,
-                    created_at=anuncio.created_at,
-                    updated_at=anuncio.updated_at,
-                    imagens=imagens,
-                    is_favorito=True,
-                )
-            )
-    return items
+            items.append(_anuncios.encode(anuncio, is_favorito=True))
+    return FastJSONResponse(items)
 
 
 @router.get("/vendedor/{vendedor_id}", response_model=VendedorPerfil)
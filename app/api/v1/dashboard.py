@@ -9,16 +9,18 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_optional_user
+from app.core.cache_decorator import cached_response
 from app.core.logger import get_logger
 from app.database import get_db
-from app.services.cache import cache, cache_key
+from app.models.user import User
+from app.services.activity_feed import activity_feed
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 # TTL do cache em segundos
 DASHBOARD_CACHE_TTL = 60  # 1 minuto para stats
-ATIVIDADES_CACHE_TTL = 30  # 30 segundos para atividades recentes
 
 
 @router.get("/stats-simples")
@@ -38,21 +40,14 @@ async def get_stats_simples(
         return {"error": str(e), "status": "error"}
 
 @router.get("/stats-completo")
+@cached_response("dashboard", ttl=DASHBOARD_CACHE_TTL)
 async def get_stats_completo(
     tenant_id: int = Query(1, description="ID do condomínio"), db: AsyncSession = Depends(get_db)
 ):
     """
     Retorna estatísticas completas de TODAS as áreas do sistema em tempo real.
-    Dados sao cacheados por 1 minuto para melhor performance.
+    Resposta cacheada (já comprimida, com ETag) por 1 minuto para melhor performance.
     """
-    # Tenta buscar do cache
-    ck = cache_key("dashboard", "stats", str(tenant_id))
-    if cache.is_connected:
-        cached_data = await cache.get(ck)
-        if cached_data:
-            logger.debug("dashboard_cache_hit", tenant_id=tenant_id)
-            return cached_data
-
     today = datetime.now().date()
     week_ago = today - timedelta(days=7)
 
@@ -119,71 +114,24 @@ async def get_stats_completo(
         "acessos": {"pendentes": 0, "aprovados": 0},
     }
 
-    # Armazena no cache
-    if cache.is_connected:
-        await cache.set(ck, response_data, ttl=DASHBOARD_CACHE_TTL)
-        logger.debug("dashboard_cache_set", tenant_id=tenant_id)
-
     return response_data
 
 
 @router.get("/atividades-recentes")
 async def get_atividades_recentes(
-    tenant_id: int = Query(1, description="ID do condomínio"),
+    tenant_id: int = Query(1, description="ID do condomínio (sem autenticação)"),
     limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, pattern=r"^\d+-\d+$", description="next_cursor da página anterior"),
     db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_optional_user),
 ):
     """
-    Retorna as atividades mais recentes do condomínio.
-    Dados sao cacheados por 30 segundos.
-    """
-    # Tenta buscar do cache
-    ck = cache_key("dashboard", "atividades", str(tenant_id), str(limit))
-    if cache.is_connected:
-        cached_data = await cache.get(ck)
-        if cached_data:
-            logger.debug("atividades_cache_hit", tenant_id=tenant_id)
-            return cached_data
-
-    result = await db.execute(
-        text(
-            """
-        (SELECT 'manutencao' as tipo, id, title as titulo, created_at as data, 'wrench' as icone
-         FROM maintenance_tickets WHERE tenant_id = :tid ORDER BY created_at DESC LIMIT 3)
-        UNION ALL
-        (SELECT 'ocorrencia' as tipo, id, title as titulo, created_at as data, 'alert' as icone
-         FROM occurrences WHERE tenant_id = :tid ORDER BY created_at DESC LIMIT 3)
-        UNION ALL
-        (SELECT 'comunicado' as tipo, id, title as titulo, created_at as data, 'megaphone' as icone
-         FROM announcements WHERE tenant_id = :tid ORDER BY created_at DESC LIMIT 3)
-        UNION ALL
-        (SELECT 'visitante' as tipo, id, name as titulo, created_at as data, 'user' as icone
-         FROM visitors WHERE tenant_id = :tid ORDER BY created_at DESC LIMIT 3)
-        ORDER BY data DESC
-        LIMIT :limit
+    Retorna as atividades mais recentes do condomínio, filtradas pela role do usuário.
+    Lidas do feed no Redis (app/services/activity_feed.py) com um único XREVRANGE;
+    next_cursor carrega a página seguinte ("carregar mais").
     """
-        ),
-        {"tid": tenant_id, "limit": limit},
-    )
+    role = None
+    if current_user is not None:
+        tenant_id, role = current_user.tenant_id, current_user.role
 
-    rows = result.fetchall()
-
-    response_data = {
-        "items": [
-            {
-                "tipo": row.tipo,
-                "id": row.id,
-                "titulo": row.titulo,
-                "data": row.data.isoformat() if row.data else None,
-                "icone": row.icone,
-            }
-            for row in rows
-        ]
-    }
-
-    # Armazena no cache
-    if cache.is_connected:
-        await cache.set(ck, response_data, ttl=ATIVIDADES_CACHE_TTL)
-        logger.debug("atividades_cache_set", tenant_id=tenant_id)
-
-    return response_data
+    return await activity_feed.read(db, tenant_id, role, limit=limit, cursor=cursor)
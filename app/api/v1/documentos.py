@@ -8,13 +8,14 @@ import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
 from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import UPLOAD_BASE_DIR
 from app.database import get_db
+from app.services.file_delivery import file_delivery
 
 router = APIRouter(prefix="/documentos", tags=["Documentos"])
 
@@ -180,6 +181,23 @@ async def detalhe_documento(
     )
 
 
+@router.get("/{doc_id}/download")
+async def baixar_documento(
+    doc_id: int,
+    request: Request,
+    tenant_id: int = Query(1, description="ID do condomínio"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download com o nome original; o corpo sai pelo nginx (X-Accel-Redirect) quando disponível"""
+    query = text("SELECT nome, arquivo_url FROM documentos WHERE id = :id AND tenant_id = :tenant_id AND NOT is_pasta")
+    r = (await db.execute(query, {"id": doc_id, "tenant_id": tenant_id})).fetchone()
+    arquivo = file_delivery.resolve(r.arquivo_url) if r and r.arquivo_url else None
+    if not arquivo:
+        raise HTTPException(status_code=404, detail="Documento não encontrado")
+    nome = r.nome if "." in r.nome else r.nome + os.path.splitext(arquivo.path)[1]
+    return file_delivery.respond(request, arquivo, download_name=nome, private=True)
+
+
 @router.post("", response_model=DocumentoResponse, status_code=status.HTTP_201_CREATED)
 async def criar_documento(
     dados: DocumentoCreate,
@@ -14,6 +14,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.services.activity_feed import activity_feed
 from app.services.notification_hooks import DeliveryNotifications
 
 router = APIRouter(prefix="/encomendas", tags=["Encomendas"])
@@ -195,14 +196,15 @@ async def create_encomenda(
     )
 
     encomenda_id = result.scalar()
-    await db.commit()
 
-    # Disparar notificação para o morador
+    # Notificação para o morador (outbox, mesma transação da encomenda)
     await DeliveryNotifications.on_arrive(
         db,
         tenant_id,
         {"id": encomenda_id, "unit_id": data.unit_id, "carrier": data.carrier, "recipient_name": data.recipient_name},
     )
+    await db.commit()
+    await activity_feed.publish(tenant_id, "encomenda", encomenda_id, f"Encomenda para {data.recipient_name}")
 
     return {"id": encomenda_id, "message": "Encomenda registrada com sucesso"}
 
@@ -267,9 +269,7 @@ async def notify_recipient(
         {"id": encomenda_id, "tid": tenant_id},
     )
 
-    await db.commit()
-
-    # Enviar notificação para os moradores da unidade
+    # Notificação para os moradores da unidade (outbox, mesma transação)
     await DeliveryNotifications.on_notify(
         db,
         tenant_id,
@@ -281,6 +281,7 @@ async def notify_recipient(
             "storage_location": row.storage_location,
         },
     )
+    await db.commit()
 
     return {"success": True, "message": "Morador notificado"}
 
@@ -0,0 +1,57 @@
+"""
+API de Ingestão de Eventos de Dispositivos
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, Request
+
+from app.config import settings
+from app.core.exceptions import AppException
+from app.schemas.portaria import IngestaoEventosResponse
+from app.services.event_ingest import event_ingestor, parse_events
+from app.services.health_probe import health_probe
+
+router = APIRouter(prefix="/portaria/eventos", tags=["Portaria - Eventos de Dispositivos"])
+
+
+@router.post("", response_model=IngestaoEventosResponse)
+async def ingerir_eventos(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    x_device_token: Optional[str] = Header(None),
+):
+    """
+    Recebe um lote de eventos de acesso do hardware (usado pelo hardware).
+
+    Corpo em NDJSON (application/x-ndjson), array msgpack (application/msgpack)
+    ou array JSON; autenticação por `Authorization: Bearer <token>` ou
+    `X-Device-Token`, com o token de POST /pontos-acesso/{id}/token-ingestao.
+    Responde depois que os eventos estão gravados; cada evento leva id e ts
+    do dispositivo, então reenviar o mesmo lote não duplica registros. 429 com Retry-After quando o servidor está saturado.
+    """
+    token = x_device_token
+    if token is None and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    dispositivo = await event_ingestor.authenticate(token)
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.INGEST_MAX_BODY_BYTES:
+        raise AppException(status_code=413, detail="Lote acima do tamanho máximo", code="BODY_TOO_LARGE")
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > settings.INGEST_MAX_BODY_BYTES:
+            raise AppException(status_code=413, detail="Lote acima do tamanho máximo", code="BODY_TOO_LARGE")
+
+    events = parse_events(bytes(body), request.headers.get("content-type"))
+    resultado = await event_ingestor.ingest(dispositivo, events)
+    health_probe.record_heartbeat(dispositivo.tenant_id, dispositivo.ponto_id, "online")
+
+    return IngestaoEventosResponse(
+        recebidos=resultado.recebidos,
+        inseridos=resultado.inseridos,
+        duplicados=resultado.duplicados,
+        rejeitados=resultado.rejeitados,
+        erros=resultado.erros or [],
+    )
@@ -10,10 +10,14 @@ from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache_decorator import cached_response, invalidate_cache
 from app.database import get_db
 
 router = APIRouter(prefix="/faq", tags=["Perguntas Frequentes"])
 
+# TTL da resposta cacheada (invalidada ao criar uma pergunta)
+FAQ_CACHE_TTL = 600  # 10 minutos
+
 
 class FAQBase(BaseModel):
     pergunta: str
@@ -42,6 +46,7 @@ class FAQListResponse(BaseModel):
 
 
 @router.get("", response_model=FAQListResponse)
+@cached_response("faq", ttl=FAQ_CACHE_TTL)
 async def listar_faq(
     categoria: Optional[str] = None,
     busca: Optional[str] = None,
@@ -85,6 +90,7 @@ async def criar_faq(
         {"pergunta": dados.pergunta, "resposta": dados.resposta, "categoria": dados.categoria, "tenant_id": tenant_id},
     )
     await db.commit()
+    await invalidate_cache("faq", tenant_id)
     r = result.fetchone()
     return FAQResponse(
         id=r.id,
@@ -5,7 +5,7 @@ API do Mapa Visual da Garagem
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,6 +19,8 @@ from app.schemas.portaria import (
     VagaGaragemResponse,
     VagaGaragemUpdate,
 )
+from app.services.garage_occupancy import garage_occupancy
+from app.services.plate_index import plate_index
 
 router = APIRouter(prefix="/portaria/garagem", tags=["Portaria - Garagem"])
 
@@ -30,93 +32,13 @@ async def obter_mapa(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Retorna o mapa visual da garagem com todas as vagas."""
-    query = """
-        SELECT v.*, u.number as unit_number, u.block as unit_block,
-               ve.plate as veiculo_placa, ve.model as veiculo_modelo
-        FROM vagas_garagem v
-        LEFT JOIN units u ON u.id = v.unit_id
-        LEFT JOIN vehicles ve ON ve.id = v.veiculo_id
-        WHERE v.tenant_id = :tenant_id AND v.is_active = true
     """
-    params = {"tenant_id": tenant_id}
-
-    if mapa_id:
-        query += " AND v.mapa_id = :mapa_id"
-        params["mapa_id"] = mapa_id
-
-    query += " ORDER BY v.mapa_id, v.numero"
-
-    result = await db.execute(text(query), params)
-    rows = result.fetchall()
-
-    # Agrupar por mapa_id
-    mapas = {}
-    for row in rows:
-        mapa = row.mapa_id or "principal"
-        if mapa not in mapas:
-            mapas[mapa] = {
-                "mapa_id": mapa,
-                "nome": f"Andar {mapa}" if mapa != "principal" else "Garagem Principal",
-                "vagas": [],
-                "total_vagas": 0,
-                "vagas_ocupadas": 0,
-                "vagas_livres": 0
-            }
-
-        vaga = VagaGaragemResponse(
-            id=row.id,
-            tenant_id=row.tenant_id,
-            parking_spot_id=row.parking_spot_id,
-            numero=row.numero,
-            bloco=row.bloco,
-            andar=row.andar,
-            tipo=row.tipo,
-            unit_id=row.unit_id,
-            unit_number=row.unit_number,
-            unit_block=row.unit_block,
-            posicao_x=row.posicao_x,
-            posicao_y=row.posicao_y,
-            largura=row.largura,
-            altura=row.altura,
-            rotacao=row.rotacao,
-            mapa_id=row.mapa_id,
-            status=row.status,
-            ocupada_desde=row.ocupada_desde,
-            veiculo_id=row.veiculo_id,
-            veiculo_placa=row.veiculo_placa,
-            veiculo_modelo=row.veiculo_modelo,
-            is_active=row.is_active,
-            created_at=row.created_at,
-            updated_at=row.updated_at
-        )
+    Retorna o mapa visual da garagem com todas as vagas.
 
-        mapas[mapa]["vagas"].append(vaga)
-        mapas[mapa]["total_vagas"] += 1
-
-        if row.status == "ocupada":
-            mapas[mapa]["vagas_ocupadas"] += 1
-        elif row.status == "livre":
-            mapas[mapa]["vagas_livres"] += 1
-
-    # Calcular ocupação percentual
-    result_list = []
-    for mapa_data in mapas.values():
-        total = mapa_data["total_vagas"]
-        ocupacao = (mapa_data["vagas_ocupadas"] / total * 100) if total > 0 else 0
-        result_list.append(
-            MapaGaragemResponse(
-                mapa_id=mapa_data["mapa_id"],
-                nome=mapa_data["nome"],
-                vagas=mapa_data["vagas"],
-                total_vagas=total,
-                vagas_ocupadas=mapa_data["vagas_ocupadas"],
-                vagas_livres=mapa_data["vagas_livres"],
-                ocupacao_percentual=round(ocupacao, 1)
-            )
-        )
-
-    return result_list
+    Servido do estado em memória (JSON pré-renderizado): não consulta o banco.
+    """
+    body = await garage_occupancy.render_maps(db, tenant_id, mapa_id)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/ocupacao", response_model=OcupacaoGaragemResponse)
@@ -125,47 +47,8 @@ async def obter_ocupacao(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Retorna estatísticas de ocupação da garagem."""
-    result = await db.execute(
-        text("""
-            SELECT
-                COUNT(*) as total,
-                COUNT(*) FILTER (WHERE status = 'ocupada') as ocupadas,
-                COUNT(*) FILTER (WHERE status = 'livre') as livres,
-                COUNT(*) FILTER (WHERE status = 'reservada') as reservadas,
-                COUNT(*) FILTER (WHERE status = 'manutencao') as manutencao
-            FROM vagas_garagem
-            WHERE tenant_id = :tenant_id AND is_active = true
-        """),
-        {"tenant_id": tenant_id}
-    )
-    stats = result.fetchone()
-
-    # Contagem por tipo
-    por_tipo_result = await db.execute(
-        text("""
-            SELECT tipo, COUNT(*) as count
-            FROM vagas_garagem
-            WHERE tenant_id = :tenant_id AND is_active = true
-            GROUP BY tipo
-        """),
-        {"tenant_id": tenant_id}
-    )
-    por_tipo = {row.tipo: row.count for row in por_tipo_result.fetchall()}
-
-    total = stats.total or 0
-    ocupadas = stats.ocupadas or 0
-    ocupacao_pct = (ocupadas / total * 100) if total > 0 else 0
-
-    return OcupacaoGaragemResponse(
-        total_vagas=total,
-        vagas_ocupadas=ocupadas,
-        vagas_livres=stats.livres or 0,
-        vagas_reservadas=stats.reservadas or 0,
-        vagas_manutencao=stats.manutencao or 0,
-        ocupacao_percentual=round(ocupacao_pct, 1),
-        por_tipo=por_tipo
-    )
+    """Retorna estatísticas de ocupação da garagem (contadores em memória)."""
+    return await garage_occupancy.occupancy(db, tenant_id)
 
 
 @router.get("/vagas", response_model=VagaGaragemListResponse)
@@ -348,6 +231,7 @@ async def criar_vaga(
     )
     await db.commit()
     row = result.fetchone()
+    await garage_occupancy.refresh_spot(db, tenant_id, row.id)
 
     return VagaGaragemResponse(
         id=row.id,
@@ -408,6 +292,7 @@ async def atualizar_posicao(
     if not row:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
 
+    await garage_occupancy.refresh_spot(db, tenant_id, vaga_id)
     return {"success": True, "vaga": row.numero}
 
 
@@ -434,15 +319,11 @@ async def ocupar_vaga(
     if row.status != "livre":
         raise HTTPException(status_code=400, detail=f"Vaga não está livre (status: {row.status})")
 
-    # Buscar veículo pela placa se informada
+    # Buscar veículo pela placa se informada (placa exata de morador; leitura OCR só se inequívoca)
     if placa and not veiculo_id:
-        veiculo_result = await db.execute(
-            text("SELECT id FROM vehicles WHERE plate = :placa AND tenant_id = :tenant_id"),
-            {"placa": placa, "tenant_id": tenant_id}
-        )
-        veiculo_row = veiculo_result.fetchone()
-        if veiculo_row:
-            veiculo_id = veiculo_row.id
+        veiculo = await plate_index.resident_vehicle(db, tenant_id, placa)
+        if veiculo:
+            veiculo_id = veiculo.vehicle_id
 
     await db.execute(
         text("""
@@ -453,6 +334,7 @@ async def ocupar_vaga(
         {"id": vaga_id, "tenant_id": tenant_id, "veiculo_id": veiculo_id}
     )
     await db.commit()
+    await garage_occupancy.refresh_spot(db, tenant_id, vaga_id)
 
     return {"success": True, "message": "Vaga ocupada com sucesso"}
 
@@ -480,6 +362,8 @@ async def liberar_vaga(
     if not row:
         raise HTTPException(status_code=404, detail="Vaga não encontrada ou não está ocupada")
 
+    await garage_occupancy.refresh_spot(db, tenant_id, vaga_id)
+
     return {"success": True, "message": f"Vaga {row.numero} liberada"}
 
 
@@ -503,3 +387,5 @@ async def excluir_vaga(
 
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Vaga não encontrada")
+
+    await garage_occupancy.refresh_spot(db, tenant_id, vaga_id)
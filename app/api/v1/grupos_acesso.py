@@ -17,6 +17,7 @@ from app.schemas.portaria import (
     GrupoAcessoResponse,
     GrupoAcessoUpdate,
 )
+from app.services.access_engine import access_engine
 
 router = APIRouter(prefix="/portaria/grupos-acesso", tags=["Portaria - Grupos de Acesso"])
 
@@ -169,6 +170,7 @@ async def criar_grupo(
     )
     await db.commit()
     row = result.fetchone()
+    await access_engine.refresh_grupo(db, tenant_id, row.id)
 
     return GrupoAcessoResponse(
         id=row.id,
@@ -233,6 +235,7 @@ async def atualizar_grupo(
     result = await db.execute(text(query), params)
     await db.commit()
     row = result.fetchone()
+    await access_engine.refresh_grupo(db, tenant_id, row.id)
 
     return GrupoAcessoResponse(
         id=row.id,
@@ -276,6 +279,8 @@ async def excluir_grupo(
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Grupo não encontrado")
 
+    await access_engine.refresh_grupo(db, tenant_id, grupo_id)
+
 
 @router.get("/{grupo_id}/pontos")
 async def listar_pontos_grupo(
@@ -336,6 +341,7 @@ async def vincular_ponto(
         }
     )
     await db.commit()
+    await access_engine.refresh_grupo(db, tenant_id, grupo_id)
 
     return {"message": "Ponto vinculado com sucesso"}
 
@@ -354,5 +360,6 @@ async def desvincular_ponto(
         {"grupo_id": grupo_id, "ponto_id": ponto_id}
     )
     await db.commit()
+    await access_engine.refresh_grupo(db, tenant_id, grupo_id)
 
     return {"message": "Ponto desvinculado com sucesso"}
@@ -0,0 +1,55 @@
+"""
+Endpoints de importação em massa (unidades, moradores, veículos e pets)
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_tenant, get_current_user, get_db
+from app.core.permissions import Role
+from app.models.user import User
+from app.services.bulk_import import ENTITIES, bulk_import
+
+router = APIRouter(prefix="/importacao", tags=["Importação"])
+
+
+@router.get("/modelos")
+async def listar_modelos():
+    """Colunas aceitas por entidade (nome canônico, apelidos e obrigatoriedade)"""
+    return {
+        name: {
+            "label": spec.label,
+            "colunas": [
+                {"nome": column.name, "apelidos": list(column.aliases), "obrigatoria": column.required}
+                for column in spec.columns
+            ],
+        }
+        for name, spec in ENTITIES.items()
+    }
+
+
+@router.post("/{entidade}")
+async def importar(
+    entidade: str,
+    file: UploadFile = File(..., description="Planilha .csv ou .xlsx (primeira linha = cabeçalho)"),
+    dry_run: bool = Query(False, description="Apenas valida; nada é gravado"),
+    senha_padrao: Optional[str] = Form(None, description="Senha dos moradores sem senha na planilha"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    tenant_id: int = Depends(get_current_tenant),
+):
+    """
+    Importa uma planilha de unidades, moradores, veículos ou pets.
+
+    Linhas válidas são gravadas (ou atualizadas, se já existirem); as demais
+    voltam em "errors" com o número da linha e a coluna.
+    """
+    if current_user.role < Role.SYNDIC:
+        raise HTTPException(status_code=403, detail="Sem permissão para importar cadastros")
+
+    report = await bulk_import.run(
+        db, tenant_id, entidade, file.filename, file.file, dry_run=dry_run, default_password=senha_padrao
+    )
+    return report.as_dict()
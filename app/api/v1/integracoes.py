@@ -2,7 +2,6 @@
 API de Integrações com Hardware
 """
 
-from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
@@ -15,11 +14,14 @@ from app.schemas.portaria import (
     IntegracaoCreate,
     IntegracaoListResponse,
     IntegracaoResponse,
+    IntegracaoStatusResponse,
     IntegracaoTesteResponse,
     IntegracaoUpdate,
     SincronizacaoLogResponse,
     PARCEIROS_DISPONIVEIS,
 )
+from app.services.credential_sync import SYNC_SOURCES, credential_sync
+from app.services.health_probe import health_probe
 
 router = APIRouter(prefix="/portaria/integracoes", tags=["Portaria - Integrações"])
 
@@ -30,6 +32,17 @@ async def listar_parceiros():
     return [p.model_dump() for p in PARCEIROS_DISPONIVEIS]
 
 
+@router.get("/status", response_model=List[IntegracaoStatusResponse])
+async def status_integracoes(
+    tenant_id: int = Query(..., description="ID do condomínio"),
+    atualizar: bool = Query(False, description="Verifica os equipamentos agora em vez de usar o cache"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Retorna o status de todas as integrações ativas (verificadas em paralelo, em cache)."""
+    return await health_probe.integracoes_status(db, tenant_id, refresh=atualizar)
+
+
 @router.get("", response_model=IntegracaoListResponse)
 async def listar_integracoes(
     tenant_id: int = Query(..., description="ID do condomínio"),
@@ -178,6 +191,7 @@ async def criar_integracao(
     )
     await db.commit()
     row = result.fetchone()
+    health_probe.invalidate(tenant_id)
 
     return IntegracaoResponse(
         id=row.id,
@@ -239,6 +253,7 @@ async def atualizar_integracao(
     result = await db.execute(text(query), params)
     await db.commit()
     row = result.fetchone()
+    health_probe.invalidate(tenant_id)
 
     return IntegracaoResponse(
         id=row.id,
@@ -282,6 +297,8 @@ async def excluir_integracao(
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Integração não encontrada")
 
+    health_probe.invalidate(tenant_id)
+
 
 @router.post("/{integracao_id}/testar", response_model=IntegracaoTesteResponse)
 async def testar_integracao(
@@ -300,40 +317,59 @@ async def testar_integracao(
     if not row:
         raise HTTPException(status_code=404, detail="Integração não encontrada")
 
-    # TODO: Implementar teste real com cada parceiro
-    # Por enquanto, simula um teste bem-sucedido
-
-    # Atualizar status
-    await db.execute(
-        text("""
-            UPDATE integracoes_hardware
-            SET status = 'ativo', last_health_check = NOW(), last_error = NULL
-            WHERE id = :id
-        """),
-        {"id": integracao_id}
-    )
-    await db.commit()
+    resultado = await health_probe.probe_integracao(db, row)
 
     return IntegracaoTesteResponse(
-        sucesso=True,
-        mensagem=f"Conexão com {row.parceiro} estabelecida com sucesso",
+        sucesso=resultado.is_online,
+        mensagem=(
+            f"Conexão com {row.parceiro} estabelecida com sucesso"
+            if resultado.is_online
+            else f"Falha na conexão com {row.parceiro}: {resultado.erro}"
+        ),
         detalhes={
             "parceiro": row.parceiro,
             "ip": row.config.get("base_url") if row.config else None,
-            "testado_em": datetime.now().isoformat()
+            "status": resultado.status,
+            "http_status": resultado.http_status,
+            "latencia_ms": resultado.latencia_ms,
+            "tentativas": resultado.tentativas,
+            "timeout_ms": resultado.timeout_ms,
+            "testado_em": resultado.verificado_em.isoformat()
         }
     )
 
 
+@router.post("/sincronizar")
+async def sincronizar_todas(
+    tipo_sync: Optional[str] = Query(None, description="Tipo: moradores, visitantes, veiculos (padrão: todos)"),
+    completo: bool = Query(False, description="Reconciliação completa em vez do delta"),
+    tenant_id: int = Query(..., description="ID do condomínio"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Sincroniza em paralelo todas as integrações ativas do condomínio."""
+    if tipo_sync is not None and tipo_sync not in SYNC_SOURCES:
+        raise HTTPException(status_code=400, detail=f"Tipo de sincronização inválido: {tipo_sync}")
+
+    resumos = await credential_sync.sync_tenant(
+        db, tenant_id, tipos=[tipo_sync] if tipo_sync else None, completo=completo
+    )
+    return {"success": all(r["status"] == "sucesso" for r in resumos), "sincronizacoes": resumos}
+
+
 @router.post("/{integracao_id}/sincronizar")
 async def sincronizar_integracao(
     integracao_id: int,
-    tipo_sync: str = Query(..., description="Tipo: moradores, visitantes, veiculos, acessos"),
+    tipo_sync: str = Query(..., description="Tipo: moradores, visitantes, veiculos"),
+    completo: bool = Query(False, description="Reconciliação completa em vez do delta"),
     tenant_id: int = Query(..., description="ID do condomínio"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Inicia uma sincronização com a integração."""
+    """Envia para a integração as credenciais alteradas desde a última sincronização."""
+    if tipo_sync not in SYNC_SOURCES:
+        raise HTTPException(status_code=400, detail=f"Tipo de sincronização inválido: {tipo_sync}")
+
     result = await db.execute(
         text("SELECT * FROM integracoes_hardware WHERE id = :id AND tenant_id = :tenant_id AND is_active = true"),
         {"id": integracao_id, "tenant_id": tenant_id}
@@ -346,66 +382,12 @@ async def sincronizar_integracao(
     if row.status != "ativo":
         raise HTTPException(status_code=400, detail="Integração não está conectada")
 
-    # Criar log de sincronização
-    log_result = await db.execute(
-        text("""
-            INSERT INTO sincronizacoes_log (
-                integracao_id, tipo_sync, direcao, status,
-                iniciado_em, created_at
-            ) VALUES (
-                :integracao_id, :tipo_sync, 'push', 'processando',
-                NOW(), NOW()
-            )
-            RETURNING id
-        """),
-        {"integracao_id": integracao_id, "tipo_sync": tipo_sync}
-    )
-    log_id = log_result.fetchone().id
-
-    # TODO: Implementar sincronização real em background
-    # Por enquanto, simula uma sincronização
-
-    # Simular resultado
-    import random
-    total = random.randint(10, 100)
-    sucesso = total - random.randint(0, 5)
-    erro = total - sucesso
-
-    await db.execute(
-        text("""
-            UPDATE sincronizacoes_log
-            SET status = 'sucesso',
-                registros_total = :total,
-                registros_sucesso = :sucesso,
-                registros_erro = :erro,
-                finalizado_em = NOW(),
-                duracao_ms = :duracao
-            WHERE id = :id
-        """),
-        {
-            "id": log_id,
-            "total": total,
-            "sucesso": sucesso,
-            "erro": erro,
-            "duracao": random.randint(500, 5000)
-        }
-    )
-
-    # Atualizar última sincronização
-    await db.execute(
-        text("UPDATE integracoes_hardware SET last_sync_at = NOW() WHERE id = :id"),
-        {"id": integracao_id}
-    )
-
-    await db.commit()
+    resumo = await credential_sync.sync_integracao(db, row, tipo_sync, completo=completo)
 
     return {
-        "success": True,
-        "message": f"Sincronização de {tipo_sync} iniciada",
-        "log_id": log_id,
-        "registros_total": total,
-        "registros_sucesso": sucesso,
-        "registros_erro": erro
+        "success": resumo["status"] == "sucesso",
+        "message": f"Sincronização de {tipo_sync} ({resumo['modo']}): {resumo['status']}",
+        **resumo
     }
 
 
@@ -440,6 +422,7 @@ async def listar_sincronizacoes(
             registros_sucesso=row.registros_sucesso,
             registros_erro=row.registros_erro,
             erro_mensagem=row.erro_mensagem,
+            detalhes=row.detalhes,
             iniciado_em=row.iniciado_em,
             finalizado_em=row.finalizado_em,
             duracao_ms=row.duracao_ms,
@@ -19,6 +19,7 @@ from app.schemas.maintenance import (
     TicketResponse,
     TicketUpdate,
 )
+from app.services.activity_feed import activity_feed
 
 router = APIRouter(prefix="/manutencao", tags=["Manutenção"])
 
@@ -198,6 +199,7 @@ async def criar_ticket(
     db.add(ticket)
     await db.commit()
     await db.refresh(ticket)
+    await activity_feed.publish(tenant_id, "manutencao", ticket.id, ticket.title, ticket.created_at)
 
     return TicketResponse(
         id=ticket.id,
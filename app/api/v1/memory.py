@@ -0,0 +1,85 @@
+"""
+Endpoints de memória do worker (super admin)
+
+Fluxo para achar um vazamento: ligar o tracemalloc, tirar um snapshot,
+deixar o tráfego (ou o soak test) rodar e pedir o diff contra um snapshot
+novo. Tudo é por worker: a resposta traz o pid de quem atendeu.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.deps import require_role
+from app.core.permissions import Role
+from app.models.user import User
+from app.services.memory import GROUP_BY, memory_service
+
+router = APIRouter(prefix="/admin/memory", tags=["Memória"])
+
+
+@router.get("")
+async def estatisticas(current_user: User = Depends(require_role(Role.SUPER_ADMIN))):
+    """RSS, blocos do heap do Python, GC e estado do tracemalloc deste worker"""
+    return memory_service.stats()
+
+
+@router.post("/tracemalloc")
+async def ligar_tracemalloc(
+    frames: int = Query(None, ge=1, le=50, description="Profundidade das pilhas (padrão MEMORY_TRACEMALLOC_FRAMES)"),
+    current_user: User = Depends(require_role(Role.SUPER_ADMIN)),
+):
+    memory_service.start_tracing(frames)
+    return memory_service.stats()
+
+
+@router.delete("/tracemalloc")
+async def desligar_tracemalloc(current_user: User = Depends(require_role(Role.SUPER_ADMIN))):
+    memory_service.stop_tracing()
+    return memory_service.stats()
+
+
+@router.post("/snapshots")
+async def tirar_snapshot(current_user: User = Depends(require_role(Role.SUPER_ADMIN))):
+    """Snapshot das alocações rastreadas (o id leva o pid do worker)"""
+    try:
+        snapshot = await asyncio.to_thread(memory_service.take_snapshot)
+    except RuntimeError:
+        raise HTTPException(status_code=409, detail="tracemalloc desligado: POST /admin/memory/tracemalloc")
+    return {"id": snapshot.id, "created_at": snapshot.created_at, "traced_bytes": snapshot.traced_bytes}
+
+
+@router.get("/snapshots")
+async def listar_snapshots(current_user: User = Depends(require_role(Role.SUPER_ADMIN))):
+    return {"pid": memory_service.stats()["pid"], "items": memory_service.list_snapshots()}
+
+
+@router.get("/snapshots/{snapshot_id}/diff")
+async def diff_snapshots(
+    snapshot_id: str,
+    against: str = Query(None, description="Snapshot mais recente (padrão: tira um agora)"),
+    limit: int = Query(25, ge=1, le=200),
+    group_by: str = Query("lineno", description="lineno, filename ou traceback"),
+    current_user: User = Depends(require_role(Role.SUPER_ADMIN)),
+):
+    """Locais de alocação que mais cresceram entre dois snapshots deste worker"""
+    if group_by not in GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"group_by deve ser um de: {', '.join(GROUP_BY)}")
+
+    base = memory_service.get_snapshot(snapshot_id)
+    if base is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Snapshot {snapshot_id} não está neste worker (pid {memory_service.stats()['pid']})",
+        )
+    if against:
+        current = memory_service.get_snapshot(against)
+        if current is None:
+            raise HTTPException(status_code=404, detail=f"Snapshot {against} não está neste worker")
+    else:
+        try:
+            current = await asyncio.to_thread(memory_service.take_snapshot)
+        except RuntimeError:
+            raise HTTPException(status_code=409, detail="tracemalloc desligado")
+
+    return await asyncio.to_thread(memory_service.diff, base, current, limit, group_by)
@@ -2,14 +2,18 @@
 Centro de Comando de Eventos - Notificações Inteligentes
 """
 
+import re
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.services.cache import cache
+from app.services.notification_stream import notification_stream
 
 router = APIRouter(prefix="/notifications", tags=["Notificações"])
 
@@ -156,6 +160,7 @@ async def setup_notifications(
                 },
             )
         await db.commit()
+        await notification_stream.invalidate(tenant_id, user_id)
         return {"message": f"Tabela criada com {len(samples)} notificações de exemplo"}
     return {"message": "Tabela existe", "count": count}
 
@@ -214,11 +219,26 @@ async def perform_action(
         "archive": "is_dismissed = TRUE, is_read = TRUE",
     }
     if data.action in ["approve", "reject"]:
-        sql = "UPDATE notifications SET is_actioned = TRUE, actioned_at = NOW(), is_read = TRUE WHERE id = :id"
+        sets = "is_actioned = TRUE, actioned_at = NOW(), is_read = TRUE"
     else:
-        sql = f"UPDATE notifications SET {updates.get(data.action, 'is_read = TRUE')} WHERE id = :id"
-    await db.execute(text(sql), {"id": notification_id})
+        sets = updates.get(data.action, "is_read = TRUE")
+    # Estado anterior e novo: o contador de não lidas muda só se a notificação mudou de situação
+    result = await db.execute(
+        text(
+            f"""
+        UPDATE notifications n SET {sets}
+        FROM (SELECT id, is_read, is_dismissed FROM notifications WHERE id = :id FOR UPDATE) antes
+        WHERE n.id = antes.id
+        RETURNING n.tenant_id, n.user_id,
+            (NOT antes.is_read AND NOT antes.is_dismissed)::int - (NOT n.is_read AND NOT n.is_dismissed)::int AS lidas
+    """
+        ),
+        {"id": notification_id},
+    )
+    row = result.fetchone()
     await db.commit()
+    if row and row.lidas:
+        await notification_stream.adjust(row.tenant_id, row.user_id, -row.lidas, [notification_id])
     return {"success": True}
 
 
@@ -228,14 +248,58 @@ async def mark_all_read(
     user_id: int = Query(1, description="ID do usuário autenticado"),
     db: AsyncSession = Depends(get_db),
 ):
-    await db.execute(
-        text("UPDATE notifications SET is_read = TRUE WHERE user_id = :uid AND tenant_id = :tid AND NOT is_read"),
+    result = await db.execute(
+        text(
+            "UPDATE notifications SET is_read = TRUE WHERE user_id = :uid AND tenant_id = :tid AND NOT is_read "
+            "RETURNING id, is_dismissed"
+        ),
         {"uid": user_id, "tid": tenant_id},
     )
+    # Dispensadas já não contavam como não lidas
+    lidas = [row.id for row in result.fetchall() if not row.is_dismissed]
     await db.commit()
+    await notification_stream.adjust(tenant_id, user_id, -len(lidas), lidas)
     return {"success": True}
 
 
+@router.get("/unread")
+async def get_unread_count(
+    tenant_id: int = Query(1, description="ID do condomínio"),
+    user_id: int = Query(1, description="ID do usuário autenticado"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Total de não lidas para o badge do sino (contador no Redis; o banco só é consultado na primeira vez)"""
+    return {"unread": await notification_stream.unread(db, tenant_id, user_id)}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    tenant_id: int = Query(1, description="ID do condomínio"),
+    user_id: int = Query(1, description="ID do usuário autenticado"),
+    last_event_id: Optional[str] = Header(None, description="Enviado pelo EventSource ao reconectar"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Eventos de notificação em tempo real (Server-Sent Events).
+
+    Eventos: unread (total atual, ao conectar), notification (nova), read (lidas ou
+    dispensadas) e reset (eventos perdidos: recarregar a lista). Ao reconectar, o
+    EventSource envia Last-Event-ID e recebe só o que perdeu.
+    """
+    if not cache.is_connected:
+        raise HTTPException(status_code=503, detail="Stream de notificações indisponível", headers={"Retry-After": "5"})
+    if last_event_id and not re.fullmatch(r"\d+-\d+", last_event_id):
+        last_event_id = None
+
+    unread = await notification_stream.unread(db, tenant_id, user_id)
+    return StreamingResponse(
+        notification_stream.events(tenant_id, user_id, unread, last_event_id),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: o nginx repassa cada evento sem acumular
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 from app.services.notification_hooks import (
     AnnouncementNotifications,
     MaintenanceNotifications,
@@ -264,6 +328,7 @@ async def test_reservation(
             "user_id": 999,
         },
     )
+    await db.commit()
     return {"message": "Notificação de reserva enviada"}
 
 
@@ -276,6 +341,7 @@ async def test_maintenance(
         tenant_id,
         {"id": 999, "title": "Vazamento no banheiro", "category": "Hidráulica", "location": "Apt 405", "user_id": 999},
     )
+    await db.commit()
     return {"message": "Notificação de manutenção enviada"}
 
 
@@ -284,6 +350,7 @@ async def test_voting(tenant_id: int = Query(1, description="ID do condomínio")
     count = await VotingNotifications.on_create(
         db, tenant_id, {"id": 999, "title": "Instalação de academia", "end_date": "30/12/2025"}, 999
     )
+    await db.commit()
     return {"message": f"Notificação enviada para {count} moradores"}
 
 
@@ -302,6 +369,7 @@ async def test_announcement(
         },
         999,
     )
+    await db.commit()
     return {"message": f"Comunicado enviado para {count} moradores"}
 
 
@@ -309,4 +377,5 @@ async def test_announcement(
 async def clear_test(tenant_id: int = Query(1, description="ID do condomínio"), db: AsyncSession = Depends(get_db)):
     result = await db.execute(text("DELETE FROM notifications WHERE reference_id = 999"))
     await db.commit()
+    await notification_stream.invalidate(tenant_id)
     return {"message": f"{result.rowcount} removidas"}
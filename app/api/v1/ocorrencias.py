@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.occurrence import Occurrence
 from app.schemas.occurrences import OccurrenceCreate, OccurrenceListResponse, OccurrenceResponse, OccurrenceUpdate
+from app.services.activity_feed import activity_feed
 
 router = APIRouter(prefix="/ocorrencias", tags=["Ocorrências"])
 
@@ -209,6 +210,7 @@ async def criar_ocorrencia(
     db.add(ocorrencia)
     await db.commit()
     await db.refresh(ocorrencia)
+    await activity_feed.publish(tenant_id, "ocorrencia", ocorrencia.id, ocorrencia.title, ocorrencia.created_at)
 
     return OccurrenceResponse(
         id=ocorrencia.id,
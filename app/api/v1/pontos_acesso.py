@@ -10,14 +10,21 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.core.permissions import Role
 from app.models.user import User
 from app.schemas.portaria import (
+    DecisaoAcessoRequest,
+    DecisaoAcessoResponse,
     PontoAcessoCreate,
     PontoAcessoListResponse,
     PontoAcessoResponse,
     PontoAcessoStatusResponse,
     PontoAcessoUpdate,
+    TokenIngestaoResponse,
 )
+from app.services.access_engine import access_engine
+from app.services.event_ingest import event_ingestor
+from app.services.health_probe import health_probe
 
 router = APIRouter(prefix="/portaria/pontos-acesso", tags=["Portaria - Pontos de Acesso"])
 
@@ -100,31 +107,26 @@ async def listar_pontos(
 @router.get("/status", response_model=List[PontoAcessoStatusResponse])
 async def status_pontos(
     tenant_id: int = Query(..., description="ID do condomínio"),
+    atualizar: bool = Query(False, description="Verifica os equipamentos agora em vez de usar o cache"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Retorna o status de todos os pontos de acesso ativos."""
-    result = await db.execute(
-        text("""
-            SELECT id, codigo, nome, status, last_ping_at
-            FROM pontos_acesso
-            WHERE tenant_id = :tenant_id AND is_active = true AND visivel = true
-            ORDER BY ordem, nome
-        """),
-        {"tenant_id": tenant_id}
-    )
+    """Retorna o status de todos os pontos de acesso ativos (verificados em paralelo, em cache)."""
+    return await health_probe.pontos_status(db, tenant_id, refresh=atualizar)
 
-    return [
-        PontoAcessoStatusResponse(
-            id=row.id,
-            codigo=row.codigo,
-            nome=row.nome,
-            status=row.status,
-            last_ping_at=row.last_ping_at,
-            is_online=row.status == "online"
-        )
-        for row in result.fetchall()
-    ]
+
+@router.get("/matriz")
+async def matriz_acesso(
+    tenant_id: int = Query(..., description="ID do condomínio"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Exporta a matriz de acesso compilada (para decisão offline nos controladores)."""
+    if current_user.role < Role.SYNDIC:
+        raise HTTPException(status_code=403, detail="Sem permissão para exportar a matriz de acesso")
+
+    matrix = await access_engine.get_matrix(db, tenant_id)
+    return matrix.snapshot()
 
 
 @router.get("/{ponto_id}", response_model=PontoAcessoResponse)
@@ -219,6 +221,8 @@ async def criar_ponto(
     )
     await db.commit()
     row = result.fetchone()
+    await access_engine.refresh_ponto(db, tenant_id, row.id)
+    health_probe.invalidate(tenant_id)
 
     return PontoAcessoResponse(
         id=row.id,
@@ -286,6 +290,9 @@ async def atualizar_ponto(
     result = await db.execute(text(query), params)
     await db.commit()
     row = result.fetchone()
+    await access_engine.refresh_ponto(db, tenant_id, row.id)
+    health_probe.invalidate(tenant_id)
+    event_ingestor.forget_device(row.id)
 
     return PontoAcessoResponse(
         id=row.id,
@@ -335,6 +342,10 @@ async def excluir_ponto(
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Ponto de acesso não encontrado")
 
+    await access_engine.refresh_ponto(db, tenant_id, ponto_id)
+    health_probe.invalidate(tenant_id)
+    event_ingestor.forget_device(ponto_id)
+
 
 @router.post("/{ponto_id}/abrir")
 async def abrir_ponto(
@@ -358,6 +369,12 @@ async def abrir_ponto(
     if ponto.status != "online":
         raise HTTPException(status_code=400, detail="Ponto de acesso não está online")
 
+    # Morador só abre pontos liberados pelos grupos de acesso do seu bloco
+    if current_user.role == Role.RESIDENT:
+        decisao = await access_engine.decide(db, tenant_id, ponto_id, user_id=current_user.id)
+        if not decisao.allowed:
+            raise HTTPException(status_code=403, detail=decisao.motivo)
+
     # TODO: Implementar integração real com hardware
     # Por enquanto, apenas registra o comando
 
@@ -396,27 +413,12 @@ async def status_ponto(
     current_user: User = Depends(get_current_user),
 ):
     """Retorna o status atual de um ponto de acesso."""
-    result = await db.execute(
-        text("""
-            SELECT id, codigo, nome, status, last_ping_at
-            FROM pontos_acesso
-            WHERE id = :id AND tenant_id = :tenant_id
-        """),
-        {"id": ponto_id, "tenant_id": tenant_id}
-    )
-    row = result.fetchone()
+    ponto = await health_probe.ponto_status(db, tenant_id, ponto_id)
 
-    if not row:
+    if not ponto:
         raise HTTPException(status_code=404, detail="Ponto de acesso não encontrado")
 
-    return PontoAcessoStatusResponse(
-        id=row.id,
-        codigo=row.codigo,
-        nome=row.nome,
-        status=row.status,
-        last_ping_at=row.last_ping_at,
-        is_online=row.status == "online"
-    )
+    return ponto
 
 
 @router.post("/{ponto_id}/ping")
@@ -442,4 +444,50 @@ async def ping_ponto(
     if not row:
         raise HTTPException(status_code=404, detail="Ponto de acesso não encontrado")
 
+    health_probe.record_heartbeat(tenant_id, ponto_id, status)
     return {"success": True, "ponto": row.nome, "status": status}
+
+
+@router.post("/{ponto_id}/token-ingestao", response_model=TokenIngestaoResponse)
+async def gerar_token_ingestao(
+    ponto_id: int,
+    tenant_id: int = Query(..., description="ID do condomínio"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Gera o token com que o hardware envia eventos em POST /portaria/eventos (o anterior é revogado)."""
+    if current_user.role < Role.SYNDIC:
+        raise HTTPException(status_code=403, detail="Sem permissão para gerar token de dispositivo")
+
+    token = await event_ingestor.issue_token(db, tenant_id, ponto_id)
+    if token is None:
+        raise HTTPException(status_code=404, detail="Ponto de acesso não encontrado")
+    await db.commit()
+
+    return TokenIngestaoResponse(ponto_id=ponto_id, token=token)
+
+
+@router.post("/{ponto_id}/decidir", response_model=DecisaoAcessoResponse)
+async def decidir_acesso(
+    ponto_id: int,
+    dados: DecisaoAcessoRequest,
+    tenant_id: int = Query(..., description="ID do condomínio"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Decide se a pessoa pode passar pelo ponto agora (usado pelo hardware; só QR Code consulta o banco)."""
+    decisao = await access_engine.decide(
+        db,
+        tenant_id,
+        ponto_id,
+        user_id=dados.user_id,
+        qr_code=dados.qr_code,
+        tipo=dados.tipo,
+        bloco=dados.bloco,
+        direcao=dados.direcao,
+    )
+    return DecisaoAcessoResponse(
+        permitido=decisao.allowed,
+        motivo=decisao.motivo,
+        ponto_id=ponto_id,
+        pre_autorizacao_id=decisao.pre_autorizacao_id,
+    )
@@ -10,18 +10,24 @@ from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import PaginationDep, get_current_user, get_db
+from app.core.serialization import FastJSONResponse, RowEncoder
 from app.models.user import User
 from app.schemas.portaria import (
     DashboardPortariaResponse,
     DashboardPortariaStats,
     LivroPortariaEntry,
     LivroPortariaResponse,
-    PontoAcessoStatusResponse,
     TurnoInfo,
     VisitaResponse,
 )
+from app.services.garage_occupancy import garage_occupancy
+from app.services.health_probe import health_probe
 
-router = APIRouter(prefix="/portaria", tags=["Portaria"])
+router = APIRouter(prefix="/portaria", tags=["Portaria"], default_response_class=FastJSONResponse)
+
+# Listas do dashboard e do livro: linhas do banco direto para JSON, sem um modelo por item
+_visitas = RowEncoder(VisitaResponse)
+_livro = RowEncoder(LivroPortariaResponse, columns={"titulo": "title", "conteudo": "content", "categoria": "category"})
 
 
 @router.get("/dashboard", response_model=DashboardPortariaResponse)
@@ -65,15 +71,23 @@ async def get_dashboard(
     entregas_stats = entregas_query.fetchone()
 
     # Estatísticas de acessos
+    # Filtros por intervalo na coluna (e não DATE(...)) para podar as partições mensais
+    inicio_dia = datetime.combine(hoje, datetime.min.time())
     acessos_query = await db.execute(
         text("""
             SELECT
-                COUNT(*) FILTER (WHERE DATE(registered_at) = :hoje) as hoje,
+                COUNT(*) FILTER (WHERE registered_at >= :inicio_dia AND registered_at < :fim_dia) as hoje,
                 COUNT(*) FILTER (WHERE registered_at >= :uma_hora) as ultima_hora
             FROM access_logs
-            WHERE tenant_id = :tenant_id
+            WHERE tenant_id = :tenant_id AND registered_at >= :inicio
         """),
-        {"tenant_id": tenant_id, "hoje": hoje, "uma_hora": uma_hora_atras}
+        {
+            "tenant_id": tenant_id,
+            "inicio_dia": inicio_dia,
+            "fim_dia": inicio_dia + timedelta(days=1),
+            "uma_hora": uma_hora_atras,
+            "inicio": min(inicio_dia, uma_hora_atras),
+        }
     )
     acessos_stats = acessos_query.fetchone()
 
@@ -90,24 +104,8 @@ async def get_dashboard(
     )
     ocorrencias_stats = ocorrencias_query.fetchone()
 
-    # Estatísticas de garagem
-    garagem_query = await db.execute(
-        text("""
-            SELECT
-                COUNT(*) FILTER (WHERE status = 'ocupada') as ocupadas,
-                COUNT(*) FILTER (WHERE status = 'livre') as livres,
-                COUNT(*) as total
-            FROM vagas_garagem
-            WHERE tenant_id = :tenant_id AND is_active = true
-        """),
-        {"tenant_id": tenant_id}
-    )
-    garagem_stats = garagem_query.fetchone()
-
-    # Calcular ocupação percentual
-    total_vagas = garagem_stats.total if garagem_stats and garagem_stats.total else 0
-    ocupadas = garagem_stats.ocupadas if garagem_stats and garagem_stats.ocupadas else 0
-    ocupacao_pct = (ocupadas / total_vagas * 100) if total_vagas > 0 else 0
+    # Estatísticas de garagem (contadores em memória)
+    garagem = await garage_occupancy.occupancy(db, tenant_id)
 
     stats = DashboardPortariaStats(
         visitantes_hoje=visitantes_stats.visitantes_hoje if visitantes_stats else 0,
@@ -119,9 +117,9 @@ async def get_dashboard(
         acessos_ultima_hora=acessos_stats.ultima_hora if acessos_stats else 0,
         ocorrencias_abertas=ocorrencias_stats.abertas if ocorrencias_stats else 0,
         ocorrencias_hoje=ocorrencias_stats.hoje if ocorrencias_stats else 0,
-        vagas_ocupadas=ocupadas,
-        vagas_livres=garagem_stats.livres if garagem_stats else 0,
-        ocupacao_percentual=round(ocupacao_pct, 1)
+        vagas_ocupadas=garagem.vagas_ocupadas,
+        vagas_livres=garagem.vagas_livres,
+        ocupacao_percentual=garagem.ocupacao_percentual
     )
 
     # Visitantes ativos (em andamento)
@@ -139,34 +137,7 @@ async def get_dashboard(
         """),
         {"tenant_id": tenant_id}
     )
-    visitantes_ativos = [
-        VisitaResponse(
-            id=row.id,
-            tenant_id=row.tenant_id,
-            visitor_id=row.visitor_id,
-            visitante_nome=row.visitante_nome,
-            visitante_documento=row.visitante_documento,
-            visitante_foto_url=row.visitante_foto_url,
-            unit_id=row.unit_id,
-            unit_number=row.unit_number,
-            unit_block=row.unit_block,
-            morador_id=row.morador_id,
-            morador_nome=row.morador_nome,
-            porteiro_entrada_id=row.porteiro_entrada_id,
-            porteiro_entrada_nome=row.porteiro_entrada_nome,
-            tipo=row.tipo,
-            status=row.status,
-            data_entrada=row.data_entrada,
-            data_saida=row.data_saida,
-            autorizado_por=row.autorizado_por,
-            metodo_autorizacao=row.metodo_autorizacao,
-            veiculo_placa=row.veiculo_placa,
-            veiculo_modelo=row.veiculo_modelo,
-            observacoes=row.observacoes,
-            created_at=row.created_at
-        )
-        for row in visitantes_ativos_query.fetchall()
-    ]
+    visitantes_ativos = _visitas.encode_many(visitantes_ativos_query.fetchall())
 
     # Últimos acessos
     ultimos_acessos_query = await db.execute(
@@ -198,27 +169,8 @@ async def get_dashboard(
         for row in ultimos_acessos_query.fetchall()
     ]
 
-    # Status dos pontos de acesso
-    pontos_query = await db.execute(
-        text("""
-            SELECT id, codigo, nome, status, last_ping_at
-            FROM pontos_acesso
-            WHERE tenant_id = :tenant_id AND is_active = true AND visivel = true
-            ORDER BY ordem, nome
-        """),
-        {"tenant_id": tenant_id}
-    )
-    pontos_status = [
-        PontoAcessoStatusResponse(
-            id=row.id,
-            codigo=row.codigo,
-            nome=row.nome,
-            status=row.status,
-            last_ping_at=row.last_ping_at,
-            is_online=row.status == "online"
-        )
-        for row in pontos_query.fetchall()
-    ]
+    # Status dos pontos de acesso (cache das verificações)
+    pontos_status = await health_probe.pontos_status(db, tenant_id)
 
     # Alertas
     alertas = []
@@ -252,13 +204,13 @@ async def get_dashboard(
             "icone": "AlertTriangle"
         })
 
-    return DashboardPortariaResponse(
-        stats=stats,
-        visitantes_ativos=visitantes_ativos,
-        ultimos_acessos=ultimos_acessos,
-        pontos_acesso_status=pontos_status,
-        alertas=alertas
-    )
+    return FastJSONResponse({
+        "stats": stats,
+        "visitantes_ativos": visitantes_ativos,
+        "ultimos_acessos": ultimos_acessos,
+        "pontos_acesso_status": pontos_status,
+        "alertas": alertas,
+    })
 
 
 @router.get("/turno", response_model=TurnoInfo)
@@ -391,21 +343,7 @@ async def listar_registros_livro(
     result = await db.execute(text(query), params)
     rows = result.fetchall()
 
-    return [
-        LivroPortariaResponse(
-            id=row.id,
-            tenant_id=row.tenant_id,
-            user_id=row.user_id,
-            user_nome=row.user_nome,
-            titulo=row.title,
-            conteudo=row.content,
-            categoria=row.category,
-            shift=row.shift,
-            registered_at=row.registered_at,
-            created_at=row.created_at
-        )
-        for row in rows
-    ]
+    return FastJSONResponse(_livro.encode_many(rows))
 
 
 @router.get("/stats/acessos")
@@ -426,17 +364,18 @@ async def get_stats_acessos(
         data_inicio = hoje - timedelta(days=7)
     else:  # mes
         data_inicio = hoje - timedelta(days=30)
+    inicio = datetime.combine(data_inicio, datetime.min.time())
 
     # Acessos por hora
     por_hora = await db.execute(
         text("""
             SELECT EXTRACT(HOUR FROM registered_at) as hora, COUNT(*) as total
             FROM access_logs
-            WHERE tenant_id = :tenant_id AND DATE(registered_at) >= :data_inicio
+            WHERE tenant_id = :tenant_id AND registered_at >= :inicio
             GROUP BY EXTRACT(HOUR FROM registered_at)
             ORDER BY hora
         """),
-        {"tenant_id": tenant_id, "data_inicio": data_inicio}
+        {"tenant_id": tenant_id, "inicio": inicio}
     )
 
     # Acessos por método
@@ -444,11 +383,11 @@ async def get_stats_acessos(
         text("""
             SELECT access_method, COUNT(*) as total
             FROM access_logs
-            WHERE tenant_id = :tenant_id AND DATE(registered_at) >= :data_inicio
+            WHERE tenant_id = :tenant_id AND registered_at >= :inicio
             GROUP BY access_method
             ORDER BY total DESC
         """),
-        {"tenant_id": tenant_id, "data_inicio": data_inicio}
+        {"tenant_id": tenant_id, "inicio": inicio}
     )
 
     # Acessos por ponto
@@ -456,11 +395,11 @@ async def get_stats_acessos(
         text("""
             SELECT access_point, COUNT(*) as total
             FROM access_logs
-            WHERE tenant_id = :tenant_id AND DATE(registered_at) >= :data_inicio
+            WHERE tenant_id = :tenant_id AND registered_at >= :inicio
             GROUP BY access_point
             ORDER BY total DESC
         """),
-        {"tenant_id": tenant_id, "data_inicio": data_inicio}
+        {"tenant_id": tenant_id, "inicio": inicio}
     )
 
     # Acessos por tipo (entrada/saída)
@@ -468,10 +407,10 @@ async def get_stats_acessos(
         text("""
             SELECT access_type, COUNT(*) as total
             FROM access_logs
-            WHERE tenant_id = :tenant_id AND DATE(registered_at) >= :data_inicio
+            WHERE tenant_id = :tenant_id AND registered_at >= :inicio
             GROUP BY access_type
         """),
-        {"tenant_id": tenant_id, "data_inicio": data_inicio}
+        {"tenant_id": tenant_id, "inicio": inicio}
     )
 
     return {
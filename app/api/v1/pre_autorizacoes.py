@@ -12,6 +12,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.core.serialization import FastJSONResponse, RowEncoder, paginated
 from app.models.user import User
 from app.schemas.portaria import (
     PreAutorizacaoCreate,
@@ -21,8 +22,16 @@ from app.schemas.portaria import (
     PreAutorizacaoValidarRequest,
     PreAutorizacaoValidarResponse,
 )
+from app.services.access_engine import access_engine
 
-router = APIRouter(prefix="/portaria/pre-autorizacoes", tags=["Portaria - Pré-Autorizações"])
+router = APIRouter(
+    prefix="/portaria/pre-autorizacoes",
+    tags=["Portaria - Pré-Autorizações"],
+    default_response_class=FastJSONResponse,
+)
+
+# Listagem: linhas do banco direto para JSON, sem construir PreAutorizacaoResponse por item
+_pre_autorizacoes = RowEncoder(PreAutorizacaoResponse)
 
 
 def gerar_qr_code() -> str:
@@ -87,51 +96,7 @@ async def listar_pre_autorizacoes(
     result = await db.execute(text(query), params)
     rows = result.fetchall()
 
-    items = [
-        PreAutorizacaoResponse(
-            id=row.id,
-            tenant_id=row.tenant_id,
-            unit_id=row.unit_id,
-            unit_number=row.unit_number,
-            unit_block=row.unit_block,
-            morador_id=row.morador_id,
-            morador_nome=row.morador_nome,
-            visitante_nome=row.visitante_nome,
-            visitante_documento=row.visitante_documento,
-            visitante_telefone=row.visitante_telefone,
-            visitante_email=row.visitante_email,
-            visitante_tipo=row.visitante_tipo,
-            veiculo_placa=row.veiculo_placa,
-            veiculo_modelo=row.veiculo_modelo,
-            veiculo_cor=row.veiculo_cor,
-            data_inicio=row.data_inicio,
-            data_fim=row.data_fim,
-            horario_inicio=row.horario_inicio,
-            horario_fim=row.horario_fim,
-            dias_semana=row.dias_semana,
-            tipo=row.tipo,
-            is_single_use=row.is_single_use,
-            max_usos=row.max_usos,
-            usos_realizados=row.usos_realizados,
-            grupo_acesso_id=row.grupo_acesso_id,
-            ponto_acesso_id=row.ponto_acesso_id,
-            qr_code=row.qr_code,
-            qr_code_url=row.qr_code_url,
-            status=row.status,
-            observacoes=row.observacoes,
-            created_at=row.created_at,
-            updated_at=row.updated_at
-        )
-        for row in rows
-    ]
-
-    return PreAutorizacaoListResponse(
-        items=items,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return FastJSONResponse(paginated(_pre_autorizacoes.encode_many(rows), total, skip, limit))
 
 
 @router.get("/{pre_auth_id}", response_model=PreAutorizacaoResponse)
@@ -256,6 +221,7 @@ async def criar_pre_autorizacao(
     )
     await db.commit()
     row = result.fetchone()
+    await access_engine.refresh_pre_autorizacao(db, tenant_id, row.id)
 
     # Buscar dados adicionais
     unit_info = await db.execute(
@@ -340,6 +306,7 @@ async def atualizar_pre_autorizacao(
     result = await db.execute(text(query), params)
     await db.commit()
     row = result.fetchone()
+    await access_engine.refresh_pre_autorizacao(db, tenant_id, row.id)
 
     # Buscar dados adicionais
     extra = await db.execute(
@@ -411,6 +378,8 @@ async def cancelar_pre_autorizacao(
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Pré-autorização não encontrada ou já cancelada")
 
+    await access_engine.refresh_pre_autorizacao(db, tenant_id, pre_auth_id)
+
 
 @router.post("/validar", response_model=PreAutorizacaoValidarResponse)
 async def validar_qr_code(
@@ -560,6 +529,8 @@ async def registrar_uso(
     if not row:
         raise HTTPException(status_code=404, detail="Pré-autorização não encontrada ou inativa")
 
+    await access_engine.refresh_pre_autorizacao(db, tenant_id, pre_auth_id)
+
     return {
         "success": True,
         "usos_realizados": row.usos_realizados,
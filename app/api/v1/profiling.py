@@ -0,0 +1,54 @@
+"""
+Endpoints de profiling sob demanda (super admin)
+
+Fluxo: emitir um token, repetir a requisição lenta com o header
+X-Profile-Token e baixar o perfil pelo X-Request-ID/X-Profile-ID da resposta.
+Os perfis ficam no worker que atendeu a requisição.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.api.deps import require_role
+from app.config import settings
+from app.core.permissions import Role
+from app.models.user import User
+from app.services.profiling import PROFILE_HEADER, profiling_service
+
+router = APIRouter(prefix="/admin/profiles", tags=["Profiling"])
+
+
+@router.post("/token")
+async def emitir_token(
+    ttl_seconds: int = Query(None, ge=30, le=3600, description="Validade (padrão PROFILING_TOKEN_TTL_SECONDS)"),
+    current_user: User = Depends(require_role(Role.SUPER_ADMIN)),
+):
+    """Token assinado para o header que liga o profiling numa requisição"""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=409, detail="Profiling desligado (PROFILING_ENABLED=false)")
+    return {
+        "header": PROFILE_HEADER,
+        "token": profiling_service.issue_token(ttl_seconds),
+        "expires_in": ttl_seconds or settings.PROFILING_TOKEN_TTL_SECONDS,
+    }
+
+
+@router.get("")
+async def listar_perfis(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_role(Role.SUPER_ADMIN)),
+):
+    """Perfis mais recentes deste worker"""
+    return {"enabled": settings.PROFILING_ENABLED, "items": profiling_service.list(limit)}
+
+
+@router.get("/{request_id}")
+async def baixar_perfil(
+    request_id: str,
+    current_user: User = Depends(require_role(Role.SUPER_ADMIN)),
+):
+    """Perfil no formato speedscope (arrastar o arquivo em https://speedscope.app)"""
+    path = profiling_service.profile_path(request_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return FileResponse(path, media_type="application/json", filename=f"{request_id}.speedscope.json")
@@ -3,7 +3,7 @@ Endpoints de relatórios - Públicos (sem autenticação para desenvolvimento)
 """
 
 import io
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query
@@ -11,13 +11,21 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache_decorator import cached_response
 from app.database import get_db
+from app.services.archival import archival_service
+from app.services.search import escape_like, normalize_text, search_digits_pattern
 
 router = APIRouter(prefix="/reports", tags=["Relatórios"])
 
+# TTL das respostas JSON cacheadas dos relatórios de cadastro; a versão do domínio
+# "moradores" entra na chave, então uma alteração de cadastro aparece na hora
+REPORTS_CACHE_TTL = 600  # 10 minutos
+
 
 # ==================== MORADORES ====================
 @router.get("/moradores")
+@cached_response("reports", ttl=REPORTS_CACHE_TTL, domains=["moradores"])
 async def moradores_report(
     tenant_id: int = Query(1, description="ID do condomínio"),
     search: Optional[str] = None,
@@ -38,8 +46,11 @@ async def moradores_report(
         where_clauses.append("role = :role")
         params["role"] = role
     if search:
-        where_clauses.append("(name ILIKE :search OR email ILIKE :search OR cpf ILIKE :search)")
-        params["search"] = f"%{search}%"
+        # Colunas normalizadas (sem acento / só dígitos) com índice trigram
+        where_clauses.append("(search_name LIKE :search OR email ILIKE :search_raw OR search_cpf LIKE :search_digits)")
+        params["search"] = f"%{escape_like(normalize_text(search))}%"
+        params["search_raw"] = f"%{escape_like(search)}%"
+        params["search_digits"] = search_digits_pattern(search)
 
     where_sql = " AND ".join(where_clauses)
 
@@ -88,8 +99,9 @@ async def visitantes_report(
         where_clauses.append("visitor_type = :vtype")
         params["vtype"] = visitor_type
     if search:
-        where_clauses.append("(name ILIKE :search OR cpf ILIKE :search)")
-        params["search"] = f"%{search}%"
+        where_clauses.append("(search_name LIKE :search OR search_cpf LIKE :search_digits)")
+        params["search"] = f"%{escape_like(normalize_text(search))}%"
+        params["search_digits"] = search_digits_pattern(search)
     if start_date:
         where_clauses.append("created_at >= :start_date")
         params["start_date"] = start_date
@@ -123,6 +135,7 @@ async def visitantes_report(
 
 # ==================== VEÍCULOS ====================
 @router.get("/veiculos")
+@cached_response("reports", ttl=REPORTS_CACHE_TTL, domains=["moradores"])
 async def veiculos_report(
     tenant_id: int = Query(1, description="ID do condomínio"),
     search: Optional[str] = None,
@@ -306,6 +319,7 @@ async def ocorrencias_report(
 
 # ==================== UNIDADES ====================
 @router.get("/unidades")
+@cached_response("reports", ttl=REPORTS_CACHE_TTL, domains=["moradores"])
 async def unidades_report(
     tenant_id: int = Query(1, description="ID do condomínio"),
     search: Optional[str] = None,
@@ -377,8 +391,8 @@ async def acessos_report(
         where_clauses.append("a.registered_at >= :start_date")
         params["start_date"] = start_date
     if end_date:
-        where_clauses.append("a.registered_at <= :end_date")
-        params["end_date"] = end_date
+        where_clauses.append("a.registered_at < :end_date")
+        params["end_date"] = end_date + timedelta(days=1)
 
     where_sql = " AND ".join(where_clauses)
 
@@ -413,6 +427,9 @@ async def acessos_report(
 
 # ==================== RESUMO GERAL ====================
 @router.get("/resumo")
+@cached_response(
+    "reports", ttl=REPORTS_CACHE_TTL, domains=["moradores", "visitas", "manutencao", "ocorrencias", "acessos"]
+)
 async def resumo_geral(tenant_id: int = Query(1, description="ID do condomínio"), db: AsyncSession = Depends(get_db)):
     """Resumo geral para a página de relatórios"""
     result = await db.execute(
@@ -470,6 +487,7 @@ def generate_csv(items: List[dict], filename: str) -> StreamingResponse:
 
 # ==================== DEPENDENTES ====================
 @router.get("/dependentes")
+@cached_response("reports", ttl=REPORTS_CACHE_TTL, domains=["moradores"])
 async def dependentes_report(
     tenant_id: int = Query(1, description="ID do condomínio"),
     search: Optional[str] = None,
@@ -504,6 +522,7 @@ async def dependentes_report(
 
 # ==================== PETS ====================
 @router.get("/pets")
+@cached_response("reports", ttl=REPORTS_CACHE_TTL, domains=["moradores"])
 async def pets_report(
     tenant_id: int = Query(1, description="ID do condomínio"),
     search: Optional[str] = None,
@@ -1044,6 +1063,7 @@ async def auditoria_report(
     page: int = Query(1, ge=1),
     limit: int = Query(50, ge=1, le=500),
     format: str = Query("json", pattern="^(json|csv)$"),
+    incluir_arquivo: bool = Query(False, description="Inclui registros já movidos para o arquivo frio"),
     db: AsyncSession = Depends(get_db),
 ):
     """Relatório de logs de auditoria"""
@@ -1056,8 +1076,8 @@ async def auditoria_report(
         where_clauses.append("al.created_at >= :start_date")
         params["start_date"] = start_date
     if end_date:
-        where_clauses.append("al.created_at <= :end_date")
-        params["end_date"] = end_date
+        where_clauses.append("al.created_at < :end_date")
+        params["end_date"] = end_date + timedelta(days=1)
     where_sql = " AND ".join(where_clauses)
     count_result = await db.execute(text(f"SELECT COUNT(*) FROM audit_logs al WHERE {where_sql}"), params)
     total = count_result.scalar() or 0
@@ -1074,11 +1094,74 @@ async def auditoria_report(
         params,
     )
     items = [dict(row._mapping) for row in result.fetchall()]
+    if incluir_arquivo:
+        # Registros arquivados são sempre mais antigos que os do banco: vêm depois na ordenação
+        archived_total, archived_items = await _archived_audit_page(
+            db,
+            tenant_id,
+            action,
+            start_date,
+            end_date,
+            skip=max(0, params["offset"] - total),
+            take=limit - len(items),
+        )
+        items.extend(archived_items)
+        total += archived_total
     if format == "csv":
         return generate_csv(items, "auditoria")
     return {"items": items, "total": total, "page": page, "generated_at": datetime.now().isoformat()}
 
 
+AUDIT_REPORT_COLUMNS = [
+    "id",
+    "action",
+    "entity_type",
+    "entity_id",
+    "old_values",
+    "new_values",
+    "ip_address",
+    "created_at",
+    "user_name",
+]
+
+
+async def _archived_audit_page(
+    db: AsyncSession,
+    tenant_id: int,
+    action: Optional[str],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    skip: int,
+    take: int,
+) -> tuple:
+    """Conta os logs de auditoria arquivados que atendem o filtro e retorna a fatia [skip, skip + take)"""
+    start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+    end = datetime.combine(end_date + timedelta(days=1), datetime.min.time()) if end_date else None
+    total, page = await archival_service.archived_page(
+        db,
+        "audit_logs",
+        tenant_id,
+        start,
+        end,
+        skip=skip,
+        take=take,
+        match=(lambda row: row.get("action") == action) if action else None,
+    )
+
+    # Nome do usuário via users, como no relatório do banco
+    user_ids = list({row["user_id"] for row in page if row.get("user_id")})
+    names = {}
+    if user_ids:
+        result = await db.execute(text("SELECT id, name FROM users WHERE id = ANY(:ids)"), {"ids": user_ids})
+        names = {row[0]: row[1] for row in result.fetchall()}
+    items = []
+    for row in page:
+        item = {column: row.get(column) for column in AUDIT_REPORT_COLUMNS}
+        item["user_name"] = names.get(row.get("user_id"))
+        items.append(item)
+    return total, items
+
+
 # ==================== LOGINS ====================
 @router.get("/logins")
 async def logins_report(
@@ -1097,8 +1180,8 @@ async def logins_report(
         where_clauses.append("al.created_at >= :start_date")
         params["start_date"] = start_date
     if end_date:
-        where_clauses.append("al.created_at <= :end_date")
-        params["end_date"] = end_date
+        where_clauses.append("al.created_at < :end_date")
+        params["end_date"] = end_date + timedelta(days=1)
     where_sql = " AND ".join(where_clauses)
     count_result = await db.execute(text(f"SELECT COUNT(*) FROM audit_logs al WHERE {where_sql}"), params)
     total = count_result.scalar() or 0
@@ -1141,8 +1224,8 @@ async def logs_acesso_report(
         where_clauses.append("al.registered_at >= :start_date")
         params["start_date"] = start_date
     if end_date:
-        where_clauses.append("al.registered_at <= :end_date")
-        params["end_date"] = end_date
+        where_clauses.append("al.registered_at < :end_date")
+        params["end_date"] = end_date + timedelta(days=1)
     where_sql = " AND ".join(where_clauses)
     count_result = await db.execute(text(f"SELECT COUNT(*) FROM access_logs al WHERE {where_sql}"), params)
     total = count_result.scalar() or 0
@@ -1215,8 +1298,8 @@ async def visitantes_log_report(
         where_clauses.append("al.registered_at >= :start_date")
         params["start_date"] = start_date
     if end_date:
-        where_clauses.append("al.registered_at <= :end_date")
-        params["end_date"] = end_date
+        where_clauses.append("al.registered_at < :end_date")
+        params["end_date"] = end_date + timedelta(days=1)
     where_sql = " AND ".join(where_clauses)
     count_result = await db.execute(text(f"SELECT COUNT(*) FROM access_logs al WHERE {where_sql}"), params)
     total = count_result.scalar() or 0
@@ -1255,8 +1338,8 @@ async def prestadores_log_report(
         where_clauses.append("al.registered_at >= :start_date")
         params["start_date"] = start_date
     if end_date:
-        where_clauses.append("al.registered_at <= :end_date")
-        params["end_date"] = end_date
+        where_clauses.append("al.registered_at < :end_date")
+        params["end_date"] = end_date + timedelta(days=1)
     where_sql = " AND ".join(where_clauses)
     count_result = await db.execute(
         text(
@@ -1298,11 +1381,13 @@ async def presenca_diaria_report(
 ):
     """Relatório de presença diária"""
     params = {"tid": tenant_id, "limit": limit, "offset": (page - 1) * limit}
+    # Intervalo semi-aberto na coluna (e não ::date) para o Postgres podar as partições
     if data:
-        params["data"] = data
-        where_date = "AND al.registered_at::date = :data"
+        params["inicio"] = data
+        params["fim"] = data + timedelta(days=1)
+        where_date = "AND al.registered_at >= :inicio AND al.registered_at < :fim"
     else:
-        where_date = "AND al.registered_at::date = CURRENT_DATE"
+        where_date = "AND al.registered_at >= CURRENT_DATE AND al.registered_at < CURRENT_DATE + 1"
     count_result = await db.execute(
         text(
             f"""
@@ -1357,8 +1442,8 @@ async def historico_frequencia_report(
         where_clauses.append("al.registered_at >= :start_date")
         params["start_date"] = start_date
     if end_date:
-        where_clauses.append("al.registered_at <= :end_date")
-        params["end_date"] = end_date
+        where_clauses.append("al.registered_at < :end_date")
+        params["end_date"] = end_date + timedelta(days=1)
     where_sql = " AND ".join(where_clauses)
     count_result = await db.execute(text(f"SELECT COUNT(*) FROM access_logs al WHERE {where_sql}"), params)
     total = count_result.scalar() or 0
@@ -6,15 +6,19 @@ from app.api.v1.anuncios import router as anuncios_router
 from app.api.v1.ativos import router as ativos_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.avaliacoes import router as avaliacoes_router
+from app.api.v1.changes import router as changes_router
 from app.api.v1.classificados import router as classificados_router
 from app.api.v1.dashboard import router as dashboard_router
 from app.api.v1.dependents import router as dependents_router
 from app.api.v1.destaques import router as destaques_router
 from app.api.v1.documentos import router as documentos_router
 from app.api.v1.encomendas import router as encomendas_router
+from app.api.v1.eventos_dispositivos import router as eventos_dispositivos_router
 from app.api.v1.estatisticas import router as estatisticas_router
 from app.api.v1.faq import router as faq_router
+from app.api.v1.importacao import router as importacao_router
 from app.api.v1.manutencao import router as manutencao_router
+from app.api.v1.memory import router as memory_router
 from app.api.v1.notifications import router as notifications_router
 from app.api.v1.ocorrencias import router as ocorrencias_router
 from app.api.v1.pets import router as pets_router
@@ -26,8 +30,10 @@ from app.api.v1.integracoes import router as integracoes_router
 from app.api.v1.garagem_visual import router as garagem_router
 from app.api.v1.visitas import router as visitas_router
 from app.api.v1.profile import router as profile_router
+from app.api.v1.profiling import router as profiling_router
 from app.api.v1.reports import router as reports_router
 from app.api.v1.reservas import router as reservas_router
+from app.api.v1.search import router as search_router
 from app.api.v1.surveys import router as surveys_router
 from app.api.v1.tenant import router as tenant_router
 from app.api.v1.units import router as units_router
@@ -66,6 +72,11 @@ api_router.include_router(notifications_router)
 api_router.include_router(encomendas_router)
 api_router.include_router(tenant_router)
 api_router.include_router(reservas_router)
+api_router.include_router(search_router)
+api_router.include_router(importacao_router)
+api_router.include_router(profiling_router)
+api_router.include_router(memory_router)
+api_router.include_router(changes_router)
 
 # Portaria module routes
 api_router.include_router(portaria_router)
@@ -75,6 +86,7 @@ api_router.include_router(pre_autorizacoes_router)
 api_router.include_router(integracoes_router)
 api_router.include_router(garagem_router)
 api_router.include_router(visitas_router)
+api_router.include_router(eventos_dispositivos_router)
 
 # WebSocket routes
 api_router.include_router(websocket_router, tags=["WebSocket"])
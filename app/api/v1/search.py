@@ -0,0 +1,48 @@
+"""
+Busca unificada - moradores, visitantes, veículos e unidades
+"""
+
+import time
+from dataclasses import asdict
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db
+from app.models.user import User
+from app.schemas.search import SearchResponse, SearchResultItem
+from app.services.search import SEARCH_TYPES, search_service
+
+router = APIRouter(prefix="/search", tags=["Busca"])
+
+
+@router.get("", response_model=SearchResponse)
+async def unified_search(
+    q: str = Query(..., min_length=1, max_length=100, description="Nome, CPF, telefone, placa ou unidade"),
+    types: Optional[str] = Query(None, description="Tipos separados por vírgula: users,visitors,vehicles,units"),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Busca da portaria (digitação incremental) no condomínio do usuário.
+
+    Resultados ordenados por relevância: correspondências de prefixo
+    primeiro, depois similaridade (trigram).
+    """
+    selected = [item.strip() for item in types.split(",") if item.strip()] if types else list(SEARCH_TYPES)
+    invalid = [item for item in selected if item not in SEARCH_TYPES]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipos inválidos: {', '.join(invalid)}",
+        )
+
+    started = time.perf_counter()
+    results = await search_service.search(db, current_user.tenant_id, q, types=selected, limit=limit)
+    return SearchResponse(
+        query=q,
+        items=[SearchResultItem(**asdict(result)) for result in results],
+        took_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -14,12 +14,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
 from app.config import UPLOAD_BASE_DIR
+from app.core.cache_decorator import cached_response, invalidate_cache
 
 router = APIRouter(prefix="/tenant", tags=["Tenant/Condomínio"])
 
 UPLOAD_DIR = os.path.join(UPLOAD_BASE_DIR, "tenant")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# TTL das respostas cacheadas (invalidadas ao alterar os dados ou o logo)
+TENANT_CACHE_TTL = 300  # 5 minutos
+TENANT_STATS_CACHE_TTL = 60  # 1 minuto para contagens e equipe (mudam fora deste módulo)
+
 
 class TenantUpdate(BaseModel):
     name: Optional[str] = None
@@ -34,6 +39,7 @@ class TenantUpdate(BaseModel):
 
 
 @router.get("")
+@cached_response("tenant", ttl=TENANT_CACHE_TTL)
 async def get_tenant(tenant_id: int = Query(1, description="ID do condomínio"), db: AsyncSession = Depends(get_db)):
     """Dados do condomínio"""
     result = await db.execute(
@@ -56,6 +62,7 @@ async def get_tenant(tenant_id: int = Query(1, description="ID do condomínio"),
 
 
 @router.get("/stats")
+@cached_response("tenant", ttl=TENANT_STATS_CACHE_TTL)
 async def get_tenant_stats(
     tenant_id: int = Query(1, description="ID do condomínio"), db: AsyncSession = Depends(get_db)
 ):
@@ -123,6 +130,7 @@ async def get_tenant_stats(
 
 
 @router.get("/equipe")
+@cached_response("tenant", ttl=TENANT_STATS_CACHE_TTL)
 async def get_equipe(tenant_id: int = Query(1, description="ID do condomínio"), db: AsyncSession = Depends(get_db)):
     """Equipe do condomínio (síndicos, porteiros, etc)"""
     result = await db.execute(
@@ -193,6 +201,7 @@ async def update_tenant(
             params,
         )
         await db.commit()
+        await invalidate_cache("tenant", tenant_id)
 
     return {"success": True, "message": "Dados atualizados com sucesso"}
 
@@ -224,6 +233,7 @@ async def upload_logo(
     )
 
     await db.commit()
+    await invalidate_cache("tenant", tenant_id)
     return {"logo_url": logo_url}
 
 
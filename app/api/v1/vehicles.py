@@ -2,6 +2,7 @@
 Endpoints de veículos
 """
 
+import time
 from datetime import datetime
 from typing import Optional
 
@@ -11,6 +12,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db
+from app.services.plate_index import plate_index
 
 router = APIRouter(prefix="/vehicles", tags=["Veículos"])
 
@@ -88,6 +90,41 @@ async def list_vehicles(
     return {"items": items, "total": total, "page": page}
 
 
+@router.get("/lookup")
+async def lookup_plate(
+    plate: str = Query(..., min_length=1, max_length=20, description="Placa lida (câmera LPR ou digitada)"),
+    tenant_id: int = Query(1, description="ID do condomínio"),
+    limit: int = Query(5, ge=1, le=20),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Consulta de placa tolerante a erros de OCR (O/0, I/1, B/8, ...).
+
+    Retorna morador/visitante, unidade e vaga a partir do índice em memória.
+    """
+    started = time.perf_counter()
+    matches = await plate_index.lookup(db, tenant_id, plate, limit=limit)
+    items = [
+        {
+            "type": item.entry.kind,
+            "vehicle_id": item.entry.vehicle_id,
+            "plate": item.entry.plate,
+            "model": item.entry.model,
+            "color": item.entry.color,
+            "owner_id": item.entry.owner_id,
+            "owner_name": item.entry.owner_name,
+            "unit_id": item.entry.unit_id,
+            "unit": item.entry.unit,
+            "spot": item.entry.spot,
+            "blocked": item.entry.blocked,
+            "match": item.match,
+            "distance": item.distance,
+        }
+        for item in matches
+    ]
+    return {"plate": plate, "items": items, "took_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+
 @router.get("/{vehicle_id}")
 async def get_vehicle(
     vehicle_id: int, tenant_id: int = Query(1, description="ID do condomínio"), db: AsyncSession = Depends(get_db)
@@ -152,8 +189,9 @@ async def create_vehicle(
             "tid": tenant_id,
         },
     )
-    await db.commit()
     new_id = result.scalar()
+    await db.commit()
+    await plate_index.refresh_vehicle(db, tenant_id, new_id)
     return {"id": new_id, "message": "Veículo criado com sucesso"}
 
 
@@ -190,6 +228,7 @@ async def update_vehicle(
         params,
     )
     await db.commit()
+    await plate_index.refresh_vehicle(db, tenant_id, vehicle_id)
 
     return {"message": "Veículo atualizado com sucesso"}
 
@@ -209,4 +248,5 @@ async def delete_vehicle(
         {"id": vehicle_id, "tid": tenant_id},
     )
     await db.commit()
+    await plate_index.refresh_vehicle(db, tenant_id, vehicle_id)
     return {"message": "Veículo removido com sucesso"}
@@ -10,6 +10,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db
+from app.core.serialization import FastJSONResponse, RowEncoder, paginated
 from app.models.user import User
 from app.schemas.portaria import (
     VisitaAutorizar,
@@ -19,8 +20,12 @@ from app.schemas.portaria import (
     VisitaNegar,
     VisitaResponse,
 )
+from app.services.activity_feed import activity_feed
 
-router = APIRouter(prefix="/portaria/visitas", tags=["Portaria - Visitas"])
+router = APIRouter(prefix="/portaria/visitas", tags=["Portaria - Visitas"], default_response_class=FastJSONResponse)
+
+# Listagem: linhas do banco direto para JSON, sem construir VisitaResponse por item
+_visitas = RowEncoder(VisitaResponse)
 
 
 @router.get("", response_model=VisitaListResponse)
@@ -83,48 +88,7 @@ async def listar_visitas(
     result = await db.execute(text(query), params)
     rows = result.fetchall()
 
-    items = [
-        VisitaResponse(
-            id=row.id,
-            tenant_id=row.tenant_id,
-            visitor_id=row.visitor_id,
-            visitante_nome=row.visitante_nome,
-            visitante_documento=row.visitante_documento,
-            visitante_foto_url=row.visitante_foto_url,
-            unit_id=row.unit_id,
-            unit_number=row.unit_number,
-            unit_block=row.unit_block,
-            tipo=row.tipo,
-            morador_id=row.morador_id,
-            morador_nome=row.morador_nome,
-            porteiro_entrada_id=row.porteiro_entrada_id,
-            porteiro_entrada_nome=row.porteiro_entrada_nome,
-            porteiro_saida_id=row.porteiro_saida_id,
-            status=row.status,
-            data_entrada=row.data_entrada,
-            data_saida=row.data_saida,
-            autorizado_por=row.autorizado_por,
-            metodo_autorizacao=row.metodo_autorizacao,
-            pre_autorizacao_id=row.pre_autorizacao_id,
-            ponto_entrada_id=row.ponto_entrada_id,
-            ponto_saida_id=row.ponto_saida_id,
-            veiculo_placa=row.veiculo_placa,
-            veiculo_modelo=row.veiculo_modelo,
-            observacoes=row.observacoes,
-            motivo_negacao=row.motivo_negacao,
-            created_at=row.created_at,
-            updated_at=row.updated_at
-        )
-        for row in rows
-    ]
-
-    return VisitaListResponse(
-        items=items,
-        total=total,
-        page=skip // limit + 1,
-        size=limit,
-        pages=(total + limit - 1) // limit
-    )
+    return FastJSONResponse(paginated(_visitas.encode_many(rows), total, skip, limit))
 
 
 @router.get("/em-andamento")
@@ -303,6 +267,7 @@ async def registrar_visita(
     )
     await db.commit()
     row = result.fetchone()
+    await activity_feed.publish(tenant_id, "visitante", row.id, row.visitante_nome, row.created_at)
 
     # Buscar dados adicionais
     extra = await db.execute(
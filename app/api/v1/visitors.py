@@ -29,6 +29,7 @@ from app.schemas.visitor import (
     VisitorUpdate,
     VisitorVehicleResponse,
 )
+from app.services.plate_index import plate_index
 
 router = APIRouter(prefix="/visitors", tags=["Visitantes"])
 
@@ -280,6 +281,7 @@ async def create_visitor(
 
     db.add(visitor)
     await db.commit()
+    await plate_index.refresh_visitor(db, tenant_id, visitor.id)
     await db.refresh(visitor)
 
     return visitor_to_response(visitor, current_user.name)
@@ -317,6 +319,7 @@ async def update_visitor(
     visitor.updated_by_id = current_user.id
 
     await db.commit()
+    await plate_index.refresh_visitor(db, tenant_id, visitor_id)
     await db.refresh(visitor)
 
     return visitor_to_response(visitor)
@@ -465,6 +468,7 @@ async def block_visitor(
     visitor.blocked_by_id = current_user.id
 
     await db.commit()
+    await plate_index.refresh_visitor(db, tenant_id, visitor_id)
 
     return MessageResponse(message="Visitante bloqueado com sucesso")
 
@@ -494,5 +498,6 @@ async def unblock_visitor(
     visitor.blocked_by_id = None
 
     await db.commit()
+    await plate_index.refresh_visitor(db, tenant_id, visitor_id)
 
     return MessageResponse(message="Visitante desbloqueado com sucesso")
@@ -40,6 +40,120 @@ class Settings(BaseSettings):
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 1800  # 30 minutos
 
+    # Particionamento mensal (access_logs, audit_logs)
+    PARTITION_PREMAKE_MONTHS: int = 3  # meses futuros criados antecipadamente
+    PARTITION_RETENTION_MONTHS: int = 0  # meses mantidos anexados (0 = nunca desanexar)
+
+    # Arquivamento frio (notifications, access_logs, audit_logs, key_logs, sincronizacoes_log)
+    ARCHIVE_DIR: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "archive")
+    ARCHIVE_RETENTION_MONTHS: int = 0  # retenção padrão sem política do condomínio (0 = não arquiva)
+    ARCHIVE_BATCH_SIZE: int = 10_000  # linhas por arquivo .ndjson.zst
+    ARCHIVE_DELETE_CHUNK: int = 1_000  # linhas removidas por transação
+    ARCHIVE_ZSTD_LEVEL: int = 10
+
+    # Índice de placas em memória (app/services/plate_index.py)
+    PLATE_INDEX_TTL_SECONDS: int = 300  # recarga completa (alterações de outros workers)
+    PLATE_INDEX_MAX_DISTANCE: int = 1  # caracteres trocados/faltando tolerados além das confusões do OCR
+
+    # Matriz de decisão de acesso em memória (app/services/access_engine.py)
+    ACCESS_ENGINE_TTL_SECONDS: int = 300  # recarga completa (alterações de outros workers)
+
+    # Sincronização delta de credenciais com o hardware (app/services/credential_sync.py)
+    CREDENTIAL_SYNC_JOURNAL_PAGE: int = 5000  # linhas do journal por rodada
+    CREDENTIAL_SYNC_JOURNAL_RETENTION_DAYS: int = 30  # integração parada há mais tempo faz reconciliação completa
+    CREDENTIAL_SYNC_MAX_INTEGRATIONS: int = 8  # integrações sincronizadas em paralelo
+    CREDENTIAL_SYNC_TIMEOUT_SECONDS: float = 30.0
+    CREDENTIAL_SYNC_MAX_RETRIES: int = 3
+    CREDENTIAL_SYNC_RETRY_BACKOFF_SECONDS: float = 1.0
+
+    # Verificação de saúde dos equipamentos (app/services/health_probe.py)
+    HEALTH_STATUS_TTL_SECONDS: int = 30  # status em cache; a leitura seguinte verifica de novo
+    HEALTH_PROBE_CONCURRENCY: int = 50  # equipamentos verificados ao mesmo tempo (e conexões no pool)
+    HEALTH_PROBE_TIMEOUT_INITIAL_SECONDS: float = 2.0  # antes da primeira resposta do equipamento
+    HEALTH_PROBE_TIMEOUT_MIN_SECONDS: float = 0.3
+    HEALTH_PROBE_TIMEOUT_MAX_SECONDS: float = 5.0
+    HEALTH_PROBE_RETRIES: int = 1  # novas tentativas após timeout
+
+    # Outbox transacional (app/services/outbox.py)
+    OUTBOX_DISPATCHER_ENABLED: bool = True  # workers no próprio processo da API (ou scripts/outbox_dispatcher.py)
+    OUTBOX_WORKERS: int = 2  # workers por processo
+    OUTBOX_BATCH_SIZE: int = 100  # mensagens reivindicadas por lote
+    OUTBOX_POLL_INTERVAL: float = 1.0  # espera quando não há mensagens prontas (s)
+    OUTBOX_LEASE_SECONDS: int = 300  # após isso, mensagem 'processando' de worker morto volta para a fila
+    OUTBOX_MAX_ATTEMPTS: int = 8  # depois vai para a dead-letter (status morta)
+    OUTBOX_BACKOFF_SECONDS: float = 5.0
+    OUTBOX_BACKOFF_MAX_SECONDS: float = 3600.0
+    OUTBOX_RETENTION_DAYS: int = 7  # enviadas mantidas para auditoria
+    OUTBOX_SMTP_TIMEOUT_SECONDS: float = 30.0
+    OUTBOX_WEBHOOK_TIMEOUT_SECONDS: float = 15.0
+    OUTBOX_WEBHOOK_CONCURRENCY: int = 20
+
+    # Ingestão de eventos de dispositivos (app/services/event_ingest.py)
+    INGEST_FLUSH_INTERVAL_MS: int = 50  # espera máxima de um evento no buffer antes da gravação
+    INGEST_FLUSH_ROWS: int = 5000  # grava antes do intervalo ao juntar esse número de eventos
+    INGEST_BUFFER_MAX_EVENTS: int = 50000  # acima disso, 429 + Retry-After (backpressure)
+    INGEST_MAX_BATCH_EVENTS: int = 10000  # eventos por requisição
+    INGEST_MAX_BODY_BYTES: int = 8 * 1024 * 1024
+    INGEST_DEVICE_CACHE_TTL_SECONDS: int = 60  # token do dispositivo validado sem ir ao banco
+
+    # Estado de ocupação da garagem em memória (app/services/garage_occupancy.py)
+    GARAGE_STATE_TTL_SECONDS: int = 30  # recarga completa (alterações de outros workers)
+
+    # Reservas (app/services/reservations.py)
+    RESERVATION_CALENDAR_TTL_SECONDS: int = 3600  # calendário em cache; invalidado a cada criação/cancelamento
+
+    # Importação em massa de cadastros (app/services/bulk_import.py)
+    IMPORT_MAX_ROWS: int = 50_000  # linhas por arquivo
+    IMPORT_MAX_ERRORS: int = 500  # erros detalhados no relatório (o total é sempre contado)
+    IMPORT_HASH_WORKERS: int = 0  # processos para o bcrypt (0 = número de CPUs)
+
+    # Profiling por requisição (app/middleware/profiling.py)
+    PROFILING_ENABLED: bool = False  # False = middleware nem é instalado (custo zero)
+    PROFILING_SAMPLE_RATE: float = 0.0  # fração das requisições perfiladas sem o header assinado
+    PROFILING_INTERVAL: float = 0.001  # intervalo de amostragem (s)
+    PROFILING_DIR: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "profiles")
+    PROFILING_MAX_FILES: int = 200  # perfis mantidos em disco (os mais antigos são removidos)
+    PROFILING_TOKEN_TTL_SECONDS: int = 900  # validade do header X-Profile-Token
+
+    # Monitor do event loop (app/services/loop_monitor.py)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL: float = 0.05  # período do tick que mede o atraso (s)
+    LOOP_BLOCK_THRESHOLD_MS: int = 100  # acima disso a pilha da thread do loop é registrada
+    LOOP_BLOCK_FAIL_MS: int = 0  # testes: falha o teste que travar o loop por mais que isso (0 = desligado)
+
+    # Memória por worker (app/services/memory.py)
+    MEMORY_TRACEMALLOC_FRAMES: int = 10  # profundidade das pilhas quando o tracemalloc é ligado
+    MEMORY_MAX_SNAPSHOTS: int = 5  # snapshots mantidos por worker
+
+    # Respostas pré-comprimidas com ETag (app/services/response_cache.py)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MIN_SIZE: int = 1000  # abaixo disso guarda só o corpo sem compressão (igual ao GZip)
+    RESPONSE_CACHE_GZIP_LEVEL: int = 9
+    RESPONSE_CACHE_ZSTD_LEVEL: int = 12
+    RESPONSE_CACHE_BROTLI_QUALITY: int = 9
+
+    # Entrega de arquivos de upload (app/services/file_delivery.py)
+    FILE_DELIVERY_MODE: str = "auto"  # auto (X-Accel-Redirect quando o nginx pede), accel ou direct
+    FILE_ACCEL_PREFIX: str = "/_protected_uploads/"  # location internal do nginx com alias para UPLOAD_BASE_DIR
+    FILE_CHUNK_BYTES: int = 1024 * 1024  # leitura por bloco no modo direct
+    FILE_IMMUTABLE_MAX_AGE: int = 31_536_000  # nomes com uuid nunca são regravados
+    FILE_MUTABLE_MAX_AGE: int = 300
+    FILE_PROTECTED_AREAS: List[str] = []  # subpastas que exigem Bearer ou link assinado (ex.: ["documentos"])
+    FILE_SIGNED_URL_TTL_SECONDS: int = 3600
+
+    # Feed de atividades recentes (app/services/activity_feed.py)
+    ACTIVITY_FEED_MAXLEN: int = 500  # entradas mantidas por stream (XADD MAXLEN ~)
+    ACTIVITY_FEED_TTL_SECONDS: int = 7 * 24 * 3600  # renovado a cada escrita; condomínio parado recarrega do banco
+    ACTIVITY_FEED_SEED_PER_TYPE: int = 50  # linhas por tipo na carga inicial
+
+    # Contador de não lidas e stream SSE de notificações (app/services/notification_stream.py)
+    NOTIFICATION_UNREAD_TTL_SECONDS: int = 86_400  # contador recontado no banco depois disso
+    NOTIFICATION_STREAM_MAXLEN: int = 200  # eventos por usuário disponíveis para o Last-Event-ID
+    NOTIFICATION_STREAM_TTL_SECONDS: int = 7 * 24 * 3600
+    NOTIFICATION_SSE_BLOCK_MS: int = 1000  # XREAD BLOCK do leitor por worker (novas conexões entram na volta seguinte)
+    NOTIFICATION_SSE_PING_SECONDS: int = 15  # comentário de keep-alive (proxies fecham conexões ociosas)
+    NOTIFICATION_SSE_QUEUE_SIZE: int = 100  # eventos pendentes por conexão; cliente lento reconecta e repõe
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_MAX_CONNECTIONS: int = 10
@@ -60,6 +174,8 @@ class Settings(BaseSettings):
     RATE_LIMIT_WINDOW: int = 60  # segundos
     RATE_LIMIT_AUTH_REQUESTS: int = 5  # tentativas de login
     RATE_LIMIT_AUTH_WINDOW: int = 300  # 5 minutos
+    RATE_LIMIT_DEVICE_AUTH_FAILURES: int = 20  # tokens de dispositivo inválidos por IP em /portaria/eventos
+    RATE_LIMIT_DEVICE_AUTH_WINDOW: int = 300
 
     # Security
     CORS_ALLOW_CREDENTIALS: bool = True
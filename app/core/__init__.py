@@ -10,6 +10,7 @@ from app.core.exceptions import (
     DuplicateError,
     ForbiddenError,
     NotFoundError,
+    TooManyRequestsError,
     UnauthorizedError,
     ValidationError,
 )
@@ -58,6 +59,7 @@ __all__ = [
     "UnauthorizedError",
     "ForbiddenError",
     "ConflictError",
+    "TooManyRequestsError",
     "BusinessError",
     "DuplicateError",
     "ValidationError",
@@ -5,11 +5,19 @@ Provides easy caching for API responses
 
 import functools
 import hashlib
+import inspect
 import json
-from typing import Callable, Optional, Union
+from typing import Callable, Optional, Sequence, Union
 
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from app.config import settings
 from app.core.logger import get_logger
 from app.services.cache import cache, cache_key
+from app.services.data_versions import data_version_service
+from app.services.response_cache import response_cache
 
 logger = get_logger(__name__)
 
@@ -125,6 +133,86 @@ def cached(
     return decorator
 
 
+def cached_response(prefix: str, ttl: int = 300, domains: Optional[Sequence[str]] = None):
+    """
+    Decorator de cache da resposta HTTP pronta (JSON serializado e comprimido).
+
+    Diferente de @cached, guarda os bytes da resposta com as variantes
+    gzip/zstd/br e um ETag forte (app/services/response_cache.py). Um GET com
+    If-None-Match igual ao ETag guardado recebe 304 sem executar o endpoint.
+
+    A chave leva o tenant (parâmetro 'tenant_id' ou current_user.tenant_id),
+    o path e a query string, no formato conecta:{prefix}:t:{tenant}:resp:...,
+    então invalidate_cache(prefix, tenant_id) também descarta as respostas.
+
+    Com domains, a chave leva também as versões desses domínios
+    (app/services/data_versions.py, uma consulta por chave primária usando o
+    parâmetro 'db' do endpoint): qualquer escrita no domínio gera uma chave
+    nova, sem esperar o TTL nem chamar invalidate_cache.
+
+    Args:
+        prefix: Prefixo da chave de cache (ex: "faq", "reports")
+        ttl: Tempo de vida da resposta em segundos (default: 300 = 5 min)
+        domains: Domínios de dados dos quais a resposta depende (ex: ["visitas"])
+
+    Usage:
+        @router.get("")
+        @cached_response("faq", ttl=300)
+        async def listar_faq(tenant_id: int = Query(1), db: AsyncSession = Depends(get_db)):
+            ...
+
+    Note:
+        Resultados Response (ex.: CSV em StreamingResponse) e dicts de erro
+        ({"error": ...}) passam sem cache. O endpoint não precisa declarar
+        'request': o decorator o injeta na assinatura vista pelo FastAPI.
+    """
+
+    def decorator(func: Callable):
+        signature = inspect.signature(func)
+        inject_request = "request" not in signature.parameters
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop("request") if inject_request else kwargs["request"]
+            if not settings.RESPONSE_CACHE_ENABLED or not cache.is_connected or request.method != "GET":
+                return await func(*args, **kwargs)
+
+            tenant_id = kwargs.get("tenant_id")
+            if tenant_id is None:
+                tenant_id = getattr(kwargs.get("current_user"), "tenant_id", None)
+            query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+            if domains and tenant_id is not None and kwargs.get("db") is not None:
+                query += "#" + await data_version_service.stamp(kwargs["db"], tenant_id, domains)
+            digest = hashlib.md5(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+            final_key = cache_key(prefix, f"t:{tenant_id}", "resp", digest)
+
+            cached_result = await response_cache.respond(final_key, request.headers)
+            if cached_result is not None:
+                return cached_result
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response) or (isinstance(result, dict) and "error" in result):
+                return result
+
+            body = JSONResponse(jsonable_encoder(result)).body
+            stored = await response_cache.store(final_key, body, "application/json", ttl)
+            return response_cache.build(stored, request.headers)
+
+        if inject_request:
+            parameters = list(signature.parameters.values())
+            request_param = inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            # Parâmetros **kwargs precisam ficar por último
+            position = next(
+                (i for i, p in enumerate(parameters) if p.kind == inspect.Parameter.VAR_KEYWORD), len(parameters)
+            )
+            parameters.insert(position, request_param)
+            wrapper.__signature__ = signature.replace(parameters=parameters)
+
+        return wrapper
+
+    return decorator
+
+
 async def invalidate_cache(prefix: str, tenant_id: Optional[int] = None):
     """
     Invalida cache por prefixo.
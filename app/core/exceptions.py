@@ -50,6 +50,19 @@ class ConflictError(AppException):
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail, code=code)
 
 
+class TooManyRequestsError(AppException):
+    """Limite de taxa ou capacidade atingido; o cliente deve repetir após retry_after segundos"""
+
+    def __init__(self, detail: str = "Muitas requisições", retry_after: int = 1, code: str = "TOO_MANY_REQUESTS"):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            code=code,
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.retry_after = retry_after
+
+
 class BusinessError(BadRequestError):
     """Erro de regra de negócio"""
 
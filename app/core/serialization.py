@@ -0,0 +1,174 @@
+"""
+Serialização rápida de respostas
+
+Nos endpoints de listagem, cada linha do banco virava um modelo pydantic campo
+a campo, e o FastAPI validava e serializava tudo de novo pelo response_model.
+Para linhas que já vêm do nosso banco (tipos garantidos pelo schema SQL), o
+caminho rápido é:
+
+    _visitas = RowEncoder(VisitaResponse)
+
+    @router.get("", response_model=VisitaListResponse)   # só documentação
+    async def listar(...):
+        ...
+        return FastJSONResponse({"items": _visitas.encode_many(rows), ...})
+
+RowEncoder lê os campos do modelo uma vez e monta um dict por linha (Row do
+SQLAlchemy, mapping ou objeto ORM), convertendo só o que o pydantic
+converteria na saída (Decimal em campo float, Decimal como texto, modelos
+aninhados). Retornar uma Response faz o FastAPI pular o response_model; o
+FastJSONResponse codifica com orjson, com a mesma saída do pydantic para
+datas, UUIDs, enums e Decimals. Sem o orjson instalado, cai no json da
+biblioteca padrão.
+
+Não há validação: validators, str_strip_whitespace e limites de tamanho do
+modelo não são aplicados. Usar só com dados confiáveis, nunca com entrada do
+cliente. Opt-in por router com `APIRouter(default_response_class=FastJSONResponse)`.
+"""
+
+import json
+import operator
+import typing
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined, to_jsonable_python
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto em bytes; tipos desconhecidos (modelos, timedelta...) passam pelo pydantic"""
+    if orjson is not None:
+        return orjson.dumps(content, default=to_jsonable_python, option=_ORJSON_OPTIONS)
+    return json.dumps(content, default=to_jsonable_python, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse com orjson; aceita bytes já codificados"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _to_float(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _to_str(value: Any) -> Any:
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def _converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Conversão aplicada a valores não nulos do campo; None quando o orjson já produz o mesmo que o pydantic"""
+    annotation = _unwrap_optional(annotation)
+    if annotation is float:
+        return _to_float
+    if annotation is Decimal:
+        return _to_str
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return RowEncoder(annotation).encode
+    if typing.get_origin(annotation) in (list, List):
+        args = typing.get_args(annotation)
+        inner = _converter(args[0]) if args else None
+        if inner is not None:
+            return lambda values: [None if value is None else inner(value) for value in values]
+    return None
+
+
+class _Attributes:
+    """Leitura por atributo (objetos ORM) com a mesma interface de Mapping.get"""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return getattr(self.obj, name, default)
+
+
+class RowEncoder:
+    """
+    Converte linhas em dicts prontos para JSON no formato de `model`.
+
+    columns mapeia campo do modelo -> coluna da linha quando os nomes diferem
+    (ex.: {"titulo": "title"}). Campos ausentes na linha recebem o default do
+    modelo (None para obrigatórios).
+    """
+
+    def __init__(self, model: Type[BaseModel], columns: Optional[Mapping[str, str]] = None):
+        self.model = model
+        columns = columns or {}
+        self._fields: List[Tuple[str, str, Any]] = []
+        self._converted: List[Tuple[str, Callable[[Any], Any]]] = []
+        for name, info in model.model_fields.items():
+            if info.default is not PydanticUndefined:
+                default = info.default
+            elif info.default_factory is not None:
+                default = info.default_factory()
+            else:
+                default = None
+            key = info.serialization_alias or info.alias or name
+            self._fields.append((columns.get(name, name), key, default))
+            convert = _converter(info.annotation)
+            if convert is not None:
+                self._converted.append((key, convert))
+        # Caminho comum: a linha tem todas as colunas; leitura em C, sem um get() por campo
+        self._keys = tuple(key for _, key, _ in self._fields)
+        names = [column for column, _, _ in self._fields]
+        self._items = operator.itemgetter(*names) if len(names) > 1 else lambda row: (row[names[0]],)
+        self._attrs = operator.attrgetter(*names) if len(names) > 1 else lambda obj: (getattr(obj, names[0]),)
+
+    def encode(self, row: Any, **overrides: Any) -> Dict[str, Any]:
+        """Um item; overrides substitui campos calculados fora da linha (ex.: is_favorito)"""
+        source = row if isinstance(row, Mapping) else getattr(row, "_mapping", None)
+        try:
+            values = self._items(source) if source is not None else self._attrs(row)
+        except (KeyError, AttributeError):
+            # Colunas faltando: default do modelo
+            get = source.get if source is not None else _Attributes(row).get
+            values = [get(column, default) for column, _, default in self._fields]
+        item = dict(zip(self._keys, values))
+        for key, convert in self._converted:
+            value = item[key]
+            if value is not None:
+                item[key] = convert(value)
+        if overrides:
+            item.update(overrides)
+        return item
+
+    def encode_many(self, rows: Iterable[Any]) -> List[Dict[str, Any]]:
+        return [self.encode(row) for row in rows]
+
+
+def paginated(items: List[Any], total: int, skip: int, limit: int) -> Dict[str, Any]:
+    """Corpo no formato de PaginatedResponse (app/schemas/common.py)"""
+    current = skip // limit + 1
+    total_pages = (total + limit - 1) // limit
+    return {
+        "items": items,
+        "total": total,
+        "page": current,
+        "page_size": limit,
+        "total_pages": total_pages,
+        "has_next": current < total_pages,
+        "has_prev": current > 1,
+    }
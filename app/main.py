@@ -10,20 +10,28 @@ from typing import Any, Dict
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from prometheus_fastapi_instrumentator import Instrumentator
 
+from app.api.v1.arquivos import router as arquivos_router
 from app.api.v1.router import api_router
 from app.config import settings
 from app.core.logger import get_logger
-from app.database import check_db_connection, close_db_connections, init_db
+from app.database import check_db_connection, close_db_connections, get_db_context, init_db
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
+from app.services.bulk_import import bulk_import
 from app.services.cache import cache
+from app.services.event_ingest import event_ingestor
+from app.services.health_probe import health_probe
+from app.services.loop_monitor import loop_monitor
+from app.services.notification_stream import notification_stream
+from app.services.outbox import outbox
+from app.services.partitioning import partition_manager
 
 logger = get_logger(__name__)
 
@@ -42,13 +50,34 @@ async def lifespan(app: FastAPI):
     await init_db()
     await cache.connect()
 
+    # Atraso do event loop (histograma em /metrics) e pilha de quem o bloqueia
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+    # Garante as partições mensais dos logs (o cron em scripts/manage_partitions.py faz o resto)
+    try:
+        async with get_db_context() as db:
+            await partition_manager.ensure_partitions(db)
+    except Exception as e:
+        logger.error("partition_maintenance_failed", error=str(e))
+
+    # Entrega de notificações, e-mails e webhooks gravados no outbox
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        outbox.start()
+
     logger.info("application_started", message="Conecta Plus API started successfully!")
 
     yield
 
     # Shutdown
     logger.info("application_stopping")
+    await loop_monitor.stop()
+    await outbox.stop()
+    await event_ingestor.stop()
+    await notification_stream.stop()
     await cache.disconnect()
+    await health_probe.close()
+    bulk_import.shutdown()
     await close_db_connections()
     logger.info("application_stopped", message="Conecta Plus API shutdown complete!")
 
@@ -88,8 +117,10 @@ A API usa autenticacao JWT. Obtenha um token via `/api/v1/auth/login`.
 # MIDDLEWARES (ordem importa - ultimo adicionado = primeiro executado)
 # =============================================================================
 
-# GZip compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# GZip compression (exceto arquivos de upload, entregues como estão, e o SSE, que o GZip acumularia)
+app.add_middleware(
+    CompressionMiddleware, minimum_size=1000, exclude_prefixes=("/uploads/", "/api/v1/notifications/stream")
+)
 
 # Trusted hosts (proteção contra host header attacks)
 if settings.is_production:
@@ -114,6 +145,10 @@ app.add_middleware(SecurityHeadersMiddleware)
 # Rate limiting
 app.add_middleware(RateLimitMiddleware)
 
+# Profiling sob demanda (dentro do logging, que define o request_id); desligado = nem instalado
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Logging (primeiro a executar, ultimo a ser adicionado)
 app.add_middleware(LoggingMiddleware)
 
@@ -163,12 +198,11 @@ async def global_exception_handler(request: Request, exc: Exception):
 # STATIC FILES
 # =============================================================================
 
-# Servir arquivos de upload
+# Servir arquivos de upload (autorização aqui, corpo pelo nginx ou em blocos: app/services/file_delivery.py)
 from app.config import UPLOAD_BASE_DIR
 
 os.makedirs(UPLOAD_BASE_DIR, exist_ok=True)
-if os.path.exists(UPLOAD_BASE_DIR):
-    app.mount("/uploads", StaticFiles(directory=UPLOAD_BASE_DIR), name="uploads")
+app.include_router(arquivos_router)
 
 
 # =============================================================================
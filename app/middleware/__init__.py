@@ -2,12 +2,16 @@
 Middlewares do Conecta Plus API
 """
 
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.logging import LoggingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.middleware.security import SecurityHeadersMiddleware
 
 __all__ = [
+    "CompressionMiddleware",
     "LoggingMiddleware",
+    "ProfilingMiddleware",
     "RateLimitMiddleware",
     "SecurityHeadersMiddleware",
 ]
@@ -0,0 +1,34 @@
+"""
+Middleware de Compressão GZip
+"""
+
+from typing import Sequence
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware que deixa de fora os prefixos informados.
+
+    Arquivos de upload (imagens, PDFs) já são comprimidos, e comprimir um
+    206 quebraria o Content-Range; ler o arquivo inteiro para comprimir
+    também anularia a entrega em blocos.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        compresslevel: int = 9,
+        exclude_prefixes: Sequence[str] = (),
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.exclude_prefixes and scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,80 @@
+"""
+Middleware de Profiling por Requisição
+
+Roda a requisição sob o profiler por amostragem do pyinstrument quando ela
+traz um X-Profile-Token válido ou cai na amostragem de PROFILING_SAMPLE_RATE;
+o perfil é gravado com o request_id do LoggingMiddleware (ver
+app/services/profiling.py). Só é instalado com PROFILING_ENABLED, então não
+há custo algum quando o profiling está desligado.
+
+O perfil cobre até a resposta começar a ser enviada (corpo em streaming,
+como os CSVs grandes, fica de fora).
+"""
+
+import asyncio
+import random
+import time
+from typing import Callable
+
+from fastapi import Request, Response
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.services.profiling import PROFILE_HEADER, ProfileInfo, profiling_service
+
+logger = get_logger(__name__)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """Perfila requisições marcadas (header assinado) ou amostradas"""
+
+    def _reason(self, request: Request) -> str:
+        token = request.headers.get(PROFILE_HEADER)
+        if token is not None:
+            if profiling_service.verify_token(token):
+                return "token"
+            logger.warning("profile_token_invalid", path=request.url.path)
+        if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "sample"
+        return ""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        reason = self._reason(request)
+        if not reason:
+            return await call_next(request)
+
+        # async_mode "enabled": amostra só o contexto desta requisição, não as concorrentes
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.stop()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        request_id = getattr(request.state, "request_id", None)
+        if request_id:
+            info = ProfileInfo(
+                request_id=request_id,
+                method=request.method,
+                path=request.url.path,
+                status_code=response.status_code,
+                duration_ms=round(duration_ms, 2),
+                reason=reason,
+                created_at=time.time(),
+            )
+            response.headers["X-Profile-ID"] = request_id
+            # Renderizar e gravar custa CPU/IO proporcional ao perfil: fora do event loop
+            asyncio.get_running_loop().run_in_executor(None, self._save, profiler, info)
+        return response
+
+    @staticmethod
+    def _save(profiler: Profiler, info: ProfileInfo) -> None:
+        try:
+            profiling_service.save(info, profiler.output(renderer=SpeedscopeRenderer()))
+        except Exception as e:
+            logger.error("profile_save_failed", request_id=info.request_id, error=str(e))
@@ -109,6 +109,11 @@ class InMemoryRateLimiter:
         self._requests[key].append(now)
         return True, remaining - 1, reset_time
 
+    async def get_usage(self, key: str, window_seconds: int) -> int:
+        """Retorna o número de requisições na janela atual"""
+        window_start = time.time() - window_seconds
+        return sum(1 for ts in self._requests.get(key, ()) if ts > window_start)
+
 
 # Instâncias globais
 redis_rate_limiter = RedisRateLimiter()
@@ -141,6 +146,10 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         "/favicon.ico",
     ]
 
+    # Ingestão de eventos do hardware: autenticada por dispositivo e com backpressure próprio (429 + Retry-After);
+    # só as falhas de autenticação são limitadas
+    DEVICE_PATHS = ("/api/v1/portaria/eventos",)
+
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Verificar se rate limiting está habilitado
         if not settings.RATE_LIMIT_ENABLED:
@@ -148,10 +157,13 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         path = request.url.path
 
-        # Paths isentos
-        if path in self.EXEMPT_PATHS or path.startswith("/static"):
+        # Paths isentos (uploads: uma galeria de fotos não deve consumir o limite geral)
+        if path in self.EXEMPT_PATHS or path.startswith("/static") or path.startswith("/uploads/"):
             return await call_next(request)
 
+        if path.startswith(self.DEVICE_PATHS):
+            return await self._dispatch_device(request, call_next)
+
         # Obter IP do cliente
         client_ip = self._get_client_ip(request)
 
@@ -172,27 +184,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         is_allowed, remaining, reset_time = await limiter.is_allowed(key, max_requests, window_seconds)
 
         if not is_allowed:
-            retry_after = max(1, reset_time - int(time.time()))
-            logger.warning(
-                "rate_limit_exceeded",
-                client_ip=client_ip,
-                path=path,
-                key=key,
-                limiter_type="redis" if cache.is_connected else "memory",
-            )
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
-                    "detail": "Muitas requisições. Tente novamente mais tarde.",
-                    "retry_after": retry_after,
-                },
-                headers={
-                    "X-RateLimit-Limit": str(max_requests),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(reset_time),
-                    "Retry-After": str(retry_after),
-                },
-            )
+            return self._limited(client_ip, path, key, max_requests, reset_time)
 
         # Processar requisição
         response = await call_next(request)
@@ -204,6 +196,45 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         return response
 
+    async def _dispatch_device(self, request: Request, call_next: Callable) -> Response:
+        """Dispositivo autenticado não tem limite; cada token inválido conta (e custa uma consulta ao banco)"""
+        client_ip = self._get_client_ip(request)
+        key = f"rate:device_auth:{client_ip}"
+        max_failures = settings.RATE_LIMIT_DEVICE_AUTH_FAILURES
+        window_seconds = settings.RATE_LIMIT_DEVICE_AUTH_WINDOW
+        limiter = await get_rate_limiter()
+
+        if await limiter.get_usage(key, window_seconds) >= max_failures:
+            return self._limited(client_ip, request.url.path, key, max_failures, int(time.time() + window_seconds))
+
+        response = await call_next(request)
+        if response.status_code == status.HTTP_401_UNAUTHORIZED:
+            await limiter.is_allowed(key, max_failures, window_seconds)
+        return response
+
+    def _limited(self, client_ip: str, path: str, key: str, max_requests: int, reset_time: int) -> Response:
+        retry_after = max(1, reset_time - int(time.time()))
+        logger.warning(
+            "rate_limit_exceeded",
+            client_ip=client_ip,
+            path=path,
+            key=key,
+            limiter_type="redis" if cache.is_connected else "memory",
+        )
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={
+                "detail": "Muitas requisições. Tente novamente mais tarde.",
+                "retry_after": retry_after,
+            },
+            headers={
+                "X-RateLimit-Limit": str(max_requests),
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(reset_time),
+                "Retry-After": str(retry_after),
+            },
+        )
+
     def _get_client_ip(self, request: Request) -> str:
         """Obtém o IP real do cliente, considerando proxies"""
         # Verificar headers de proxy (em ordem de prioridade)
@@ -6,13 +6,16 @@ from app.models.access_log import AccessLog
 from app.models.announcement import Announcement, AnnouncementComment, AnnouncementRead
 from app.models.audit_log import AuditLog, Key, KeyLog, Logbook, LostFound, Work
 from app.models.base import AuditMixin, Base, SoftDeleteMixin, TenantMixin, TimestampMixin
+from app.models.data_version import TenantDataVersion
 from app.models.device import Device, DeviceRequest
 from app.models.financial import BankAccount, Boleto, FinancialCategory, Payment
 from app.models.maintenance import MaintenanceExecution, MaintenanceSchedule, MaintenanceTicket, TicketComment
 from app.models.occurrence import Occurrence, OccurrenceComment
+from app.models.outbox import OutboxMessage
 from app.models.package import Package
 from app.models.pet import Pet
 from app.models.reservation import CommonArea, Reservation
+from app.models.retention import ArchiveBatch, RetentionPolicy
 from app.models.resident import Dependent
 from app.models.survey import Survey, SurveyOption, SurveyVote
 from app.models.tenant import Tenant
@@ -22,9 +25,12 @@ from app.models.vehicle import ParkingSpot, Vehicle
 from app.models.visitor import Visitor, VisitorVehicle
 from app.models.portaria import (
     ComunicacaoPortaria,
+    CredencialJournal,
     GrupoAcesso,
     GrupoAcessoPonto,
     IntegracaoHardware,
+    IntegracaoSyncEstado,
+    IntegracaoSyncItem,
     PontoAcesso,
     PreAutorizacao,
     SincronizacaoLog,
@@ -86,6 +92,13 @@ __all__ = [
     "Key",
     "KeyLog",
     "Work",
+    # Retention
+    "RetentionPolicy",
+    "ArchiveBatch",
+    # Data versions
+    "TenantDataVersion",
+    # Outbox
+    "OutboxMessage",
     # Financial
     "BankAccount",
     "Boleto",
@@ -99,6 +112,9 @@ __all__ = [
     "TipoOcorrencia",
     "IntegracaoHardware",
     "SincronizacaoLog",
+    "CredencialJournal",
+    "IntegracaoSyncEstado",
+    "IntegracaoSyncItem",
     "VagaGaragem",
     "ComunicacaoPortaria",
     "Visita",
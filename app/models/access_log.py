@@ -2,7 +2,7 @@
 Model AccessLog - Registro de acessos (entrada/saída)
 """
 
-from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, String, Text, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,11 +11,16 @@ from app.models.base import TenantMixin
 
 
 class AccessLog(Base, TenantMixin):
-    """Registro de todos os acessos (entrada/saída)"""
+    """
+    Registro de todos os acessos (entrada/saída).
+
+    Tabela particionada por mês em registered_at (ver app/services/partitioning.py);
+    por isso a chave primária inclui registered_at.
+    """
 
     __tablename__ = "access_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
 
     # Quem acessou (um dos dois será preenchido)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -54,8 +59,12 @@ class AccessLog(Base, TenantMixin):
     device_id = Column(Integer, ForeignKey("devices.id"))
     device_serial = Column(String(100))
 
+    # Origem de eventos enviados pelo hardware (POST /portaria/eventos); sem FK para a ingestão em lote
+    ponto_acesso_id = Column(Integer)
+    device_event_id = Column(String(100))  # id do evento no dispositivo, chave de idempotência
+
     # Timestamps
-    registered_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    registered_at = Column(DateTime, server_default=func.now(), nullable=False, primary_key=True)
 
     # Observações
     observations = Column(Text)
@@ -78,7 +87,26 @@ class AccessLog(Base, TenantMixin):
         Index("ix_access_logs_tenant_unit", "tenant_id", "unit_id"),
         Index("ix_access_logs_tenant_type", "tenant_id", "access_type"),
         Index("ix_access_logs_tenant_method", "tenant_id", "access_method"),
+        Index("ix_access_logs_registered_at_brin", "registered_at", postgresql_using="brin"),
+        Index(
+            "ux_access_logs_device_event",
+            "ponto_acesso_id",
+            "device_event_id",
+            "registered_at",
+            unique=True,
+            postgresql_where=text("device_event_id IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (registered_at)"},
     )
 
     def __repr__(self):
         return f"<AccessLog(id={self.id}, type='{self.access_type}', at='{self.registered_at}')>"
+
+
+# Partição DEFAULT para bancos criados via create_all (testes/desenvolvimento);
+# as partições mensais são criadas pelo PartitionManager
+event.listen(
+    AccessLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS access_logs_default PARTITION OF access_logs DEFAULT"),
+)
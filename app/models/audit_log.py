@@ -2,7 +2,7 @@
 Model AuditLog - Log de auditoria do sistema
 """
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, String, Text, event
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -12,11 +12,15 @@ from app.models.base import TenantMixin
 
 
 class AuditLog(Base, TenantMixin):
-    """Log de auditoria de todas as ações do sistema"""
+    """
+    Log de auditoria de todas as ações do sistema.
+
+    Tabela particionada por mês em created_at (ver app/services/partitioning.py).
+    """
 
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
 
     # Usuário que executou a ação
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -55,15 +59,28 @@ class AuditLog(Base, TenantMixin):
     request_id = Column(String(50))
 
     # Timestamp
-    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, primary_key=True)
 
     # Relacionamentos
     user = relationship("User")
 
+    __table_args__ = (
+        Index("ix_audit_logs_tenant_date", "tenant_id", "created_at"),
+        Index("ix_audit_logs_created_at_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     def __repr__(self):
         return f"<AuditLog(id={self.id}, action='{self.action}', entity='{self.entity_type}')>"
 
 
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT"),
+)
+
+
 class Logbook(Base, TenantMixin):
     """Livro de ocorrências da portaria"""
 
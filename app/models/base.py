@@ -4,7 +4,7 @@ Models base e mixins reutilizáveis
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, func
+from sqlalchemy import DDL, Boolean, Column, DateTime, ForeignKey, Integer, event, func
 from sqlalchemy.orm import declared_attr, relationship
 
 from app.database import Base
@@ -46,3 +46,30 @@ class SoftDeleteMixin:
     @declared_attr
     def deleted_by_id(cls):
         return Column(Integer, ForeignKey("users.id"), nullable=True)
+
+
+# Funções SQL de normalização das colunas geradas search_* (app/services/search.py).
+# IMMUTABLE: exigido por colunas geradas e índices. Também criadas pela migration 005.
+SEARCH_ACCENTS = "áàâãäåéèêëíìîïóòôõöúùûüçñýÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝ"
+SEARCH_PLAIN = "aaaaaaeeeeiiiiooooouuuucnyaaaaaaeeeeiiiiooooouuuucny"
+
+SEARCH_FUNCTIONS = [
+    f"""
+    CREATE OR REPLACE FUNCTION search_normalize(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    AS $$ SELECT translate(lower(value), '{SEARCH_ACCENTS}', '{SEARCH_PLAIN}') $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_digits(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    AS $$ SELECT regexp_replace(value, '[^0-9]', '', 'g') $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_code(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    AS $$ SELECT upper(regexp_replace(value, '[^A-Za-z0-9]', '', 'g')) $$
+    """,
+]
+
+for _function_sql in SEARCH_FUNCTIONS:
+    event.listen(Base.metadata, "before_create", DDL(_function_sql))
@@ -0,0 +1,26 @@
+"""
+Model de Versões de Dados - contador por condomínio e domínio (visitas, encomendas, ...)
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String, func
+
+from app.database import Base
+
+
+class TenantDataVersion(Base):
+    """
+    Versão monotônica dos dados de um domínio em um condomínio.
+
+    Incrementada na mesma transação da escrita por triggers nas tabelas do
+    domínio (migration 007); lida por app/services/data_versions.py.
+    """
+
+    __tablename__ = "tenant_data_versions"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    domain = Column(String(40), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<TenantDataVersion(tenant={self.tenant_id}, domain='{self.domain}', version={self.version})>"
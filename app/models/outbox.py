@@ -0,0 +1,45 @@
+"""
+Model do Outbox - efeitos colaterais (notificações, e-mails, webhooks) a entregar
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Text, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.database import Base
+
+
+class OutboxMessage(Base):
+    """
+    Mensagem gravada na mesma transação da alteração de negócio.
+
+    Entregue pelo dispatcher (app/services/outbox.py), que reivindica lotes
+    por canal com FOR UPDATE SKIP LOCKED (migration 009).
+    """
+
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=True)
+    canal = Column(String(30), nullable=False)  # notificacao, email, webhook
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default="pendente")  # pendente, processando, enviado, morta
+    tentativas = Column(Integer, nullable=False, default=0)
+    proxima_tentativa_em = Column(DateTime, server_default=func.now(), nullable=False)
+    bloqueado_ate = Column(DateTime)  # lease do worker que reivindicou a mensagem
+    last_error = Column(Text)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    enviado_em = Column(DateTime)
+
+    __table_args__ = (
+        Index(
+            "ix_outbox_pendentes",
+            "canal",
+            "proxima_tentativa_em",
+            "id",
+            postgresql_where=text("status IN ('pendente', 'processando')"),
+        ),
+        Index("ix_outbox_mortas", "canal", "created_at", postgresql_where=text("status = 'morta'")),
+    )
+
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, canal='{self.canal}', status='{self.status}')>"
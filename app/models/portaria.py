@@ -3,6 +3,7 @@ Models do Módulo Controle de Portaria
 """
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     Date,
@@ -14,6 +15,7 @@ from sqlalchemy import (
     String,
     Text,
     Time,
+    func,
 )
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
@@ -98,6 +100,7 @@ class PontoAcesso(Base, TenantMixin, TimestampMixin):
     porta = Column(Integer)
     rele_id = Column(String(100))  # ID do relé para acionamento
     sensor_id = Column(String(100))  # ID do sensor para monitoramento
+    ingest_token_hash = Column(String(64))  # sha256 do token de ingestão de eventos (POST /portaria/eventos)
 
     # Configuração de eclusa/intertravamento
     is_eclusa = Column(Boolean, default=False)
@@ -366,6 +369,53 @@ class SincronizacaoLog(Base, TimestampMixin):
         return f"<SincronizacaoLog(id={self.id}, tipo='{self.tipo_sync}', status='{self.status}')>"
 
 
+class CredencialJournal(Base):
+    """
+    Entidades de credenciais alteradas (moradores, visitantes, veículos).
+
+    Preenchido por triggers por comando (migration 008) e consumido pela
+    sincronização delta (app/services/credential_sync.py) em ordem (xid, id).
+    """
+
+    __tablename__ = "credenciais_journal"
+
+    id = Column(BigInteger, primary_key=True)
+    tenant_id = Column(Integer, nullable=False)
+    tipo_sync = Column(String(30), nullable=False)
+    entidade_id = Column(Integer, nullable=False)
+    xid = Column(BigInteger, nullable=False)  # transação que gerou a linha
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (Index("ix_credenciais_journal_tenant", "tenant_id", "tipo_sync", "xid", "id"),)
+
+
+class IntegracaoSyncEstado(Base):
+    """Posição do journal já aplicada por integração e tipo de sincronização"""
+
+    __tablename__ = "integracoes_sync_estado"
+
+    integracao_id = Column(Integer, ForeignKey("integracoes_hardware.id", ondelete="CASCADE"), primary_key=True)
+    tipo_sync = Column(String(30), primary_key=True)
+    watermark_xid = Column(BigInteger, nullable=False, default=0)
+    watermark_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+class IntegracaoSyncItem(Base):
+    """Hash do registro que a integração já recebeu (base do cálculo do delta)"""
+
+    __tablename__ = "integracoes_sync_itens"
+
+    integracao_id = Column(Integer, ForeignKey("integracoes_hardware.id", ondelete="CASCADE"), primary_key=True)
+    tipo_sync = Column(String(30), primary_key=True)
+    entidade_id = Column(Integer, primary_key=True)
+    hash = Column(String(32), nullable=False)
+    expira_em = Column(Date)  # visitantes: data_fim da pré-autorização
+    synced_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (Index("ix_integracoes_sync_itens_expira", "integracao_id", "tipo_sync", "expira_em"),)
+
+
 class VagaGaragem(Base, TenantMixin, TimestampMixin):
     """Extensão visual das vagas de estacionamento para mapa"""
 
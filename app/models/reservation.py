@@ -2,8 +2,23 @@
 Model Reservation - Reservas de áreas comuns
 """
 
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Integer, Numeric, String, Text, Time
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    Time,
+    func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSRANGE, ExcludeConstraint
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -103,6 +118,16 @@ class Reservation(Base, TenantMixin, TimestampMixin, AuditMixin):
     cancelled_by_id = Column(Integer, ForeignKey("users.id"))
     cancel_reason = Column(String(500))
 
+    # Intervalo ocupado [início, fim); fim <= início atravessa a meia-noite (00:00-00:00 = dia inteiro)
+    period = Column(
+        TSRANGE,
+        Computed(
+            "tsrange(date + start_time, CASE WHEN end_time > start_time "
+            "THEN date + end_time ELSE date + 1 + end_time END)",
+            persisted=True,
+        ),
+    )
+
     # Relacionamentos
     area = relationship("CommonArea", back_populates="reservations")
     unit = relationship("Unit")
@@ -110,5 +135,19 @@ class Reservation(Base, TenantMixin, TimestampMixin, AuditMixin):
     reviewed_by = relationship("User", foreign_keys=[reviewed_by_id])
     cancelled_by = relationship("User", foreign_keys=[cancelled_by_id])
 
+    __table_args__ = (
+        # Sem sobreposição de horários na mesma área (ver app/services/reservations.py).
+        # int4range(area_id, area_id, '[]') usa o operador && do GiST nativo, sem btree_gist.
+        ExcludeConstraint(
+            (func.int4range(area_id, area_id, literal_column("'[]'")), "&&"),
+            (period, "&&"),
+            name="ex_reservations_area_period",
+            using="gist",
+            where="status NOT IN ('cancelled', 'rejected')",
+        ),
+        Index("ix_reservations_area_date", "area_id", "date"),
+        Index("ix_reservations_user_area_date", "user_id", "area_id", "date"),
+    )
+
     def __repr__(self):
         return f"<Reservation(id={self.id}, area={self.area_id}, date='{self.date}')>"
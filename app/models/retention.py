@@ -0,0 +1,70 @@
+"""
+Models de Retenção e Arquivamento - políticas por condomínio e manifesto dos lotes arquivados
+"""
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String, UniqueConstraint
+
+from app.database import Base
+from app.models.base import TenantMixin, TimestampMixin
+
+
+class RetentionPolicy(Base, TenantMixin, TimestampMixin):
+    """
+    Política de retenção de uma tabela de alto volume para um condomínio.
+
+    Linhas mais antigas que `retention_months` são exportadas para o arquivo
+    frio e removidas do banco (ver app/services/archival.py).
+    """
+
+    __tablename__ = "retention_policies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(50), nullable=False)  # notifications, access_logs, audit_logs, key_logs, ...
+    retention_months = Column(Integer, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    __table_args__ = (UniqueConstraint("tenant_id", "table_name", name="uq_retention_policies_tenant_table"),)
+
+    def __repr__(self):
+        return f"<RetentionPolicy(tenant={self.tenant_id}, table='{self.table_name}', months={self.retention_months})>"
+
+
+class ArchiveBatch(Base, TenantMixin, TimestampMixin):
+    """
+    Manifesto de um lote exportado para o arquivo frio.
+
+    Cada lote cobre as linhas do condomínio com id em [first_id, last_id] e
+    tempo anterior a `cutoff`. O status permite retomar a execução:
+    - exported: arquivo gravado, linhas ainda (parcialmente) no banco
+    - purged: linhas removidas do banco
+    """
+
+    __tablename__ = "archive_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    table_name = Column(String(50), nullable=False)
+
+    # Intervalo do lote
+    first_id = Column(BigInteger, nullable=False)
+    last_id = Column(BigInteger, nullable=False)
+    min_time = Column(DateTime, nullable=False)
+    max_time = Column(DateTime, nullable=False)
+    cutoff = Column(DateTime, nullable=False)
+
+    # Arquivo
+    row_count = Column(Integer, nullable=False)
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(BigInteger)
+    checksum = Column(String(64))  # sha256 do arquivo comprimido
+
+    # Estado
+    status = Column(String(20), default="exported", nullable=False)
+    purged_at = Column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint("table_name", "tenant_id", "first_id", name="uq_archive_batches_table_tenant_first"),
+        Index("ix_archive_batches_lookup", "table_name", "tenant_id", "min_time"),
+    )
+
+    def __repr__(self):
+        return f"<ArchiveBatch(table='{self.table_name}', ids={self.first_id}-{self.last_id}, status='{self.status}')>"
@@ -2,7 +2,7 @@
 Model Unit - Unidade do condomínio
 """
 
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Index, Integer, Numeric, String
+from sqlalchemy import Boolean, Column, Computed, Date, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -43,6 +43,9 @@ class Unit(Base, TenantMixin, TimestampMixin):
     # Status
     is_active = Column(Boolean, default=True)
 
+    # Identificação normalizada para busca: "A-101" -> "A101" (ver app/services/search.py)
+    search_code = Column(Text, Computed("search_code(coalesce(block, '') || number)", persisted=True))
+
     # Relacionamentos
     tenant = relationship("Tenant", back_populates="units")
     owner = relationship("User", foreign_keys=[owner_id])
@@ -51,7 +54,10 @@ class Unit(Base, TenantMixin, TimestampMixin):
     vehicles = relationship("Vehicle", back_populates="unit")
 
     # Índice composto para busca rápida
-    __table_args__ = (Index("ix_units_tenant_block_number", "tenant_id", "block", "number"),)
+    __table_args__ = (
+        Index("ix_units_tenant_block_number", "tenant_id", "block", "number"),
+        Index("ix_units_search_code", "tenant_id", search_code.collate("C")),
+    )
 
     @property
     def full_identifier(self) -> str:
@@ -2,7 +2,7 @@
 Model User - Usuário do sistema
 """
 
-from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy import Boolean, Column, Computed, Date, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -54,6 +54,11 @@ class User(Base, TenantMixin, TimestampMixin, SoftDeleteMixin):
     has_special_needs = Column(Boolean, default=False)
     special_needs_description = Column(String(500))
 
+    # Colunas normalizadas para busca (geradas pelo banco, ver app/services/search.py)
+    search_name = Column(Text, Computed("search_normalize(name)", persisted=True))
+    search_cpf = Column(Text, Computed("search_digits(cpf)", persisted=True))
+    search_phone = Column(Text, Computed("search_digits(phone)", persisted=True))
+
     # Relacionamentos
     tenant = relationship("Tenant", back_populates="users")
     units = relationship("UnitResident", back_populates="user")
@@ -64,6 +69,10 @@ class User(Base, TenantMixin, TimestampMixin, SoftDeleteMixin):
     __table_args__ = (
         Index("ix_users_tenant_email", "tenant_id", "email"),
         Index("ix_users_tenant_cpf", "tenant_id", "cpf"),
+        # Prefixo (LIKE 'abc%') com ordenação pelo índice; os GIN trigram estão na migration 005 (pg_trgm)
+        Index("ix_users_search_name", "tenant_id", search_name.collate("C")),
+        Index("ix_users_search_cpf", "tenant_id", search_cpf.collate("C")),
+        Index("ix_users_search_phone", "tenant_id", search_phone.collate("C")),
     )
 
     def __repr__(self):
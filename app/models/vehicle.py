@@ -2,7 +2,7 @@
 Model Vehicle - Veículos de moradores
 """
 
-from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String
+from sqlalchemy import Boolean, Column, Computed, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -47,6 +47,9 @@ class Vehicle(Base, TenantMixin, TimestampMixin, AuditMixin):
     # Status
     is_active = Column(Boolean, default=True)
 
+    # Placa normalizada para busca (gerada pelo banco, ver app/services/search.py)
+    search_plate = Column(Text, Computed("search_code(plate)", persisted=True))
+
     # Relacionamentos
     tenant = relationship("Tenant", back_populates="vehicles")
     owner = relationship("User", back_populates="vehicles", foreign_keys=[owner_id])
@@ -58,6 +61,7 @@ class Vehicle(Base, TenantMixin, TimestampMixin, AuditMixin):
     __table_args__ = (
         Index("ix_vehicles_tenant_plate", "tenant_id", "plate"),
         Index("ix_vehicles_tenant_owner", "tenant_id", "owner_id"),
+        Index("ix_vehicles_search_plate", "tenant_id", search_plate.collate("C")),
     )
 
     def __repr__(self):
@@ -2,7 +2,7 @@
 Model Visitor - Visitante, Prestador, Entregador
 """
 
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Index, Integer, String, Text
+from sqlalchemy import Boolean, Column, Computed, Date, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -58,6 +58,11 @@ class Visitor(Base, TenantMixin, TimestampMixin, AuditMixin):
     blocked_at = Column(Date)
     blocked_by_id = Column(Integer, ForeignKey("users.id"))
 
+    # Colunas normalizadas para busca (geradas pelo banco, ver app/services/search.py)
+    search_name = Column(Text, Computed("search_normalize(name)", persisted=True))
+    search_cpf = Column(Text, Computed("search_digits(cpf)", persisted=True))
+    search_phone = Column(Text, Computed("search_digits(phone)", persisted=True))
+
     # Relacionamentos
     tenant = relationship("Tenant", back_populates="visitors")
     vehicles = relationship("VisitorVehicle", back_populates="visitor", cascade="all, delete-orphan")
@@ -69,6 +74,9 @@ class Visitor(Base, TenantMixin, TimestampMixin, AuditMixin):
         Index("ix_visitors_tenant_name", "tenant_id", "name"),
         Index("ix_visitors_tenant_cpf", "tenant_id", "cpf"),
         Index("ix_visitors_tenant_type", "tenant_id", "visitor_type"),
+        Index("ix_visitors_search_name", "tenant_id", search_name.collate("C")),
+        Index("ix_visitors_search_cpf", "tenant_id", search_cpf.collate("C")),
+        Index("ix_visitors_search_phone", "tenant_id", search_phone.collate("C")),
     )
 
     def __repr__(self):
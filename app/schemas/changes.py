@@ -0,0 +1,16 @@
+"""
+Schemas da detecção de mudanças por condomínio
+"""
+
+from typing import Dict, List
+
+from app.schemas.common import BaseSchema
+
+
+class ChangesResponse(BaseSchema):
+    """Domínios que mudaram desde o cursor informado"""
+
+    tenant_id: int
+    changed: List[str]
+    versions: Dict[str, int]
+    cursor: str  # enviar como ?since= na próxima consulta
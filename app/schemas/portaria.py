@@ -127,6 +127,47 @@ class PontoAcessoStatusResponse(BaseSchema):
     status: str
     last_ping_at: Optional[datetime] = None
     is_online: bool = False
+    latencia_ms: Optional[float] = None
+    erro: Optional[str] = None
+    fonte: Optional[str] = None  # sonda (verificado pelo servidor) ou heartbeat (informado pelo hardware)
+
+
+class DecisaoAcessoRequest(BaseSchema):
+    """Consulta do controlador: QR Code, morador (user_id) ou tipo de pessoa + bloco"""
+
+    qr_code: Optional[str] = None
+    user_id: Optional[int] = None
+    tipo: Optional[str] = Field(None, pattern="^(morador|visitante|prestador|entregador)$")
+    bloco: Optional[str] = None
+    direcao: str = Field("entrada", pattern="^(entrada|saida)$")
+
+
+class DecisaoAcessoResponse(BaseSchema):
+    permitido: bool
+    motivo: str
+    ponto_id: int
+    pre_autorizacao_id: Optional[int] = None
+
+
+class TokenIngestaoResponse(BaseSchema):
+    """Exibido uma única vez: o banco guarda só o hash"""
+
+    ponto_id: int
+    token: str
+
+
+class EventoRejeitado(BaseSchema):
+    indice: int
+    id: Optional[Any] = None
+    motivo: str
+
+
+class IngestaoEventosResponse(BaseSchema):
+    recebidos: int
+    inseridos: int
+    duplicados: int  # já gravados antes (reenvio) ou repetidos no lote
+    rejeitados: int
+    erros: List[EventoRejeitado] = []
 
 
 # =============================================================================
@@ -306,6 +347,17 @@ class IntegracaoTesteResponse(BaseSchema):
     detalhes: Optional[Dict[str, Any]] = None
 
 
+class IntegracaoStatusResponse(BaseSchema):
+    id: int
+    parceiro: str
+    nome_exibicao: Optional[str] = None
+    status: str
+    is_online: bool = False
+    latencia_ms: Optional[float] = None
+    erro: Optional[str] = None
+    verificado_em: Optional[datetime] = None
+
+
 class SincronizacaoLogResponse(BaseSchema):
     id: int
     integracao_id: int
@@ -316,6 +368,7 @@ class SincronizacaoLogResponse(BaseSchema):
     registros_sucesso: int
     registros_erro: int
     erro_mensagem: Optional[str] = None
+    detalhes: Optional[Dict[str, Any]] = None  # modo, watermarks e estatísticas por lote
     iniciado_em: Optional[datetime] = None
     finalizado_em: Optional[datetime] = None
     duracao_ms: Optional[int] = None
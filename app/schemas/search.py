@@ -0,0 +1,25 @@
+"""
+Schemas da busca unificada
+"""
+
+from typing import List, Optional
+
+from app.schemas.common import BaseSchema
+
+
+class SearchResultItem(BaseSchema):
+    """Item do resultado (morador, visitante, veículo ou unidade)"""
+
+    type: str  # user, visitor, vehicle, unit
+    id: int
+    title: str
+    subtitle: Optional[str] = None
+    score: float
+
+
+class SearchResponse(BaseSchema):
+    """Resposta da busca unificada"""
+
+    query: str
+    items: List[SearchResultItem]
+    took_ms: float
@@ -0,0 +1,511 @@
+"""
+Motor de Decisão de Acesso em Memória - pontos e grupos de acesso
+
+"Pode X abrir o ponto Y agora?" exigia juntar grupos_acesso,
+grupos_acesso_pontos e pontos_acesso e conferir horário e dia em Python,
+no caminho em que o controlador segura a porta. O motor compila, por
+condomínio, uma matriz de autorização:
+
+- principal (tipo de pessoa, bloco) -> ponto -> horário permitido, como
+  bitset de 672 bits (7 dias x 96 faixas de 15 minutos), um para entrada e
+  outro para saída; grupos que cobrem o mesmo principal e ponto são unidos
+  com OR na compilação;
+- moradores -> blocos das unidades em que residem;
+- pré-autorizações ativas por QR Code, com validade, usos restantes e o
+  próprio bitset (cruzado com o do grupo vinculado, se houver).
+
+A decisão é feita com acessos a dicionário e um teste de bit. Os horários
+são arredondados para dentro da grade de 15 minutos (início para cima, fim
+para baixo): na dúvida o motor nega. Fim menor ou igual ao início atravessa
+a meia-noite.
+
+A matriz é carregada na primeira consulta do condomínio, atualizada de forma
+incremental pelos endpoints de grupos, pontos e pré-autorizações e
+recarregada por completo após ACCESS_ENGINE_TTL_SECONDS (alterações feitas
+por outros workers), como o índice de placas. Decisões por QR Code relêem a
+pré-autorização (uma consulta pelo índice único de qr_code) antes de decidir:
+cancelamento e uso registrados em outro worker valem na hora.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from datetime import time as dt_time
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+ALL_WEEK = (1 << WEEK_SLOTS) - 1
+
+# Tipos de pessoa dos grupos (colunas permite_*)
+TIPOS = ("morador", "visitante", "prestador", "entregador")
+DIRECOES = ("entrada", "saida")
+
+# Bloco curinga: grupos sem blocos_permitidos e pessoas sem bloco conhecido
+ANY_BLOCK = "*"
+
+
+def weekday_index(day: date) -> int:
+    """Dia da semana no formato de dias_semana: 0=dom, 1=seg, ..., 6=sab"""
+    return (day.weekday() + 1) % 7
+
+
+def slot_of(when: datetime) -> int:
+    """Posição do instante no bitset semanal"""
+    return weekday_index(when.date()) * SLOTS_PER_DAY + (when.hour * 60 + when.minute) // SLOT_MINUTES
+
+
+def _minutes(value: dt_time) -> int:
+    return value.hour * 60 + value.minute + (1 if value.second or value.microsecond else 0)
+
+
+def schedule_bits(
+    inicio: Optional[dt_time] = None, fim: Optional[dt_time] = None, dias: Optional[Sequence[int]] = None
+) -> int:
+    """
+    Bitset semanal de um horário (sem horário = dia todo; sem dias = todos).
+
+    Usage:
+        schedule_bits(time(8), time(18), [1, 2, 3, 4, 5])  # seg a sex, 08:00-17:59
+    """
+    days = sorted({day % 7 for day in dias}) if dias else range(7)
+
+    if inicio is None or fim is None:
+        day_mask = (1 << SLOTS_PER_DAY) - 1
+        spans = [(0, day_mask)]
+    else:
+        first = -(-_minutes(inicio) // SLOT_MINUTES)  # arredonda para cima
+        last = fim.hour * 60 // SLOT_MINUTES + fim.minute // SLOT_MINUTES  # faixas inteiras até o fim
+        if last > first:
+            spans = [(0, _range_mask(first, last))]
+        else:
+            # Atravessa a meia-noite: do início até 24h e, no dia seguinte, de 0h até o fim
+            spans = [(0, _range_mask(first, SLOTS_PER_DAY)), (1, _range_mask(0, last))]
+
+    bits = 0
+    for day in days:
+        for offset, mask in spans:
+            bits |= mask << (((day + offset) % 7) * SLOTS_PER_DAY)
+    return bits
+
+
+def _range_mask(first: int, last: int) -> int:
+    """Faixas [first, last) de um dia"""
+    return ((1 << last) - 1) ^ ((1 << first) - 1) if last > first else 0
+
+
+@dataclass
+class PointRule:
+    """Horários permitidos em um ponto, por direção"""
+
+    entrada: int = 0
+    saida: int = 0
+
+    def bits(self, direcao: str) -> int:
+        return self.entrada if direcao == "entrada" else self.saida
+
+    def merge(self, other: "PointRule") -> None:
+        self.entrada |= other.entrada
+        self.saida |= other.saida
+
+
+@dataclass
+class CompiledGroup:
+    """Grupo de acesso ativo já convertido em bitsets"""
+
+    id: int
+    tipos: FrozenSet[str]
+    blocos: Optional[FrozenSet[str]]  # None = todos os blocos
+    pontos: Dict[int, PointRule] = field(default_factory=dict)
+
+
+@dataclass
+class CompiledPreAuth:
+    """Pré-autorização ativa"""
+
+    id: int
+    qr_code: str
+    data_inicio: date
+    data_fim: date
+    bits: int
+    grupo_id: Optional[int] = None
+    ponto_id: Optional[int] = None
+    usos_restantes: Optional[int] = None  # None = sem limite
+
+
+@dataclass
+class AccessDecision:
+    allowed: bool
+    motivo: str
+    ponto_id: int
+    pre_autorizacao_id: Optional[int] = None
+
+
+class TenantAccessMatrix:
+    """Matriz de autorização compilada de um condomínio"""
+
+    def __init__(
+        self,
+        tenant_id: int,
+        pontos: Iterable[int] = (),
+        grupos: Iterable[CompiledGroup] = (),
+        residentes: Optional[Dict[int, FrozenSet[str]]] = None,
+        pre_autorizacoes: Iterable[CompiledPreAuth] = (),
+    ):
+        self.tenant_id = tenant_id
+        self.pontos: Set[int] = set(pontos)
+        self.grupos: Dict[int, CompiledGroup] = {grupo.id: grupo for grupo in grupos}
+        self.residentes: Dict[int, FrozenSet[str]] = dict(residentes or {})
+        self.pre_autorizacoes: Dict[str, CompiledPreAuth] = {item.qr_code: item for item in pre_autorizacoes}
+        self._matrix: Dict[Tuple[str, str], Dict[int, PointRule]] = {}
+        self.loaded_at = time.monotonic()
+        self.compile()
+
+    def compile(self) -> None:
+        """(Re)monta principal -> ponto -> horários a partir dos grupos compilados (sem banco)"""
+        blocos = {bloco for grupo in self.grupos.values() if grupo.blocos for bloco in grupo.blocos}
+        matrix: Dict[Tuple[str, str], Dict[int, PointRule]] = {}
+        for tipo in TIPOS:
+            for bloco in blocos | {ANY_BLOCK}:
+                rules: Dict[int, PointRule] = {}
+                for grupo in self.grupos.values():
+                    if tipo not in grupo.tipos:
+                        continue
+                    if grupo.blocos is not None and bloco not in grupo.blocos:
+                        continue
+                    for ponto_id, rule in grupo.pontos.items():
+                        rules.setdefault(ponto_id, PointRule()).merge(rule)
+                if rules:
+                    matrix[(tipo, bloco)] = rules
+        self._matrix = matrix
+
+    # ==================== ATUALIZAÇÃO ====================
+
+    def set_group(self, grupo_id: int, grupo: Optional[CompiledGroup]) -> None:
+        """Substitui (ou remove, se None) um grupo e recompila a matriz"""
+        if grupo is None:
+            self.grupos.pop(grupo_id, None)
+        else:
+            self.grupos[grupo_id] = grupo
+        self.compile()
+
+    def set_ponto(self, ponto_id: int, active: bool) -> None:
+        if active:
+            self.pontos.add(ponto_id)
+        else:
+            self.pontos.discard(ponto_id)
+
+    def set_pre_autorizacao(self, pre_auth_id: int, item: Optional[CompiledPreAuth]) -> None:
+        for qr_code, current in list(self.pre_autorizacoes.items()):
+            if current.id == pre_auth_id:
+                del self.pre_autorizacoes[qr_code]
+        if item is not None:
+            self.pre_autorizacoes[item.qr_code] = item
+
+    # ==================== DECISÃO ====================
+
+    def rules_for(self, tipo: str, bloco: Optional[str]) -> Dict[int, PointRule]:
+        rules = self._matrix.get((tipo, bloco)) if bloco else None
+        if rules is None:
+            rules = self._matrix.get((tipo, ANY_BLOCK), {})
+        return rules
+
+    def decide_tipo(
+        self, tipo: str, bloco: Optional[str], ponto_id: int, when: datetime, direcao: str = "entrada"
+    ) -> AccessDecision:
+        """Visitante, prestador ou entregador a caminho de uma unidade do bloco"""
+        if ponto_id not in self.pontos:
+            return AccessDecision(False, "Ponto de acesso inativo ou inexistente", ponto_id)
+        rule = self.rules_for(tipo, bloco).get(ponto_id)
+        if rule is None:
+            return AccessDecision(False, "Nenhum grupo de acesso libera este ponto", ponto_id)
+        if not rule.bits(direcao) >> slot_of(when) & 1:
+            return AccessDecision(False, "Fora do horário permitido", ponto_id)
+        return AccessDecision(True, "Acesso autorizado", ponto_id)
+
+    def decide_user(self, user_id: int, ponto_id: int, when: datetime, direcao: str = "entrada") -> AccessDecision:
+        """Morador: basta um dos blocos das suas unidades liberar o ponto"""
+        decision = None
+        for bloco in self.residentes.get(user_id) or (None,):
+            decision = self.decide_tipo("morador", bloco, ponto_id, when, direcao)
+            if decision.allowed:
+                break
+        return decision
+
+    def decide_pre_autorizacao(
+        self, qr_code: str, ponto_id: int, when: datetime, direcao: str = "entrada"
+    ) -> AccessDecision:
+        """QR Code de pré-autorização (mesmas regras de POST /pre-autorizacoes/validar, mais o grupo)"""
+        item = self.pre_autorizacoes.get(qr_code)
+        if item is None:
+            return AccessDecision(False, "QR Code não encontrado ou pré-autorização inativa", ponto_id)
+        if not item.data_inicio <= when.date() <= item.data_fim:
+            return AccessDecision(False, "Pré-autorização fora do período de validade", ponto_id, item.id)
+        if item.usos_restantes is not None and item.usos_restantes <= 0:
+            return AccessDecision(False, "Número máximo de usos atingido", ponto_id, item.id)
+        if ponto_id not in self.pontos:
+            return AccessDecision(False, "Ponto de acesso inativo ou inexistente", ponto_id, item.id)
+        if item.ponto_id is not None and item.ponto_id != ponto_id:
+            return AccessDecision(False, "Ponto de acesso não autorizado", ponto_id, item.id)
+
+        bits = item.bits
+        if item.grupo_id is not None:
+            grupo = self.grupos.get(item.grupo_id)
+            rule = grupo.pontos.get(ponto_id) if grupo else None
+            if rule is None:
+                return AccessDecision(False, "Grupo de acesso não libera este ponto", ponto_id, item.id)
+            bits &= rule.bits(direcao)
+        if not bits >> slot_of(when) & 1:
+            return AccessDecision(False, "Fora do horário permitido", ponto_id, item.id)
+        return AccessDecision(True, "Acesso autorizado", ponto_id, item.id)
+
+    # ==================== EXPORTAÇÃO ====================
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Matriz em JSON para controladores (decisão offline).
+
+        Bitsets em hexadecimal; o bit i corresponde ao dia i // 96 (0=dom) e à
+        faixa de 15 minutos i % 96.
+        """
+
+        def rule_json(rule: PointRule) -> Dict[str, str]:
+            return {"entrada": format(rule.entrada, "x"), "saida": format(rule.saida, "x")}
+
+        return {
+            "tenant_id": self.tenant_id,
+            "slot_minutes": SLOT_MINUTES,
+            "pontos": sorted(self.pontos),
+            "matriz": {
+                f"{tipo}:{bloco}": {str(ponto_id): rule_json(rule) for ponto_id, rule in sorted(rules.items())}
+                for (tipo, bloco), rules in sorted(self._matrix.items())
+            },
+            "moradores": {str(user_id): sorted(blocos) for user_id, blocos in sorted(self.residentes.items())},
+            "grupos": {
+                str(grupo.id): {str(ponto_id): rule_json(rule) for ponto_id, rule in sorted(grupo.pontos.items())}
+                for grupo in self.grupos.values()
+            },
+            "pre_autorizacoes": [
+                {
+                    "id": item.id,
+                    "qr_code": item.qr_code,
+                    "data_inicio": item.data_inicio.isoformat(),
+                    "data_fim": item.data_fim.isoformat(),
+                    "horarios": format(item.bits, "x"),
+                    "grupo_id": item.grupo_id,
+                    "ponto_id": item.ponto_id,
+                    "usos_restantes": item.usos_restantes,
+                }
+                for item in self.pre_autorizacoes.values()
+            ],
+        }
+
+
+PONTOS_SQL = "SELECT id, is_active FROM pontos_acesso WHERE tenant_id = :tid {where}"
+
+GRUPOS_SQL = """
+    SELECT g.id, g.permite_morador, g.permite_visitante, g.permite_prestador, g.permite_entregador,
+           g.blocos_permitidos, g.horario_inicio, g.horario_fim, g.dias_semana,
+           gp.ponto_id, gp.permite_entrada, gp.permite_saida
+    FROM grupos_acesso g
+    LEFT JOIN grupos_acesso_pontos gp ON gp.grupo_id = g.id
+    WHERE g.tenant_id = :tid AND g.is_active = true {where}
+"""
+
+RESIDENTES_SQL = """
+    SELECT ur.user_id, array_agg(DISTINCT u.block) FILTER (WHERE u.block <> '') AS blocos
+    FROM unit_residents ur
+    JOIN units u ON u.id = ur.unit_id
+    WHERE u.tenant_id = :tid AND ur.is_active = true
+    GROUP BY ur.user_id
+"""
+
+PRE_AUTORIZACOES_SQL = """
+    SELECT id, qr_code, data_inicio, data_fim, horario_inicio, horario_fim, dias_semana,
+           is_single_use, max_usos, usos_realizados, grupo_acesso_id, ponto_acesso_id
+    FROM pre_autorizacoes
+    WHERE tenant_id = :tid AND status = 'ativa' AND data_fim >= CURRENT_DATE {where}
+"""
+
+
+def _compile_groups(rows) -> Dict[int, CompiledGroup]:
+    """Linhas de GRUPOS_SQL (uma por vínculo grupo-ponto) -> grupos compilados"""
+    grupos: Dict[int, CompiledGroup] = {}
+    for row in rows:
+        grupo = grupos.get(row.id)
+        if grupo is None:
+            tipos = frozenset(tipo for tipo in TIPOS if getattr(row, f"permite_{tipo}"))
+            blocos = frozenset(row.blocos_permitidos) if row.blocos_permitidos else None
+            grupo = grupos[row.id] = CompiledGroup(id=row.id, tipos=tipos, blocos=blocos)
+        if row.ponto_id is not None:
+            bits = schedule_bits(row.horario_inicio, row.horario_fim, row.dias_semana)
+            grupo.pontos[row.ponto_id] = PointRule(
+                entrada=bits if row.permite_entrada else 0, saida=bits if row.permite_saida else 0
+            )
+    return grupos
+
+
+def _compile_pre_auth(row) -> CompiledPreAuth:
+    restantes = max((row.max_usos or 1) - row.usos_realizados, 0) if row.is_single_use else None
+    return CompiledPreAuth(
+        id=row.id,
+        qr_code=row.qr_code,
+        data_inicio=row.data_inicio,
+        data_fim=row.data_fim,
+        bits=schedule_bits(row.horario_inicio, row.horario_fim, row.dias_semana),
+        grupo_id=row.grupo_acesso_id,
+        ponto_id=row.ponto_acesso_id,
+        usos_restantes=restantes,
+    )
+
+
+class AccessEngineService:
+    """
+    Matrizes de autorização por condomínio, mantidas no processo.
+
+    Cada worker tem sua cópia: as atualizações incrementais valem para o
+    worker que atendeu a alteração e os demais convergem no próximo TTL.
+    A exceção são as pré-autorizações, conferidas no banco a cada QR Code.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = settings.ACCESS_ENGINE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._matrices: Dict[int, TenantAccessMatrix] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def _is_fresh(self, matrix: Optional[TenantAccessMatrix]) -> bool:
+        return matrix is not None and time.monotonic() - matrix.loaded_at < self.ttl_seconds
+
+    async def get_matrix(self, db: AsyncSession, tenant_id: int) -> TenantAccessMatrix:
+        """Matriz do condomínio, compilada sob demanda (uma carga por vez)"""
+        matrix = self._matrices.get(tenant_id)
+        if self._is_fresh(matrix):
+            return matrix
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            matrix = self._matrices.get(tenant_id)
+            if not self._is_fresh(matrix):
+                matrix = await self.load(db, tenant_id)
+        return matrix
+
+    async def load(self, db: AsyncSession, tenant_id: int) -> TenantAccessMatrix:
+        """Recompila a matriz inteira do condomínio"""
+        started = time.perf_counter()
+        params = {"tid": tenant_id}
+        pontos = await db.execute(text(PONTOS_SQL.format(where="AND is_active = true")), params)
+        grupos = await db.execute(text(GRUPOS_SQL.format(where="")), params)
+        residentes = await db.execute(text(RESIDENTES_SQL), params)
+        pre_autorizacoes = await db.execute(text(PRE_AUTORIZACOES_SQL.format(where="")), params)
+
+        matrix = TenantAccessMatrix(
+            tenant_id,
+            pontos=[row.id for row in pontos.fetchall()],
+            grupos=_compile_groups(grupos.fetchall()).values(),
+            residentes={row.user_id: frozenset(row.blocos or ()) for row in residentes.fetchall()},
+            pre_autorizacoes=[_compile_pre_auth(row) for row in pre_autorizacoes.fetchall()],
+        )
+        self._matrices[tenant_id] = matrix
+
+        logger.info(
+            "access_matrix_loaded",
+            tenant_id=tenant_id,
+            pontos=len(matrix.pontos),
+            grupos=len(matrix.grupos),
+            pre_autorizacoes=len(matrix.pre_autorizacoes),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return matrix
+
+    async def decide(
+        self,
+        db: AsyncSession,
+        tenant_id: int,
+        ponto_id: int,
+        *,
+        user_id: Optional[int] = None,
+        qr_code: Optional[str] = None,
+        tipo: Optional[str] = None,
+        bloco: Optional[str] = None,
+        direcao: str = "entrada",
+        when: Optional[datetime] = None,
+    ) -> AccessDecision:
+        """
+        Decisão para um morador (user_id), um QR Code ou um tipo de pessoa e bloco.
+
+        Usage:
+            decision = await access_engine.decide(db, tenant_id, ponto_id, user_id=current_user.id)
+        """
+        matrix = await self.get_matrix(db, tenant_id)
+        when = when or datetime.now()
+        if qr_code:
+            await self._refresh_qr_code(db, matrix, qr_code)
+            return matrix.decide_pre_autorizacao(qr_code, ponto_id, when, direcao)
+        if user_id is not None:
+            return matrix.decide_user(user_id, ponto_id, when, direcao)
+        return matrix.decide_tipo(tipo or "visitante", bloco, ponto_id, when, direcao)
+
+    # ==================== ATUALIZAÇÃO INCREMENTAL ====================
+
+    async def refresh_grupo(self, db: AsyncSession, tenant_id: int, grupo_id: int) -> None:
+        """Recompila um grupo após criação, edição, exclusão ou (des)vínculo de ponto"""
+        matrix = self._matrices.get(tenant_id)
+        if matrix is None:
+            return  # ainda não carregada: a primeira consulta compila tudo
+
+        result = await db.execute(text(GRUPOS_SQL.format(where="AND g.id = :gid")), {"tid": tenant_id, "gid": grupo_id})
+        matrix.set_group(grupo_id, _compile_groups(result.fetchall()).get(grupo_id))
+
+    async def refresh_ponto(self, db: AsyncSession, tenant_id: int, ponto_id: int) -> None:
+        """Atualiza o estado ativo/inativo de um ponto"""
+        matrix = self._matrices.get(tenant_id)
+        if matrix is None:
+            return
+
+        result = await db.execute(text(PONTOS_SQL.format(where="AND id = :pid")), {"tid": tenant_id, "pid": ponto_id})
+        row = result.fetchone()
+        matrix.set_ponto(ponto_id, bool(row and row.is_active))
+
+    async def refresh_pre_autorizacao(self, db: AsyncSession, tenant_id: int, pre_auth_id: int) -> None:
+        """Recompila uma pré-autorização (criação, edição, cancelamento)"""
+        matrix = self._matrices.get(tenant_id)
+        if matrix is None:
+            return
+
+        result = await db.execute(
+            text(PRE_AUTORIZACOES_SQL.format(where="AND id = :paid")), {"tid": tenant_id, "paid": pre_auth_id}
+        )
+        row = result.fetchone()
+        matrix.set_pre_autorizacao(pre_auth_id, _compile_pre_auth(row) if row else None)
+
+    async def _refresh_qr_code(self, db: AsyncSession, matrix: TenantAccessMatrix, qr_code: str) -> None:
+        """Relê a pré-autorização do QR Code: cancelada ou usada em outro worker não fica liberada até o TTL"""
+        result = await db.execute(
+            text(PRE_AUTORIZACOES_SQL.format(where="AND qr_code = :qr")), {"tid": matrix.tenant_id, "qr": qr_code}
+        )
+        row = result.fetchone()
+        if row is not None:
+            matrix.set_pre_autorizacao(row.id, _compile_pre_auth(row))
+        elif qr_code in matrix.pre_autorizacoes:
+            matrix.set_pre_autorizacao(matrix.pre_autorizacoes[qr_code].id, None)
+
+    def invalidate(self, tenant_id: Optional[int] = None) -> None:
+        """Descarta a matriz (de um condomínio ou de todas)"""
+        if tenant_id is None:
+            self._matrices.clear()
+        else:
+            self._matrices.pop(tenant_id, None)
+
+
+# Singleton instance
+access_engine = AccessEngineService()
@@ -0,0 +1,258 @@
+"""
+Feed de Atividades Recentes por Condomínio
+
+GET /dashboard/atividades-recentes consultava várias tabelas (UNION ALL com
+um ORDER BY por tabela) a cada leitura, e o cache de 30 segundos era refeito
+a cada nova atividade. Aqui o feed é montado na escrita (fan-out-on-write):
+
+- um Redis Stream por condomínio e role (conecta:feed:<tenant>:<role>), com
+  XADD MAXLEN ~ ACTIVITY_FEED_MAXLEN; cada tipo de atividade vai só para os
+  streams das roles que podem vê-lo (morador não vê visitantes e encomendas
+  dos outros), então filtrar por role não custa nada na leitura;
+- os caminhos de escrita (visitas, encomendas, ocorrências, reservas,
+  manutenção e comunicados) chamam publish() após o commit: uma consulta
+  EXISTS e um pipeline com um XADD por role;
+- a leitura é um único XREVRANGE; o id da última entrada é o cursor de
+  "carregar mais" (XREVRANGE com início exclusivo "(<id>").
+
+O banco continua sendo a fonte da verdade. Na primeira leitura (ou depois de
+ACTIVITY_FEED_TTL_SECONDS sem escritas) os streams são recarregados com as
+últimas ACTIVITY_FEED_SEED_PER_TYPE linhas de cada tabela; até lá publish()
+não grava nada. Escritas fora da API (imports, scripts) e exclusões só
+aparecem na próxima recarga. Sem Redis, a leitura cai na consulta ao banco
+(sem cursor).
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.core.permissions import Role
+from app.services.cache import cache, cache_key
+
+logger = get_logger(__name__)
+
+ALL_ROLES: Tuple[int, ...] = tuple(int(role) for role in Role)
+STAFF_ROLES: Tuple[int, ...] = tuple(int(role) for role in (Role.SYNDIC, Role.DOORMAN, Role.ADMIN, Role.SUPER_ADMIN))
+
+SEED_LOCK_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class TipoAtividade:
+    """Tipo de atividade: ícone, roles que o veem e consulta das mais recentes (carga inicial)"""
+
+    icone: str
+    roles: Tuple[int, ...]
+    sql: str
+
+
+TIPOS: Dict[str, TipoAtividade] = {
+    "visitante": TipoAtividade(
+        "user",
+        STAFF_ROLES,
+        "SELECT id, visitante_nome AS titulo, created_at AS data FROM visitas WHERE tenant_id = :tid",
+    ),
+    "encomenda": TipoAtividade(
+        "package",
+        STAFF_ROLES,
+        "SELECT id, 'Encomenda para ' || COALESCE(recipient_name, '') AS titulo, created_at AS data "
+        "FROM packages WHERE tenant_id = :tid",
+    ),
+    "ocorrencia": TipoAtividade(
+        "alert",
+        STAFF_ROLES,
+        "SELECT id, title AS titulo, created_at AS data FROM occurrences WHERE tenant_id = :tid",
+    ),
+    "reserva": TipoAtividade(
+        "calendar",
+        ALL_ROLES,
+        "SELECT r.id, 'Reserva: ' || COALESCE(ca.name, '') AS titulo, r.created_at AS data "
+        "FROM reservations r LEFT JOIN common_areas ca ON ca.id = r.area_id WHERE r.tenant_id = :tid",
+    ),
+    "manutencao": TipoAtividade(
+        "wrench",
+        ALL_ROLES,
+        "SELECT id, title AS titulo, created_at AS data FROM maintenance_tickets WHERE tenant_id = :tid",
+    ),
+    "comunicado": TipoAtividade(
+        "megaphone",
+        ALL_ROLES,
+        "SELECT id, title AS titulo, created_at AS data FROM announcements WHERE tenant_id = :tid",
+    ),
+}
+
+
+def feed_key(tenant_id: int, role: int) -> str:
+    return cache_key("feed", str(tenant_id), str(role))
+
+
+def _ready_key(tenant_id: int) -> str:
+    return cache_key("feed", str(tenant_id), "pronto")
+
+
+def _lock_key(tenant_id: int) -> str:
+    return cache_key("feed", str(tenant_id), "carregando")
+
+
+def _feed_role(role: Optional[int]) -> int:
+    """Role do stream lido; desconhecida ou anônima vê o feed do morador"""
+    return int(role) if role in ALL_ROLES else int(Role.RESIDENT)
+
+
+def make_item(tipo: str, item_id: int, titulo: Optional[str], data: Optional[datetime]) -> Dict[str, Any]:
+    """Item no formato da resposta (tipo, id, titulo, data, icone)"""
+    return {
+        "tipo": tipo,
+        "id": item_id,
+        "titulo": titulo,
+        "data": data.isoformat() if data else None,
+        "icone": TIPOS[tipo].icone,
+    }
+
+
+class ActivityFeedService:
+    """
+    Feed de atividades em Redis Streams, por condomínio e role.
+
+    Usage:
+        await db.commit()
+        await activity_feed.publish(tenant_id, "encomenda", encomenda_id, "Encomenda para Ana")
+
+        page = await activity_feed.read(db, tenant_id, current_user.role, limit=10)
+        more = await activity_feed.read(db, tenant_id, current_user.role, limit=10, cursor=page["next_cursor"])
+    """
+
+    async def publish(
+        self, tenant_id: int, tipo: str, item_id: int, titulo: Optional[str], data: Optional[datetime] = None
+    ) -> None:
+        """Adiciona uma atividade aos streams das roles do tipo (chamar após o commit; falhas só são registradas)"""
+        client = cache._client
+        if client is None:
+            return
+
+        try:
+            if not await client.exists(_ready_key(tenant_id)):
+                return  # feed não carregado: a carga inicial lê do banco
+            entry = {"item": json.dumps(make_item(tipo, item_id, titulo, data or datetime.now()))}
+            ttl = settings.ACTIVITY_FEED_TTL_SECONDS
+            async with client.pipeline(transaction=False) as pipe:
+                for role in TIPOS[tipo].roles:
+                    pipe.xadd(feed_key(tenant_id, role), entry, maxlen=settings.ACTIVITY_FEED_MAXLEN, approximate=True)
+                # Todos os streams do condomínio expiram juntos com o marcador de carga
+                for role in ALL_ROLES:
+                    pipe.expire(feed_key(tenant_id, role), ttl)
+                pipe.expire(_ready_key(tenant_id), ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("activity_feed_publish_error", tenant_id=tenant_id, tipo=tipo, error=str(e))
+
+    async def read(
+        self, db: AsyncSession, tenant_id: int, role: Optional[int], limit: int = 10, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Página do feed, da mais recente para a mais antiga.
+
+        Returns:
+            {"items": [...], "next_cursor": id da última entrada, ou None no fim do feed}
+        """
+        role = _feed_role(role)
+        client = cache._client
+        if client is None:
+            return {"items": [] if cursor else await self.query(db, tenant_id, role, limit), "next_cursor": None}
+
+        key = feed_key(tenant_id, role)
+        start = f"({cursor}" if cursor else "+"
+        try:
+            entries = await client.xrevrange(key, max=start, min="-", count=limit)
+            if not entries and cursor is None and not await client.exists(_ready_key(tenant_id)):
+                if not await self.seed(db, tenant_id):
+                    # Outra requisição está carregando: responde do banco desta vez
+                    return {"items": await self.query(db, tenant_id, role, limit), "next_cursor": None}
+                entries = await client.xrevrange(key, max=start, min="-", count=limit)
+        except Exception as e:
+            logger.warning("activity_feed_read_error", tenant_id=tenant_id, error=str(e))
+            return {"items": [] if cursor else await self.query(db, tenant_id, role, limit), "next_cursor": None}
+
+        return {
+            "items": [json.loads(fields["item"]) for _, fields in entries],
+            "next_cursor": entries[-1][0] if len(entries) == limit else None,
+        }
+
+    async def query(
+        self, db: AsyncSession, tenant_id: int, role: Optional[int] = None, limit: int = 10, per_type: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Atividades mais recentes direto do banco (role=None: todos os tipos)"""
+        tipos = [tipo for tipo, spec in TIPOS.items() if role is None or role in spec.roles]
+        parts = [
+            f"(SELECT '{tipo}' AS tipo, q.* FROM ({TIPOS[tipo].sql}) q ORDER BY q.data DESC LIMIT :per_type)"
+            for tipo in tipos
+        ]
+        result = await db.execute(
+            text(" UNION ALL ".join(parts) + " ORDER BY data DESC, id DESC LIMIT :limit"),
+            {"tid": tenant_id, "per_type": per_type or limit, "limit": limit},
+        )
+        return [make_item(row.tipo, row.id, row.titulo, row.data) for row in result.fetchall()]
+
+    async def seed(self, db: AsyncSession, tenant_id: int) -> bool:
+        """
+        (Re)carrega os streams do condomínio a partir do banco.
+
+        Returns:
+            False se outra requisição já está carregando
+        """
+        client = cache._client
+        if not await client.set(_lock_key(tenant_id), "1", nx=True, ex=SEED_LOCK_SECONDS):
+            return False
+
+        started = time.perf_counter()
+        try:
+            per_type = settings.ACTIVITY_FEED_SEED_PER_TYPE
+            items = await self.query(db, tenant_id, limit=per_type * len(TIPOS), per_type=per_type)
+            await self._write(client, tenant_id, items)
+        finally:
+            await client.delete(_lock_key(tenant_id))
+
+        logger.info(
+            "activity_feed_seeded",
+            tenant_id=tenant_id,
+            items=len(items),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return True
+
+    async def _write(self, client: Any, tenant_id: int, items: Sequence[Dict[str, Any]]) -> None:
+        """Substitui os streams do condomínio pelos itens (mais recente primeiro) e marca o feed como carregado"""
+        ttl = settings.ACTIVITY_FEED_TTL_SECONDS
+        keys = [feed_key(tenant_id, role) for role in ALL_ROLES]
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(*keys)
+            for item in reversed(items):
+                entry = {"item": json.dumps(item)}
+                for role in TIPOS[item["tipo"]].roles:
+                    pipe.xadd(feed_key(tenant_id, role), entry, maxlen=settings.ACTIVITY_FEED_MAXLEN, approximate=True)
+            for key in keys:
+                pipe.expire(key, ttl)
+            pipe.set(_ready_key(tenant_id), "1", ex=ttl)
+            await pipe.execute()
+
+    async def reset(self, tenant_id: int) -> None:
+        """Descarta o feed do condomínio; a próxima leitura recarrega do banco"""
+        client = cache._client
+        if client is None:
+            return
+        try:
+            await client.delete(_ready_key(tenant_id), *(feed_key(tenant_id, role) for role in ALL_ROLES))
+        except Exception as e:
+            logger.warning("activity_feed_reset_error", tenant_id=tenant_id, error=str(e))
+
+
+# Singleton instance
+activity_feed = ActivityFeedService()
@@ -0,0 +1,502 @@
+"""
+Arquivamento Frio e Retenção
+Exporta linhas antigas das tabelas de alto volume para arquivos NDJSON
+comprimidos com zstd no disco local e as remove do banco em pequenos lotes.
+
+Fluxo por (tabela, condomínio):
+    1. Retoma lotes já exportados e ainda não removidos (status "exported")
+    2. Seleciona até ARCHIVE_BATCH_SIZE linhas anteriores ao corte, em ordem de id
+    3. Grava o arquivo (tmp + rename atômico) e registra o lote em archive_batches
+    4. Remove as linhas do lote em transações de ARCHIVE_DELETE_CHUNK linhas
+
+Todos os passos são idempotentes: reexecutar após uma falha regrava o mesmo
+arquivo (mesmo nome) e/ou termina a remoção do lote pendente.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import zstandard
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.database import engine
+from app.services.partitioning import add_months, month_start
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ArchiveTable:
+    """Tabela arquivável: coluna de tempo e filtro SQL por condomínio (parâmetro :tenant_id)"""
+
+    name: str
+    time_column: str
+    tenant_filter: str
+
+
+ARCHIVE_TABLES: Dict[str, ArchiveTable] = {
+    "notifications": ArchiveTable("notifications", "created_at", "tenant_id = :tenant_id"),
+    "access_logs": ArchiveTable("access_logs", "registered_at", "tenant_id = :tenant_id"),
+    "audit_logs": ArchiveTable("audit_logs", "created_at", "tenant_id = :tenant_id"),
+    # key_logs e sincronizacoes_log não têm tenant_id: o condomínio vem da tabela pai
+    "key_logs": ArchiveTable("key_logs", "action_at", "key_id IN (SELECT id FROM keys WHERE tenant_id = :tenant_id)"),
+    "sincronizacoes_log": ArchiveTable(
+        "sincronizacoes_log",
+        "created_at",
+        "integracao_id IN (SELECT id FROM integracoes_hardware WHERE tenant_id = :tenant_id)",
+    ),
+}
+
+# Advisory lock impede duas execuções simultâneas
+ARCHIVE_LOCK_KEY = 726_002
+
+ARCHIVE_EXTENSION = ".ndjson.zst"
+
+
+def _json_default(value: Any) -> Any:
+    """Serializa tipos do Postgres que o json não conhece"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def archive_path(table: str, tenant_id: int, first_id: int, last_id: int, base_dir: Optional[str] = None) -> str:
+    """
+    Caminho do arquivo de um lote (determinístico, para regravação idempotente).
+
+    Usage:
+        archive_path("audit_logs", 1, 100, 250)
+        # Returns: "<ARCHIVE_DIR>/audit_logs/tenant_1/audit_logs_100_250.ndjson.zst"
+    """
+    base_dir = base_dir or settings.ARCHIVE_DIR
+    return os.path.join(base_dir, table, f"tenant_{tenant_id}", f"{table}_{first_id}_{last_id}{ARCHIVE_EXTENSION}")
+
+
+def write_archive_file(path: str, rows: List[Dict[str, Any]], level: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Grava as linhas em NDJSON comprimido (zstd).
+
+    O arquivo é escrito em `<path>.tmp`, sincronizado em disco e renomeado,
+    de modo que um arquivo no caminho final está sempre completo.
+
+    Returns:
+        {"size": bytes, "checksum": sha256}
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    compressor = zstandard.ZstdCompressor(level=level or settings.ARCHIVE_ZSTD_LEVEL)
+    with open(tmp_path, "wb") as fh:
+        with compressor.stream_writer(fh, closefd=False) as writer:
+            for row in rows:
+                writer.write(json.dumps(row, default=_json_default, ensure_ascii=False).encode("utf-8"))
+                writer.write(b"\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return {"size": os.path.getsize(path), "checksum": digest.hexdigest()}
+
+
+def read_archive_file(path: str) -> List[Dict[str, Any]]:
+    """Lê um arquivo de lote inteiro (limitado a ARCHIVE_BATCH_SIZE linhas)"""
+    decompressor = zstandard.ZstdDecompressor()
+    with open(path, "rb") as fh:
+        with decompressor.stream_reader(fh) as reader:
+            return [json.loads(line) for line in io.TextIOWrapper(reader, encoding="utf-8") if line.strip()]
+
+
+@dataclass
+class RetentionRule:
+    """Retenção efetiva de uma tabela para um condomínio"""
+
+    tenant_id: int
+    table: str
+    retention_months: int
+
+    def cutoff(self, today: Optional[date] = None) -> datetime:
+        """Início do mês mais antigo mantido no banco (linhas anteriores são arquivadas)"""
+        first_kept = add_months(month_start(today or datetime.now().date()), -self.retention_months)
+        return datetime.combine(first_kept, datetime.min.time())
+
+
+class ArchivalService:
+    """
+    Aplica as políticas de retenção e lê o arquivo frio.
+
+    Políticas ficam em retention_policies (por condomínio e tabela); sem
+    política, vale settings.ARCHIVE_RETENTION_MONTHS (0 = não arquiva).
+    """
+
+    def __init__(self, tables: Optional[Dict[str, ArchiveTable]] = None, base_dir: Optional[str] = None):
+        self.tables = tables or ARCHIVE_TABLES
+        self.base_dir = base_dir
+
+    # ==================== POLÍTICAS ====================
+
+    async def get_rules(self, db: AsyncSession, tenant_id: Optional[int] = None) -> List[RetentionRule]:
+        """Retenção efetiva por (condomínio, tabela), combinando políticas e o padrão global"""
+        tenant_sql = "WHERE id = :tenant_id" if tenant_id is not None else ""
+        tenants = await db.execute(text(f"SELECT id FROM tenants {tenant_sql} ORDER BY id"), {"tenant_id": tenant_id})
+        policies = await db.execute(
+            text("SELECT tenant_id, table_name, retention_months, is_active FROM retention_policies")
+        )
+        overrides = {(row[0], row[1]): (row[2] if row[3] else 0) for row in policies.fetchall()}
+
+        rules = []
+        for (tid,) in tenants.fetchall():
+            for table in self.tables:
+                months = overrides.get((tid, table), settings.ARCHIVE_RETENTION_MONTHS)
+                if months > 0:
+                    rules.append(RetentionRule(tenant_id=tid, table=table, retention_months=months))
+        return rules
+
+    async def set_policy(
+        self, db: AsyncSession, tenant_id: int, table: str, retention_months: int, is_active: bool = True
+    ) -> None:
+        """Cria ou atualiza a política de um condomínio para uma tabela"""
+        if table not in self.tables:
+            raise ValueError(f"Tabela não arquivável: {table}")
+        await db.execute(
+            text(
+                """
+                INSERT INTO retention_policies (tenant_id, table_name, retention_months, is_active)
+                VALUES (:tenant_id, :table, :months, :active)
+                ON CONFLICT (tenant_id, table_name)
+                DO UPDATE SET retention_months = :months, is_active = :active, updated_at = NOW()
+            """
+            ),
+            {"tenant_id": tenant_id, "table": table, "months": retention_months, "active": is_active},
+        )
+        await db.commit()
+
+    # ==================== ARQUIVAMENTO ====================
+
+    async def run(
+        self, db: AsyncSession, tenant_id: Optional[int] = None, today: Optional[date] = None
+    ) -> Dict[str, int]:
+        """
+        Arquiva todas as (tabelas, condomínios) com retenção configurada.
+
+        Returns:
+            Linhas arquivadas por tabela
+        """
+        # O lock fica numa conexão própria: a sessão devolve a conexão ao pool a cada commit
+        async with engine.connect() as lock_conn:
+            locked = await lock_conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": ARCHIVE_LOCK_KEY})
+            if not locked.scalar():
+                logger.warning("archive_already_running")
+                return {}
+
+            archived: Dict[str, int] = {}
+            try:
+                for rule in await self.get_rules(db, tenant_id):
+                    count = await self.archive_table(db, rule.table, rule.tenant_id, rule.cutoff(today))
+                    archived[rule.table] = archived.get(rule.table, 0) + count
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ARCHIVE_LOCK_KEY})
+                await lock_conn.commit()
+        return archived
+
+    async def archive_table(
+        self,
+        db: AsyncSession,
+        table: str,
+        tenant_id: int,
+        cutoff: datetime,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Exporta e remove as linhas do condomínio anteriores a `cutoff`.
+
+        Returns:
+            Quantidade de linhas arquivadas nesta execução
+        """
+        spec = self.tables[table]
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+
+        # Lotes exportados por uma execução interrompida
+        pending = await db.execute(
+            text(
+                """
+                SELECT id, first_id, last_id, cutoff FROM archive_batches
+                WHERE table_name = :table AND tenant_id = :tenant_id AND status = 'exported'
+                ORDER BY first_id
+            """
+            ),
+            {"table": table, "tenant_id": tenant_id},
+        )
+        for batch_id, first_id, last_id, batch_cutoff in pending.fetchall():
+            await self.purge_batch(db, spec, tenant_id, batch_id, first_id, last_id, batch_cutoff)
+
+        total = 0
+        after_id = 0
+        while True:
+            result = await db.execute(
+                text(
+                    f"""
+                    SELECT * FROM {spec.name}
+                    WHERE {spec.tenant_filter} AND {spec.time_column} < :cutoff AND id > :after_id
+                    ORDER BY id LIMIT :limit
+                """
+                ),
+                {"tenant_id": tenant_id, "cutoff": cutoff, "after_id": after_id, "limit": batch_size},
+            )
+            rows = [dict(row._mapping) for row in result.fetchall()]
+            if not rows:
+                break
+
+            batch_id = await self.export_batch(db, spec, tenant_id, cutoff, rows)
+            await self.purge_batch(db, spec, tenant_id, batch_id, rows[0]["id"], rows[-1]["id"], cutoff)
+            total += len(rows)
+            after_id = rows[-1]["id"]
+
+        if total:
+            logger.info("archive_table_done", table=table, tenant_id=tenant_id, rows=total, cutoff=cutoff.isoformat())
+        return total
+
+    async def export_batch(
+        self, db: AsyncSession, spec: ArchiveTable, tenant_id: int, cutoff: datetime, rows: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Grava o arquivo do lote e registra o manifesto (status "exported").
+
+        Returns:
+            ID do lote em archive_batches
+        """
+        first_id, last_id = rows[0]["id"], rows[-1]["id"]
+        times = [row[spec.time_column] for row in rows]
+        path = archive_path(spec.name, tenant_id, first_id, last_id, self.base_dir)
+        info = await asyncio.to_thread(write_archive_file, path, rows)
+
+        result = await db.execute(
+            text(
+                """
+                INSERT INTO archive_batches (
+                    tenant_id, table_name, first_id, last_id, min_time, max_time, cutoff,
+                    row_count, file_path, file_size, checksum, status
+                ) VALUES (
+                    :tenant_id, :table, :first_id, :last_id, :min_time, :max_time, :cutoff,
+                    :row_count, :file_path, :file_size, :checksum, 'exported'
+                )
+                ON CONFLICT (table_name, tenant_id, first_id) DO UPDATE SET
+                    last_id = EXCLUDED.last_id, min_time = EXCLUDED.min_time, max_time = EXCLUDED.max_time,
+                    cutoff = EXCLUDED.cutoff, row_count = EXCLUDED.row_count, file_path = EXCLUDED.file_path,
+                    file_size = EXCLUDED.file_size, checksum = EXCLUDED.checksum,
+                    status = 'exported', updated_at = NOW()
+                RETURNING id
+            """
+            ),
+            {
+                "tenant_id": tenant_id,
+                "table": spec.name,
+                "first_id": first_id,
+                "last_id": last_id,
+                "min_time": min(times),
+                "max_time": max(times),
+                "cutoff": cutoff,
+                "row_count": len(rows),
+                "file_path": path,
+                "file_size": info["size"],
+                "checksum": info["checksum"],
+            },
+        )
+        batch_id = result.scalar()
+        await db.commit()
+        logger.info("archive_batch_exported", table=spec.name, tenant_id=tenant_id, rows=len(rows), path=path)
+        return batch_id
+
+    async def purge_batch(
+        self,
+        db: AsyncSession,
+        spec: ArchiveTable,
+        tenant_id: int,
+        batch_id: int,
+        first_id: int,
+        last_id: int,
+        cutoff: datetime,
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """
+        Remove do banco as linhas de um lote exportado, em transações curtas.
+
+        O filtro (condomínio, id no intervalo, tempo < corte) é o mesmo da
+        exportação: só remove linhas que estão no arquivo.
+
+        Returns:
+            Linhas removidas
+        """
+        chunk_size = chunk_size or settings.ARCHIVE_DELETE_CHUNK
+        params = {
+            "tenant_id": tenant_id,
+            "first_id": first_id,
+            "last_id": last_id,
+            "cutoff": cutoff,
+            "limit": chunk_size,
+        }
+        removed = 0
+        while True:
+            result = await db.execute(
+                text(
+                    f"""
+                    DELETE FROM {spec.name} WHERE id IN (
+                        SELECT id FROM {spec.name}
+                        WHERE {spec.tenant_filter} AND {spec.time_column} < :cutoff
+                          AND id BETWEEN :first_id AND :last_id
+                        LIMIT :limit
+                    )
+                """
+                ),
+                params,
+            )
+            await db.commit()
+            removed += result.rowcount
+            if result.rowcount < chunk_size:
+                break
+
+        await db.execute(
+            text("UPDATE archive_batches SET status = 'purged', purged_at = NOW(), updated_at = NOW() WHERE id = :id"),
+            {"id": batch_id},
+        )
+        await db.commit()
+        return removed
+
+    # ==================== LEITURA ====================
+
+    async def iter_archived(
+        self,
+        db: AsyncSession,
+        table: str,
+        tenant_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        newest_first: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Percorre as linhas arquivadas de um condomínio no intervalo [start, end).
+
+        Lê um arquivo de lote por vez (no máximo ARCHIVE_BATCH_SIZE linhas em
+        memória). Campos de data voltam como string ISO 8601; a coluna de
+        tempo da tabela é convertida para datetime.
+
+        Usage:
+            async for row in archival_service.iter_archived(db, "audit_logs", 1, start, end):
+                ...
+        """
+        batches = await self._batches(db, "file_path", table, tenant_id, start, end, newest_first)
+        for (path,) in batches:
+            for row in await self._read_batch(table, tenant_id, path, start, end, newest_first):
+                yield row
+
+    async def archived_page(
+        self,
+        db: AsyncSession,
+        table: str,
+        tenant_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        skip: int = 0,
+        take: int = 50,
+        match: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Total de linhas arquivadas no intervalo e a fatia [skip, skip + take), mais recentes primeiro.
+
+        O total vem do manifesto (row_count) para lotes inteiros dentro do
+        intervalo; só são abertos os arquivos das bordas do intervalo e os que
+        cobrem a página. Com `match` (filtro por conteúdo) o manifesto não
+        sabe contar e todos os lotes do intervalo são lidos.
+        """
+        batches = await self._batches(
+            db, "file_path, row_count, min_time, max_time", table, tenant_id, start, end, newest_first=True
+        )
+        total = 0
+        page: List[Dict[str, Any]] = []
+        for path, row_count, min_time, max_time in batches:
+            inside = (start is None or min_time >= start) and (end is None or max_time < end)
+            rows = None
+            if match is not None or not inside:
+                rows = await self._read_batch(table, tenant_id, path, start, end, newest_first=True)
+                if match is not None:
+                    rows = [row for row in rows if match(row)]
+                count = len(rows)
+            else:
+                count = row_count
+            if total < skip + take and total + count > skip:
+                if rows is None:
+                    rows = await self._read_batch(table, tenant_id, path, start, end, newest_first=True)
+                page.extend(rows[max(0, skip - total) : skip + take - total])
+            total += count
+        return total, page
+
+    async def _batches(
+        self,
+        db: AsyncSession,
+        columns: str,
+        table: str,
+        tenant_id: int,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        newest_first: bool,
+    ) -> List[Any]:
+        """Lotes do manifesto que cruzam o intervalo, na ordem de leitura"""
+        where_clauses = ["table_name = :table", "tenant_id = :tenant_id"]
+        params: Dict[str, Any] = {"table": table, "tenant_id": tenant_id}
+        if start:
+            where_clauses.append("max_time >= :start")
+            params["start"] = start
+        if end:
+            where_clauses.append("min_time < :end")
+            params["end"] = end
+        order = "DESC" if newest_first else "ASC"
+        result = await db.execute(
+            text(
+                f"SELECT {columns} FROM archive_batches WHERE {' AND '.join(where_clauses)} "
+                f"ORDER BY max_time {order}, first_id {order}"
+            ),
+            params,
+        )
+        return result.fetchall()
+
+    async def _read_batch(
+        self,
+        table: str,
+        tenant_id: int,
+        path: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        newest_first: bool,
+    ) -> List[Dict[str, Any]]:
+        """Linhas de um arquivo de lote no intervalo [start, end), ordenadas pela coluna de tempo"""
+        if not os.path.exists(path):
+            logger.error("archive_file_missing", table=table, tenant_id=tenant_id, path=path)
+            return []
+        spec = self.tables[table]
+        rows = await asyncio.to_thread(read_archive_file, path)
+        for row in rows:
+            row[spec.time_column] = datetime.fromisoformat(row[spec.time_column])
+        rows.sort(key=lambda row: (row[spec.time_column], row["id"]), reverse=newest_first)
+        return [
+            row
+            for row in rows
+            if not ((start and row[spec.time_column] < start) or (end and row[spec.time_column] >= end))
+        ]
+
+
+# Singleton instance
+archival_service = ArchivalService()
@@ -0,0 +1,938 @@
+"""
+Importação em Massa de Cadastros (unidades, moradores, veículos e pets)
+
+Cadastrar um condomínio novo pelos endpoints unitários significa milhares de
+requisições, cada uma com validação, bcrypt e commit próprios. Aqui a
+planilha (CSV ou XLSX) passa por três etapas:
+
+1. Leitura e validação em streaming, em uma thread (o parse do openpyxl e a
+   validação de até dezenas de milhares de linhas travariam o event loop):
+   cada linha é convertida para os tipos da tabela e os erros são acumulados
+   por linha/coluna, sem montar a planilha inteira em memória. Linhas
+   inválidas não impedem a importação das demais.
+2. Hash das senhas dos moradores em um ProcessPoolExecutor (bcrypt é CPU-bound).
+   Senhas iguais são calculadas uma única vez.
+3. COPY das linhas válidas para uma tabela temporária (staging) e merge
+   set-based: resolve unidades/proprietários, devolve as linhas que o banco
+   rejeita, atualiza as que já existem e insere as novas, tudo em uma
+   transação com lock por condomínio.
+
+Moradores sem senha na planilha (e sem senha padrão) recebem o hash de um
+segredo aleatório descartado: a conta existe, mas só entra após o síndico
+definir uma senha.
+"""
+
+import asyncio
+import csv
+import io
+import itertools
+import os
+import re
+import secrets
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import BadRequestError
+from app.core.logger import get_logger
+from app.core.security import get_password_hash
+from app.services.plate_index import plate_index
+
+logger = get_logger(__name__)
+
+# Classe do pg_advisory_xact_lock(classe, tenant_id): uma importação por condomínio por vez
+IMPORT_LOCK_CLASS = 726_004
+
+CSV_EXTENSIONS = (".csv", ".txt")
+XLSX_EXTENSIONS = (".xlsx", ".xlsm")
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_PLATE_RE = re.compile(r"^[A-Z]{3}[0-9][A-Z0-9][0-9]{2}$")
+_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%y")
+_TRUE = {"1", "s", "sim", "y", "yes", "true", "verdadeiro", "x"}
+_FALSE = {"0", "n", "nao", "no", "false", "falso", ""}
+
+
+def normalize_header(value: Any) -> str:
+    """Cabeçalho sem acento/caixa/pontuação (Número do Apto -> numero_do_apto)"""
+    plain = unicodedata.normalize("NFKD", str(value or "")).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", plain.lower()).strip("_")
+
+
+# ==================== CONVERSORES ====================
+# Recebem o valor bruto da célula (str no CSV; int/float/datetime no XLSX) e
+# retornam o valor tipado ou None; ValueError vira erro da linha.
+
+
+def _blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # XLSX: "101" digitado como número
+    return str(value).strip()
+
+
+def text_value(max_length: int) -> Callable[[Any], Optional[str]]:
+    def parse(value: Any) -> Optional[str]:
+        if _blank(value):
+            return None
+        result = _as_text(value)
+        if len(result) > max_length:
+            raise ValueError(f"máximo de {max_length} caracteres")
+        return result
+
+    return parse
+
+
+def int_value(value: Any) -> Optional[int]:
+    if _blank(value):
+        return None
+    try:
+        number = float(_as_text(value).replace(",", "."))
+    except ValueError:
+        raise ValueError("número inteiro inválido")
+    if not number.is_integer():
+        raise ValueError("número inteiro inválido")
+    return int(number)
+
+
+def decimal_value(value: Any) -> Optional[Decimal]:
+    if _blank(value):
+        return None
+    raw = _as_text(value)
+    if "," in raw:
+        raw = raw.replace(".", "").replace(",", ".")  # 1.234,56
+    try:
+        return Decimal(raw)
+    except InvalidOperation:
+        raise ValueError("número inválido")
+
+
+def date_value(value: Any) -> Optional[date]:
+    if _blank(value):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    raw = _as_text(value)
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError("data inválida (use DD/MM/AAAA)")
+
+
+def bool_value(value: Any) -> Optional[bool]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    raw = normalize_header(value)
+    if raw in _TRUE:
+        return True
+    if raw in _FALSE:
+        return False if raw else None
+    raise ValueError("use sim/não")
+
+
+def email_value(value: Any) -> Optional[str]:
+    if _blank(value):
+        return None
+    raw = _as_text(value).lower()
+    if len(raw) > 255 or not _EMAIL_RE.match(raw):
+        raise ValueError("email inválido")
+    return raw
+
+
+def cpf_value(value: Any) -> Optional[str]:
+    if _blank(value):
+        return None
+    digits = re.sub(r"\D", "", _as_text(value))
+    if isinstance(value, (int, float)):
+        digits = digits.zfill(11)  # célula numérica do XLSX perde os zeros à esquerda
+    if len(digits) != 11:
+        raise ValueError("CPF deve ter 11 dígitos")
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def plate_value(value: Any) -> Optional[str]:
+    if _blank(value):
+        return None
+    plate = re.sub(r"[^A-Z0-9]", "", _as_text(value).upper())
+    if not _PLATE_RE.match(plate):
+        raise ValueError("placa inválida")
+    return plate
+
+
+def password_value(value: Any) -> Optional[str]:
+    if _blank(value):
+        return None
+    raw = _as_text(value)
+    if len(raw) < 8:
+        raise ValueError("senha deve ter ao menos 8 caracteres")
+    return raw
+
+
+def choice_value(options: Dict[str, str]) -> Callable[[Any], Optional[str]]:
+    """Aceita o valor canônico ou um apelido em português (comparação sem acento/caixa)"""
+    lookup = {normalize_header(key): canonical for key, canonical in options.items()}
+    lookup.update({normalize_header(canonical): canonical for canonical in options.values()})
+
+    def parse(value: Any) -> Optional[str]:
+        if _blank(value):
+            return None
+        canonical = lookup.get(normalize_header(value))
+        if canonical is None:
+            raise ValueError(f"valor inválido (use {', '.join(sorted(set(options.values())))})")
+        return canonical
+
+    return parse
+
+
+# ==================== ENTIDADES ====================
+
+
+@dataclass(frozen=True)
+class ImportColumn:
+    """Coluna da planilha / tabela de staging"""
+
+    name: str
+    sql_type: str
+    parse: Callable[[Any], Any]
+    required: bool = False
+    aliases: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """
+    Como importar uma entidade.
+
+    resolve: UPDATEs na staging que preenchem ids (unidade, proprietário)
+    checks: SELECTs (row_number, coluna, mensagem) das linhas que o banco rejeita
+    update/insert/link: merge set-based a partir da staging
+    """
+
+    name: str
+    label: str
+    columns: Tuple[ImportColumn, ...]
+    key: Callable[[Dict[str, Any]], Optional[tuple]]
+    update: str
+    insert: str
+    extra_columns: Tuple[Tuple[str, str], ...] = ()
+    row_check: Optional[Callable[[Dict[str, Any]], List[Tuple[str, str]]]] = None
+    resolve: Tuple[str, ...] = ()
+    checks: Tuple[str, ...] = ()
+    link: Optional[str] = None
+
+    @property
+    def staging(self) -> str:
+        return f"import_{self.name}"
+
+    @property
+    def staging_columns(self) -> List[str]:
+        names = [column.name for column in self.columns if column.name != "password"]
+        return ["row_number", *names, *(name for name, _ in self.extra_columns)]
+
+    def create_staging_sql(self) -> str:
+        columns = [f"{column.name} {column.sql_type}" for column in self.columns if column.name != "password"]
+        columns += [f"{name} {sql_type}" for name, sql_type in self.extra_columns]
+        return f"CREATE TEMP TABLE {self.staging} (row_number integer PRIMARY KEY, {', '.join(columns)}) ON COMMIT DROP"
+
+    def header_map(self) -> Dict[str, str]:
+        """Cabeçalho normalizado -> nome da coluna"""
+        mapping = {}
+        for column in self.columns:
+            for alias in (column.name, *column.aliases):
+                mapping.setdefault(normalize_header(alias), column.name)
+        return mapping
+
+
+# Mesma unidade: bloco vazio e nulo são equivalentes
+UNIT_MATCH = "un.tenant_id = :tid AND coalesce(un.block, '') = coalesce(s.block, '') AND un.number = s.number"
+
+UNIT_COLUMNS = (
+    ImportColumn("block", "varchar(10)", text_value(10), aliases=("bloco", "torre")),
+    ImportColumn("number", "varchar(20)", text_value(20), aliases=("numero", "unidade", "apto", "apartamento")),
+)
+
+OWNER_COLUMNS = (
+    ImportColumn(
+        "owner_email",
+        "varchar(255)",
+        email_value,
+        aliases=("email_proprietario", "proprietario_email", "email_morador", "email"),
+    ),
+    ImportColumn("owner_cpf", "varchar(14)", cpf_value, aliases=("cpf_proprietario", "proprietario_cpf", "cpf")),
+)
+
+OWNER_EXTRA = (("owner_id", "integer"), ("unit_id", "integer"))
+
+# Os ids são resolvidos na staging com joins (hash) antes do merge; sem OR e sem subquery por linha
+RESOLVE_UNIT = f"UPDATE {{staging}} s SET unit_id = un.id FROM units un WHERE s.number IS NOT NULL AND {UNIT_MATCH}"
+
+CHECK_UNIT = (
+    "SELECT row_number, 'number', 'Unidade não encontrada' FROM {staging} WHERE number IS NOT NULL AND unit_id IS NULL"
+)
+
+# Proprietário por email (ou CPF); unidade pela planilha ou, na falta, a unidade principal do proprietário
+RESOLVE_OWNER = (
+    """
+    UPDATE {staging} s SET owner_id = u.id
+    FROM users u
+    WHERE u.tenant_id = :tid AND u.is_deleted = false AND u.email = s.owner_email
+    """,
+    """
+    UPDATE {staging} s SET owner_id = u.id
+    FROM users u
+    WHERE u.tenant_id = :tid AND u.is_deleted = false AND u.cpf = s.owner_cpf AND s.owner_email IS NULL
+    """,
+    RESOLVE_UNIT,
+    """
+    UPDATE {staging} s SET unit_id = ur.unit_id
+    FROM (
+        SELECT DISTINCT ON (user_id) user_id, unit_id FROM unit_residents
+        WHERE is_active = true AND user_id IN (SELECT owner_id FROM {staging})
+        ORDER BY user_id, is_primary DESC, id
+    ) ur
+    WHERE ur.user_id = s.owner_id AND s.number IS NULL
+    """,
+)
+
+CHECK_OWNER = (
+    "SELECT row_number, 'owner_email', 'Proprietário não encontrado' FROM {staging} WHERE owner_id IS NULL",
+    CHECK_UNIT,
+)
+
+
+def _unit_key(row: Dict[str, Any]) -> Optional[tuple]:
+    return ((row.get("block") or "").upper(), row["number"].upper())
+
+
+def _owner_ref(row: Dict[str, Any]) -> Optional[str]:
+    return row.get("owner_email") or row.get("owner_cpf")
+
+
+def _require_owner(row: Dict[str, Any]) -> List[Tuple[str, str]]:
+    if not _owner_ref(row):
+        return [("owner_email", "informe o email ou o CPF do proprietário")]
+    return []
+
+
+def _require_unit_for_resident(row: Dict[str, Any]) -> List[Tuple[str, str]]:
+    if row.get("block") and not row.get("number"):
+        return [("number", "informe o número da unidade")]
+    return []
+
+
+UNITS = EntitySpec(
+    name="units",
+    label="unidades",
+    columns=(
+        ImportColumn("block", "varchar(10)", text_value(10), aliases=("bloco", "torre")),
+        ImportColumn(
+            "number", "varchar(20)", text_value(20), required=True, aliases=("numero", "unidade", "apto", "apartamento")
+        ),
+        ImportColumn("floor", "integer", int_value, aliases=("andar",)),
+        ImportColumn(
+            "unit_type",
+            "varchar(50)",
+            choice_value({"apartamento": "apartment", "casa": "house", "loja": "store", "sala": "store"}),
+            aliases=("tipo",),
+        ),
+        ImportColumn("area", "numeric(10, 2)", decimal_value, aliases=("area_m2", "metragem")),
+        ImportColumn("bedrooms", "integer", int_value, aliases=("quartos",)),
+        ImportColumn("bathrooms", "integer", int_value, aliases=("banheiros",)),
+        ImportColumn("parking_spots", "integer", int_value, aliases=("vagas",)),
+        ImportColumn("ideal_fraction", "numeric(10, 6)", decimal_value, aliases=("fracao_ideal", "fracao")),
+        ImportColumn("is_rented", "boolean", bool_value, aliases=("alugada", "locada")),
+    ),
+    key=_unit_key,
+    update="""
+        UPDATE units un SET
+            floor = coalesce(s.floor, un.floor),
+            unit_type = coalesce(s.unit_type, un.unit_type),
+            area = coalesce(s.area, un.area),
+            bedrooms = coalesce(s.bedrooms, un.bedrooms),
+            bathrooms = coalesce(s.bathrooms, un.bathrooms),
+            parking_spots = coalesce(s.parking_spots, un.parking_spots),
+            ideal_fraction = coalesce(s.ideal_fraction, un.ideal_fraction),
+            is_rented = coalesce(s.is_rented, un.is_rented),
+            is_active = true,
+            updated_at = NOW()
+        FROM import_units s
+        WHERE """
+    + UNIT_MATCH,
+    insert="""
+        INSERT INTO units (tenant_id, block, number, floor, unit_type, area, bedrooms, bathrooms,
+                           parking_spots, ideal_fraction, is_rented, is_active, created_at, updated_at)
+        SELECT :tid, s.block, s.number, s.floor, coalesce(s.unit_type, 'apartment'), s.area, s.bedrooms, s.bathrooms,
+               coalesce(s.parking_spots, 1), s.ideal_fraction, coalesce(s.is_rented, false), true, NOW(), NOW()
+        FROM import_units s
+        WHERE NOT EXISTS (SELECT 1 FROM units un WHERE """
+    + UNIT_MATCH
+    + ")",
+)
+
+RESIDENTS = EntitySpec(
+    name="residents",
+    label="moradores",
+    columns=(
+        ImportColumn("name", "varchar(255)", text_value(255), required=True, aliases=("nome",)),
+        ImportColumn("email", "varchar(255)", email_value, required=True, aliases=("e_mail",)),
+        ImportColumn("cpf", "varchar(14)", cpf_value),
+        ImportColumn("rg", "varchar(20)", text_value(20)),
+        ImportColumn("phone", "varchar(20)", text_value(20), aliases=("telefone", "celular")),
+        ImportColumn("birth_date", "date", date_value, aliases=("nascimento", "data_nascimento")),
+        ImportColumn(
+            "gender",
+            "varchar(1)",
+            choice_value({"masculino": "M", "feminino": "F", "outro": "O"}),
+            aliases=("sexo", "genero"),
+        ),
+        *UNIT_COLUMNS,
+        ImportColumn(
+            "relationship_type",
+            "varchar(50)",
+            choice_value({"proprietario": "owner", "inquilino": "tenant", "morador": "resident"}),
+            aliases=("vinculo", "tipo"),
+        ),
+        ImportColumn("is_primary", "boolean", bool_value, aliases=("responsavel", "titular", "principal")),
+        ImportColumn("password", "text", password_value, aliases=("senha",)),
+    ),
+    key=lambda row: (row["email"],),
+    row_check=_require_unit_for_resident,
+    extra_columns=(("password_hash", "varchar(255)"), ("unit_id", "integer")),
+    resolve=(RESOLVE_UNIT,),
+    checks=(
+        """
+        SELECT s.row_number, 'email', 'Email já cadastrado em outro condomínio'
+        FROM {staging} s JOIN users u ON u.email = s.email
+        WHERE u.tenant_id <> :tid
+        """,
+        # Importação só cria e atualiza moradores: síndico, porteiro e admin não são sobrescritos
+        """
+        SELECT s.row_number, 'email', 'Email pertence a um usuário que não é morador'
+        FROM {staging} s JOIN users u ON u.email = s.email
+        WHERE u.tenant_id = :tid AND u.role <> 1
+        """,
+        """
+        SELECT s.row_number, 'cpf', 'CPF já cadastrado para outro morador'
+        FROM {staging} s
+        WHERE s.cpf IS NOT NULL AND EXISTS (
+            SELECT 1 FROM users u WHERE u.tenant_id = :tid AND u.cpf = s.cpf AND u.email <> s.email
+        )
+        """,
+        CHECK_UNIT,
+    ),
+    # Senha só é trocada quando a planilha traz uma
+    update="""
+        UPDATE users u SET
+            name = s.name,
+            cpf = coalesce(s.cpf, u.cpf),
+            rg = coalesce(s.rg, u.rg),
+            phone = coalesce(s.phone, u.phone),
+            birth_date = coalesce(s.birth_date, u.birth_date),
+            gender = coalesce(s.gender, u.gender),
+            password_hash = coalesce(s.password_hash, u.password_hash),
+            updated_at = NOW()
+        FROM import_residents s
+        WHERE u.email = s.email AND u.tenant_id = :tid AND u.role = 1
+    """,
+    insert="""
+        INSERT INTO users (tenant_id, name, email, password_hash, cpf, rg, phone, birth_date, gender,
+                           role, is_active, is_verified, is_deleted, has_special_needs, created_at, updated_at)
+        SELECT :tid, s.name, s.email, coalesce(s.password_hash, :locked_hash), s.cpf, s.rg, s.phone,
+               s.birth_date, s.gender, 1, true, false, false, false, NOW(), NOW()
+        FROM import_residents s
+        WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.email = s.email)
+    """,
+    link="""
+        INSERT INTO unit_residents (unit_id, user_id, relationship_type, is_primary, is_active, created_at, updated_at)
+        SELECT s.unit_id, u.id, coalesce(s.relationship_type, 'resident'), coalesce(s.is_primary, false),
+               true, NOW(), NOW()
+        FROM import_residents s
+        JOIN users u ON u.email = s.email AND u.tenant_id = :tid AND u.role = 1
+        WHERE s.unit_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM unit_residents ur WHERE ur.unit_id = s.unit_id AND ur.user_id = u.id)
+    """,
+)
+
+VEHICLES = EntitySpec(
+    name="vehicles",
+    label="veículos",
+    columns=(
+        ImportColumn("plate", "varchar(10)", plate_value, required=True, aliases=("placa",)),
+        ImportColumn("model", "varchar(100)", text_value(100), aliases=("modelo",)),
+        ImportColumn("brand", "varchar(100)", text_value(100), aliases=("marca",)),
+        ImportColumn("color", "varchar(50)", text_value(50), aliases=("cor",)),
+        ImportColumn("year", "integer", int_value, aliases=("ano",)),
+        ImportColumn(
+            "vehicle_type",
+            "varchar(20)",
+            choice_value(
+                {
+                    "carro": "car",
+                    "moto": "motorcycle",
+                    "motocicleta": "motorcycle",
+                    "caminhao": "truck",
+                    "bicicleta": "bike",
+                    "outro": "other",
+                }
+            ),
+            aliases=("tipo",),
+        ),
+        ImportColumn("tag_number", "varchar(50)", text_value(50), aliases=("tag",)),
+        ImportColumn("remote_number", "varchar(50)", text_value(50), aliases=("controle",)),
+        *OWNER_COLUMNS,
+        *UNIT_COLUMNS,
+    ),
+    key=lambda row: (row["plate"],),
+    row_check=_require_owner,
+    extra_columns=OWNER_EXTRA,
+    resolve=RESOLVE_OWNER,
+    checks=CHECK_OWNER,
+    update="""
+        UPDATE vehicles v SET
+            owner_id = s.owner_id,
+            unit_id = coalesce(s.unit_id, v.unit_id),
+            model = coalesce(s.model, v.model),
+            brand = coalesce(s.brand, v.brand),
+            color = coalesce(s.color, v.color),
+            year = coalesce(s.year, v.year),
+            vehicle_type = coalesce(s.vehicle_type, v.vehicle_type),
+            tag_number = coalesce(s.tag_number, v.tag_number),
+            remote_number = coalesce(s.remote_number, v.remote_number),
+            is_active = true,
+            updated_at = NOW()
+        FROM import_vehicles s
+        WHERE v.tenant_id = :tid AND v.search_plate = s.plate
+    """,
+    insert="""
+        INSERT INTO vehicles (tenant_id, owner_id, unit_id, plate, model, brand, color, year, vehicle_type,
+                              tag_number, remote_number, is_active, created_at, updated_at)
+        SELECT :tid, s.owner_id, s.unit_id, s.plate, s.model, s.brand, s.color, s.year,
+               coalesce(s.vehicle_type, 'car'), s.tag_number, s.remote_number, true, NOW(), NOW()
+        FROM import_vehicles s
+        WHERE NOT EXISTS (SELECT 1 FROM vehicles v WHERE v.tenant_id = :tid AND v.search_plate = s.plate)
+    """,
+)
+
+PETS = EntitySpec(
+    name="pets",
+    label="pets",
+    columns=(
+        ImportColumn("name", "varchar(100)", text_value(100), required=True, aliases=("nome",)),
+        ImportColumn(
+            "species",
+            "varchar(50)",
+            choice_value(
+                {
+                    "cachorro": "dog",
+                    "cao": "dog",
+                    "gato": "cat",
+                    "passaro": "bird",
+                    "ave": "bird",
+                    "peixe": "fish",
+                    "hamster": "hamster",
+                    "coelho": "rabbit",
+                    "tartaruga": "turtle",
+                    "outro": "other",
+                }
+            ),
+            required=True,
+            aliases=("especie",),
+        ),
+        ImportColumn("breed", "varchar(100)", text_value(100), aliases=("raca",)),
+        ImportColumn("color", "varchar(50)", text_value(50), aliases=("cor",)),
+        ImportColumn(
+            "size",
+            "varchar(20)",
+            choice_value({"pequeno": "small", "medio": "medium", "grande": "large"}),
+            aliases=("porte",),
+        ),
+        ImportColumn("gender", "varchar(1)", choice_value({"macho": "M", "femea": "F"}), aliases=("sexo",)),
+        ImportColumn("birth_date", "date", date_value, aliases=("nascimento", "data_nascimento")),
+        ImportColumn("microchip", "varchar(50)", text_value(50)),
+        ImportColumn("vaccinated", "boolean", bool_value, aliases=("vacinado",)),
+        ImportColumn("neutered", "boolean", bool_value, aliases=("castrado",)),
+        *OWNER_COLUMNS,
+        *UNIT_COLUMNS,
+    ),
+    key=lambda row: (_owner_ref(row), row["name"].lower()),
+    row_check=_require_owner,
+    extra_columns=OWNER_EXTRA,
+    resolve=RESOLVE_OWNER,
+    checks=CHECK_OWNER,
+    update="""
+        UPDATE pets p SET
+            unit_id = coalesce(s.unit_id, p.unit_id),
+            species = s.species,
+            breed = coalesce(s.breed, p.breed),
+            color = coalesce(s.color, p.color),
+            size = coalesce(s.size, p.size),
+            gender = coalesce(s.gender, p.gender),
+            birth_date = coalesce(s.birth_date, p.birth_date),
+            microchip = coalesce(s.microchip, p.microchip),
+            vaccinated = coalesce(s.vaccinated, p.vaccinated),
+            neutered = coalesce(s.neutered, p.neutered),
+            is_active = true,
+            updated_at = NOW()
+        FROM import_pets s
+        WHERE p.tenant_id = :tid AND p.owner_id = s.owner_id AND lower(p.name) = lower(s.name)
+    """,
+    insert="""
+        INSERT INTO pets (tenant_id, owner_id, unit_id, name, species, breed, color, size, gender, birth_date,
+                          microchip, vaccinated, neutered, is_active, created_at, updated_at)
+        SELECT :tid, s.owner_id, s.unit_id, s.name, s.species, s.breed, s.color, s.size, s.gender, s.birth_date,
+               s.microchip, coalesce(s.vaccinated, false), coalesce(s.neutered, false), true, NOW(), NOW()
+        FROM import_pets s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM pets p WHERE p.tenant_id = :tid AND p.owner_id = s.owner_id AND lower(p.name) = lower(s.name)
+        )
+    """,
+)
+
+ENTITIES: Dict[str, EntitySpec] = {spec.name: spec for spec in (UNITS, RESIDENTS, VEHICLES, PETS)}
+
+
+# ==================== LEITURA ====================
+
+
+def _read_csv(stream: BinaryIO) -> Iterator[Sequence[Any]]:
+    sample = stream.read(64 * 1024)
+    stream.seek(0)
+    try:
+        sample.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # Amostra cortada no meio de um caractere continua sendo UTF-8; o resto é o CSV do Excel
+        encoding = "utf-8-sig" if e.start >= len(sample) - 3 else "cp1252"
+
+    wrapper = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    first_line = wrapper.readline()
+    wrapper.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(first_line, delimiters=";,\t|")
+    except csv.Error:
+        dialect = csv.excel
+    try:
+        yield from csv.reader(wrapper, dialect)
+    finally:
+        wrapper.detach()
+
+
+def _read_xlsx(stream: BinaryIO) -> Iterator[Sequence[Any]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(filename: str, stream: BinaryIO) -> Iterator[Sequence[Any]]:
+    """Linhas brutas da planilha (a primeira é o cabeçalho)"""
+    extension = os.path.splitext((filename or "").lower())[1]
+    if extension in CSV_EXTENSIONS:
+        return _read_csv(stream)
+    if extension in XLSX_EXTENSIONS:
+        return _read_xlsx(stream)
+    raise BadRequestError("Formato não suportado: envie um arquivo .csv ou .xlsx")
+
+
+# ==================== RELATÓRIO ====================
+
+
+@dataclass
+class ImportReport:
+    """Resultado da importação, com os erros por linha (linha 1 = cabeçalho)"""
+
+    entity: str
+    dry_run: bool = False
+    total_rows: int = 0
+    valid_rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    linked: int = 0
+    error_count: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    ignored_columns: List[str] = field(default_factory=list)
+    took_ms: float = 0
+
+    def add_error(self, row: int, column: Optional[str], message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "column": column, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "entity": self.entity,
+            "dry_run": self.dry_run,
+            "total_rows": self.total_rows,
+            "valid_rows": self.valid_rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "linked": self.linked,
+            "error_count": self.error_count,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "ignored_columns": self.ignored_columns,
+            "took_ms": self.took_ms,
+        }
+
+
+def validate_rows(spec: EntitySpec, rows: Iterator[Sequence[Any]], report: ImportReport) -> List[Dict[str, Any]]:
+    """
+    Valida as linhas em uma passada e retorna as válidas, já tipadas e com "row_number".
+
+    Erros de cabeçalho (coluna obrigatória ausente) abortam com BadRequestError;
+    erros de conteúdo ficam no relatório e a linha é descartada.
+    """
+    header = next(rows, None)
+    if header is None:
+        raise BadRequestError("Arquivo vazio")
+
+    mapping = spec.header_map()
+    positions: Dict[str, int] = {}
+    for index, title in enumerate(header):
+        name = mapping.get(normalize_header(title))
+        if name is None:
+            if not _blank(title):
+                report.ignored_columns.append(str(title))
+        else:
+            positions.setdefault(name, index)
+
+    missing = [column.name for column in spec.columns if column.required and column.name not in positions]
+    if missing:
+        raise BadRequestError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+    columns = [column for column in spec.columns if column.name in positions]
+    seen: Dict[tuple, int] = {}
+    valid: List[Dict[str, Any]] = []
+
+    for row_number, raw in enumerate(rows, start=2):
+        if all(_blank(value) for value in raw):
+            continue
+        report.total_rows += 1
+        if report.total_rows > settings.IMPORT_MAX_ROWS:
+            raise BadRequestError(f"Arquivo excede o limite de {settings.IMPORT_MAX_ROWS} linhas")
+
+        values: Dict[str, Any] = {"row_number": row_number}
+        errors: List[Tuple[str, str]] = []
+        for column in columns:
+            index = positions[column.name]
+            try:
+                values[column.name] = column.parse(raw[index] if index < len(raw) else None)
+            except ValueError as e:
+                errors.append((column.name, str(e)))
+                continue
+            if column.required and values[column.name] is None:
+                errors.append((column.name, "obrigatório"))
+
+        if not errors and spec.row_check:
+            errors = spec.row_check(values)
+        if not errors:
+            key = spec.key(values)
+            if key in seen:
+                errors.append((None, f"duplicado (linha {seen[key]})"))
+            else:
+                seen[key] = row_number
+
+        for column_name, message in errors:
+            report.add_error(row_number, column_name, message)
+        if not errors:
+            valid.append(values)
+
+    report.valid_rows = len(valid)
+    return valid
+
+
+# ==================== HASH DE SENHAS ====================
+
+
+def _read_and_validate(spec: EntitySpec, filename: str, stream: BinaryIO, report: ImportReport) -> List[Dict[str, Any]]:
+    """Executado em uma thread, fora do event loop"""
+    return validate_rows(spec, read_rows(filename, stream), report)
+
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """Executado nos processos do pool"""
+    return [get_password_hash(password) for password in passwords]
+
+
+class BulkImportService:
+    """
+    Importação de planilhas de cadastro.
+
+    Usage:
+        report = await bulk_import.run(db, tenant_id, "residents", file.filename, file.file)
+    """
+
+    def __init__(self, hash_workers: Optional[int] = None):
+        self.hash_workers = hash_workers or settings.IMPORT_HASH_WORKERS or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.hash_workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def hash_passwords(self, passwords: List[str]) -> Dict[str, str]:
+        """
+        Hash bcrypt de cada senha distinta, dividido entre os processos do pool.
+
+        Senhas iguais (ex.: senha inicial padrão) compartilham o mesmo hash.
+        """
+        distinct = list(dict.fromkeys(passwords))
+        if not distinct:
+            return {}
+        # Alguns lotes por processo: equilibra a carga sem multiplicar o custo de IPC
+        size = -(-len(distinct) // (self.hash_workers * 4))
+        chunks = [distinct[i : i + size] for i in range(0, len(distinct), size)]
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        hashed = await asyncio.gather(*(loop.run_in_executor(pool, _hash_passwords, chunk) for chunk in chunks))
+        return dict(zip(distinct, itertools.chain.from_iterable(hashed)))
+
+    async def _prepare_passwords(
+        self, valid: List[Dict[str, Any]], default_password: Optional[str], dry_run: bool
+    ) -> Optional[str]:
+        """Preenche password_hash das linhas e retorna o hash usado para contas sem senha"""
+        for row in valid:
+            row["password"] = row.get("password") or default_password
+        if dry_run:
+            for row in valid:
+                row["password_hash"] = None
+            return "dry-run"
+
+        missing = any(row["password"] is None for row in valid)
+        secret = secrets.token_urlsafe(32)
+        hashes = await self.hash_passwords(
+            [row["password"] for row in valid if row["password"]] + ([secret] if missing else [])
+        )
+        for row in valid:
+            row["password_hash"] = hashes.get(row["password"]) if row["password"] else None
+        return hashes.get(secret)
+
+    # ==================== IMPORTAÇÃO ====================
+
+    async def _copy(self, db: AsyncSession, spec: EntitySpec, valid: List[Dict[str, Any]]) -> None:
+        """CREATE TEMP TABLE + COPY binário das linhas válidas (na conexão da sessão)"""
+        await db.execute(text(spec.create_staging_sql()))
+        columns = spec.staging_columns
+        records = [tuple(row.get(name) for name in columns) for row in valid]
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(spec.staging, records=records, columns=columns)
+        # Tabela temporária não passa pelo autovacuum: sem estatísticas o planner escolhe nested loops
+        await db.execute(text(f"ANALYZE {spec.staging}"))
+
+    async def _merge(self, db: AsyncSession, spec: EntitySpec, tenant_id: int, report: ImportReport, **params) -> None:
+        params = {"tid": tenant_id, **params}
+        for statement in spec.resolve:
+            await db.execute(text(statement.format(staging=spec.staging)), params)
+
+        rejected = set()
+        for statement in spec.checks:
+            result = await db.execute(text(statement.format(staging=spec.staging)), params)
+            for row_number, column_name, message in result.fetchall():
+                if row_number not in rejected:
+                    rejected.add(row_number)
+                    report.add_error(row_number, column_name, message)
+        if rejected:
+            await db.execute(
+                text(f"DELETE FROM {spec.staging} WHERE row_number = ANY(:rows)"), {"rows": sorted(rejected)}
+            )
+            report.valid_rows -= len(rejected)
+
+        report.updated = (await db.execute(text(spec.update), params)).rowcount
+        report.inserted = (await db.execute(text(spec.insert), params)).rowcount
+        if spec.link:
+            report.linked = (await db.execute(text(spec.link), params)).rowcount
+
+    async def run(
+        self,
+        db: AsyncSession,
+        tenant_id: int,
+        entity: str,
+        filename: str,
+        stream: BinaryIO,
+        dry_run: bool = False,
+        default_password: Optional[str] = None,
+    ) -> ImportReport:
+        """
+        Valida e importa uma planilha. Com dry_run, executa tudo (inclusive as
+        verificações no banco) e desfaz a transação no final.
+        """
+        spec = ENTITIES.get(entity)
+        if spec is None:
+            raise BadRequestError(f"Entidade inválida: use {', '.join(ENTITIES)}")
+        if default_password is not None:
+            default_password = password_value(default_password)
+
+        started = time.perf_counter()
+        report = ImportReport(entity=entity, dry_run=dry_run)
+        valid = await asyncio.to_thread(_read_and_validate, spec, filename, stream, report)
+        validated_ms = (time.perf_counter() - started) * 1000
+
+        locked_hash = None
+        if valid and spec is RESIDENTS:
+            locked_hash = await self._prepare_passwords(valid, default_password, dry_run)
+        hashed_ms = (time.perf_counter() - started) * 1000
+
+        if valid:
+            try:
+                await db.execute(
+                    text("SELECT pg_advisory_xact_lock(:lock_class, :tid)"),
+                    {"lock_class": IMPORT_LOCK_CLASS, "tid": tenant_id},
+                )
+                await self._copy(db, spec, valid)
+                await self._merge(db, spec, tenant_id, report, locked_hash=locked_hash)
+                if dry_run:
+                    await db.rollback()
+                else:
+                    await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+        if spec is VEHICLES and report.inserted + report.updated and not dry_run:
+            plate_index.invalidate(tenant_id)
+
+        report.took_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(
+            "bulk_import_finished",
+            tenant_id=tenant_id,
+            entity=entity,
+            dry_run=dry_run,
+            rows=report.total_rows,
+            inserted=report.inserted,
+            updated=report.updated,
+            errors=report.error_count,
+            validate_ms=round(validated_ms, 2),
+            hash_ms=round(hashed_ms - validated_ms, 2),
+            took_ms=report.took_ms,
+        )
+        return report
+
+
+# Singleton instance
+bulk_import = BulkImportService()
@@ -4,7 +4,7 @@ Redis Cache Service
 
 import json
 from datetime import timedelta
-from typing import Any, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 import redis.asyncio as redis
 from redis.asyncio.connection import ConnectionPool
@@ -21,6 +21,9 @@ class RedisCache:
     def __init__(self):
         self._pool: Optional[ConnectionPool] = None
         self._client: Optional[redis.Redis] = None
+        # Cliente sem decode_responses para valores binários (respostas comprimidas)
+        self._binary_pool: Optional[ConnectionPool] = None
+        self._binary: Optional[redis.Redis] = None
 
     async def connect(self):
         """Conecta ao Redis"""
@@ -35,10 +38,18 @@ class RedisCache:
 
                 # Test connection
                 await self._client.ping()
+
+                self._binary_pool = ConnectionPool.from_url(
+                    settings.REDIS_URL,
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    decode_responses=False,
+                )
+                self._binary = redis.Redis(connection_pool=self._binary_pool)
                 logger.info("redis_connected", url=settings.REDIS_URL)
             except Exception as e:
                 logger.error("redis_connection_failed", error=str(e))
                 self._client = None
+                self._binary = None
 
     async def disconnect(self):
         """Desconecta do Redis"""
@@ -49,6 +60,12 @@ class RedisCache:
             self._client = None
             self._pool = None
             logger.info("redis_disconnected")
+        if self._binary:
+            await self._binary.close()
+            if self._binary_pool:
+                await self._binary_pool.disconnect()
+            self._binary = None
+            self._binary_pool = None
 
     @property
     def is_connected(self) -> bool:
@@ -185,6 +202,38 @@ class RedisCache:
         except Exception:
             return False
 
+    async def get_fields(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        """
+        Lê campos de um hash sem decodificar (bytes).
+
+        Returns:
+            Um valor por campo, None para campos ausentes (ou Redis indisponível)
+        """
+        if not self._binary:
+            return [None] * len(fields)
+
+        try:
+            return await self._binary.hmget(key, fields)
+        except Exception as e:
+            logger.warning("cache_get_fields_error", key=key, error=str(e))
+            return [None] * len(fields)
+
+    async def set_fields(self, key: str, mapping: Dict[str, bytes], ttl: int) -> bool:
+        """Grava um hash de valores binários substituindo o anterior, com TTL"""
+        if not self._binary:
+            return False
+
+        try:
+            async with self._binary.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, ttl)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning("cache_set_fields_error", key=key, error=str(e))
+            return False
+
 
 # Singleton instance
 cache = RedisCache()
@@ -0,0 +1,711 @@
+"""
+Sincronização Delta de Credenciais com o Hardware
+
+Enviar a cada sincronização todos os moradores, faces, tags, QR Codes e
+veículos para cada controlador leva minutos em condomínios grandes e satura
+os links lentos dos equipamentos. Aqui cada integração recebe só o que mudou:
+
+- triggers (migration 008) anotam em credenciais_journal as entidades
+  afetadas por cada comando; cada integração guarda, por tipo, a posição do
+  journal já aplicada (integracoes_sync_estado);
+- para as entidades alteradas desde o watermark, o registro atual é
+  comparado com o hash do que a integração já recebeu
+  (integracoes_sync_itens), gerando inclusões, alterações e remoções;
+  alterações que não mudam a credencial (ex.: last_login) não geram envio;
+- as operações são agrupadas em lotes no limite de bytes e de itens do
+  parceiro e enviadas com concorrência limitada por equipamento; várias
+  integrações sincronizam em paralelo;
+- cada lote leva um Idempotency-Key derivado do conteúdo: a retentativa
+  (erros de rede, 429 e 5xx, com backoff exponencial) e a reexecução após
+  uma falha parcial reenviam o mesmo lote com a mesma chave;
+- o watermark só avança quando todos os lotes da rodada foram aceitos, e os
+  hashes dos lotes aceitos são gravados, então a próxima rodada reenvia só
+  o que faltou.
+
+A primeira sincronização (ou com completo=True, ou após um tempo parado maior
+que a retenção do journal) reconcilia todos os registros, ainda enviando
+apenas as diferenças em relação ao que a integração já tem. O resultado e as
+estatísticas de cada lote ficam em sincronizacoes_log.detalhes.
+
+O protocolo é um POST JSON genérico em {base_url}{sync_path} da configuração
+da integração; os limites por parceiro podem ser ajustados pela config
+(sync_max_bytes, sync_max_itens, sync_concorrencia, sync_path).
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Status HTTP que justificam nova tentativa do mesmo lote
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class PartnerProfile:
+    """Limites de envio de um parceiro"""
+
+    max_payload_bytes: int
+    max_itens: int
+    concorrencia: int  # lotes simultâneos por equipamento
+    path: str = "/api/conecta/credenciais"
+
+
+PARTNER_PROFILES: Dict[str, PartnerProfile] = {
+    "intelbras": PartnerProfile(max_payload_bytes=64 * 1024, max_itens=100, concorrencia=2),
+    "controlid": PartnerProfile(max_payload_bytes=256 * 1024, max_itens=500, concorrencia=1),
+    "hikvision": PartnerProfile(max_payload_bytes=32 * 1024, max_itens=50, concorrencia=2),
+    "linear": PartnerProfile(max_payload_bytes=16 * 1024, max_itens=50, concorrencia=1),
+    "nice": PartnerProfile(max_payload_bytes=16 * 1024, max_itens=50, concorrencia=1),
+}
+DEFAULT_PROFILE = PartnerProfile(max_payload_bytes=64 * 1024, max_itens=100, concorrencia=1)
+
+
+def partner_profile(parceiro: str, config: Optional[Dict[str, Any]] = None) -> PartnerProfile:
+    """Limites do parceiro com os ajustes da config da integração"""
+    base = PARTNER_PROFILES.get(parceiro, DEFAULT_PROFILE)
+    config = config or {}
+    return PartnerProfile(
+        max_payload_bytes=int(config.get("sync_max_bytes", base.max_payload_bytes)),
+        max_itens=int(config.get("sync_max_itens", base.max_itens)),
+        concorrencia=max(int(config.get("sync_concorrencia", base.concorrencia)), 1),
+        path=config.get("sync_path", base.path),
+    )
+
+
+MORADORES_SQL = """
+    SELECT u.id, u.name AS nome, u.cpf, u.photo_url,
+           array_agg(DISTINCT concat_ws('-', un.block, un.number) ORDER BY concat_ws('-', un.block, un.number))
+               FILTER (WHERE un.id IS NOT NULL) AS unidades,
+           (SELECT array_agg(s.numero_tag ORDER BY s.numero_tag) FROM acessos_solicitacoes s
+             WHERE s.morador_id = u.id AND s.tipo = 'tag' AND s.status = 'aprovado') AS tags,
+           (SELECT s.imagem_url FROM acessos_solicitacoes s
+             WHERE s.morador_id = u.id AND s.tipo = 'facial' AND s.status = 'aprovado'
+             ORDER BY s.updated_at DESC LIMIT 1) AS face_url
+    FROM users u
+    LEFT JOIN unit_residents ur ON ur.user_id = u.id AND ur.is_active = true
+    LEFT JOIN units un ON un.id = ur.unit_id
+    WHERE u.tenant_id = :tid AND u.is_active = true AND u.role = 1 {where}
+    GROUP BY u.id
+"""
+
+VISITANTES_SQL = """
+    SELECT id, visitante_nome AS nome, visitante_documento AS documento, visitante_tipo AS tipo,
+           qr_code, veiculo_placa AS placa, data_inicio, data_fim, horario_inicio, horario_fim, dias_semana,
+           ponto_acesso_id
+    FROM pre_autorizacoes
+    WHERE tenant_id = :tid AND status = 'ativa' AND data_fim >= CURRENT_DATE {where}
+"""
+
+VEICULOS_SQL = """
+    SELECT v.id, v.plate AS placa, v.tag_number AS tag, v.remote_number AS controle, v.owner_id AS morador_id,
+           v.model AS modelo, v.color AS cor
+    FROM vehicles v
+    WHERE v.tenant_id = :tid AND v.is_active = true {where}
+"""
+
+
+@dataclass(frozen=True)
+class SyncSource:
+    """Origem das credenciais de um tipo de sincronização"""
+
+    flag: str  # coluna sync_* da integração
+    sql: str  # registros elegíveis; {where} recebe o filtro por ids
+    id_column: str
+    expira: Optional[str] = None  # campo com a data em que o registro deixa de valer
+
+
+SYNC_SOURCES: Dict[str, SyncSource] = {
+    "moradores": SyncSource("sync_moradores", MORADORES_SQL, "u.id"),
+    "visitantes": SyncSource("sync_visitantes", VISITANTES_SQL, "id", expira="data_fim"),
+    "veiculos": SyncSource("sync_veiculos", VEICULOS_SQL, "v.id"),
+}
+
+# Tabela -> (tipo, coluna do id, tenant via units) - espelhado na migration 008
+JOURNAL_SOURCES: Dict[str, Tuple[str, str, bool]] = {
+    "users": ("moradores", "id", False),
+    "unit_residents": ("moradores", "user_id", True),
+    "acessos_solicitacoes": ("moradores", "morador_id", False),
+    "pre_autorizacoes": ("visitantes", "id", False),
+    "vehicles": ("veiculos", "id", False),
+}
+
+
+def _json(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def record_hash(dados: Dict[str, Any]) -> str:
+    return hashlib.md5(_json(dados)).hexdigest()
+
+
+@dataclass
+class SyncOp:
+    op: str  # add, update, remove
+    entidade_id: int
+    dados: Optional[Dict[str, Any]] = None
+    hash: Optional[str] = None
+    expira_em: Optional[date] = None
+
+    def payload(self) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"op": self.op, "id": self.entidade_id}
+        if self.dados is not None:
+            item["dados"] = self.dados
+        return item
+
+
+def compute_delta(
+    desired: Dict[int, Dict[str, Any]],
+    current: Dict[int, str],
+    ids: Optional[Iterable[int]] = None,
+    expira: Optional[str] = None,
+) -> List[SyncOp]:
+    """
+    Operações mínimas para levar a integração de `current` (hashes já
+    enviados) a `desired` (registros elegíveis), restritas a `ids` quando
+    informado (modo delta) ou sobre tudo (reconciliação completa).
+    """
+    candidates = set(desired) | set(current) if ids is None else set(ids)
+    ops: List[SyncOp] = []
+    for entidade_id in sorted(candidates):
+        dados = desired.get(entidade_id)
+        if dados is None:
+            if entidade_id in current:
+                ops.append(SyncOp("remove", entidade_id))
+            continue
+        digest = record_hash(dados)
+        known = current.get(entidade_id)
+        if known == digest:
+            continue
+        ops.append(
+            SyncOp(
+                "add" if known is None else "update",
+                entidade_id,
+                dados=dados,
+                hash=digest,
+                expira_em=dados.get(expira) if expira else None,
+            )
+        )
+    return ops
+
+
+@dataclass
+class Batch:
+    key: str  # Idempotency-Key: estável para o mesmo conteúdo
+    ops: List[SyncOp]
+    body: bytes
+
+
+def pack_batches(integracao_id: int, tipo_sync: str, ops: List[SyncOp], profile: PartnerProfile) -> List[Batch]:
+    """Agrupa as operações em lotes dentro dos limites de bytes e itens do parceiro"""
+    envelope = len(_json({"tipo": tipo_sync, "lote": "x" * 32, "operacoes": []}))
+    batches: List[Batch] = []
+    current: List[SyncOp] = []
+    encoded: List[bytes] = []
+    size = envelope
+
+    def close():
+        items = b"[" + b",".join(encoded) + b"]"
+        key = hashlib.sha256(f"{integracao_id}:{tipo_sync}:".encode() + items).hexdigest()[:32]
+        body = b'{"lote":"%s","operacoes":%s,"tipo":"%s"}' % (key.encode(), items, tipo_sync.encode())
+        batches.append(Batch(key=key, ops=list(current), body=body))
+
+    for op in ops:
+        item = _json(op.payload())
+        if current and (size + len(item) + 1 > profile.max_payload_bytes or len(current) >= profile.max_itens):
+            close()
+            current, encoded, size = [], [], envelope
+        current.append(op)
+        encoded.append(item)
+        size += len(item) + 1
+    if current:
+        close()
+    return batches
+
+
+@dataclass
+class BatchResult:
+    key: str
+    ops: List[SyncOp]
+    bytes: int
+    tentativas: int
+    sucesso: bool
+    duracao_ms: float
+    erro: Optional[str] = None
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {"add": 0, "update": 0, "remove": 0}
+        for op in self.ops:
+            counts[op.op] += 1
+        return {
+            "lote": self.key,
+            "itens": len(self.ops),
+            "adicionados": counts["add"],
+            "atualizados": counts["update"],
+            "removidos": counts["remove"],
+            "bytes": self.bytes,
+            "tentativas": self.tentativas,
+            "status": "sucesso" if self.sucesso else "erro",
+            "duracao_ms": round(self.duracao_ms, 1),
+            "erro": self.erro,
+        }
+
+
+@dataclass
+class SyncPlan:
+    modo: str  # delta, completo
+    ops: List[SyncOp]
+    inicio: Tuple[int, int]  # (xid, id) do journal já aplicado
+    fim: Tuple[int, int]  # posição após aplicar a rodada
+    mais: bool = False  # página do journal cheia: há outra rodada
+
+
+@dataclass
+class SyncRun:
+    integracao_id: int
+    tipo_sync: str
+    modo: str = "delta"
+    lotes: List[BatchResult] = field(default_factory=list)
+    watermark_inicial: Tuple[int, int] = (0, 0)
+    watermark_final: Tuple[int, int] = (0, 0)
+
+    @property
+    def total(self) -> int:
+        return sum(len(result.ops) for result in self.lotes)
+
+    @property
+    def sucesso(self) -> int:
+        return sum(len(result.ops) for result in self.lotes if result.sucesso)
+
+    @property
+    def status(self) -> str:
+        if self.sucesso == self.total:
+            return "sucesso"
+        return "parcial" if self.sucesso else "erro"
+
+
+class CredentialSyncService:
+    """Sincronização delta das credenciais com as integrações de hardware"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        # transport: permite apontar o cliente HTTP para um transporte próprio (testes, proxies)
+        self._transport = transport
+
+    # ==================== ENVIO ====================
+
+    async def _send(self, client: httpx.AsyncClient, path: str, batch: Batch) -> BatchResult:
+        """POST de um lote com retentativas idempotentes"""
+        started = time.perf_counter()
+        error = None
+        attempts = 0
+        for attempts in range(1, settings.CREDENTIAL_SYNC_MAX_RETRIES + 2):
+            try:
+                response = await client.post(
+                    path,
+                    content=batch.body,
+                    headers={"Content-Type": "application/json", "Idempotency-Key": batch.key},
+                )
+            except httpx.TransportError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                if response.status_code < 300:
+                    error = None
+                    break
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUS:
+                    break
+            if attempts <= settings.CREDENTIAL_SYNC_MAX_RETRIES:
+                await asyncio.sleep(settings.CREDENTIAL_SYNC_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+        return BatchResult(
+            key=batch.key,
+            ops=batch.ops,
+            bytes=len(batch.body),
+            tentativas=attempts,
+            sucesso=error is None,
+            duracao_ms=(time.perf_counter() - started) * 1000,
+            erro=error,
+        )
+
+    async def push(self, integracao: Any, profile: PartnerProfile, batches: List[Batch]) -> List[BatchResult]:
+        """Envia os lotes para o equipamento com no máximo profile.concorrencia em paralelo"""
+        if not batches:
+            return []
+        config = integracao.config or {}
+        headers = {"Authorization": f"Bearer {config['api_key']}"} if config.get("api_key") else {}
+        limit = asyncio.Semaphore(profile.concorrencia)
+
+        async def send(batch: Batch) -> BatchResult:
+            async with limit:
+                return await self._send(client, profile.path, batch)
+
+        async with httpx.AsyncClient(
+            base_url=config.get("base_url", ""),
+            headers=headers,
+            timeout=settings.CREDENTIAL_SYNC_TIMEOUT_SECONDS,
+            transport=self._transport,
+        ) as client:
+            return await asyncio.gather(*(send(batch) for batch in batches))
+
+    # ==================== PLANEJAMENTO ====================
+
+    async def _load(
+        self, db: AsyncSession, tenant_id: int, source: SyncSource, ids: Optional[Iterable[int]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Registros elegíveis (todos ou só os ids informados)"""
+        params: Dict[str, Any] = {"tid": tenant_id}
+        where = ""
+        if ids is not None:
+            params["ids"] = list(ids)
+            if not params["ids"]:
+                return {}
+            where = f"AND {source.id_column} = ANY(:ids)"
+        result = await db.execute(text(source.sql.format(where=where)), params)
+        return {row.id: dict(row._mapping) for row in result.fetchall()}
+
+    async def _current(
+        self, db: AsyncSession, integracao_id: int, tipo_sync: str, ids: Optional[Iterable[int]]
+    ) -> Dict[int, str]:
+        """Hashes do que a integração já recebeu"""
+        params: Dict[str, Any] = {"iid": integracao_id, "tipo": tipo_sync}
+        where = ""
+        if ids is not None:
+            params["ids"] = list(ids)
+            where = "AND entidade_id = ANY(:ids)"
+        result = await db.execute(
+            text(
+                "SELECT entidade_id, hash FROM integracoes_sync_itens "
+                f"WHERE integracao_id = :iid AND tipo_sync = :tipo {where}"
+            ),
+            params,
+        )
+        return {row.entidade_id: row.hash for row in result.fetchall()}
+
+    async def plan(self, db: AsyncSession, integracao: Any, tipo_sync: str, completo: bool = False) -> SyncPlan:
+        """Operações de uma rodada: delta a partir do watermark ou reconciliação completa"""
+        source = SYNC_SOURCES[tipo_sync]
+        params = {
+            "iid": integracao.id,
+            "tid": integracao.tenant_id,
+            "tipo": tipo_sync,
+            "dias": settings.CREDENTIAL_SYNC_JOURNAL_RETENTION_DAYS,
+        }
+        estado = (
+            await db.execute(
+                text(
+                    """
+                    SELECT watermark_xid, watermark_id,
+                           updated_at < NOW() - make_interval(days => :dias) AS expirado
+                    FROM integracoes_sync_estado
+                    WHERE integracao_id = :iid AND tipo_sync = :tipo
+                """
+                ),
+                params,
+            )
+        ).fetchone()
+        # Transações abaixo do xmin já terminaram: suas linhas do journal estão todas visíveis
+        params["xmin"] = (
+            await db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+        ).scalar()
+
+        if completo or estado is None or estado.expirado:
+            # Reconciliação completa: a posição atual do journal vira o watermark
+            last = (
+                await db.execute(
+                    text(
+                        """
+                        SELECT xid, id FROM credenciais_journal
+                        WHERE tenant_id = :tid AND tipo_sync = :tipo AND xid < :xmin
+                        ORDER BY xid DESC, id DESC LIMIT 1
+                    """
+                    ),
+                    params,
+                )
+            ).fetchone()
+            inicio = (estado.watermark_xid, estado.watermark_id) if estado else (0, 0)
+            desired = await self._load(db, integracao.tenant_id, source, None)
+            current = await self._current(db, integracao.id, tipo_sync, None)
+            ops = compute_delta(desired, current, expira=source.expira)
+            return SyncPlan("completo", ops, inicio, (last.xid, last.id) if last else inicio)
+
+        inicio = (estado.watermark_xid, estado.watermark_id)
+        params.update({"wxid": inicio[0], "wid": inicio[1], "page": settings.CREDENTIAL_SYNC_JOURNAL_PAGE})
+        rows = (
+            await db.execute(
+                text(
+                    """
+                    SELECT xid, id, entidade_id FROM credenciais_journal
+                    WHERE tenant_id = :tid AND tipo_sync = :tipo AND xid < :xmin AND (xid, id) > (:wxid, :wid)
+                    ORDER BY xid, id LIMIT :page
+                """
+                ),
+                params,
+            )
+        ).fetchall()
+        ids = {row.entidade_id for row in rows}
+        if source.expira:
+            # Registros vencidos não passam pelo journal: saem pela data guardada no envio
+            expired = await db.execute(
+                text(
+                    "SELECT entidade_id FROM integracoes_sync_itens "
+                    "WHERE integracao_id = :iid AND tipo_sync = :tipo AND expira_em < CURRENT_DATE"
+                ),
+                params,
+            )
+            ids.update(row.entidade_id for row in expired.fetchall())
+
+        desired = await self._load(db, integracao.tenant_id, source, ids)
+        current = await self._current(db, integracao.id, tipo_sync, ids)
+        ops = compute_delta(desired, current, ids, expira=source.expira)
+        fim = (rows[-1].xid, rows[-1].id) if rows else inicio
+        return SyncPlan("delta", ops, inicio, fim, mais=len(rows) == settings.CREDENTIAL_SYNC_JOURNAL_PAGE)
+
+    # ==================== APLICAÇÃO ====================
+
+    async def apply(
+        self, db: AsyncSession, integracao_id: int, tipo_sync: str, plan: SyncPlan, results: List[BatchResult]
+    ) -> bool:
+        """Grava o estado dos lotes aceitos e avança o watermark se todos foram aceitos"""
+        upserts = []
+        removes = []
+        for result in results:
+            if not result.sucesso:
+                continue
+            for op in result.ops:
+                if op.op == "remove":
+                    removes.append(op.entidade_id)
+                else:
+                    upserts.append(
+                        {
+                            "iid": integracao_id,
+                            "tipo": tipo_sync,
+                            "eid": op.entidade_id,
+                            "hash": op.hash,
+                            "expira": op.expira_em,
+                        }
+                    )
+
+        if upserts:
+            await db.execute(
+                text(
+                    """
+                    INSERT INTO integracoes_sync_itens (integracao_id, tipo_sync, entidade_id, hash, expira_em)
+                    VALUES (:iid, :tipo, :eid, :hash, :expira)
+                    ON CONFLICT (integracao_id, tipo_sync, entidade_id)
+                    DO UPDATE SET hash = EXCLUDED.hash, expira_em = EXCLUDED.expira_em, synced_at = NOW()
+                """
+                ),
+                upserts,
+            )
+        if removes:
+            await db.execute(
+                text(
+                    "DELETE FROM integracoes_sync_itens "
+                    "WHERE integracao_id = :iid AND tipo_sync = :tipo AND entidade_id = ANY(:ids)"
+                ),
+                {"iid": integracao_id, "tipo": tipo_sync, "ids": removes},
+            )
+
+        complete = all(result.sucesso for result in results)
+        if complete:
+            await db.execute(
+                text(
+                    """
+                    INSERT INTO integracoes_sync_estado (integracao_id, tipo_sync, watermark_xid, watermark_id)
+                    VALUES (:iid, :tipo, :wxid, :wid)
+                    ON CONFLICT (integracao_id, tipo_sync)
+                    DO UPDATE SET watermark_xid = :wxid, watermark_id = :wid, updated_at = NOW()
+                """
+                ),
+                {"iid": integracao_id, "tipo": tipo_sync, "wxid": plan.fim[0], "wid": plan.fim[1]},
+            )
+        return complete
+
+    # ==================== EXECUÇÃO ====================
+
+    async def sync_integracao(
+        self,
+        db: AsyncSession,
+        integracao: Any,
+        tipo_sync: str,
+        completo: bool = False,
+        lock: Optional[asyncio.Lock] = None,
+    ) -> Dict[str, Any]:
+        """
+        Sincroniza um tipo de credencial com uma integração e registra o
+        resultado em sincronizacoes_log.
+
+        lock protege a sessão quando várias integrações rodam em paralelo:
+        só o envio HTTP acontece fora dele.
+
+        Usage:
+            resumo = await credential_sync.sync_integracao(db, integracao_row, "moradores")
+        """
+        lock = lock or asyncio.Lock()
+        profile = partner_profile(integracao.parceiro, integracao.config)
+        run = SyncRun(integracao_id=integracao.id, tipo_sync=tipo_sync)
+        started = time.perf_counter()
+
+        async with lock:
+            log_id = (
+                await db.execute(
+                    text(
+                        """
+                        INSERT INTO sincronizacoes_log (
+                            integracao_id, tipo_sync, direcao, status, iniciado_em, created_at
+                        ) VALUES (:iid, :tipo, 'push', 'processando', NOW(), NOW())
+                        RETURNING id
+                    """
+                    ),
+                    {"iid": integracao.id, "tipo": tipo_sync},
+                )
+            ).scalar()
+            await db.commit()
+
+        error = None
+        try:
+            while True:
+                async with lock:
+                    plan = await self.plan(db, integracao, tipo_sync, completo=completo)
+                if not run.lotes:
+                    run.modo = plan.modo
+                    run.watermark_inicial = run.watermark_final = plan.inicio
+
+                results = await self.push(
+                    integracao, profile, pack_batches(integracao.id, tipo_sync, plan.ops, profile)
+                )
+                run.lotes.extend(results)
+
+                async with lock:
+                    complete = await self.apply(db, integracao.id, tipo_sync, plan, results)
+                    await db.commit()
+                if not complete:
+                    break
+                run.watermark_final = plan.fim
+                if not plan.mais:
+                    break
+                completo = False
+        except Exception as exc:  # registra a falha no log antes de propagar
+            error = f"{type(exc).__name__}: {exc}"
+            async with lock:
+                await db.rollback()
+            raise
+        finally:
+            failed = [result.erro for result in run.lotes if not result.sucesso]
+            error = error or (failed[0] if failed else None)
+            status = "erro" if error and not run.sucesso else run.status
+            detalhes = {
+                "modo": run.modo,
+                "parceiro": integracao.parceiro,
+                "watermark_inicial": list(run.watermark_inicial),
+                "watermark_final": list(run.watermark_final),
+                "lotes": [result.stats() for result in run.lotes],
+            }
+            async with lock:
+                await db.execute(
+                    text(
+                        """
+                        UPDATE sincronizacoes_log
+                        SET status = :status, registros_total = :total, registros_sucesso = :sucesso,
+                            registros_erro = :erro_count, erro_mensagem = :erro, detalhes = :detalhes,
+                            finalizado_em = NOW(), duracao_ms = :duracao
+                        WHERE id = :id
+                    """
+                    ),
+                    {
+                        "id": log_id,
+                        "status": status,
+                        "total": run.total,
+                        "sucesso": run.sucesso,
+                        "erro_count": run.total - run.sucesso,
+                        "erro": error,
+                        "detalhes": json.dumps(detalhes),
+                        "duracao": int((time.perf_counter() - started) * 1000),
+                    },
+                )
+                await db.execute(
+                    text("UPDATE integracoes_hardware SET last_sync_at = NOW(), last_error = :erro WHERE id = :id"),
+                    {"id": integracao.id, "erro": error},
+                )
+                await db.commit()
+
+        logger.info(
+            "credential_sync_done",
+            integracao_id=integracao.id,
+            tipo_sync=tipo_sync,
+            modo=run.modo,
+            status=status,
+            registros=run.total,
+            lotes=len(run.lotes),
+            duracao_ms=int((time.perf_counter() - started) * 1000),
+        )
+        return {
+            "log_id": log_id,
+            "integracao_id": integracao.id,
+            "tipo_sync": tipo_sync,
+            "modo": run.modo,
+            "status": status,
+            "registros_total": run.total,
+            "registros_sucesso": run.sucesso,
+            "registros_erro": run.total - run.sucesso,
+            "lotes": len(run.lotes),
+        }
+
+    async def sync_tenant(
+        self, db: AsyncSession, tenant_id: int, tipos: Optional[Iterable[str]] = None, completo: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Sincroniza todas as integrações ativas do condomínio em paralelo
+        (até CREDENTIAL_SYNC_MAX_INTEGRATIONS ao mesmo tempo); os tipos de uma
+        mesma integração rodam em sequência para respeitar o limite do equipamento.
+        """
+        result = await db.execute(
+            text(
+                "SELECT * FROM integracoes_hardware "
+                "WHERE tenant_id = :tid AND is_active = true AND status = 'ativo' ORDER BY id"
+            ),
+            {"tid": tenant_id},
+        )
+        integracoes = result.fetchall()
+        selected = list(tipos) if tipos is not None else list(SYNC_SOURCES)
+        lock = asyncio.Lock()
+        limit = asyncio.Semaphore(settings.CREDENTIAL_SYNC_MAX_INTEGRATIONS)
+
+        async def run(integracao) -> List[Dict[str, Any]]:
+            resumos = []
+            async with limit:
+                for tipo_sync in selected:
+                    if getattr(integracao, SYNC_SOURCES[tipo_sync].flag, False):
+                        resumos.append(await self.sync_integracao(db, integracao, tipo_sync, completo, lock=lock))
+            return resumos
+
+        grouped = await asyncio.gather(*(run(integracao) for integracao in integracoes))
+        return [resumo for resumos in grouped for resumo in resumos]
+
+    async def prune_journal(self, db: AsyncSession) -> int:
+        """
+        Remove do journal as linhas além da retenção. Integrações paradas há mais
+        tempo que isso fazem reconciliação completa na próxima sincronização.
+        """
+        result = await db.execute(
+            text("DELETE FROM credenciais_journal WHERE created_at < NOW() - make_interval(days => :dias)"),
+            {"dias": settings.CREDENTIAL_SYNC_JOURNAL_RETENTION_DAYS},
+        )
+        await db.commit()
+        return result.rowcount
+
+
+# Singleton instance
+credential_sync = CredentialSyncService()
@@ -0,0 +1,90 @@
+"""
+Versões de Dados por Condomínio - detecção barata de mudanças
+
+Cada domínio (visitas, encomendas, acessos, ...) tem um contador monotônico
+por condomínio em tenant_data_versions. Triggers por comando nas tabelas do
+domínio (migration 007) incrementam o contador na mesma transação da
+escrita, então todo caminho de escrita é coberto, inclusive imports em lote
+e scripts fora da API.
+
+Quem faz polling (frontend, cache de respostas, ETags) lê as versões com
+uma consulta por chave primária e só refaz o trabalho dos domínios que
+mudaram. O cursor entregue ao cliente ("visitas:12,encomendas:40") é o
+conjunto das versões vistas; GET /changes?since=<cursor> responde quais
+domínios avançaram desde então.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Domínio -> tabelas com trigger (espelhado na migration 007)
+DATA_DOMAINS: Dict[str, List[str]] = {
+    "visitas": ["visitas", "visitors", "pre_autorizacoes"],
+    "encomendas": ["packages"],
+    "acessos": ["access_logs", "acessos_solicitacoes"],
+    "notificacoes": ["notifications"],
+    "reservas": ["reservations", "common_areas"],
+    "comunicados": ["announcements"],
+    "ocorrencias": ["occurrences"],
+    "manutencao": ["maintenance_tickets"],
+    "moradores": ["users", "units", "dependents", "vehicles", "pets"],
+    "portaria": ["logbook", "comunicacoes_portaria"],
+    "dispositivos": ["devices", "device_requests"],
+    "classificados": ["classificados_anuncios"],
+    "achados_perdidos": ["lost_found"],
+    "pesquisas": ["surveys"],
+    "faq": ["faq"],
+}
+
+
+def parse_cursor(cursor: Optional[str]) -> Dict[str, int]:
+    """'visitas:12,encomendas:40' -> {"visitas": 12, "encomendas": 40} (itens inválidos são ignorados)"""
+    versions: Dict[str, int] = {}
+    for item in (cursor or "").split(","):
+        domain, _, version = item.strip().partition(":")
+        if domain in DATA_DOMAINS and version.isdigit():
+            versions[domain] = int(version)
+    return versions
+
+
+def format_cursor(versions: Dict[str, int]) -> str:
+    return ",".join(f"{domain}:{version}" for domain, version in versions.items())
+
+
+class DataVersionService:
+    """Leitura dos contadores de versão por condomínio"""
+
+    async def get(self, db: AsyncSession, tenant_id: int, domains: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Versão atual de cada domínio (0 para domínios ainda sem escrita)"""
+        selected = list(domains) if domains is not None else list(DATA_DOMAINS)
+        result = await db.execute(
+            text(
+                "SELECT domain, version FROM tenant_data_versions " "WHERE tenant_id = :tid AND domain = ANY(:domains)"
+            ),
+            {"tid": tenant_id, "domains": selected},
+        )
+        current = {row.domain: row.version for row in result.fetchall()}
+        return {domain: current.get(domain, 0) for domain in selected}
+
+    async def changes(
+        self, db: AsyncSession, tenant_id: int, since: Optional[str] = None, domains: Optional[Iterable[str]] = None
+    ) -> Dict:
+        """Domínios que avançaram desde o cursor e o novo cursor"""
+        seen = parse_cursor(since)
+        versions = await self.get(db, tenant_id, domains)
+        changed = [domain for domain, version in versions.items() if version > seen.get(domain, 0)]
+        return {"tenant_id": tenant_id, "changed": changed, "versions": versions, "cursor": format_cursor(versions)}
+
+    async def stamp(self, db: AsyncSession, tenant_id: int, domains: Iterable[str]) -> str:
+        """Carimbo das versões de alguns domínios (para chaves de cache e ETags)"""
+        return format_cursor(await self.get(db, tenant_id, domains))
+
+
+# Singleton instance
+data_version_service = DataVersionService()
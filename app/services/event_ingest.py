@@ -0,0 +1,510 @@
+"""
+Ingestão de Eventos de Dispositivos (controladoras, câmeras LPR, interfones)
+
+O hardware registrava cada acesso com um POST autenticado e um INSERT em
+access_logs. Aqui o dispositivo envia lotes (NDJSON, array msgpack ou array
+JSON) para POST /portaria/eventos:
+
+- autenticação por dispositivo: token "<ponto_id>.<segredo>" emitido em
+  POST /portaria/pontos-acesso/{id}/token-ingestao; só o sha256 do segredo
+  fica no banco e a validação fica em cache por INGEST_DEVICE_CACHE_TTL_SECONDS
+  (só de pontos existentes; tokens inválidos são limitados por IP no
+  RateLimitMiddleware);
+- os eventos válidos entram em um buffer em memória compartilhado por todas
+  as requisições do processo e são gravados juntos (group commit) a cada
+  INGEST_FLUSH_INTERVAL_MS ou INGEST_FLUSH_ROWS eventos, em um único
+  INSERT ... SELECT FROM unnest(arrays) por lote;
+- a requisição só responde depois da gravação do lote em que entrou: 200
+  significa evento no banco, e o dispositivo pode descartar o que enviou;
+- idempotência pelo id e pelo horário do evento no dispositivo: ON CONFLICT
+  no índice único (ponto_acesso_id, device_event_id, registered_at) da
+  migration 010, então reenviar um lote após timeout, 429 ou 503 não duplica
+  acessos. Por isso ts é obrigatório: com o horário do servidor, cada
+  reenvio teria um registered_at novo;
+- buffer limitado (INGEST_BUFFER_MAX_EVENTS): acima disso a requisição é
+  recusada com 429 e Retry-After estimado pela vazão recente, em vez de
+  acumular memória e latência.
+
+user_id, visitor_id e unit_id que não existem no condomínio do dispositivo
+são gravados como NULL: um id inválido não derruba o lote inteiro por FK.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import AppException, BadRequestError, TooManyRequestsError, UnauthorizedError
+from app.core.logger import get_logger
+from app.database import get_db_context
+
+try:
+    import msgpack
+except ImportError:  # application/msgpack é aceito só com o pacote instalado
+    msgpack = None
+
+logger = get_logger(__name__)
+
+INGEST_EVENTS = Counter(
+    "device_events_total", "Eventos de dispositivos recebidos", ["resultado"]
+)  # resultado: inserido, duplicado, rejeitado, recusado
+INGEST_FLUSH = Histogram(
+    "device_events_flush_seconds",
+    "Duração da gravação de um lote de eventos",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+INGEST_FLUSH_ROWS = Histogram(
+    "device_events_flush_rows",
+    "Eventos gravados por lote",
+    buckets=(1, 10, 50, 100, 500, 1000, 2500, 5000, 10000, 25000),
+)
+INGEST_BUFFERED = Gauge("device_events_buffered", "Eventos aguardando gravação (buffer + lote em gravação)")
+
+CONTENT_NDJSON = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+CONTENT_MSGPACK = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+ACCESS_TYPES = {"entry": "entry", "exit": "exit", "entrada": "entry", "saida": "exit", "saída": "exit"}
+
+# Relógio do dispositivo adiantado além disso indica configuração errada, não um acesso real
+MAX_FUTURE_SKEW = timedelta(days=1)
+
+# Erros devolvidos por requisição (o restante é só contado)
+MAX_REPORTED_ERRORS = 100
+
+# Ordem das colunas nas tuplas do buffer e nos arrays do INSERT
+COLUMNS = (
+    "tenant_id",
+    "ponto_acesso_id",
+    "device_event_id",
+    "registered_at",
+    "access_type",
+    "access_method",
+    "access_point",
+    "user_id",
+    "visitor_id",
+    "unit_id",
+    "vehicle_plate",
+    "device_id",
+    "device_serial",
+    "photo_url",
+    "observations",
+)
+
+INSERT_SQL = """
+    INSERT INTO access_logs (
+        tenant_id, ponto_acesso_id, device_event_id, registered_at, access_type, access_method,
+        access_point, user_id, visitor_id, unit_id, vehicle_plate, device_id, device_serial,
+        photo_url, observations
+    )
+    SELECT e.tenant_id, e.ponto_acesso_id, e.device_event_id, e.registered_at, e.access_type, e.access_method,
+           e.access_point, u.id, v.id, un.id, e.vehicle_plate, e.device_id, e.device_serial,
+           e.photo_url, e.observations
+    FROM unnest(
+        CAST(:tenant_id AS integer[]), CAST(:ponto_acesso_id AS integer[]), CAST(:device_event_id AS text[]),
+        CAST(:registered_at AS timestamp[]), CAST(:access_type AS text[]), CAST(:access_method AS text[]),
+        CAST(:access_point AS text[]), CAST(:user_id AS integer[]), CAST(:visitor_id AS integer[]),
+        CAST(:unit_id AS integer[]), CAST(:vehicle_plate AS text[]), CAST(:device_id AS integer[]),
+        CAST(:device_serial AS text[]), CAST(:photo_url AS text[]), CAST(:observations AS text[])
+    ) AS e(
+        tenant_id, ponto_acesso_id, device_event_id, registered_at, access_type, access_method,
+        access_point, user_id, visitor_id, unit_id, vehicle_plate, device_id, device_serial,
+        photo_url, observations
+    )
+    LEFT JOIN users u ON u.id = e.user_id AND u.tenant_id = e.tenant_id
+    LEFT JOIN visitors v ON v.id = e.visitor_id AND v.tenant_id = e.tenant_id
+    LEFT JOIN units un ON un.id = e.unit_id AND un.tenant_id = e.tenant_id
+    ON CONFLICT (ponto_acesso_id, device_event_id, registered_at) WHERE device_event_id IS NOT NULL DO NOTHING
+    RETURNING ponto_acesso_id, device_event_id, registered_at
+"""
+
+# Heartbeat implícito: o ponto que envia eventos está online (no máximo uma escrita a cada 10s por ponto)
+HEARTBEAT_SQL = """
+    UPDATE pontos_acesso
+    SET status = 'online', last_ping_at = NOW()
+    WHERE id = ANY(:ids) AND (last_ping_at IS NULL OR last_ping_at < NOW() - INTERVAL '10 seconds')
+"""
+
+
+@dataclass(frozen=True)
+class Dispositivo:
+    """Ponto de acesso autenticado pelo token de ingestão"""
+
+    ponto_id: int
+    tenant_id: int
+    nome: str
+    device_id: Optional[int] = None
+
+
+@dataclass
+class ResultadoIngestao:
+    recebidos: int = 0
+    inseridos: int = 0
+    duplicados: int = 0
+    rejeitados: int = 0
+    erros: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class _Lote:
+    """Eventos de uma requisição aguardando a gravação"""
+
+    rows: List[tuple]
+    future: asyncio.Future
+
+
+def hash_token(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def split_token(token: Optional[str]) -> Optional[Tuple[int, str]]:
+    """ "<ponto_id>.<segredo>" -> (ponto_id, segredo); None se o formato não bate"""
+    ponto, _, secret = (token or "").strip().partition(".")
+    if not ponto.isdigit() or not secret:
+        return None
+    return int(ponto), secret
+
+
+def parse_events(body: bytes, content_type: Optional[str]) -> List[Any]:
+    """
+    Decodifica o corpo em uma lista de eventos (ainda não validados).
+
+    NDJSON é decodificado em uma única chamada a json.loads; só se alguma
+    linha for inválida cada linha é lida separadamente para apontar qual.
+    """
+    media_type = (content_type or "application/json").split(";")[0].strip().lower()
+
+    if media_type in CONTENT_MSGPACK:
+        if msgpack is None:
+            raise BadRequestError("Formato msgpack indisponível no servidor; envie NDJSON", code="UNSUPPORTED_FORMAT")
+        try:
+            events = msgpack.unpackb(body, raw=False, strict_map_key=False)
+        except Exception:
+            raise BadRequestError("Corpo msgpack inválido", code="INVALID_BODY")
+    elif media_type in CONTENT_NDJSON:
+        lines = [line for line in body.splitlines() if line.strip()]
+        try:
+            events = json.loads(b"[" + b",".join(lines) + b"]")
+        except ValueError:
+            for number, line in enumerate(lines, 1):
+                try:
+                    json.loads(line)
+                except ValueError:
+                    raise BadRequestError(f"Linha {number} do NDJSON não é JSON válido", code="INVALID_BODY")
+            raise BadRequestError("Corpo NDJSON inválido", code="INVALID_BODY")
+    elif media_type == "application/json":
+        try:
+            events = json.loads(body)
+        except ValueError:
+            raise BadRequestError("Corpo JSON inválido", code="INVALID_BODY")
+    else:
+        raise BadRequestError(
+            "Content-Type deve ser application/x-ndjson, application/msgpack ou application/json",
+            code="UNSUPPORTED_FORMAT",
+        )
+
+    if isinstance(events, dict):
+        events = [events]
+    if not isinstance(events, list):
+        raise BadRequestError("O corpo deve ser uma lista de eventos", code="INVALID_BODY")
+    if len(events) > settings.INGEST_MAX_BATCH_EVENTS:
+        raise BadRequestError(
+            f"Lote com {len(events)} eventos; máximo de {settings.INGEST_MAX_BATCH_EVENTS} por requisição",
+            code="BATCH_TOO_LARGE",
+        )
+    return events
+
+
+def _timestamp(value: Any, now: datetime) -> datetime:
+    """Epoch (s ou ms) ou ISO 8601 -> datetime local sem fuso, como o restante de access_logs"""
+    if value is None or value == "":
+        raise ValueError("ts obrigatório (idempotência)")
+    if isinstance(value, bool):
+        raise ValueError("ts inválido")
+    if isinstance(value, (int, float)):
+        seconds = value / 1000 if value > 100_000_000_000 else value
+        when = datetime.fromtimestamp(seconds)
+    elif isinstance(value, str):
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if when.tzinfo is not None:
+            when = when.astimezone().replace(tzinfo=None)
+    else:
+        raise ValueError("ts inválido")
+    if when > now + MAX_FUTURE_SKEW:
+        raise ValueError("ts no futuro (relógio do dispositivo)")
+    return when
+
+
+def _text(event: Dict[str, Any], key: str, limit: int) -> Optional[str]:
+    value = event.get(key)
+    if value is None or value == "":
+        return None
+    value = str(value)
+    if len(value) > limit:
+        raise ValueError(f"{key} acima de {limit} caracteres")
+    return value
+
+
+def _int(event: Dict[str, Any], key: str) -> Optional[int]:
+    value = event.get(key)
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+        raise ValueError(f"{key} deve ser inteiro")
+    return int(value)
+
+
+def normalize_event(event: Any, dispositivo: Dispositivo, now: datetime) -> tuple:
+    """
+    Evento do dispositivo -> tupla na ordem de COLUMNS (ValueError com o motivo se inválido).
+
+    Campos: id e ts (obrigatórios), tipo (entry/exit ou entrada/saida), metodo,
+    user_id, visitor_id, unit_id, placa, serial, foto_url, obs.
+    """
+    if not isinstance(event, dict):
+        raise ValueError("evento deve ser um objeto")
+
+    event_id = event.get("id", event.get("event_id"))
+    if event_id is None or event_id == "":
+        raise ValueError("id obrigatório (idempotência)")
+    event_id = str(event_id)
+    if len(event_id) > 100:
+        raise ValueError("id acima de 100 caracteres")
+
+    access_type = ACCESS_TYPES.get(str(event.get("tipo", event.get("access_type", "entry"))).lower())
+    if access_type is None:
+        raise ValueError("tipo deve ser entry/exit (ou entrada/saida)")
+
+    placa = event.get("placa", event.get("vehicle_plate"))
+    if placa:
+        placa = "".join(ch for ch in str(placa).upper() if ch.isalnum())
+        if len(placa) > 10:
+            raise ValueError("placa inválida")
+
+    return (
+        dispositivo.tenant_id,
+        dispositivo.ponto_id,
+        event_id,
+        _timestamp(event.get("ts", event.get("registered_at")), now),
+        access_type,
+        _text(event, "metodo", 30) or _text(event, "access_method", 30) or "device",
+        dispositivo.nome[:100],
+        _int(event, "user_id"),
+        _int(event, "visitor_id"),
+        _int(event, "unit_id"),
+        placa or None,
+        dispositivo.device_id,
+        _text(event, "serial", 100),
+        _text(event, "foto_url", 500),
+        _text(event, "obs", 2000),
+    )
+
+
+class EventIngestor:
+    """Buffer compartilhado e gravação em lote dos eventos de dispositivos"""
+
+    def __init__(self, session_factory: Callable = get_db_context):
+        self.session_factory = session_factory
+        self._buffer: List[_Lote] = []
+        self._buffered_rows = 0
+        self._flushing_rows = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._rate = 0.0  # eventos/s gravados (média móvel), base do Retry-After
+        # Só pontos existentes: um ponto_id inexistente não ocupa memória (falhas limitadas pelo RateLimitMiddleware)
+        self._devices: Dict[int, Tuple[float, str, Dispositivo]] = {}
+
+    # ==================== AUTENTICAÇÃO ====================
+
+    async def authenticate(self, token: Optional[str]) -> Dispositivo:
+        """Valida o token do dispositivo; a consulta ao banco fica em cache por ponto"""
+        parts = split_token(token)
+        if parts is None:
+            raise UnauthorizedError("Token do dispositivo ausente ou malformado")
+        ponto_id, secret = parts
+
+        cached = self._devices.get(ponto_id)
+        if cached is None or cached[0] < time.monotonic():
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    text(
+                        """
+                        SELECT id, tenant_id, nome, device_id, ingest_token_hash
+                        FROM pontos_acesso
+                        WHERE id = :id AND is_active = TRUE AND ingest_token_hash IS NOT NULL
+                    """
+                    ),
+                    {"id": ponto_id},
+                )
+                row = result.fetchone()
+            if row is None:
+                self._devices.pop(ponto_id, None)
+                raise UnauthorizedError("Token do dispositivo inválido")
+            cached = (
+                time.monotonic() + settings.INGEST_DEVICE_CACHE_TTL_SECONDS,
+                row.ingest_token_hash,
+                Dispositivo(row.id, row.tenant_id, row.nome, row.device_id),
+            )
+            self._devices[ponto_id] = cached
+
+        if not hmac.compare_digest(cached[1], hash_token(secret)):
+            raise UnauthorizedError("Token do dispositivo inválido")
+        return cached[2]
+
+    async def issue_token(self, db: AsyncSession, tenant_id: int, ponto_id: int) -> Optional[str]:
+        """Gera um novo token para o ponto (o anterior deixa de valer); None se o ponto não existe"""
+        secret = secrets.token_urlsafe(32)
+        result = await db.execute(
+            text(
+                """
+                UPDATE pontos_acesso SET ingest_token_hash = :hash, updated_at = NOW()
+                WHERE id = :id AND tenant_id = :tenant_id
+                RETURNING id
+            """
+            ),
+            {"id": ponto_id, "tenant_id": tenant_id, "hash": hash_token(secret)},
+        )
+        if result.fetchone() is None:
+            return None
+        self._devices.pop(ponto_id, None)
+        return f"{ponto_id}.{secret}"
+
+    def forget_device(self, ponto_id: int) -> None:
+        """Descarta a validação em cache (ponto alterado ou removido)"""
+        self._devices.pop(ponto_id, None)
+
+    # ==================== INGESTÃO ====================
+
+    async def ingest(self, dispositivo: Dispositivo, events: Sequence[Any]) -> ResultadoIngestao:
+        """Valida os eventos, espera a gravação do lote em que entraram e devolve as contagens"""
+        now = datetime.now()
+        rows: List[tuple] = []
+        erros: List[Dict[str, Any]] = []
+        rejeitados = 0
+
+        for index, event in enumerate(events):
+            try:
+                rows.append(normalize_event(event, dispositivo, now))
+            except ValueError as e:
+                rejeitados += 1
+                if len(erros) < MAX_REPORTED_ERRORS:
+                    event_id = event.get("id", event.get("event_id")) if isinstance(event, dict) else None
+                    erros.append({"indice": index, "id": event_id, "motivo": str(e)})
+
+        INGEST_EVENTS.labels("rejeitado").inc(rejeitados)
+        resultado = ResultadoIngestao(recebidos=len(events), rejeitados=rejeitados, erros=erros)
+        if rows:
+            resultado.inseridos = await self.submit(rows)
+            resultado.duplicados = len(rows) - resultado.inseridos
+        return resultado
+
+    async def submit(self, rows: List[tuple]) -> int:
+        """Coloca as linhas no buffer e espera o flush; retorna quantas foram inseridas (não duplicadas)"""
+        pending = self._buffered_rows + self._flushing_rows
+        if pending + len(rows) > settings.INGEST_BUFFER_MAX_EVENTS:
+            INGEST_EVENTS.labels("recusado").inc(len(rows))
+            retry_after = max(1, math.ceil(pending / self._rate)) if self._rate else 1
+            logger.warning("device_events_backpressure", buffered=pending, rows=len(rows), retry_after=retry_after)
+            raise TooManyRequestsError(
+                "Buffer de eventos cheio; reenvie o lote após Retry-After", retry_after=retry_after, code="INGEST_BUSY"
+            )
+
+        self.start()
+        lote = _Lote(rows, asyncio.get_running_loop().create_future())
+        self._buffer.append(lote)
+        self._buffered_rows += len(rows)
+        INGEST_BUFFERED.set(self._buffered_rows + self._flushing_rows)
+        if self._buffered_rows >= settings.INGEST_FLUSH_ROWS:
+            self._wake.set()
+        return await lote.future
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Grava o que está no buffer e encerra o flusher"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        interval = settings.INGEST_FLUSH_INTERVAL_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._buffer:
+                await self.flush()
+            if self._stopping and not self._buffer:
+                return
+
+    async def flush(self) -> None:
+        """Grava todo o buffer em um INSERT e resolve as requisições que esperavam por ele"""
+        lotes, self._buffer = self._buffer, []
+        self._flushing_rows, self._buffered_rows = self._buffered_rows, 0
+        rows = [row for lote in lotes for row in lote.rows]
+        start = time.perf_counter()
+
+        try:
+            columns = list(zip(*rows))
+            params = {name: list(values) for name, values in zip(COLUMNS, columns)}
+            async with self.session_factory() as db:
+                result = await db.execute(text(INSERT_SQL), params)
+                inserted = {tuple(row) for row in result.fetchall()}
+                await db.execute(text(HEARTBEAT_SQL), {"ids": sorted(set(params["ponto_acesso_id"]))})
+                await db.commit()
+        except Exception as e:
+            logger.error("device_events_flush_failed", rows=len(rows), error=str(e), error_type=type(e).__name__)
+            error = AppException(
+                status_code=503,
+                detail="Falha ao gravar os eventos; reenvie o lote",
+                code="INGEST_UNAVAILABLE",
+                headers={"Retry-After": "1"},
+            )
+            for lote in lotes:
+                if not lote.future.done():
+                    lote.future.set_exception(error)
+            return
+        finally:
+            self._flushing_rows = 0
+            INGEST_BUFFERED.set(self._buffered_rows)
+
+        elapsed = time.perf_counter() - start
+        self._rate = len(rows) / elapsed if not self._rate else 0.8 * self._rate + 0.2 * (len(rows) / elapsed)
+        INGEST_FLUSH.observe(elapsed)
+        INGEST_FLUSH_ROWS.observe(len(rows))
+        INGEST_EVENTS.labels("inserido").inc(len(inserted))
+        INGEST_EVENTS.labels("duplicado").inc(len(rows) - len(inserted))
+
+        for lote in lotes:
+            count = 0
+            for row in lote.rows:
+                key = (row[1], row[2], row[3])
+                # O mesmo evento repetido no lote conta como inserido uma vez só
+                if key in inserted:
+                    inserted.discard(key)
+                    count += 1
+            if not lote.future.done():
+                lote.future.set_result(count)
+
+
+# Singleton instance
+event_ingestor = EventIngestor()
@@ -0,0 +1,349 @@
+"""
+Entrega de Arquivos de Upload
+
+Documentos, fotos e logos em UPLOAD_BASE_DIR passam por GET /uploads/{caminho}:
+o Python resolve o caminho, aplica a autorização da área e responde 304 para
+requisições condicionais; o corpo não atravessa o worker quando há nginx na
+frente. Dois modos (FILE_DELIVERY_MODE):
+
+- accel: resposta vazia com `X-Accel-Redirect: FILE_ACCEL_PREFIX + caminho`.
+  O nginx serve o arquivo da location `internal` com sendfile, e trata Range e
+  If-Range por conta própria. Content-Type, Content-Disposition e
+  Cache-Control definidos aqui são mantidos pelo nginx.
+- direct: sem nginx (desenvolvimento, testes, deploy de um container só). O
+  worker envia o arquivo em blocos de FILE_CHUNK_BYTES lidos com os.pread
+  fora do event loop, com suporte a Range (206/416) e If-Range.
+
+No modo auto (padrão) o accel é usado quando a requisição chega pela location
+/uploads/ do nginx, que envia `X-File-Delivery: accel`; acessando o uvicorn
+direto, o mesmo deploy cai no modo direct.
+
+O ETag segue o formato do nginx ("<mtime hex>-<tamanho hex>"), então o valor é
+o mesmo qualquer que seja o caminho que entregou o arquivo. Os uploads são
+gravados com nome gerado por uuid e nunca regravados: esses nomes recebem
+`Cache-Control: max-age=FILE_IMMUTABLE_MAX_AGE, immutable`.
+
+Áreas em FILE_PROTECTED_AREAS exigem um access token (Authorization: Bearer)
+ou um link assinado de signed_url(), com validade e HMAC de SECRET_KEY.
+"""
+
+import hashlib
+import hmac
+import mimetypes
+import os
+import re
+import stat
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.config import UPLOAD_BASE_DIR, settings
+from app.core.exceptions import UnauthorizedError
+from app.core.logger import get_logger
+from app.core.security import verify_access_token
+
+logger = get_logger(__name__)
+
+UPLOADS_URL_PREFIX = "/uploads/"
+ACCEL_HEADER = "X-File-Delivery"
+
+# uuid4 completo ("<uuid>.pdf") ou sufixo curto ("logo_3_<8 hex>.png"), como gravam os endpoints de upload
+_IMMUTABLE_NAME = re.compile(
+    r"(?:^|_)(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{8}|[0-9a-f]{32}|[0-9a-f]{64})"
+    r"\.[A-Za-z0-9]{1,8}$"
+)
+
+# Abertos no navegador; o resto (inclusive SVG e HTML enviados como anexo) sai como download
+_INLINE_TYPES = (
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "application/pdf",
+    "video/",
+    "audio/",
+    "text/plain",
+)
+
+
+class RangeNotSatisfiable(ValueError):
+    """Range fora do arquivo (416)"""
+
+
+@dataclass
+class Arquivo:
+    """Arquivo de upload resolvido e com metadados do stat"""
+
+    relative: str  # "documentos/<uuid>.pdf"
+    path: str
+    size: int
+    mtime: int
+    content_type: str
+    immutable: bool
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.mtime:x}-{self.size:x}"'
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.mtime, usegmt=True)
+
+    @property
+    def area(self) -> str:
+        return self.relative.split("/", 1)[0] if "/" in self.relative else ""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Intervalo (início, fim inclusive) de um header Range com um único intervalo.
+
+    None quando não há Range utilizável (ausente, malformado ou com vários
+    intervalos: a resposta é o arquivo inteiro, como permite a RFC 9110).
+    RangeNotSatisfiable quando o intervalo começa depois do fim do arquivo.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, sep, end = header[6:].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        first = int(start) if start else None
+        last = int(end) if end else None
+    except ValueError:
+        return None
+    if first is None:
+        # Sufixo: os últimos N bytes
+        if last is None:
+            return None
+        if last <= 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - last), size - 1
+    if last is not None and last < first:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable(header)
+    return first, size - 1 if last is None else min(last, size - 1)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Comparação fraca (If-None-Match): W/"x" equivale a "x"
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def is_not_modified(headers: Mapping[str, str], arquivo: Arquivo) -> bool:
+    """If-None-Match tem precedência; If-Modified-Since só vale sem ele"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, arquivo.etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return arquivo.mtime <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def if_range_matches(headers: Mapping[str, str], arquivo: Arquivo) -> bool:
+    """Range só vale se o If-Range (ETag forte ou data) ainda corresponde ao arquivo"""
+    if_range = headers.get("if-range")
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == arquivo.etag
+    return if_range == arquivo.last_modified
+
+
+class FileBodyResponse(Response):
+    """
+    Corpo de [start, end] do arquivo, lido em blocos fora do event loop.
+
+    Diferente do FileResponse do Starlette: respeita o intervalo e usa os.pread
+    sobre um descritor aberto uma vez, sem o wrapper de arquivo assíncrono.
+    """
+
+    def __init__(self, arquivo: Arquivo, start: int, end: int, status_code: int, headers: Mapping[str, str]):
+        super().__init__(status_code=status_code, headers=dict(headers), media_type=arquivo.content_type)
+        self.path = arquivo.path
+        self.start = start
+        self.end = end
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.end < self.start:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        fd = await anyio.to_thread.run_sync(os.open, self.path, os.O_RDONLY)
+        try:
+            offset, remaining = self.start, self.end - self.start + 1
+            chunk_size = settings.FILE_CHUNK_BYTES
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, min(chunk_size, remaining), offset)
+                if not chunk:
+                    # Arquivo truncado durante o envio: encerra com o que foi possível
+                    break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            os.close(fd)
+
+
+class FileDelivery:
+    """Resolução, autorização e resposta dos arquivos de UPLOAD_BASE_DIR"""
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self._base_dir = base_dir
+
+    @property
+    def base_dir(self) -> str:
+        return os.path.realpath(self._base_dir or UPLOAD_BASE_DIR)
+
+    # ------------------------------------------------------------------
+    # Resolução
+    # ------------------------------------------------------------------
+
+    def resolve(self, relative: str) -> Optional[Arquivo]:
+        """Arquivo regular dentro de base_dir, ou None (inexistente, oculto ou fora da pasta)"""
+        relative = relative.lstrip("/")
+        if relative.startswith(UPLOADS_URL_PREFIX.lstrip("/")):
+            relative = relative[len(UPLOADS_URL_PREFIX) - 1 :]
+        parts = relative.split("/")
+        if not relative or any(not part or part.startswith(".") for part in parts):
+            return None
+
+        base = self.base_dir
+        path = os.path.realpath(os.path.join(base, *parts))
+        if not path.startswith(base + os.sep):
+            return None
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+
+        content_type = mimetypes.guess_type(parts[-1])[0] or "application/octet-stream"
+        return Arquivo(
+            relative="/".join(parts),
+            path=path,
+            size=st.st_size,
+            mtime=int(st.st_mtime),
+            content_type=content_type,
+            immutable=bool(_IMMUTABLE_NAME.search(parts[-1])),
+        )
+
+    # ------------------------------------------------------------------
+    # Autorização
+    # ------------------------------------------------------------------
+
+    def is_protected(self, arquivo: Arquivo) -> bool:
+        return arquivo.area in settings.FILE_PROTECTED_AREAS
+
+    def _signature(self, relative: str, expires: int) -> str:
+        message = f"upload:{relative}:{expires}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    def signed_url(self, relative: str, ttl_seconds: Optional[int] = None) -> str:
+        """URL de /uploads com validade, para áreas protegidas abertas sem header (img, window.open)"""
+        relative = relative.lstrip("/")
+        if relative.startswith(UPLOADS_URL_PREFIX.lstrip("/")):
+            relative = relative[len(UPLOADS_URL_PREFIX) - 1 :]
+        expires = int(time.time()) + (ttl_seconds or settings.FILE_SIGNED_URL_TTL_SECONDS)
+        return f"{UPLOADS_URL_PREFIX}{quote(relative)}?exp={expires}&sig={self._signature(relative, expires)}"
+
+    def verify_signature(self, relative: str, expires: Optional[str], signature: Optional[str]) -> bool:
+        if not expires or not signature or not expires.isdigit() or int(expires) < time.time():
+            return False
+        return hmac.compare_digest(signature, self._signature(relative, int(expires)))
+
+    def authorize(self, request: Request, arquivo: Arquivo) -> None:
+        """Áreas protegidas: access token válido ou link assinado; as demais são públicas"""
+        if not self.is_protected(arquivo):
+            return
+        if self.verify_signature(arquivo.relative, request.query_params.get("exp"), request.query_params.get("sig")):
+            return
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer ") and verify_access_token(authorization[7:]):
+            return
+        logger.info("file_unauthorized", path=arquivo.relative, signed="sig" in request.query_params)
+        raise UnauthorizedError("Link expirado ou acesso não autorizado", code="FILE_UNAUTHORIZED")
+
+    # ------------------------------------------------------------------
+    # Resposta
+    # ------------------------------------------------------------------
+
+    def use_accel(self, request: Request) -> bool:
+        mode = settings.FILE_DELIVERY_MODE
+        if mode == "auto":
+            return request.headers.get(ACCEL_HEADER) == "accel"
+        return mode == "accel"
+
+    def cache_control(self, arquivo: Arquivo, private: bool) -> str:
+        scope = "private" if private else "public"
+        if arquivo.immutable:
+            return f"{scope}, max-age={settings.FILE_IMMUTABLE_MAX_AGE}, immutable"
+        return f"{scope}, max-age={settings.FILE_MUTABLE_MAX_AGE}"
+
+    def respond(
+        self,
+        request: Request,
+        arquivo: Arquivo,
+        download_name: Optional[str] = None,
+        private: Optional[bool] = None,
+    ) -> Response:
+        """
+        Resposta para um arquivo já resolvido e autorizado.
+
+        download_name força `attachment` com esse nome (ex.: nome original do
+        documento). private (padrão: área protegida) impede cache compartilhado.
+        """
+        if private is None:
+            private = self.is_protected(arquivo)
+        headers = {
+            "Cache-Control": self.cache_control(arquivo, private),
+            "ETag": arquivo.etag,
+            "Last-Modified": arquivo.last_modified,
+            "Accept-Ranges": "bytes",
+        }
+        if download_name or not arquivo.content_type.startswith(_INLINE_TYPES):
+            name = download_name or arquivo.relative.rsplit("/", 1)[-1]
+            headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(name)}"
+
+        if is_not_modified(request.headers, arquivo):
+            return Response(status_code=304, headers=headers)
+
+        if self.use_accel(request):
+            headers["X-Accel-Redirect"] = settings.FILE_ACCEL_PREFIX + quote(arquivo.relative)
+            return Response(status_code=200, headers=headers, media_type=arquivo.content_type)
+
+        start, end, status_code = 0, arquivo.size - 1, 200
+        if request.headers.get("range") and if_range_matches(request.headers, arquivo):
+            try:
+                interval = parse_range(request.headers["range"], arquivo.size)
+            except RangeNotSatisfiable:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{arquivo.size}"})
+            if interval is not None:
+                start, end = interval
+                status_code = 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{arquivo.size}"
+
+        return FileBodyResponse(arquivo, start, end, status_code, headers)
+
+
+# Singleton instance
+file_delivery = FileDelivery()
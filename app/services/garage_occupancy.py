@@ -0,0 +1,223 @@
+"""
+Estado de Ocupação da Garagem em Memória
+
+O mapa visual e o dashboard da portaria liam vagas_garagem (com joins em
+units e vehicles) a cada requisição. Este serviço mantém, por condomínio:
+
+- as vagas ativas já no formato de resposta (VagaGaragemResponse)
+- contadores por status, por tipo e por mapa/andar, ajustados a cada mudança
+- o JSON do mapa pré-renderizado, invalidado quando alguma vaga muda
+
+Os endpoints que alteram vagas chamam refresh_spot() após o commit, o que
+relê só a vaga alterada, ajusta os contadores e envia a mudança aos clientes
+conectados via WebSocket. Alterações feitas por outros workers são absorvidas
+na recarga completa após GARAGE_STATE_TTL_SECONDS.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.schemas.portaria import MapaGaragemResponse, OcupacaoGaragemResponse, VagaGaragemResponse
+from app.services.websocket import NotificationType, create_notification, manager
+
+logger = get_logger(__name__)
+
+DEFAULT_MAP = "principal"
+
+SPOT_SQL = """
+    SELECT v.*, u.number AS unit_number, u.block AS unit_block,
+           ve.plate AS veiculo_placa, ve.model AS veiculo_modelo
+    FROM vagas_garagem v
+    LEFT JOIN units u ON u.id = v.unit_id
+    LEFT JOIN vehicles ve ON ve.id = v.veiculo_id
+    WHERE v.tenant_id = :tenant_id {where}
+"""
+
+_maps_adapter = TypeAdapter(List[MapaGaragemResponse])
+
+
+def map_name(mapa_id: str) -> str:
+    return f"Andar {mapa_id}" if mapa_id != DEFAULT_MAP else "Garagem Principal"
+
+
+class TenantGarage:
+    """Vagas e contadores de um condomínio"""
+
+    def __init__(self, spots: Optional[List[VagaGaragemResponse]] = None):
+        self.spots: Dict[int, VagaGaragemResponse] = {}
+        self.by_status: Counter = Counter()
+        self.by_type: Counter = Counter()
+        self.by_map: Dict[str, Counter] = {}
+        self._rendered: Dict[Optional[str], bytes] = {}
+        self.loaded_at = time.monotonic()
+        for spot in list(spots or []):
+            self.apply(spot.id, spot)
+
+    def __len__(self) -> int:
+        return len(self.spots)
+
+    def _count(self, spot: VagaGaragemResponse, delta: int) -> None:
+        mapa = spot.mapa_id or DEFAULT_MAP
+        self.by_status[spot.status] += delta
+        self.by_type[spot.tipo] += delta
+        self.by_map.setdefault(mapa, Counter())[spot.status] += delta
+        self.by_map[mapa]["total"] += delta
+        if not self.by_map[mapa]["total"]:
+            del self.by_map[mapa]
+
+    def apply(self, vaga_id: int, spot: Optional[VagaGaragemResponse]) -> Optional[VagaGaragemResponse]:
+        """Insere, substitui ou remove (spot=None / inativa) uma vaga; retorna a versão anterior"""
+        previous = self.spots.pop(vaga_id, None)
+        if previous is not None:
+            self._count(previous, -1)
+        if spot is not None and spot.is_active:
+            self.spots[vaga_id] = spot
+            self._count(spot, 1)
+        self._rendered.clear()
+        return previous
+
+    def occupancy(self) -> OcupacaoGaragemResponse:
+        total = len(self.spots)
+        ocupadas = self.by_status["ocupada"]
+        return OcupacaoGaragemResponse(
+            total_vagas=total,
+            vagas_ocupadas=ocupadas,
+            vagas_livres=self.by_status["livre"],
+            vagas_reservadas=self.by_status["reservada"],
+            vagas_manutencao=self.by_status["manutencao"],
+            ocupacao_percentual=round(ocupadas / total * 100, 1) if total else 0,
+            por_tipo={tipo: count for tipo, count in self.by_type.items() if count},
+        )
+
+    def maps(self, mapa_id: Optional[str] = None) -> List[MapaGaragemResponse]:
+        """Mapas/andares com suas vagas, na ordem (mapa_id, numero)"""
+        spots = sorted(self.spots.values(), key=lambda item: (item.mapa_id is None, item.mapa_id or "", item.numero))
+        grouped: Dict[str, List[VagaGaragemResponse]] = {}
+        for spot in spots:
+            if mapa_id and spot.mapa_id != mapa_id:
+                continue
+            grouped.setdefault(spot.mapa_id or DEFAULT_MAP, []).append(spot)
+
+        result = []
+        for mapa, vagas in grouped.items():
+            counts = self.by_map[mapa]
+            result.append(
+                MapaGaragemResponse(
+                    mapa_id=mapa,
+                    nome=map_name(mapa),
+                    vagas=vagas,
+                    total_vagas=counts["total"],
+                    vagas_ocupadas=counts["ocupada"],
+                    vagas_livres=counts["livre"],
+                    ocupacao_percentual=round(counts["ocupada"] / counts["total"] * 100, 1),
+                )
+            )
+        return result
+
+    def render_maps(self, mapa_id: Optional[str] = None) -> bytes:
+        """JSON do mapa, reaproveitado até a próxima mudança de vaga"""
+        rendered = self._rendered.get(mapa_id)
+        if rendered is None:
+            rendered = self._rendered[mapa_id] = _maps_adapter.dump_json(self.maps(mapa_id))
+        return rendered
+
+
+class GarageOccupancyService:
+    """
+    Estado da garagem por condomínio, mantido no processo.
+
+    Usage:
+        body = await garage_occupancy.render_maps(db, tenant_id)
+        await garage_occupancy.refresh_spot(db, tenant_id, vaga_id)
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = settings.GARAGE_STATE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._garages: Dict[int, TenantGarage] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def _is_fresh(self, garage: Optional[TenantGarage]) -> bool:
+        return garage is not None and time.monotonic() - garage.loaded_at < self.ttl_seconds
+
+    async def get_garage(self, db: AsyncSession, tenant_id: int) -> TenantGarage:
+        garage = self._garages.get(tenant_id)
+        if self._is_fresh(garage):
+            return garage
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            garage = self._garages.get(tenant_id)
+            if not self._is_fresh(garage):
+                garage = await self.load(db, tenant_id)
+        return garage
+
+    async def load(self, db: AsyncSession, tenant_id: int) -> TenantGarage:
+        """Recarrega todas as vagas ativas do condomínio"""
+        started = time.perf_counter()
+        result = await db.execute(text(SPOT_SQL.format(where="AND v.is_active = true")), {"tenant_id": tenant_id})
+        garage = TenantGarage([VagaGaragemResponse.model_validate(dict(row._mapping)) for row in result.fetchall()])
+        self._garages[tenant_id] = garage
+
+        logger.info(
+            "garage_state_loaded",
+            tenant_id=tenant_id,
+            spots=len(garage),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return garage
+
+    async def occupancy(self, db: AsyncSession, tenant_id: int) -> OcupacaoGaragemResponse:
+        return (await self.get_garage(db, tenant_id)).occupancy()
+
+    async def render_maps(self, db: AsyncSession, tenant_id: int, mapa_id: Optional[str] = None) -> bytes:
+        return (await self.get_garage(db, tenant_id)).render_maps(mapa_id)
+
+    async def refresh_spot(self, db: AsyncSession, tenant_id: int, vaga_id: int) -> None:
+        """
+        Relê uma vaga após criação, ocupação, liberação, reposicionamento ou exclusão
+        e envia a nova versão aos clientes do condomínio.
+        """
+        garage = self._garages.get(tenant_id)
+        if garage is None:
+            return  # ainda não carregado: a primeira leitura carrega tudo
+
+        result = await db.execute(
+            text(SPOT_SQL.format(where="AND v.id = :id")), {"tenant_id": tenant_id, "id": vaga_id}
+        )
+        row = result.fetchone()
+        spot = VagaGaragemResponse.model_validate(dict(row._mapping)) if row else None
+        garage.apply(vaga_id, spot)
+
+        removed = spot is None or not spot.is_active
+        await manager.send_to_tenant(
+            tenant_id,
+            create_notification(
+                NotificationType.GARAGE_SPOT_UPDATE,
+                title="Garagem",
+                message=f"Vaga {spot.numero}: {'removida' if removed else spot.status}" if spot else "Vaga removida",
+                data={
+                    "vaga_id": vaga_id,
+                    "removed": removed,
+                    "vaga": None if removed else spot.model_dump(mode="json"),
+                    "ocupacao": garage.occupancy().model_dump(mode="json"),
+                },
+            ),
+        )
+
+    def invalidate(self, tenant_id: Optional[int] = None) -> None:
+        if tenant_id is None:
+            self._garages.clear()
+        else:
+            self._garages.pop(tenant_id, None)
+
+
+# Singleton instance
+garage_occupancy = GarageOccupancyService()
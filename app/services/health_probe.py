@@ -0,0 +1,461 @@
+"""
+Verificação de Saúde dos Equipamentos
+
+Antes o teste de integração sempre respondia sucesso e o status dos pontos de
+acesso era só o que o hardware informava pelo ping. Aqui o servidor verifica
+ativamente todas as integrações e pontos de acesso do condomínio:
+
+- todos os equipamentos são verificados em paralelo (limitado por
+  HEALTH_PROBE_CONCURRENCY), reaproveitando as conexões de um único pool
+  HTTP do processo;
+- cada parceiro tem sua própria sonda (endpoint de status e autenticação);
+  pontos de acesso sem parceiro usam uma sonda genérica em que qualquer
+  resposta HTTP indica equipamento no ar;
+- o timeout de cada equipamento se adapta ao tempo de resposta observado
+  (estimador do RFC 6298: média suavizada + 4x a variação), dobrando a cada
+  timeout; um timeout é repetido uma vez antes de marcar offline;
+- o resultado fica em memória por HEALTH_STATUS_TTL_SECONDS: os endpoints de
+  status leem o cache e só a primeira leitura após expirar consulta os
+  equipamentos; mudanças de status são gravadas no banco.
+
+Pontos de acesso sem IP ou em manutenção não são verificados e mantêm o
+status informado pelo hardware (POST /{ponto_id}/ping).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.schemas.portaria import IntegracaoStatusResponse, PontoAcessoStatusResponse
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class VendorProbe:
+    """Como verificar um equipamento de um parceiro"""
+
+    path: str
+    method: str = "GET"
+    digest: bool = False  # usuário/senha via Digest (padrão: Basic)
+    any_response: bool = False  # qualquer resposta HTTP < 500 conta como online
+
+
+VENDOR_PROBES: Dict[str, VendorProbe] = {
+    "intelbras": VendorProbe("/cgi-bin/magicBox.cgi?action=getSystemInfo", digest=True),
+    "controlid": VendorProbe("/system_information.fcgi", method="POST"),
+    "hikvision": VendorProbe("/ISAPI/System/status", digest=True),
+    "linear": VendorProbe("/status"),
+    "nice": VendorProbe("/status"),
+}
+GENERIC_PROBE = VendorProbe("/", any_response=True)
+
+PONTOS_SQL = """
+    SELECT id, codigo, nome, status, last_ping_at, ip_address, porta, visivel
+    FROM pontos_acesso
+    WHERE tenant_id = :tenant_id AND is_active = true
+    ORDER BY ordem, nome
+"""
+
+INTEGRACOES_SQL = """
+    SELECT id, parceiro, nome_exibicao, config, status, last_health_check, last_error
+    FROM integracoes_hardware
+    WHERE tenant_id = :tenant_id AND is_active = true
+    ORDER BY id
+"""
+
+
+@dataclass
+class RttEstimator:
+    """Timeout adaptativo de um equipamento (RFC 6298)"""
+
+    srtt: Optional[float] = None
+    rttvar: float = 0.0
+    backoff: int = 1
+
+    def timeout(self) -> float:
+        if self.srtt is None:
+            base = settings.HEALTH_PROBE_TIMEOUT_INITIAL_SECONDS
+        else:
+            base = self.srtt + 4 * self.rttvar
+        return min(
+            max(base * self.backoff, settings.HEALTH_PROBE_TIMEOUT_MIN_SECONDS),
+            settings.HEALTH_PROBE_TIMEOUT_MAX_SECONDS,
+        )
+
+    def observe(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.backoff = 1
+
+    def on_timeout(self) -> None:
+        self.backoff = min(self.backoff * 2, 64)
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    """Equipamento a verificar"""
+
+    kind: str  # integracao, ponto
+    id: int
+    url: str
+    probe: VendorProbe
+    headers: Dict[str, str] = field(default_factory=dict)
+    auth: Optional[httpx.Auth] = None
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.kind, self.id
+
+
+@dataclass
+class ProbeResult:
+    """Resultado da verificação de um equipamento"""
+
+    status: str  # online, offline, erro, manutencao
+    latencia_ms: Optional[float] = None
+    erro: Optional[str] = None
+    http_status: Optional[int] = None
+    tentativas: int = 0
+    timeout_ms: Optional[float] = None
+    fonte: str = "sonda"  # sonda, heartbeat
+    verificado_em: datetime = field(default_factory=datetime.now)
+
+    @property
+    def is_online(self) -> bool:
+        return self.status == "online"
+
+
+def classify(probe: VendorProbe, status_code: int) -> Tuple[str, Optional[str]]:
+    """Status do equipamento a partir da resposta HTTP"""
+    if status_code < 400 or (probe.any_response and status_code < 500):
+        return "online", None
+    if status_code in (401, 403):
+        return "erro", f"Credenciais recusadas (HTTP {status_code})"
+    return "erro", f"HTTP {status_code}"
+
+
+def integracao_target(integracao: Any) -> Optional[ProbeTarget]:
+    """Sonda de uma integração (None quando não há base_url configurada)"""
+    config = integracao.config or {}
+    base_url = (config.get("base_url") or "").rstrip("/")
+    if not base_url:
+        return None
+    probe = VENDOR_PROBES.get(integracao.parceiro, GENERIC_PROBE)
+    if config.get("health_path"):
+        probe = VendorProbe(config["health_path"], method=probe.method, digest=probe.digest)
+
+    headers = {}
+    auth = None
+    if config.get("username"):
+        auth_class = httpx.DigestAuth if probe.digest else httpx.BasicAuth
+        auth = auth_class(config["username"], config.get("password") or "")
+    elif config.get("api_key"):
+        headers["Authorization"] = f"Bearer {config['api_key']}"
+    return ProbeTarget("integracao", integracao.id, base_url + probe.path, probe, headers, auth)
+
+
+def ponto_target(ponto: Any) -> Optional[ProbeTarget]:
+    """Sonda genérica de um ponto de acesso (None sem IP ou em manutenção)"""
+    if not ponto.ip_address or ponto.status == "manutencao":
+        return None
+    base_url = ponto.ip_address if "://" in ponto.ip_address else f"http://{ponto.ip_address}"
+    if ponto.porta:
+        base_url = f"{base_url.rstrip('/')}:{ponto.porta}"
+    return ProbeTarget("ponto", ponto.id, base_url.rstrip("/") + GENERIC_PROBE.path, GENERIC_PROBE)
+
+
+@dataclass
+class TenantHealth:
+    """Último resultado das verificações de um condomínio"""
+
+    pontos: List[Any]
+    integracoes: List[Any]
+    results: Dict[Tuple[str, int], ProbeResult]
+    checked_at: float = field(default_factory=time.monotonic)
+
+    def ponto_status(self, ponto: Any) -> PontoAcessoStatusResponse:
+        result = self.results[("ponto", ponto.id)]
+        return PontoAcessoStatusResponse(
+            id=ponto.id,
+            codigo=ponto.codigo,
+            nome=ponto.nome,
+            status=result.status,
+            last_ping_at=result.verificado_em if result.is_online else ponto.last_ping_at,
+            is_online=result.is_online,
+            latencia_ms=result.latencia_ms,
+            erro=result.erro,
+            fonte=result.fonte,
+        )
+
+    def integracao_status(self, integracao: Any) -> IntegracaoStatusResponse:
+        result = self.results[("integracao", integracao.id)]
+        return IntegracaoStatusResponse(
+            id=integracao.id,
+            parceiro=integracao.parceiro,
+            nome_exibicao=integracao.nome_exibicao,
+            status=result.status,
+            is_online=result.is_online,
+            latencia_ms=result.latencia_ms,
+            erro=result.erro,
+            verificado_em=result.verificado_em,
+        )
+
+
+class HealthProbeService:
+    """
+    Verificação concorrente dos equipamentos com cache de status por condomínio.
+
+    Usage:
+        pontos = await health_probe.pontos_status(db, tenant_id)
+        result = await health_probe.probe_integracao(db, row)
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.ttl_seconds = settings.HEALTH_STATUS_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._rtt: Dict[str, RttEstimator] = {}
+        self._health: Dict[int, TenantHealth] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    # ==================== SONDAS ====================
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pool HTTP compartilhado por todas as verificações do processo"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.HEALTH_PROBE_CONCURRENCY,
+                    max_keepalive_connections=settings.HEALTH_PROBE_CONCURRENCY,
+                    keepalive_expiry=max(self.ttl_seconds * 2, 5),
+                ),
+                transport=self._transport,
+                follow_redirects=False,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def timeout_for(self, url: str) -> float:
+        return self._rtt.setdefault(url, RttEstimator()).timeout()
+
+    async def probe(self, target: ProbeTarget) -> ProbeResult:
+        """Verifica um equipamento; timeout repetido uma vez com o prazo dobrado"""
+        client = self._get_client()
+        estimator = self._rtt.setdefault(target.url, RttEstimator())
+        attempts = 0
+        timeout = estimator.timeout()
+        error = "Timeout"
+        for attempts in range(1, settings.HEALTH_PROBE_RETRIES + 2):
+            timeout = estimator.timeout()
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    target.probe.method,
+                    target.url,
+                    headers=target.headers,
+                    auth=target.auth,
+                    timeout=timeout,
+                )
+            except httpx.TimeoutException:
+                estimator.on_timeout()
+                error = f"Timeout ({timeout * 1000:.0f} ms)"
+                continue
+            except httpx.TransportError as exc:
+                return ProbeResult(
+                    "offline", erro=f"{type(exc).__name__}: {exc}", tentativas=attempts, timeout_ms=timeout * 1000
+                )
+
+            rtt = time.perf_counter() - started
+            estimator.observe(rtt)
+            status, error = classify(target.probe, response.status_code)
+            return ProbeResult(
+                status,
+                latencia_ms=round(rtt * 1000, 2),
+                erro=error,
+                http_status=response.status_code,
+                tentativas=attempts,
+                timeout_ms=timeout * 1000,
+            )
+
+        return ProbeResult("offline", erro=error, tentativas=attempts, timeout_ms=timeout * 1000)
+
+    async def probe_many(self, targets: List[ProbeTarget]) -> Dict[Tuple[str, int], ProbeResult]:
+        """Verifica todos os equipamentos em paralelo (até HEALTH_PROBE_CONCURRENCY simultâneos)"""
+        limit = asyncio.Semaphore(settings.HEALTH_PROBE_CONCURRENCY)
+
+        async def run(target: ProbeTarget) -> ProbeResult:
+            async with limit:
+                return await self.probe(target)
+
+        results = await asyncio.gather(*(run(target) for target in targets))
+        return {target.key: result for target, result in zip(targets, results)}
+
+    # ==================== CACHE POR CONDOMÍNIO ====================
+
+    def _is_fresh(self, health: Optional[TenantHealth]) -> bool:
+        return health is not None and time.monotonic() - health.checked_at < self.ttl_seconds
+
+    async def get_health(self, db: AsyncSession, tenant_id: int, refresh: bool = False) -> TenantHealth:
+        health = self._health.get(tenant_id)
+        if not refresh and self._is_fresh(health):
+            return health
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            health = self._health.get(tenant_id)
+            if refresh or not self._is_fresh(health):
+                health = await self.check_tenant(db, tenant_id)
+        return health
+
+    async def check_tenant(self, db: AsyncSession, tenant_id: int) -> TenantHealth:
+        """Verifica todas as integrações e pontos de acesso ativos do condomínio"""
+        started = time.perf_counter()
+        pontos = (await db.execute(text(PONTOS_SQL), {"tenant_id": tenant_id})).fetchall()
+        integracoes = (await db.execute(text(INTEGRACOES_SQL), {"tenant_id": tenant_id})).fetchall()
+
+        targets = []
+        results: Dict[Tuple[str, int], ProbeResult] = {}
+        for ponto in pontos:
+            target = ponto_target(ponto)
+            if target is None:
+                results[("ponto", ponto.id)] = ProbeResult(
+                    ponto.status or "offline", fonte="heartbeat", verificado_em=ponto.last_ping_at or datetime.now()
+                )
+            else:
+                targets.append(target)
+        for integracao in integracoes:
+            target = integracao_target(integracao)
+            if target is None:
+                results[("integracao", integracao.id)] = ProbeResult("erro", erro="base_url não configurada")
+            else:
+                targets.append(target)
+
+        results.update(await self.probe_many(targets))
+        health = TenantHealth(list(pontos), list(integracoes), results)
+        self._health[tenant_id] = health
+        await self._persist(db, tenant_id, health)
+
+        logger.info(
+            "health_probe_completed",
+            tenant_id=tenant_id,
+            targets=len(targets),
+            online=sum(1 for key in (t.key for t in targets) if results[key].is_online),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return health
+
+    async def _persist(self, db: AsyncSession, tenant_id: int, health: TenantHealth) -> None:
+        """Grava no banco os pontos que mudaram de status e o health check das integrações"""
+        changed = [
+            (ponto.id, health.results[("ponto", ponto.id)].status)
+            for ponto in health.pontos
+            if health.results[("ponto", ponto.id)].fonte == "sonda"
+            and health.results[("ponto", ponto.id)].status != ponto.status
+        ]
+        if changed:
+            await db.execute(
+                text(
+                    """
+                    UPDATE pontos_acesso p
+                    SET status = v.status,
+                        last_ping_at = CASE WHEN v.status = 'online' THEN NOW() ELSE p.last_ping_at END
+                    FROM unnest(CAST(:ids AS integer[]), CAST(:status AS text[])) AS v(id, status)
+                    WHERE p.id = v.id AND p.tenant_id = :tenant_id AND p.status IS DISTINCT FROM 'manutencao'
+                    """
+                ),
+                {"tenant_id": tenant_id, "ids": [c[0] for c in changed], "status": [c[1] for c in changed]},
+            )
+
+        if health.integracoes:
+            await self._persist_integracoes(
+                db, {i.id: health.results[("integracao", i.id)] for i in health.integracoes}
+            )
+        await db.commit()
+
+    async def _persist_integracoes(self, db: AsyncSession, results: Dict[int, ProbeResult]) -> None:
+        await db.execute(
+            text(
+                """
+                UPDATE integracoes_hardware i
+                SET status = CASE WHEN v.online THEN 'ativo' ELSE 'erro' END,
+                    last_health_check = NOW(), last_error = v.erro
+                FROM unnest(CAST(:ids AS integer[]), CAST(:online AS boolean[]), CAST(:erros AS text[]))
+                    AS v(id, online, erro)
+                WHERE i.id = v.id
+                """
+            ),
+            {
+                "ids": list(results),
+                "online": [r.is_online for r in results.values()],
+                "erros": [r.erro for r in results.values()],
+            },
+        )
+
+    # ==================== LEITURA E ATUALIZAÇÃO ====================
+
+    async def pontos_status(
+        self, db: AsyncSession, tenant_id: int, refresh: bool = False, visiveis: bool = True
+    ) -> List[PontoAcessoStatusResponse]:
+        health = await self.get_health(db, tenant_id, refresh)
+        return [health.ponto_status(p) for p in health.pontos if p.visivel or not visiveis]
+
+    async def ponto_status(
+        self, db: AsyncSession, tenant_id: int, ponto_id: int
+    ) -> Optional[PontoAcessoStatusResponse]:
+        health = await self.get_health(db, tenant_id)
+        for ponto in health.pontos:
+            if ponto.id == ponto_id:
+                return health.ponto_status(ponto)
+        return None
+
+    async def integracoes_status(
+        self, db: AsyncSession, tenant_id: int, refresh: bool = False
+    ) -> List[IntegracaoStatusResponse]:
+        health = await self.get_health(db, tenant_id, refresh)
+        return [health.integracao_status(i) for i in health.integracoes]
+
+    async def probe_integracao(self, db: AsyncSession, integracao: Any) -> ProbeResult:
+        """Verifica uma integração agora (teste manual), grava o resultado e atualiza o cache"""
+        target = integracao_target(integracao)
+        result = ProbeResult("erro", erro="base_url não configurada") if target is None else await self.probe(target)
+        await self._persist_integracoes(db, {integracao.id: result})
+        await db.commit()
+
+        health = self._health.get(integracao.tenant_id)
+        if health is not None and ("integracao", integracao.id) in health.results:
+            health.results[("integracao", integracao.id)] = result
+        return result
+
+    def record_heartbeat(self, tenant_id: int, ponto_id: int, status: str) -> None:
+        """Status informado pelo próprio hardware (ping) vale até a próxima verificação"""
+        health = self._health.get(tenant_id)
+        if health is not None and ("ponto", ponto_id) in health.results:
+            health.results[("ponto", ponto_id)] = ProbeResult(status, fonte="heartbeat")
+
+    def invalidate(self, tenant_id: Optional[int] = None) -> None:
+        """Descarta o cache (pontos ou integrações criados, alterados ou removidos)"""
+        if tenant_id is None:
+            self._health.clear()
+        else:
+            self._health.pop(tenant_id, None)
+
+
+# Singleton instance
+health_probe = HealthProbeService()
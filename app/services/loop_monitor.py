@@ -0,0 +1,197 @@
+"""
+Monitor de Atraso do Event Loop
+
+Chamadas síncronas no caminho de uma requisição (bcrypt, escrita de upload
+com open().write(), subprocess, SDKs síncronos) travam o event loop do
+worker inteiro, e só aparecem como picos de latência em endpoints que não
+têm nada a ver com elas. Este monitor:
+
+- agenda um tick a cada LOOP_MONITOR_INTERVAL e mede o quanto ele acordou
+  atrasado, exportando no histograma Prometheus event_loop_lag_seconds
+  (exposto em /metrics junto com as métricas HTTP);
+- roda uma thread auxiliar que, quando o tick passa de LOOP_BLOCK_THRESHOLD_MS
+  sem rodar, captura a pilha da thread do loop (o frame que está bloqueando)
+  e registra event_loop_blocked com a rota e o request_id em execução;
+- em testes (LOOP_BLOCK_FAIL_MS), guarda os bloqueios para o conftest
+  falhar o teste que travou o loop (ver tests/conftest.py).
+
+A rota é descoberta subindo a pilha até o frame do Starlette que tem o
+"scope" da requisição, sem custo algum por requisição.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Atraso do event loop medido por um tick periódico",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKS = Counter("event_loop_blocks_total", "Bloqueios do event loop acima de LOOP_BLOCK_THRESHOLD_MS")
+
+STACK_LIMIT = 25  # frames mais internos registrados no log
+
+
+@dataclass
+class BlockEvent:
+    """Um bloqueio detectado (duration_ms é atualizado quando o loop volta)"""
+
+    duration_ms: float
+    method: Optional[str]
+    route: Optional[str]
+    request_id: Optional[str]
+    stack: str
+
+
+def request_from_stack(frame) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(método, rota, request_id) da requisição cujo frame está na pilha (scope ASGI http)"""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            route = scope.get("route")
+            path = getattr(route, "path", None) or scope.get("path")
+            request_id = (scope.get("state") or {}).get("request_id")
+            return scope.get("method"), path, request_id
+        frame = frame.f_back
+    return None, None, None
+
+
+class LoopMonitor:
+    """Tick no event loop + thread de vigilância"""
+
+    def __init__(self):
+        self.blocks: List[BlockEvent] = []
+        self.collect = False  # guarda os bloqueios em self.blocks (modo teste)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._interval = 0.0
+        self._threshold = 0.0
+        self._deadline = 0.0  # quando o próximo tick deveria rodar (monotonic)
+        self._paused = False  # loop parado (entre testes): tempo parado não conta como atraso
+        self._current: Optional[BlockEvent] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        interval: Optional[float] = None,
+        threshold_ms: Optional[float] = None,
+    ) -> None:
+        """Inicia no loop informado (ou no atual); pode ser chamado com o loop ainda parado"""
+        if self.is_running:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._interval = interval or settings.LOOP_MONITOR_INTERVAL
+        self._threshold = (threshold_ms or settings.LOOP_BLOCK_THRESHOLD_MS) / 1000
+        self._deadline = time.monotonic() + self._interval
+        self._stop.clear()
+        self._task = self._loop.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+        logger.info("loop_monitor_started", interval=self._interval, threshold_ms=self._threshold * 1000)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def drain(self) -> List[BlockEvent]:
+        """Bloqueios detectados desde a última chamada (modo teste)"""
+        blocks, self.blocks = self.blocks, []
+        return blocks
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+
+    async def _tick(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        while True:
+            self._deadline = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, time.monotonic() - self._deadline)
+            if self._paused:
+                # Loop esteve parado (entre testes) e a vigilância ainda não viu a retomada
+                continue
+            LOOP_LAG.observe(lag)
+            if self._current is not None:
+                self._current.duration_ms = round(lag * 1000, 1)
+                logger.warning(
+                    "event_loop_block_ended",
+                    blocked_ms=self._current.duration_ms,
+                    route=self._current.route,
+                    request_id=self._current.request_id,
+                )
+                self._current = None
+
+    # ------------------------------------------------------------------
+    # Thread de vigilância
+    # ------------------------------------------------------------------
+
+    def _watch(self) -> None:
+        period = min(self._interval, self._threshold / 4)
+        while not self._stop.wait(period):
+            if not self._loop.is_running():
+                # Parou (fim de run_until_complete): um bloqueio em curso termina aqui
+                self._paused = True
+                self._current = None
+                continue
+            if self._paused:
+                # Loop voltou a rodar: o relógio recomeça agora
+                self._deadline = max(self._deadline, time.monotonic())
+                self._paused = False
+            late = time.monotonic() - self._deadline
+            if late > self._threshold and self._current is None and self._loop_thread_id is not None:
+                self._capture(late)
+
+    def _capture(self, late: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        method, route, request_id = request_from_stack(frame)
+        stack = "".join(traceback.format_stack(frame)[-STACK_LIMIT:])
+        block = BlockEvent(
+            duration_ms=round(late * 1000, 1), method=method, route=route, request_id=request_id, stack=stack
+        )
+        self._current = block
+        LOOP_BLOCKS.inc()
+        if self.collect:
+            self.blocks.append(block)
+        logger.warning(
+            "event_loop_blocked",
+            blocked_ms=block.duration_ms,
+            method=method,
+            route=route,
+            request_id=request_id,
+            stack=stack,
+        )
+
+
+# Singleton instance
+loop_monitor = LoopMonitor()
@@ -0,0 +1,191 @@
+"""
+Observabilidade de Memória por Worker
+
+O gunicorn recicla cada worker após max_requests para conter vazamentos
+suspeitos, o que custa caches frios (índice de placas, garagem, calendários)
+a cada reciclagem. Este serviço dá visibilidade para achar o vazamento em
+vez de mascará-lo:
+
+- métricas Prometheus do worker (RSS, blocos alocados pelo Python, contagem
+  do GC e, com o tracemalloc ligado, bytes rastreados), com o pid como label;
+- snapshots do tracemalloc sob demanda e o diff entre dois deles, com os
+  locais de alocação que mais cresceram (endpoints em /admin/memory).
+
+Os snapshots ficam na memória do próprio worker (os ids levam o pid); para
+comparar dois pontos, as chamadas precisam cair no mesmo worker. O soak test
+em benchmarks/soak.py usa estes dados para atribuir o crescimento a cada
+endpoint.
+"""
+
+import gc
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY
+
+from app.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Alocações do próprio rastreamento e do import não interessam no diff
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+
+def rss_bytes() -> int:
+    """Memória residente atual do processo (no Linux via /proc; senão o pico do getrusage)"""
+    try:
+        with open("/proc/self/statm") as fp:
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class Snapshot:
+    id: str
+    created_at: float
+    traced_bytes: int
+    snapshot: tracemalloc.Snapshot
+
+
+class MemoryService:
+    """Estatísticas do worker e snapshots do tracemalloc"""
+
+    def __init__(self, max_snapshots: Optional[int] = None):
+        self.max_snapshots = max_snapshots or settings.MEMORY_MAX_SNAPSHOTS
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self._counter = 0
+        self._started_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self._started_at, 1),
+            "rss_bytes": rss_bytes(),
+            "python_allocated_blocks": sys.getallocatedblocks(),
+            "gc_counts": list(gc.get_count()),
+            "tracemalloc": {
+                "tracing": tracemalloc.is_tracing(),
+                "frames": tracemalloc.get_traceback_limit(),
+                "traced_bytes": traced,
+                "peak_bytes": peak,
+                "snapshots": len(self._snapshots),
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # tracemalloc
+    # ------------------------------------------------------------------
+
+    def start_tracing(self, frames: Optional[int] = None) -> None:
+        """Liga o rastreamento (custo de CPU e memória enquanto ligado)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or settings.MEMORY_TRACEMALLOC_FRAMES)
+            logger.info("tracemalloc_started", frames=tracemalloc.get_traceback_limit(), pid=os.getpid())
+
+    def stop_tracing(self) -> None:
+        """Desliga o rastreamento e descarta os snapshots"""
+        self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc_stopped", pid=os.getpid())
+
+    def take_snapshot(self) -> Snapshot:
+        """Snapshot filtrado; mantém só os max_snapshots mais recentes"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc desligado")
+        self._counter += 1
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        item = Snapshot(
+            id=f"{os.getpid()}-{self._counter}",
+            created_at=time.time(),
+            traced_bytes=tracemalloc.get_traced_memory()[0],
+            snapshot=snapshot,
+        )
+        self._snapshots[item.id] = item
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return item
+
+    def get_snapshot(self, snapshot_id: str) -> Optional[Snapshot]:
+        return self._snapshots.get(snapshot_id)
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        return [
+            {"id": item.id, "created_at": item.created_at, "traced_bytes": item.traced_bytes}
+            for item in self._snapshots.values()
+        ]
+
+    def diff(self, base: Snapshot, current: Snapshot, limit: int = 25, group_by: str = "lineno") -> Dict[str, Any]:
+        """Locais de alocação que mais cresceram de base para current"""
+        stats = current.snapshot.compare_to(base.snapshot, group_by)
+        growth = sum(stat.size_diff for stat in stats)
+        return {
+            "base": base.id,
+            "current": current.id,
+            "interval_s": round(current.created_at - base.created_at, 1),
+            "size_diff_bytes": growth,
+            "top": [
+                {
+                    "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+
+class MemoryCollector:
+    """Métricas de memória do worker para o /metrics"""
+
+    def __init__(self, service: MemoryService):
+        self.service = service
+
+    def collect(self):
+        pid = str(os.getpid())
+        rss = GaugeMetricFamily("worker_resident_memory_bytes", "RSS do worker", labels=["pid"])
+        rss.add_metric([pid], rss_bytes())
+        yield rss
+
+        blocks = GaugeMetricFamily(
+            "python_heap_allocated_blocks", "Blocos alocados pelo alocador do Python", labels=["pid"]
+        )
+        blocks.add_metric([pid], sys.getallocatedblocks())
+        yield blocks
+
+        pending = GaugeMetricFamily(
+            "python_gc_pending_objects", "Objetos aguardando coleta", labels=["pid", "generation"]
+        )
+        for generation, count in enumerate(gc.get_count()):
+            pending.add_metric([pid, str(generation)], count)
+        yield pending
+
+        if tracemalloc.is_tracing():
+            traced = GaugeMetricFamily("python_tracemalloc_traced_bytes", "Bytes rastreados", labels=["pid"])
+            traced.add_metric([pid], tracemalloc.get_traced_memory()[0])
+            yield traced
+
+
+# Singleton instance
+memory_service = MemoryService()
+REGISTRY.register(MemoryCollector(memory_service))
@@ -1,5 +1,8 @@
 """
 Hooks de Notificação
+
+Gravam no outbox na transação do chamador: chame antes do commit da
+alteração de negócio (a entrega é feita pelo dispatcher de app/services/outbox.py).
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,7 +15,7 @@ ROLE_MORADOR, ROLE_SINDICO, ROLE_PORTEIRO, ROLE_ADMIN, ROLE_SUPERADMIN = 1, 2, 3
 class ReservationNotifications:
     @staticmethod
     async def on_create(db, tenant_id, data):
-        await NotificationService.create_for_role(
+        await NotificationService.enqueue_for_role(
             db,
             tenant_id,
             ROLE_SINDICO,
@@ -29,7 +32,7 @@ class MaintenanceNotifications:
     @staticmethod
     async def on_create(db, tenant_id, data):
         ntype = "maintenance_urgent" if data.get("priority") == "urgent" else "maintenance_new"
-        await NotificationService.create_for_role(
+        await NotificationService.enqueue_for_role(
             db,
             tenant_id,
             ROLE_SINDICO,
@@ -45,7 +48,7 @@ class MaintenanceNotifications:
 class VotingNotifications:
     @staticmethod
     async def on_create(db, tenant_id, data, creator_id):
-        return await NotificationService.create_for_all_residents(
+        return await NotificationService.enqueue_for_all_residents(
             db,
             tenant_id,
             "voting_new",
@@ -60,7 +63,7 @@ class VotingNotifications:
 class OccurrenceNotifications:
     @staticmethod
     async def on_create(db, tenant_id, data):
-        await NotificationService.create_for_role(
+        await NotificationService.enqueue_for_role(
             db,
             tenant_id,
             ROLE_SINDICO,
@@ -76,7 +79,7 @@ class OccurrenceNotifications:
 class AnnouncementNotifications:
     @staticmethod
     async def on_create(db, tenant_id, data, creator_id):
-        return await NotificationService.create_for_all_residents(
+        return await NotificationService.enqueue_for_all_residents(
             db,
             tenant_id,
             "announcement_new",
@@ -91,7 +94,7 @@ class AnnouncementNotifications:
 class ClassifiedNotifications:
     @staticmethod
     async def on_create(db, tenant_id, data, creator_id):
-        return await NotificationService.create_for_all_residents(
+        return await NotificationService.enqueue_for_all_residents(
             db,
             tenant_id,
             "classified_new",
@@ -106,7 +109,7 @@ class ClassifiedNotifications:
 class SurveyNotifications:
     @staticmethod
     async def on_create(db, tenant_id, data, creator_id):
-        return await NotificationService.create_for_all_residents(
+        return await NotificationService.enqueue_for_all_residents(
             db,
             tenant_id,
             "survey_new",
@@ -122,62 +125,27 @@ class DeliveryNotifications:
     @staticmethod
     async def on_arrive(db, tenant_id, data):
         """Notifica moradores da unidade sobre chegada de encomenda"""
-        from sqlalchemy import text
-
-        # Buscar usuários da unidade
-        result = await db.execute(
-            text(
-                """
-            SELECT u.id FROM users u
-            WHERE u.tenant_id = :tid AND u.unit_id = :unit_id AND u.is_active = TRUE
-        """
-            ),
-            {"tid": tenant_id, "unit_id": data["unit_id"]},
+        return await NotificationService.enqueue_for_unit(
+            db,
+            tenant_id,
+            data["unit_id"],
+            "delivery_arrived",
+            "Encomenda chegou!",
+            f"{data['carrier']} - {data['recipient_name']} - Retire na portaria",
+            "encomenda",
+            data["id"],
         )
-        user_ids = [row[0] for row in result.fetchall()]
-
-        nids = []
-        for uid in user_ids:
-            nid = await NotificationService.create(
-                db,
-                tenant_id,
-                uid,
-                "delivery_arrived",
-                f"Encomenda chegou!",
-                f"{data['carrier']} - {data['recipient_name']} - Retire na portaria",
-                "encomenda",
-                data["id"],
-            )
-            nids.append(nid)
-        return nids
 
     @staticmethod
     async def on_notify(db, tenant_id, data):
         """Notifica moradores quando porteiro envia lembrete"""
-        from sqlalchemy import text
-
-        result = await db.execute(
-            text(
-                """
-            SELECT u.id FROM users u
-            WHERE u.tenant_id = :tid AND u.unit_id = :unit_id AND u.is_active = TRUE
-        """
-            ),
-            {"tid": tenant_id, "unit_id": data["unit_id"]},
+        return await NotificationService.enqueue_for_unit(
+            db,
+            tenant_id,
+            data["unit_id"],
+            "delivery_arrived",
+            "Lembrete: Encomenda aguardando",
+            f"{data['carrier']} para {data['recipient_name']} - {data.get('storage_location', 'Portaria')}",
+            "encomenda",
+            data["id"],
         )
-        user_ids = [row[0] for row in result.fetchall()]
-
-        nids = []
-        for uid in user_ids:
-            nid = await NotificationService.create(
-                db,
-                tenant_id,
-                uid,
-                "delivery_arrived",
-                f"Lembrete: Encomenda aguardando",
-                f"{data['carrier']} para {data['recipient_name']} - {data.get('storage_location', 'Portaria')}",
-                "encomenda",
-                data["id"],
-            )
-            nids.append(nid)
-        return nids
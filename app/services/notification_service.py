@@ -1,5 +1,12 @@
 """
 Serviço Centralizado de Notificações
+
+Os hooks (notification_hooks.py) usam os métodos enqueue*: a notificação vai
+para o outbox na transação do chamador e o dispatcher (app/services/outbox.py)
+grava as linhas de notifications em lote, fora do tempo da requisição.
+
+Depois do commit, as notificações gravadas somam no contador de não lidas e
+viram eventos do stream SSE de cada usuário (app/services/notification_stream.py).
 """
 
 import json
@@ -8,6 +15,32 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.notification_stream import notification_stream
+from app.services.outbox import CANAL_NOTIFICACAO, outbox
+
+INSERT_SQL = """
+    INSERT INTO notifications (tenant_id, user_id, type, category, priority, title, message, icon, color, reference_type, reference_id, actions, metadata)
+    VALUES (:tenant_id, :user_id, :type, :category, :priority, :title, :message, :icon, :color, :ref_type, :ref_id, :actions, :metadata)
+"""
+
+# Colunas devolvidas para os eventos do stream SSE
+RETURNING_COLUMNS = (
+    "id, tenant_id, user_id, type, category, priority, title, message, icon, color, "
+    "reference_type, reference_id, actions, created_at"
+)
+
+# Várias notificações em um único INSERT (as linhas chegam como um array JSON com as chaves de build())
+INSERT_MANY_SQL = f"""
+    INSERT INTO notifications (tenant_id, user_id, type, category, priority, title, message, icon, color, reference_type, reference_id, actions, metadata)
+    SELECT r.tenant_id, r.user_id, r.type, r.category, r.priority, r.title, r.message, r.icon, r.color,
+           r.ref_type, r.ref_id, r.actions::jsonb, r.metadata::jsonb
+    FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS r(
+        tenant_id int, user_id int, type text, category text, priority int, title text, message text,
+        icon text, color text, ref_type text, ref_id int, actions text, metadata text
+    )
+    RETURNING {RETURNING_COLUMNS}
+"""
+
 
 class NotificationService:
     NOTIFICATION_CONFIG = {
@@ -132,9 +165,8 @@ class NotificationService:
     }
 
     @classmethod
-    async def create(
+    def build(
         cls,
-        db: AsyncSession,
         tenant_id: int,
         user_id: int,
         notification_type: str,
@@ -143,42 +175,172 @@ class NotificationService:
         reference_type: str = None,
         reference_id: int = None,
         metadata: Dict = None,
-    ) -> int:
+    ) -> Dict[str, Any]:
+        """Parâmetros do INSERT de uma notificação"""
         config = cls.NOTIFICATION_CONFIG.get(
             notification_type,
             {"type": "info", "category": "info", "priority": 3, "icon": "bell", "color": "#64748b", "actions": []},
         )
+        return {
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "type": config["type"],
+            "category": config["category"],
+            "priority": config["priority"],
+            "title": title,
+            "message": message,
+            "icon": config["icon"],
+            "color": config["color"],
+            "ref_type": reference_type,
+            "ref_id": reference_id,
+            "actions": json.dumps(config.get("actions", [])),
+            "metadata": json.dumps(metadata or {}),
+        }
 
-        actions_json = json.dumps(config.get("actions", []))
-        metadata_json = json.dumps(metadata or {})
+    @classmethod
+    async def create(
+        cls,
+        db: AsyncSession,
+        tenant_id: int,
+        user_id: int,
+        notification_type: str,
+        title: str,
+        message: str,
+        reference_type: str = None,
+        reference_id: int = None,
+        metadata: Dict = None,
+    ) -> int:
+        params = cls.build(
+            tenant_id, user_id, notification_type, title, message, reference_type, reference_id, metadata
+        )
+        result = await db.execute(text(f"{INSERT_SQL} RETURNING {RETURNING_COLUMNS}"), params)
+        row = result.fetchone()
+        await db.commit()
+        await notification_stream.notify_created([row])
+        return row.id
+
+    @classmethod
+    async def create_many(cls, db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Grava várias notificações (parâmetros de build) em um único INSERT, sem commit.
 
-        result = await db.execute(
-            text(
-                """
-            INSERT INTO notifications (tenant_id, user_id, type, category, priority, title, message, icon, color, reference_type, reference_id, actions, metadata)
-            VALUES (:tenant_id, :user_id, :type, :category, :priority, :title, :message, :icon, :color, :ref_type, :ref_id, :actions, :metadata)
-            RETURNING id
+        Returns:
+            Linhas gravadas; depois do commit, passe-as para notification_stream.notify_created
         """
-            ),
+        if not rows:
+            return []
+        result = await db.execute(text(INSERT_MANY_SQL), {"rows": json.dumps(rows)})
+        return result.fetchall()
+
+    # ==================== OUTBOX ====================
+
+    @classmethod
+    async def recipients(
+        cls,
+        db: AsyncSession,
+        tenant_id: int,
+        role: Optional[int] = None,
+        unit_id: Optional[int] = None,
+        exclude_user_id: Optional[int] = None,
+    ) -> List[int]:
+        """Usuários ativos do condomínio (opcionalmente de um papel ou de uma unidade)"""
+        query = "SELECT id FROM users WHERE tenant_id = :tid AND is_active = TRUE"
+        params: Dict[str, Any] = {"tid": tenant_id}
+        if role is not None:
+            query += " AND role = :role"
+            params["role"] = role
+        if unit_id is not None:
+            query += " AND id IN (SELECT user_id FROM unit_residents WHERE unit_id = :unit_id AND is_active = TRUE)"
+            params["unit_id"] = unit_id
+        if exclude_user_id:
+            query += " AND id != :exclude"
+            params["exclude"] = exclude_user_id
+        result = await db.execute(text(query), params)
+        return [row[0] for row in result.fetchall()]
+
+    @classmethod
+    async def enqueue(
+        cls,
+        db: AsyncSession,
+        tenant_id: int,
+        user_ids: List[int],
+        notification_type: str,
+        title: str,
+        message: str,
+        reference_type: str = None,
+        reference_id: int = None,
+        metadata: Dict = None,
+    ) -> int:
+        """Grava no outbox a notificação para os usuários (commit fica com o chamador)"""
+        if not user_ids:
+            return 0
+        await outbox.enqueue(
+            db,
+            CANAL_NOTIFICACAO,
             {
-                "tenant_id": tenant_id,
-                "user_id": user_id,
-                "type": config["type"],
-                "category": config["category"],
-                "priority": config["priority"],
+                "user_ids": list(user_ids),
+                "notification_type": notification_type,
                 "title": title,
                 "message": message,
-                "icon": config["icon"],
-                "color": config["color"],
-                "ref_type": reference_type,
-                "ref_id": reference_id,
-                "actions": actions_json,
-                "metadata": metadata_json,
+                "reference_type": reference_type,
+                "reference_id": reference_id,
+                "metadata": metadata,
             },
+            tenant_id=tenant_id,
+        )
+        return len(user_ids)
+
+    @classmethod
+    async def enqueue_for_role(
+        cls,
+        db: AsyncSession,
+        tenant_id: int,
+        role: int,
+        notification_type: str,
+        title: str,
+        message: str,
+        reference_type: str = None,
+        reference_id: int = None,
+        exclude_user_id: int = None,
+    ) -> int:
+        user_ids = await cls.recipients(db, tenant_id, role=role, exclude_user_id=exclude_user_id)
+        return await cls.enqueue(
+            db, tenant_id, user_ids, notification_type, title, message, reference_type, reference_id
+        )
+
+    @classmethod
+    async def enqueue_for_all_residents(
+        cls,
+        db: AsyncSession,
+        tenant_id: int,
+        notification_type: str,
+        title: str,
+        message: str,
+        reference_type: str = None,
+        reference_id: int = None,
+        exclude_user_id: int = None,
+    ) -> int:
+        user_ids = await cls.recipients(db, tenant_id, exclude_user_id=exclude_user_id)
+        return await cls.enqueue(
+            db, tenant_id, user_ids, notification_type, title, message, reference_type, reference_id
+        )
+
+    @classmethod
+    async def enqueue_for_unit(
+        cls,
+        db: AsyncSession,
+        tenant_id: int,
+        unit_id: int,
+        notification_type: str,
+        title: str,
+        message: str,
+        reference_type: str = None,
+        reference_id: int = None,
+    ) -> int:
+        user_ids = await cls.recipients(db, tenant_id, unit_id=unit_id)
+        return await cls.enqueue(
+            db, tenant_id, user_ids, notification_type, title, message, reference_type, reference_id
         )
-        nid = result.scalar()
-        await db.commit()
-        return nid
 
     @classmethod
     async def create_for_role(
@@ -0,0 +1,376 @@
+"""
+Contador de Não Lidas e Stream de Notificações (SSE)
+
+O sino do frontend chamava GET /notifications, que conta as não lidas no SQL
+a cada polling, e quem estava desconectado perdia os eventos. Aqui, por
+usuário:
+
+- contador de não lidas em um hash do Redis (conecta:notif:<tenant>:<user>,
+  campos ok e unread). NotificationService.create e o outbox somam após o
+  commit; as ações de lida/dispensada e o mark-all-read subtraem exatamente o
+  que mudou (o UPDATE devolve o estado anterior). O campo ok só é gravado pela
+  recontagem no banco: um HINCRBY sobre um hash expirado cria o campo unread
+  sem ok, e a próxima leitura reconta em vez de confiar nele. A recontagem
+  usa WATCH/MULTI: uma soma que chega durante o COUNT descarta o HSET. O TTL
+  (NOTIFICATION_UNREAD_TTL_SECONDS) corrige divergências raras, como linhas
+  removidas fora da API;
+- Redis Stream de eventos (conecta:notif:<tenant>:<user>:eventos) com XADD
+  MAXLEN ~ NOTIFICATION_STREAM_MAXLEN: "notification" (nova), "read"
+  (lidas/dispensadas) e o total de não lidas em cada evento;
+- GET /notifications/stream (SSE): envia o total atual, repõe o que o cliente
+  perdeu a partir do Last-Event-ID e segue com os eventos novos. Se o id não
+  está mais no stream (cortado ou expirado) envia "reset" para o cliente
+  recarregar a lista.
+
+Cada worker tem um único leitor (XREAD BLOCK em uma conexão própria, fora do
+pool) para todos os streams com conexões abertas; os eventos são repassados
+às filas de cada conexão. Uma conexão lenta cuja fila enche é encerrada e o
+EventSource reconecta repondo pelo Last-Event-ID.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.core.serialization import dumps
+from app.services.cache import cache, cache_key
+
+logger = get_logger(__name__)
+
+EVENTO_NOTIFICACAO = "notification"
+EVENTO_LIDA = "read"
+EVENTO_NAO_LIDAS = "unread"
+EVENTO_RESET = "reset"
+
+SSE_RETRY_MS = 3000  # espera do EventSource antes de reconectar
+
+UNREAD_SQL = (
+    "SELECT COUNT(*) FROM notifications "
+    "WHERE user_id = :uid AND tenant_id = :tid AND NOT is_read AND NOT is_dismissed"
+)
+
+Usuario = Tuple[int, int]  # (tenant_id, user_id)
+
+
+def counter_key(tenant_id: int, user_id: int) -> str:
+    return cache_key("notif", str(tenant_id), str(user_id))
+
+
+def stream_key(tenant_id: int, user_id: int) -> str:
+    return cache_key("notif", str(tenant_id), str(user_id), "eventos")
+
+
+def _id_tuple(entry_id: str) -> Tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def sse_event(event: str, data: str, event_id: Optional[str] = None) -> str:
+    """Um evento no formato text/event-stream"""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {data}\n\n"
+
+
+def notification_payload(row: Any) -> Dict[str, Any]:
+    """Notificação gravada (linha do RETURNING) no formato do evento"""
+    payload = dict(row._mapping if hasattr(row, "_mapping") else row)
+    if isinstance(payload.get("actions"), str):
+        payload["actions"] = json.loads(payload["actions"])
+    return payload
+
+
+class _Conexao:
+    """Uma conexão SSE: fila de eventos e o último id entregue"""
+
+    __slots__ = ("key", "last_id", "queue", "ativa")
+
+    def __init__(self, key: str, last_id: str):
+        self.key = key
+        self.last_id = last_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.NOTIFICATION_SSE_QUEUE_SIZE)
+        self.ativa = True
+
+
+class NotificationStreamService:
+    """
+    Contador de não lidas e eventos de notificação por usuário.
+
+    Usage:
+        total = await notification_stream.unread(db, tenant_id, user_id)
+        await notification_stream.notify_created(rows)          # após o commit
+        await notification_stream.adjust(tenant_id, user_id, -1, [nid])
+
+        unread = await notification_stream.unread(db, tenant_id, user_id)
+        return StreamingResponse(notification_stream.events(tenant_id, user_id, unread, last_event_id), ...)
+    """
+
+    def __init__(self, reader_factory: Optional[Callable[[], redis.Redis]] = None):
+        self._reader_factory = reader_factory or (
+            lambda: redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        )
+        self._reader: Optional[redis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+        self._conexoes: Dict[str, Set[_Conexao]] = {}
+        self._posicoes: Dict[str, str] = {}
+        self._acordar = asyncio.Event()
+
+    # ==================== CONTADOR ====================
+
+    async def unread(self, db: AsyncSession, tenant_id: int, user_id: int) -> int:
+        """Total de não lidas; só consulta o banco quando o contador não existe (ou é inválido)"""
+        client = cache._client
+        key = counter_key(tenant_id, user_id)
+        if client is not None:
+            try:
+                ok, valor = await client.hmget(key, ["ok", "unread"])
+                if ok and valor is not None and int(valor) >= 0:
+                    return int(valor)
+            except Exception as e:
+                logger.warning("notification_unread_read_error", user_id=user_id, error=str(e))
+            try:
+                return await self._recount(client, db, key, tenant_id, user_id)
+            except redis.RedisError as e:
+                logger.warning("notification_unread_write_error", user_id=user_id, error=str(e))
+
+        result = await db.execute(text(UNREAD_SQL), {"uid": user_id, "tid": tenant_id})
+        return result.scalar() or 0
+
+    async def _recount(self, client: redis.Redis, db: AsyncSession, key: str, tenant_id: int, user_id: int) -> int:
+        """
+        Conta no banco e grava o contador só se nenhum HINCRBY chegou durante a contagem.
+
+        O WATCH começa antes do COUNT: um notify_created/adjust entre a contagem e
+        o HSET invalida a transação e o contador fica sem ok (a próxima leitura
+        reconta), em vez de a soma se perder até o TTL.
+        """
+        async with client.pipeline(transaction=True) as pipe:
+            await pipe.watch(key)
+            result = await db.execute(text(UNREAD_SQL), {"uid": user_id, "tid": tenant_id})
+            total = result.scalar() or 0
+            pipe.multi()
+            pipe.hset(key, mapping={"ok": 1, "unread": total})
+            pipe.expire(key, settings.NOTIFICATION_UNREAD_TTL_SECONDS)
+            try:
+                await pipe.execute()
+            except redis.WatchError:
+                logger.debug("notification_unread_recount_raced", user_id=user_id)
+        return total
+
+    async def _increment(self, client: redis.Redis, deltas: Dict[Usuario, int]) -> Dict[Usuario, Optional[int]]:
+        """Aplica os deltas; devolve o novo total de cada usuário (None quando o contador ainda não é válido)"""
+        async with client.pipeline(transaction=False) as pipe:
+            for (tenant_id, user_id), delta in deltas.items():
+                pipe.hincrby(counter_key(tenant_id, user_id), "unread", delta)
+                pipe.hget(counter_key(tenant_id, user_id), "ok")
+            results = await pipe.execute()
+
+        totais: Dict[Usuario, Optional[int]] = {}
+        for index, usuario in enumerate(deltas):
+            total, ok = results[2 * index], results[2 * index + 1]
+            totais[usuario] = total if ok and total >= 0 else None
+        return totais
+
+    async def invalidate(self, tenant_id: int, user_id: Optional[int] = None) -> None:
+        """Descarta contadores (de um usuário ou do condomínio inteiro) após remoções em massa"""
+        if user_id is not None:
+            await cache.delete(counter_key(tenant_id, user_id))
+        else:
+            # Só os contadores (terminam no user_id); os streams terminam em ":eventos"
+            await cache.delete_pattern(cache_key("notif", str(tenant_id), "*[0-9]"))
+
+    # ==================== EVENTOS ====================
+
+    async def _append(self, client: redis.Redis, eventos: List[Tuple[Usuario, str, Dict[str, Any]]]) -> None:
+        ttl = settings.NOTIFICATION_STREAM_TTL_SECONDS
+        async with client.pipeline(transaction=False) as pipe:
+            for (tenant_id, user_id), event, data in eventos:
+                key = stream_key(tenant_id, user_id)
+                pipe.xadd(
+                    key,
+                    {"event": event, "data": dumps(data).decode()},
+                    maxlen=settings.NOTIFICATION_STREAM_MAXLEN,
+                    approximate=True,
+                )
+                pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def notify_created(self, rows: Iterable[Any]) -> None:
+        """Notificações gravadas (após o commit): +1 no contador e evento "notification" para cada uma"""
+        notificacoes = [notification_payload(row) for row in rows]
+        client = cache._client
+        if client is None or not notificacoes:
+            return
+
+        try:
+            deltas: Dict[Usuario, int] = {}
+            for notificacao in notificacoes:
+                usuario = (notificacao["tenant_id"], notificacao["user_id"])
+                deltas[usuario] = deltas.get(usuario, 0) + 1
+            totais = await self._increment(client, deltas)
+            await self._append(
+                client,
+                [
+                    (
+                        (n["tenant_id"], n["user_id"]),
+                        EVENTO_NOTIFICACAO,
+                        {"notification": n, "unread": totais[(n["tenant_id"], n["user_id"])]},
+                    )
+                    for n in notificacoes
+                ],
+            )
+        except Exception as e:
+            logger.warning("notification_stream_publish_error", notifications=len(notificacoes), error=str(e))
+
+    async def adjust(self, tenant_id: int, user_id: int, delta: int, ids: List[int]) -> None:
+        """Notificações que deixaram de ser (delta < 0) ou voltaram a ser não lidas; evento "read" após o commit"""
+        client = cache._client
+        if client is None or not delta:
+            return
+
+        try:
+            totais = await self._increment(client, {(tenant_id, user_id): delta})
+            await self._append(
+                client, [((tenant_id, user_id), EVENTO_LIDA, {"ids": ids, "unread": totais[(tenant_id, user_id)]})]
+            )
+        except Exception as e:
+            logger.warning("notification_stream_adjust_error", user_id=user_id, error=str(e))
+
+    async def replay(
+        self, tenant_id: int, user_id: int, last_event_id: Optional[str]
+    ) -> Tuple[List[Tuple[str, Dict[str, str]]], str, bool]:
+        """
+        Eventos depois de last_event_id.
+
+        Returns:
+            (eventos, id a partir do qual seguir, houve lacuna). Sem last_event_id
+            não há reposição: segue a partir do último evento existente.
+        """
+        client = cache._client
+        key = stream_key(tenant_id, user_id)
+        if not last_event_id:
+            last = await client.xrevrange(key, max="+", min="-", count=1)
+            return [], last[0][0] if last else "0-0", False
+
+        # Inclusivo: se o próprio last_event_id não está mais no stream, eventos podem ter se perdido
+        entries = await client.xrange(key, min=last_event_id, max="+", count=settings.NOTIFICATION_STREAM_MAXLEN + 1)
+        if entries and entries[0][0] == last_event_id:
+            entries = entries[1:]
+            lacuna = False
+        else:
+            lacuna = True
+        return entries, entries[-1][0] if entries else last_event_id, lacuna
+
+    async def events(
+        self, tenant_id: int, user_id: int, unread: int, last_event_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Corpo text/event-stream de uma conexão (termina quando o cliente desconecta).
+
+        unread é lido antes pelo endpoint: a sessão do banco não fica presa à conexão.
+        """
+        entries, posicao, lacuna = await self.replay(tenant_id, user_id, last_event_id)
+        conexao = self._subscribe(stream_key(tenant_id, user_id), posicao)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            if lacuna:
+                yield sse_event(EVENTO_RESET, "{}")
+            yield sse_event(EVENTO_NAO_LIDAS, json.dumps({"unread": unread}))
+            for entry_id, fields in entries:
+                yield sse_event(fields["event"], fields["data"], entry_id)
+
+            while conexao.ativa or not conexao.queue.empty():
+                try:
+                    entry_id, fields = await asyncio.wait_for(
+                        conexao.queue.get(), timeout=settings.NOTIFICATION_SSE_PING_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield sse_event(fields["event"], fields["data"], entry_id)
+        finally:
+            self._unsubscribe(conexao)
+
+    # ==================== LEITOR POR WORKER ====================
+
+    def _subscribe(self, key: str, last_id: str) -> _Conexao:
+        conexao = _Conexao(key, last_id)
+        self._conexoes.setdefault(key, set()).add(conexao)
+        posicao = self._posicoes.get(key)
+        if posicao is None or _id_tuple(last_id) < _id_tuple(posicao):
+            self._posicoes[key] = last_id
+        self._acordar.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._read_loop())
+        return conexao
+
+    def _unsubscribe(self, conexao: _Conexao) -> None:
+        conexao.ativa = False
+        conexoes = self._conexoes.get(conexao.key)
+        if conexoes is None:
+            return
+        conexoes.discard(conexao)
+        if not conexoes:
+            del self._conexoes[conexao.key]
+            self._posicoes.pop(conexao.key, None)
+
+    def _deliver(self, key: str, entries: List[Tuple[str, Dict[str, str]]]) -> None:
+        for entry_id, fields in entries:
+            if key in self._posicoes:
+                self._posicoes[key] = entry_id
+            for conexao in list(self._conexoes.get(key, ())):
+                if _id_tuple(entry_id) <= _id_tuple(conexao.last_id):
+                    continue
+                try:
+                    conexao.queue.put_nowait((entry_id, fields))
+                    conexao.last_id = entry_id
+                except asyncio.QueueFull:
+                    logger.info("notification_stream_slow_client", key=key)
+                    self._unsubscribe(conexao)
+
+    async def _read_loop(self) -> None:
+        """XREAD BLOCK em todos os streams com conexões abertas neste worker"""
+        if self._reader is None:
+            self._reader = self._reader_factory()
+        while True:
+            if not self._posicoes:
+                self._acordar.clear()
+                await self._acordar.wait()
+                continue
+            try:
+                response = await self._reader.xread(
+                    dict(self._posicoes), count=100, block=settings.NOTIFICATION_SSE_BLOCK_MS
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("notification_stream_read_error", error=str(e))
+                await asyncio.sleep(1)
+                continue
+            for key, entries in response or []:
+                self._deliver(key, entries)
+
+    @property
+    def connections(self) -> int:
+        return sum(len(conexoes) for conexoes in self._conexoes.values())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._reader is not None:
+            await self._reader.close()
+            self._reader = None
+
+
+# Singleton instance
+notification_stream = NotificationStreamService()
@@ -0,0 +1,596 @@
+"""
+Outbox Transacional
+
+Notificações, e-mails e webhooks eram executados dentro da requisição: a
+latência incluía SMTP e HTTP, e uma falha depois do commit perdia o efeito.
+Aqui o endpoint só grava a mensagem na tabela outbox (migration 009), na
+mesma transação da alteração de negócio, e o dispatcher entrega depois:
+
+- N workers asyncio por processo; cada um reivindica lotes de um canal com
+  FOR UPDATE SKIP LOCKED (vários workers e processos nunca pegam a mesma
+  mensagem) e um lease (bloqueado_ate) que devolve à fila as mensagens de um
+  worker que morreu no meio do envio;
+- o lote inteiro é entregue de uma vez: notificações em um único executemany
+  (na mesma transação que as marca como enviadas), e-mails por uma conexão
+  SMTP mantida aberta entre lotes, webhooks por um pool HTTP keep-alive;
+- falha temporária volta para pendente com backoff exponencial e jitter;
+  falha definitiva (4xx, destinatário recusado) ou OUTBOX_MAX_ATTEMPTS
+  tentativas vão para status morta (dead-letter), reprocessáveis com
+  requeue();
+- métricas Prometheus (/metrics): mensagens por canal e resultado, duração
+  dos lotes e atraso entre a gravação e a entrega.
+
+Uso no endpoint:
+
+    await outbox.enqueue(db, CANAL_EMAIL, {"to": ..., "subject": ..., "body": ...}, tenant_id=tenant_id)
+    await db.commit()  # a mensagem só existe se a alteração existir
+"""
+
+import asyncio
+import json
+import random
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from prometheus_client import Counter, Histogram
+from sqlalchemy import text
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.database import get_db_context
+from app.services.notification_stream import notification_stream
+
+logger = get_logger(__name__)
+
+CANAL_NOTIFICACAO = "notificacao"
+CANAL_EMAIL = "email"
+CANAL_WEBHOOK = "webhook"
+
+OUTBOX_MESSAGES = Counter(
+    "outbox_messages_total", "Mensagens do outbox processadas", ["canal", "resultado"]
+)  # resultado: enviado, retentativa, morta
+OUTBOX_BATCH = Histogram(
+    "outbox_batch_seconds",
+    "Duração da entrega de um lote do outbox",
+    ["canal"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+OUTBOX_LAG = Histogram(
+    "outbox_delivery_lag_seconds",
+    "Tempo entre a gravação da mensagem e a entrega",
+    ["canal"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 3600.0),
+)
+
+# Status HTTP de webhook que justificam nova tentativa
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+CLAIM_SQL = """
+    UPDATE outbox o
+    SET status = 'processando', tentativas = o.tentativas + 1,
+        bloqueado_ate = NOW() + make_interval(secs => :lease)
+    FROM (
+        SELECT id FROM outbox
+        WHERE canal = :canal AND proxima_tentativa_em <= NOW()
+          AND (status = 'pendente' OR (status = 'processando' AND bloqueado_ate < NOW()))
+        ORDER BY proxima_tentativa_em, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) livre
+    WHERE o.id = livre.id
+    RETURNING o.id, o.tenant_id, o.canal, o.payload, o.tentativas, o.created_at
+"""
+
+
+@dataclass
+class Mensagem:
+    """Mensagem reivindicada por um worker"""
+
+    id: int
+    canal: str
+    tenant_id: Optional[int]
+    payload: Dict[str, Any]
+    tentativas: int
+    created_at: datetime
+
+
+@dataclass
+class Falha:
+    """Falha na entrega de uma mensagem; definitiva não é tentada de novo"""
+
+    erro: str
+    definitiva: bool = False
+
+
+def backoff_seconds(tentativas: int) -> float:
+    """Atraso antes da próxima tentativa: exponencial limitado, com jitter (50-100%)"""
+    base = min(settings.OUTBOX_BACKOFF_SECONDS * 2 ** (tentativas - 1), settings.OUTBOX_BACKOFF_MAX_SECONDS)
+    return base * random.uniform(0.5, 1.0)
+
+
+# ==================== CANAIS ====================
+
+
+class Canal:
+    """Entrega de um lote de mensagens de um canal"""
+
+    nome: str = ""
+
+    async def entregar(self, db: AsyncSession, mensagens: List[Mensagem]) -> Dict[int, Falha]:
+        """Entrega o lote; devolve só as mensagens que falharam"""
+        raise NotImplementedError
+
+    async def confirmar(self, db: AsyncSession) -> None:
+        """Efeitos que dependem do commit do lote (entregar() guarda o que precisar em db.info)"""
+
+    async def close(self) -> None:
+        pass
+
+
+class NotificacaoCanal(Canal):
+    """Linhas de notifications para todos os destinatários do lote em um único INSERT (por mensagem se falhar)"""
+
+    nome = CANAL_NOTIFICACAO
+
+    async def entregar(self, db: AsyncSession, mensagens: List[Mensagem]) -> Dict[int, Falha]:
+        from app.services.notification_service import NotificationService
+
+        validas: List[Tuple[Mensagem, List[Dict[str, Any]]]] = []
+        falhas: Dict[int, Falha] = {}
+        for mensagem in mensagens:
+            payload = mensagem.payload
+            try:
+                linhas = [
+                    NotificationService.build(
+                        mensagem.tenant_id,
+                        user_id,
+                        payload["notification_type"],
+                        payload["title"],
+                        payload["message"],
+                        payload.get("reference_type"),
+                        payload.get("reference_id"),
+                        payload.get("metadata"),
+                    )
+                    for user_id in payload["user_ids"]
+                ]
+            except KeyError as exc:
+                falhas[mensagem.id] = Falha(f"Payload sem {exc}", definitiva=True)
+            else:
+                validas.append((mensagem, linhas))
+
+        rows = [row for _, linhas in validas for row in linhas]
+        if not rows:
+            return falhas
+        try:
+            async with db.begin_nested():
+                inseridas = await NotificationService.create_many(db, rows)
+        except (IntegrityError, DataError):
+            # Uma linha inválida (ex.: user_id removido) derruba o INSERT do lote: refaz por mensagem,
+            # cada uma no seu savepoint, e só as rejeitadas vão para a dead-letter
+            inseridas = []
+            for mensagem, linhas in validas:
+                try:
+                    async with db.begin_nested():
+                        inseridas.extend(await NotificationService.create_many(db, linhas))
+                except (IntegrityError, DataError) as exc:
+                    falhas[mensagem.id] = Falha(f"Rejeitada pelo banco: {exc.orig}", definitiva=True)
+        db.info["notificacoes"] = inseridas
+        return falhas
+
+    async def confirmar(self, db: AsyncSession) -> None:
+        # Contadores de não lidas e stream SSE só depois que as linhas existem
+        await notification_stream.notify_created(db.info.pop("notificacoes", []))
+
+
+class EmailCanal(Canal):
+    """E-mails por uma conexão SMTP mantida aberta entre lotes (smtplib em thread)"""
+
+    nome = CANAL_EMAIL
+
+    def __init__(self, smtp_factory: Optional[Callable[[], smtplib.SMTP]] = None):
+        self._smtp_factory = smtp_factory or self._connect
+        self._smtp: Optional[smtplib.SMTP] = None
+        # Os workers do processo compartilham a conexão e smtplib não é thread-safe: um lote por vez
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _connect() -> smtplib.SMTP:
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.OUTBOX_SMTP_TIMEOUT_SECONDS)
+        if settings.SMTP_USE_TLS:
+            smtp.starttls()
+        if settings.SMTP_USER:
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return smtp
+
+    def _connection(self) -> smtplib.SMTP:
+        """Reaproveita a conexão aberta se o servidor ainda responde"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close()
+        self._smtp = self._smtp_factory()
+        return self._smtp
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._smtp = None
+
+    @staticmethod
+    def build_message(mensagem: Mensagem) -> EmailMessage:
+        payload = mensagem.payload
+        email = EmailMessage()
+        email["From"] = payload.get("from") or settings.SMTP_FROM_EMAIL
+        email["To"] = payload["to"] if isinstance(payload["to"], str) else ", ".join(payload["to"])
+        email["Subject"] = payload["subject"]
+        # Estável entre tentativas: o destinatário consegue descartar duplicatas
+        email["Message-ID"] = f"<outbox-{mensagem.id}@{settings.SMTP_FROM_EMAIL.split('@')[-1]}>"
+        email.set_content(payload.get("body") or "")
+        if payload.get("html"):
+            email.add_alternative(payload["html"], subtype="html")
+        return email
+
+    def _send_batch(self, mensagens: List[Mensagem]) -> Dict[int, Falha]:
+        with self._lock:
+            return self._send_locked(mensagens)
+
+    def _send_locked(self, mensagens: List[Mensagem]) -> Dict[int, Falha]:
+        falhas: Dict[int, Falha] = {}
+        try:
+            smtp = self._connection()
+        except (smtplib.SMTPException, OSError) as exc:
+            return {m.id: Falha(f"SMTP: {exc}") for m in mensagens}
+
+        for mensagem in mensagens:
+            try:
+                smtp.send_message(self.build_message(mensagem))
+            except KeyError as exc:
+                falhas[mensagem.id] = Falha(f"Payload sem {exc}", definitiva=True)
+            except smtplib.SMTPRecipientsRefused as exc:
+                falhas[mensagem.id] = Falha(f"Destinatário recusado: {exc.recipients}", definitiva=True)
+            except smtplib.SMTPResponseException as exc:
+                falhas[mensagem.id] = Falha(
+                    f"SMTP {exc.smtp_code}: {exc.smtp_error!r}", definitiva=exc.smtp_code >= 500
+                )
+            except (smtplib.SMTPException, OSError) as exc:
+                # Conexão caiu: o restante do lote volta para a fila
+                self._close()
+                for pendente in mensagens[mensagens.index(mensagem) :]:
+                    falhas[pendente.id] = Falha(f"SMTP: {exc}")
+                break
+        return falhas
+
+    async def entregar(self, db: AsyncSession, mensagens: List[Mensagem]) -> Dict[int, Falha]:
+        return await asyncio.to_thread(self._send_batch, mensagens)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+
+class WebhookCanal(Canal):
+    """POST JSON por um pool HTTP keep-alive compartilhado entre lotes"""
+
+    nome = CANAL_WEBHOOK
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=settings.OUTBOX_WEBHOOK_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.OUTBOX_WEBHOOK_CONCURRENCY,
+                    max_keepalive_connections=settings.OUTBOX_WEBHOOK_CONCURRENCY,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def _post(self, client: httpx.AsyncClient, mensagem: Mensagem) -> Optional[Falha]:
+        payload = mensagem.payload
+        if "url" not in payload:
+            return Falha("Payload sem 'url'", definitiva=True)
+        try:
+            response = await client.post(
+                payload["url"],
+                content=json.dumps(payload.get("body"), default=str),
+                headers={
+                    "Content-Type": "application/json",
+                    "Idempotency-Key": f"outbox-{mensagem.id}",
+                    **(payload.get("headers") or {}),
+                },
+            )
+        except httpx.TransportError as exc:
+            return Falha(f"{type(exc).__name__}: {exc}")
+        if response.status_code < 300:
+            return None
+        return Falha(f"HTTP {response.status_code}", definitiva=response.status_code not in RETRY_STATUS)
+
+    async def entregar(self, db: AsyncSession, mensagens: List[Mensagem]) -> Dict[int, Falha]:
+        client = self._get_client()
+        limit = asyncio.Semaphore(settings.OUTBOX_WEBHOOK_CONCURRENCY)
+
+        async def post(mensagem: Mensagem) -> Optional[Falha]:
+            async with limit:
+                return await self._post(client, mensagem)
+
+        resultados = await asyncio.gather(*(post(m) for m in mensagens))
+        return {m.id: falha for m, falha in zip(mensagens, resultados) if falha is not None}
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# ==================== SERVIÇO ====================
+
+
+class OutboxService:
+    """
+    Gravação no outbox e dispatcher com pool de workers.
+
+    Usage:
+        await outbox.enqueue(db, CANAL_WEBHOOK, {"url": url, "body": dados}, tenant_id=tenant_id)
+        outbox.start()        # no startup da aplicação (ou scripts/outbox_dispatcher.py)
+        await outbox.stop()
+    """
+
+    def __init__(
+        self,
+        canais: Optional[List[Canal]] = None,
+        session_factory: Callable = get_db_context,
+    ):
+        canais = canais if canais is not None else [NotificacaoCanal(), EmailCanal(), WebhookCanal()]
+        self.canais: Dict[str, Canal] = {canal.nome: canal for canal in canais}
+        self._session_factory = session_factory
+        self._tasks: List[asyncio.Task] = []
+        self._stop = asyncio.Event()
+
+    # ==================== GRAVAÇÃO ====================
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        canal: str,
+        payload: Dict[str, Any],
+        tenant_id: Optional[int] = None,
+    ) -> int:
+        """Grava a mensagem na transação do chamador (sem commit)"""
+        result = await db.execute(
+            text(
+                "INSERT INTO outbox (tenant_id, canal, payload) "
+                "VALUES (:tenant_id, :canal, CAST(:payload AS jsonb)) RETURNING id"
+            ),
+            {"tenant_id": tenant_id, "canal": canal, "payload": json.dumps(payload, default=str)},
+        )
+        return result.scalar()
+
+    async def enqueue_many(
+        self,
+        db: AsyncSession,
+        canal: str,
+        payloads: List[Dict[str, Any]],
+        tenant_id: Optional[int] = None,
+    ) -> int:
+        """Várias mensagens do mesmo canal em um único executemany (sem commit)"""
+        if payloads:
+            await db.execute(
+                text(
+                    "INSERT INTO outbox (tenant_id, canal, payload) VALUES (:tenant_id, :canal, CAST(:payload AS jsonb))"
+                ),
+                [
+                    {"tenant_id": tenant_id, "canal": canal, "payload": json.dumps(payload, default=str)}
+                    for payload in payloads
+                ],
+            )
+        return len(payloads)
+
+    # ==================== ENTREGA ====================
+
+    async def claim(self, db: AsyncSession, canal: str, limit: int) -> List[Mensagem]:
+        """Reivindica até limit mensagens prontas do canal (SKIP LOCKED + lease)"""
+        result = await db.execute(
+            text(CLAIM_SQL), {"canal": canal, "limit": limit, "lease": settings.OUTBOX_LEASE_SECONDS}
+        )
+        return [
+            Mensagem(
+                id=row.id,
+                canal=row.canal,
+                tenant_id=row.tenant_id,
+                payload=row.payload,
+                tentativas=row.tentativas,
+                created_at=row.created_at,
+            )
+            for row in result.fetchall()
+        ]
+
+    async def finish(self, db: AsyncSession, mensagens: List[Mensagem], falhas: Dict[int, Falha]) -> Dict[str, int]:
+        """Marca enviadas, reagenda as falhas temporárias e move as definitivas para a dead-letter"""
+        enviadas = [m for m in mensagens if m.id not in falhas]
+        retentar = []
+        mortas = []
+        for mensagem in mensagens:
+            falha = falhas.get(mensagem.id)
+            if falha is None:
+                continue
+            if falha.definitiva or mensagem.tentativas >= settings.OUTBOX_MAX_ATTEMPTS:
+                mortas.append((mensagem, falha))
+            else:
+                retentar.append((mensagem, falha))
+
+        if enviadas:
+            await db.execute(
+                text(
+                    "UPDATE outbox SET status = 'enviado', enviado_em = NOW(), bloqueado_ate = NULL, last_error = NULL "
+                    "WHERE id = ANY(:ids)"
+                ),
+                {"ids": [m.id for m in enviadas]},
+            )
+        if retentar:
+            await db.execute(
+                text(
+                    "UPDATE outbox SET status = 'pendente', bloqueado_ate = NULL, last_error = :erro, "
+                    "proxima_tentativa_em = NOW() + make_interval(secs => :atraso) WHERE id = :id"
+                ),
+                [{"id": m.id, "erro": f.erro, "atraso": backoff_seconds(m.tentativas)} for m, f in retentar],
+            )
+        if mortas:
+            await db.execute(
+                text("UPDATE outbox SET status = 'morta', bloqueado_ate = NULL, last_error = :erro WHERE id = :id"),
+                [{"id": m.id, "erro": f.erro} for m, f in mortas],
+            )
+            for mensagem, falha in mortas:
+                logger.warning(
+                    "outbox_dead_letter",
+                    outbox_id=mensagem.id,
+                    canal=mensagem.canal,
+                    tentativas=mensagem.tentativas,
+                    error=falha.erro,
+                )
+
+        return {"enviado": len(enviadas), "retentativa": len(retentar), "morta": len(mortas)}
+
+    async def dispatch(self, canal: str, limit: Optional[int] = None) -> int:
+        """Reivindica e entrega um lote do canal; devolve quantas mensagens foram processadas"""
+        handler = self.canais[canal]
+        async with self._session_factory() as db:
+            mensagens = await self.claim(db, canal, limit or settings.OUTBOX_BATCH_SIZE)
+            await db.commit()
+        if not mensagens:
+            return 0
+
+        started = time.perf_counter()
+        async with self._session_factory() as db:
+            try:
+                falhas = await handler.entregar(db, mensagens)
+            except Exception as exc:
+                await db.rollback()
+                db.info.clear()
+                falhas = {m.id: Falha(f"{type(exc).__name__}: {exc}") for m in mensagens}
+            # notificacao: as linhas gravadas e o status 'enviado' confirmam juntos
+            totais = await self.finish(db, mensagens, falhas)
+            await db.commit()
+            await handler.confirmar(db)
+
+        elapsed = time.perf_counter() - started
+        OUTBOX_BATCH.labels(canal).observe(elapsed)
+        for resultado, total in totais.items():
+            if total:
+                OUTBOX_MESSAGES.labels(canal, resultado).inc(total)
+        now = datetime.now()
+        for mensagem in mensagens:
+            if mensagem.id not in falhas:
+                OUTBOX_LAG.labels(canal).observe(max((now - mensagem.created_at).total_seconds(), 0))
+
+        logger.info(
+            "outbox_batch_dispatched",
+            canal=canal,
+            mensagens=len(mensagens),
+            elapsed_ms=round(elapsed * 1000, 2),
+            por_segundo=round(len(mensagens) / elapsed, 1) if elapsed else None,
+            **totais,
+        )
+        return len(mensagens)
+
+    async def _worker(self, numero: int) -> None:
+        """Percorre os canais enquanto houver trabalho; sem trabalho, espera o intervalo de polling"""
+        while not self._stop.is_set():
+            processadas = 0
+            for canal in self.canais:
+                try:
+                    processadas += await self.dispatch(canal)
+                except Exception as e:
+                    logger.error("outbox_dispatch_failed", worker=numero, canal=canal, error=str(e))
+            if processadas == 0:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, workers: Optional[int] = None) -> None:
+        if self.is_running:
+            return
+        self._stop = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"outbox-worker-{n}")
+            for n in range(workers or settings.OUTBOX_WORKERS)
+        ]
+        logger.info("outbox_dispatcher_started", workers=len(self._tasks), canais=list(self.canais))
+
+    async def stop(self) -> None:
+        """Termina o lote em andamento de cada worker e fecha as conexões SMTP/HTTP"""
+        self._stop.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+        for canal in self.canais.values():
+            await canal.close()
+
+    # ==================== OPERAÇÃO ====================
+
+    async def stats(self, db: AsyncSession) -> List[Dict[str, Any]]:
+        """Mensagens por canal e status, com a mais antiga ainda não entregue"""
+        result = await db.execute(
+            text(
+                """
+                SELECT canal, status, count(*) AS total, min(created_at) AS mais_antiga
+                FROM outbox
+                WHERE status <> 'enviado' OR enviado_em > NOW() - interval '1 hour'
+                GROUP BY canal, status
+                ORDER BY canal, status
+                """
+            )
+        )
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def requeue(self, db: AsyncSession, canal: Optional[str] = None, ids: Optional[List[int]] = None) -> int:
+        """Devolve mensagens da dead-letter para a fila, com as tentativas zeradas"""
+        query = (
+            "UPDATE outbox SET status = 'pendente', tentativas = 0, proxima_tentativa_em = NOW() "
+            "WHERE status = 'morta'"
+        )
+        params: Dict[str, Any] = {}
+        if canal:
+            query += " AND canal = :canal"
+            params["canal"] = canal
+        if ids:
+            query += " AND id = ANY(:ids)"
+            params["ids"] = ids
+        result = await db.execute(text(query), params)
+        await db.commit()
+        return result.rowcount
+
+    async def prune(self, db: AsyncSession) -> int:
+        """Remove as mensagens enviadas há mais de OUTBOX_RETENTION_DAYS"""
+        result = await db.execute(
+            text("DELETE FROM outbox WHERE status = 'enviado' AND enviado_em < NOW() - make_interval(days => :dias)"),
+            {"dias": settings.OUTBOX_RETENTION_DAYS},
+        )
+        await db.commit()
+        return result.rowcount
+
+
+# Singleton instance
+outbox = OutboxService()
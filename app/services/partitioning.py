@@ -0,0 +1,228 @@
+"""
+Gerenciamento de Partições Mensais
+Tabelas de log append-only (access_logs, audit_logs) particionadas por mês
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Tabela particionada -> coluna de tempo usada como chave de partição
+PARTITIONED_TABLES: Dict[str, str] = {
+    "access_logs": "registered_at",
+    "audit_logs": "created_at",
+}
+
+# Advisory lock serializa a manutenção entre workers/processos
+PARTITION_LOCK_KEY = 726_001
+
+
+def month_start(value: date) -> date:
+    """Retorna o primeiro dia do mês de `value`"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Soma (ou subtrai) meses a partir do primeiro dia do mês"""
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """
+    Nome da partição mensal.
+
+    Usage:
+        partition_name("access_logs", date(2025, 3, 1))
+        # Returns: "access_logs_p202503"
+    """
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Nome da partição DEFAULT (recebe linhas fora dos meses criados)"""
+    return f"{table}_default"
+
+
+def parse_partition_month(table: str, name: str) -> Optional[date]:
+    """Extrai o mês de uma partição criada por partition_name(); None se não seguir o padrão"""
+    prefix = f"{table}_p"
+    suffix = name[len(prefix) :]
+    if not name.startswith(prefix) or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    year, month = int(suffix[:4]), int(suffix[4:])
+    if not 1 <= month <= 12:
+        return None
+    return date(year, month, 1)
+
+
+@dataclass
+class PartitionInfo:
+    """Partição existente de uma tabela"""
+
+    name: str
+    month: Optional[date]  # None para a partição DEFAULT
+
+
+class PartitionManager:
+    """
+    Cria partições futuras e desanexa partições antigas.
+
+    As partições desanexadas não são removidas: continuam como tabelas
+    comuns para arquivamento ou DROP manual.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, str]] = None):
+        self.tables = tables or PARTITIONED_TABLES
+
+    async def is_partitioned(self, db: AsyncSession, table: str) -> bool:
+        """Verifica se a tabela já foi convertida para particionada"""
+        result = await db.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table},
+        )
+        return result.scalar() is not None
+
+    async def list_partitions(self, db: AsyncSession, table: str) -> List[PartitionInfo]:
+        """Lista as partições anexadas, ordenadas por mês"""
+        result = await db.execute(
+            text(
+                """
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(:table)
+                ORDER BY c.relname
+            """
+            ),
+            {"table": table},
+        )
+        return [PartitionInfo(name=row[0], month=parse_partition_month(table, row[0])) for row in result.fetchall()]
+
+    async def create_partition(self, db: AsyncSession, table: str, month: date) -> bool:
+        """
+        Cria a partição do mês, se ainda não existir.
+
+        Linhas do intervalo que tenham caído na partição DEFAULT são movidas
+        para a nova partição (o Postgres recusa criar a partição enquanto a
+        DEFAULT contiver linhas do intervalo).
+
+        Returns:
+            True se a partição foi criada
+        """
+        month = month_start(month)
+        name = partition_name(table, month)
+        exists = await db.execute(text("SELECT to_regclass(:name)"), {"name": name})
+        if exists.scalar() is not None:
+            return False
+
+        column = self.tables[table]
+        default = default_partition_name(table)
+        start, end = month, add_months(month, 1)
+        bounds = {"start": start, "end": end}
+
+        has_default = (await db.execute(text("SELECT to_regclass(:name)"), {"name": default})).scalar() is not None
+        moved = False
+        if has_default:
+            pending = await db.execute(
+                text(f"SELECT 1 FROM {default} WHERE {column} >= :start AND {column} < :end LIMIT 1"), bounds
+            )
+            moved = pending.scalar() is not None
+
+        if moved:
+            await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+
+        await db.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+
+        if moved:
+            await db.execute(
+                text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {column} >= :start AND {column} < :end"),
+                bounds,
+            )
+            await db.execute(text(f"DELETE FROM {default} WHERE {column} >= :start AND {column} < :end"), bounds)
+            await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+        logger.info("partition_created", table=table, partition=name, moved_from_default=moved)
+        return True
+
+    async def ensure_partitions(
+        self,
+        db: AsyncSession,
+        months_ahead: Optional[int] = None,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Garante partições do mês corrente até `months_ahead` meses à frente.
+
+        Returns:
+            Nomes das partições criadas
+        """
+        if months_ahead is None:
+            months_ahead = settings.PARTITION_PREMAKE_MONTHS
+        current = month_start(today or datetime.now().date())
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+
+        created = []
+        for table in self.tables:
+            if not await self.is_partitioned(db, table):
+                continue
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                if await self.create_partition(db, table, month):
+                    created.append(partition_name(table, month))
+        return created
+
+    async def detach_old_partitions(
+        self,
+        db: AsyncSession,
+        retention_months: Optional[int] = None,
+        today: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Desanexa partições inteiramente anteriores à janela de retenção.
+
+        Args:
+            retention_months: Meses mantidos anexados além do corrente (0 = não desanexa)
+
+        Returns:
+            Nomes das partições desanexadas
+        """
+        if retention_months is None:
+            retention_months = settings.PARTITION_RETENTION_MONTHS
+        if retention_months <= 0:
+            return []
+
+        cutoff = add_months(month_start(today or datetime.now().date()), -retention_months)
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+
+        detached = []
+        for table in self.tables:
+            if not await self.is_partitioned(db, table):
+                continue
+            for partition in await self.list_partitions(db, table):
+                if partition.month is None or add_months(partition.month, 1) > cutoff:
+                    continue
+                await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+                # A tabela desanexada não recebe mais inserts; solta o vínculo com a sequence do pai
+                await db.execute(text(f"ALTER TABLE {partition.name} ALTER COLUMN id DROP DEFAULT"))
+                detached.append(partition.name)
+                logger.info("partition_detached", table=table, partition=partition.name)
+        return detached
+
+
+# Singleton instance
+partition_manager = PartitionManager()
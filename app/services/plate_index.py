@@ -0,0 +1,386 @@
+"""
+Índice de Placas em Memória - consulta tolerante a erros de OCR
+
+Câmeras LPR e porteiros consultam placas o tempo todo, e o OCR troca
+caracteres parecidos (O/0, I/1, B/8, ...). O índice mantém, por condomínio,
+as placas dos veículos de moradores e de visitantes em três dicionários:
+
+- placa canônica (search_code: sem pontuação, maiúsculas) -> veículos
+- "esqueleto" da placa (caracteres confundíveis colapsados, mais o gêmeo
+  Mercosul da placa antiga) -> veículos
+- vizinhança de deleções do esqueleto (estilo SymSpell) -> esqueletos,
+  para tolerar um caractere trocado, sobrando ou faltando
+
+Todas as consultas são acessos a dicionário: O(1) no número de placas.
+
+O índice é carregado na primeira consulta do condomínio, atualizado de forma
+incremental pelos endpoints que alteram veículos/visitantes e recarregado por
+completo após PLATE_INDEX_TTL_SECONDS (alterações feitas por outros workers).
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.services.search import canonical_code
+
+logger = get_logger(__name__)
+
+# Grupos de caracteres que o OCR confunde; cada grupo vira o primeiro caractere
+OCR_CONFUSIONS = ("0ODQ", "1IL", "8B", "5S", "2Z", "6G", "7T", "4A")
+_SKELETON_TABLE = str.maketrans({char: group[0] for group in OCR_CONFUSIONS for char in group[1:]})
+
+_OLD_PLATE_RE = re.compile(r"^[A-Z]{3}[0-9]{4}$")
+_MERCOSUL_PLATE_RE = re.compile(r"^[A-Z]{3}[0-9][A-J][0-9]{2}$")
+
+# Ordem de relevância entre matches de mesma distância
+MATCH_KINDS = ("exact", "mercosul", "ocr", "fuzzy")
+
+# Chave de um veículo no índice: ("resident", vehicles.id) ou ("visitor", visitor_vehicles.id)
+EntryKey = Tuple[str, int]
+
+
+def mercosul_twin(code: str) -> Optional[str]:
+    """
+    Placa equivalente no outro padrão: ABC1234 <-> ABC1C34.
+
+    Na conversão para o Mercosul o 5º caractere (dígito 0-9) vira letra (A-J).
+    """
+    if _OLD_PLATE_RE.match(code):
+        return f"{code[:4]}{chr(ord('A') + int(code[4]))}{code[5:]}"
+    if _MERCOSUL_PLATE_RE.match(code):
+        return f"{code[:4]}{ord(code[4]) - ord('A')}{code[5:]}"
+    return None
+
+
+def plate_skeleton(code: str) -> str:
+    """Colapsa os caracteres confundíveis: "OBC1I34" e "0BC1134" têm o mesmo esqueleto"""
+    return code.translate(_SKELETON_TABLE)
+
+
+def deletion_variants(value: str) -> Set[str]:
+    """O próprio valor e todas as variantes com um caractere removido"""
+    return {value} | {value[:i] + value[i + 1 :] for i in range(len(value))}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Distância de Levenshtein (placas têm até 7-8 caracteres)"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+@dataclass
+class PlateEntry:
+    """Veículo indexado, com os dados que a portaria precisa na hora"""
+
+    kind: str  # resident, visitor
+    vehicle_id: int
+    plate: str  # canônica
+    model: Optional[str]
+    color: Optional[str]
+    owner_id: int  # users.id (morador) ou visitors.id (visitante)
+    owner_name: Optional[str]
+    unit_id: Optional[int] = None
+    unit: Optional[str] = None  # "A-101"
+    spot: Optional[str] = None  # número da vaga vinculada
+    blocked: bool = False  # visitante bloqueado
+
+    @property
+    def key(self) -> EntryKey:
+        return (self.kind, self.vehicle_id)
+
+
+@dataclass
+class PlateMatch:
+    """Resultado da consulta: veículo, tipo de match e distância de edição no esqueleto"""
+
+    entry: PlateEntry
+    match: str  # exact, mercosul, ocr, fuzzy
+    distance: int
+
+
+class TenantPlateIndex:
+    """Índice de placas de um condomínio"""
+
+    def __init__(self, entries: Iterable[PlateEntry] = ()):
+        self.entries: Dict[EntryKey, PlateEntry] = {}
+        self._by_plate: Dict[str, Set[EntryKey]] = {}
+        self._by_skeleton: Dict[str, Set[EntryKey]] = {}
+        self._by_deletion: Dict[str, Set[str]] = {}
+        self.loaded_at = time.monotonic()
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _skeletons(plate: str) -> Set[str]:
+        twin = mercosul_twin(plate)
+        return {plate_skeleton(plate)} | ({plate_skeleton(twin)} if twin else set())
+
+    def add(self, entry: PlateEntry) -> None:
+        """Insere ou substitui o veículo"""
+        self.remove(entry.key)
+        self.entries[entry.key] = entry
+        self._by_plate.setdefault(entry.plate, set()).add(entry.key)
+        for skeleton in self._skeletons(entry.plate):
+            keys = self._by_skeleton.setdefault(skeleton, set())
+            if not keys:
+                for variant in deletion_variants(skeleton):
+                    self._by_deletion.setdefault(variant, set()).add(skeleton)
+            keys.add(entry.key)
+
+    def remove(self, key: EntryKey) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        _discard(self._by_plate, entry.plate, key)
+        for skeleton in self._skeletons(entry.plate):
+            if _discard(self._by_skeleton, skeleton, key):
+                # Último veículo com esse esqueleto: sai também da vizinhança de deleções
+                for variant in deletion_variants(skeleton):
+                    _discard(self._by_deletion, variant, skeleton)
+
+    def keys_for_owner(self, kind: str, owner_id: int) -> List[EntryKey]:
+        return [key for key, entry in self.entries.items() if entry.kind == kind and entry.owner_id == owner_id]
+
+    def lookup(self, plate: str, limit: int = 5, max_distance: int = 1) -> List[PlateMatch]:
+        """
+        Placas mais próximas da leitura, da mais provável para a menos provável.
+
+        Usage:
+            index.lookup("0BC-1I34")  # encontra ABC1134 como "ocr"
+        """
+        code = canonical_code(plate)
+        if not code:
+            return []
+
+        twin = mercosul_twin(code)
+        skeleton = plate_skeleton(code)
+        found: Dict[EntryKey, PlateMatch] = {}
+
+        for key in self._by_skeleton.get(skeleton, ()):
+            entry = self.entries[key]
+            if entry.plate == code:
+                kind = "exact"
+            elif entry.plate == twin:
+                kind = "mercosul"
+            else:
+                kind = "ocr"
+            found[key] = PlateMatch(entry=entry, match=kind, distance=0)
+
+        if len(found) < limit and max_distance > 0:
+            candidates: Set[str] = set()
+            for variant in deletion_variants(skeleton):
+                candidates.update(self._by_deletion.get(variant, ()))
+            candidates.discard(skeleton)
+            for candidate in candidates:
+                distance = edit_distance(skeleton, candidate)
+                if distance > max_distance:
+                    continue
+                for key in self._by_skeleton[candidate]:
+                    if key not in found:
+                        found[key] = PlateMatch(entry=self.entries[key], match="fuzzy", distance=distance)
+
+        matches = sorted(
+            found.values(), key=lambda item: (item.distance, MATCH_KINDS.index(item.match), item.entry.plate)
+        )
+        return matches[:limit]
+
+    def resident_vehicle(self, plate: str) -> Optional[PlateEntry]:
+        """
+        Veículo de morador para vincular a uma vaga: placa exata sempre vence;
+        sem ela, só um match OCR/Mercosul inequívoco (um único candidato).
+        """
+        code = canonical_code(plate)
+        exact = sorted(key for key in self._by_plate.get(code, ()) if key[0] == "resident")
+        if exact:
+            return self.entries[exact[0]]
+        matches = self.lookup(plate, limit=2, max_distance=0)
+        if len(matches) == 1 and matches[0].entry.kind == "resident":
+            return matches[0].entry
+        return None
+
+
+def _discard(mapping: Dict, key, value) -> bool:
+    """Remove `value` do conjunto em mapping[key]; True se o conjunto ficou vazio"""
+    values = mapping.get(key)
+    if values is None:
+        return False
+    values.discard(value)
+    if not values:
+        del mapping[key]
+        return True
+    return False
+
+
+RESIDENT_VEHICLES_SQL = """
+    SELECT v.id, v.plate, v.model, v.color, v.owner_id, owner.name AS owner_name,
+           v.unit_id, u.block, u.number AS unit_number, ps.number AS spot, v.is_active
+    FROM vehicles v
+    LEFT JOIN users owner ON owner.id = v.owner_id
+    LEFT JOIN units u ON u.id = v.unit_id
+    LEFT JOIN parking_spots ps ON ps.id = v.parking_spot_id
+    WHERE v.tenant_id = :tid {where}
+"""
+
+VISITOR_VEHICLES_SQL = """
+    SELECT vv.id, vv.plate, vv.model, vv.color, vi.id AS owner_id, vi.name AS owner_name, vi.is_blocked
+    FROM visitor_vehicles vv
+    JOIN visitors vi ON vi.id = vv.visitor_id
+    WHERE vi.tenant_id = :tid AND vv.plate IS NOT NULL {where}
+"""
+
+
+def _resident_entry(row) -> PlateEntry:
+    unit = f"{row.block}-{row.unit_number}" if row.block else row.unit_number
+    return PlateEntry(
+        kind="resident",
+        vehicle_id=row.id,
+        plate=canonical_code(row.plate),
+        model=row.model,
+        color=row.color,
+        owner_id=row.owner_id,
+        owner_name=row.owner_name,
+        unit_id=row.unit_id,
+        unit=unit,
+        spot=row.spot,
+    )
+
+
+def _visitor_entry(row) -> PlateEntry:
+    return PlateEntry(
+        kind="visitor",
+        vehicle_id=row.id,
+        plate=canonical_code(row.plate),
+        model=row.model,
+        color=row.color,
+        owner_id=row.owner_id,
+        owner_name=row.owner_name,
+        blocked=bool(row.is_blocked),
+    )
+
+
+class PlateIndexService:
+    """
+    Índices de placas por condomínio, mantidos no processo.
+
+    Cada worker tem sua cópia: as atualizações incrementais valem para o
+    worker que atendeu a alteração e os demais convergem no próximo TTL.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = settings.PLATE_INDEX_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._indexes: Dict[int, TenantPlateIndex] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def _is_fresh(self, index: Optional[TenantPlateIndex]) -> bool:
+        return index is not None and time.monotonic() - index.loaded_at < self.ttl_seconds
+
+    async def get_index(self, db: AsyncSession, tenant_id: int) -> TenantPlateIndex:
+        """Índice do condomínio, carregado sob demanda (uma carga por vez)"""
+        index = self._indexes.get(tenant_id)
+        if self._is_fresh(index):
+            return index
+
+        lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(tenant_id)
+            if not self._is_fresh(index):
+                index = await self.load(db, tenant_id)
+        return index
+
+    async def load(self, db: AsyncSession, tenant_id: int) -> TenantPlateIndex:
+        """Recarrega todas as placas ativas do condomínio"""
+        started = time.perf_counter()
+        residents = await db.execute(
+            text(RESIDENT_VEHICLES_SQL.format(where="AND v.is_active = true")), {"tid": tenant_id}
+        )
+        visitors = await db.execute(text(VISITOR_VEHICLES_SQL.format(where="")), {"tid": tenant_id})
+
+        entries = [_resident_entry(row) for row in residents.fetchall() if row.plate]
+        entries.extend(_visitor_entry(row) for row in visitors.fetchall())
+        index = TenantPlateIndex(entries)
+        self._indexes[tenant_id] = index
+
+        logger.info(
+            "plate_index_loaded",
+            tenant_id=tenant_id,
+            vehicles=len(index),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        return index
+
+    async def lookup(
+        self, db: AsyncSession, tenant_id: int, plate: str, limit: int = 5, max_distance: Optional[int] = None
+    ) -> List[PlateMatch]:
+        """
+        Consulta tolerante a OCR.
+
+        Usage:
+            matches = await plate_index.lookup(db, tenant_id=1, plate="ABC1D34")
+        """
+        index = await self.get_index(db, tenant_id)
+        if max_distance is None:
+            max_distance = settings.PLATE_INDEX_MAX_DISTANCE
+        return index.lookup(plate, limit=limit, max_distance=max_distance)
+
+    async def resident_vehicle(self, db: AsyncSession, tenant_id: int, plate: str) -> Optional[PlateEntry]:
+        """Veículo de morador da placa (ver TenantPlateIndex.resident_vehicle)"""
+        index = await self.get_index(db, tenant_id)
+        return index.resident_vehicle(plate)
+
+    # ==================== ATUALIZAÇÃO INCREMENTAL ====================
+
+    async def refresh_vehicle(self, db: AsyncSession, tenant_id: int, vehicle_id: int) -> None:
+        """Reindexa um veículo de morador após criação, edição ou remoção"""
+        index = self._indexes.get(tenant_id)
+        if index is None:
+            return  # ainda não carregado: a primeira consulta carrega tudo
+
+        result = await db.execute(
+            text(RESIDENT_VEHICLES_SQL.format(where="AND v.id = :vid")), {"tid": tenant_id, "vid": vehicle_id}
+        )
+        row = result.fetchone()
+        if row and row.is_active and row.plate:
+            index.add(_resident_entry(row))
+        else:
+            index.remove(("resident", vehicle_id))
+
+    async def refresh_visitor(self, db: AsyncSession, tenant_id: int, visitor_id: int) -> None:
+        """Reindexa os veículos de um visitante (cadastro, edição, bloqueio)"""
+        index = self._indexes.get(tenant_id)
+        if index is None:
+            return
+
+        result = await db.execute(
+            text(VISITOR_VEHICLES_SQL.format(where="AND vi.id = :vid")), {"tid": tenant_id, "vid": visitor_id}
+        )
+        for key in index.keys_for_owner("visitor", visitor_id):
+            index.remove(key)
+        for row in result.fetchall():
+            index.add(_visitor_entry(row))
+
+    def invalidate(self, tenant_id: Optional[int] = None) -> None:
+        """Descarta o índice (de um condomínio ou de todos)"""
+        if tenant_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(tenant_id, None)
+
+
+# Singleton instance
+plate_index = PlateIndexService()
@@ -0,0 +1,152 @@
+"""
+Perfis de Requisição (profiling sob demanda)
+
+Quando um condomínio reclama de lentidão num endpoint, o ProfilingMiddleware
+roda a requisição sob um profiler por amostragem e este serviço guarda o
+resultado em PROFILING_DIR, no formato do speedscope (https://speedscope.app),
+com o request_id do LoggingMiddleware como chave:
+
+    {request_id}.speedscope.json   perfil (abrir no speedscope)
+    {request_id}.meta.json         método, rota, status, duração e motivo
+
+Uma requisição é perfilada quando traz o header X-Profile-Token (emitido por
+um super admin em POST /admin/profiles/token, assinado com SECRET_KEY e com
+validade curta) ou quando cai na amostragem de PROFILING_SAMPLE_RATE. Os
+arquivos ficam no disco do worker que atendeu; apenas os PROFILING_MAX_FILES
+mais recentes são mantidos.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+from app.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_SUFFIX = ".speedscope.json"
+META_SUFFIX = ".meta.json"
+
+# request_id do LoggingMiddleware (8 hex); evita path traversal no download
+_REQUEST_ID = re.compile(r"^[0-9a-f-]{1,36}$")
+
+
+@dataclass
+class ProfileInfo:
+    """Metadados de um perfil gravado"""
+
+    request_id: str
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    reason: str  # "token" ou "sample"
+    created_at: float
+    size_bytes: int = 0
+
+
+class ProfilingService:
+    """Tokens do header de profiling e armazenamento dos perfis em disco"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+
+    @property
+    def directory(self) -> str:
+        return self._directory or settings.PROFILING_DIR
+
+    # ------------------------------------------------------------------
+    # Token assinado
+    # ------------------------------------------------------------------
+
+    def _signature(self, expires: int) -> str:
+        message = f"profile:{expires}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    def issue_token(self, ttl_seconds: Optional[int] = None) -> str:
+        """Valor do X-Profile-Token: "<expira em (epoch)>.<hmac>" """
+        expires = int(time.time()) + (ttl_seconds or settings.PROFILING_TOKEN_TTL_SECONDS)
+        return f"{expires}.{self._signature(expires)}"
+
+    def verify_token(self, token: Optional[str]) -> bool:
+        if not token or "." not in token:
+            return False
+        expires, signature = token.split(".", 1)
+        if not expires.isdigit() or int(expires) < time.time():
+            return False
+        return hmac.compare_digest(signature, self._signature(int(expires)))
+
+    # ------------------------------------------------------------------
+    # Armazenamento
+    # ------------------------------------------------------------------
+
+    def profile_path(self, request_id: str) -> Optional[str]:
+        """Caminho do perfil, se existir (None para ids inválidos ou já removidos)"""
+        if not _REQUEST_ID.match(request_id):
+            return None
+        path = os.path.join(self.directory, request_id + PROFILE_SUFFIX)
+        return path if os.path.exists(path) else None
+
+    def save(self, info: ProfileInfo, speedscope_json: str) -> None:
+        """Grava perfil + metadados e remove os mais antigos além do limite (chamado fora do event loop)"""
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, info.request_id)
+        with open(base + PROFILE_SUFFIX, "w", encoding="utf-8") as fp:
+            fp.write(speedscope_json)
+        info.size_bytes = len(speedscope_json)
+        with open(base + META_SUFFIX, "w", encoding="utf-8") as fp:
+            json.dump(asdict(info), fp)
+
+        logger.info(
+            "request_profiled",
+            request_id=info.request_id,
+            path=info.path,
+            duration_ms=info.duration_ms,
+            reason=info.reason,
+        )
+        self.prune()
+
+    def _meta_files(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        files = [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(META_SUFFIX)
+        ]
+        return sorted(files, key=os.path.getmtime, reverse=True)
+
+    def list(self, limit: int = 50) -> List[ProfileInfo]:
+        """Perfis mais recentes primeiro"""
+        profiles = []
+        for path in self._meta_files()[:limit]:
+            try:
+                with open(path, encoding="utf-8") as fp:
+                    profiles.append(ProfileInfo(**json.load(fp)))
+            except (OSError, ValueError, TypeError):
+                # Removido por outro worker no meio da listagem ou gravação incompleta
+                continue
+        return profiles
+
+    def prune(self, keep: Optional[int] = None) -> int:
+        """Remove os perfis mais antigos além de PROFILING_MAX_FILES"""
+        keep = settings.PROFILING_MAX_FILES if keep is None else keep
+        removed = 0
+        for meta in self._meta_files()[keep:]:
+            request_id = os.path.basename(meta)[: -len(META_SUFFIX)]
+            for path in (meta, os.path.join(self.directory, request_id + PROFILE_SUFFIX)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        return removed
+
+
+# Singleton instance
+profiling_service = ProfilingService()
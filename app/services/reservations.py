@@ -0,0 +1,309 @@
+"""
+Motor de Reservas de Áreas Comuns
+
+- Sem conflitos por construção: a coluna gerada reservations.period (tsrange)
+  e a constraint de exclusão ex_reservations_area_period (migration 006)
+  impedem dois horários sobrepostos na mesma área, mesmo com requisições
+  simultâneas. O INSERT que perde a corrida recebe exclusion_violation (23P01).
+- Regra "uma reserva por área por mês" serializada por usuário com
+  pg_advisory_xact_lock e consultada por intervalo de datas (usa o índice
+  ix_reservations_user_area_date, ao contrário de EXTRACT(MONTH ...)).
+- Reservas por horário: o dia é dividido em slots de SLOT_MINUTES; o
+  calendário do mês guarda um bitmap de slots ocupados por dia, em cache no
+  Redis e invalidado a cada criação/cancelamento.
+"""
+
+import re
+from datetime import date, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.exceptions import BusinessError, NotFoundError
+from app.core.logger import get_logger
+from app.services.activity_feed import activity_feed
+from app.services.cache import cache, cache_key
+
+logger = get_logger(__name__)
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY_MASK = (1 << SLOTS_PER_DAY) - 1
+
+# Status que ocupam horário (mesmo filtro da constraint de exclusão)
+ACTIVE_FILTER = "status NOT IN ('cancelled', 'rejected')"
+
+# Classe do pg_advisory_xact_lock(classe, user_id) da regra mensal
+RESERVATION_LOCK_CLASS = 726_003
+
+EXCLUSION_VIOLATION = "23P01"
+
+_TIME_RE = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)(?::([0-5]\d))?$")
+
+
+def parse_time(value: str) -> time:
+    """Converte "HH:MM" ou "HH:MM:SS" em time"""
+    match = _TIME_RE.match(value.strip())
+    if not match:
+        raise BusinessError(f"Horário inválido: {value}")
+    return time(int(match.group(1)), int(match.group(2)), int(match.group(3) or 0))
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute + (1 if value.second else 0)
+
+
+def _bits(first: int, last: int) -> int:
+    """Máscara com os slots [first, last)"""
+    return ((1 << last) - 1) ^ ((1 << first) - 1) if last > first else 0
+
+
+def slot_masks(start: time, end: time) -> Tuple[int, int]:
+    """
+    Slots ocupados por um horário: (máscara do dia, máscara do dia seguinte).
+
+    Slots parcialmente ocupados contam como ocupados. Fim <= início atravessa
+    a meia-noite (00:00-00:00 = dia inteiro).
+    """
+    first = _minutes(start) // SLOT_MINUTES
+    last = -(-_minutes(end) // SLOT_MINUTES)
+    if end > start:
+        return _bits(first, last), 0
+    return _bits(first, SLOTS_PER_DAY), _bits(0, last)
+
+
+def window_mask(available_from: Optional[time], available_until: Optional[time]) -> int:
+    """Slots dentro do horário de funcionamento da área (sem horário = dia inteiro)"""
+    if available_from is None and available_until is None:
+        return FULL_DAY_MASK
+    day, _ = slot_masks(available_from or time(0), available_until or time(0))
+    return day
+
+
+def free_intervals(occupied: int, window: int = FULL_DAY_MASK) -> List[Dict[str, str]]:
+    """Intervalos livres [{"start_time": "08:00", "end_time": "10:30"}, ...]"""
+    free = window & ~occupied
+    intervals = []
+    slot = 0
+    while slot < SLOTS_PER_DAY:
+        if not free >> slot & 1:
+            slot += 1
+            continue
+        first = slot
+        while slot < SLOTS_PER_DAY and free >> slot & 1:
+            slot += 1
+        intervals.append({"start_time": _slot_label(first), "end_time": _slot_label(slot % SLOTS_PER_DAY)})
+    return intervals
+
+
+def _slot_label(slot: int) -> str:
+    minutes = slot * SLOT_MINUTES
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    start = date(year, month, 1)
+    end = date(year + (month == 12), month % 12 + 1, 1)
+    return start, end
+
+
+def is_exclusion_violation(error: IntegrityError) -> bool:
+    orig = error.orig
+    code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    return code == EXCLUSION_VIOLATION or "ex_reservations_area_period" in str(orig)
+
+
+class ReservationService:
+    """Criação, cancelamento e calendário de reservas"""
+
+    @staticmethod
+    def _calendar_key(tenant_id: int, area_id: int, year: int, month: int) -> str:
+        return cache_key("reservas", "calendario", str(tenant_id), str(area_id), f"{year}-{month:02d}")
+
+    async def invalidate(self, tenant_id: int, area_id: int, day: date) -> None:
+        """Descarta o calendário do mês da reserva (e do mês seguinte, se ela atravessa a virada)"""
+        months = {(day.year, day.month), ((day + timedelta(days=1)).year, (day + timedelta(days=1)).month)}
+        for year, month in months:
+            await cache.delete(self._calendar_key(tenant_id, area_id, year, month))
+
+    # ==================== ESCRITA ====================
+
+    async def create(
+        self,
+        db: AsyncSession,
+        tenant_id: int,
+        user_id: int,
+        unit_id: int,
+        area_id: int,
+        day: date,
+        start_time: str,
+        end_time: str,
+        event_name: Optional[str] = None,
+        expected_guests: Optional[int] = None,
+    ) -> int:
+        """
+        Cria uma reserva confirmada.
+
+        Usage:
+            reserva_id = await reservation_service.create(db, 1, user_id, unit_id, area_id, day, "18:00", "22:00")
+        """
+        start, end = parse_time(start_time), parse_time(end_time)
+        month_start, month_end = month_bounds(day.year, day.month)
+
+        # Serializa as reservas do usuário: duas requisições simultâneas não passam juntas pela regra mensal
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_class, :uid)"),
+            {"lock_class": RESERVATION_LOCK_CLASS, "uid": user_id},
+        )
+        existing = await db.execute(
+            text(
+                f"""
+                SELECT id FROM reservations
+                WHERE user_id = :uid AND area_id = :area_id AND date >= :month_start AND date < :month_end
+                  AND tenant_id = :tid AND {ACTIVE_FILTER}
+                LIMIT 1
+            """
+            ),
+            {"uid": user_id, "area_id": area_id, "month_start": month_start, "month_end": month_end, "tid": tenant_id},
+        )
+        if existing.fetchone():
+            await db.rollback()
+            raise BusinessError("Você já tem uma reserva nesta área este mês")
+
+        try:
+            result = await db.execute(
+                text(
+                    """
+                    INSERT INTO reservations (area_id, unit_id, user_id, date, start_time, end_time,
+                                              event_name, expected_guests, status, tenant_id, created_at)
+                    VALUES (:area_id, :unit_id, :user_id, :dt, :start_time, :end_time,
+                            :event_name, :expected_guests, 'confirmed', :tid, NOW())
+                    RETURNING id, created_at, (SELECT name FROM common_areas WHERE id = :area_id) AS area_name
+                """
+                ),
+                {
+                    "area_id": area_id,
+                    "unit_id": unit_id,
+                    "user_id": user_id,
+                    "dt": day,
+                    "start_time": start,
+                    "end_time": end,
+                    "event_name": event_name,
+                    "expected_guests": expected_guests,
+                    "tid": tenant_id,
+                },
+            )
+            row = result.fetchone()
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if is_exclusion_violation(e):
+                logger.info("reservation_conflict", tenant_id=tenant_id, area_id=area_id, date=str(day))
+                raise BusinessError("Este horário já está reservado")
+            raise
+
+        await self.invalidate(tenant_id, area_id, day)
+        await activity_feed.publish(tenant_id, "reserva", row.id, f"Reserva: {row.area_name or ''}", row.created_at)
+        return row.id
+
+    async def cancel(self, db: AsyncSession, tenant_id: int, user_id: int, reserva_id: int) -> None:
+        """Cancela uma reserva do usuário e libera o horário"""
+        result = await db.execute(
+            text(
+                """
+                UPDATE reservations SET status = 'cancelled', cancelled_at = NOW(), cancelled_by_id = :uid
+                WHERE id = :id AND user_id = :uid AND tenant_id = :tid
+                RETURNING area_id, date
+            """
+            ),
+            {"id": reserva_id, "uid": user_id, "tid": tenant_id},
+        )
+        row = result.fetchone()
+        if not row:
+            await db.rollback()
+            raise NotFoundError("Reserva não encontrada")
+        await db.commit()
+        await self.invalidate(tenant_id, row.area_id, row.date)
+
+    # ==================== CALENDÁRIO ====================
+
+    async def calendar(self, db: AsyncSession, tenant_id: int, area_id: int, year: int, month: int) -> Dict[str, Any]:
+        """
+        Reservas do mês agrupadas por dia e bitmap de slots ocupados por dia.
+
+        Retorna {"dias_ocupados": {...}, "ocupacao": {"AAAA-MM-DD": máscara}, "janela": máscara}
+        """
+        key = self._calendar_key(tenant_id, area_id, year, month)
+        cached = await cache.get(key)
+        if cached is not None:
+            return cached
+
+        month_start, month_end = month_bounds(year, month)
+        result = await db.execute(
+            text(
+                f"""
+                SELECT r.id, r.date, r.start_time, r.end_time, r.status, r.event_name,
+                       u.name as user_name, un.block, un.number as unit_number
+                FROM reservations r
+                JOIN users u ON u.id = r.user_id
+                LEFT JOIN units un ON un.id = r.unit_id
+                WHERE r.area_id = :area_id AND r.tenant_id = :tid
+                  AND r.date >= :range_start AND r.date < :month_end
+                  AND r.{ACTIVE_FILTER}
+                ORDER BY r.date, r.start_time
+            """
+            ),
+            {
+                "area_id": area_id,
+                "tid": tenant_id,
+                # Dia anterior: reservas que atravessam a meia-noite ocupam o início do mês
+                "range_start": month_start - timedelta(days=1),
+                "month_end": month_end,
+            },
+        )
+        area = await db.execute(
+            text("SELECT available_from, available_until FROM common_areas WHERE id = :area_id AND tenant_id = :tid"),
+            {"area_id": area_id, "tid": tenant_id},
+        )
+        area_row = area.fetchone()
+
+        dias_ocupados: Dict[str, List[Dict[str, Any]]] = {}
+        ocupacao: Dict[str, int] = {}
+        for r in result.fetchall():
+            day_mask, next_mask = slot_masks(r.start_time, r.end_time)
+            for day, mask in ((r.date, day_mask), (r.date + timedelta(days=1), next_mask)):
+                if mask and month_start <= day < month_end:
+                    ocupacao[str(day)] = ocupacao.get(str(day), 0) | mask
+            if r.date < month_start:
+                continue
+            dias_ocupados.setdefault(str(r.date), []).append(
+                {
+                    "id": r.id,
+                    "start_time": str(r.start_time)[:5],
+                    "end_time": str(r.end_time)[:5],
+                    "user_name": r.user_name,
+                    "unit": f"{r.block or ''} {r.unit_number or ''}".strip(),
+                    "event_name": r.event_name,
+                    "status": r.status,
+                }
+            )
+
+        data = {
+            "dias_ocupados": dias_ocupados,
+            "ocupacao": ocupacao,
+            "janela": window_mask(area_row.available_from, area_row.available_until) if area_row else FULL_DAY_MASK,
+        }
+        await cache.set(key, data, ttl=settings.RESERVATION_CALENDAR_TTL_SECONDS)
+        return data
+
+    async def free_slots(self, db: AsyncSession, tenant_id: int, area_id: int, day: date) -> List[Dict[str, str]]:
+        """Intervalos livres de uma área em um dia (a partir do calendário em cache)"""
+        data = await self.calendar(db, tenant_id, area_id, day.year, day.month)
+        return free_intervals(data["ocupacao"].get(str(day), 0), data["janela"])
+
+
+# Singleton instance
+reservation_service = ReservationService()
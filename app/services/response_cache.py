@@ -0,0 +1,182 @@
+"""
+Respostas Pré-comprimidas com ETag
+
+O GZipMiddleware recomprime a cada requisição o mesmo JSON do dashboard, do
+tenant, do FAQ e dos relatórios. Aqui o corpo serializado fica no Redis junto
+das variantes já comprimidas (gzip, zstd e, com o pacote brotli instalado, br)
+e de um ETag forte calculado sobre o corpo:
+
+- If-None-Match igual ao ETag guardado responde 304 sem executar o endpoint
+  (nenhuma consulta ao banco);
+- um acerto devolve os bytes na codificação aceita pelo cliente, sem
+  recomprimir (o GZipMiddleware não mexe em respostas com Content-Encoding).
+
+Cada entrada é um hash no Redis (etag, type, identity, gzip, zstd, br). As
+chaves seguem o formato do cache_decorator (conecta:{prefix}:t:{tenant}:...),
+então invalidate_cache(prefix, tenant_id) também descarta as respostas.
+"""
+
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import zstandard
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+from app.config import settings
+from app.core.logger import get_logger
+from app.services.cache import cache
+
+try:
+    import brotli
+except ImportError:  # br é oferecido só com o pacote instalado
+    brotli = None
+
+logger = get_logger(__name__)
+
+# Preferência do servidor quando o cliente aceita mais de uma
+ENCODINGS = ("zstd", "br", "gzip") if brotli else ("zstd", "gzip")
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    """ETag forte: muda sempre que um byte do corpo muda"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=settings.RESPONSE_CACHE_GZIP_LEVEL, mtime=0)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.RESPONSE_CACHE_ZSTD_LEVEL).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_CACHE_BROTLI_QUALITY)
+    raise ValueError(f"Codificação não suportada: {encoding}")
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Codificações de ENCODINGS aceitas pelo cliente, na ordem de preferência do servidor"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    wildcard = weights.get("*", 0.0)
+    return [encoding for encoding in ENCODINGS if weights.get(encoding, wildcard) > 0]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+@dataclass
+class CachedResponse:
+    etag: str
+    media_type: str
+    body: bytes
+    encoding: str = "identity"
+
+    def to_response(self) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if self.encoding != "identity":
+            headers["Content-Encoding"] = self.encoding
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+@dataclass
+class StoredResponse:
+    etag: str
+    media_type: str
+    variants: Dict[str, bytes]
+
+    def select(self, accept_encoding: str) -> CachedResponse:
+        encoding = next((name for name in accepted_encodings(accept_encoding) if name in self.variants), "identity")
+        return CachedResponse(
+            etag=self.etag, media_type=self.media_type, body=self.variants[encoding], encoding=encoding
+        )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"})
+
+
+class ResponseCache:
+    """Leitura e gravação das respostas pré-comprimidas no Redis"""
+
+    def variants(self, body: bytes) -> Dict[str, bytes]:
+        """Corpo original e, acima do tamanho mínimo, as versões comprimidas"""
+        result = {"identity": body}
+        if len(body) >= settings.RESPONSE_CACHE_MIN_SIZE:
+            for encoding in ENCODINGS:
+                result[encoding] = compress(body, encoding)
+        return result
+
+    async def store(self, key: str, body: bytes, media_type: str, ttl: int) -> StoredResponse:
+        """Comprime uma única vez e grava todas as variantes"""
+        stored = StoredResponse(etag=make_etag(body), media_type=media_type, variants=self.variants(body))
+        mapping = {"etag": stored.etag.encode(), "type": media_type.encode(), **stored.variants}
+        await cache.set_fields(key, mapping, ttl)
+        logger.debug("response_cache_set", key=key, size=len(body), ttl=ttl)
+        return stored
+
+    async def etag(self, key: str) -> Optional[str]:
+        [etag] = await cache.get_fields(key, ["etag"])
+        return etag.decode() if etag else None
+
+    async def get(self, key: str, accept_encoding: str = "") -> Optional[CachedResponse]:
+        """Resposta guardada na melhor codificação aceita (1 ida ao Redis; 2 para corpos pequenos)"""
+        preferred = next(iter(accepted_encodings(accept_encoding)), "identity")
+        etag, media_type, body = await cache.get_fields(key, ["etag", "type", preferred])
+        if etag is None:
+            return None
+        if body is None:
+            # Corpo abaixo de RESPONSE_CACHE_MIN_SIZE: só existe sem compressão
+            preferred = "identity"
+            [body] = await cache.get_fields(key, ["identity"])
+            if body is None:
+                return None
+        return CachedResponse(etag=etag.decode(), media_type=media_type.decode(), body=body, encoding=preferred)
+
+    async def respond(self, key: str, headers: Headers) -> Optional[Response]:
+        """304, resposta guardada ou None (miss) para uma requisição GET"""
+        if_none_match = headers.get("if-none-match")
+        if if_none_match:
+            etag = await self.etag(key)
+            if etag and etag_matches(if_none_match, etag):
+                logger.debug("response_cache_not_modified", key=key)
+                return not_modified(etag)
+
+        cached = await self.get(key, headers.get("accept-encoding", ""))
+        if cached is not None:
+            logger.debug("response_cache_hit", key=key, encoding=cached.encoding)
+            return cached.to_response()
+        return None
+
+    def build(self, stored: StoredResponse, headers: Headers) -> Response:
+        """Resposta de um miss com as variantes recém-gravadas (ou 304 se o conteúdo não mudou)"""
+        if etag_matches(headers.get("if-none-match"), stored.etag):
+            return not_modified(stored.etag)
+        return stored.select(headers.get("accept-encoding", "")).to_response()
+
+
+# Singleton instance
+response_cache = ResponseCache()
@@ -0,0 +1,320 @@
+"""
+Busca Unificada - moradores, visitantes, veículos e unidades
+
+Consulta as colunas geradas search_* (migration 005), preenchidas pelas
+funções SQL search_normalize (minúsculas, sem acento), search_digits
+(CPF/telefone só com dígitos) e search_code (placa/unidade sem pontuação):
+
+- Caminho rápido: prefixo (LIKE 'abc%') no B-tree (tenant_id, coluna COLLATE "C"),
+  que já devolve as linhas ordenadas e para no LIMIT
+- Caminho trigram: word_similarity/similarity (pg_trgm) nos índices GIN,
+  usado só quando o prefixo não preenche o limite
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import get_logger
+from app.models.base import SEARCH_ACCENTS, SEARCH_PLAIN
+
+logger = get_logger(__name__)
+
+SEARCH_TYPES = ("users", "visitors", "vehicles", "units")
+
+# Buscas acima deste tempo são registradas em log (meta da portaria: < 20 ms)
+SLOW_SEARCH_MS = 20
+
+# Abaixo de 3 caracteres não há trigramas úteis: só o caminho de prefixo
+MIN_TRIGRAM_LENGTH = 3
+
+_ACCENT_TABLE = str.maketrans(SEARCH_ACCENTS, SEARCH_PLAIN)
+_PLATE_RE = re.compile(r"^[A-Z]{1,3}[0-9][A-Z0-9]{0,3}$")
+
+
+def normalize_text(value: str) -> str:
+    """Equivalente em Python de search_normalize(): minúsculas e sem acento"""
+    return " ".join(value.lower().translate(_ACCENT_TABLE).split())
+
+
+def only_digits(value: str) -> str:
+    """Equivalente em Python de search_digits()"""
+    return re.sub(r"[^0-9]", "", value)
+
+
+def canonical_code(value: str) -> str:
+    """Equivalente em Python de search_code(): placa/unidade sem pontuação"""
+    return re.sub(r"[^A-Za-z0-9]", "", value).upper()
+
+
+def escape_like(value: str) -> str:
+    """Escapa os curingas do LIKE digitados pelo usuário"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@dataclass
+class SearchQuery:
+    """Termo de busca já normalizado nas três formas"""
+
+    raw: str
+    text: str
+    digits: str
+    code: str
+
+    @classmethod
+    def parse(cls, raw: str) -> "SearchQuery":
+        return cls(raw=raw, text=normalize_text(raw), digits=only_digits(raw), code=canonical_code(raw))
+
+    @property
+    def is_empty(self) -> bool:
+        """Sem letras nem dígitos (só espaços/pontuação)"""
+        return not re.search(r"\w", self.text)
+
+    @property
+    def is_numeric(self) -> bool:
+        """CPF, telefone ou número de unidade (ex.: "123.456", "(11) 9876")"""
+        return bool(self.digits) and not re.search(r"[^\W\d_]", self.raw)
+
+    @property
+    def looks_like_plate(self) -> bool:
+        """Placa antiga ou Mercosul, completa ou parcial (ex.: "ABC1", "BRA2E19")"""
+        return bool(_PLATE_RE.match(self.code))
+
+    @property
+    def use_trigram(self) -> bool:
+        return len(self.text) >= MIN_TRIGRAM_LENGTH
+
+
+def search_digits_pattern(term: str) -> Optional[str]:
+    """
+    Padrão LIKE '%123%' para CPF/telefone, só quando o termo é numérico.
+
+    Usado pelos relatórios: NULL faz a condição de documento não casar.
+    """
+    query = SearchQuery.parse(term)
+    return f"%{escape_like(query.digits)}%" if query.is_numeric else None
+
+
+@dataclass
+class SearchResult:
+    """Item do resultado unificado"""
+
+    type: str
+    id: int
+    title: str
+    subtitle: Optional[str]
+    score: float
+
+
+class SearchService:
+    """
+    Busca por condomínio em users, visitors, vehicles e units.
+
+    Cada tipo roda primeiro o caminho de prefixo; o caminho trigram só é
+    executado se o prefixo retornar menos que `limit` resultados.
+    """
+
+    async def search(
+        self,
+        db: AsyncSession,
+        tenant_id: int,
+        term: str,
+        types: Optional[Sequence[str]] = None,
+        limit: int = 20,
+    ) -> List[SearchResult]:
+        """
+        Busca unificada, ordenada por relevância.
+
+        Usage:
+            results = await search_service.search(db, tenant_id=1, term="joão sil")
+        """
+        query = SearchQuery.parse(term)
+        if query.is_empty:
+            return []
+
+        started = time.perf_counter()
+        results: List[SearchResult] = []
+        for search_type in types or SEARCH_TYPES:
+            handler = getattr(self, f"_search_{search_type}")
+            results.extend(await handler(db, tenant_id, query, limit))
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > SLOW_SEARCH_MS:
+            logger.warning("search_slow", tenant_id=tenant_id, length=len(term), elapsed_ms=round(elapsed_ms, 2))
+
+        # Prefixo (score 1.0) antes de similaridade; empate pelo título
+        results.sort(key=lambda item: (-item.score, item.title))
+        return results[:limit]
+
+    # ==================== PESSOAS ====================
+
+    async def _search_people(
+        self,
+        db: AsyncSession,
+        table: str,
+        result_type: str,
+        tenant_id: int,
+        query: SearchQuery,
+        limit: int,
+        extra_where: str = "",
+    ) -> List[SearchResult]:
+        params: Dict[str, Any] = {"tid": tenant_id, "limit": limit}
+        base_where = f"tenant_id = :tid {extra_where}"
+
+        if query.is_numeric:
+            # CPF / telefone: somente prefixo dos dígitos
+            params["digits"] = f"{escape_like(query.digits)}%"
+            rows = (
+                await db.execute(
+                    text(
+                        f"""
+                        SELECT id, name, cpf, phone, 1.0 AS score FROM {table}
+                        WHERE {base_where}
+                          AND (search_cpf COLLATE "C" LIKE :digits OR search_phone COLLATE "C" LIKE :digits)
+                        ORDER BY search_name LIMIT :limit
+                    """
+                    ),
+                    params,
+                )
+            ).fetchall()
+            return [self._person_result(result_type, row) for row in rows]
+
+        params["prefix"] = f"{escape_like(query.text)}%"
+        rows = (
+            await db.execute(
+                text(
+                    f"""
+                    SELECT id, name, cpf, phone, 1.0 AS score FROM {table}
+                    WHERE {base_where} AND search_name COLLATE "C" LIKE :prefix
+                    ORDER BY search_name COLLATE "C" LIMIT :limit
+                """
+                ),
+                params,
+            )
+        ).fetchall()
+        found = [self._person_result(result_type, row) for row in rows]
+
+        if len(found) < limit and query.use_trigram:
+            # Sobrenome, nome do meio ou erro de digitação: "silva", "joao da silv", "marai"
+            params["q"] = query.text
+            params["exclude"] = [item.id for item in found] or [0]
+            rows = (
+                await db.execute(
+                    text(
+                        f"""
+                        SELECT id, name, cpf, phone, word_similarity(:q, search_name) AS score FROM {table}
+                        WHERE {base_where} AND :q <% search_name AND id <> ALL(:exclude)
+                        ORDER BY score DESC, search_name LIMIT :limit
+                    """
+                    ),
+                    params,
+                )
+            ).fetchall()
+            found.extend(self._person_result(result_type, row) for row in rows)
+        return found[:limit]
+
+    @staticmethod
+    def _person_result(result_type: str, row) -> SearchResult:
+        subtitle = " · ".join(value for value in (row.cpf, row.phone) if value) or None
+        return SearchResult(type=result_type, id=row.id, title=row.name, subtitle=subtitle, score=float(row.score))
+
+    async def _search_users(self, db: AsyncSession, tenant_id: int, query: SearchQuery, limit: int):
+        return await self._search_people(
+            db, "users", "user", tenant_id, query, limit, extra_where="AND is_deleted = false AND is_active = true"
+        )
+
+    async def _search_visitors(self, db: AsyncSession, tenant_id: int, query: SearchQuery, limit: int):
+        return await self._search_people(db, "visitors", "visitor", tenant_id, query, limit)
+
+    # ==================== VEÍCULOS ====================
+
+    async def _search_vehicles(
+        self, db: AsyncSession, tenant_id: int, query: SearchQuery, limit: int
+    ) -> List[SearchResult]:
+        if not query.code or query.is_numeric:
+            # Placas começam com letras: CPF/telefone/unidade não se aplicam
+            return []
+
+        params: Dict[str, Any] = {"tid": tenant_id, "limit": limit, "prefix": f"{escape_like(query.code)}%"}
+        select_sql = """
+            SELECT v.id, v.plate, v.model, v.color, owner.name AS owner_name, {score} AS score
+            FROM vehicles v LEFT JOIN users owner ON owner.id = v.owner_id
+            WHERE v.tenant_id = :tid AND v.is_active = true AND {match}
+            ORDER BY {order} LIMIT :limit
+        """
+        rows = (
+            await db.execute(
+                text(
+                    select_sql.format(
+                        score="1.0",
+                        match='v.search_plate COLLATE "C" LIKE :prefix',
+                        order='v.search_plate COLLATE "C"',
+                    )
+                ),
+                params,
+            )
+        ).fetchall()
+        found = [self._vehicle_result(row) for row in rows]
+
+        # Trigram tolera um caractere trocado pelo OCR ou na digitação ("ABC1D34" x "ABC1034")
+        if len(found) < limit and len(query.code) >= MIN_TRIGRAM_LENGTH and query.looks_like_plate:
+            params["q"] = query.code
+            params["exclude"] = [item.id for item in found] or [0]
+            rows = (
+                await db.execute(
+                    text(
+                        select_sql.format(
+                            score="similarity(v.search_plate, :q)",
+                            match="v.search_plate % :q AND v.id <> ALL(:exclude)",
+                            order="score DESC, v.search_plate",
+                        )
+                    ),
+                    params,
+                )
+            ).fetchall()
+            found.extend(self._vehicle_result(row) for row in rows)
+        return found[:limit]
+
+    @staticmethod
+    def _vehicle_result(row) -> SearchResult:
+        details = " ".join(value for value in (row.model, row.color) if value)
+        subtitle = " · ".join(value for value in (details, row.owner_name) if value) or None
+        return SearchResult(type="vehicle", id=row.id, title=row.plate, subtitle=subtitle, score=float(row.score))
+
+    # ==================== UNIDADES ====================
+
+    async def _search_units(self, db: AsyncSession, tenant_id: int, query: SearchQuery, limit: int):
+        if not query.code or len(query.code) > 12:
+            return []
+        # "A101", "A-101" ou só o número "101" (unidades sem bloco ou qualquer bloco)
+        rows = (
+            await db.execute(
+                text(
+                    """
+                    SELECT id, block, number, 1.0 AS score FROM units
+                    WHERE tenant_id = :tid AND is_active = true
+                      AND (search_code COLLATE "C" LIKE :prefix OR number LIKE :prefix)
+                    ORDER BY search_code COLLATE "C" LIMIT :limit
+                """
+                ),
+                {"tid": tenant_id, "limit": limit, "prefix": f"{escape_like(query.code)}%"},
+            )
+        ).fetchall()
+        return [
+            SearchResult(
+                type="unit",
+                id=row.id,
+                title=f"{row.block}-{row.number}" if row.block else row.number,
+                subtitle=None,
+                score=float(row.score),
+            )
+            for row in rows
+        ]
+
+
+# Singleton instance
+search_service = SearchService()
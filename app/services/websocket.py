@@ -153,6 +153,7 @@ class NotificationType:
     RESERVATION_UPDATE = "reservation_update"
     MAINTENANCE_UPDATE = "maintenance_update"
     NEW_MESSAGE = "new_message"
+    GARAGE_SPOT_UPDATE = "garage_spot_update"
 
 
 def create_notification(
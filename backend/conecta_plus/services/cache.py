@@ -55,6 +55,11 @@ class RedisCache:
         """Verifica se esta conectado"""
         return self._client is not None
 
+    @property
+    def client(self) -> Optional[redis.Redis]:
+        """Cliente Redis para operacoes alem do cache (filas, ZSETs, pipelines)"""
+        return self._client
+
     async def get(self, key: str) -> Optional[Any]:
         """
         Obtem valor do cache.
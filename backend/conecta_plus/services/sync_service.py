@@ -1,21 +1,86 @@
 """
 Serviço de Sincronização com App Simples
 Webhook para notificar mudanças de condomínios
+
+Envio por um único cliente HTTP de longa duração (keep-alive, HTTP/2 quando
+o pacote h2 está instalado). Atualizações pendentes do mesmo tenant dentro da
+janela de coalescência viram um único payload. Falhas temporárias vão para
+uma fila de retry durável no Redis, drenada por um worker em background com
+backoff exponencial e jitter; esgotadas as tentativas, o último payload fica
+na dead-letter para reprocessamento manual.
+
+Chaves no Redis:
+    conecta:sync:retry            ZSET tenant_id -> timestamp da próxima tentativa
+    conecta:sync:retry:<tenant>   JSON com endpoint, payload e tentativas
+    conecta:sync:dead             HASH tenant_id -> JSON da última falha definitiva
+    conecta:sync:stats:<data>     HASH total/success/failed/queued/dead do dia
 """
 
 import asyncio
-from typing import Optional, Dict, Any
-from datetime import datetime
+import importlib.util
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Set, Tuple
+from datetime import datetime, date
 
 import httpx
-from fastapi import HTTPException
+from redis.exceptions import WatchError
 
 from conecta_plus.config import settings
 from conecta_plus.models.tenant import Tenant
 from conecta_plus.core.logger import get_logger
+from conecta_plus.services.cache import cache, cache_key
 
 logger = get_logger(__name__)
 
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+RETRY_QUEUE_KEY = cache_key("sync", "retry")
+DEAD_LETTER_KEY = cache_key("sync", "dead")
+
+# Respostas que não adianta repetir (endpoint inexistente, chave inválida, payload rejeitado)
+PERMANENT_STATUS = {400, 401, 403, 404, 405, 410, 413, 422}
+
+
+def retry_entry_key(tenant_id: str) -> str:
+    return cache_key("sync", "retry", str(tenant_id))
+
+
+def merge_actions(anterior: str, nova: str) -> str:
+    """
+    Ação resultante de duas atualizações coalescidas do mesmo tenant.
+
+    create seguido de update continua create (o App Simples ainda não o
+    conhece); delete prevalece; qualquer ação depois de delete reativa.
+    """
+    if nova == "delete":
+        return "delete"
+    if anterior == "create":
+        return "create"
+    return nova
+
+
+@dataclass
+class _PendingSync:
+    """Atualização aguardando a janela de coalescência"""
+
+    action: str
+    payload: Dict[str, Any]
+    future: asyncio.Future
+    coalesced: int = 0
+    tenant_nome: str = ""
+
+
+@dataclass
+class _SendResult:
+    ok: bool
+    retry: bool = False
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
 
 class SyncService:
     """
@@ -24,17 +89,104 @@ class SyncService:
 
     Funcionalidades:
     1. Sincronização de condomínios (create, update, delete)
-    2. Retry automático em caso de falha
-    3. Logs detalhados de todas as operações
-    4. Fallback para queue em caso de falha persistente
+    2. Coalescência de atualizações próximas do mesmo condomínio
+    3. Retry durável no Redis, drenado por worker em background
+    4. Logs detalhados de todas as operações
     """
 
     def __init__(self):
         self.app_simples_url = getattr(settings, 'APP_SIMPLES_API_URL', 'http://localhost:8002')
         self.sync_api_key = getattr(settings, 'SYNC_API_KEY', 'default-sync-key-change-in-production')
         self.timeout = getattr(settings, 'SYNC_TIMEOUT_SECONDS', 10.0)
-        self.max_retries = getattr(settings, 'SYNC_MAX_RETRIES', 3)
+        self.max_attempts = getattr(settings, 'SYNC_RETRY_MAX_ATTEMPTS', 10)
         self.retry_delay = getattr(settings, 'SYNC_RETRY_DELAY_SECONDS', 2.0)
+        self.retry_max_delay = getattr(settings, 'SYNC_RETRY_MAX_DELAY_SECONDS', 600.0)
+        self.retry_poll = getattr(settings, 'SYNC_RETRY_POLL_SECONDS', 1.0)
+        self.retry_batch = getattr(settings, 'SYNC_RETRY_BATCH_SIZE', 50)
+        self.coalesce_window = getattr(settings, 'SYNC_COALESCE_WINDOW_SECONDS', 0.5)
+        self.max_connections = getattr(settings, 'SYNC_MAX_CONNECTIONS', 20)
+        self.http2 = getattr(settings, 'SYNC_HTTP2', True) and HTTP2_AVAILABLE
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: Dict[str, _PendingSync] = {}
+        # Referências às tarefas de flush: o event loop só guarda referência fraca
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._tenant_locks: Dict[str, asyncio.Lock] = {}
+        self._worker: Optional[asyncio.Task] = None
+
+    # ──────────────────────────────────────────────────────────
+    # Ciclo de vida
+    # ──────────────────────────────────────────────────────────
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartilhado: conexões reaproveitadas entre envios"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.app_simples_url.rstrip('/'),
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0
+                ),
+                headers={
+                    "X-Sync-Key": self.sync_api_key,
+                    "User-Agent": "ConectaPlus-Supersistema/1.0"
+                }
+            )
+        return self._client
+
+    async def start(self):
+        """
+        Inicia o worker da fila de retry.
+        Chamado automaticamente no primeiro envio; idempotente.
+        """
+        if self._worker is not None and not self._worker.done():
+            return
+
+        await cache.connect()
+        if cache.is_connected:
+            await self._recover_orphans()
+
+        self._worker = asyncio.create_task(self._retry_worker())
+        logger.info(
+            "sync_retry_worker_started",
+            app_url=self.app_simples_url,
+            http2=self.http2,
+            redis=cache.is_connected
+        )
+
+    async def close(self):
+        """Para o worker, entrega o que está na janela de coalescência e fecha as conexões"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        for tenant_id in list(self._pending):
+            await self._flush(tenant_id, delay=0)
+        for task in list(self._flush_tasks):
+            task.cancel()
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _lock(self, tenant_id: str) -> asyncio.Lock:
+        # Envios do mesmo tenant saem em ordem: coalescência e retry nunca se cruzam
+        lock = self._tenant_locks.get(tenant_id)
+        if lock is None:
+            lock = self._tenant_locks[tenant_id] = asyncio.Lock()
+        return lock
+
+    # ──────────────────────────────────────────────────────────
+    # Envio
+    # ──────────────────────────────────────────────────────────
 
     async def sync_tenant_to_app(
         self,
@@ -49,50 +201,99 @@ class SyncService:
             action: Ação realizada ("create", "update", "delete")
 
         Returns:
-            bool: True se sincronização foi bem-sucedida
+            bool: True se sincronização foi bem-sucedida. False quando o
+            envio falhou; falhas temporárias seguem na fila de retry.
 
         Actions disponíveis:
         - create: Novo condomínio criado
         - update: Condomínio atualizado
         - delete: Condomínio desativado
+
+        Chamadas para o mesmo tenant dentro da janela de coalescência
+        compartilham um único envio, com o estado mais recente.
         """
 
         if action not in ["create", "update", "delete"]:
             logger.error(f"Ação de sincronização inválida: {action}")
             return False
 
-        # Preparar payload
-        payload = self._prepare_tenant_payload(tenant, action)
+        await self.start()
 
-        # Tentar sincronização com retry
-        success = await self._send_webhook_with_retry(
-            endpoint="/api/sync/tenant",
-            payload=payload,
+        tenant_id = str(tenant.id)
+        pending = self._pending.get(tenant_id)
+
+        if pending is not None:
+            pending.action = merge_actions(pending.action, action)
+            pending.payload = self._prepare_tenant_payload(tenant, pending.action)
+            pending.coalesced += 1
+            return await asyncio.shield(pending.future)
+
+        pending = _PendingSync(
             action=action,
-            tenant_id=tenant.id
+            payload=self._prepare_tenant_payload(tenant, action),
+            future=asyncio.get_running_loop().create_future(),
+            tenant_nome=tenant.nome
+        )
+        self._pending[tenant_id] = pending
+        task = asyncio.create_task(self._flush(tenant_id))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+        return await asyncio.shield(pending.future)
+
+    async def _flush(self, tenant_id: str, delay: Optional[float] = None):
+        """Envia a atualização coalescida do tenant ao fim da janela"""
+        await asyncio.sleep(self.coalesce_window if delay is None else delay)
+
+        async with self._lock(tenant_id):
+            pending = self._pending.pop(tenant_id, None)
+            if pending is None:
+                return
+
+            try:
+                ok = await self._deliver(tenant_id, pending)
+            except Exception as e:
+                logger.error("tenant_sync_error", tenant_id=tenant_id, error=str(e), error_type=type(e).__name__)
+                ok = False
+
+        if not pending.future.done():
+            pending.future.set_result(ok)
+
+    async def _deliver(self, tenant_id: str, pending: _PendingSync) -> bool:
+        result = await self._send_webhook(
+            endpoint="/api/sync/tenant",
+            payload=pending.payload,
+            action=pending.action,
+            tenant_id=tenant_id,
+            attempt=1
         )
 
-        if success:
+        if result.ok:
+            # Estado mais recente entregue: o que estava na fila ficou obsoleto
+            await self._discard_retry(tenant_id)
+            await self._record_stats("success")
             logger.info(
-                f"tenant_sync_success",
-                tenant_id=tenant.id,
-                tenant_nome=tenant.nome,
-                action=action,
-                app_url=self.app_simples_url
-            )
-        else:
-            logger.error(
-                f"tenant_sync_failed",
-                tenant_id=tenant.id,
-                tenant_nome=tenant.nome,
-                action=action,
+                "tenant_sync_success",
+                tenant_id=tenant_id,
+                tenant_nome=pending.tenant_nome,
+                action=pending.action,
+                coalesced=pending.coalesced,
                 app_url=self.app_simples_url
             )
+            return True
 
-            # TODO: Em produção, adicionar à queue para retry posterior
-            await self._add_to_retry_queue(tenant, action)
-
-        return success
+        await self._record_stats("failed")
+        logger.error(
+            "tenant_sync_failed",
+            tenant_id=tenant_id,
+            tenant_nome=pending.tenant_nome,
+            action=pending.action,
+            error=result.error,
+            app_url=self.app_simples_url
+        )
+        if result.retry:
+            await self._add_to_retry_queue(tenant_id, "/api/sync/tenant", pending.payload, result.error)
+        return False
 
     def _prepare_tenant_payload(self, tenant: Tenant, action: str) -> Dict[str, Any]:
         """
@@ -152,142 +353,349 @@ class SyncService:
             "source": "supersistema"
         }
 
-    async def _send_webhook_with_retry(
+    async def _send_webhook(
         self,
         endpoint: str,
         payload: Dict[str, Any],
         action: str,
-        tenant_id: str
-    ) -> bool:
+        tenant_id: str,
+        attempt: int
+    ) -> _SendResult:
         """
-        Envia webhook com retry automático em caso de falha.
+        Uma tentativa de envio pelo cliente compartilhado.
+        Não repete nem espera: falhas temporárias voltam com retry=True.
         """
 
-        url = f"{self.app_simples_url.rstrip('/')}{endpoint}"
-        headers = {
-            "X-Sync-Key": self.sync_api_key,
-            "Content-Type": "application/json",
-            "User-Agent": "ConectaPlus-Supersistema/1.0"
-        }
+        try:
+            response = await self.client.post(endpoint, json=payload)
 
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        url=url,
-                        json=payload,
-                        headers=headers,
-                        timeout=self.timeout
-                    )
-
-                    if response.status_code == 200:
-                        logger.info(
-                            "webhook_success",
-                            tenant_id=tenant_id,
-                            action=action,
-                            attempt=attempt,
-                            status_code=response.status_code,
-                            response_time_ms=response.elapsed.total_seconds() * 1000
-                        )
-                        return True
-
-                    elif response.status_code == 404:
-                        # Endpoint não existe - não vale a pena retry
-                        logger.error(
-                            "webhook_endpoint_not_found",
-                            tenant_id=tenant_id,
-                            url=url,
-                            status_code=response.status_code
-                        )
-                        return False
-
-                    elif response.status_code == 403:
-                        # Chave de API inválida - não vale a pena retry
-                        logger.error(
-                            "webhook_authentication_failed",
-                            tenant_id=tenant_id,
-                            status_code=response.status_code
-                        )
-                        return False
-
-                    else:
-                        # Erro temporário - tentar novamente
-                        logger.warning(
-                            "webhook_temporary_error",
-                            tenant_id=tenant_id,
-                            action=action,
-                            attempt=attempt,
-                            status_code=response.status_code,
-                            response_text=response.text[:500]  # Primeiros 500 chars
-                        )
-
-            except httpx.TimeoutException:
-                logger.warning(
-                    "webhook_timeout",
-                    tenant_id=tenant_id,
-                    action=action,
-                    attempt=attempt,
-                    timeout_seconds=self.timeout,
-                    url=url
-                )
-
-            except httpx.ConnectError:
-                logger.warning(
-                    "webhook_connection_error",
-                    tenant_id=tenant_id,
-                    action=action,
-                    attempt=attempt,
-                    url=url
-                )
+        except httpx.TimeoutException:
+            logger.warning(
+                "webhook_timeout",
+                tenant_id=tenant_id,
+                action=action,
+                attempt=attempt,
+                timeout_seconds=self.timeout,
+                endpoint=endpoint
+            )
+            return _SendResult(ok=False, retry=True, error="timeout")
 
-            except Exception as e:
-                logger.error(
-                    "webhook_unexpected_error",
-                    tenant_id=tenant_id,
-                    action=action,
-                    attempt=attempt,
-                    error=str(e),
-                    error_type=type(e).__name__
-                )
-
-            # Aguardar antes da próxima tentativa (exceto na última)
-            if attempt < self.max_retries:
-                await asyncio.sleep(self.retry_delay * attempt)  # Backoff exponencial
-
-        # Todas as tentativas falharam
-        logger.error(
-            "webhook_all_attempts_failed",
+        except httpx.TransportError as e:
+            logger.warning(
+                "webhook_connection_error",
+                tenant_id=tenant_id,
+                action=action,
+                attempt=attempt,
+                endpoint=endpoint,
+                error=str(e)
+            )
+            return _SendResult(ok=False, retry=True, error=f"{type(e).__name__}: {e}")
+
+        except Exception as e:
+            logger.error(
+                "webhook_unexpected_error",
+                tenant_id=tenant_id,
+                action=action,
+                attempt=attempt,
+                error=str(e),
+                error_type=type(e).__name__
+            )
+            return _SendResult(ok=False, retry=True, error=f"{type(e).__name__}: {e}")
+
+        if 200 <= response.status_code < 300:
+            logger.info(
+                "webhook_success",
+                tenant_id=tenant_id,
+                action=action,
+                attempt=attempt,
+                status_code=response.status_code,
+                http_version=response.http_version,
+                response_time_ms=response.elapsed.total_seconds() * 1000
+            )
+            return _SendResult(ok=True, status_code=response.status_code)
+
+        if response.status_code in PERMANENT_STATUS:
+            # Endpoint inexistente, chave inválida ou payload rejeitado - não vale a pena retry
+            logger.error(
+                "webhook_rejected",
+                tenant_id=tenant_id,
+                action=action,
+                endpoint=endpoint,
+                status_code=response.status_code,
+                response_text=response.text[:500]
+            )
+            return _SendResult(ok=False, error=f"HTTP {response.status_code}", status_code=response.status_code)
+
+        # Erro temporário - fica para o worker de retry
+        logger.warning(
+            "webhook_temporary_error",
             tenant_id=tenant_id,
             action=action,
-            max_retries=self.max_retries,
-            url=url
+            attempt=attempt,
+            status_code=response.status_code,
+            response_text=response.text[:500]  # Primeiros 500 chars
         )
+        return _SendResult(ok=False, retry=True, error=f"HTTP {response.status_code}", status_code=response.status_code)
 
-        return False
+    # ──────────────────────────────────────────────────────────
+    # Fila de retry (Redis)
+    # ──────────────────────────────────────────────────────────
 
-    async def _add_to_retry_queue(self, tenant: Tenant, action: str):
+    def _backoff(self, attempts: int) -> float:
+        """Atraso exponencial com jitter (50% a 100%), limitado ao máximo"""
+        delay = min(self.retry_max_delay, self.retry_delay * (2 ** (attempts - 1)))
+        return random.uniform(delay / 2, delay)
+
+    async def _add_to_retry_queue(
+        self,
+        tenant_id: str,
+        endpoint: str,
+        payload: Dict[str, Any],
+        error: Optional[str]
+    ):
         """
-        Adiciona operação falha à queue para retry posterior.
-        TODO: Implementar com Redis/RabbitMQ/SQS em produção.
+        Adiciona operação falha à fila de retry durável.
+        Um item por tenant: uma falha nova substitui o payload anterior.
         """
 
-        retry_data = {
-            "tenant_id": tenant.id,
-            "tenant_nome": tenant.nome,
-            "action": action,
+        entry = {
+            "tenant_id": tenant_id,
+            "endpoint": endpoint,
+            "action": payload.get("action"),
+            "payload": payload,
+            "attempts": 1,
             "failed_at": datetime.utcnow().isoformat(),
-            "attempts": 0,
-            "max_attempts": 10,  # Mais tentativas para queue
-            "next_retry": datetime.utcnow().isoformat()
+            "last_error": error
         }
+        next_retry = time.time() + self._backoff(1)
+
+        redis = cache.client
+        if redis is None:
+            logger.error("sync_retry_queue_unavailable", tenant_id=tenant_id, action=entry["action"])
+            return
+
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.set(retry_entry_key(tenant_id), json.dumps(entry, default=str))
+                pipe.zadd(RETRY_QUEUE_KEY, {tenant_id: next_retry})
+                await pipe.execute()
+        except Exception as e:
+            logger.error("sync_retry_queue_error", tenant_id=tenant_id, error=str(e))
+            return
 
+        await self._record_stats("queued")
         logger.info(
             "sync_added_to_retry_queue",
-            **retry_data
+            tenant_id=tenant_id,
+            action=entry["action"],
+            next_retry=datetime.utcfromtimestamp(next_retry).isoformat()
         )
 
-        # TODO: Implementar queue real
-        # await redis.lpush("sync_retry_queue", json.dumps(retry_data))
+    async def _discard_retry(self, tenant_id: str):
+        """Remove da fila o item do tenant (um envio mais recente já foi entregue)"""
+        redis = cache.client
+        if redis is None:
+            return
+
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(RETRY_QUEUE_KEY, tenant_id)
+                pipe.delete(retry_entry_key(tenant_id))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("sync_retry_discard_error", tenant_id=tenant_id, error=str(e))
+
+    async def _retry_worker(self):
+        """Drena a fila de retry enquanto o serviço estiver ativo"""
+        while True:
+            try:
+                processed = await self.process_retry_queue()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("sync_retry_worker_error", error=str(e), error_type=type(e).__name__)
+                processed = 0
+
+            if processed == 0:
+                await asyncio.sleep(self.retry_poll)
+
+    async def process_retry_queue(self) -> int:
+        """
+        Reenvia os itens vencidos da fila.
+
+        Cada item é reivindicado com ZREM (só um worker, mesmo entre
+        processos, recebe 1) e resolvido com WATCH na chave do tenant:
+        se uma falha mais nova substituiu o payload durante o envio, o
+        resultado do envio antigo é descartado.
+
+        Returns:
+            Número de itens reivindicados
+        """
+        redis = cache.client
+        if redis is None:
+            return 0
+
+        due = await redis.zrangebyscore(RETRY_QUEUE_KEY, "-inf", time.time(), start=0, num=self.retry_batch)
+        if not due:
+            return 0
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for tenant_id in due:
+                pipe.zrem(RETRY_QUEUE_KEY, tenant_id)
+            claimed = [tenant_id for tenant_id, removed in zip(due, await pipe.execute()) if removed]
+
+        # O pool do cliente limita as conexões; com HTTP/2 os envios dividem a mesma conexão
+        results = await asyncio.gather(*(self._retry_one(tenant_id) for tenant_id in claimed), return_exceptions=True)
+        for tenant_id, result in zip(claimed, results):
+            if isinstance(result, Exception):
+                # O item continua gravado e volta para o ZSET no próximo start()
+                logger.error("sync_retry_error", tenant_id=tenant_id, error=str(result), error_type=type(result).__name__)
+        return len(claimed)
+
+    async def _retry_one(self, tenant_id: str):
+        redis = cache.client
+        key = retry_entry_key(tenant_id)
+
+        async with self._lock(tenant_id):
+            raw = await redis.get(key)
+            if raw is None:
+                # Já entregue por um envio mais recente
+                return
+
+            entry = json.loads(raw)
+            attempts = entry["attempts"] + 1
+            result = await self._send_webhook(
+                endpoint=entry["endpoint"],
+                payload=entry["payload"],
+                action=entry["action"],
+                tenant_id=tenant_id,
+                attempt=attempts
+            )
+
+            entry.update(attempts=attempts, last_error=result.error)
+            if result.ok:
+                outcome = "success"
+            elif result.retry and attempts < self.max_attempts:
+                outcome = "retry"
+            else:
+                outcome = "dead"
+
+            applied = await self._resolve_retry(tenant_id, raw, outcome, entry, time.time() + self._backoff(attempts))
+
+        if not applied:
+            logger.info("sync_retry_superseded", tenant_id=tenant_id, action=entry["action"])
+            return
+
+        if outcome == "success":
+            await self._record_stats("success")
+            logger.info("tenant_sync_retry_success", tenant_id=tenant_id, action=entry["action"], attempts=attempts)
+        elif outcome == "retry":
+            logger.warning(
+                "tenant_sync_retry_failed",
+                tenant_id=tenant_id,
+                action=entry["action"],
+                attempts=attempts,
+                error=result.error
+            )
+        else:
+            await self._record_stats("dead")
+            logger.error(
+                "tenant_sync_dead_letter",
+                tenant_id=tenant_id,
+                action=entry["action"],
+                attempts=attempts,
+                error=result.error
+            )
+
+    async def _resolve_retry(
+        self,
+        tenant_id: str,
+        raw: str,
+        outcome: str,
+        entry: Dict[str, Any],
+        next_retry: float
+    ) -> bool:
+        """Grava o resultado apenas se o item do tenant ainda é o que foi enviado"""
+        redis = cache.client
+        key = retry_entry_key(tenant_id)
+
+        async with redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) != raw:
+                    return False
+
+                pipe.multi()
+                if outcome == "retry":
+                    pipe.set(key, json.dumps(entry, default=str))
+                    pipe.zadd(RETRY_QUEUE_KEY, {tenant_id: next_retry})
+                else:
+                    pipe.delete(key)
+                    if outcome == "dead":
+                        pipe.hset(DEAD_LETTER_KEY, tenant_id, json.dumps(entry, default=str))
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    async def _recover_orphans(self):
+        """
+        Reagenda itens sem entrada no ZSET: processo encerrado entre a
+        reivindicação e o resultado do reenvio.
+        """
+        redis = cache.client
+        prefix = retry_entry_key("")
+        recovered = 0
+
+        try:
+            async for key in redis.scan_iter(match=f"{prefix}*"):
+                tenant_id = key[len(prefix):]
+                if await redis.zadd(RETRY_QUEUE_KEY, {tenant_id: time.time()}, nx=True):
+                    recovered += 1
+        except Exception as e:
+            logger.warning("sync_retry_recover_error", error=str(e))
+
+        if recovered:
+            logger.info("sync_retry_orphans_recovered", count=recovered)
+
+    async def requeue_dead_letters(self) -> int:
+        """Devolve a dead-letter inteira para a fila de retry"""
+        redis = cache.client
+        if redis is None:
+            return 0
+
+        dead = await redis.hgetall(DEAD_LETTER_KEY)
+        now = time.time()
+        for tenant_id, raw in dead.items():
+            entry = json.loads(raw)
+            entry["attempts"] = 0
+            async with redis.pipeline(transaction=True) as pipe:
+                # Não sobrescreve uma falha mais nova que já está na fila
+                pipe.set(retry_entry_key(tenant_id), json.dumps(entry, default=str), nx=True)
+                pipe.zadd(RETRY_QUEUE_KEY, {tenant_id: now}, nx=True)
+                pipe.hdel(DEAD_LETTER_KEY, tenant_id)
+                await pipe.execute()
+        return len(dead)
+
+    async def _record_stats(self, result: str):
+        redis = cache.client
+        if redis is None:
+            return
+
+        key = cache_key("sync", "stats", date.today().isoformat())
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                if result in ("success", "failed"):
+                    pipe.hincrby(key, "total", 1)
+                pipe.hincrby(key, result, 1)
+                pipe.expire(key, 2 * 86400)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("sync_stats_error", error=str(e))
+
+    # ──────────────────────────────────────────────────────────
+    # Monitoramento
+    # ──────────────────────────────────────────────────────────
 
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -295,22 +703,17 @@ class SyncService:
         Usado para monitoramento da integração.
         """
 
-        url = f"{self.app_simples_url.rstrip('/')}/health"
-
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url=url,
-                    timeout=5.0
-                )
-
-                return {
-                    "status": "healthy" if response.status_code == 200 else "unhealthy",
-                    "status_code": response.status_code,
-                    "response_time_ms": response.elapsed.total_seconds() * 1000,
-                    "app_url": self.app_simples_url,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+            response = await self.client.get("/health", timeout=5.0)
+
+            return {
+                "status": "healthy" if response.status_code == 200 else "unhealthy",
+                "status_code": response.status_code,
+                "response_time_ms": response.elapsed.total_seconds() * 1000,
+                "http_version": response.http_version,
+                "app_url": self.app_simples_url,
+                "timestamp": datetime.utcnow().isoformat()
+            }
 
         except Exception as e:
             return {
@@ -324,22 +727,46 @@ class SyncService:
     async def get_sync_stats(self) -> Dict[str, Any]:
         """
         Retorna estatísticas de sincronização.
-        TODO: Implementar com métricas reais.
+        Contadores do dia e tamanho das filas vêm do Redis.
         """
 
+        stats: Dict[str, Any] = {}
+        retry_queue_size = dead_letter_size = 0
+        oldest_retry: Optional[Tuple[str, float]] = None
+
+        redis = cache.client
+        if redis is not None:
+            stats = await redis.hgetall(cache_key("sync", "stats", date.today().isoformat()))
+            retry_queue_size = await redis.zcard(RETRY_QUEUE_KEY)
+            dead_letter_size = await redis.hlen(DEAD_LETTER_KEY)
+            oldest = await redis.zrange(RETRY_QUEUE_KEY, 0, 0, withscores=True)
+            oldest_retry = oldest[0] if oldest else None
+
         return {
             "app_simples_url": self.app_simples_url,
             "timeout_seconds": self.timeout,
-            "max_retries": self.max_retries,
+            "http2": self.http2,
+            "max_attempts": self.max_attempts,
             "retry_delay_seconds": self.retry_delay,
-            # TODO: Adicionar métricas reais do Redis/Queue
-            "total_syncs_today": 0,
-            "successful_syncs_today": 0,
-            "failed_syncs_today": 0,
-            "retry_queue_size": 0
+            "coalesce_window_seconds": self.coalesce_window,
+            "total_syncs_today": int(stats.get("total", 0)),
+            "successful_syncs_today": int(stats.get("success", 0)),
+            "failed_syncs_today": int(stats.get("failed", 0)),
+            "queued_syncs_today": int(stats.get("queued", 0)),
+            "dead_letter_syncs_today": int(stats.get("dead", 0)),
+            "retry_queue_size": retry_queue_size,
+            "dead_letter_size": dead_letter_size,
+            "next_retry_at": (
+                datetime.utcfromtimestamp(oldest_retry[1]).isoformat() if oldest_retry else None
+            ),
+            "pending_coalesce": len(self._pending)
         }
 
 
+# Singleton instance
+sync_service = SyncService()
+
+
 # ══════════════════════════════════════════════════════════════
 # ENDPOINT DE RECEBIMENTO PARA APP SIMPLES
 # ══════════════════════════════════════════════════════════════
@@ -0,0 +1,3 @@
+"""
+Benchmarks do Conecta Plus (dataset sintético, micro e macrobenchmarks)
+"""
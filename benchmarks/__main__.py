@@ -0,0 +1,167 @@
+"""
+Suíte de benchmarks (execução isolada, sem deploy):
+
+    python -m benchmarks run                                   # micro + endpoints
+    python -m benchmarks run --suite micro --fakeredis -o benchmarks/results/atual.json
+    python -m benchmarks run --suite endpoints --database-url postgresql+asyncpg://.../conecta_bench
+    python -m benchmarks run --filter cache. --scale 0.2       # subconjunto, menos iterações
+    python -m benchmarks compare benchmarks/results/baseline.json benchmarks/results/atual.json
+    python -m benchmarks soak --url http://localhost:8100 --duration 3600   # memória sob carga (ver soak.py)
+
+Os endpoints exigem um banco carregado com scripts/generate_dataset.py.
+compare sai com código 1 se alguma mediana piorou além de --threshold.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+SUITES = ("micro", "endpoints")
+
+
+def _print_result(result) -> None:
+    stats = result.stats
+    print(
+        f"   • {result.name:<42} mediana {stats['median_ms']:>9.3f} ms   "
+        f"p95 {stats['p95_ms']:>9.3f} ms   {stats['ops_per_s']:>10,.0f} ops/s"
+    )
+
+
+async def run(suites, pattern, scale, fake_redis, output):
+    """Executa as suítes e grava o JSON"""
+    from benchmarks import endpoints, micro
+    from benchmarks.harness import build_report, run_suite, save_report
+
+    modules = {"micro": micro, "endpoints": endpoints}
+    results = []
+    environment = {}
+    for suite in suites:
+        module = modules[suite]
+        context = {}
+
+        async def setup(module=module, context=context):
+            ctx = await module.setup(fake_redis=fake_redis)
+            context["redis"] = ctx["redis_backend"]
+            return ctx
+
+        print(f"\n⏱️  {suite}")
+        results += await run_suite(suite, setup, module.teardown, pattern=pattern, scale=scale, on_result=_print_result)
+        environment[suite] = context
+
+    from app.config import settings
+
+    environment["database"] = settings.DATABASE_URL.rsplit("@", 1)[-1]
+    report = build_report(results, environment)
+    save_report(report, output)
+    print(f"\n✅ {len(results)} benchmarks gravados em {output}")
+
+
+def compare(baseline_path, current_path, threshold, metric):
+    """Imprime a variação por benchmark; retorna o código de saída"""
+    from benchmarks.harness import compare as compare_reports
+    from benchmarks.harness import load_report
+
+    comparisons = compare_reports(load_report(baseline_path), load_report(current_path), threshold, metric)
+    icons = {"regression": "🔴", "improvement": "🟢", "unchanged": "  ", "new": "🆕", "missing": "❔"}
+    for item in comparisons:
+        before = f"{item.baseline_ms:.3f}" if item.baseline_ms is not None else "-"
+        after = f"{item.current_ms:.3f}" if item.current_ms is not None else "-"
+        change = f"{item.change:+.1%}" if item.change is not None else ""
+        print(f"{icons[item.status]} {item.name:<42} {before:>10} → {after:>10} ms  {change}")
+
+    regressions = [item for item in comparisons if item.status == "regression"]
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regressões acima de {threshold:.0%} ({metric})")
+        return 1
+    print(f"\n✅ Sem regressões acima de {threshold:.0%} ({metric})")
+    return 0
+
+
+async def soak(args):
+    """Soak test contra um servidor rodando; grava JSON + HTML"""
+    from benchmarks.soak import SoakRunner, _fixture, save
+
+    runner = SoakRunner(
+        url=args.url,
+        duration=args.duration,
+        slice_seconds=args.slice,
+        concurrency=args.concurrency,
+        sample_interval=args.sample_interval,
+        warmup_cycles=args.warmup_cycles,
+        pattern=args.filter,
+        use_tracemalloc=args.tracemalloc,
+    )
+
+    def on_slice(item):
+        print(
+            f"   • volta {item.cycle} {item.endpoint:<36} {item.requests:>7,} req  {item.errors:>4} erros  "
+            f"RSS {item.rss_end / 1024 / 1024:8.1f} MB ({(item.rss_end - item.rss_start) / 1024:+,.0f} KB)"
+        )
+
+    print(
+        f"\n🔥 soak {args.url}: {args.duration / 60:.0f} min, fatias de {args.slice:.0f}s, {args.concurrency} conexões"
+    )
+    report = await runner.run(await _fixture(), on_slice=on_slice)
+    json_path, html_path = save(report, args.output)
+
+    summary = report["summary"]
+    print(
+        f"\n📈 RSS {summary['rss_first_bytes'] / 1024 / 1024:.1f} → {summary['rss_last_bytes'] / 1024 / 1024:.1f} MB, "
+        f"tendência {summary['rss_slope_bytes_per_hour'] / 1024 / 1024:+.2f} MB/h"
+    )
+    if len(summary["pids"]) > 1:
+        print(f"⚠️  Amostras de {len(summary['pids'])} workers: rode o servidor com um único worker")
+    print(f"✅ Relatório: {json_path} / {html_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks do Conecta Plus")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Executa os benchmarks e grava o JSON")
+    run_parser.add_argument("--suite", choices=SUITES, action="append", help="Padrão: todas")
+    run_parser.add_argument("--filter", default=None, help="Apenas benchmarks cujo nome contém o texto")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="Multiplica o número de iterações")
+    run_parser.add_argument("--fakeredis", action="store_true", help="Usa fakeredis em vez do Redis real")
+    run_parser.add_argument("--database-url", default=None, help="Banco com o dataset de benchmark")
+    run_parser.add_argument(
+        "-o", "--output", default=f"benchmarks/results/{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+
+    compare_parser = commands.add_parser("compare", help="Compara uma execução com o baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Piora tolerada (fração)")
+    compare_parser.add_argument("--metric", default="median_ms", choices=("median_ms", "p95_ms", "mean_ms", "min_ms"))
+
+    soak_parser = commands.add_parser("soak", help="Carga contínua contra um servidor, medindo a memória do worker")
+    soak_parser.add_argument("--url", default="http://localhost:8100")
+    soak_parser.add_argument("--duration", type=float, default=3600, help="Duração total (s)")
+    soak_parser.add_argument("--slice", type=float, default=30, help="Duração de cada fatia por endpoint (s)")
+    soak_parser.add_argument("--concurrency", type=int, default=8)
+    soak_parser.add_argument("--sample-interval", type=float, default=2, help="Intervalo de leitura da memória (s)")
+    soak_parser.add_argument("--warmup-cycles", type=int, default=1, help="Voltas iniciais fora do resumo")
+    soak_parser.add_argument("--filter", default=None, help="Apenas endpoints cujo nome contém o texto")
+    soak_parser.add_argument("--tracemalloc", action="store_true", help="Liga o tracemalloc e reporta o top no fim")
+    soak_parser.add_argument("--database-url", default=None, help="Banco do servidor (para os usuários)")
+    soak_parser.add_argument(
+        "-o", "--output", default=f"benchmarks/results/soak-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        sys.exit(compare(args.baseline, args.current, args.threshold, args.metric))
+
+    # Configuração lida na importação de app.config: precisa vir antes de importar a aplicação.
+    # Logs por request iriam para o stdout e distorceriam os tempos.
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    if args.command == "soak":
+        asyncio.run(soak(args))
+    else:
+        asyncio.run(run(args.suite or list(SUITES), args.filter, args.scale, args.fakeredis, args.output))
@@ -0,0 +1,711 @@
+"""
+Dataset Sintético em Escala de Produção
+
+Gera N condomínios com distribuições próximas das reais e grava tudo com
+COPY (asyncpg), em lotes mensais por condomínio:
+
+- unidades (quantidade lognormal por condomínio), moradores (Poisson por
+  unidade), porteiros, síndico e cadastro de visitantes recorrentes
+- anos de access_logs, visitas, encomendas (packages), notifications e
+  audit_logs, com picos por hora do dia e dia da semana, unidades com
+  atividade desigual (lognormal) e visitantes frequentes (Zipf)
+
+Tudo é derivado de numpy.random.default_rng([seed, condomínio]): a mesma
+semente gera o mesmo conteúdo (os ids dependem das sequências do banco).
+As partições mensais de access_logs/audit_logs são criadas antes da carga.
+
+Uso (ver scripts/generate_dataset.py):
+
+    profile = DatasetProfile(tenants=20, years=3, seed=42)
+    counts = await DatasetGenerator(profile).run(database_url)
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.logger import get_logger
+from app.core.security import get_password_hash
+from app.services.partitioning import add_months, month_start, partition_manager
+
+logger = get_logger(__name__)
+
+# Senha de todos os usuários gerados (login nos benchmarks de endpoint)
+BENCHMARK_PASSWORD = "benchmark123"
+BENCHMARK_EMAIL_DOMAIN = "bench.conectaplus.com.br"
+
+
+def benchmark_email(kind: str, tenant_number: int, number: int = 1) -> str:
+    """
+    Email previsível dos usuários gerados (login nos testes de carga):
+    morador7.c001@..., porteiro2.c001@..., sindico1.c001@... (condomínio e pessoa a partir de 1)
+    """
+    return f"{kind}{number}.c{tenant_number:03d}@{BENCHMARK_EMAIL_DOMAIN}"
+
+
+# Peso relativo por hora do dia (0h..23h)
+HOURLY_WEIGHTS: Dict[str, Sequence[float]] = {
+    "access": (2, 1, 1, 1, 1, 3, 8, 12, 10, 6, 5, 5, 6, 5, 5, 5, 7, 11, 12, 10, 8, 6, 4, 3),
+    "visit": (0, 0, 0, 0, 0, 0, 1, 2, 5, 7, 8, 7, 6, 7, 8, 8, 8, 7, 6, 5, 4, 2, 1, 0.5),
+    "package": (0, 0, 0, 0, 0, 0, 0, 1, 4, 8, 10, 10, 8, 9, 10, 10, 9, 7, 4, 2, 1, 0.5, 0, 0),
+    "notification": (1, 0.5, 0.5, 0.5, 0.5, 1, 4, 8, 9, 9, 8, 8, 8, 8, 9, 9, 9, 10, 10, 9, 8, 6, 4, 2),
+    "audit": (1, 0.5, 0.5, 0.5, 0.5, 1, 4, 8, 9, 9, 8, 7, 6, 7, 8, 8, 8, 7, 5, 4, 3, 2, 1, 1),
+}
+
+# Peso relativo por dia da semana (segunda..domingo)
+WEEKDAY_WEIGHTS: Dict[str, Sequence[float]] = {
+    "access": (1, 1, 1, 1, 1.05, 0.9, 0.8),
+    "visit": (0.8, 0.8, 0.85, 0.9, 1.1, 1.4, 1.3),
+    "package": (1.2, 1.1, 1.1, 1.1, 1, 0.5, 0.1),
+    "notification": (1, 1, 1, 1, 1, 0.8, 0.7),
+    "audit": (1.1, 1, 1, 1, 1, 0.6, 0.4),
+}
+
+FIRST_NAMES = (
+    "Ana", "Maria", "João", "José", "Pedro", "Paulo", "Lucas", "Gabriel", "Rafael", "Carlos", "Marcos", "Luiz",
+    "Fernanda", "Juliana", "Patrícia", "Aline", "Camila", "Amanda", "Bruna", "Letícia", "Beatriz", "Larissa",
+    "Rodrigo", "Felipe", "Bruno", "Thiago", "Diego", "André", "Márcia", "Cecília", "Antônio", "Francisca",
+)  # fmt: skip
+LAST_NAMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+    "Rocha", "Dias", "Nascimento", "Andrade", "Moreira", "Nunes", "Marques", "Machado", "Mendes", "Freitas",
+    "Araújo", "Conceição", "Gonçalves", "Cardoso", "Teixeira", "Correia",
+)  # fmt: skip
+
+ACCESS_METHODS = {"tag": 0.34, "facial": 0.24, "remote": 0.18, "app": 0.09, "biometric": 0.04, "manual": 0.11}
+VISITOR_ACCESS_METHODS = {"manual": 0.45, "qrcode": 0.3, "intercom": 0.15, "facial": 0.1}
+ACCESS_POINTS = {"Portaria Principal": 0.5, "Garagem": 0.35, "Portaria de Serviço": 0.1, "Pedestre Lateral": 0.05}
+VISITOR_TYPES = {"visitor": 0.55, "provider": 0.2, "delivery": 0.15, "relative": 0.07, "airbnb": 0.03}
+VISIT_TYPES = {"visita": 0.55, "prestacao_servico": 0.25, "entrega": 0.15, "airbnb": 0.05}
+AUTHORIZATION_METHODS = {"interfone": 0.4, "app": 0.3, "qr_code": 0.2, "porteiro": 0.1}
+PACKAGE_SENDERS = {
+    "Mercado Livre": 0.26, "Correios": 0.2, "Shopee": 0.18, "Amazon": 0.14, "Magalu": 0.06,
+    "Jadlog": 0.05, "Loggi": 0.05, "Total Express": 0.03, "iFood": 0.03,
+}  # fmt: skip
+PACKAGE_TYPES = {"package": 0.55, "envelope": 0.2, "box": 0.18, "food": 0.05, "furniture": 0.02}
+PACKAGE_SIZES = {"small": 0.4, "medium": 0.4, "large": 0.17, "extra_large": 0.03}
+NOTIFICATION_KINDS = {
+    ("package", "portaria", "Encomenda recebida"): 0.35,
+    ("visit", "portaria", "Visitante na portaria"): 0.25,
+    ("announcement", "comunicado", "Novo comunicado"): 0.15,
+    ("reservation", "reservas", "Reserva confirmada"): 0.08,
+    ("occurrence", "ocorrencias", "Ocorrência atualizada"): 0.07,
+    ("financial", "financeiro", "Boleto disponível"): 0.1,
+}
+AUDIT_ACTIONS = {
+    "login": 0.35, "update": 0.2, "create": 0.15, "access_grant": 0.15, "logout": 0.08,
+    "delete": 0.03, "export": 0.02, "access_deny": 0.02,
+}  # fmt: skip
+# Tabelas de eventos (volume) cujos índices secundários são recriados após a carga
+EVENT_TABLES = ("access_logs", "visitas", "packages", "notifications", "audit_logs")
+
+AUDIT_ENTITIES = {"visitor": 0.3, "user": 0.2, "package": 0.2, "vehicle": 0.1, "reservation": 0.1, "unit": 0.1}
+
+
+@dataclass
+class DatasetProfile:
+    """Tamanho e intensidade do dataset (taxas por unidade ou morador por dia)"""
+
+    tenants: int = 5
+    years: float = 2.0
+    seed: int = 42
+    units_median: int = 240  # unidades por condomínio (lognormal, sigma 0.5)
+    residents_per_unit: float = 2.4  # Poisson, mínimo 1
+    doormen_per_tenant: int = 6
+    visitors_per_unit: float = 4.0  # visitantes recorrentes cadastrados
+    accesses_per_unit_day: float = 9.0
+    visits_per_unit_day: float = 0.35
+    packages_per_unit_day: float = 0.3
+    notifications_per_resident_day: float = 0.6
+    audit_per_unit_day: float = 1.5
+    end: date = field(default_factory=date.today)
+
+    @property
+    def start(self) -> date:
+        return month_start(self.end - timedelta(days=round(self.years * 365)))
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def scaled(self, factor: float) -> "DatasetProfile":
+        """Mesmo perfil com as taxas diárias multiplicadas"""
+        rates = (
+            "accesses_per_unit_day",
+            "visits_per_unit_day",
+            "packages_per_unit_day",
+            "notifications_per_resident_day",
+            "audit_per_unit_day",
+        )
+        values = {**self.__dict__, **{name: getattr(self, name) * factor for name in rates}}
+        return DatasetProfile(**values)
+
+    def estimate(self) -> Dict[str, int]:
+        """Linhas esperadas por tabela (médias das distribuições)"""
+        units = self.tenants * self.units_median * math.exp(0.5**2 / 2)
+        residents = units * self.residents_per_unit
+        weekday = {kind: sum(weights) / 7 for kind, weights in WEEKDAY_WEIGHTS.items()}
+        return {
+            "units": round(units),
+            "users": round(residents + self.tenants * (self.doormen_per_tenant + 1)),
+            "visitors": round(units * self.visitors_per_unit),
+            "access_logs": round(units * self.accesses_per_unit_day * self.days * weekday["access"]),
+            "visitas": round(units * self.visits_per_unit_day * self.days * weekday["visit"]),
+            "packages": round(units * self.packages_per_unit_day * self.days * weekday["package"]),
+            "notifications": round(
+                residents * self.notifications_per_resident_day * self.days * weekday["notification"]
+            ),
+            "audit_logs": round(units * self.audit_per_unit_day * self.days * weekday["audit"]),
+        }
+
+
+# ==================== DISTRIBUIÇÕES ====================
+
+
+def _probabilities(weights: Sequence[float]) -> np.ndarray:
+    array = np.asarray(weights, dtype=float)
+    return array / array.sum()
+
+
+def weighted_choice(rng: np.random.Generator, options: Dict[Any, float], size: int) -> np.ndarray:
+    """Amostra `size` chaves de `options` segundo os pesos (array de objetos)"""
+    keys = np.empty(len(options), dtype=object)
+    keys[:] = list(options)
+    return keys[rng.choice(len(options), size=size, p=_probabilities(list(options.values())))]
+
+
+def event_times(rng: np.random.Generator, start: date, days: int, daily_rate: float, kind: str) -> np.ndarray:
+    """
+    Instantes (datetime64[s], ordenados) de um processo de Poisson diário
+    modulado por dia da semana e hora do dia.
+    """
+    weekday = np.asarray(WEEKDAY_WEIGHTS[kind])[(np.arange(days) + start.weekday()) % 7]
+    per_day = rng.poisson(daily_rate * weekday)
+    day = np.repeat(np.arange(days), per_day)
+    hour = rng.choice(24, size=day.size, p=_probabilities(HOURLY_WEIGHTS[kind]))
+    seconds = day * 86_400 + hour * 3_600 + rng.integers(0, 3_600, size=day.size)
+    seconds.sort()
+    return np.datetime64(start, "s") + seconds.astype("timedelta64[s]")
+
+
+def activity_weights(rng: np.random.Generator, size: int, sigma: float = 0.8) -> np.ndarray:
+    """Pesos lognormais: poucas unidades muito movimentadas, muitas tranquilas"""
+    return _probabilities(rng.lognormal(0, sigma, size=size))
+
+
+def zipf_indexes(rng: np.random.Generator, population: int, size: int, a: float = 1.3) -> np.ndarray:
+    """Índices em [0, population) com cauda Zipf (visitantes frequentes)"""
+    return (rng.zipf(a, size=size) - 1) % population
+
+
+def person_names(rng: np.random.Generator, size: int) -> np.ndarray:
+    first = np.asarray(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), size=size)]
+    last = np.asarray(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), size=size)]
+    middle = np.asarray(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), size=size)]
+    return np.char.add(np.char.add(np.char.add(first, " "), np.char.add(middle, " ")), last)
+
+
+def cpfs(rng: np.random.Generator, size: int) -> List[str]:
+    digits = rng.integers(0, 10**11, size=size, dtype=np.int64)
+    return [f"{d // 10**8:03d}.{d // 10**5 % 1000:03d}.{d // 100 % 1000:03d}-{d % 100:02d}" for d in digits.tolist()]
+
+
+def pick_in_groups(rng: np.random.Generator, first: np.ndarray, counts: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Para cada grupo sorteado (ex.: unidade), um membro uniforme (ex.: morador) desse grupo"""
+    return first[groups] + (rng.random(groups.size) * counts[groups]).astype(np.int64)
+
+
+def _nullable(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Array de objetos com None onde mask é False"""
+    result = np.full(values.shape, None, dtype=object)
+    result[mask] = values[mask]
+    return result
+
+
+def _records(columns: Dict[str, Any]) -> List[tuple]:
+    return list(zip(*(value.tolist() if isinstance(value, np.ndarray) else value for value in columns.values())))
+
+
+# ==================== CONDOMÍNIO ====================
+
+
+@dataclass
+class TenantPopulation:
+    """Ids e atributos (arrays alinhados) das pessoas de um condomínio"""
+
+    tenant_id: int
+    unit_ids: np.ndarray
+    unit_first_resident: np.ndarray  # índice do primeiro morador de cada unidade em resident_ids
+    unit_resident_count: np.ndarray
+    resident_ids: np.ndarray
+    resident_names: np.ndarray
+    staff_ids: np.ndarray  # porteiros; o último é o síndico
+    visitor_ids: np.ndarray
+    visitor_names: np.ndarray
+    visitor_cpfs: List[str]
+    unit_weights: np.ndarray
+
+
+class DatasetGenerator:
+    """
+    Carga do dataset sintético via COPY.
+
+    Usage:
+        counts = await DatasetGenerator(DatasetProfile(tenants=20, years=3)).run(database_url)
+    """
+
+    def __init__(self, profile: DatasetProfile, skip_fk_checks: bool = True, defer_indexes: bool = True):
+        self.profile = profile
+        self.skip_fk_checks = skip_fk_checks
+        self.defer_indexes = defer_indexes
+        self.counts: Dict[str, int] = {}
+        self._password_hash: Optional[str] = None
+        self._has_notifications = False
+
+    async def _copy(self, conn: AsyncConnection, table: str, columns: Dict[str, Any]) -> int:
+        records = _records(columns)
+        if records:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(table, records=records, columns=list(columns))
+        self.counts[table] = self.counts.get(table, 0) + len(records)
+        return len(records)
+
+    @staticmethod
+    async def _reserve_ids(conn: AsyncConnection, table: str, count: int) -> np.ndarray:
+        """Reserva um bloco contínuo da sequência de id (os ids vão no COPY, para as FKs)"""
+        last = (
+            await conn.execute(
+                text(
+                    "SELECT setval(pg_get_serial_sequence(:table, 'id'), nextval(pg_get_serial_sequence(:table, 'id')) + :n - 1)"
+                ),
+                {"table": table, "n": count},
+            )
+        ).scalar()
+        return np.arange(last - count + 1, last + 1, dtype=np.int64)
+
+    @staticmethod
+    async def _drop_secondary_indexes(conn: AsyncConnection) -> List[str]:
+        """
+        Remove os índices não únicos das tabelas de eventos e retorna suas
+        definições. Recriar no fim é bem mais rápido que mantê-los linha a
+        linha durante o COPY; PKs e índices únicos ficam.
+        """
+        rows = (
+            await conn.execute(
+                text(
+                    """
+                    SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+                    FROM pg_index i
+                    JOIN pg_class t ON t.oid = i.indrelid
+                    JOIN pg_namespace n ON n.oid = t.relnamespace AND n.nspname = current_schema()
+                    WHERE t.relname = ANY(:tables) AND NOT i.indisunique
+                    """
+                ),
+                {"tables": list(EVENT_TABLES)},
+            )
+        ).fetchall()
+        for name, _ in rows:
+            # Em tabela particionada o DROP no pai remove os índices das partições
+            await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        await conn.commit()
+        # "ON ONLY" criaria o índice do pai inválido, sem as partições
+        return [definition.replace(" ON ONLY ", " ON ") for _, definition in rows]
+
+    @staticmethod
+    async def _restore_indexes(conn: AsyncConnection, definitions: List[str]) -> None:
+        await conn.execute(text("SET maintenance_work_mem = '256MB'"))
+        for definition in definitions:
+            await conn.execute(text(definition))
+        await conn.commit()
+
+    async def _prepare(self, conn: AsyncConnection) -> None:
+        await conn.execute(text("SET synchronous_commit = off"))
+        if self.skip_fk_checks:
+            # Dados consistentes por construção: sem os triggers de FK o COPY fica ~3x mais rápido
+            try:
+                await conn.execute(text("SET session_replication_role = replica"))
+            except Exception as e:
+                await conn.rollback()
+                await conn.execute(text("SET synchronous_commit = off"))
+                logger.warning("dataset_fk_checks_enabled", reason=str(e).splitlines()[0])
+
+        month = self.profile.start
+        while month <= self.profile.end:
+            for table in ("access_logs", "audit_logs"):
+                if await partition_manager.is_partitioned(conn, table):
+                    await partition_manager.create_partition(conn, table, month)
+            month = add_months(month, 1)
+
+        self._has_notifications = (await conn.execute(text("SELECT to_regclass('notifications')"))).scalar() is not None
+        self._password_hash = get_password_hash(BENCHMARK_PASSWORD)
+        await conn.commit()
+
+    async def _create_tenant(self, conn: AsyncConnection, rng: np.random.Generator, number: int) -> TenantPopulation:
+        profile = self.profile
+        tenant_id = int((await self._reserve_ids(conn, "tenants", 1))[0])
+        created = datetime.combine(profile.start, datetime.min.time())
+        await self._copy(
+            conn,
+            "tenants",
+            {
+                "id": [tenant_id],
+                "name": [f"Condomínio Benchmark {number:03d}"],
+                "city": ["São Paulo"],
+                "state": ["SP"],
+                "settings": ["{}"],
+                "is_active": [True],
+                "subscription_plan": ["basic"],
+                "created_at": [created],
+                "updated_at": [created],
+            },
+        )
+
+        # Unidades: blocos de 4 a 20 andares, 4 apartamentos por andar
+        n_units = max(20, int(rng.lognormal(math.log(profile.units_median), 0.5)))
+        unit_ids = await self._reserve_ids(conn, "units", n_units)
+        per_floor = 4
+        floors = int(rng.integers(4, 21))
+        position = np.arange(n_units)
+        floor = position // per_floor % floors + 1
+        block = np.asarray([chr(65 + b % 26) for b in range(n_units // (per_floor * floors) + 1)])[
+            position // (per_floor * floors)
+        ]
+        unit_number = np.char.mod("%d", floor * 100 + position % per_floor + 1)
+        await self._copy(
+            conn,
+            "units",
+            {
+                "id": unit_ids,
+                "tenant_id": np.full(n_units, tenant_id),
+                "block": block,
+                "number": unit_number,
+                "floor": floor,
+                "unit_type": np.full(n_units, "apartment", dtype=object),
+                "parking_spots": rng.choice([1, 1, 1, 2, 2, 3], size=n_units),
+                "is_rented": rng.random(n_units) < 0.25,
+                "is_active": np.ones(n_units, dtype=bool),
+                "created_at": [created] * n_units,
+                "updated_at": [created] * n_units,
+            },
+        )
+
+        # Moradores (Poisson por unidade, mínimo 1) + porteiros + síndico
+        counts = np.maximum(1, rng.poisson(profile.residents_per_unit, size=n_units))
+        first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        n_residents = int(counts.sum())
+        n_staff = profile.doormen_per_tenant + 1
+        user_ids = await self._reserve_ids(conn, "users", n_residents + n_staff)
+        names = person_names(rng, n_residents + n_staff)
+        roles = np.concatenate((np.ones(n_residents, dtype=np.int64), np.full(n_staff - 1, 3), [2]))
+        await self._copy(
+            conn,
+            "users",
+            {
+                "id": user_ids,
+                "tenant_id": np.full(user_ids.size, tenant_id),
+                "name": names,
+                "email": [benchmark_email("morador", number, k + 1) for k in range(n_residents)]
+                + [benchmark_email("porteiro", number, k + 1) for k in range(n_staff - 1)]
+                + [benchmark_email("sindico", number)],
+                "password_hash": [self._password_hash] * user_ids.size,
+                "cpf": cpfs(rng, user_ids.size),
+                "phone": np.char.mod("(11) 9%08d", rng.integers(0, 10**8, size=user_ids.size)),
+                "role": roles,
+                "is_active": np.ones(user_ids.size, dtype=bool),
+                "is_verified": np.ones(user_ids.size, dtype=bool),
+                "is_deleted": np.zeros(user_ids.size, dtype=bool),
+                "has_special_needs": rng.random(user_ids.size) < 0.03,
+                "created_at": [created] * user_ids.size,
+                "updated_at": [created] * user_ids.size,
+            },
+        )
+        resident_unit = np.repeat(np.arange(n_units), counts)
+        is_primary = np.zeros(n_residents, dtype=bool)
+        is_primary[first] = True
+        await self._copy(
+            conn,
+            "unit_residents",
+            {
+                "unit_id": unit_ids[resident_unit],
+                "user_id": user_ids[:n_residents],
+                "relationship_type": np.where(is_primary, "owner", "resident").astype(object),
+                "is_primary": is_primary,
+                "is_active": np.ones(n_residents, dtype=bool),
+                "created_at": [created] * n_residents,
+                "updated_at": [created] * n_residents,
+            },
+        )
+
+        # Visitantes recorrentes
+        n_visitors = max(10, int(n_units * profile.visitors_per_unit))
+        visitor_ids = await self._reserve_ids(conn, "visitors", n_visitors)
+        visitor_names = person_names(rng, n_visitors)
+        visitor_cpfs = cpfs(rng, n_visitors)
+        await self._copy(
+            conn,
+            "visitors",
+            {
+                "id": visitor_ids,
+                "tenant_id": np.full(n_visitors, tenant_id),
+                "name": visitor_names,
+                "cpf": visitor_cpfs,
+                "phone": np.char.mod("(11) 9%08d", rng.integers(0, 10**8, size=n_visitors)),
+                "visitor_type": weighted_choice(rng, VISITOR_TYPES, n_visitors),
+                "is_blocked": rng.random(n_visitors) < 0.005,
+                "has_special_needs": np.zeros(n_visitors, dtype=bool),
+                "created_at": [created] * n_visitors,
+                "updated_at": [created] * n_visitors,
+            },
+        )
+        await conn.commit()
+
+        return TenantPopulation(
+            tenant_id=tenant_id,
+            unit_ids=unit_ids,
+            unit_first_resident=first,
+            unit_resident_count=counts,
+            resident_ids=user_ids[:n_residents],
+            resident_names=names[:n_residents],
+            staff_ids=user_ids[n_residents:],
+            visitor_ids=visitor_ids,
+            visitor_names=visitor_names,
+            visitor_cpfs=visitor_cpfs,
+            unit_weights=activity_weights(rng, n_units),
+        )
+
+    # ==================== EVENTOS (POR MÊS) ====================
+
+    def _doorman_on_duty(self, population: TenantPopulation, times: np.ndarray) -> np.ndarray:
+        """Porteiro do turno (3 turnos de 8h em rodízio diário)"""
+        doormen = population.staff_ids[:-1]
+        hours = (times - times.astype("datetime64[D]")).astype("timedelta64[h]").astype(np.int64)
+        days = times.astype("datetime64[D]").astype(np.int64)
+        return doormen[(days * 3 + hours // 8) % doormen.size]
+
+    async def _access_logs(self, conn, rng, population: TenantPopulation, start: date, days: int, now) -> None:
+        n_units = population.unit_ids.size
+        times = event_times(rng, start, days, self.profile.accesses_per_unit_day * n_units, "access")
+        times = times[times <= now]
+        size = times.size
+        units = rng.choice(n_units, size=size, p=population.unit_weights)
+        is_resident = rng.random(size) < 0.78
+        residents = population.resident_ids[
+            pick_in_groups(rng, population.unit_first_resident, population.unit_resident_count, units)
+        ]
+        visitors = population.visitor_ids[zipf_indexes(rng, population.visitor_ids.size, size)]
+        method = np.where(
+            is_resident, weighted_choice(rng, ACCESS_METHODS, size), weighted_choice(rng, VISITOR_ACCESS_METHODS, size)
+        )
+        manual = (method == "manual") | (method == "intercom")
+        await self._copy(
+            conn,
+            "access_logs",
+            {
+                "tenant_id": np.full(size, population.tenant_id),
+                "user_id": _nullable(residents, is_resident),
+                "visitor_id": _nullable(visitors, ~is_resident),
+                "unit_id": population.unit_ids[units],
+                "access_type": np.where(rng.random(size) < 0.5, "entry", "exit").astype(object),
+                "access_method": method,
+                "access_point": weighted_choice(rng, ACCESS_POINTS, size),
+                "registered_by_id": _nullable(self._doorman_on_duty(population, times), manual),
+                "registered_at": times.astype("datetime64[us]"),
+            },
+        )
+
+    async def _visitas(self, conn, rng, population: TenantPopulation, start: date, days: int, now) -> None:
+        n_units = population.unit_ids.size
+        entries = event_times(rng, start, days, self.profile.visits_per_unit_day * n_units, "visit")
+        entries = entries[entries <= now]
+        size = entries.size
+        units = rng.choice(n_units, size=size, p=population.unit_weights)
+        visitors = zipf_indexes(rng, population.visitor_ids.size, size)
+        duration = rng.lognormal(math.log(75 * 60), 0.9, size=size).astype(np.int64)
+        exits = entries + duration.astype("timedelta64[s]")
+        finished = exits <= now
+        status = np.where(finished, "finalizada", "em_andamento").astype(object)
+        status[rng.random(size) < 0.02] = "negada"
+        cpf_column = np.empty(population.visitor_ids.size, dtype=object)
+        cpf_column[:] = population.visitor_cpfs
+        await self._copy(
+            conn,
+            "visitas",
+            {
+                "tenant_id": np.full(size, population.tenant_id),
+                "visitor_id": population.visitor_ids[visitors],
+                "visitante_nome": population.visitor_names[visitors],
+                "visitante_documento": cpf_column[visitors],
+                "unit_id": population.unit_ids[units],
+                "morador_id": population.resident_ids[
+                    pick_in_groups(rng, population.unit_first_resident, population.unit_resident_count, units)
+                ],
+                "porteiro_entrada_id": self._doorman_on_duty(population, entries),
+                "porteiro_saida_id": _nullable(self._doorman_on_duty(population, exits), finished),
+                "tipo": weighted_choice(rng, VISIT_TYPES, size),
+                "status": status,
+                "data_entrada": entries.astype("datetime64[us]"),
+                "data_saida": _nullable(exits.astype("datetime64[us]"), finished),
+                "metodo_autorizacao": weighted_choice(rng, AUTHORIZATION_METHODS, size),
+                "created_at": entries.astype("datetime64[us]"),
+                "updated_at": entries.astype("datetime64[us]"),
+            },
+        )
+
+    async def _packages(self, conn, rng, population: TenantPopulation, start: date, days: int, now, serial) -> int:
+        n_units = population.unit_ids.size
+        received = event_times(rng, start, days, self.profile.packages_per_unit_day * n_units, "package")
+        received = received[received <= now]
+        size = received.size
+        units = rng.choice(n_units, size=size, p=population.unit_weights)
+        recipients = pick_in_groups(rng, population.unit_first_resident, population.unit_resident_count, units)
+        notified = received + rng.integers(60, 900, size=size).astype("timedelta64[s]")
+        picked = received + rng.exponential(20 * 3_600, size=size).astype(np.int64).astype("timedelta64[s]")
+        picked_up = picked <= now
+        returned = picked_up & (rng.random(size) < 0.01)
+        status = np.where(picked_up, "picked_up", "notified").astype(object)
+        status[returned] = "returned"
+        collected = picked_up & ~returned
+        protocols = [f"BK{population.tenant_id:05d}{serial + i:09d}" for i in range(size)]
+        await self._copy(
+            conn,
+            "packages",
+            {
+                "tenant_id": np.full(size, population.tenant_id),
+                "protocol": protocols,
+                "unit_id": population.unit_ids[units],
+                "recipient_name": population.resident_names[recipients],
+                "received_at": received.astype("datetime64[us]"),
+                "received_by_id": self._doorman_on_duty(population, received),
+                "sender": weighted_choice(rng, PACKAGE_SENDERS, size),
+                "package_type": weighted_choice(rng, PACKAGE_TYPES, size),
+                "size": weighted_choice(rng, PACKAGE_SIZES, size),
+                "status": status,
+                "notified_at": notified.astype("datetime64[us]"),
+                "notification_count": 1 + (~picked_up & (rng.random(size) < 0.3)),
+                "picked_up_at": _nullable(picked.astype("datetime64[us]"), collected),
+                "picked_up_by_id": _nullable(population.resident_ids[recipients], collected),
+                "picked_up_by_name": _nullable(population.resident_names[recipients].astype(object), collected),
+                "created_at": received.astype("datetime64[us]"),
+                "updated_at": received.astype("datetime64[us]"),
+            },
+        )
+        return size
+
+    async def _notifications(self, conn, rng, population: TenantPopulation, start: date, days: int, now) -> None:
+        n_residents = population.resident_ids.size
+        times = event_times(rng, start, days, self.profile.notifications_per_resident_day * n_residents, "notification")
+        times = times[times <= now]
+        size = times.size
+        kinds = weighted_choice(rng, NOTIFICATION_KINDS, size)
+        age_days = (np.datetime64(now, "s") - times).astype("timedelta64[D]").astype(np.int64)
+        is_read = rng.random(size) < np.where(age_days > 7, 0.92, 0.45)
+        await self._copy(
+            conn,
+            "notifications",
+            {
+                "tenant_id": np.full(size, population.tenant_id),
+                "user_id": population.resident_ids[rng.integers(0, n_residents, size=size)],
+                "type": [kind[0] for kind in kinds],
+                "category": [kind[1] for kind in kinds],
+                "priority": rng.choice([2, 3, 3, 3, 4], size=size),
+                "title": [kind[2] for kind in kinds],
+                "is_read": is_read,
+                "is_dismissed": is_read & (rng.random(size) < 0.2),
+                "is_actioned": np.zeros(size, dtype=bool),
+                "created_at": times.astype("datetime64[us]"),
+                "updated_at": times.astype("datetime64[us]"),
+            },
+        )
+
+    async def _audit_logs(self, conn, rng, population: TenantPopulation, start: date, days: int, now) -> None:
+        n_units = population.unit_ids.size
+        times = event_times(rng, start, days, self.profile.audit_per_unit_day * n_units, "audit")
+        times = times[times <= now]
+        size = times.size
+        # Metade das ações é da equipe (porteiros/síndico), o resto de moradores
+        staff = rng.random(size) < 0.5
+        users = np.where(
+            staff,
+            population.staff_ids[rng.integers(0, population.staff_ids.size, size=size)],
+            population.resident_ids[rng.integers(0, population.resident_ids.size, size=size)],
+        )
+        actions = weighted_choice(rng, AUDIT_ACTIONS, size)
+        entities = weighted_choice(rng, AUDIT_ENTITIES, size)
+        await self._copy(
+            conn,
+            "audit_logs",
+            {
+                "tenant_id": np.full(size, population.tenant_id),
+                "user_id": users,
+                "action": actions,
+                "entity_type": entities,
+                "entity_id": rng.integers(1, 1_000_000, size=size),
+                "description": np.char.add(np.char.add(actions.astype(str), " "), entities.astype(str)),
+                "ip_address": np.char.mod("10.%d.0.1", rng.integers(0, 256, size=size)),
+                "created_at": times.astype("datetime64[us]"),
+            },
+        )
+
+    async def _generate_tenant(self, conn: AsyncConnection, number: int) -> None:
+        rng = np.random.default_rng([self.profile.seed, number])
+        population = await self._create_tenant(conn, rng, number)
+        now = np.datetime64(datetime.combine(self.profile.end, datetime.max.time()), "s")
+        serial = 0
+        month = self.profile.start
+        while month <= self.profile.end:
+            days = min((add_months(month, 1) - month).days, (self.profile.end - month).days + 1)
+            await self._access_logs(conn, rng, population, month, days, now)
+            await self._visitas(conn, rng, population, month, days, now)
+            serial += await self._packages(conn, rng, population, month, days, now, serial)
+            if self._has_notifications:
+                await self._notifications(conn, rng, population, month, days, now)
+            await self._audit_logs(conn, rng, population, month, days, now)
+            await conn.commit()
+            month = add_months(month, 1)
+
+    async def run(self, database_url: str) -> Dict[str, int]:
+        """Gera e grava todos os condomínios; retorna as linhas gravadas por tabela"""
+        engine = create_async_engine(database_url)
+        started = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                await self._prepare(conn)
+                deferred = await self._drop_secondary_indexes(conn) if self.defer_indexes else []
+                try:
+                    # Numeração continua a de cargas anteriores no mesmo banco (emails únicos)
+                    first = (
+                        await conn.execute(
+                            text("SELECT COUNT(*) + 1 FROM tenants WHERE name LIKE 'Condomínio Benchmark %'")
+                        )
+                    ).scalar()
+                    for number in range(first, first + self.profile.tenants):
+                        await self._generate_tenant(conn, number)
+                        logger.info(
+                            "dataset_tenant_generated",
+                            tenant=number,
+                            last=first + self.profile.tenants - 1,
+                            rows=sum(self.counts.values()),
+                            elapsed_s=round(time.perf_counter() - started, 1),
+                        )
+                finally:
+                    # Recria os índices mesmo se a carga falhar no meio
+                    await conn.rollback()
+                    await self._restore_indexes(conn, deferred)
+                    logger.info(
+                        "dataset_indexes_restored",
+                        indexes=len(deferred),
+                        elapsed_s=round(time.perf_counter() - started, 1),
+                    )
+                for table in self.counts:
+                    await conn.execute(text(f"ANALYZE {table}"))
+                await conn.commit()
+        finally:
+            await engine.dispose()
+        return self.counts
@@ -0,0 +1,177 @@
+"""
+Benchmarks de endpoint: a aplicação inteira (middlewares, dependências,
+SQL e serialização) via cliente ASGI em processo, sem rede nem uvicorn.
+
+Precisa de um banco carregado pelo gerador de dataset
+(scripts/generate_dataset.py); usa o primeiro condomínio "Benchmark" e um
+porteiro dele. O Redis pode ser real ou fakeredis, como nos micro.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict
+
+import httpx
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.security import create_access_token
+from app.database import close_db_connections, get_db_context
+from app.services.cache import cache
+from benchmarks.harness import benchmark, connect_redis
+
+SUITE = "endpoints"
+
+BENCHMARK_QR_CODE = "BENCH-QR-0001"
+
+
+async def _fixture(db) -> Dict[str, Any]:
+    """Condomínio, porteiro e pré-autorização usados nas requisições"""
+    row = (
+        await db.execute(
+            text(
+                """
+                SELECT t.id AS tenant_id, u.id AS user_id, u.role,
+                       (SELECT ur.unit_id FROM unit_residents ur JOIN units un ON un.id = ur.unit_id
+                        WHERE un.tenant_id = t.id AND ur.is_primary ORDER BY ur.unit_id LIMIT 1) AS unit_id,
+                       (SELECT ur.user_id FROM unit_residents ur JOIN units un ON un.id = ur.unit_id
+                        WHERE un.tenant_id = t.id AND ur.is_primary ORDER BY ur.unit_id LIMIT 1) AS morador_id
+                FROM tenants t
+                JOIN users u ON u.tenant_id = t.id AND u.role = 3 AND u.is_active
+                WHERE t.name LIKE 'Condomínio Benchmark%'
+                ORDER BY t.id, u.id
+                LIMIT 1
+                """
+            )
+        )
+    ).fetchone()
+    if row is None:
+        raise RuntimeError("Banco sem dataset de benchmark: rode scripts/generate_dataset.py antes")
+
+    # Pré-autorização válida para o caminho de validação do QR Code (idempotente)
+    await db.execute(
+        text(
+            """
+            INSERT INTO pre_autorizacoes (
+                tenant_id, unit_id, morador_id, visitante_nome, visitante_tipo, data_inicio, data_fim,
+                tipo, is_single_use, max_usos, usos_realizados, qr_code, status, created_at, updated_at
+            ) VALUES (
+                :tenant_id, :unit_id, :morador_id, 'Visitante Benchmark', 'visitante', :inicio, :fim,
+                'recorrente', false, 1000000, 0, :qr_code, 'ativa', NOW(), NOW()
+            )
+            ON CONFLICT (qr_code) DO UPDATE SET data_inicio = :inicio, data_fim = :fim, status = 'ativa'
+            """
+        ),
+        {
+            "tenant_id": row.tenant_id,
+            "unit_id": row.unit_id,
+            "morador_id": row.morador_id,
+            "inicio": date.today() - timedelta(days=1),
+            "fim": date.today() + timedelta(days=365),
+            "qr_code": BENCHMARK_QR_CODE,
+        },
+    )
+    return dict(row._mapping)
+
+
+async def setup(fake_redis: bool = False) -> Dict[str, Any]:
+    from app.main import app
+
+    # O rate limit continua no caminho, mas sem bloquear o volume do benchmark
+    settings.RATE_LIMIT_REQUESTS = 10**9
+
+    backend = await connect_redis(fake=fake_redis)
+    async with get_db_context() as db:
+        fixture = await _fixture(db)
+
+    token = create_access_token({"sub": str(fixture["user_id"]), "tenant_id": fixture["tenant_id"], "role": 3})
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://benchmark",
+        headers={"Authorization": f"Bearer {token}", "X-Forwarded-For": "10.0.0.1"},
+    )
+    ctx = {"redis_backend": backend, "client": client, **fixture}
+
+    # Falha cedo (e com o corpo da resposta) se algum endpoint não responde 200
+    for bench in ENDPOINT_BENCHMARKS:
+        await bench(ctx)
+    return ctx
+
+
+async def teardown(ctx: Dict[str, Any]) -> None:
+    await ctx["client"].aclose()
+    await cache.disconnect()
+    await close_db_connections()
+
+
+async def _request(ctx: Dict[str, Any], method: str, url: str, **kwargs) -> None:
+    response = await ctx["client"].request(method, url, **kwargs)
+    if response.status_code != 200:
+        raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.text[:300]}")
+    # Consome o corpo, como um cliente real
+    response.content
+
+
+@benchmark("portaria.dashboard", suite=SUITE, iterations=50, warmup=3)
+async def portaria_dashboard(ctx):
+    """GET /portaria/dashboard (estatísticas do dia + listas em tempo real)"""
+    await _request(ctx, "GET", "/api/v1/portaria/dashboard", params={"tenant_id": ctx["tenant_id"]})
+
+
+@benchmark("visitas.list", suite=SUITE, iterations=100, warmup=5)
+async def visitas_list(ctx):
+    """GET /portaria/visitas (primeira página, 50 itens)"""
+    await _request(ctx, "GET", "/api/v1/portaria/visitas", params={"tenant_id": ctx["tenant_id"], "limit": 50})
+
+
+@benchmark("visitas.list_finalizadas_30d", suite=SUITE, iterations=100, warmup=5)
+async def visitas_list_filtered(ctx):
+    """GET /portaria/visitas filtrando status e últimos 30 dias"""
+    params = {
+        "tenant_id": ctx["tenant_id"],
+        "status": "finalizada",
+        "data_inicio": (date.today() - timedelta(days=30)).isoformat(),
+        "limit": 50,
+    }
+    await _request(ctx, "GET", "/api/v1/portaria/visitas", params=params)
+
+
+@benchmark("reports.acessos", suite=SUITE, iterations=50, warmup=3)
+async def reports_acessos(ctx):
+    """GET /reports/acessos (contagem total + primeira página)"""
+    await _request(ctx, "GET", "/api/v1/reports/acessos", params={"tenant_id": ctx["tenant_id"]})
+
+
+@benchmark("reports.acessos_month", suite=SUITE, iterations=50, warmup=3)
+async def reports_acessos_month(ctx):
+    """GET /reports/acessos do último mês"""
+    params = {"tenant_id": ctx["tenant_id"], "start_date": (date.today() - timedelta(days=30)).isoformat()}
+    await _request(ctx, "GET", "/api/v1/reports/acessos", params=params)
+
+
+@benchmark("reports.resumo", suite=SUITE, iterations=30, warmup=2)
+async def reports_resumo(ctx):
+    """GET /reports/resumo (contagens gerais do condomínio)"""
+    await _request(ctx, "GET", "/api/v1/reports/resumo", params={"tenant_id": ctx["tenant_id"]})
+
+
+@benchmark("pre_autorizacoes.validar_qr", suite=SUITE, iterations=200, warmup=10)
+async def validar_qr(ctx):
+    """POST /portaria/pre-autorizacoes/validar (leitura do QR Code na portaria)"""
+    await _request(
+        ctx,
+        "POST",
+        "/api/v1/portaria/pre-autorizacoes/validar",
+        params={"tenant_id": ctx["tenant_id"]},
+        json={"qr_code": BENCHMARK_QR_CODE},
+    )
+
+
+ENDPOINT_BENCHMARKS = (
+    portaria_dashboard,
+    visitas_list,
+    visitas_list_filtered,
+    reports_acessos,
+    reports_acessos_month,
+    reports_resumo,
+    validar_qr,
+)
@@ -0,0 +1,269 @@
+"""
+Execução, resultados e comparação dos benchmarks
+
+Cada benchmark é uma função (sync ou async) registrada com @benchmark; o
+runner faz o aquecimento, cronometra cada chamada e grava as estatísticas
+em JSON. compare() confronta dois arquivos e aponta as regressões.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Variação da mediana (fração) a partir da qual o compare acusa regressão
+DEFAULT_THRESHOLD = 0.10
+
+# Diferenças absolutas abaixo disso (ms) são ruído de medição, não regressão
+NOISE_FLOOR_MS = 0.005
+
+
+@dataclass
+class Benchmark:
+    """Benchmark registrado"""
+
+    name: str
+    suite: str
+    func: Callable[..., Any]
+    iterations: int
+    warmup: int
+    description: str = ""
+
+
+@dataclass
+class BenchmarkResult:
+    """Tempos de uma execução (ms por chamada)"""
+
+    name: str
+    suite: str
+    timings_ms: List[float] = field(repr=False)
+    description: str = ""
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        ordered = sorted(self.timings_ms)
+        mean = statistics.fmean(ordered)
+        return {
+            "iterations": len(ordered),
+            "min_ms": round(ordered[0], 4),
+            "median_ms": round(statistics.median(ordered), 4),
+            "mean_ms": round(mean, 4),
+            "p95_ms": round(percentile(ordered, 95), 4),
+            "p99_ms": round(percentile(ordered, 99), 4),
+            "max_ms": round(ordered[-1], 4),
+            "stdev_ms": round(statistics.pstdev(ordered), 4),
+            "ops_per_s": round(1000 / mean, 1) if mean else 0.0,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"suite": self.suite, "description": self.description, **self.stats}
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, suite: str, iterations: int = 1000, warmup: Optional[int] = None):
+    """
+    Registra um benchmark. A função recebe o contexto da suíte (dict montado
+    no setup) e é chamada `iterations` vezes.
+
+    Usage:
+        @benchmark("cache.get_hit", suite="micro", iterations=5000)
+        async def cache_get_hit(ctx):
+            await cache.get("conecta:bench:hit")
+    """
+
+    def decorator(func: Callable[..., Any]):
+        REGISTRY[name] = Benchmark(
+            name=name,
+            suite=suite,
+            func=func,
+            iterations=iterations,
+            warmup=warmup if warmup is not None else max(1, iterations // 10),
+            description=(func.__doc__ or "").strip().splitlines()[0] if func.__doc__ else "",
+        )
+        return func
+
+    return decorator
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """Percentil com interpolação linear (lista já ordenada)"""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+async def run_benchmark(bench: Benchmark, ctx: Dict[str, Any], scale: float = 1.0) -> BenchmarkResult:
+    """Aquece e cronometra cada chamada (perf_counter_ns)"""
+    is_async = inspect.iscoroutinefunction(bench.func)
+    iterations = max(1, int(bench.iterations * scale))
+    timings: List[float] = []
+
+    for _ in range(max(1, int(bench.warmup * scale))):
+        result = bench.func(ctx)
+        if is_async:
+            await result
+
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        result = bench.func(ctx)
+        if is_async:
+            await result
+        timings.append((time.perf_counter_ns() - started) / 1e6)
+
+    return BenchmarkResult(name=bench.name, suite=bench.suite, timings_ms=timings, description=bench.description)
+
+
+async def run_suite(
+    suite: str,
+    setup: Callable[[], Awaitable[Dict[str, Any]]],
+    teardown: Callable[[Dict[str, Any]], Awaitable[None]],
+    pattern: Optional[str] = None,
+    scale: float = 1.0,
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> List[BenchmarkResult]:
+    """Executa os benchmarks de uma suíte (filtrados por substring) com setup/teardown compartilhados"""
+    selected = [b for b in REGISTRY.values() if b.suite == suite and (not pattern or pattern in b.name)]
+    if not selected:
+        return []
+
+    results = []
+    ctx = await setup()
+    try:
+        for bench in selected:
+            result = await run_benchmark(bench, ctx, scale=scale)
+            results.append(result)
+            if on_result:
+                on_result(result)
+            # Libera o loop entre benchmarks (tarefas pendentes não contaminam o próximo)
+            await asyncio.sleep(0)
+    finally:
+        await teardown(ctx)
+    return results
+
+
+# ==================== AMBIENTE ====================
+
+
+async def connect_redis(fake: bool = False) -> str:
+    """
+    Conecta o singleton `cache` ao Redis de settings.REDIS_URL ou, com
+    fake=True (ou Redis indisponível), a um fakeredis em memória.
+    Retorna o backend usado ("redis" ou "fakeredis").
+    """
+    from app.services.cache import cache
+
+    if not fake:
+        await cache.connect()
+        if cache.is_connected:
+            return "redis"
+        logger.warning("benchmark_redis_unavailable", fallback="fakeredis")
+
+    try:
+        import fakeredis
+    except ImportError as e:
+        raise RuntimeError("Redis indisponível e fakeredis não instalado (pip install fakeredis)") from e
+
+    cache._client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return "fakeredis"
+
+
+# ==================== RESULTADOS ====================
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def build_report(results: List[BenchmarkResult], environment: Dict[str, Any]) -> Dict[str, Any]:
+    """Documento JSON com metadados do ambiente e estatísticas por benchmark"""
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "environment": environment,
+        "benchmarks": {result.name: result.as_dict() for result in results},
+    }
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(report, fp, indent=2, ensure_ascii=False)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+@dataclass
+class Comparison:
+    """Variação de um benchmark entre baseline e execução atual"""
+
+    name: str
+    baseline_ms: Optional[float]
+    current_ms: Optional[float]
+    status: str  # regression, improvement, unchanged, new, missing
+
+    @property
+    def change(self) -> Optional[float]:
+        if not self.baseline_ms or self.current_ms is None:
+            return None
+        return self.current_ms / self.baseline_ms - 1
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    metric: str = "median_ms",
+) -> List[Comparison]:
+    """
+    Compara a métrica (mediana por padrão) de cada benchmark. Regressão =
+    piora acima de `threshold` e acima do piso de ruído em valor absoluto.
+    """
+    before = baseline.get("benchmarks", {})
+    after = current.get("benchmarks", {})
+    comparisons = []
+
+    for name in sorted(set(before) | set(after)):
+        old = before.get(name, {}).get(metric)
+        new = after.get(name, {}).get(metric)
+        if old is None:
+            status = "new"
+        elif new is None:
+            status = "missing"
+        else:
+            delta = new - old
+            if abs(delta) < NOISE_FLOOR_MS or abs(delta) <= threshold * old:
+                status = "unchanged"
+            else:
+                status = "regression" if delta > 0 else "improvement"
+        comparisons.append(Comparison(name=name, baseline_ms=old, current_ms=new, status=status))
+
+    return comparisons
@@ -0,0 +1,416 @@
+"""
+Microbenchmarks: cache Redis, decorator @cached, rate limiter, JWT,
+serialização pydantic das listas de visitas (response_model x caminho rápido
+de app/core/serialization.py), decisões da matriz de acesso,
+decodificação/validação de lotes de eventos de dispositivos e tempo de worker
+por download de upload (StaticFiles x entrega em blocos x X-Accel-Redirect).
+
+Rodam contra o Redis de settings.REDIS_URL ou um fakeredis (--fakeredis);
+não usam o banco.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.staticfiles import StaticFiles
+
+from app.core.cache_decorator import cached
+from app.core.security import create_access_token, verify_access_token
+from app.core.serialization import FastJSONResponse, RowEncoder, paginated
+from app.middleware.rate_limit import memory_rate_limiter, redis_rate_limiter
+from app.schemas.portaria import VisitaListResponse, VisitaResponse
+from app.services.access_engine import CompiledGroup, CompiledPreAuth, PointRule, TenantAccessMatrix, schedule_bits
+from app.services.cache import cache, cache_key
+from app.services.event_ingest import Dispositivo, normalize_event, parse_events
+from app.services.file_delivery import FileDelivery
+from benchmarks.harness import benchmark, connect_redis
+
+SUITE = "micro"
+
+# Tamanho de página padrão e máximo de GET /portaria/visitas
+VISITAS_PAGE = 50
+VISITAS_PAGE_MAX = 200
+
+# Lote típico de POST /portaria/eventos
+EVENTOS_LOTE = 500
+
+# PDF típico de /uploads/documentos
+ARQUIVO_BYTES = 2 * 1024 * 1024
+ARQUIVO_NOME = "documentos/3f2b8c1e-7d4a-4e5b-9c6d-0a1b2c3d4e5f.pdf"
+
+_visita_list = TypeAdapter(List[VisitaResponse])
+_visita_page_field = create_model_field(name="Response_listar_visitas", type_=VisitaListResponse, mode="serialization")
+_visita_encoder = RowEncoder(VisitaResponse)
+_counter = itertools.count()
+
+
+def access_matrix(blocos: int = 20, pontos: int = 40, moradores: int = 2000) -> TenantAccessMatrix:
+    """Condomínio sintético: um grupo de moradores por bloco, grupos de serviço e 500 QR Codes"""
+    comercial = schedule_bits(time(8), time(18), [1, 2, 3, 4, 5])
+    nomes = [chr(ord("A") + i) for i in range(blocos)]
+    grupos = [
+        CompiledGroup(
+            id=i + 1,
+            tipos=frozenset({"morador", "visitante"}),
+            blocos=frozenset({bloco}),
+            pontos={p: PointRule(entrada=schedule_bits(), saida=schedule_bits()) for p in range(i % 4, pontos, 4)},
+        )
+        for i, bloco in enumerate(nomes)
+    ]
+    grupos.append(
+        CompiledGroup(
+            id=100,
+            tipos=frozenset({"prestador", "entregador"}),
+            blocos=None,
+            pontos={p: PointRule(entrada=comercial, saida=comercial) for p in range(0, pontos, 2)},
+        )
+    )
+    hoje = date.today()
+    pre_autorizacoes = [
+        CompiledPreAuth(
+            id=i,
+            qr_code=f"QR{i:06d}",
+            data_inicio=hoje,
+            data_fim=hoje + timedelta(days=7),
+            bits=schedule_bits(),
+            grupo_id=1 + i % blocos,
+            usos_restantes=1,
+        )
+        for i in range(500)
+    ]
+    return TenantAccessMatrix(
+        1,
+        pontos=range(pontos),
+        grupos=grupos,
+        residentes={user_id: frozenset({nomes[user_id % blocos]}) for user_id in range(moradores)},
+        pre_autorizacoes=pre_autorizacoes,
+    )
+
+
+def device_events_ndjson(count: int) -> bytes:
+    """Lote NDJSON no formato enviado pelas controladoras"""
+    inicio = datetime(2025, 3, 14, 7, 0)
+    return b"\n".join(
+        json.dumps(
+            {
+                "id": f"ev-{i}",
+                "ts": (inicio + timedelta(seconds=i)).isoformat(),
+                "tipo": "entrada" if i % 2 else "saida",
+                "metodo": "tag",
+                "user_id": 900 + i % 200,
+                "unit_id": 300 + i % 20,
+                "serial": f"TAG{i:06d}",
+            }
+        ).encode()
+        for i in range(count)
+    )
+
+
+def visita_rows(count: int) -> List[Dict[str, Any]]:
+    """Linhas no formato retornado pela query de GET /portaria/visitas"""
+    entrada = datetime(2025, 3, 14, 9, 30)
+    return [
+        {
+            "id": 100_000 + i,
+            "tenant_id": 1,
+            "visitor_id": 5_000 + i % 40,
+            "visitante_nome": f"Visitante Benchmark {i}",
+            "visitante_documento": f"123.456.{i % 1000:03d}-00",
+            "visitante_telefone": "(11) 98888-7777",
+            "unit_id": 300 + i % 20,
+            "tipo": "visita",
+            "status": "finalizada",
+            "data_entrada": entrada + timedelta(minutes=7 * i),
+            "data_saida": entrada + timedelta(minutes=7 * i + 80),
+            "morador_id": 900 + i % 20,
+            "porteiro_entrada_id": 12,
+            "porteiro_saida_id": 12,
+            "metodo_autorizacao": "interfone",
+            "autorizado_por": "Morador Benchmark",
+            "visitante_foto_url": None,
+            "pre_autorizacao_id": None,
+            "ponto_entrada_id": 4,
+            "ponto_saida_id": 4,
+            "veiculo_placa": "ABC1D23" if i % 3 == 0 else None,
+            "veiculo_modelo": "Onix" if i % 3 == 0 else None,
+            "observacoes": None,
+            "motivo_negacao": None,
+            "created_at": entrada + timedelta(minutes=7 * i),
+            "updated_at": entrada + timedelta(minutes=7 * i + 80),
+            "unit_number": str(101 + i % 20),
+            "unit_block": "A",
+            "morador_nome": "Morador Benchmark",
+            "porteiro_entrada_nome": "Porteiro Benchmark",
+        }
+        for i in range(count)
+    ]
+
+
+@cached("bench", ttl=300, key_params=["page"])
+async def _cached_endpoint(current_user=None, page: int = 1):
+    return {"page": page, "items": [{"id": i, "status": "ok"} for i in range(20)]}
+
+
+def upload_request(headers: Dict[str, str], method: str = "GET") -> Dict[str, Any]:
+    """Escopo ASGI de GET /uploads/<ARQUIVO_NOME>"""
+    return {
+        "type": "http",
+        "method": method,
+        "path": "/" + ARQUIVO_NOME,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+
+
+async def _receive() -> Dict[str, Any]:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _discard(message: Dict[str, Any]) -> None:
+    pass
+
+
+async def deliver(ctx: Dict[str, Any], headers: Dict[str, str]) -> None:
+    """Um download pelo caminho de app/api/v1/arquivos.py, com o corpo descartado"""
+    scope = upload_request(headers)
+    delivery = ctx["file_delivery"]
+    arquivo = delivery.resolve(ARQUIVO_NOME)
+    response = delivery.respond(Request(scope), arquivo)
+    await response(scope, _receive, _discard)
+
+
+async def setup(fake_redis: bool = False) -> Dict[str, Any]:
+    backend = await connect_redis(fake=fake_redis)
+    rows = visita_rows(VISITAS_PAGE)
+    models = _visita_list.validate_python(rows)
+    payload = _visita_list.dump_python(models, mode="json")
+
+    await cache.set(cache_key("bench", "hit"), {"id": 1, "name": "Condomínio Benchmark", "active": True}, ttl=600)
+    await cache.set(cache_key("bench", "visitas"), payload, ttl=600)
+    user = SimpleNamespace(id=12, tenant_id=1)
+    await _cached_endpoint(current_user=user, page=1)
+
+    uploads_dir = tempfile.mkdtemp(prefix="bench-uploads-")
+    os.makedirs(os.path.join(uploads_dir, "documentos"))
+    with open(os.path.join(uploads_dir, ARQUIVO_NOME), "wb") as fp:
+        fp.write(os.urandom(ARQUIVO_BYTES))
+    delivery = FileDelivery(base_dir=uploads_dir)
+    etag = delivery.resolve(ARQUIVO_NOME).etag
+
+    return {
+        "redis_backend": backend,
+        "user": user,
+        "rows": rows,
+        "rows_max": visita_rows(VISITAS_PAGE_MAX),
+        "models": models,
+        "token": create_access_token({"sub": "12", "tenant_id": 1, "role": 3}),
+        "access_matrix": access_matrix(),
+        "eventos": device_events_ndjson(EVENTOS_LOTE),
+        "dispositivo": Dispositivo(ponto_id=4, tenant_id=1, nome="Portaria Principal"),
+        "now": datetime.now().replace(hour=10),
+        "uploads_dir": uploads_dir,
+        "file_delivery": delivery,
+        "static_files": StaticFiles(directory=uploads_dir),
+        "etag": etag,
+    }
+
+
+async def teardown(ctx: Dict[str, Any]) -> None:
+    await cache.delete_pattern(cache_key("bench", "*"))
+    await cache.delete_pattern("rate:bench:*")
+    await cache.disconnect()
+    shutil.rmtree(ctx["uploads_dir"], ignore_errors=True)
+
+
+# ==================== CACHE ====================
+
+
+@benchmark("cache.get_hit", suite=SUITE, iterations=3000)
+async def cache_get_hit(ctx):
+    """RedisCache.get de um dict pequeno existente"""
+    await cache.get(cache_key("bench", "hit"))
+
+
+@benchmark("cache.get_miss", suite=SUITE, iterations=3000)
+async def cache_get_miss(ctx):
+    """RedisCache.get de chave inexistente"""
+    await cache.get(cache_key("bench", "miss"))
+
+
+@benchmark("cache.get_visitas_page", suite=SUITE, iterations=1000)
+async def cache_get_visitas_page(ctx):
+    """RedisCache.get de uma página de 50 visitas (JSON ~30 KB)"""
+    await cache.get(cache_key("bench", "visitas"))
+
+
+@benchmark("cache.set", suite=SUITE, iterations=3000)
+async def cache_set(ctx):
+    """RedisCache.set de um dict pequeno com TTL"""
+    await cache.set(cache_key("bench", "set"), {"id": 1, "status": "ok"}, ttl=60)
+
+
+# ==================== @cached ====================
+
+
+@benchmark("cached.hit", suite=SUITE, iterations=3000)
+async def cached_hit(ctx):
+    """Endpoint com @cached servido do cache (monta a chave + get)"""
+    await _cached_endpoint(current_user=ctx["user"], page=1)
+
+
+@benchmark("cached.miss", suite=SUITE, iterations=1000)
+async def cached_miss(ctx):
+    """Endpoint com @cached sem cache (get + função + set)"""
+    await _cached_endpoint(current_user=ctx["user"], page=next(_counter) + 2)
+
+
+# ==================== RATE LIMIT ====================
+
+
+@benchmark("rate_limit.redis", suite=SUITE, iterations=2000)
+async def rate_limit_redis(ctx):
+    """RedisRateLimiter.is_allowed (pipeline sliding window)"""
+    await redis_rate_limiter.is_allowed("rate:bench:redis", 10**9, 60)
+
+
+@benchmark("rate_limit.memory", suite=SUITE, iterations=2000)
+async def rate_limit_memory(ctx):
+    """InMemoryRateLimiter.is_allowed com a janela enchendo"""
+    await memory_rate_limiter.is_allowed("rate:bench:memory", 10**9, 60)
+
+
+# ==================== JWT ====================
+
+
+@benchmark("jwt.verify_access_token", suite=SUITE, iterations=3000)
+def jwt_verify(ctx):
+    """Decodificação e validação do access token (feita a cada request autenticado)"""
+    verify_access_token(ctx["token"])
+
+
+@benchmark("jwt.create_access_token", suite=SUITE, iterations=3000)
+def jwt_create(ctx):
+    """Emissão de access token (login e refresh)"""
+    create_access_token({"sub": "12", "tenant_id": 1, "role": 3})
+
+
+# ==================== PYDANTIC ====================
+
+
+@benchmark("pydantic.visitas_validate", suite=SUITE, iterations=500)
+def visitas_validate(ctx):
+    """Validação de 50 linhas em List[VisitaResponse]"""
+    _visita_list.validate_python(ctx["rows"])
+
+
+@benchmark("pydantic.visitas_dump_json", suite=SUITE, iterations=500)
+def visitas_dump_json(ctx):
+    """Serialização de 50 VisitaResponse para JSON (pydantic-core)"""
+    _visita_list.dump_json(ctx["models"])
+
+
+@benchmark("pydantic.visitas_model_dump_json_dumps", suite=SUITE, iterations=500)
+def visitas_model_dump(ctx):
+    """model_dump(mode="json") + json.dumps por item, como no caminho do @cached"""
+    json.dumps([model.model_dump(mode="json") for model in ctx["models"]])
+
+
+@benchmark("serialization.visitas_page_response_model", suite=SUITE, iterations=200)
+async def visitas_page_response_model(ctx):
+    """Caminho anterior de GET /portaria/visitas (200 linhas): VisitaResponse por linha + response_model + JSONResponse"""
+    rows = ctx["rows_max"]
+    items = [VisitaResponse(**row) for row in rows]
+    page = VisitaListResponse(
+        items=items, total=1000, page=1, page_size=200, total_pages=5, has_next=True, has_prev=False
+    )
+    content = await serialize_response(field=_visita_page_field, response_content=page)
+    JSONResponse(content)
+
+
+@benchmark("serialization.visitas_page_fast", suite=SUITE, iterations=200)
+def visitas_page_fast(ctx):
+    """Caminho rápido (200 linhas): RowEncoder + FastJSONResponse (orjson), sem modelos nem response_model"""
+    FastJSONResponse(paginated(_visita_encoder.encode_many(ctx["rows_max"]), total=1000, skip=0, limit=200))
+
+
+# ==================== ACESSO ====================
+
+
+@benchmark("access.decide_user", suite=SUITE, iterations=20000)
+def access_decide_user(ctx):
+    """Morador abrindo um ponto (POST /pontos-acesso/{id}/abrir e /decidir)"""
+    ctx["access_matrix"].decide_user(next(_counter) % 2000, 4, ctx["now"])
+
+
+@benchmark("access.decide_tipo", suite=SUITE, iterations=20000)
+def access_decide_tipo(ctx):
+    """Prestador ou entregador por tipo de pessoa e bloco"""
+    ctx["access_matrix"].decide_tipo("entregador", "C", 2, ctx["now"], "saida")
+
+
+@benchmark("access.decide_qr_code", suite=SUITE, iterations=20000)
+def access_decide_qr_code(ctx):
+    """QR Code de pré-autorização cruzado com o grupo vinculado"""
+    ctx["access_matrix"].decide_pre_autorizacao(f"QR{next(_counter) % 500:06d}", 4, ctx["now"])
+
+
+@benchmark("access.compile", suite=SUITE, iterations=50)
+def access_compile(ctx):
+    """Recompilação da matriz (alteração de um grupo)"""
+    ctx["access_matrix"].compile()
+
+
+# ==================== INGESTÃO DE EVENTOS ====================
+
+
+@benchmark("ingest.parse_normalize_ndjson", suite=SUITE, iterations=200)
+def ingest_parse_normalize(ctx):
+    """Decodificação e validação de um lote NDJSON de 500 eventos (CPU por requisição de ingestão)"""
+    now = datetime.now()
+    for event in parse_events(ctx["eventos"], "application/x-ndjson"):
+        normalize_event(event, ctx["dispositivo"], now)
+
+
+# ==================== ENTREGA DE ARQUIVOS ====================
+
+
+@benchmark("files.staticfiles_2mb", suite=SUITE, iterations=200)
+async def files_staticfiles(ctx):
+    """Download de 2 MiB pelo StaticFiles montado em /uploads (caminho anterior: corpo em blocos de 64 KiB)"""
+    await ctx["static_files"](upload_request({}), _receive, _discard)
+
+
+@benchmark("files.direct_2mb", suite=SUITE, iterations=200)
+async def files_direct(ctx):
+    """Download de 2 MiB no modo direct (sem nginx): os.pread em blocos de FILE_CHUNK_BYTES"""
+    await deliver(ctx, {})
+
+
+@benchmark("files.direct_range_256k", suite=SUITE, iterations=500)
+async def files_direct_range(ctx):
+    """Range de 256 KiB no modo direct (player de vídeo, retomada de download)"""
+    await deliver(ctx, {"Range": "bytes=524288-786431"})
+
+
+@benchmark("files.accel_redirect", suite=SUITE, iterations=2000)
+async def files_accel(ctx):
+    """Mesmo download atrás do nginx: worker só resolve, autoriza e responde X-Accel-Redirect"""
+    await deliver(ctx, {"X-File-Delivery": "accel"})
+
+
+@benchmark("files.not_modified", suite=SUITE, iterations=2000)
+async def files_not_modified(ctx):
+    """Revalidação com If-None-Match (304 sem corpo, em qualquer modo)"""
+    await deliver(ctx, {"If-None-Match": ctx["etag"]})
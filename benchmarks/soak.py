@@ -0,0 +1,345 @@
+"""
+Soak test de memória: a API rodando de verdade (uvicorn/gunicorn), sob carga
+contínua por uma hora ou mais, com a memória do worker amostrada em
+/admin/memory. Os endpoints da suíte "endpoints" se revezam em fatias de
+--slice segundos; o crescimento de RSS de cada fatia é atribuído ao endpoint
+que estava rodando, e as voltas repetidas ao longo da execução separam
+vazamento (cresce toda volta) de aquecimento (cresce só na primeira).
+
+    python -m benchmarks soak --url http://localhost:8100 --duration 3600
+    python -m benchmarks soak --duration 600 --slice 20 --tracemalloc   # + top alocações no fim
+
+Requisitos:
+- servidor com UM worker (os números são por processo) e RATE_LIMIT_ENABLED=false
+  ou um limite alto;
+- mesmo banco (dataset de scripts/generate_dataset.py) e mesma SECRET_KEY do
+  servidor: os tokens são emitidos aqui, como nos benchmarks de endpoint;
+- um usuário super admin no banco (scripts/seed_data.py cria um) para ler
+  /admin/memory.
+
+Saída: JSON com as amostras e o resumo por endpoint, e um HTML com o gráfico
+de RSS ao longo do tempo (fundo colorido pelo endpoint da fatia).
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.database import close_db_connections, get_db_context
+from benchmarks.harness import REGISTRY
+
+MB = 1024 * 1024
+
+PALETTE = ("#4e79a7", "#f28e2b", "#59a14f", "#e15759", "#76b7b2", "#edc948", "#b07aa1", "#ff9da7", "#9c755f")
+
+
+@dataclass
+class Sample:
+    """Memória do worker num instante"""
+
+    t: float  # segundos desde o início
+    pid: int
+    rss_bytes: int
+    allocated_blocks: int
+    traced_bytes: int
+    endpoint: str
+
+
+@dataclass
+class Slice:
+    """Uma fatia de carga de um endpoint"""
+
+    endpoint: str
+    cycle: int
+    started: float
+    ended: float
+    requests: int
+    errors: int
+    rss_start: int
+    rss_end: int
+    blocks_start: int
+    blocks_end: int
+
+
+def endpoint_benchmarks(pattern: Optional[str] = None) -> List[Tuple[str, Callable]]:
+    """Endpoints da suíte de benchmarks (mesmas requisições, agora contra o servidor)"""
+    import benchmarks.endpoints  # noqa: F401  (registra os benchmarks)
+
+    return [
+        (name, bench.func)
+        for name, bench in REGISTRY.items()
+        if bench.suite == "endpoints" and (not pattern or pattern in name)
+    ]
+
+
+def linear_slope(points: List[Tuple[float, float]]) -> float:
+    """Inclinação por mínimos quadrados (unidade de y por unidade de x)"""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def summarize(samples: List[Sample], slices: List[Slice], warmup_cycles: int = 1) -> Dict[str, Any]:
+    """Crescimento por endpoint (sem as voltas de aquecimento) e tendência geral"""
+    measured = [item for item in slices if item.cycle >= warmup_cycles]
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    for item in measured:
+        entry = endpoints.setdefault(
+            item.endpoint,
+            {"slices": 0, "requests": 0, "errors": 0, "rss_growth_bytes": 0, "blocks_growth": 0, "per_cycle": []},
+        )
+        growth = item.rss_end - item.rss_start
+        entry["slices"] += 1
+        entry["requests"] += item.requests
+        entry["errors"] += item.errors
+        entry["rss_growth_bytes"] += growth
+        entry["blocks_growth"] += item.blocks_end - item.blocks_start
+        entry["per_cycle"].append(growth)
+    for entry in endpoints.values():
+        entry["bytes_per_request"] = round(entry["rss_growth_bytes"] / entry["requests"], 1) if entry["requests"] else 0
+        # Vazamento cresce em quase toda volta; aquecimento/fragmentação oscila
+        entry["cycles_growing"] = sum(1 for growth in entry["per_cycle"] if growth > 0)
+
+    start = measured[0].started if measured else 0.0
+    points = [(sample.t, sample.rss_bytes) for sample in samples if sample.t >= start]
+    return {
+        "pids": sorted({sample.pid for sample in samples}),
+        "rss_first_bytes": points[0][1] if points else 0,
+        "rss_last_bytes": points[-1][1] if points else 0,
+        "rss_slope_bytes_per_hour": round(linear_slope(points) * 3600),
+        "endpoints": dict(sorted(endpoints.items(), key=lambda kv: -kv[1]["rss_growth_bytes"])),
+    }
+
+
+def render_html(report: Dict[str, Any]) -> str:
+    """Gráfico SVG de RSS no tempo (fundo pelo endpoint da fatia) + tabela por endpoint"""
+    samples = [Sample(**sample) for sample in report["samples"]]
+    slices = [Slice(**item) for item in report["slices"]]
+    summary = report["summary"]
+    width, height, pad = 1100, 380, 50
+    if not samples:
+        return "<html><body><p>Sem amostras</p></body></html>"
+
+    t_max = max(max(sample.t for sample in samples), 1.0)
+    low = min(sample.rss_bytes for sample in samples) / MB
+    high = max(sample.rss_bytes for sample in samples) / MB
+    low, high = low - 1, high + 1
+
+    def x(t: float) -> float:
+        return pad + (width - 2 * pad) * t / t_max
+
+    def y(mb: float) -> float:
+        return height - pad - (height - 2 * pad) * (mb - low) / (high - low)
+
+    names = sorted({item.endpoint for item in slices})
+    colors = {name: PALETTE[index % len(PALETTE)] for index, name in enumerate(names)}
+    parts = [f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg" font-size="11">']
+    for item in slices:
+        parts.append(
+            f'<rect x="{x(item.started):.1f}" y="{pad}" width="{max(x(item.ended) - x(item.started), 0.5):.1f}" '
+            f'height="{height - 2 * pad}" fill="{colors[item.endpoint]}" opacity="0.18"/>'
+        )
+    points = " ".join(f"{x(sample.t):.1f},{y(sample.rss_bytes / MB):.1f}" for sample in samples)
+    parts.append(f'<polyline points="{points}" fill="none" stroke="#222" stroke-width="1.5"/>')
+    for step in range(5):
+        mb = low + (high - low) * step / 4
+        parts.append(f'<text x="4" y="{y(mb) + 4:.1f}">{mb:.0f} MB</text>')
+    for step in range(6):
+        t = t_max * step / 5
+        parts.append(f'<text x="{x(t) - 12:.1f}" y="{height - pad + 16}">{t / 60:.0f} min</text>')
+    for index, name in enumerate(names):
+        parts.append(
+            f'<rect x="{pad + index * 150}" y="10" width="10" height="10" fill="{colors[name]}"/>'
+            f'<text x="{pad + index * 150 + 14}" y="19">{name}</text>'
+        )
+    parts.append("</svg>")
+
+    rows = "".join(
+        f"<tr><td>{name}</td><td>{entry['requests']:,}</td><td>{entry['errors']:,}</td>"
+        f"<td>{entry['rss_growth_bytes'] / MB:+.2f}</td><td>{entry['bytes_per_request']:+.1f}</td>"
+        f"<td>{entry['cycles_growing']}/{entry['slices']}</td><td>{entry['blocks_growth']:+,}</td></tr>"
+        for name, entry in summary["endpoints"].items()
+    )
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'><title>Soak test - memória</title>"
+        "<style>body{font-family:sans-serif}td,th{padding:4px 10px;text-align:right}"
+        "td:first-child,th:first-child{text-align:left}</style></head><body>"
+        f"<h2>Soak test ({report['duration_s'] / 60:.0f} min, {report['concurrency']} conexões, "
+        f"fatias de {report['slice_s']:.0f}s)</h2>"
+        f"<p>RSS {summary['rss_first_bytes'] / MB:.1f} → {summary['rss_last_bytes'] / MB:.1f} MB, "
+        f"tendência {summary['rss_slope_bytes_per_hour'] / MB:+.2f} MB/h (sem as voltas de aquecimento). "
+        f"Workers: {', '.join(map(str, summary['pids']))}</p>"
+        + "".join(parts)
+        + "<table><tr><th>endpoint</th><th>requisições</th><th>erros</th><th>Δ RSS (MB)</th>"
+        "<th>bytes/req</th><th>voltas crescendo</th><th>Δ blocos</th></tr>" + rows + "</table></body></html>"
+    )
+
+
+async def _fixture() -> Dict[str, Any]:
+    """Condomínio/porteiro da suíte de endpoints + um super admin para ler /admin/memory"""
+    from benchmarks.endpoints import _fixture as endpoints_fixture
+
+    async with get_db_context() as db:
+        fixture = await endpoints_fixture(db)
+        admin = (
+            await db.execute(text("SELECT id, tenant_id FROM users WHERE role >= 5 AND is_active ORDER BY id LIMIT 1"))
+        ).fetchone()
+    await close_db_connections()
+    if admin is None:
+        raise RuntimeError("Nenhum super admin no banco (role 5): necessário para ler /admin/memory")
+    fixture["admin_id"], fixture["admin_tenant_id"] = admin.id, admin.tenant_id
+    return fixture
+
+
+class SoakRunner:
+    """Revezamento das fatias de carga e amostragem da memória"""
+
+    def __init__(
+        self,
+        url: str,
+        duration: float,
+        slice_seconds: float = 30,
+        concurrency: int = 8,
+        sample_interval: float = 2,
+        warmup_cycles: int = 1,
+        pattern: Optional[str] = None,
+        use_tracemalloc: bool = False,
+    ):
+        self.url = url
+        self.duration = duration
+        self.slice_seconds = slice_seconds
+        self.concurrency = concurrency
+        self.sample_interval = sample_interval
+        self.warmup_cycles = warmup_cycles
+        self.endpoints = endpoint_benchmarks(pattern)
+        self.use_tracemalloc = use_tracemalloc
+        self.samples: List[Sample] = []
+        self.slices: List[Slice] = []
+        self._current = ""
+        self._start = 0.0
+
+    async def _memory(self, admin: httpx.AsyncClient) -> Dict[str, Any]:
+        response = await admin.get("/api/v1/admin/memory")
+        response.raise_for_status()
+        return response.json()
+
+    async def _sampler(self, admin: httpx.AsyncClient) -> None:
+        while True:
+            stats = await self._memory(admin)
+            self.samples.append(
+                Sample(
+                    t=round(time.monotonic() - self._start, 2),
+                    pid=stats["pid"],
+                    rss_bytes=stats["rss_bytes"],
+                    allocated_blocks=stats["python_allocated_blocks"],
+                    traced_bytes=stats["tracemalloc"]["traced_bytes"],
+                    endpoint=self._current,
+                )
+            )
+            await asyncio.sleep(self.sample_interval)
+
+    async def _load(self, ctx: Dict[str, Any], func: Callable, until: float, counters: Dict[str, int]) -> None:
+        while time.monotonic() < until:
+            try:
+                await func(ctx)
+                counters["requests"] += 1
+            except Exception:
+                counters["errors"] += 1
+
+    async def run(self, fixture: Dict[str, Any], on_slice: Optional[Callable[[Slice], None]] = None) -> Dict[str, Any]:
+        token = create_access_token({"sub": str(fixture["user_id"]), "tenant_id": fixture["tenant_id"], "role": 3})
+        admin_token = create_access_token(
+            {"sub": str(fixture["admin_id"]), "tenant_id": fixture["admin_tenant_id"], "role": 5}
+        )
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        client = httpx.AsyncClient(
+            base_url=self.url, headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=60
+        )
+        admin = httpx.AsyncClient(base_url=self.url, headers={"Authorization": f"Bearer {admin_token}"}, timeout=60)
+        ctx = {"client": client, **fixture}
+        tracemalloc_top = None
+
+        try:
+            if self.use_tracemalloc:
+                (await admin.post("/api/v1/admin/memory/tracemalloc")).raise_for_status()
+            self._start = time.monotonic()
+            sampler = asyncio.create_task(self._sampler(admin))
+            base_snapshot = None
+            cycle = 0
+            while time.monotonic() - self._start < self.duration:
+                for name, func in self.endpoints:
+                    if time.monotonic() - self._start >= self.duration:
+                        break
+                    if self.use_tracemalloc and cycle == self.warmup_cycles and base_snapshot is None:
+                        base_snapshot = (await admin.post("/api/v1/admin/memory/snapshots")).json()["id"]
+                    self._current = name
+                    before = await self._memory(admin)
+                    started = time.monotonic() - self._start
+                    counters = {"requests": 0, "errors": 0}
+                    until = time.monotonic() + self.slice_seconds
+                    await asyncio.gather(*(self._load(ctx, func, until, counters) for _ in range(self.concurrency)))
+                    after = await self._memory(admin)
+                    item = Slice(
+                        endpoint=name,
+                        cycle=cycle,
+                        started=round(started, 2),
+                        ended=round(time.monotonic() - self._start, 2),
+                        requests=counters["requests"],
+                        errors=counters["errors"],
+                        rss_start=before["rss_bytes"],
+                        rss_end=after["rss_bytes"],
+                        blocks_start=before["python_allocated_blocks"],
+                        blocks_end=after["python_allocated_blocks"],
+                    )
+                    self.slices.append(item)
+                    if on_slice:
+                        on_slice(item)
+                cycle += 1
+            sampler.cancel()
+
+            if base_snapshot:
+                response = await admin.get(f"/api/v1/admin/memory/snapshots/{base_snapshot}/diff", params={"limit": 30})
+                tracemalloc_top = response.json() if response.status_code == 200 else {"error": response.text}
+        finally:
+            if self.use_tracemalloc:
+                await admin.delete("/api/v1/admin/memory/tracemalloc")
+            await client.aclose()
+            await admin.aclose()
+
+        return {
+            "url": self.url,
+            "duration_s": round(time.monotonic() - self._start, 1),
+            "slice_s": self.slice_seconds,
+            "concurrency": self.concurrency,
+            "warmup_cycles": self.warmup_cycles,
+            "summary": summarize(self.samples, self.slices, self.warmup_cycles),
+            "tracemalloc": tracemalloc_top,
+            "samples": [asdict(sample) for sample in self.samples],
+            "slices": [asdict(item) for item in self.slices],
+        }
+
+
+def save(report: Dict[str, Any], output: str) -> Tuple[str, str]:
+    """Grava <output>.json e <output>.html"""
+    base = output[:-5] if output.endswith(".json") else output
+    directory = os.path.dirname(base)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(base + ".json", "w", encoding="utf-8") as fp:
+        json.dump(report, fp, indent=2)
+    with open(base + ".html", "w", encoding="utf-8") as fp:
+        fp.write(render_html(report))
+    return base + ".json", base + ".html"
@@ -15,8 +15,10 @@ backlog = 2048
 workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
-max_requests = 10000  # Reinicia worker apos N requests (previne memory leaks)
-max_requests_jitter = 1000  # Adiciona variacao para evitar restart simultaneo
+# Reinicia worker apos N requests (contencao de memory leaks; 0 = nunca). Cada reciclagem esfria os
+# caches em memoria: medir com `python -m benchmarks soak` e /admin/memory antes de reduzir/desligar
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))  # Variacao para evitar restart simultaneo
 
 # Timeouts
 timeout = 120  # Segundos para processar request
@@ -0,0 +1,168 @@
+"""Particionamento mensal de access_logs e audit_logs
+
+Converte as tabelas de log append-only em tabelas particionadas por RANGE
+mensal na coluna de tempo, copiando os dados existentes. Cria partições do
+primeiro mês com dados até 3 meses à frente, uma partição DEFAULT e índices
+BRIN na coluna de tempo. Novas partições são criadas pelo PartitionManager
+(app/services/partitioning.py).
+
+A cópia reescreve as tabelas inteiras: execute em janela de manutenção.
+
+Revision ID: 003_partition_logs
+Revises: 002_portaria
+Create Date: 2026-01-12
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003_partition_logs'
+down_revision = '002_portaria'
+branch_labels = None
+depends_on = None
+
+
+# Tabela -> coluna de tempo (chave de partição)
+PARTITIONED_TABLES = {
+    'access_logs': 'registered_at',
+    'audit_logs': 'created_at',
+}
+
+# Índices B-tree recriados no pai particionado (o PK e o BRIN são tratados à parte)
+INDEXES = {
+    'access_logs': [
+        ('ix_access_logs_tenant_id', ['tenant_id']),
+        ('ix_access_logs_tenant_date', ['tenant_id', 'registered_at']),
+        ('ix_access_logs_user_id', ['user_id']),
+        ('ix_access_logs_visitor_id', ['visitor_id']),
+        ('ix_access_logs_unit_id', ['unit_id']),
+    ],
+    'audit_logs': [
+        ('ix_audit_logs_tenant_id', ['tenant_id']),
+        ('ix_audit_logs_tenant_date', ['tenant_id', 'created_at']),
+    ],
+}
+
+PREMAKE_MONTHS = 3
+
+
+def _convert_to_partitioned(table: str, column: str) -> None:
+    legacy = f'{table}_legacy'
+
+    # Índices e constraints do legado mantêm os nomes; renomear evita colisão
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+    op.execute(f"""
+        DO $$
+        DECLARE idx record;
+        BEGIN
+            FOR idx IN
+                SELECT indexname FROM pg_indexes
+                WHERE tablename = '{legacy}' AND indexname <> '{legacy}_pkey'
+            LOOP
+                EXECUTE format('ALTER INDEX %I RENAME TO %I', idx.indexname, idx.indexname || '_legacy');
+            END LOOP;
+        END $$;
+    """)
+    # A sequence do id passa a pertencer ao novo pai (senão cai junto com o legado)
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+
+    op.execute(f"""
+        CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE ({column})
+    """)
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column})')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+    # Recria as foreign keys do legado no pai particionado
+    op.execute(f"""
+        DO $$
+        DECLARE fk record;
+        BEGIN
+            FOR fk IN
+                SELECT conname, pg_get_constraintdef(oid) AS def
+                FROM pg_constraint
+                WHERE conrelid = '{legacy}'::regclass AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE {legacy} DROP CONSTRAINT %I', fk.conname);
+                EXECUTE format('ALTER TABLE {table} ADD CONSTRAINT %I %s', fk.conname, fk.def);
+            END LOOP;
+        END $$;
+    """)
+
+    # Partições mensais: do primeiro mês com dados até PREMAKE_MONTHS à frente
+    op.execute(f"""
+        DO $$
+        DECLARE
+            first_month date;
+            last_month date := date_trunc('month', now())::date + interval '{PREMAKE_MONTHS} months';
+            month date;
+        BEGIN
+            SELECT COALESCE(date_trunc('month', MIN({column}))::date, date_trunc('month', now())::date)
+              INTO first_month FROM {legacy};
+            month := LEAST(first_month, date_trunc('month', now())::date);
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(month, 'YYYYMM'), month, (month + interval '1 month')::date
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    op.execute(f"SELECT setval('{table}_id_seq', COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)")
+    op.execute(f'DROP TABLE {legacy}')
+
+    for name, columns in INDEXES[table]:
+        op.create_index(name, table, columns)
+    # BRIN: poucos KB por partição e eficiente para dados inseridos em ordem de tempo
+    op.execute(f'CREATE INDEX ix_{table}_{column}_brin ON {table} USING brin ({column})')
+    op.execute(f'ANALYZE {table}')
+
+
+def _convert_to_plain(table: str, column: str) -> None:
+    partitioned = f'{table}_partitioned'
+
+    op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+    op.execute(f'ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey')
+    for name, _ in INDEXES[table]:
+        op.drop_index(name, table_name=partitioned)
+    op.execute(f'DROP INDEX ix_{table}_{column}_brin')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+
+    op.execute(f'CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+    op.execute(f"""
+        DO $$
+        DECLARE fk record;
+        BEGIN
+            FOR fk IN
+                SELECT conname, pg_get_constraintdef(oid) AS def
+                FROM pg_constraint
+                WHERE conrelid = '{partitioned}'::regclass AND contype = 'f' AND conparentid = 0
+            LOOP
+                EXECUTE format('ALTER TABLE {partitioned} DROP CONSTRAINT %I', fk.conname);
+                EXECUTE format('ALTER TABLE {table} ADD CONSTRAINT %I %s', fk.conname, fk.def);
+            END LOOP;
+        END $$;
+    """)
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {partitioned}')
+    op.execute(f'DROP TABLE {partitioned}')
+
+    op.create_index(f'ix_{table}_tenant_id', table, ['tenant_id'])
+    op.create_index(f'ix_{table}_{column}', table, [column])
+
+
+def upgrade() -> None:
+    for table, column in PARTITIONED_TABLES.items():
+        _convert_to_partitioned(table, column)
+
+
+def downgrade() -> None:
+    for table, column in PARTITIONED_TABLES.items():
+        _convert_to_plain(table, column)
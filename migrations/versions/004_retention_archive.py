@@ -0,0 +1,68 @@
+"""Retenção e arquivamento frio das tabelas de log
+
+Cria retention_policies (retenção por condomínio e tabela) e archive_batches
+(manifesto dos lotes exportados para arquivos .ndjson.zst). O arquivamento
+é executado por scripts/archive_logs.py (app/services/archival.py).
+
+Revision ID: 004_retention_archive
+Revises: 003_partition_logs
+Create Date: 2026-01-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_retention_archive'
+down_revision = '003_partition_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'retention_policies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(50), nullable=False),
+        sa.Column('retention_months', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tenant_id', 'table_name', name='uq_retention_policies_tenant_table'),
+    )
+    op.create_index('ix_retention_policies_id', 'retention_policies', ['id'])
+    op.create_index('ix_retention_policies_tenant_id', 'retention_policies', ['tenant_id'])
+
+    op.create_table(
+        'archive_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('table_name', sa.String(50), nullable=False),
+        sa.Column('first_id', sa.BigInteger(), nullable=False),
+        sa.Column('last_id', sa.BigInteger(), nullable=False),
+        sa.Column('min_time', sa.DateTime(), nullable=False),
+        sa.Column('max_time', sa.DateTime(), nullable=False),
+        sa.Column('cutoff', sa.DateTime(), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('file_path', sa.String(500), nullable=False),
+        sa.Column('file_size', sa.BigInteger(), nullable=True),
+        sa.Column('checksum', sa.String(64), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='exported'),
+        sa.Column('purged_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('table_name', 'tenant_id', 'first_id', name='uq_archive_batches_table_tenant_first'),
+    )
+    op.create_index('ix_archive_batches_id', 'archive_batches', ['id'])
+    op.create_index('ix_archive_batches_tenant_id', 'archive_batches', ['tenant_id'])
+    op.create_index('ix_archive_batches_lookup', 'archive_batches', ['table_name', 'tenant_id', 'min_time'])
+
+
+def downgrade() -> None:
+    op.drop_table('archive_batches')
+    op.drop_table('retention_policies')
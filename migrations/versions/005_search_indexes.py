@@ -0,0 +1,98 @@
+"""Colunas e índices de busca para moradores, visitantes, veículos e unidades
+
+Cria as funções de normalização usadas por app/services/search.py:
+- search_normalize(text): minúsculas, sem acento
+- search_digits(text): só dígitos (CPF, telefone)
+- search_code(text): alfanumérico maiúsculo (placa, unidade)
+
+Adiciona colunas geradas (STORED) com os valores normalizados e indexa:
+- B-tree (tenant_id, coluna COLLATE "C"): prefixo LIKE 'abc%' ordenado pelo índice
+- GIN gin_trgm_ops (coluna): similaridade e substring (LIKE '%abc%')
+
+Requer a extensão pg_trgm (contrib). ADD COLUMN ... STORED reescreve as
+tabelas (lock exclusivo): execute em janela de manutenção. Os índices são
+criados CONCURRENTLY.
+
+Revision ID: 005_search_indexes
+Revises: 004_retention_archive
+Create Date: 2026-01-26
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_search_indexes'
+down_revision = '004_retention_archive'
+branch_labels = None
+depends_on = None
+
+
+ACCENTS = 'áàâãäåéèêëíìîïóòôõöúùûüçñýÁÀÂÃÄÅÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑÝ'
+PLAIN = 'aaaaaaeeeeiiiiooooouuuucnyaaaaaaeeeeiiiiooooouuuucny'
+
+FUNCTIONS = {
+    'search_normalize': f"SELECT translate(lower(value), '{ACCENTS}', '{PLAIN}')",
+    'search_digits': "SELECT regexp_replace(value, '[^0-9]', '', 'g')",
+    'search_code': "SELECT upper(regexp_replace(value, '[^A-Za-z0-9]', '', 'g'))",
+}
+
+# tabela -> [(coluna gerada, expressão, índice GIN trigram?)]
+COLUMNS = {
+    'users': [
+        ('search_name', 'search_normalize(name)', True),
+        ('search_cpf', 'search_digits(cpf)', False),
+        ('search_phone', 'search_digits(phone)', False),
+    ],
+    'visitors': [
+        ('search_name', 'search_normalize(name)', True),
+        ('search_cpf', 'search_digits(cpf)', False),
+        ('search_phone', 'search_digits(phone)', False),
+    ],
+    'vehicles': [
+        ('search_plate', 'search_code(plate)', True),
+    ],
+    'units': [
+        ('search_code', "search_code(coalesce(block, '') || number)", False),
+    ],
+}
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, body in FUNCTIONS.items():
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {name}(value text) RETURNS text
+            LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+            AS $$ {body} $$
+        """)
+
+    for table, columns in COLUMNS.items():
+        additions = ', '.join(
+            f'ADD COLUMN {column} text GENERATED ALWAYS AS ({expression}) STORED'
+            for column, expression, _ in columns
+        )
+        op.execute(f'ALTER TABLE {table} {additions}')
+
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        for table, columns in COLUMNS.items():
+            for column, _, trigram in columns:
+                op.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column} '
+                    f'ON {table} (tenant_id, {column} COLLATE "C")'
+                )
+                if trigram:
+                    op.execute(
+                        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column}_trgm '
+                        f'ON {table} USING gin ({column} gin_trgm_ops)'
+                    )
+            op.execute(f'ANALYZE {table}')
+
+
+def downgrade() -> None:
+    for table, columns in COLUMNS.items():
+        # Os índices caem junto com as colunas
+        op.execute(f"ALTER TABLE {table} {', '.join(f'DROP COLUMN {column}' for column, _, _ in columns)}")
+    for name in FUNCTIONS:
+        op.execute(f'DROP FUNCTION IF EXISTS {name}(text)')
+    # pg_trgm fica instalada: pode ser usada por outros objetos
@@ -0,0 +1,53 @@
+"""Reservas sem conflito: intervalo gerado, constraint de exclusão e índices
+
+Adiciona reservations.period (tsrange gerado a partir de date, start_time e
+end_time; fim <= início atravessa a meia-noite) e a constraint
+ex_reservations_area_period, que impede horários sobrepostos na mesma área
+para reservas não canceladas/rejeitadas (app/services/reservations.py).
+
+A constraint usa int4range(area_id, area_id, '[]') com && em vez de
+area_id WITH =, o que dispensa a extensão btree_gist.
+
+Antes de aplicar, verifique se há reservas sobrepostas (a constraint falha):
+
+    SELECT a.id, b.id FROM reservations a JOIN reservations b
+      ON a.area_id = b.area_id AND a.id < b.id AND a.date = b.date
+     AND a.start_time < b.end_time AND b.start_time < a.end_time
+     AND a.status NOT IN ('cancelled', 'rejected') AND b.status NOT IN ('cancelled', 'rejected');
+
+Revision ID: 006_reservation_conflicts
+Revises: 005_search_indexes
+Create Date: 2026-02-02
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006_reservation_conflicts'
+down_revision = '005_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+PERIOD_EXPRESSION = (
+    "tsrange(date + start_time, "
+    "CASE WHEN end_time > start_time THEN date + end_time ELSE date + 1 + end_time END)"
+)
+
+
+def upgrade() -> None:
+    op.execute(f'ALTER TABLE reservations ADD COLUMN period tsrange GENERATED ALWAYS AS ({PERIOD_EXPRESSION}) STORED')
+    op.execute("""
+        ALTER TABLE reservations ADD CONSTRAINT ex_reservations_area_period
+        EXCLUDE USING gist (int4range(area_id, area_id, '[]') WITH &&, period WITH &&)
+        WHERE (status NOT IN ('cancelled', 'rejected'))
+    """)
+    op.create_index('ix_reservations_area_date', 'reservations', ['area_id', 'date'])
+    op.create_index('ix_reservations_user_area_date', 'reservations', ['user_id', 'area_id', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_user_area_date', table_name='reservations')
+    op.drop_index('ix_reservations_area_date', table_name='reservations')
+    op.execute('ALTER TABLE reservations DROP CONSTRAINT ex_reservations_area_period')
+    op.execute('ALTER TABLE reservations DROP COLUMN period')
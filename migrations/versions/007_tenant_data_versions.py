@@ -0,0 +1,105 @@
+"""Contadores de versão por condomínio e domínio (detecção barata de mudanças)
+
+Cria tenant_data_versions (tenant_id, domain, version) e triggers por
+comando (FOR EACH STATEMENT com tabelas de transição) nas tabelas
+rastreadas: cada INSERT/UPDATE/DELETE incrementa, na mesma transação, a
+versão do domínio para cada condomínio afetado pelo comando. Um import de
+mil linhas incrementa uma vez, não mil.
+
+O mapa domínio -> tabelas espelha DATA_DOMAINS em app/services/data_versions.py;
+tabelas ausentes no banco (ex.: faq, criada fora das migrations) são puladas.
+
+Revision ID: 007_tenant_data_versions
+Revises: 006_reservation_conflicts
+Create Date: 2026-02-09
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_tenant_data_versions'
+down_revision = '006_reservation_conflicts'
+branch_labels = None
+depends_on = None
+
+
+DATA_DOMAINS = {
+    'visitas': ['visitas', 'visitors', 'pre_autorizacoes'],
+    'encomendas': ['packages'],
+    'acessos': ['access_logs', 'acessos_solicitacoes'],
+    'notificacoes': ['notifications'],
+    'reservas': ['reservations', 'common_areas'],
+    'comunicados': ['announcements'],
+    'ocorrencias': ['occurrences'],
+    'manutencao': ['maintenance_tickets'],
+    'moradores': ['users', 'units', 'dependents', 'vehicles', 'pets'],
+    'portaria': ['logbook', 'comunicacoes_portaria'],
+    'dispositivos': ['devices', 'device_requests'],
+    'classificados': ['classificados_anuncios'],
+    'achados_perdidos': ['lost_found'],
+    'pesquisas': ['surveys'],
+    'faq': ['faq'],
+}
+
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_tenant_data_version() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO tenant_data_versions (tenant_id, domain, version, updated_at)
+        SELECT DISTINCT tenant_id, TG_ARGV[0], 1, now() FROM old_rows WHERE tenant_id IS NOT NULL
+        ORDER BY tenant_id
+        ON CONFLICT (tenant_id, domain)
+        DO UPDATE SET version = tenant_data_versions.version + 1, updated_at = now();
+    ELSE
+        INSERT INTO tenant_data_versions (tenant_id, domain, version, updated_at)
+        SELECT DISTINCT tenant_id, TG_ARGV[0], 1, now() FROM new_rows WHERE tenant_id IS NOT NULL
+        ORDER BY tenant_id
+        ON CONFLICT (tenant_id, domain)
+        DO UPDATE SET version = tenant_data_versions.version + 1, updated_at = now();
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# Tabelas de transição só admitem um evento por trigger
+TRIGGERS = (
+    ('ins', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('upd', 'UPDATE', 'NEW TABLE AS new_rows'),
+    ('del', 'DELETE', 'OLD TABLE AS old_rows'),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tenant_data_versions',
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('domain', sa.String(40), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tenant_id', 'domain'),
+    )
+    op.execute(BUMP_FUNCTION)
+
+    conn = op.get_bind()
+    for domain, tables in DATA_DOMAINS.items():
+        for table in tables:
+            if conn.execute(sa.text('SELECT to_regclass(:t)'), {'t': table}).scalar() is None:
+                continue
+            for suffix, event, referencing in TRIGGERS:
+                op.execute(
+                    f'CREATE TRIGGER trg_{table}_data_version_{suffix} AFTER {event} ON {table} '
+                    f'REFERENCING {referencing} FOR EACH STATEMENT '
+                    f"EXECUTE FUNCTION bump_tenant_data_version('{domain}')"
+                )
+
+
+def downgrade() -> None:
+    for tables in DATA_DOMAINS.values():
+        for table in tables:
+            for suffix, _, _ in TRIGGERS:
+                op.execute(f'DROP TRIGGER IF EXISTS trg_{table}_data_version_{suffix} ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS bump_tenant_data_version()')
+    op.drop_table('tenant_data_versions')
@@ -0,0 +1,137 @@
+"""Journal de credenciais e estado da sincronização delta com o hardware
+
+Cria:
+- credenciais_journal: cada INSERT/UPDATE/DELETE nas tabelas de origem das
+  credenciais (moradores, faces/tags aprovadas, pré-autorizações, veículos)
+  registra, por comando, os IDs afetados;
+- integracoes_sync_estado: watermark (última posição do journal aplicada)
+  por integração e tipo de sincronização;
+- integracoes_sync_itens: hash do registro que cada integração já recebeu,
+  para enviar apenas inclusões, alterações e remoções de fato.
+
+Cada linha guarda a transação que a gerou (xid). A leitura só consome
+transações anteriores ao xmin do snapshot, em ordem (xid, id): uma transação
+longa que pegou um id menor e confirmou depois não é pulada pelo watermark.
+
+O mapa tabela -> (tipo, coluna do id) espelha JOURNAL_SOURCES em
+app/services/credential_sync.py; tabelas ausentes no banco são puladas.
+
+Revision ID: 008_credential_sync_journal
+Revises: 007_tenant_data_versions
+Create Date: 2026-02-12
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_credential_sync_journal'
+down_revision = '007_tenant_data_versions'
+branch_labels = None
+depends_on = None
+
+
+# tabela -> (tipo_sync, coluna com o id da entidade, tenant via units)
+JOURNAL_SOURCES = {
+    'users': ('moradores', 'id', False),
+    'unit_residents': ('moradores', 'user_id', True),
+    'acessos_solicitacoes': ('moradores', 'morador_id', False),
+    'pre_autorizacoes': ('visitantes', 'id', False),
+    'vehicles': ('veiculos', 'id', False),
+}
+
+JOURNAL_FUNCTION = """
+CREATE OR REPLACE FUNCTION journal_credencial() RETURNS trigger AS $$
+DECLARE
+    rows_table text := CASE WHEN TG_OP = 'DELETE' THEN 'old_rows' ELSE 'new_rows' END;
+BEGIN
+    IF TG_ARGV[2] = 'units' THEN
+        EXECUTE format(
+            'INSERT INTO credenciais_journal (tenant_id, tipo_sync, entidade_id) '
+            'SELECT DISTINCT u.tenant_id, %L, r.%I FROM %I r JOIN units u ON u.id = r.unit_id',
+            TG_ARGV[0], TG_ARGV[1], rows_table);
+    ELSE
+        EXECUTE format(
+            'INSERT INTO credenciais_journal (tenant_id, tipo_sync, entidade_id) '
+            'SELECT DISTINCT tenant_id, %L, %I FROM %I WHERE tenant_id IS NOT NULL AND %I IS NOT NULL',
+            TG_ARGV[0], TG_ARGV[1], rows_table, TG_ARGV[1]);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# Tabelas de transição só admitem um evento por trigger
+TRIGGERS = (
+    ('ins', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('upd', 'UPDATE', 'NEW TABLE AS new_rows'),
+    ('del', 'DELETE', 'OLD TABLE AS old_rows'),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'credenciais_journal',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=False),
+        sa.Column('tipo_sync', sa.String(30), nullable=False),
+        sa.Column('entidade_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'xid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False
+        ),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_credenciais_journal_tenant', 'credenciais_journal', ['tenant_id', 'tipo_sync', 'xid', 'id'])
+
+    op.create_table(
+        'integracoes_sync_estado',
+        sa.Column('integracao_id', sa.Integer(), nullable=False),
+        sa.Column('tipo_sync', sa.String(30), nullable=False),
+        sa.Column('watermark_xid', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('watermark_id', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['integracao_id'], ['integracoes_hardware.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('integracao_id', 'tipo_sync')
+    )
+
+    op.create_table(
+        'integracoes_sync_itens',
+        sa.Column('integracao_id', sa.Integer(), nullable=False),
+        sa.Column('tipo_sync', sa.String(30), nullable=False),
+        sa.Column('entidade_id', sa.Integer(), nullable=False),
+        sa.Column('hash', sa.String(32), nullable=False),
+        sa.Column('expira_em', sa.Date(), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['integracao_id'], ['integracoes_hardware.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('integracao_id', 'tipo_sync', 'entidade_id')
+    )
+    op.create_index(
+        'ix_integracoes_sync_itens_expira', 'integracoes_sync_itens', ['integracao_id', 'tipo_sync', 'expira_em']
+    )
+
+    op.execute(JOURNAL_FUNCTION)
+
+    conn = op.get_bind()
+    for table, (tipo_sync, column, via_units) in JOURNAL_SOURCES.items():
+        if conn.execute(sa.text('SELECT to_regclass(:t)'), {'t': table}).scalar() is None:
+            continue
+        args = f"'{tipo_sync}', '{column}'" + (", 'units'" if via_units else '')
+        for suffix, event, referencing in TRIGGERS:
+            op.execute(
+                f'CREATE TRIGGER trg_{table}_credencial_{suffix} AFTER {event} ON {table} '
+                f'REFERENCING {referencing} FOR EACH STATEMENT '
+                f'EXECUTE FUNCTION journal_credencial({args})'
+            )
+
+
+def downgrade() -> None:
+    for table in JOURNAL_SOURCES:
+        for suffix, _, _ in TRIGGERS:
+            op.execute(f'DROP TRIGGER IF EXISTS trg_{table}_credencial_{suffix} ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS journal_credencial()')
+    op.drop_index('ix_integracoes_sync_itens_expira', table_name='integracoes_sync_itens')
+    op.drop_table('integracoes_sync_itens')
+    op.drop_table('integracoes_sync_estado')
+    op.drop_index('ix_credenciais_journal_tenant', table_name='credenciais_journal')
+    op.drop_table('credenciais_journal')
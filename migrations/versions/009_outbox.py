@@ -0,0 +1,60 @@
+"""Outbox transacional para notificações, e-mails e webhooks
+
+Cria a tabela outbox: os endpoints gravam a mensagem na mesma transação da
+alteração de negócio e o dispatcher (app/services/outbox.py) a entrega depois,
+reivindicando lotes com FOR UPDATE SKIP LOCKED.
+
+Status: pendente -> processando -> enviado, ou de volta a pendente com
+proxima_tentativa_em no futuro (backoff), ou morta após o limite de
+tentativas (dead-letter, reprocessável manualmente).
+
+O índice parcial cobre apenas as mensagens ainda não entregues, então a busca
+do dispatcher não cresce com o histórico de enviadas.
+
+Revision ID: 009_outbox
+Revises: 008_credential_sync_journal
+Create Date: 2026-02-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '009_outbox'
+down_revision = '008_credential_sync_journal'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('tenant_id', sa.Integer(), nullable=True),
+        sa.Column('canal', sa.String(30), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pendente'),
+        sa.Column('tentativas', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('proxima_tentativa_em', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('bloqueado_ate', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column('enviado_em', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_outbox_pendentes', 'outbox', ['canal', 'proxima_tentativa_em', 'id'],
+        postgresql_where=sa.text("status IN ('pendente', 'processando')")
+    )
+    op.create_index(
+        'ix_outbox_mortas', 'outbox', ['canal', 'created_at'],
+        postgresql_where=sa.text("status = 'morta'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_mortas', table_name='outbox')
+    op.drop_index('ix_outbox_pendentes', table_name='outbox')
+    op.drop_table('outbox')
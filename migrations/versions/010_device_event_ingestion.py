@@ -0,0 +1,43 @@
+"""Ingestão de eventos de dispositivos em access_logs
+
+Adiciona a access_logs a origem dos eventos enviados pelo hardware
+(ponto_acesso_id) e o id do evento no dispositivo (device_event_id), com
+índice único parcial para idempotência: o reenvio de um lote não duplica
+registros (INSERT ... ON CONFLICT DO NOTHING em app/services/event_ingest.py).
+Em tabela particionada o índice único precisa incluir a chave de partição;
+o dispositivo reenvia o evento com o mesmo horário, então registered_at
+entra na chave sem perder a deduplicação.
+
+Adiciona também pontos_acesso.ingest_token_hash (sha256 do token que
+autentica o dispositivo na ingestão).
+
+Revision ID: 010_device_event_ingestion
+Revises: 009_outbox
+Create Date: 2026-02-23
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_device_event_ingestion'
+down_revision = '009_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('access_logs', sa.Column('ponto_acesso_id', sa.Integer(), nullable=True))
+    op.add_column('access_logs', sa.Column('device_event_id', sa.String(100), nullable=True))
+    op.create_index(
+        'ux_access_logs_device_event', 'access_logs', ['ponto_acesso_id', 'device_event_id', 'registered_at'],
+        unique=True, postgresql_where=sa.text('device_event_id IS NOT NULL')
+    )
+    op.add_column('pontos_acesso', sa.Column('ingest_token_hash', sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('pontos_acesso', 'ingest_token_hash')
+    op.drop_index('ux_access_logs_device_event', table_name='access_logs')
+    op.drop_column('access_logs', 'device_event_id')
+    op.drop_column('access_logs', 'ponto_acesso_id')
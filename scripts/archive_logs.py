@@ -0,0 +1,52 @@
+"""
+Arquivamento frio das tabelas de log (retenção por condomínio)
+Executar diariamente via cron, fora do horário de pico:
+
+    python scripts/archive_logs.py                                   # aplica as políticas
+    python scripts/archive_logs.py --tenant 1                        # apenas um condomínio
+    python scripts/archive_logs.py --set-policy 1 audit_logs 24      # define retenção de 24 meses
+    python scripts/archive_logs.py --list
+"""
+
+import argparse
+import asyncio
+
+from app.config import settings
+from app.database import get_db_context
+from app.services.archival import archival_service
+
+
+async def archive_logs(tenant_id: int, list_only: bool):
+    """Exporta e remove as linhas fora da janela de retenção"""
+    async with get_db_context() as db:
+        if not list_only:
+            archived = await archival_service.run(db, tenant_id=tenant_id)
+            print(f"✅ Arquivado em {settings.ARCHIVE_DIR}")
+            for table, count in archived.items():
+                print(f"   • {table}: {count:,} linhas")
+
+        rules = await archival_service.get_rules(db, tenant_id=tenant_id)
+        print(f"\n{len(rules)} regras de retenção ativas")
+        for rule in rules:
+            print(f"   • condomínio {rule.tenant_id} / {rule.table}: {rule.retention_months} meses")
+
+
+async def set_policy(tenant_id: int, table: str, months: int):
+    """Define a retenção de uma tabela para um condomínio (0 meses = desativa)"""
+    async with get_db_context() as db:
+        await archival_service.set_policy(db, tenant_id, table, months, is_active=months > 0)
+    print(f"✅ Política salva: condomínio {tenant_id} / {table} = {months} meses")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Arquivamento frio e retenção dos logs")
+    parser.add_argument("--tenant", type=int, default=None, help="Processa apenas este condomínio")
+    parser.add_argument("--list", action="store_true", help="Apenas lista as regras de retenção")
+    parser.add_argument("--set-policy", nargs=3, metavar=("TENANT", "TABLE", "MONTHS"))
+    args = parser.parse_args()
+
+    if args.set_policy:
+        tenant, table, months = args.set_policy
+        asyncio.run(set_policy(int(tenant), table, int(months)))
+    else:
+        asyncio.run(archive_logs(args.tenant, args.list))
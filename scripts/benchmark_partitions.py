@@ -0,0 +1,206 @@
+"""
+Benchmark: access_logs particionada x tabela comum
+
+Cria o schema `bench` com duas cópias sintéticas de access_logs (comum e
+particionada por mês), popula N linhas (padrão 50M, 36 meses, 200 tenants)
+e mede as consultas usadas pelos relatórios e pelo dashboard da portaria.
+
+    python scripts/benchmark_partitions.py --rows 50000000
+    python scripts/benchmark_partitions.py --rows 1000000 --keep   # mantém o schema
+
+Use um banco descartável: o schema `bench` é recriado a cada execução.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.services.partitioning import add_months
+
+CHUNK_ROWS = 1_000_000
+
+COLUMNS = """
+    id bigint NOT NULL,
+    tenant_id integer NOT NULL,
+    user_id integer,
+    visitor_id integer,
+    unit_id integer,
+    access_type varchar(10) NOT NULL,
+    access_method varchar(30) NOT NULL,
+    access_point varchar(100),
+    vehicle_plate varchar(10),
+    registered_at timestamp NOT NULL
+"""
+
+# Consultas no formato das usadas em reports.py / portaria_dashboard.py:
+# nome -> (SQL, dias antes do dia de referência, dias depois)
+QUERIES = {
+    "dashboard_acessos_hoje": (
+        "SELECT COUNT(*) FROM {table} WHERE tenant_id = :tid AND registered_at >= :inicio AND registered_at < :fim",
+        0,
+        1,
+    ),
+    "stats_acessos_mes_por_metodo": (
+        """
+        SELECT access_method, COUNT(*) FROM {table}
+        WHERE tenant_id = :tid AND registered_at >= :inicio AND registered_at < :fim
+        GROUP BY access_method
+        """,
+        30,
+        1,
+    ),
+    "relatorio_logs_acesso_pagina": (
+        """
+        SELECT id, access_type, access_method, access_point, registered_at FROM {table}
+        WHERE tenant_id = :tid AND registered_at >= :inicio AND registered_at < :fim
+        ORDER BY registered_at DESC LIMIT 50
+        """,
+        7,
+        0,
+    ),
+    "relatorio_logs_acesso_total": (
+        "SELECT COUNT(*) FROM {table} WHERE tenant_id = :tid AND registered_at >= :inicio AND registered_at < :fim",
+        90,
+        0,
+    ),
+}
+
+
+async def create_tables(conn, months: int, start: date):
+    """Cria as tabelas comum e particionada no schema bench"""
+    await conn.execute(text("DROP SCHEMA IF EXISTS bench CASCADE"))
+    await conn.execute(text("CREATE SCHEMA bench"))
+
+    await conn.execute(text(f"CREATE TABLE bench.access_logs_plain ({COLUMNS})"))
+    await conn.execute(text(f"CREATE TABLE bench.access_logs_part ({COLUMNS}) PARTITION BY RANGE (registered_at)"))
+    for offset in range(months):
+        month = add_months(start, offset)
+        await conn.execute(
+            text(
+                f"CREATE TABLE bench.access_logs_part_p{month:%Y%m} PARTITION OF bench.access_logs_part "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+
+
+async def populate(conn, rows: int, months: int, tenants: int, start: date):
+    """Gera as linhas em blocos (ordem cronológica, como em produção)"""
+    seconds = (add_months(start, months) - start).days * 86400
+    for offset in range(0, rows, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, rows - offset)
+        # Valores inteiros gerados aqui mesmo: interpolados direto no SQL
+        insert = f"""
+            SELECT g, 1 + (hashint4(g::int) & 2147483647) % {tenants},
+                CASE WHEN g % 3 = 0 THEN NULL ELSE g % 5000 END,
+                CASE WHEN g % 3 = 0 THEN g % 20000 END,
+                g % 4000,
+                CASE WHEN g % 2 = 0 THEN 'entry' ELSE 'exit' END,
+                (ARRAY['facial','tag','remote','qrcode','manual','app'])[1 + g % 6],
+                'Portaria Principal', NULL,
+                TIMESTAMP '{start.isoformat()}' + (((g - 1)::float8 / {rows}) * {seconds}) * interval '1 second'
+            FROM generate_series({offset + 1}::bigint, {offset + size}::bigint) g
+        """
+        for table in ("bench.access_logs_plain", "bench.access_logs_part"):
+            await conn.execute(text(f"INSERT INTO {table} {insert}"))
+        print(f"   {offset + size:>12,} / {rows:,} linhas")
+
+
+async def create_indexes(conn):
+    """Índices equivalentes aos do model AccessLog"""
+    for table in ("bench.access_logs_plain", "bench.access_logs_part"):
+        name = table.split(".")[1]
+        await conn.execute(text(f"CREATE INDEX ix_{name}_tenant_date ON {table} (tenant_id, registered_at)"))
+    await conn.execute(text("CREATE INDEX ix_part_brin ON bench.access_logs_part USING brin (registered_at)"))
+    await conn.execute(text("ALTER TABLE bench.access_logs_plain ADD PRIMARY KEY (id)"))
+    await conn.execute(text("ALTER TABLE bench.access_logs_part ADD PRIMARY KEY (id, registered_at)"))
+    await conn.execute(text("ANALYZE bench.access_logs_plain"))
+    await conn.execute(text("ANALYZE bench.access_logs_part"))
+
+
+def _scanned_relations(plan) -> set:
+    """Partições presentes no plano (EXPLAIN FORMAT JSON)"""
+    found = set()
+    nodes = [plan[0]["Plan"]] if isinstance(plan, list) else [plan]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Relation Name", "").startswith("access_logs_part_p"):
+            found.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return found
+
+
+async def run_queries(conn, day: datetime, tenants: int, repeat: int):
+    """Executa cada consulta `repeat` vezes por tabela e imprime a mediana"""
+    print(f"\n{'consulta':<32} {'comum (ms)':>12} {'particionada (ms)':>18} {'partições lidas':>16}")
+    for name, (sql, days_before, days_after) in QUERIES.items():
+        window = {"inicio": day - timedelta(days=days_before), "fim": day + timedelta(days=days_after)}
+        timings = {}
+        for table in ("bench.access_logs_plain", "bench.access_logs_part"):
+            samples = []
+            for i in range(repeat):
+                started = time.perf_counter()
+                await conn.execute(text(sql.format(table=table)), {"tid": 1 + i % tenants, **window})
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[table] = statistics.median(samples)
+
+        plan = await conn.execute(
+            text("EXPLAIN (FORMAT JSON) " + sql.format(table="bench.access_logs_part")), {"tid": 1, **window}
+        )
+        scanned = len(_scanned_relations(plan.scalar()))
+        print(
+            f"{name:<32} {timings['bench.access_logs_plain']:>12.2f} "
+            f"{timings['bench.access_logs_part']:>18.2f} {scanned:>16}"
+        )
+
+
+async def benchmark(rows: int, months: int, tenants: int, repeat: int, keep: bool):
+    engine = create_async_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    start = add_months(date.today().replace(day=1), -months + 1)
+    day = datetime.combine(add_months(start, months - 1).replace(day=15), datetime.min.time())
+
+    async with engine.connect() as conn:
+        print(f"🏗️  Criando tabelas ({months} partições mensais desde {start})")
+        await create_tables(conn, months, start)
+
+        print(f"📥 Inserindo {rows:,} linhas em cada tabela")
+        started = time.perf_counter()
+        await populate(conn, rows, months, tenants, start)
+        await create_indexes(conn)
+        print(f"   carga + índices: {time.perf_counter() - started:.1f}s")
+
+        sizes = await conn.execute(
+            text(
+                """
+                SELECT pg_size_pretty(pg_total_relation_size('bench.access_logs_plain')),
+                       (SELECT pg_size_pretty(SUM(pg_total_relation_size(inhrelid)))
+                        FROM pg_inherits WHERE inhparent = 'bench.access_logs_part'::regclass)
+            """
+            )
+        )
+        plain_size, part_size = sizes.fetchone()
+        print(f"   tamanho: comum {plain_size} | particionada {part_size}")
+
+        await run_queries(conn, day, tenants, repeat)
+
+        if not keep:
+            await conn.execute(text("DROP SCHEMA bench CASCADE"))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de particionamento de access_logs")
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--tenants", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="Mantém o schema bench ao final")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.rows, args.months, args.tenants, args.repeat, args.keep))
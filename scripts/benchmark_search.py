@@ -0,0 +1,107 @@
+"""
+Benchmark da busca unificada (/search)
+
+Cria um condomínio descartável com N pessoas (padrão 50k moradores + 50k
+visitantes) e veículos, mede a latência de search_service.search() para
+termos típicos da portaria e remove o condomínio ao final.
+
+    python scripts/benchmark_search.py
+    python scripts/benchmark_search.py --people 50000 --repeat 50
+
+Requer a migration 005 (pg_trgm + colunas search_*). Meta: p95 < 20 ms.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.database import get_db_context
+from app.services.search import search_service
+
+TERMS = ["jo", "joão sil", "conceicao", "silva 123", "marai", "123.45", "(11) 9000", "abc1", "ABC1D3", "A10"]
+
+
+async def seed(db, people: int) -> int:
+    """Cria o condomínio de benchmark e popula pessoas e veículos"""
+    tenant_id = (
+        await db.execute(text("INSERT INTO tenants (name, is_active) VALUES ('Benchmark busca', true) RETURNING id"))
+    ).scalar()
+    names = """
+        (ARRAY['João','José','Maria','Ana','Márcia','Luís','Antônio','Cecília'])[1 + g % 8] || ' ' ||
+        (ARRAY['Silva','Souza','Conceição','Araújo','Oliveira','Gonçalves'])[1 + (g / 8) % 6] || ' ' || g
+    """
+    await db.execute(
+        text(
+            f"""
+            INSERT INTO users (tenant_id, name, email, password_hash, cpf, phone, role, is_active, is_deleted)
+            SELECT :tid, {names}, 'bench{tenant_id}_' || g || '@example.com', 'x',
+                   lpad((g::bigint * 7919 % 99999999999)::text, 11, '0'), '(11) 9' || lpad(g::text, 8, '0'),
+                   1, true, false
+            FROM generate_series(1, :people) g
+        """
+        ),
+        {"tid": tenant_id, "people": people},
+    )
+    await db.execute(
+        text(
+            f"""
+            INSERT INTO visitors (tenant_id, name, cpf, phone, visitor_type)
+            SELECT :tid, {names}, lpad((g::bigint * 104729 % 99999999999)::text, 11, '0'), NULL, 'visitor'
+            FROM generate_series(1, :people) g
+        """
+        ),
+        {"tid": tenant_id, "people": people},
+    )
+    await db.execute(
+        text(
+            """
+            INSERT INTO vehicles (tenant_id, owner_id, plate, model, is_active)
+            SELECT :tid, u.id,
+                   chr(65 + u.id % 26) || chr(65 + (u.id / 26) % 26) || chr(65 + (u.id / 676) % 26)
+                   || '-' || (u.id % 10) || chr(65 + u.id % 10) || lpad((u.id % 100)::text, 2, '0'),
+                   'Onix', true
+            FROM users u WHERE u.tenant_id = :tid AND u.id % 2 = 0
+        """
+        ),
+        {"tid": tenant_id},
+    )
+    await db.commit()
+    for table in ("users", "visitors", "vehicles"):
+        await db.execute(text(f"ANALYZE {table}"))
+    return tenant_id
+
+
+async def benchmark(people: int, repeat: int):
+    async with get_db_context() as db:
+        print(f"📥 Criando condomínio com {people:,} moradores e {people:,} visitantes")
+        tenant_id = await seed(db, people)
+        try:
+            print(f"\n{'termo':<14} {'p50 (ms)':>10} {'p95 (ms)':>10} {'resultados':>11}")
+            for term in TERMS:
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    results = await search_service.search(db, tenant_id, term)
+                    samples.append((time.perf_counter() - started) * 1000)
+                samples.sort()
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+                print(f"{term!r:<14} {statistics.median(samples):>10.2f} {p95:>10.2f} {len(results):>11}")
+        finally:
+            await db.rollback()
+            await db.execute(text("DELETE FROM vehicles WHERE tenant_id = :tid"), {"tid": tenant_id})
+            await db.execute(text("DELETE FROM visitors WHERE tenant_id = :tid"), {"tid": tenant_id})
+            await db.execute(text("DELETE FROM users WHERE tenant_id = :tid"), {"tid": tenant_id})
+            await db.execute(text("DELETE FROM tenants WHERE id = :tid"), {"tid": tenant_id})
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da busca unificada")
+    parser.add_argument("--people", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.people, args.repeat))
@@ -0,0 +1,53 @@
+"""
+Importação em massa de cadastros (implantação de um condomínio)
+Mesma rotina do POST /api/v1/importacao/{entidade}:
+
+    python scripts/import_cadastros.py 1 units unidades.xlsx
+    python scripts/import_cadastros.py 1 residents moradores.csv --senha-padrao "Trocar@123"
+    python scripts/import_cadastros.py 1 vehicles veiculos.csv --dry-run
+
+Ordem recomendada: units, residents, vehicles, pets (cada etapa resolve as anteriores).
+"""
+
+import argparse
+import asyncio
+
+from app.database import get_db_context
+from app.services.bulk_import import ENTITIES, bulk_import
+
+
+async def import_file(tenant_id: int, entity: str, path: str, dry_run: bool, default_password: str):
+    """Importa a planilha e imprime o relatório"""
+    try:
+        with open(path, "rb") as stream:
+            async with get_db_context() as db:
+                report = await bulk_import.run(
+                    db, tenant_id, entity, path, stream, dry_run=dry_run, default_password=default_password
+                )
+    finally:
+        bulk_import.shutdown()
+
+    prefix = "🔎 Validação" if dry_run else "✅ Importação"
+    print(f"{prefix} de {ENTITIES[entity].label} em {report.took_ms / 1000:.1f}s")
+    print(f"   • linhas: {report.total_rows:,} ({report.valid_rows:,} válidas)")
+    print(f"   • inseridas: {report.inserted:,} / atualizadas: {report.updated:,}")
+    if report.linked:
+        print(f"   • vínculos com unidades: {report.linked:,}")
+    if report.ignored_columns:
+        print(f"   • colunas ignoradas: {', '.join(report.ignored_columns)}")
+    if report.error_count:
+        print(f"\n⚠️  {report.error_count:,} erros")
+        for error in report.as_dict()["errors"]:
+            print(f"   linha {error['row']} [{error['column'] or '-'}]: {error['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importação em massa de cadastros")
+    parser.add_argument("tenant", type=int, help="ID do condomínio")
+    parser.add_argument("entity", choices=list(ENTITIES))
+    parser.add_argument("path", help="Planilha .csv ou .xlsx")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas valida; nada é gravado")
+    parser.add_argument("--senha-padrao", default=None, help="Senha dos moradores sem senha na planilha")
+    args = parser.parse_args()
+
+    asyncio.run(import_file(args.tenant, args.entity, args.path, args.dry_run, args.senha_padrao))
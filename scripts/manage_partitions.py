@@ -0,0 +1,40 @@
+"""
+Manutenção das partições mensais de access_logs / audit_logs
+Executar diariamente via cron:
+
+    python scripts/manage_partitions.py                 # cria partições futuras
+    python scripts/manage_partitions.py --retention 24  # e desanexa as com mais de 24 meses
+"""
+
+import argparse
+import asyncio
+
+from app.config import settings
+from app.database import get_db_context
+from app.services.partitioning import PARTITIONED_TABLES, partition_manager
+
+
+async def manage_partitions(months_ahead: int, retention_months: int, list_only: bool):
+    """Cria partições futuras e desanexa as antigas"""
+    async with get_db_context() as db:
+        if not list_only:
+            created = await partition_manager.ensure_partitions(db, months_ahead=months_ahead)
+            detached = await partition_manager.detach_old_partitions(db, retention_months=retention_months)
+            print(f"✅ Partições criadas: {', '.join(created) or 'nenhuma'}")
+            print(f"📦 Partições desanexadas: {', '.join(detached) or 'nenhuma'}")
+
+        for table in PARTITIONED_TABLES:
+            partitions = await partition_manager.list_partitions(db, table)
+            print(f"\n{table}: {len(partitions)} partições")
+            for partition in partitions:
+                print(f"   • {partition.name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manutenção das partições mensais dos logs")
+    parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_PREMAKE_MONTHS)
+    parser.add_argument("--retention", type=int, default=settings.PARTITION_RETENTION_MONTHS)
+    parser.add_argument("--list", action="store_true", help="Apenas lista as partições")
+    args = parser.parse_args()
+
+    asyncio.run(manage_partitions(args.months_ahead, args.retention, args.list))
@@ -0,0 +1,69 @@
+"""
+Dispatcher do outbox (notificações, e-mails e webhooks) fora da API
+Com OUTBOX_DISPATCHER_ENABLED=false na API, rodar como serviço próprio:
+
+    python scripts/outbox_dispatcher.py                  # workers até Ctrl+C / SIGTERM
+    python scripts/outbox_dispatcher.py --workers 8
+    python scripts/outbox_dispatcher.py --stats          # fila por canal e status
+    python scripts/outbox_dispatcher.py --requeue email  # devolve a dead-letter do canal para a fila
+    python scripts/outbox_dispatcher.py --prune          # remove enviadas além da retenção (cron diário)
+"""
+
+import argparse
+import asyncio
+import signal
+
+from app.config import settings
+from app.database import get_db_context
+from app.services.outbox import outbox
+
+
+async def run(workers: int):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    outbox.start(workers)
+    print(f"📮 Dispatcher do outbox com {workers} workers ({', '.join(outbox.canais)})")
+    await stop.wait()
+    await outbox.stop()
+    print("📮 Dispatcher parado")
+
+
+async def stats():
+    async with get_db_context() as db:
+        rows = await outbox.stats(db)
+    print(f"{'canal':<14}{'status':<14}{'total':>10}  mais antiga")
+    for row in rows:
+        print(f"{row['canal']:<14}{row['status']:<14}{row['total']:>10,}  {row['mais_antiga']:%Y-%m-%d %H:%M:%S}")
+
+
+async def requeue(canal: str):
+    async with get_db_context() as db:
+        count = await outbox.requeue(db, canal=None if canal == "todos" else canal)
+    print(f"🔁 {count:,} mensagens devolvidas para a fila")
+
+
+async def prune():
+    async with get_db_context() as db:
+        count = await outbox.prune(db)
+    print(f"🧹 {count:,} mensagens enviadas há mais de {settings.OUTBOX_RETENTION_DAYS} dias removidas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dispatcher do outbox transacional")
+    parser.add_argument("--workers", type=int, default=settings.OUTBOX_WORKERS)
+    parser.add_argument("--stats", action="store_true", help="Mostra a fila por canal e status")
+    parser.add_argument("--requeue", metavar="CANAL", help="Reprocessa a dead-letter do canal (ou 'todos')")
+    parser.add_argument("--prune", action="store_true", help="Remove as mensagens enviadas além da retenção")
+    args = parser.parse_args()
+
+    if args.stats:
+        asyncio.run(stats())
+    elif args.requeue:
+        asyncio.run(requeue(args.requeue))
+    elif args.prune:
+        asyncio.run(prune())
+    else:
+        asyncio.run(run(args.workers))
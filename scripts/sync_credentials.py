@@ -0,0 +1,57 @@
+"""
+Sincronização delta das credenciais com as integrações de hardware
+Executar periodicamente via cron (ex.: a cada 5 minutos):
+
+    python scripts/sync_credentials.py                         # todos os condomínios, todos os tipos
+    python scripts/sync_credentials.py --tenant 1 --tipo moradores
+    python scripts/sync_credentials.py --completo              # reconciliação completa
+    python scripts/sync_credentials.py --prune                 # limpa o journal além da retenção
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import get_db_context
+from app.services.credential_sync import SYNC_SOURCES, credential_sync
+
+
+async def sync_credentials(tenant_id: int, tipo: str, completo: bool, prune: bool):
+    async with get_db_context() as db:
+        if tenant_id is None:
+            result = await db.execute(
+                text(
+                    "SELECT DISTINCT tenant_id FROM integracoes_hardware "
+                    "WHERE is_active = true AND status = 'ativo' ORDER BY tenant_id"
+                )
+            )
+            tenants = [row.tenant_id for row in result.fetchall()]
+        else:
+            tenants = [tenant_id]
+
+        for tenant in tenants:
+            resumos = await credential_sync.sync_tenant(db, tenant, tipos=[tipo] if tipo else None, completo=completo)
+            print(f"🔄 Condomínio {tenant}: {len(resumos)} sincronizações")
+            for resumo in resumos:
+                print(
+                    f"   • integração {resumo['integracao_id']} / {resumo['tipo_sync']} ({resumo['modo']}): "
+                    f"{resumo['status']} - {resumo['registros_sucesso']}/{resumo['registros_total']} registros "
+                    f"em {resumo['lotes']} lotes"
+                )
+
+        if prune:
+            removed = await credential_sync.prune_journal(db)
+            print(f"🧹 Journal: {removed:,} linhas com mais de {settings.CREDENTIAL_SYNC_JOURNAL_RETENTION_DAYS} dias")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sincronização delta de credenciais com o hardware")
+    parser.add_argument("--tenant", type=int, default=None, help="Processa apenas este condomínio")
+    parser.add_argument("--tipo", choices=list(SYNC_SOURCES), default=None, help="Padrão: todos os tipos")
+    parser.add_argument("--completo", action="store_true", help="Reconciliação completa em vez do delta")
+    parser.add_argument("--prune", action="store_true", help="Remove do journal as linhas além da retenção")
+    args = parser.parse_args()
+
+    asyncio.run(sync_credentials(args.tenant, args.tipo, args.completo, args.prune))
@@ -19,6 +19,7 @@ from app.database import Base, get_db
 from app.main import app
 from app.models import Tenant, User
 from app.models.unit import Unit
+from app.services.loop_monitor import loop_monitor
 
 # Use a separate test database
 TEST_DATABASE_URL = settings.DATABASE_URL.replace("/conecta_plus", "/conecta_plus_test")
@@ -34,6 +35,35 @@ def event_loop() -> Generator:
     loop.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def loop_block_monitor(event_loop):
+    """Com LOOP_BLOCK_FAIL_MS, vigia o event loop dos testes (chamadas síncronas que o travam)"""
+    if not settings.LOOP_BLOCK_FAIL_MS:
+        yield None
+        return
+
+    loop_monitor.collect = True
+    loop_monitor.start(event_loop, threshold_ms=settings.LOOP_BLOCK_FAIL_MS)
+    yield loop_monitor
+    event_loop.run_until_complete(loop_monitor.stop())
+
+
+@pytest.fixture(autouse=True)
+def fail_on_loop_block(loop_block_monitor):
+    """Falha o teste que bloqueou o event loop por mais de LOOP_BLOCK_FAIL_MS"""
+    yield
+    if loop_block_monitor is None:
+        return
+    blocks = loop_block_monitor.drain()
+    if blocks:
+        block = max(blocks, key=lambda b: b.duration_ms)
+        pytest.fail(
+            f"Event loop bloqueado por {block.duration_ms:.0f}ms (limite {settings.LOOP_BLOCK_FAIL_MS}ms) "
+            f"em {block.method or ''} {block.route or '(fora de requisição)'}:\n{block.stack}",
+            pytrace=False,
+        )
+
+
 @pytest_asyncio.fixture(scope="session")
 async def test_engine():
     """Create test database engine"""
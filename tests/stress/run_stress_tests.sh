@@ -118,6 +118,27 @@ run_quick_test() {
     echo -e "\n\n${GREEN}✓ Teste rápido concluído${NC}"
 }
 
+# Função para rodar um cenário de carga (headless, com relatório de SLO)
+# Requer o dataset sintético: python scripts/generate_dataset.py --tenants 1
+# (no docker-compose: docker compose exec api python scripts/generate_dataset.py --tenants 1
+#  e API_URL=http://localhost:8100)
+run_scenario() {
+    local scenario="${1:-troca_turno}"
+    local file="${SCRIPT_DIR}/scenarios/${scenario}.py"
+
+    if [ ! -f "$file" ]; then
+        echo -e "${RED}Cenário desconhecido: ${scenario}${NC}"
+        echo "Disponíveis: $(ls "${SCRIPT_DIR}/scenarios" | grep -vE '^(__init__|common|slo)\.py$' | sed 's/\.py$//' | tr '\n' ' ')"
+        return 1
+    fi
+
+    echo -e "\n${BLUE}=== CENÁRIO: ${scenario} ===${NC}"
+    echo -e "Escala de tempo: ${GREEN}${STRESS_TIME_SCALE:-1}${NC} (STRESS_TIME_SCALE=0.1 para ensaio rápido)"
+    echo ""
+
+    (cd "${SCRIPT_DIR}/../.." && PYTHONPATH=. locust -f "$file" --headless --only-summary --host="${API_URL}")
+}
+
 # Função para benchmark simples
 run_benchmark() {
     echo -e "\n${BLUE}=== BENCHMARK (Apache Bench) ===${NC}"
@@ -142,7 +163,8 @@ show_menu() {
     echo "  2) Locust (Web UI)"
     echo "  3) k6 (CLI)"
     echo "  4) Benchmark (Apache Bench)"
-    echo "  5) Sair"
+    echo "  5) Cenário de carga com SLO (troca_turno)"
+    echo "  6) Sair"
     echo ""
     read -p "Opção: " choice
 
@@ -160,6 +182,9 @@ show_menu() {
             check_server && run_benchmark
             ;;
         5)
+            check_server && run_scenario troca_turno
+            ;;
+        6)
             echo -e "${GREEN}Até mais!${NC}"
             exit 0
             ;;
@@ -181,6 +206,8 @@ elif [ "$1" == "k6" ]; then
     check_server && run_k6
 elif [ "$1" == "benchmark" ]; then
     check_server && run_benchmark
+elif [ "$1" == "scenario" ]; then
+    check_server && run_scenario "$2"
 else
     show_menu
 fi
@@ -0,0 +1,3 @@
+"""
+Cenários de carga com perfis de tráfego reais (ver common.py e run_stress_tests.sh)
+"""
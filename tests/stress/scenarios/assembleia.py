@@ -0,0 +1,103 @@
+"""
+Cenário: votação em assembleia virtual
+
+O síndico abre a votação e os moradores entram quase juntos (link enviado
+no grupo do condomínio): abrem a pauta, votam uma vez e ficam atualizando o
+resultado parcial até o encerramento.
+
+    PYTHONPATH=. locust -f tests/stress/scenarios/assembleia.py --headless --host http://localhost:8100
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from locust import between, task
+
+from tests.stress.scenarios.common import ConectaUser, StagesShape, register_slo_report
+
+register_slo_report("assembleia")
+
+# Pauta aberta pelo síndico no início do teste (compartilhada entre os moradores do processo)
+pauta: dict = {"survey_id": None, "option_ids": []}
+
+
+class SindicoAssembleia(ConectaUser):
+    """Abre a pauta e acompanha a apuração"""
+
+    kind = "sindico"
+    fixed_count = 1
+    wait_time = between(10, 20)
+
+    def on_start(self):
+        super().on_start()
+        response = self.post(
+            "/surveys",
+            user_id=self.user_id,
+            json={
+                "title": f"AGO {datetime.now():%d/%m/%Y %H:%M} - Aprovação das contas",
+                "survey_type": "assembly",
+                "ends_at": (datetime.now() + timedelta(hours=2)).isoformat(),
+                "options": [{"text": "Aprovo"}, {"text": "Reprovo"}, {"text": "Abstenção"}],
+            },
+        )
+        if response.status_code == 201:
+            survey = response.json()
+            pauta["option_ids"] = [option["id"] for option in survey["options"]]
+            pauta["survey_id"] = survey["id"]
+
+    @task
+    def apuracao(self):
+        if pauta["survey_id"]:
+            self.get(f"/surveys/{pauta['survey_id']}", name="/surveys/{id}", user_id=self.user_id)
+
+
+class MoradorVotante(ConectaUser):
+    """Morador que entra, lê a pauta, vota uma vez e acompanha o resultado"""
+
+    kind = "morador"
+    wait_time = between(3, 12)
+
+    voted: Optional[bool] = None
+
+    def on_start(self):
+        super().on_start()
+        self.voted = False
+        self.get("/surveys", user_id=self.user_id, status="active")
+
+    @task(6)
+    def acompanhar(self):
+        if pauta["survey_id"]:
+            self.get(f"/surveys/{pauta['survey_id']}", name="/surveys/{id}", user_id=self.user_id)
+
+    @task(3)
+    def votar(self):
+        if self.voted or not pauta["survey_id"]:
+            return
+        with self.client.post(
+            f"/api/v1/surveys/{pauta['survey_id']}/votar",
+            params={"tenant_id": self.tenant_id, "user_id": self.user_id},
+            json={"option_id": random.choices(pauta["option_ids"], weights=[6, 3, 1])[0]},
+            headers=self.headers,
+            name="/surveys/{id}/votar [POST]",
+            catch_response=True,
+        ) as response:
+            # Mesmo morador em dois aparelhos (pool menor que o número de usuários) é esperado
+            if response.status_code == 400 and "já votou" in response.text:
+                response.success()
+        self.voted = True
+
+    @task(1)
+    def listar(self):
+        self.get("/surveys", user_id=self.user_id, status="active")
+
+
+class AssembleiaShape(StagesShape):
+    """Abertura com pico de entradas, votação concentrada nos primeiros minutos e cauda"""
+
+    stages = [
+        (30, 5, 5),  # síndico abre a pauta
+        (60, 300, 25),  # link no grupo: todos entram
+        (300, 300, 10),
+        (240, 80, 5),  # quem ficou acompanhando a apuração
+    ]
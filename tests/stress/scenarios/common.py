@@ -0,0 +1,155 @@
+"""
+Base dos cenários de carga: login com os usuários do dataset sintético,
+formas de rampa por estágios e relatório de SLO ao final da execução.
+
+Variáveis de ambiente:
+    STRESS_CONDOMINIO   número do condomínio do dataset (padrão 1 = "Condomínio Benchmark 001")
+    STRESS_MORADORES    quantos moradores distintos usar no login (padrão 150)
+    STRESS_PORTEIROS    quantos porteiros existem no condomínio (padrão 6, o do gerador)
+    STRESS_TIME_SCALE   multiplica a duração dos estágios (0.1 = ensaio rápido)
+    STRESS_SLO_FILE     JSON com SLOs sobrescritos (ver slo.py)
+    STRESS_REPORT_DIR   onde gravar o relatório (padrão tests/stress/reports)
+"""
+
+import itertools
+import os
+import random
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from locust import HttpUser, LoadTestShape, events
+from locust.exception import StopUser
+
+from benchmarks.dataset import BENCHMARK_PASSWORD, benchmark_email
+from tests.stress.scenarios.slo import EndpointStats, evaluate, load_slos, render, write_report
+
+CONDOMINIO = int(os.environ.get("STRESS_CONDOMINIO", "1"))
+MORADORES = int(os.environ.get("STRESS_MORADORES", "150"))
+PORTEIROS = int(os.environ.get("STRESS_PORTEIROS", "6"))
+TIME_SCALE = float(os.environ.get("STRESS_TIME_SCALE", "1"))
+REPORT_DIR = os.environ.get("STRESS_REPORT_DIR", "tests/stress/reports")
+
+_credential_counters = {kind: itertools.count() for kind in ("morador", "porteiro", "sindico")}
+_pool_sizes = {"morador": MORADORES, "porteiro": PORTEIROS, "sindico": 1}
+
+
+def next_email(kind: str) -> str:
+    """Percorre os usuários do tipo em rodízio (logins distintos até esgotar o pool)"""
+    number = next(_credential_counters[kind]) % _pool_sizes[kind] + 1
+    return benchmark_email(kind, CONDOMINIO, number)
+
+
+class ConectaUser(HttpUser):
+    """
+    Usuário autenticado do dataset. Cada instância simula um aparelho
+    diferente (IP próprio em X-Forwarded-For, como atrás do proxy), para
+    que o rate limit por IP se comporte como em produção.
+    """
+
+    abstract = True
+    kind = "morador"
+
+    tenant_id: int = 0
+    user_id: int = 0
+    unit_ids: List[int] = []
+
+    def on_start(self):
+        self.ip = f"10.{random.randint(0, 255)}.{random.randint(0, 255)}.{random.randint(1, 254)}"
+        self.headers = {"X-Forwarded-For": self.ip}
+        self.email = next_email(self.kind)
+        self.login()
+
+    def login(self) -> None:
+        with self.client.post(
+            "/api/v1/auth/login",
+            json={"email": self.email, "password": BENCHMARK_PASSWORD},
+            headers=self.headers,
+            name="/auth/login",
+            catch_response=True,
+        ) as response:
+            if response.status_code != 200:
+                response.failure(f"login {self.email}: {response.status_code}")
+                raise StopUser()
+            self.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        me = self.client.get("/api/v1/auth/me", headers=self.headers, name="/auth/me").json()
+        self.tenant_id = me["tenant_id"]
+        self.user_id = me["id"]
+        self._load_units()
+
+    def _load_units(self) -> None:
+        # Lista de unidades compartilhada pela classe (uma carga por processo)
+        if not ConectaUser.unit_ids:
+            response = self.client.get(
+                "/api/v1/units/",
+                params={"tenant_id": self.tenant_id, "limit": 500},
+                headers=self.headers,
+                name="/units",
+            )
+            ConectaUser.unit_ids = [item["id"] for item in response.json().get("items", [])]
+
+    def random_unit(self) -> int:
+        return random.choice(self.unit_ids)
+
+    def get(self, path: str, name: Optional[str] = None, **params):
+        params.setdefault("tenant_id", self.tenant_id)
+        return self.client.get(f"/api/v1{path}", params=params, headers=self.headers, name=name or path)
+
+    def post(self, path: str, json=None, name: Optional[str] = None, **params):
+        params.setdefault("tenant_id", self.tenant_id)
+        return self.client.post(
+            f"/api/v1{path}", params=params, json=json, headers=self.headers, name=name or f"{path} [POST]"
+        )
+
+
+def fake_document() -> str:
+    return f"{random.randint(100, 999)}.{random.randint(100, 999)}.{random.randint(100, 999)}-{random.randint(10, 99)}"
+
+
+class StagesShape(LoadTestShape):
+    """
+    Rampa por estágios: (duração em s, usuários, taxa de spawn/s). A duração
+    é escalada por STRESS_TIME_SCALE; a execução termina após o último estágio.
+    """
+
+    abstract = True
+    stages: List[Tuple[float, int, float]] = []
+
+    def tick(self):
+        elapsed = self.get_run_time()
+        for duration, users, spawn_rate in self.stages:
+            elapsed -= duration * TIME_SCALE
+            if elapsed < 0:
+                return users, spawn_rate
+        return None
+
+
+def register_slo_report(scenario: str) -> None:
+    """Ao encerrar: p50/p95/p99 por endpoint contra os SLOs; código de saída 1 se algum violar"""
+
+    @events.quitting.add_listener
+    def _report(environment, **kwargs):
+        rows = [
+            EndpointStats(
+                name=entry.name,
+                method=entry.method,
+                requests=entry.num_requests,
+                failures=entry.num_failures,
+                p50=entry.get_response_time_percentile(0.5) or 0,
+                p95=entry.get_response_time_percentile(0.95) or 0,
+                p99=entry.get_response_time_percentile(0.99) or 0,
+            )
+            for entry in environment.stats.entries.values()
+            if entry.num_requests
+        ]
+        results = evaluate(rows, load_slos())
+        path = os.path.join(REPORT_DIR, f"{scenario}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        write_report(path, scenario, results)
+
+        violations = sum(not result.ok for result in results)
+        print(f"\n{'=' * 100}\nSLO - cenário {scenario}\n{'=' * 100}")
+        print(render(results))
+        print(f"\n{'❌ ' + str(violations) + ' endpoints fora do SLO' if violations else '✅ Todos os SLOs atendidos'}")
+        print(f"Relatório: {path}")
+        if violations:
+            environment.process_exit_code = 1
@@ -0,0 +1,86 @@
+"""
+Cenário: onda de entregas de encomendas
+
+Transportadoras chegam em lote no fim da manhã e no meio da tarde: a
+portaria registra dezenas de encomendas seguidas, os moradores recebem a
+notificação e abrem o app, e parte vem retirar na portaria.
+
+    PYTHONPATH=. locust -f tests/stress/scenarios/onda_encomendas.py --headless --host http://localhost:8100
+"""
+
+import random
+
+from locust import between, task
+
+from tests.stress.scenarios.common import ConectaUser, StagesShape, register_slo_report
+
+register_slo_report("onda_encomendas")
+
+TRANSPORTADORAS = ["Mercado Livre", "Correios", "Shopee", "Amazon", "Magalu", "Jadlog", "Loggi"]
+
+
+class PorteiroRecebimento(ConectaUser):
+    """Porteiro recebendo o lote da transportadora (pausas curtas entre volumes)"""
+
+    kind = "porteiro"
+    weight = 2
+    wait_time = between(3, 8)
+
+    @task(8)
+    def registrar_encomenda(self):
+        self.post(
+            "/encomendas",
+            json={
+                "unit_id": self.random_unit(),
+                "recipient_name": "Morador",
+                "tracking_code": f"BR{random.randint(10**9, 10**10 - 1)}",
+                "carrier": random.choice(TRANSPORTADORAS),
+                "storage_location": random.choice(["Armário 1", "Armário 2", "Sala de encomendas"]),
+            },
+        )
+
+    @task(3)
+    def pendentes(self):
+        self.get("/encomendas", name="/encomendas?status=pending", status="pending", limit=50)
+
+    @task(2)
+    def stats(self):
+        self.get("/encomendas/stats")
+
+    @task(2)
+    def dashboard(self):
+        self.get("/portaria/dashboard")
+
+
+class MoradorNotificado(ConectaUser):
+    """Morador que recebeu o push: abre notificações e as encomendas da unidade"""
+
+    kind = "morador"
+    weight = 10
+    wait_time = between(10, 40)
+
+    @task(5)
+    def notificacoes(self):
+        self.get("/notifications", user_id=self.user_id, is_read="false")
+
+    @task(4)
+    def minhas_encomendas(self):
+        self.get("/encomendas", name="/encomendas [morador]", unit_id=self.random_unit(), limit=20)
+
+    @task(1)
+    def marcar_lidas(self):
+        self.post("/notifications/mark-all-read", user_id=self.user_id)
+
+
+class OndaEncomendasShape(StagesShape):
+    """Duas ondas (manhã e tarde) com vale entre elas"""
+
+    stages = [
+        (60, 15, 3),
+        (120, 150, 10),  # onda da manhã
+        (240, 150, 5),
+        (120, 30, 5),  # almoço
+        (120, 200, 15),  # onda da tarde (maior)
+        (240, 200, 5),
+        (60, 20, 10),
+    ]
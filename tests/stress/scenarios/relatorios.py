@@ -0,0 +1,96 @@
+"""
+Cenário: dia de exportação de relatórios
+
+Fechamento do mês: síndicos e administradora exportam CSVs de acessos,
+visitantes e auditoria de períodos longos, enquanto a portaria segue
+operando normalmente sobre o mesmo banco.
+
+    PYTHONPATH=. locust -f tests/stress/scenarios/relatorios.py --headless --host http://localhost:8100
+"""
+
+import random
+from datetime import date, timedelta
+
+from locust import between, task
+
+from tests.stress.scenarios.common import ConectaUser, StagesShape, register_slo_report
+
+register_slo_report("relatorios")
+
+
+def _periodo(max_days: int) -> dict:
+    """Intervalo que termina hoje (mês fechado é o mais comum)"""
+    days = random.choice([7, 30, 30, 30, max_days])
+    return {"start_date": (date.today() - timedelta(days=days)).isoformat(), "end_date": date.today().isoformat()}
+
+
+class SindicoRelatorios(ConectaUser):
+    """Síndico/administradora gerando relatórios (lê, pensa, exporta)"""
+
+    kind = "sindico"
+    weight = 3
+    wait_time = between(10, 30)
+
+    @task(4)
+    def acessos_csv(self):
+        self.get("/reports/acessos", name="/reports/acessos [csv]", format="csv", limit=500, **_periodo(90))
+
+    @task(3)
+    def visitantes_csv(self):
+        self.get(
+            "/reports/visitantes-log", name="/reports/visitantes-log [csv]", format="csv", limit=500, **_periodo(90)
+        )
+
+    @task(2)
+    def auditoria_csv(self):
+        self.get("/reports/auditoria", name="/reports/auditoria [csv]", format="csv", limit=500, **_periodo(180))
+
+    @task(3)
+    def acessos_paginas(self):
+        """Navegação paginada antes de exportar"""
+        periodo = _periodo(30)
+        for page in range(1, random.randint(2, 5)):
+            self.get("/reports/acessos", page=page, **periodo)
+
+    @task(2)
+    def resumo(self):
+        self.get("/reports/resumo")
+
+    @task(1)
+    def moradores_csv(self):
+        self.get("/reports/moradores", name="/reports/moradores [csv]", format="csv", limit=500)
+
+
+class PorteiroOperando(ConectaUser):
+    """Operação normal da portaria (o que não pode degradar com os relatórios)"""
+
+    kind = "porteiro"
+    weight = 2
+    wait_time = between(2, 6)
+
+    @task(5)
+    def dashboard(self):
+        self.get("/portaria/dashboard")
+
+    @task(3)
+    def em_andamento(self):
+        self.get("/portaria/visitas/em-andamento")
+
+    @task(1)
+    def validar_qr(self):
+        self.post(
+            "/portaria/pre-autorizacoes/validar",
+            json={"qr_code": f"QR-{random.randint(100000, 999999)}"},
+            name="/portaria/pre-autorizacoes/validar",
+        )
+
+
+class RelatoriosShape(StagesShape):
+    """Rampa lenta ao longo da manhã e platô prolongado"""
+
+    stages = [
+        (300, 15, 1),
+        (300, 40, 1),
+        (900, 40, 1),
+        (120, 5, 2),
+    ]
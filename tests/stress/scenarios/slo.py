@@ -0,0 +1,140 @@
+"""
+SLOs por endpoint e relatório de latência dos cenários de carga
+
+Independe do locust (recebe as estatísticas já extraídas), para poder ser
+testado e reaproveitado. Os limites padrão podem ser sobrescritos por um
+JSON em STRESS_SLO_FILE:
+
+    {"/portaria/dashboard": {"p95": 400}, "/reports/*": {"p99": 10000, "error_rate": 0.05}}
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class SLO:
+    """Limites de latência (ms) e taxa de erro máxima (fração)"""
+
+    p50: float
+    p95: float
+    p99: float
+    error_rate: float = 0.01
+
+
+# Padrões sobre o nome da requisição no locust ("*" e "?" como no fnmatch, colchetes literais,
+# como em "[csv]"); o mais específico (mais longo) vence
+DEFAULT_SLOS: Dict[str, SLO] = {
+    "*": SLO(p50=200, p95=800, p99=1500),
+    "/auth/login": SLO(p50=400, p95=1000, p99=2000),  # bcrypt no caminho
+    "/auth/me": SLO(p50=50, p95=200, p99=400),
+    "/portaria/dashboard": SLO(p50=150, p95=500, p99=1000),
+    "/portaria/turno": SLO(p50=50, p95=200, p99=400),
+    "/portaria/visitas*": SLO(p50=100, p95=400, p99=800),
+    "/portaria/pre-autorizacoes/validar": SLO(p50=50, p95=150, p99=300),
+    "/encomendas*": SLO(p50=100, p95=400, p99=800),
+    "/surveys/*": SLO(p50=100, p95=400, p99=800),
+    "/reports/*": SLO(p50=800, p95=3000, p99=6000, error_rate=0.02),
+    "/reports/* [csv]": SLO(p50=1500, p95=5000, p99=10000, error_rate=0.02),
+}
+
+
+@dataclass
+class EndpointStats:
+    """Estatísticas agregadas de um endpoint ao fim da execução"""
+
+    name: str
+    method: str
+    requests: int
+    failures: int
+    p50: float
+    p95: float
+    p99: float
+
+    @property
+    def error_rate(self) -> float:
+        return self.failures / self.requests if self.requests else 0.0
+
+
+@dataclass
+class SLOResult:
+    stats: EndpointStats
+    slo: SLO
+    pattern: str
+    violations: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+
+def load_slos(path: Optional[str] = None) -> Dict[str, SLO]:
+    """SLOs padrão com as sobrescritas do arquivo (campos ausentes herdam do padrão do mesmo nome ou de "*")"""
+    slos = dict(DEFAULT_SLOS)
+    path = path or os.environ.get("STRESS_SLO_FILE")
+    if not path:
+        return slos
+
+    with open(path, encoding="utf-8") as fp:
+        overrides = json.load(fp)
+    for pattern, values in overrides.items():
+        slos[pattern] = replace(slos.get(pattern, slos["*"]), **values)
+    return slos
+
+
+def match_slo(name: str, slos: Dict[str, SLO]) -> str:
+    """Padrão mais específico que casa com o nome da requisição"""
+    matches = [pattern for pattern in slos if fnmatchcase(name, pattern.replace("[", "[[]"))]
+    return max(matches, key=len) if matches else "*"
+
+
+def evaluate(rows: List[EndpointStats], slos: Dict[str, SLO]) -> List[SLOResult]:
+    results = []
+    for stats in rows:
+        pattern = match_slo(stats.name, slos)
+        slo = slos[pattern]
+        violations = [
+            f"{metric} {getattr(stats, metric):.0f}ms > {getattr(slo, metric):.0f}ms"
+            for metric in ("p50", "p95", "p99")
+            if getattr(stats, metric) > getattr(slo, metric)
+        ]
+        if stats.error_rate > slo.error_rate:
+            violations.append(f"erros {stats.error_rate:.1%} > {slo.error_rate:.1%}")
+        results.append(SLOResult(stats=stats, slo=slo, pattern=pattern, violations=violations))
+    return results
+
+
+def render(results: List[SLOResult]) -> str:
+    """Tabela texto por endpoint (ordem: violações primeiro, depois volume)"""
+    lines = [
+        f"{'':2} {'endpoint':<48} {'reqs':>8} {'erros':>7} {'p50':>7} {'p95':>7} {'p99':>7}  SLO (p50/p95/p99)",
+    ]
+    for result in sorted(results, key=lambda r: (r.ok, -r.stats.requests)):
+        s, slo = result.stats, result.slo
+        lines.append(
+            f"{'✅' if result.ok else '❌'} {(s.method + ' ' + s.name)[:48]:<48} {s.requests:>8,} {s.error_rate:>7.1%} "
+            f"{s.p50:>7.0f} {s.p95:>7.0f} {s.p99:>7.0f}  {slo.p50:.0f}/{slo.p95:.0f}/{slo.p99:.0f}"
+        )
+        for violation in result.violations:
+            lines.append(f"{'':3}↳ {violation}")
+    return "\n".join(lines)
+
+
+def write_report(path: str, scenario: str, results: List[SLOResult]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    document = {
+        "scenario": scenario,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "passed": all(result.ok for result in results),
+        "endpoints": [
+            {**asdict(result.stats), "slo": asdict(result.slo), "violations": result.violations} for result in results
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump(document, fp, indent=2, ensure_ascii=False)
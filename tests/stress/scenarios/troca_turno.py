@@ -0,0 +1,140 @@
+"""
+Cenário: troca de turno da portaria
+
+O turno que chega faz login em todos os postos ao mesmo tempo, abre o
+dashboard, consulta o turno e o livro, enquanto o turno que sai registra a
+passagem e a fila de visitantes acumulada é despachada em rajada.
+
+    PYTHONPATH=. locust -f tests/stress/scenarios/troca_turno.py --headless --host http://localhost:8100
+"""
+
+import random
+
+from locust import between, task
+
+from tests.stress.scenarios.common import ConectaUser, StagesShape, fake_document, register_slo_report
+
+register_slo_report("troca_turno")
+
+
+class PorteiroTurno(ConectaUser):
+    """Porteiro do turno que assume: dashboard em polling e registro de visitas"""
+
+    kind = "porteiro"
+    weight = 6
+    wait_time = between(2, 6)
+
+    def on_start(self):
+        super().on_start()
+        # Rotina de quem assume: dashboard, turno e livro antes de qualquer coisa
+        self.get("/portaria/dashboard")
+        self.get("/portaria/turno")
+        self.get("/portaria/livro", limit=20)
+        self.get("/portaria/visitas/em-andamento")
+
+    @task(10)
+    def dashboard(self):
+        self.get("/portaria/dashboard")
+
+    @task(4)
+    def turno(self):
+        self.get("/portaria/turno")
+
+    @task(6)
+    def em_andamento(self):
+        self.get("/portaria/visitas/em-andamento")
+
+    @task(3)
+    def aguardando(self):
+        self.get("/portaria/visitas/aguardando")
+
+    @task(5)
+    def registrar_visita(self):
+        """Visitante chega: registro, autorização pelo interfone e, às vezes, saída imediata"""
+        response = self.post(
+            "/portaria/visitas",
+            json={
+                "visitante_nome": f"Visitante Carga {random.randint(1, 100_000)}",
+                "visitante_documento": fake_document(),
+                "unit_id": self.random_unit(),
+                "tipo": random.choice(["visita", "visita", "prestacao_servico", "entrega"]),
+            },
+        )
+        if response.status_code != 201:
+            return
+        visita_id = response.json()["id"]
+        self.post(
+            f"/portaria/visitas/{visita_id}/autorizar",
+            json={"metodo_autorizacao": "interfone"},
+            name="/portaria/visitas/{id}/autorizar [POST]",
+        )
+        if random.random() < 0.3:
+            self.post(
+                f"/portaria/visitas/{visita_id}/finalizar", json={}, name="/portaria/visitas/{id}/finalizar [POST]"
+            )
+
+    @task(2)
+    def stats_acessos(self):
+        self.get("/portaria/stats/acessos", periodo="hoje")
+
+    @task(1)
+    def validar_qr(self):
+        self.post(
+            "/portaria/pre-autorizacoes/validar",
+            json={"qr_code": f"QR-{random.randint(100000, 999999)}"},
+            name="/portaria/pre-autorizacoes/validar",
+        )
+
+
+class PorteiroSaindo(ConectaUser):
+    """Turno que sai: registra a passagem no livro e consulta o histórico"""
+
+    kind = "porteiro"
+    weight = 2
+    wait_time = between(5, 15)
+
+    @task(3)
+    def registrar_passagem(self):
+        self.post(
+            "/portaria/livro",
+            json={
+                "titulo": "Passagem de turno",
+                "conteudo": f"Sem ocorrências. {random.randint(0, 12)} encomendas pendentes na portaria.",
+                "categoria": "turno",
+            },
+        )
+
+    @task(2)
+    def livro(self):
+        self.get("/portaria/livro", limit=50)
+
+    @task(1)
+    def visitas(self):
+        self.get("/portaria/visitas", limit=50)
+
+
+class MoradorApp(ConectaUser):
+    """Moradores no app durante o pico (pré-autorizações e garagem)"""
+
+    kind = "morador"
+    weight = 3
+    wait_time = between(5, 20)
+
+    @task(3)
+    def pre_autorizacoes(self):
+        self.get("/portaria/pre-autorizacoes", name="/portaria/pre-autorizacoes [morador]")
+
+    @task(1)
+    def garagem(self):
+        self.get("/portaria/garagem/ocupacao", name="/portaria/garagem/ocupacao [morador]")
+
+
+class TrocaTurnoShape(StagesShape):
+    """Movimento normal, rajada de logins da troca, sobreposição dos turnos e estabilização"""
+
+    stages = [
+        (120, 20, 2),  # turno da noite em operação
+        (60, 120, 20),  # troca: postos logam de uma vez
+        (300, 120, 5),  # sobreposição + fila acumulada
+        (180, 40, 5),  # turno anterior sai
+    ]
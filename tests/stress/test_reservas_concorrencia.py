@@ -0,0 +1,125 @@
+"""
+Teste de Stress - Reservas Simultâneas
+Conecta Plus API
+
+Dispara reservas concorrentes (uma sessão/conexão por requisição) contra o
+banco de teste e verifica que a constraint de exclusão e o lock por usuário
+deixam passar exatamente uma reserva por horário.
+
+Uso:
+    pytest tests/stress/test_reservas_concorrencia.py -m integration
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.exceptions import BusinessError
+from app.models import Tenant, User
+from app.models.reservation import CommonArea
+from app.models.unit import Unit
+from app.services.reservations import reservation_service
+
+CONCURRENT_REQUESTS = 25
+
+pytestmark = [pytest.mark.integration, pytest.mark.slow]
+
+
+@pytest.fixture
+async def cenario(test_engine):
+    """Condomínio com uma área e CONCURRENT_REQUESTS moradores"""
+    sessions = async_sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as db:
+        tenant = Tenant(name="Stress reservas", is_active=True)
+        db.add(tenant)
+        await db.flush()
+        unit = Unit(tenant_id=tenant.id, block="S", number="1", is_active=True)
+        area = CommonArea(tenant_id=tenant.id, name="Salão de festas", is_active=True)
+        users = [
+            User(
+                tenant_id=tenant.id,
+                name=f"Morador {i}",
+                email=f"stress_reserva_{i}@example.com",
+                password_hash="x",
+                role=1,
+                is_active=True,
+            )
+            for i in range(CONCURRENT_REQUESTS)
+        ]
+        db.add_all([unit, area, *users])
+        await db.commit()
+        ids = {"tenant": tenant.id, "unit": unit.id, "area": area.id, "users": [user.id for user in users]}
+
+    yield sessions, ids
+
+    async with sessions() as db:
+        await db.execute(text("DELETE FROM reservations WHERE tenant_id = :tid"), {"tid": ids["tenant"]})
+        await db.execute(text("DELETE FROM users WHERE tenant_id = :tid"), {"tid": ids["tenant"]})
+        await db.execute(text("DELETE FROM common_areas WHERE tenant_id = :tid"), {"tid": ids["tenant"]})
+        await db.execute(text("DELETE FROM units WHERE tenant_id = :tid"), {"tid": ids["tenant"]})
+        await db.execute(text("DELETE FROM tenants WHERE id = :tid"), {"tid": ids["tenant"]})
+        await db.commit()
+
+
+async def _reservar(sessions, ids, user_id, day, start, end):
+    async with sessions() as db:
+        try:
+            return await reservation_service.create(
+                db, ids["tenant"], user_id, ids["unit"], ids["area"], day, start, end
+            )
+        except BusinessError:
+            return None
+
+
+class TestReservasConcorrentes:
+    """Testes de corrida na criação de reservas"""
+
+    async def test_same_slot_only_one_wins(self, cenario):
+        """Test N moradores disputando horários sobrepostos: só um confirma"""
+        sessions, ids = cenario
+        day = date.today() + timedelta(days=10)
+        # Horários diferentes, todos sobrepostos às 20:00
+        slots = [(f"{18 + i % 3}:00", f"{21 + i % 2}:00") for i in range(CONCURRENT_REQUESTS)]
+
+        results = await asyncio.gather(
+            *(_reservar(sessions, ids, user_id, day, *slot) for user_id, slot in zip(ids["users"], slots))
+        )
+
+        assert len([r for r in results if r is not None]) == 1
+        async with sessions() as db:
+            count = await db.execute(
+                text("SELECT COUNT(*) FROM reservations WHERE area_id = :area AND status = 'confirmed'"),
+                {"area": ids["area"]},
+            )
+            assert count.scalar() == 1
+
+    async def test_disjoint_slots_all_win(self, cenario):
+        """Test horários encadeados sem sobreposição: todos confirmam"""
+        sessions, ids = cenario
+        day = date.today() + timedelta(days=40)
+        users = ids["users"][:12]
+        slots = [(f"{8 + i}:00", f"{9 + i}:00") for i in range(len(users))]
+
+        results = await asyncio.gather(
+            *(_reservar(sessions, ids, user_id, day, *slot) for user_id, slot in zip(users, slots))
+        )
+
+        assert all(r is not None for r in results)
+
+    async def test_same_user_monthly_rule(self, cenario):
+        """Test mesmo morador reservando dias diferentes do mês ao mesmo tempo: só um passa"""
+        sessions, ids = cenario
+        first_day = (date.today().replace(day=1) + timedelta(days=95)).replace(day=1)
+        user_id = ids["users"][0]
+
+        results = await asyncio.gather(
+            *(
+                _reservar(sessions, ids, user_id, first_day + timedelta(days=i), "10:00", "12:00")
+                for i in range(CONCURRENT_REQUESTS)
+            )
+        )
+
+        assert len([r for r in results if r is not None]) == 1
@@ -0,0 +1,274 @@
+"""
+Testes unitários para app/services/access_engine.py
+"""
+
+from datetime import date, datetime, time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.access_engine import (
+    SLOTS_PER_DAY,
+    AccessEngineService,
+    CompiledGroup,
+    CompiledPreAuth,
+    PointRule,
+    TenantAccessMatrix,
+    schedule_bits,
+    slot_of,
+)
+
+SEGUNDA = date(2026, 10, 19)
+DOMINGO = date(2026, 10, 18)
+COMERCIAL = schedule_bits(time(8), time(18), [1, 2, 3, 4, 5])
+
+
+def _at(day, hour, minute=0):
+    return datetime.combine(day, time(hour, minute))
+
+
+def _group(id, tipos, blocos=None, pontos=(1,), entrada=COMERCIAL, saida=COMERCIAL):
+    return CompiledGroup(
+        id=id,
+        tipos=frozenset(tipos),
+        blocos=frozenset(blocos) if blocos else None,
+        pontos={ponto: PointRule(entrada=entrada, saida=saida) for ponto in pontos},
+    )
+
+
+def _pre_auth(qr_code="QR1", bits=None, grupo_id=None, ponto_id=None, usos_restantes=None):
+    return CompiledPreAuth(
+        id=7,
+        qr_code=qr_code,
+        data_inicio=SEGUNDA,
+        data_fim=SEGUNDA,
+        bits=schedule_bits() if bits is None else bits,
+        grupo_id=grupo_id,
+        ponto_id=ponto_id,
+        usos_restantes=usos_restantes,
+    )
+
+
+def _rows(*rows):
+    result = MagicMock()
+    result.fetchall.return_value = list(rows)
+    result.fetchone.return_value = rows[0] if rows else None
+    return result
+
+
+def _group_row(id, ponto_id, permite_entrada=True, permite_saida=False, **kwargs):
+    values = dict(
+        id=id,
+        permite_morador=True,
+        permite_visitante=False,
+        permite_prestador=False,
+        permite_entregador=False,
+        blocos_permitidos=["A"],
+        horario_inicio=None,
+        horario_fim=None,
+        dias_semana=None,
+        ponto_id=ponto_id,
+        permite_entrada=permite_entrada,
+        permite_saida=permite_saida,
+    )
+    values.update(kwargs)
+    return SimpleNamespace(**values)
+
+
+class TestScheduleBits:
+    """Testes para a grade semanal de 15 minutos"""
+
+    def test_business_hours(self):
+        """Test seg-sex 08:00-18:00 cobre 08:00 até 17:59"""
+        assert COMERCIAL >> slot_of(_at(SEGUNDA, 8)) & 1
+        assert COMERCIAL >> slot_of(_at(SEGUNDA, 17, 59)) & 1
+        assert not COMERCIAL >> slot_of(_at(SEGUNDA, 18)) & 1
+        assert not COMERCIAL >> slot_of(_at(SEGUNDA, 7, 59)) & 1
+        assert not COMERCIAL >> slot_of(_at(DOMINGO, 10)) & 1
+
+    def test_rounds_inward(self):
+        """Test horário fora da grade é arredondado para dentro (nega na dúvida)"""
+        bits = schedule_bits(time(8, 10), time(9, 50))
+
+        assert not bits >> slot_of(_at(SEGUNDA, 8, 10)) & 1
+        assert bits >> slot_of(_at(SEGUNDA, 8, 15)) & 1
+        assert bits >> slot_of(_at(SEGUNDA, 9, 44)) & 1
+        assert not bits >> slot_of(_at(SEGUNDA, 9, 45)) & 1
+
+    def test_overnight_wraps_to_next_day(self):
+        """Test 22:00-06:00 no sábado continua no domingo de madrugada"""
+        bits = schedule_bits(time(22), time(6), [6])
+
+        assert bits >> slot_of(_at(date(2026, 10, 17), 23)) & 1
+        assert bits >> slot_of(_at(DOMINGO, 5, 59)) & 1
+        assert not bits >> slot_of(_at(DOMINGO, 6)) & 1
+        assert not bits >> slot_of(_at(date(2026, 10, 17), 5)) & 1
+
+    def test_defaults_to_whole_week(self):
+        """Test sem horário e sem dias libera a semana toda"""
+        assert schedule_bits() == (1 << 7 * SLOTS_PER_DAY) - 1
+
+
+class TestTenantAccessMatrix:
+    """Testes para as decisões da matriz compilada"""
+
+    def test_groups_are_merged_per_block(self):
+        """Test grupos do bloco e grupos sem bloco se somam para o mesmo ponto"""
+        noite = schedule_bits(time(18), time(23))
+        matrix = TenantAccessMatrix(
+            1,
+            pontos=[1],
+            grupos=[_group(1, ["morador"], blocos=["A"]), _group(2, ["morador"], entrada=noite)],
+            residentes={10: frozenset({"A"}), 11: frozenset({"B"})},
+        )
+
+        assert matrix.decide_user(10, 1, _at(SEGUNDA, 9)).allowed
+        assert matrix.decide_user(10, 1, _at(SEGUNDA, 20)).allowed
+        assert not matrix.decide_user(11, 1, _at(SEGUNDA, 9)).allowed
+        assert matrix.decide_user(11, 1, _at(SEGUNDA, 20)).allowed
+
+    def test_direction_and_reasons(self):
+        """Test entrada/saída separadas e motivo da negativa"""
+        matrix = TenantAccessMatrix(1, pontos=[1, 2], grupos=[_group(1, ["entregador"], saida=0)])
+
+        assert matrix.decide_tipo("entregador", "A", 1, _at(SEGUNDA, 9)).allowed
+        saida = matrix.decide_tipo("entregador", "A", 1, _at(SEGUNDA, 9), "saida")
+        assert saida.motivo == "Fora do horário permitido"
+        assert not matrix.decide_tipo("entregador", "A", 2, _at(SEGUNDA, 9)).allowed
+        assert not matrix.decide_tipo("visitante", "A", 1, _at(SEGUNDA, 9)).allowed
+        assert not matrix.decide_tipo("entregador", "A", 3, _at(SEGUNDA, 9)).allowed
+
+    def test_incremental_updates(self):
+        """Test troca de grupo e desativação de ponto sem recarga"""
+        matrix = TenantAccessMatrix(1, pontos=[1], grupos=[_group(1, ["visitante"])])
+
+        matrix.set_group(1, _group(1, ["visitante"], pontos=(2,)))
+        assert not matrix.decide_tipo("visitante", None, 1, _at(SEGUNDA, 9)).allowed
+
+        matrix.set_ponto(2, True)
+        assert matrix.decide_tipo("visitante", None, 2, _at(SEGUNDA, 9)).allowed
+
+        matrix.set_ponto(2, False)
+        matrix.set_group(1, None)
+        assert matrix.snapshot()["matriz"] == {}
+
+    def test_pre_autorizacao(self):
+        """Test validade, usos, ponto específico e interseção com o grupo"""
+        matrix = TenantAccessMatrix(
+            1,
+            pontos=[1, 2],
+            grupos=[_group(1, ["visitante"], pontos=(1,))],
+            pre_autorizacoes=[
+                _pre_auth("QR1", grupo_id=1),
+                _pre_auth("QR2", usos_restantes=0),
+                _pre_auth("QR3", ponto_id=2, bits=schedule_bits(time(20), time(22))),
+            ],
+        )
+
+        assert matrix.decide_pre_autorizacao("QR1", 1, _at(SEGUNDA, 9)).allowed
+        assert not matrix.decide_pre_autorizacao("QR1", 1, _at(SEGUNDA, 19)).allowed  # fora do grupo
+        assert not matrix.decide_pre_autorizacao("QR1", 2, _at(SEGUNDA, 9)).allowed
+        assert not matrix.decide_pre_autorizacao("QR1", 1, _at(DOMINGO, 9)).allowed  # fora da validade
+        assert matrix.decide_pre_autorizacao("QR2", 1, _at(SEGUNDA, 9)).motivo == "Número máximo de usos atingido"
+        assert matrix.decide_pre_autorizacao("QR3", 2, _at(SEGUNDA, 21)).allowed
+        assert not matrix.decide_pre_autorizacao("QR3", 1, _at(SEGUNDA, 21)).allowed
+        assert matrix.decide_pre_autorizacao("QR9", 1, _at(SEGUNDA, 9)).pre_autorizacao_id is None
+
+    def test_snapshot(self):
+        """Test exportação em JSON com bitsets em hexadecimal"""
+        matrix = TenantAccessMatrix(
+            1, pontos=[1], grupos=[_group(1, ["morador"], blocos=["A"])], residentes={10: frozenset({"A"})}
+        )
+
+        snapshot = matrix.snapshot()
+
+        assert snapshot["slot_minutes"] == 15
+        assert int(snapshot["matriz"]["morador:A"]["1"]["entrada"], 16) == COMERCIAL
+        assert snapshot["moradores"] == {"10": ["A"]}
+
+
+class TestAccessEngineService:
+    """Testes para carga e atualização por condomínio"""
+
+    @pytest.mark.asyncio
+    async def test_loads_once_within_ttl(self):
+        """Test que a matriz é compilada na primeira consulta e reutilizada"""
+        service = AccessEngineService(ttl_seconds=300)
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[
+                _rows(SimpleNamespace(id=1, is_active=True)),
+                _rows(_group_row(1, 1)),
+                _rows(SimpleNamespace(user_id=10, blocos=["A"])),
+                _rows(),
+            ]
+        )
+
+        first = await service.decide(db, 1, 1, user_id=10, when=_at(SEGUNDA, 3))
+        saida = await service.decide(db, 1, 1, user_id=10, direcao="saida", when=_at(SEGUNDA, 3))
+
+        assert db.execute.await_count == 4
+        assert first.allowed
+        assert not saida.allowed
+
+    @pytest.mark.asyncio
+    async def test_refresh_grupo_removes_inactive_group(self):
+        """Test grupo desativado (sem linhas) sai da matriz"""
+        service = AccessEngineService()
+        service._matrices[1] = TenantAccessMatrix(1, pontos=[1], grupos=[_group(1, ["visitante"])])
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_rows())
+
+        await service.refresh_grupo(db, 1, 1)
+
+        assert not service._matrices[1].decide_tipo("visitante", None, 1, _at(SEGUNDA, 9)).allowed
+
+    @pytest.mark.asyncio
+    async def test_refresh_skips_unloaded_tenant(self):
+        """Test que condomínio sem matriz não consulta o banco"""
+        db = AsyncMock()
+
+        await AccessEngineService().refresh_ponto(db, 1, 1)
+
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_qr_code_rechecked_across_workers(self):
+        """Test cancelamento e uso feitos em outro worker valem na hora para decisões por QR Code"""
+
+        def pre_auth_row(**kwargs):
+            values = dict(
+                id=7,
+                qr_code="QR1",
+                data_inicio=SEGUNDA,
+                data_fim=SEGUNDA,
+                horario_inicio=None,
+                horario_fim=None,
+                dias_semana=None,
+                is_single_use=True,
+                max_usos=1,
+                usos_realizados=0,
+                grupo_acesso_id=None,
+                ponto_acesso_id=None,
+            )
+            values.update(kwargs)
+            return SimpleNamespace(**values)
+
+        workers = [AccessEngineService(ttl_seconds=300), AccessEngineService(ttl_seconds=300)]
+        for worker in workers:
+            worker._matrices[1] = TenantAccessMatrix(1, pontos=[1], pre_autorizacoes=[_pre_auth(usos_restantes=1)])
+        db = AsyncMock()
+
+        # Worker 0 registra o uso; o worker 1 ainda tem usos_restantes=1 na matriz
+        db.execute = AsyncMock(return_value=_rows(pre_auth_row(usos_realizados=1)))
+        await workers[0].refresh_pre_autorizacao(db, 1, 7)
+        usado = await workers[1].decide(db, 1, 1, qr_code="QR1", when=_at(SEGUNDA, 9))
+        assert (usado.allowed, usado.motivo) == (False, "Número máximo de usos atingido")
+
+        # Cancelada: a consulta não devolve linha e o QR sai da matriz
+        db.execute = AsyncMock(return_value=_rows())
+        cancelado = await workers[1].decide(db, 1, 1, qr_code="QR1", when=_at(SEGUNDA, 9))
+        assert not cancelado.allowed
+        assert "QR1" not in workers[1]._matrices[1].pre_autorizacoes
+        assert db.execute.await_args.args[1] == {"tid": 1, "qr": "QR1"}
@@ -0,0 +1,130 @@
+"""
+Testes unitários para app/services/activity_feed.py
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from app.core.permissions import Role
+from app.services.activity_feed import ActivityFeedService, feed_key
+from app.services.cache import cache
+
+INICIO = datetime(2026, 3, 1, 8, 0)
+
+
+def _rows(count: int, tipos=("visitante", "manutencao", "encomenda", "comunicado")):
+    """Linhas da consulta ao banco, da mais recente para a mais antiga"""
+    return [
+        SimpleNamespace(tipo=tipos[i % len(tipos)], id=i, titulo=f"Atividade {i}", data=INICIO - timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+def _db(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    db = AsyncMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "_client", client)
+    return client
+
+
+class TestFeed:
+    """Testes para carga inicial, publicação e leitura"""
+
+    @pytest.mark.asyncio
+    async def test_seed_on_first_read_then_publish(self, redis):
+        """Test primeira leitura carrega do banco; publicações seguintes entram no topo sem consultar o banco"""
+        feed = ActivityFeedService()
+        await feed.publish(2, "encomenda", 1, "Encomenda para Ana")
+        assert await redis.exists(feed_key(2, Role.DOORMAN)) == 0  # feed não carregado: nada gravado
+
+        db = _db(_rows(8))
+        page = await feed.read(db, 2, Role.DOORMAN, limit=3)
+        assert [item["id"] for item in page["items"]] == [0, 1, 2]
+        assert page["items"][0] == {
+            "tipo": "visitante",
+            "id": 0,
+            "titulo": "Atividade 0",
+            "data": "2026-03-01T08:00:00",
+            "icone": "user",
+        }
+
+        await feed.publish(2, "encomenda", 99, "Encomenda para Ana", INICIO + timedelta(hours=1))
+        page = await feed.read(db, 2, Role.DOORMAN, limit=3)
+        assert [item["id"] for item in page["items"]] == [99, 0, 1]
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_role_streams(self, redis):
+        """Test morador (e anônimo) não vê visitantes e encomendas; síndico vê tudo"""
+        feed = ActivityFeedService()
+        db = _db(_rows(8))
+        await feed.read(db, 2, Role.SYNDIC)
+        await feed.publish(2, "visitante", 50, "Carlos")
+        await feed.publish(2, "reserva", 51, "Reserva: Churrasqueira")
+
+        sindico = await feed.read(db, 2, Role.SYNDIC, limit=50)
+        morador = await feed.read(db, 2, Role.RESIDENT, limit=50)
+        anonimo = await feed.read(db, 2, None, limit=50)
+
+        assert len(sindico["items"]) == 10
+        assert [item["id"] for item in morador["items"]] == [51, 1, 3, 5, 7]
+        assert {item["tipo"] for item in morador["items"]} == {"reserva", "comunicado", "manutencao"}
+        assert anonimo == morador
+
+    @pytest.mark.asyncio
+    async def test_cursor_pagination(self, redis):
+        """Test carregar mais percorre o feed inteiro sem repetir itens e termina com next_cursor None"""
+        feed = ActivityFeedService()
+        db = _db(_rows(20))
+        ids, cursor = [], None
+        while True:
+            page = await feed.read(db, 2, Role.ADMIN, limit=6, cursor=cursor)
+            ids += [item["id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert ids == list(range(20))
+
+    @pytest.mark.asyncio
+    async def test_reset_and_concurrent_seed(self, redis):
+        """Test reset força nova carga; com outra carga em andamento responde do banco sem gravar"""
+        feed = ActivityFeedService()
+        db = _db(_rows(4))
+        await feed.read(db, 2, Role.ADMIN)
+        await feed.reset(2)
+        assert await redis.exists(feed_key(2, Role.ADMIN)) == 0
+
+        await redis.set("conecta:feed:2:carregando", "1")
+        page = await feed.read(db, 2, Role.ADMIN)
+        assert [item["id"] for item in page["items"]] == [0, 1, 2, 3]
+        assert page["next_cursor"] is None
+        assert await redis.exists(feed_key(2, Role.ADMIN)) == 0
+
+    @pytest.mark.asyncio
+    async def test_without_redis(self, monkeypatch):
+        """Test sem Redis a leitura consulta o banco filtrando os tipos da role; cursor devolve vazio"""
+        monkeypatch.setattr(cache, "_client", None)
+        feed = ActivityFeedService()
+        db = _db(_rows(2, tipos=("manutencao",)))
+
+        page = await feed.read(db, 2, Role.RESIDENT, limit=5)
+        sql = str(db.execute.call_args.args[0])
+
+        assert [item["id"] for item in page["items"]] == [0, 1]
+        assert "maintenance_tickets" in sql and "reservations" in sql
+        assert "visitas" not in sql and "packages" not in sql
+        assert (await feed.read(db, 2, Role.RESIDENT, cursor="1-0")) == {"items": [], "next_cursor": None}
+        await feed.publish(2, "visitante", 1, "Ana")  # sem Redis: ignorado
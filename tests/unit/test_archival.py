@@ -0,0 +1,248 @@
+"""
+Testes unitários para app/services/archival.py
+"""
+
+import os
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.archival import (
+    ARCHIVE_TABLES,
+    ArchivalService,
+    RetentionRule,
+    archive_path,
+    read_archive_file,
+    write_archive_file,
+)
+
+
+def _result(rows=None, rowcount=0, scalar=None):
+    result = MagicMock()
+    result.fetchall.return_value = rows or []
+    result.rowcount = rowcount
+    result.scalar.return_value = scalar
+    return result
+
+
+class TestArchiveFiles:
+    """Testes para gravação e leitura dos arquivos .ndjson.zst"""
+
+    def test_archive_path(self):
+        """Test caminho determinístico por tabela, condomínio e intervalo de ids"""
+        path = archive_path("audit_logs", 7, 100, 250, base_dir="/data")
+        assert path == "/data/audit_logs/tenant_7/audit_logs_100_250.ndjson.zst"
+
+    def test_write_and_read_roundtrip(self, tmp_path):
+        """Test que as linhas gravadas são lidas de volta"""
+        path = str(tmp_path / "lote.ndjson.zst")
+        rows = [
+            {"id": 1, "action": "login", "created_at": datetime(2024, 1, 5, 10, 30)},
+            {"id": 2, "action": "update", "created_at": datetime(2024, 1, 6), "new_values": {"nome": "José"}},
+        ]
+
+        info = write_archive_file(path, rows, level=3)
+
+        assert info["size"] == os.path.getsize(path)
+        assert len(info["checksum"]) == 64
+        assert not os.path.exists(f"{path}.tmp")
+        loaded = read_archive_file(path)
+        assert loaded[0]["created_at"] == "2024-01-05T10:30:00"
+        assert loaded[1]["new_values"] == {"nome": "José"}
+
+    def test_rewrite_is_idempotent(self, tmp_path):
+        """Test que regravar o mesmo lote substitui o arquivo"""
+        path = str(tmp_path / "lote.ndjson.zst")
+        rows = [{"id": 1, "created_at": datetime(2024, 1, 5)}]
+
+        first = write_archive_file(path, rows, level=3)
+        second = write_archive_file(path, rows, level=3)
+
+        assert first["checksum"] == second["checksum"]
+        assert len(read_archive_file(path)) == 1
+
+
+class TestRetentionRules:
+    """Testes para resolução das políticas de retenção"""
+
+    def test_cutoff_is_month_start(self):
+        """Test que o corte é o início do mês mais antigo mantido"""
+        rule = RetentionRule(tenant_id=1, table="audit_logs", retention_months=6)
+        assert rule.cutoff(today=date(2025, 3, 17)) == datetime(2024, 9, 1)
+
+    @pytest.mark.asyncio
+    async def test_policy_overrides_default(self, monkeypatch):
+        """Test que a política do condomínio prevalece sobre o padrão global"""
+        monkeypatch.setattr("app.services.archival.settings.ARCHIVE_RETENTION_MONTHS", 0)
+        service = ArchivalService({"audit_logs": ARCHIVE_TABLES["audit_logs"]})
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[
+                _result(rows=[(1,), (2,)]),
+                _result(rows=[(1, "audit_logs", 12, True), (2, "audit_logs", 6, False)]),
+            ]
+        )
+
+        rules = await service.get_rules(db)
+
+        assert rules == [RetentionRule(tenant_id=1, table="audit_logs", retention_months=12)]
+
+    @pytest.mark.asyncio
+    async def test_default_applies_without_policy(self, monkeypatch):
+        """Test que o padrão global vale para condomínios sem política"""
+        monkeypatch.setattr("app.services.archival.settings.ARCHIVE_RETENTION_MONTHS", 24)
+        service = ArchivalService({"access_logs": ARCHIVE_TABLES["access_logs"]})
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_result(rows=[(3,)]), _result(rows=[])])
+
+        rules = await service.get_rules(db)
+
+        assert rules == [RetentionRule(tenant_id=3, table="access_logs", retention_months=24)]
+
+    @pytest.mark.asyncio
+    async def test_set_policy_rejects_unknown_table(self):
+        """Test que só tabelas arquiváveis aceitam política"""
+        with pytest.raises(ValueError):
+            await ArchivalService().set_policy(AsyncMock(), 1, "users", 12)
+
+
+class TestArchiveTable:
+    """Testes para exportação e remoção em lotes"""
+
+    @pytest.mark.asyncio
+    async def test_purge_deletes_in_chunks(self):
+        """Test que a remoção segue em transações até esvaziar o lote"""
+        service = ArchivalService()
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[_result(rowcount=100), _result(rowcount=100), _result(rowcount=30), _result()]
+        )
+
+        removed = await service.purge_batch(
+            db, ARCHIVE_TABLES["access_logs"], 1, 9, 1, 500, datetime(2024, 1, 1), chunk_size=100
+        )
+
+        assert removed == 230
+        assert db.commit.await_count == 4
+        assert "status = 'purged'" in str(db.execute.call_args_list[-1].args[0])
+
+    @pytest.mark.asyncio
+    async def test_resumes_pending_batches_first(self):
+        """Test que lotes exportados e não removidos são retomados antes de novos lotes"""
+        service = ArchivalService()
+        service.purge_batch = AsyncMock(return_value=0)
+        service.export_batch = AsyncMock()
+        cutoff = datetime(2024, 1, 1)
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_result(rows=[(5, 10, 20, cutoff)]), _result(rows=[])])
+
+        archived = await service.archive_table(db, "audit_logs", 1, cutoff)
+
+        assert archived == 0
+        service.purge_batch.assert_awaited_once_with(db, ARCHIVE_TABLES["audit_logs"], 1, 5, 10, 20, cutoff)
+        service.export_batch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_exports_then_purges_each_batch(self):
+        """Test que cada lote é exportado antes de ser removido"""
+        service = ArchivalService()
+        service.export_batch = AsyncMock(return_value=42)
+        service.purge_batch = AsyncMock(return_value=2)
+        cutoff = datetime(2024, 1, 1)
+        row_a = MagicMock(_mapping={"id": 3, "created_at": datetime(2023, 5, 1)})
+        row_b = MagicMock(_mapping={"id": 8, "created_at": datetime(2023, 6, 1)})
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_result(), _result(rows=[row_a, row_b]), _result()])
+
+        archived = await service.archive_table(db, "audit_logs", 1, cutoff, batch_size=2)
+
+        assert archived == 2
+        service.purge_batch.assert_awaited_once_with(db, ARCHIVE_TABLES["audit_logs"], 1, 42, 3, 8, cutoff)
+
+
+class TestIterArchived:
+    """Testes para leitura em streaming do arquivo frio"""
+
+    @pytest.mark.asyncio
+    async def test_filters_by_time_range(self, tmp_path):
+        """Test que só linhas no intervalo [start, end) são retornadas, mais recentes primeiro"""
+        path = str(tmp_path / "lote.ndjson.zst")
+        write_archive_file(
+            path,
+            [{"id": i, "created_at": datetime(2023, 1, i)} for i in range(1, 6)],
+            level=3,
+        )
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_result(rows=[(path,)]))
+
+        rows = [
+            row
+            async for row in ArchivalService().iter_archived(
+                db, "audit_logs", 1, datetime(2023, 1, 2), datetime(2023, 1, 5), newest_first=True
+            )
+        ]
+
+        assert [row["id"] for row in rows] == [4, 3, 2]
+        assert rows[0]["created_at"] == datetime(2023, 1, 4)
+
+    @pytest.mark.asyncio
+    async def test_skips_missing_files(self, tmp_path):
+        """Test que arquivo ausente não interrompe a leitura"""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_result(rows=[(str(tmp_path / "nao_existe.ndjson.zst"),)]))
+
+        rows = [row async for row in ArchivalService().iter_archived(db, "audit_logs", 1)]
+
+        assert rows == []
+
+
+class TestArchivedPage:
+    """Testes para a paginação do arquivo frio pelo manifesto"""
+
+    @staticmethod
+    def _lote(tmp_path, nome, dias, action="update"):
+        path = str(tmp_path / f"{nome}.ndjson.zst")
+        write_archive_file(
+            path, [{"id": dia, "action": action, "created_at": datetime(2023, 1, dia)} for dia in dias], level=3
+        )
+        return (path, len(dias), datetime(2023, 1, min(dias)), datetime(2023, 1, max(dias)))
+
+    @pytest.mark.asyncio
+    async def test_total_from_manifest_opens_only_page_batches(self, tmp_path, monkeypatch):
+        """Test total pelo row_count do manifesto; só os arquivos da página e das bordas do intervalo são lidos"""
+        antigo = (str(tmp_path / "nao_lido.ndjson.zst"), 1000, datetime(2023, 1, 5), datetime(2023, 1, 9))
+        borda = self._lote(tmp_path, "borda", [2, 3, 4])
+        recente = self._lote(tmp_path, "recente", [20, 21, 22])
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_result(rows=[recente, antigo, borda]))
+        lidos = []
+        monkeypatch.setattr(
+            "app.services.archival.read_archive_file", lambda path: lidos.append(path) or read_archive_file(path)
+        )
+
+        total, page = await ArchivalService().archived_page(
+            db, "audit_logs", 1, start=datetime(2023, 1, 3), skip=1, take=2
+        )
+
+        assert total == 3 + 1000 + 2
+        assert [row["id"] for row in page] == [21, 20]
+        assert lidos == [recente[0], borda[0]]
+        assert "row_count" in str(db.execute.await_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_content_filter_reads_batches(self, tmp_path):
+        """Test com filtro por conteúdo o total conta só as linhas que passam no filtro"""
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            return_value=_result(
+                rows=[self._lote(tmp_path, "a", [10, 11], "login"), self._lote(tmp_path, "b", [1, 2, 3], "update")]
+            )
+        )
+
+        total, page = await ArchivalService().archived_page(
+            db, "audit_logs", 1, skip=0, take=10, match=lambda row: row["action"] == "login"
+        )
+
+        assert total == 2
+        assert [row["id"] for row in page] == [11, 10]
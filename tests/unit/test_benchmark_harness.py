@@ -0,0 +1,77 @@
+"""
+Testes unitários para benchmarks/harness.py (runner e comparação)
+"""
+
+import pytest
+
+from benchmarks.harness import Benchmark, BenchmarkResult, compare, percentile, run_benchmark
+
+
+def _report(**medians):
+    return {"benchmarks": {name: {"median_ms": value} for name, value in medians.items()}}
+
+
+class TestStats:
+    """Testes para as estatísticas de uma execução"""
+
+    def test_percentile_interpolates(self):
+        """Test percentis com interpolação linear"""
+        ordered = [1.0, 2.0, 3.0, 4.0, 5.0]
+
+        assert percentile(ordered, 50) == 3.0
+        assert percentile(ordered, 95) == pytest.approx(4.8)
+        assert percentile([], 99) == 0.0
+
+    def test_result_stats(self):
+        """Test mediana, p95 e ops/s calculados dos tempos"""
+        stats = BenchmarkResult(name="x", suite="micro", timings_ms=[2.0, 1.0, 3.0, 2.0]).stats
+
+        assert stats["iterations"] == 4
+        assert stats["median_ms"] == 2.0
+        assert stats["min_ms"] == 1.0
+        assert stats["ops_per_s"] == 500.0
+
+    @pytest.mark.asyncio
+    async def test_run_benchmark_sync_and_async(self):
+        """Test aquecimento + iterações para funções sync e async"""
+        calls = []
+
+        async def async_func(ctx):
+            calls.append(ctx["tag"])
+
+        bench = Benchmark(name="a", suite="micro", func=async_func, iterations=10, warmup=2)
+        result = await run_benchmark(bench, {"tag": "a"})
+
+        assert len(result.timings_ms) == 10
+        assert len(calls) == 12
+
+        bench = Benchmark(name="s", suite="micro", func=lambda ctx: calls.append("s"), iterations=10, warmup=2)
+        result = await run_benchmark(bench, {}, scale=0.5)
+
+        assert len(result.timings_ms) == 5
+
+
+class TestCompare:
+    """Testes para a comparação com o baseline"""
+
+    def test_flags_regression_and_improvement(self):
+        """Test piora acima do limite é regressão; melhora e variação pequena não"""
+        baseline = _report(slow=10.0, fast=10.0, same=10.0, gone=1.0)
+        current = _report(slow=12.0, fast=7.0, same=10.5, new=3.0)
+
+        statuses = {item.name: item.status for item in compare(baseline, current, threshold=0.1)}
+
+        assert statuses == {
+            "slow": "regression",
+            "fast": "improvement",
+            "same": "unchanged",
+            "gone": "missing",
+            "new": "new",
+        }
+
+    def test_noise_floor(self):
+        """Test variação relativa grande em operação de microssegundos é ruído"""
+        comparison = compare(_report(jwt=0.002), _report(jwt=0.004))[0]
+
+        assert comparison.status == "unchanged"
+        assert comparison.change == pytest.approx(1.0)
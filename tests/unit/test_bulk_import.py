@@ -0,0 +1,259 @@
+"""
+Testes unitários para app/services/bulk_import.py
+"""
+
+import io
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.exceptions import BadRequestError
+from app.core.security import verify_password
+from app.services.bulk_import import (
+    ENTITIES,
+    BulkImportService,
+    ImportReport,
+    bool_value,
+    cpf_value,
+    date_value,
+    decimal_value,
+    plate_value,
+    read_rows,
+    validate_rows,
+)
+
+
+def _validate(entity: str, filename: str, content: bytes):
+    report = ImportReport(entity=entity)
+    valid = validate_rows(ENTITIES[entity], read_rows(filename, io.BytesIO(content)), report)
+    return valid, report
+
+
+def _result(rows=None, rowcount=0):
+    result = MagicMock()
+    result.fetchall.return_value = rows or []
+    result.rowcount = rowcount
+    return result
+
+
+class TestConverters:
+    """Testes para a conversão das células"""
+
+    def test_cpf_keeps_leading_zeros(self):
+        """Test CPF vindo do XLSX como número perde os zeros à esquerda"""
+        assert cpf_value(1234567890.0) == "012.345.678-90"
+        assert cpf_value("123.456.789-09") == "123.456.789-09"
+        with pytest.raises(ValueError):
+            cpf_value("123")
+
+    def test_plate(self):
+        """Test placa antiga e Mercosul, com ou sem hífen"""
+        assert plate_value("abc-1234") == "ABC1234"
+        assert plate_value("BRA2E19") == "BRA2E19"
+        with pytest.raises(ValueError):
+            plate_value("AB12345")
+
+    def test_decimal_and_date_formats(self):
+        """Test formatos brasileiros de número e data"""
+        assert decimal_value("1.234,56") == Decimal("1234.56")
+        assert decimal_value(72.5) == Decimal("72.5")
+        assert date_value("05/03/1990") == date(1990, 3, 5)
+        assert date_value(datetime(1990, 3, 5, 0, 0)) == date(1990, 3, 5)
+
+    def test_bool(self):
+        """Test sim/não com e sem acento"""
+        assert bool_value("Sim") is True
+        assert bool_value("NÃO") is False
+        assert bool_value("") is None
+        with pytest.raises(ValueError):
+            bool_value("talvez")
+
+
+class TestValidation:
+    """Testes para a validação em streaming"""
+
+    def test_csv_with_portuguese_headers_and_row_errors(self):
+        """Test cabeçalhos em português, linhas inválidas no relatório e válidas tipadas"""
+        content = (
+            "Bloco;Número;Andar;Tipo;Observação\n"
+            "A;101;1;Apartamento;x\n"
+            "A;102;um;apartamento;\n"
+            ";;;;\n"
+            "B;201;2;loja;\n"
+        ).encode()
+
+        valid, report = _validate("units", "unidades.csv", content)
+
+        assert [row["number"] for row in valid] == ["101", "201"]
+        assert valid[1]["unit_type"] == "store"
+        assert report.total_rows == 3
+        assert report.errors == [{"row": 3, "column": "floor", "error": "número inteiro inválido"}]
+        assert report.ignored_columns == ["Observação"]
+
+    def test_duplicates_reference_first_row(self):
+        """Test email repetido na planilha"""
+        content = b"nome,email\nAna,ana@ex.com\nAna B,ANA@ex.com\n"
+
+        valid, report = _validate("residents", "moradores.csv", content)
+
+        assert len(valid) == 1
+        assert report.errors[0]["row"] == 3
+        assert "linha 2" in report.errors[0]["error"]
+
+    def test_missing_required_column(self):
+        """Test planilha sem coluna obrigatória é rejeitada antes de ler as linhas"""
+        with pytest.raises(BadRequestError, match="email"):
+            _validate("residents", "moradores.csv", b"nome;telefone\nAna;119999\n")
+
+    def test_owner_required_for_vehicles(self):
+        """Test veículo sem email nem CPF do proprietário"""
+        valid, report = _validate("vehicles", "veiculos.csv", b"placa,modelo,cpf\nABC1234,Gol,\n")
+
+        assert valid == []
+        assert report.errors[0]["column"] == "owner_email"
+
+    def test_cp1252_csv(self):
+        """Test CSV salvo pelo Excel em português (Windows-1252)"""
+        content = "nome;especie;email\nTotó;cão;ana@ex.com\n".encode("cp1252")
+
+        valid, report = _validate("pets", "pets.csv", content)
+
+        assert valid[0]["name"] == "Totó"
+        assert valid[0]["species"] == "dog"
+
+    def test_xlsx(self):
+        """Test planilha XLSX com números e datas nativos"""
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["Nome", "E-mail", "CPF", "Nascimento", "Bloco", "Unidade"])
+        sheet.append(["Ana", "ana@ex.com", 1234567890, datetime(1990, 3, 5), "A", 101])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        report = ImportReport(entity="residents")
+        valid = validate_rows(ENTITIES["residents"], read_rows("moradores.xlsx", buffer), report)
+
+        assert valid[0]["cpf"] == "012.345.678-90"
+        assert valid[0]["birth_date"] == date(1990, 3, 5)
+        assert valid[0]["number"] == "101"
+
+    def test_unsupported_format(self):
+        """Test extensão não suportada"""
+        with pytest.raises(BadRequestError):
+            read_rows("moradores.pdf", io.BytesIO(b""))
+
+
+class TestPasswords:
+    """Testes para o hash de senhas no pool de processos"""
+
+    @pytest.mark.asyncio
+    async def test_hash_passwords_deduplicates(self):
+        """Test senhas iguais calculadas uma vez e verificáveis"""
+        service = BulkImportService(hash_workers=1)
+        try:
+            hashes = await service.hash_passwords(["senhaInicial1", "outraSenha2", "senhaInicial1"])
+        finally:
+            service.shutdown()
+
+        assert len(hashes) == 2
+        assert verify_password("senhaInicial1", hashes["senhaInicial1"])
+        assert verify_password("outraSenha2", hashes["outraSenha2"])
+
+
+class TestMerge:
+    """Testes para o merge a partir da staging"""
+
+    @pytest.mark.asyncio
+    async def test_rejected_rows_removed_from_staging(self):
+        """Test linhas rejeitadas pelo banco entram no relatório e saem da staging"""
+        spec = ENTITIES["vehicles"]
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[_result()] * len(spec.resolve)
+            + [_result(rows=[(3, "owner_email", "Proprietário não encontrado")]), _result(rows=[])]
+            + [_result(), _result(rowcount=2), _result(rowcount=5)]
+        )
+        report = ImportReport(entity="vehicles", valid_rows=8)
+
+        await BulkImportService(hash_workers=1)._merge(db, spec, 1, report)
+
+        delete = db.execute.call_args_list[len(spec.resolve) + 2]
+        assert "DELETE FROM import_vehicles" in str(delete.args[0])
+        assert delete.args[1] == {"rows": [3]}
+        assert (report.valid_rows, report.updated, report.inserted) == (7, 2, 5)
+        assert report.errors == [{"row": 3, "column": "owner_email", "error": "Proprietário não encontrado"}]
+
+    @pytest.mark.asyncio
+    async def test_non_resident_email_is_rejected(self):
+        """Test email de porteiro/admin do condomínio vira erro; update e vínculo só alcançam moradores"""
+        spec = ENTITIES["residents"]
+        staff_check = next(i for i, check in enumerate(spec.checks) if "u.role <> 1" in check)
+        checks = [_result(rows=[])] * len(spec.checks)
+        checks[staff_check] = _result(rows=[(2, "email", "Email pertence a um usuário que não é morador")])
+        db = AsyncMock()
+        db.execute = AsyncMock(
+            side_effect=[_result()] * len(spec.resolve)
+            + checks
+            + [_result(), _result(rowcount=1), _result(rowcount=0), _result(rowcount=1)]
+        )
+        report = ImportReport(entity="residents", valid_rows=2)
+
+        await BulkImportService(hash_workers=1)._merge(db, spec, 1, report, locked_hash="x")
+
+        delete = db.execute.call_args_list[len(spec.resolve) + len(spec.checks)]
+        assert delete.args[1] == {"rows": [2]}
+        assert report.valid_rows == 1
+        assert report.errors == [{"row": 2, "column": "email", "error": "Email pertence a um usuário que não é morador"}]
+        assert "u.role = 1" in spec.update
+        assert "u.role = 1" in spec.link
+
+    @pytest.mark.asyncio
+    async def test_dry_run_rolls_back(self, monkeypatch):
+        """Test dry run executa o merge e desfaz a transação"""
+        service = BulkImportService(hash_workers=1)
+        monkeypatch.setattr(service, "_copy", AsyncMock())
+        monkeypatch.setattr(service, "_merge", AsyncMock())
+        db = AsyncMock()
+
+        report = await service.run(db, 1, "units", "unidades.csv", io.BytesIO(b"numero\n101\n"), dry_run=True)
+
+        assert report.valid_rows == 1
+        service._merge.assert_awaited_once()
+        assert db.execute.await_count == 1  # só o lock: leitura e validação não tocam o banco
+        db.rollback.assert_awaited_once()
+        db.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_parse_runs_off_the_event_loop(self, monkeypatch):
+        """Test leitura e validação da planilha rodam em outra thread; o COPY continua no loop"""
+        threads = {}
+
+        class Planilha(io.BytesIO):
+            def read(self, *args):
+                threads["leitura"] = threading.get_ident()
+                return super().read(*args)
+
+        async def copy(db, spec, valid):
+            threads["copy"] = threading.get_ident()
+
+        service = BulkImportService(hash_workers=1)
+        monkeypatch.setattr(service, "_copy", copy)
+        monkeypatch.setattr(service, "_merge", AsyncMock())
+
+        report = await service.run(AsyncMock(), 1, "units", "unidades.csv", Planilha(b"numero\n101\n102\n"))
+
+        assert report.valid_rows == 2
+        assert threads["leitura"] != threading.get_ident()
+        assert threads["copy"] == threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_invalid_entity(self):
+        """Test entidade desconhecida"""
+        with pytest.raises(BadRequestError):
+            await BulkImportService(hash_workers=1).run(AsyncMock(), 1, "boletos", "x.csv", io.BytesIO(b""))
@@ -0,0 +1,198 @@
+"""
+Testes unitários para app/services/credential_sync.py
+"""
+
+import asyncio
+import json
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.credential_sync import (
+    BatchResult,
+    CredentialSyncService,
+    PartnerProfile,
+    SyncOp,
+    SyncPlan,
+    compute_delta,
+    pack_batches,
+    partner_profile,
+    record_hash,
+)
+
+PROFILE = PartnerProfile(max_payload_bytes=4096, max_itens=3, concorrencia=2)
+
+
+def _integracao(**config):
+    return SimpleNamespace(id=1, tenant_id=2, parceiro="linear", config={"base_url": "http://device", **config})
+
+
+def _ops(count):
+    return [SyncOp("add", i, dados={"nome": f"Morador {i}"}, hash="h") for i in range(count)]
+
+
+class TestComputeDelta:
+    """Testes para o cálculo das operações mínimas"""
+
+    def test_add_update_remove_and_skip(self):
+        """Test inclusão, alteração, remoção e registro inalterado"""
+        desired = {1: {"nome": "Ana"}, 2: {"nome": "Bruno"}, 3: {"nome": "Carla"}}
+        current = {2: "hash-antigo", 3: record_hash({"nome": "Carla"}), 4: "x"}
+
+        ops = compute_delta(desired, current)
+
+        assert [(op.op, op.entidade_id) for op in ops] == [("add", 1), ("update", 2), ("remove", 4)]
+        assert ops[0].hash == record_hash({"nome": "Ana"})
+        assert ops[2].dados is None
+
+    def test_restricted_to_journal_ids(self):
+        """Test modo delta considera só as entidades do journal"""
+        desired = {1: {"nome": "Ana"}}
+        current = {4: "x"}
+
+        assert [op.entidade_id for op in compute_delta(desired, current, ids=[1])] == [1]
+        assert compute_delta(desired, {}, ids=[9]) == []
+
+    def test_expiration_date_is_kept(self):
+        """Test data de expiração guardada para remover visitantes vencidos"""
+        [op] = compute_delta({5: {"data_fim": date(2026, 3, 1)}}, {}, expira="data_fim")
+
+        assert op.expira_em == date(2026, 3, 1)
+
+
+class TestPackBatches:
+    """Testes para o agrupamento em lotes"""
+
+    def test_respects_item_and_byte_limits(self):
+        """Test lotes dentro de max_itens e max_payload_bytes"""
+        by_items = pack_batches(1, "moradores", _ops(7), PROFILE)
+        by_bytes = pack_batches(
+            1, "moradores", _ops(7), PartnerProfile(max_payload_bytes=200, max_itens=100, concorrencia=1)
+        )
+
+        assert [len(batch.ops) for batch in by_items] == [3, 3, 1]
+        assert len(by_bytes) > 1
+        assert all(len(batch.body) <= 200 for batch in by_bytes)
+
+    def test_idempotency_key_is_stable(self):
+        """Test mesma integração e conteúdo geram a mesma chave; outra integração, outra chave"""
+        [first] = pack_batches(1, "moradores", _ops(2), PROFILE)
+        [again] = pack_batches(1, "moradores", _ops(2), PROFILE)
+        [other] = pack_batches(2, "moradores", _ops(2), PROFILE)
+
+        assert first.key == again.key
+        assert first.key != other.key
+        body = json.loads(first.body)
+        assert body["lote"] == first.key
+        assert body["operacoes"][0] == {"op": "add", "id": 0, "dados": {"nome": "Morador 0"}}
+
+    def test_partner_profile_overrides(self):
+        """Test limites do parceiro ajustáveis pela config da integração"""
+        profile = partner_profile("intelbras", {"sync_max_itens": 10, "sync_concorrencia": 0})
+
+        assert profile.max_itens == 10
+        assert profile.concorrencia == 1
+        assert profile.max_payload_bytes == 64 * 1024
+        assert partner_profile("desconhecido").concorrencia == 1
+
+
+class TestPush:
+    """Testes para o envio com retentativa e limite por equipamento"""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(settings, "CREDENTIAL_SYNC_RETRY_BACKOFF_SECONDS", 0)
+
+    @pytest.mark.asyncio
+    async def test_retries_with_same_idempotency_key(self):
+        """Test 503 seguido de 200: duas tentativas com a mesma chave"""
+        keys = []
+
+        def handler(request):
+            keys.append(request.headers["Idempotency-Key"])
+            return httpx.Response(503 if len(keys) == 1 else 200)
+
+        service = CredentialSyncService(transport=httpx.MockTransport(handler))
+        batches = pack_batches(1, "moradores", _ops(1), PROFILE)
+
+        [result] = await service.push(_integracao(api_key="k"), PROFILE, batches)
+
+        assert result.sucesso
+        assert result.tentativas == 2
+        assert keys == [batches[0].key, batches[0].key]
+
+    @pytest.mark.asyncio
+    async def test_client_error_is_not_retried(self):
+        """Test 400 falha o lote sem nova tentativa"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400)
+
+        service = CredentialSyncService(transport=httpx.MockTransport(handler))
+
+        [result] = await service.push(_integracao(), PROFILE, pack_batches(1, "moradores", _ops(1), PROFILE))
+
+        assert not result.sucesso
+        assert result.erro == "HTTP 400"
+        assert len(calls) == 1
+        assert result.stats()["status"] == "erro"
+
+    @pytest.mark.asyncio
+    async def test_device_concurrency_limit(self):
+        """Test no máximo profile.concorrencia lotes simultâneos no equipamento"""
+        active = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return httpx.Response(200)
+
+        service = CredentialSyncService(transport=httpx.MockTransport(handler))
+
+        results = await service.push(_integracao(), PROFILE, pack_batches(1, "moradores", _ops(15), PROFILE))
+
+        assert len(results) == 5
+        assert all(result.sucesso for result in results)
+        assert peak == 2
+
+
+class TestApply:
+    """Testes para a gravação do estado após o envio"""
+
+    @pytest.mark.asyncio
+    async def test_watermark_only_advances_when_all_batches_succeed(self):
+        """Test lote com erro: hashes dos aceitos gravados, watermark mantido"""
+        plan = SyncPlan("delta", [], (10, 1), (20, 5))
+        ok = BatchResult("a", _ops(1), 10, 1, True, 1.0)
+        failed = BatchResult("b", [SyncOp("remove", 9)], 10, 4, False, 1.0, erro="HTTP 503")
+        db = AsyncMock()
+
+        complete = await CredentialSyncService().apply(db, 1, "moradores", plan, [ok, failed])
+
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert not complete
+        assert len(statements) == 1
+        assert "INSERT INTO integracoes_sync_itens" in statements[0]
+
+    @pytest.mark.asyncio
+    async def test_all_batches_ok_advances_watermark(self):
+        """Test todos os lotes aceitos: remoções aplicadas e watermark avançado"""
+        plan = SyncPlan("delta", [], (10, 1), (20, 5))
+        ok = BatchResult("a", [SyncOp("remove", 9)], 10, 1, True, 1.0)
+        db = AsyncMock()
+
+        assert await CredentialSyncService().apply(db, 1, "moradores", plan, [ok])
+
+        calls = db.execute.await_args_list
+        assert "DELETE FROM integracoes_sync_itens" in str(calls[0].args[0])
+        assert calls[1].args[1] == {"iid": 1, "tipo": "moradores", "wxid": 20, "wid": 5}
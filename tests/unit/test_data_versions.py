@@ -0,0 +1,82 @@
+"""
+Testes unitários para app/services/data_versions.py (versões de dados por condomínio)
+"""
+
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.data_versions import DATA_DOMAINS, DataVersionService, format_cursor, parse_cursor
+
+MIGRATION = Path(__file__).parents[2] / "migrations" / "versions" / "007_tenant_data_versions.py"
+
+
+def _versions(**versions):
+    result = MagicMock()
+    result.fetchall.return_value = [SimpleNamespace(domain=d, version=v) for d, v in versions.items()]
+    return result
+
+
+class TestCursor:
+    """Testes para o cursor de versões"""
+
+    def test_roundtrip(self):
+        """Test cursor formatado e lido de volta"""
+        versions = {"visitas": 12, "encomendas": 40}
+        assert format_cursor(versions) == "visitas:12,encomendas:40"
+        assert parse_cursor(format_cursor(versions)) == versions
+
+    def test_ignores_invalid_items(self):
+        """Test domínio desconhecido, versão não numérica e cursor vazio"""
+        assert parse_cursor("visitas:3,xyz:9,encomendas:abc, acessos:7") == {"visitas": 3, "acessos": 7}
+        assert parse_cursor(None) == {}
+        assert parse_cursor("") == {}
+
+
+class TestDataVersionService:
+    """Testes para a leitura das versões e o cálculo das mudanças"""
+
+    async def test_missing_domains_are_zero(self):
+        """Test domínio sem escrita aparece com versão 0"""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_versions(visitas=5))
+
+        versions = await DataVersionService().get(db, 1, ["visitas", "encomendas"])
+
+        assert versions == {"visitas": 5, "encomendas": 0}
+        assert db.execute.call_args.args[1] == {"tid": 1, "domains": ["visitas", "encomendas"]}
+
+    async def test_changes_since_cursor(self):
+        """Test só domínios que avançaram desde o cursor entram em changed"""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_versions(visitas=5, encomendas=40, acessos=2))
+
+        result = await DataVersionService().changes(
+            db, 1, "visitas:5,encomendas:39", ["visitas", "encomendas", "acessos"]
+        )
+
+        assert result["changed"] == ["encomendas", "acessos"]
+        assert result["cursor"] == "visitas:5,encomendas:40,acessos:2"
+
+    async def test_changes_without_cursor_lists_written_domains(self):
+        """Test primeira consulta: todos os domínios com alguma escrita"""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_versions(moradores=3))
+
+        result = await DataVersionService().changes(db, 1)
+
+        assert result["changed"] == ["moradores"]
+        assert set(result["versions"]) == set(DATA_DOMAINS)
+
+
+class TestMigration:
+    """Testes para a migration dos triggers"""
+
+    def test_domains_match_service(self):
+        """Test mapa domínio -> tabelas da migration igual ao do serviço"""
+        spec = importlib.util.spec_from_file_location("migration_007", MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        assert migration.DATA_DOMAINS == DATA_DOMAINS
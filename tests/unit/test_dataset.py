@@ -0,0 +1,77 @@
+"""
+Testes unitários para benchmarks/dataset.py (gerador do dataset sintético)
+"""
+
+from datetime import date
+
+import numpy as np
+
+from benchmarks.dataset import (
+    ACCESS_METHODS,
+    DatasetProfile,
+    event_times,
+    pick_in_groups,
+    weighted_choice,
+    zipf_indexes,
+)
+
+
+class TestDistributions:
+    """Testes para as distribuições vetorizadas"""
+
+    def test_event_times_deterministic_and_sorted(self):
+        """Test mesma semente gera os mesmos instantes, ordenados e dentro do período"""
+        first = event_times(np.random.default_rng([42, 0]), date(2024, 1, 1), 31, 500, "access")
+        second = event_times(np.random.default_rng([42, 0]), date(2024, 1, 1), 31, 500, "access")
+
+        assert np.array_equal(first, second)
+        assert np.all(first[1:] >= first[:-1])
+        assert first.min() >= np.datetime64("2024-01-01T00:00:00")
+        assert first.max() < np.datetime64("2024-02-01T00:00:00")
+        assert abs(first.size - 31 * 500) < 31 * 500 * 0.05
+
+    def test_event_times_follow_hourly_profile(self):
+        """Test pico de acessos às 18h e madrugada vazia"""
+        times = event_times(np.random.default_rng(1), date(2024, 1, 1), 28, 2000, "access")
+        hours = np.bincount((times - times.astype("datetime64[D]")).astype("timedelta64[h]").astype(int), minlength=24)
+
+        assert hours[18] > 5 * hours[3]
+
+    def test_weighted_choice(self):
+        """Test frequências próximas dos pesos"""
+        values = weighted_choice(np.random.default_rng(3), ACCESS_METHODS, 20_000)
+
+        assert set(values) <= set(ACCESS_METHODS)
+        assert abs((values == "tag").mean() - ACCESS_METHODS["tag"]) < 0.02
+
+    def test_pick_in_groups_stays_in_group(self):
+        """Test morador sorteado pertence à unidade sorteada"""
+        counts = np.array([1, 3, 2])
+        first = np.array([0, 1, 4])
+        groups = np.random.default_rng(5).integers(0, 3, size=1000)
+
+        picked = pick_in_groups(np.random.default_rng(6), first, counts, groups)
+
+        assert np.all(picked >= first[groups])
+        assert np.all(picked < first[groups] + counts[groups])
+
+    def test_zipf_indexes_concentrated(self):
+        """Test poucos visitantes concentram as visitas"""
+        indexes = zipf_indexes(np.random.default_rng(8), 1000, 10_000)
+
+        assert indexes.max() < 1000
+        assert (indexes < 10).mean() > 0.5
+
+
+class TestProfile:
+    """Testes para o perfil do dataset"""
+
+    def test_scaled_and_estimate(self):
+        """Test escala multiplica só as taxas de eventos"""
+        profile = DatasetProfile(tenants=2, years=1, end=date(2024, 12, 31))
+        half = profile.scaled(0.5)
+
+        assert profile.start == date(2024, 1, 1)
+        assert half.units_median == profile.units_median
+        assert half.estimate()["units"] == profile.estimate()["units"]
+        assert abs(half.estimate()["access_logs"] * 2 - profile.estimate()["access_logs"]) <= 2
@@ -0,0 +1,304 @@
+"""
+Testes unitários para app/services/event_ingest.py
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import msgpack
+import pytest
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core.exceptions import AppException, BadRequestError, TooManyRequestsError, UnauthorizedError
+from app.middleware import rate_limit
+from app.middleware.rate_limit import InMemoryRateLimiter, RateLimitMiddleware
+from app.services.cache import cache
+from app.services.event_ingest import Dispositivo, EventIngestor, hash_token, normalize_event, parse_events
+
+DISPOSITIVO = Dispositivo(ponto_id=7, tenant_id=2, nome="Portaria Principal", device_id=None)
+NOW = datetime(2026, 2, 20, 10, 0)
+TS = NOW.isoformat()
+
+
+class FakeDB:
+    """Sessão falsa: devolve do INSERT as chaves ainda não gravadas, como o ON CONFLICT DO NOTHING"""
+
+    def __init__(self, gravados=None, falhar=False):
+        self.gravados = gravados if gravados is not None else set()
+        self.falhar = falhar
+        self.inserts = []
+        self.commits = 0
+
+    def factory(self):
+        @asynccontextmanager
+        async def session():
+            db = AsyncMock()
+            db.execute.side_effect = self.execute
+            db.commit.side_effect = self.commit
+            yield db
+
+        return session
+
+    async def execute(self, statement, params=None):
+        result = MagicMock()
+        if "INSERT INTO access_logs" in str(statement):
+            if self.falhar:
+                raise ConnectionError("banco fora do ar")
+            self.inserts.append(params)
+            novos = []
+            for key in zip(params["ponto_acesso_id"], params["device_event_id"], params["registered_at"]):
+                if key not in self.gravados:
+                    self.gravados.add(key)
+                    novos.append(key)
+            result.fetchall.return_value = novos
+        return result
+
+    async def commit(self):
+        self.commits += 1
+
+
+class TestParseEvents:
+    """Testes para a decodificação do corpo"""
+
+    def test_ndjson_msgpack_and_json(self):
+        """Test os três formatos produzem a mesma lista; objeto único vira lista"""
+        eventos = [{"id": "a1", "tipo": "entrada"}, {"id": "a2", "tipo": "saida"}]
+        ndjson = b"\n".join(json.dumps(e).encode() for e in eventos) + b"\n\n"
+
+        assert parse_events(ndjson, "application/x-ndjson") == eventos
+        assert parse_events(msgpack.packb(eventos), "application/msgpack") == eventos
+        assert parse_events(json.dumps(eventos).encode(), "application/json; charset=utf-8") == eventos
+        assert parse_events(json.dumps(eventos[0]).encode(), None) == eventos[:1]
+
+    def test_invalid_line_and_limits(self, monkeypatch):
+        """Test aponta a linha inválida do NDJSON; recusa formato desconhecido e lote acima do limite"""
+        with pytest.raises(BadRequestError, match="Linha 2"):
+            parse_events(b'{"id": 1}\n{"id": \n{"id": 3}', "application/x-ndjson")
+        with pytest.raises(BadRequestError):
+            parse_events(b"id=1", "text/plain")
+
+        monkeypatch.setattr(settings, "INGEST_MAX_BATCH_EVENTS", 2)
+        with pytest.raises(BadRequestError, match="máximo de 2"):
+            parse_events(json.dumps([{"id": i} for i in range(3)]).encode(), "application/json")
+
+
+class TestNormalizeEvent:
+    """Testes para a validação de um evento"""
+
+    def test_fields_and_aliases(self):
+        """Test tenant e ponto vêm do dispositivo; aliases de tipo; placa normalizada; epoch em ms"""
+        epoch_ms = int(datetime(2026, 2, 20, 9, 59).timestamp() * 1000)
+        row = dict(
+            zip(
+                ("tenant_id", "ponto_acesso_id", "device_event_id", "registered_at", "access_type", "access_method"),
+                normalize_event(
+                    {"id": 991, "ts": epoch_ms, "tipo": "Saida", "metodo": "lpr", "placa": "abc-1d23", "tenant_id": 99},
+                    DISPOSITIVO,
+                    NOW,
+                ),
+            )
+        )
+
+        assert row == {
+            "tenant_id": 2,
+            "ponto_acesso_id": 7,
+            "device_event_id": "991",
+            "registered_at": datetime(2026, 2, 20, 9, 59),
+            "access_type": "exit",
+            "access_method": "lpr",
+        }
+        assert normalize_event({"id": "x", "ts": TS, "placa": "abc-1d23"}, DISPOSITIVO, NOW)[10] == "ABC1D23"
+
+    def test_iso_timestamp_with_timezone_becomes_local(self):
+        """Test ISO 8601 com fuso é convertido para o horário local sem fuso"""
+        utc = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+        row = normalize_event({"id": "x", "ts": "2026-02-20T12:00:00Z"}, DISPOSITIVO, NOW)
+
+        assert row[3] == utc.astimezone().replace(tzinfo=None)
+        assert row[3].tzinfo is None
+
+    @pytest.mark.parametrize(
+        "evento, motivo",
+        [
+            ({"tipo": "entry"}, "id obrigatório"),
+            ({"id": "x", "ts": TS, "tipo": "lado"}, "tipo"),
+            ({"id": "x"}, "ts obrigatório"),
+            ({"id": "x", "ts": (NOW + timedelta(days=2)).isoformat()}, "futuro"),
+            ({"id": "x", "ts": TS, "user_id": "abc"}, "user_id"),
+            ({"id": "x", "ts": TS, "placa": "ABCDEFGHIJK1"}, "placa"),
+            ("texto", "objeto"),
+        ],
+    )
+    def test_invalid_events(self, evento, motivo):
+        """Test eventos inválidos são rejeitados com o motivo"""
+        with pytest.raises(ValueError, match=motivo):
+            normalize_event(evento, DISPOSITIVO, NOW)
+
+
+class TestAuthenticate:
+    """Testes para a autenticação por dispositivo"""
+
+    @pytest.mark.asyncio
+    async def test_token_checked_against_hash_and_cached(self):
+        """Test token certo autentica, errado é recusado; o banco é consultado uma vez por ponto"""
+        consultas = []
+
+        @asynccontextmanager
+        async def factory():
+            db = AsyncMock()
+            row = MagicMock(id=7, tenant_id=2, nome="Garagem", device_id=None, ingest_token_hash=hash_token("s3gredo"))
+            db.execute.return_value = MagicMock(fetchone=MagicMock(return_value=row))
+            consultas.append(db)
+            yield db
+
+        ingestor = EventIngestor(session_factory=factory)
+
+        dispositivo = await ingestor.authenticate("7.s3gredo")
+        assert (dispositivo.ponto_id, dispositivo.tenant_id, dispositivo.nome) == (7, 2, "Garagem")
+        with pytest.raises(UnauthorizedError):
+            await ingestor.authenticate("7.outro")
+        with pytest.raises(UnauthorizedError):
+            await ingestor.authenticate("sem-ponto")
+        assert len(consultas) == 1
+
+        ingestor.forget_device(7)
+        await ingestor.authenticate("7.s3gredo")
+        assert len(consultas) == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_device_is_not_cached(self):
+        """Test ponto inexistente não entra no cache: ids inventados não acumulam memória"""
+        consultas = []
+
+        @asynccontextmanager
+        async def factory():
+            db = AsyncMock()
+            db.execute.return_value = MagicMock(fetchone=MagicMock(return_value=None))
+            consultas.append(db)
+            yield db
+
+        ingestor = EventIngestor(session_factory=factory)
+        for ponto_id in (101, 102, 101):
+            with pytest.raises(UnauthorizedError):
+                await ingestor.authenticate(f"{ponto_id}.qualquer")
+
+        assert len(consultas) == 3
+        assert ingestor._devices == {}
+
+
+class TestDeviceAuthRateLimit:
+    """Testes para o limite de tokens inválidos em /portaria/eventos"""
+
+    def test_failed_tokens_are_limited_per_ip(self, monkeypatch):
+        """Test após N tokens inválidos o IP recebe 429 sem chegar ao endpoint; dispositivo válido não conta"""
+        monkeypatch.setattr(cache, "_client", None)
+        monkeypatch.setattr(rate_limit, "memory_rate_limiter", InMemoryRateLimiter())
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+        monkeypatch.setattr(settings, "RATE_LIMIT_DEVICE_AUTH_FAILURES", 2)
+        chamadas = []
+
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware)
+
+        @app.post("/api/v1/portaria/eventos")
+        async def eventos(x_device_token: str = Header(None)):
+            chamadas.append(x_device_token)
+            if x_device_token != "7.s3gredo":
+                return JSONResponse({"detail": "Token do dispositivo inválido"}, status_code=401)
+            return {"inseridos": 0}
+
+        client = TestClient(app)
+        for _ in range(5):
+            assert client.post("/api/v1/portaria/eventos", headers={"X-Device-Token": "7.s3gredo"}).status_code == 200
+        status_codes = [
+            client.post("/api/v1/portaria/eventos", headers={"X-Device-Token": f"{i}.x"}).status_code for i in range(4)
+        ]
+
+        assert status_codes == [401, 401, 429, 429]
+        assert len(chamadas) == 7
+        outro_ip = client.post("/api/v1/portaria/eventos", headers={"X-Device-Token": "1.x", "X-Real-IP": "10.0.0.9"})
+        assert outro_ip.status_code == 401
+
+
+class TestGroupCommit:
+    """Testes para o buffer e a gravação em lote"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_insert(self):
+        """Test duas requisições no mesmo intervalo: um INSERT, duplicados contados por requisição"""
+        fake = FakeDB()
+        ingestor = EventIngestor(session_factory=fake.factory())
+        ts = NOW.isoformat()
+
+        primeiro = await ingestor.ingest(DISPOSITIVO, [{"id": "e1", "ts": ts}, {"id": "e2", "ts": ts}])
+        assert (primeiro.inseridos, primeiro.duplicados) == (2, 0)
+
+        a, b = await asyncio.gather(
+            ingestor.ingest(DISPOSITIVO, [{"id": "e2", "ts": ts}, {"id": "e3", "ts": ts}, {"tipo": "entry"}]),
+            ingestor.ingest(DISPOSITIVO, [{"id": f"n{i}", "ts": ts} for i in range(5)]),
+        )
+        await ingestor.stop()
+
+        assert (a.recebidos, a.inseridos, a.duplicados, a.rejeitados) == (3, 1, 1, 1)
+        assert a.erros == [{"indice": 2, "id": None, "motivo": "id obrigatório (idempotência)"}]
+        assert (b.inseridos, b.duplicados) == (5, 0)
+        assert len(fake.inserts) == 2
+        assert len(fake.inserts[1]["device_event_id"]) == 7
+        assert fake.inserts[1]["tenant_id"] == [2] * 7
+
+    @pytest.mark.asyncio
+    async def test_resend_without_ts_is_rejected_not_duplicated(self):
+        """Test lote sem ts é recusado (reenvio teria outro registered_at); com ts o reenvio só conta duplicados"""
+        fake = FakeDB()
+        ingestor = EventIngestor(session_factory=fake.factory())
+        sem_ts = [{"id": "r1"}, {"id": "r2"}]
+
+        for _ in range(2):
+            resultado = await ingestor.ingest(DISPOSITIVO, sem_ts)
+            assert (resultado.inseridos, resultado.rejeitados) == (0, 2)
+            assert resultado.erros[0]["motivo"] == "ts obrigatório (idempotência)"
+
+        com_ts = [{"id": "r1", "ts": TS}, {"id": "r2", "ts": TS}]
+        primeiro = await ingestor.ingest(DISPOSITIVO, com_ts)
+        reenvio = await ingestor.ingest(DISPOSITIVO, com_ts)
+        await ingestor.stop()
+
+        assert (primeiro.inseridos, primeiro.duplicados) == (2, 0)
+        assert (reenvio.inseridos, reenvio.duplicados) == (0, 2)
+        assert len(fake.gravados) == 2
+
+    @pytest.mark.asyncio
+    async def test_flush_rows_triggers_before_interval(self, monkeypatch):
+        """Test ao juntar INGEST_FLUSH_ROWS eventos grava sem esperar o intervalo"""
+        monkeypatch.setattr(settings, "INGEST_FLUSH_INTERVAL_MS", 60_000)
+        monkeypatch.setattr(settings, "INGEST_FLUSH_ROWS", 3)
+        ingestor = EventIngestor(session_factory=FakeDB().factory())
+
+        resultado = await asyncio.wait_for(
+            ingestor.ingest(DISPOSITIVO, [{"id": f"e{i}", "ts": TS} for i in range(3)]), timeout=2
+        )
+        await ingestor.stop()
+
+        assert resultado.inseridos == 3
+
+    @pytest.mark.asyncio
+    async def test_backpressure_and_database_failure(self, monkeypatch):
+        """Test buffer cheio recusa com 429 + Retry-After; falha do banco devolve 503 a quem esperava"""
+        monkeypatch.setattr(settings, "INGEST_BUFFER_MAX_EVENTS", 4)
+        ingestor = EventIngestor(session_factory=FakeDB(falhar=True).factory())
+
+        with pytest.raises(TooManyRequestsError) as exc:
+            await ingestor.ingest(DISPOSITIVO, [{"id": f"e{i}", "ts": TS} for i in range(5)])
+        assert exc.value.status_code == 429
+        assert int(exc.value.headers["Retry-After"]) >= 1
+
+        with pytest.raises(AppException) as exc:
+            await ingestor.ingest(DISPOSITIVO, [{"id": "e1", "ts": TS}])
+        await ingestor.stop()
+        assert exc.value.status_code == 503
@@ -0,0 +1,189 @@
+"""
+Testes unitários para app/services/file_delivery.py
+"""
+
+import os
+import time
+import uuid
+from email.utils import formatdate
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.arquivos import router as arquivos_router
+from app.config import settings
+from app.core.security import create_access_token
+from app.middleware.compression import CompressionMiddleware
+from app.services.file_delivery import RangeNotSatisfiable, file_delivery, parse_range
+
+CONTEUDO = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """Pasta de uploads temporária com um documento de nome uuid e um logo de nome fixo"""
+    (tmp_path / "documentos").mkdir()
+    (tmp_path / "tenant").mkdir()
+    nome = f"{uuid.uuid4()}.pdf"
+    (tmp_path / "documentos" / nome).write_bytes(CONTEUDO)
+    (tmp_path / "tenant" / "logo.png").write_bytes(b"\x89PNG" + b"0" * 100)
+    (tmp_path / "segredo.txt").write_text("fora das áreas")
+    monkeypatch.setattr(file_delivery, "_base_dir", str(tmp_path / "documentos" / ".."))
+    monkeypatch.setattr(settings, "FILE_DELIVERY_MODE", "auto")
+    monkeypatch.setattr(settings, "FILE_CHUNK_BYTES", 4096)
+    monkeypatch.setattr(settings, "FILE_PROTECTED_AREAS", [])
+    return f"documentos/{nome}"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, exclude_prefixes=("/uploads/",))
+    app.include_router(arquivos_router)
+    return TestClient(app)
+
+
+class TestParseRange:
+    """Testes para o header Range"""
+
+    @pytest.mark.parametrize(
+        "header, esperado",
+        [
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=-200", (800, 999)),
+            ("bytes=-5000", (0, 999)),
+            ("bytes=900-5000", (900, 999)),
+            (None, None),
+            ("items=0-1", None),
+            ("bytes=0-1,5-9", None),
+            ("bytes=9-3", None),
+            ("bytes=a-b", None),
+        ],
+    )
+    def test_intervals(self, header, esperado):
+        """Test intervalo único, aberto e sufixo; múltiplos ou malformados devolvem o arquivo inteiro"""
+        assert parse_range(header, 1000) == esperado
+
+    def test_unsatisfiable(self):
+        """Test início depois do fim do arquivo é 416"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=1000-", 1000)
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=-0", 1000)
+
+
+class TestResolve:
+    """Testes para a resolução do caminho"""
+
+    def test_path_traversal_and_missing(self, uploads):
+        """Test caminhos fora da pasta, ocultos, diretórios e inexistentes não resolvem"""
+        assert file_delivery.resolve(uploads).size == len(CONTEUDO)
+        assert file_delivery.resolve("/uploads/" + uploads).relative == uploads
+        for caminho in ("../etc/passwd", "documentos/../../x", "documentos/.env", "documentos", "tenant/nada.png", ""):
+            assert file_delivery.resolve(caminho) is None
+
+    def test_immutable_names(self, uploads):
+        """Test nomes com uuid (completo ou sufixo curto) são imutáveis; nomes fixos não"""
+        assert file_delivery.resolve(uploads).immutable is True
+        assert file_delivery.resolve("tenant/logo.png").immutable is False
+
+
+class TestDirectDelivery:
+    """Testes para a entrega pelo worker (sem nginx)"""
+
+    def test_full_body_and_cache_headers(self, uploads, client):
+        """Test corpo em vários blocos, sem gzip, ETag no formato do nginx e cache longo para nome uuid"""
+        response = client.get(f"/uploads/{uploads}", headers={"Accept-Encoding": "gzip"})
+        st = os.stat(file_delivery.resolve(uploads).path)
+
+        assert response.status_code == 200
+        assert response.content == CONTEUDO
+        assert "content-encoding" not in response.headers
+        assert response.headers["content-length"] == str(len(CONTEUDO))
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["etag"] == f'"{int(st.st_mtime):x}-{st.st_size:x}"'
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert client.get("/uploads/tenant/logo.png").headers["cache-control"] == "public, max-age=300"
+
+    def test_range_requests(self, uploads, client):
+        """Test 206 com Content-Range, sufixo, 416 e If-Range desatualizado devolvendo o arquivo inteiro"""
+        parcial = client.get(f"/uploads/{uploads}", headers={"Range": "bytes=4000-8999"})
+        assert parcial.status_code == 206
+        assert parcial.content == CONTEUDO[4000:9000]
+        assert parcial.headers["content-range"] == f"bytes 4000-8999/{len(CONTEUDO)}"
+
+        assert client.get(f"/uploads/{uploads}", headers={"Range": "bytes=-10"}).content == CONTEUDO[-10:]
+
+        fora = client.get(f"/uploads/{uploads}", headers={"Range": "bytes=999999-"})
+        assert fora.status_code == 416
+        assert fora.headers["content-range"] == f"bytes */{len(CONTEUDO)}"
+
+        antigo = client.get(f"/uploads/{uploads}", headers={"Range": "bytes=0-9", "If-Range": '"1-1"'})
+        assert antigo.status_code == 200
+        assert antigo.content == CONTEUDO
+
+    def test_conditional_requests_and_head(self, uploads, client):
+        """Test If-None-Match e If-Modified-Since respondem 304; HEAD sem corpo"""
+        etag = client.get(f"/uploads/{uploads}").headers["etag"]
+
+        assert client.get(f"/uploads/{uploads}", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+        assert client.get(f"/uploads/{uploads}", headers={"If-None-Match": '"outro"'}).status_code == 200
+        futuro = formatdate(time.time() + 60, usegmt=True)
+        assert client.get(f"/uploads/{uploads}", headers={"If-Modified-Since": futuro}).status_code == 304
+
+        head = client.head(f"/uploads/{uploads}")
+        assert head.status_code == 200
+        assert head.content == b""
+        assert head.headers["content-length"] == str(len(CONTEUDO))
+
+    def test_not_found_outside_areas(self, uploads, client):
+        """Test traversal e arquivos inexistentes são 404"""
+        assert client.get("/uploads/documentos/nao-existe.pdf").status_code == 404
+        assert client.get("/uploads/documentos/%2e%2e/%2e%2e/etc/passwd").status_code == 404
+
+
+class TestAccelDelivery:
+    """Testes para a entrega pelo nginx (X-Accel-Redirect)"""
+
+    def test_accel_header_from_nginx(self, uploads, client):
+        """Test com o header do nginx a resposta é vazia e aponta a location internal"""
+        response = client.get(f"/uploads/{uploads}", headers={"X-File-Delivery": "accel", "Range": "bytes=0-9"})
+
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == f"/_protected_uploads/{uploads}"
+        assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+        assert "content-range" not in response.headers
+
+    def test_mode_setting(self, uploads, client, monkeypatch):
+        """Test direct ignora o header; accel vale mesmo sem ele"""
+        monkeypatch.setattr(settings, "FILE_DELIVERY_MODE", "direct")
+        assert client.get(f"/uploads/{uploads}", headers={"X-File-Delivery": "accel"}).content == CONTEUDO
+
+        monkeypatch.setattr(settings, "FILE_DELIVERY_MODE", "accel")
+        assert "x-accel-redirect" in client.get(f"/uploads/{uploads}").headers
+
+
+class TestProtectedAreas:
+    """Testes para a autorização das áreas protegidas"""
+
+    def test_bearer_or_signed_url(self, uploads, client, monkeypatch):
+        """Test sem credencial 401; Bearer válido ou link assinado liberam, com cache privado"""
+        monkeypatch.setattr(settings, "FILE_PROTECTED_AREAS", ["documentos"])
+
+        assert client.get(f"/uploads/{uploads}").status_code == 401
+        assert client.get("/uploads/tenant/logo.png").status_code == 200
+
+        token = create_access_token({"sub": "1", "tenant_id": 1, "role": 1})
+        autenticado = client.get(f"/uploads/{uploads}", headers={"Authorization": f"Bearer {token}"})
+        assert autenticado.status_code == 200
+        assert autenticado.headers["cache-control"].startswith("private,")
+
+        assert client.get(file_delivery.signed_url(uploads)).content == CONTEUDO
+        expirado = file_delivery.signed_url(uploads, ttl_seconds=-10)
+        assert client.get(expirado).status_code == 401
+        outro = file_delivery.signed_url("documentos/outro.pdf").split("?")[1]
+        assert client.get(f"/uploads/{uploads}?{outro}").status_code == 401
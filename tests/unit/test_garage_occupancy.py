@@ -0,0 +1,133 @@
+"""
+Testes unitários para app/services/garage_occupancy.py
+"""
+
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.schemas.portaria import VagaGaragemResponse
+from app.services.garage_occupancy import GarageOccupancyService, TenantGarage
+
+
+def _spot(id, numero, status="livre", tipo="fixa", mapa_id=None, is_active=True):
+    return VagaGaragemResponse(
+        id=id,
+        tenant_id=1,
+        numero=numero,
+        tipo=tipo,
+        mapa_id=mapa_id,
+        status=status,
+        is_active=is_active,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def _row(spot):
+    row = MagicMock()
+    row._mapping = spot.model_dump()
+    return row
+
+
+def _result(*rows):
+    result = MagicMock()
+    result.fetchall.return_value = list(rows)
+    result.fetchone.return_value = rows[0] if rows else None
+    return result
+
+
+class TestTenantGarage:
+    """Testes para os contadores e o mapa em memória"""
+
+    def test_occupancy_counters(self):
+        """Test contagem por status e por tipo"""
+        garage = TenantGarage(
+            [_spot(1, "01", "ocupada"), _spot(2, "02"), _spot(3, "03", "manutencao", tipo="pcd"), _spot(4, "04")]
+        )
+
+        occupancy = garage.occupancy()
+
+        assert (occupancy.total_vagas, occupancy.vagas_ocupadas, occupancy.vagas_livres) == (4, 1, 2)
+        assert occupancy.vagas_manutencao == 1
+        assert occupancy.ocupacao_percentual == 25.0
+        assert occupancy.por_tipo == {"fixa": 3, "pcd": 1}
+
+    def test_apply_adjusts_counters(self):
+        """Test que ocupar e remover vagas ajusta os contadores sem recontar"""
+        garage = TenantGarage([_spot(1, "01"), _spot(2, "02")])
+
+        garage.apply(1, _spot(1, "01", "ocupada"))
+        garage.apply(2, _spot(2, "02", is_active=False))
+
+        occupancy = garage.occupancy()
+        assert (occupancy.total_vagas, occupancy.vagas_ocupadas, occupancy.vagas_livres) == (1, 1, 0)
+        assert occupancy.por_tipo == {"fixa": 1}
+
+    def test_maps_grouped_and_ordered(self):
+        """Test agrupamento por mapa, vagas sem mapa no principal e ordem por número"""
+        garage = TenantGarage([_spot(1, "B2", mapa_id="1"), _spot(2, "A1", "ocupada", mapa_id="1"), _spot(3, "X")])
+
+        maps = garage.maps()
+
+        assert [(item.mapa_id, item.nome) for item in maps] == [("1", "Andar 1"), ("principal", "Garagem Principal")]
+        assert [vaga.numero for vaga in maps[0].vagas] == ["A1", "B2"]
+        assert maps[0].ocupacao_percentual == 50.0
+
+    def test_rendered_map_invalidated_on_change(self):
+        """Test que o JSON pré-renderizado é reaproveitado até a próxima mudança"""
+        garage = TenantGarage([_spot(1, "01")])
+
+        first = garage.render_maps()
+        assert garage.render_maps() is first
+
+        garage.apply(1, _spot(1, "01", "ocupada"))
+        assert json.loads(garage.render_maps())[0]["vagas"][0]["status"] == "ocupada"
+
+
+class TestGarageOccupancyService:
+    """Testes para carga e atualização por condomínio"""
+
+    @pytest.mark.asyncio
+    async def test_loads_once_within_ttl(self):
+        """Test que o estado é carregado uma vez e servido da memória"""
+        service = GarageOccupancyService(ttl_seconds=30)
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_result(_row(_spot(1, "01", "ocupada")), _row(_spot(2, "02"))))
+
+        await service.occupancy(db, 1)
+        occupancy = await service.occupancy(db, 1)
+
+        assert db.execute.await_count == 1
+        assert occupancy.ocupacao_percentual == 50.0
+
+    @pytest.mark.asyncio
+    async def test_refresh_spot_pushes_change(self, monkeypatch):
+        """Test que a vaga alterada é relida e enviada aos clientes do condomínio"""
+        send = AsyncMock()
+        monkeypatch.setattr("app.services.garage_occupancy.manager.send_to_tenant", send)
+        service = GarageOccupancyService()
+        service._garages[1] = TenantGarage([_spot(1, "01")])
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_result(_row(_spot(1, "01", "ocupada"))))
+
+        await service.refresh_spot(db, 1, 1)
+
+        message = send.await_args.args[1]
+        assert message["type"] == "garage_spot_update"
+        assert message["data"]["vaga"]["status"] == "ocupada"
+        assert message["data"]["ocupacao"]["vagas_ocupadas"] == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_removed_spot(self, monkeypatch):
+        """Test que vaga excluída sai do estado"""
+        monkeypatch.setattr("app.services.garage_occupancy.manager.send_to_tenant", AsyncMock())
+        service = GarageOccupancyService()
+        service._garages[1] = TenantGarage([_spot(1, "01")])
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_result(_row(_spot(1, "01", is_active=False))))
+
+        await service.refresh_spot(db, 1, 1)
+
+        assert len(service._garages[1]) == 0
@@ -0,0 +1,284 @@
+"""
+Testes unitários para app/services/health_probe.py
+
+Os equipamentos são servidores HTTP locais (asyncio) que simulam atraso,
+status e autenticação.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import settings
+from app.services.health_probe import (
+    GENERIC_PROBE,
+    VENDOR_PROBES,
+    HealthProbeService,
+    ProbeTarget,
+    RttEstimator,
+    classify,
+    integracao_target,
+    ponto_target,
+)
+
+
+class StandInDevice:
+    """Equipamento falso: responde com status após um atraso, mantendo a conexão"""
+
+    def __init__(self, status_code=200, delay=0.0):
+        self.status_code = status_code
+        self.delay = delay
+        self.connections = 0
+        self.requests = []
+        self.server = None
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.requests.append(head.split(b"\r\n", 1)[0].decode())
+                await asyncio.sleep(self.delay)
+                writer.write(
+                    f"HTTP/1.1 {self.status_code} X\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok".encode()
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+
+@pytest.fixture
+async def service():
+    service = HealthProbeService(ttl_seconds=30)
+    yield service
+    await service.close()
+
+
+def _target(device, probe=GENERIC_PROBE, id=1):
+    return ProbeTarget("ponto", id, device.url + probe.path, probe)
+
+
+def _result(rows):
+    result = MagicMock()
+    result.fetchall.return_value = rows
+    return result
+
+
+class TestVendorProbes:
+    """Testes para as sondas por parceiro"""
+
+    def test_classify(self):
+        """Test 2xx online, 401 credenciais, 404 só é online na sonda genérica"""
+        linear = VENDOR_PROBES["linear"]
+
+        assert classify(linear, 200) == ("online", None)
+        assert classify(linear, 401)[0] == "erro"
+        assert "Credenciais" in classify(linear, 401)[1]
+        assert classify(linear, 404) == ("erro", "HTTP 404")
+        assert classify(GENERIC_PROBE, 404) == ("online", None)
+        assert classify(GENERIC_PROBE, 503) == ("erro", "HTTP 503")
+
+    def test_targets_from_config(self):
+        """Test URL, autenticação e health_path da integração; ponto sem IP não é verificado"""
+        hik = SimpleNamespace(id=1, parceiro="hikvision", config={"base_url": "http://cam/", "username": "admin"})
+        custom = SimpleNamespace(id=2, parceiro="nice", config={"base_url": "http://gate", "health_path": "/ping"})
+        ponto = SimpleNamespace(id=3, ip_address="10.0.0.5", porta=8080, status="online")
+
+        assert integracao_target(hik).url == "http://cam/ISAPI/System/status"
+        assert type(integracao_target(hik).auth).__name__ == "DigestAuth"
+        assert integracao_target(custom).url == "http://gate/ping"
+        assert integracao_target(SimpleNamespace(id=4, parceiro="nice", config={})) is None
+        assert ponto_target(ponto).url == "http://10.0.0.5:8080/"
+        assert ponto_target(SimpleNamespace(id=5, ip_address=None, porta=None, status="online")) is None
+        assert ponto_target(SimpleNamespace(id=6, ip_address="10.0.0.6", porta=None, status="manutencao")) is None
+
+
+class TestAdaptiveTimeout:
+    """Testes para o timeout adaptativo"""
+
+    def test_estimator_converges_and_backs_off(self):
+        """Test respostas rápidas reduzem o timeout ao mínimo; timeouts dobram o prazo"""
+        estimator = RttEstimator()
+        assert estimator.timeout() == settings.HEALTH_PROBE_TIMEOUT_INITIAL_SECONDS
+
+        for _ in range(10):
+            estimator.observe(0.01)
+        assert estimator.timeout() == settings.HEALTH_PROBE_TIMEOUT_MIN_SECONDS
+
+        estimator.observe(1.0)
+        slow = estimator.timeout()
+        estimator.on_timeout()
+        assert estimator.timeout() == min(slow * 2, settings.HEALTH_PROBE_TIMEOUT_MAX_SECONDS)
+
+    @pytest.mark.asyncio
+    async def test_slow_device_times_out_after_retry(self, service, monkeypatch):
+        """Test equipamento mais lento que o prazo: duas tentativas e offline"""
+        monkeypatch.setattr(settings, "HEALTH_PROBE_TIMEOUT_INITIAL_SECONDS", 0.05)
+        monkeypatch.setattr(settings, "HEALTH_PROBE_TIMEOUT_MIN_SECONDS", 0.05)
+
+        async with StandInDevice(delay=0.5) as device:
+            target = _target(device)
+            result = await service.probe(target)
+
+        assert result.status == "offline"
+        assert result.tentativas == 2
+        assert "Timeout" in result.erro
+        assert service.timeout_for(target.url) == pytest.approx(0.2)
+
+
+class TestProbe:
+    """Testes para a verificação dos equipamentos"""
+
+    @pytest.mark.asyncio
+    async def test_vendor_probe_request(self, service):
+        """Test sonda Control iD: POST no endpoint do parceiro"""
+        async with StandInDevice() as device:
+            result = await service.probe(_target(device, VENDOR_PROBES["controlid"]))
+
+        assert result.is_online
+        assert result.http_status == 200
+        assert result.latencia_ms is not None
+        assert device.requests == ["POST /system_information.fcgi HTTP/1.1"]
+
+    @pytest.mark.asyncio
+    async def test_connection_refused_is_offline(self, service):
+        """Test porta fechada: offline sem nova tentativa"""
+        async with StandInDevice() as device:
+            url = device.url
+        result = await service.probe(ProbeTarget("ponto", 1, url + "/", GENERIC_PROBE))
+
+        assert result.status == "offline"
+        assert result.tentativas == 1
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, service):
+        """Test verificações seguidas usam a mesma conexão do pool"""
+        async with StandInDevice() as device:
+            for _ in range(5):
+                assert (await service.probe(_target(device))).is_online
+
+        assert len(device.requests) == 5
+        assert device.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_fan_out_is_concurrent(self, service):
+        """Test 20 equipamentos de 200 ms verificados juntos em bem menos que 4 s"""
+        devices = [StandInDevice(delay=0.2) for _ in range(20)]
+        for device in devices:
+            await device.__aenter__()
+        try:
+            started = time.perf_counter()
+            results = await service.probe_many([_target(d, id=i) for i, d in enumerate(devices)])
+            elapsed = time.perf_counter() - started
+        finally:
+            for device in devices:
+                await device.__aexit__()
+
+        assert len(results) == 20
+        assert all(result.is_online for result in results.values())
+        assert elapsed < 1.0
+
+
+class TestTenantCache:
+    """Testes para o cache de status por condomínio"""
+
+    @pytest.mark.asyncio
+    async def test_check_tenant_caches_and_persists(self, service):
+        """Test pontos e integrações verificados uma vez; leituras seguintes vêm do cache"""
+        async with StandInDevice() as up, StandInDevice(status_code=401) as locked:
+            host, port = up.url.rsplit(":", 1)
+            pontos = [
+                SimpleNamespace(
+                    id=1,
+                    codigo="P1",
+                    nome="Portão",
+                    status="offline",
+                    last_ping_at=None,
+                    ip_address=host,
+                    porta=int(port),
+                    visivel=True,
+                ),
+                SimpleNamespace(
+                    id=2,
+                    codigo="P2",
+                    nome="Eclusa",
+                    status="online",
+                    last_ping_at=datetime(2026, 1, 1),
+                    ip_address=None,
+                    porta=None,
+                    visivel=True,
+                ),
+                SimpleNamespace(
+                    id=3,
+                    codigo="P3",
+                    nome="Oculto",
+                    status="offline",
+                    last_ping_at=None,
+                    ip_address=None,
+                    porta=None,
+                    visivel=False,
+                ),
+            ]
+            integracoes = [
+                SimpleNamespace(id=7, parceiro="linear", nome_exibicao="Linear", config={"base_url": locked.url})
+            ]
+            db = AsyncMock()
+            db.execute.side_effect = [_result(pontos), _result(integracoes), MagicMock(), MagicMock()]
+
+            status = await service.pontos_status(db, 2)
+            again = await service.pontos_status(db, 2)
+            integracoes_status = await service.integracoes_status(db, 2)
+
+        assert [(p.id, p.status, p.fonte) for p in status] == [(1, "online", "sonda"), (2, "online", "heartbeat")]
+        assert status[0].last_ping_at is not None
+        assert again == status
+        assert integracoes_status[0].status == "erro"
+        assert "Credenciais" in integracoes_status[0].erro
+
+        statements = [str(call.args[0]) for call in db.execute.await_args_list]
+        assert len(statements) == 4
+        assert "UPDATE pontos_acesso" in statements[2]
+        assert db.execute.await_args_list[2].args[1]["ids"] == [1]
+        assert "UPDATE integracoes_hardware" in statements[3]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_and_invalidate(self, service):
+        """Test ping do hardware atualiza o cache; invalidate força nova verificação"""
+        ponto = SimpleNamespace(
+            id=1,
+            codigo="P1",
+            nome="Portão",
+            status="online",
+            last_ping_at=None,
+            ip_address=None,
+            porta=None,
+            visivel=True,
+        )
+        db = AsyncMock()
+        db.execute.side_effect = lambda *args, **kwargs: _result([ponto] if "pontos_acesso" in str(args[0]) else [])
+
+        await service.pontos_status(db, 2)
+        service.record_heartbeat(2, 1, "erro")
+        [status] = await service.pontos_status(db, 2)
+        assert (status.status, status.is_online) == ("erro", False)
+
+        service.invalidate(2)
+        [status] = await service.pontos_status(db, 2)
+        assert status.status == "online"
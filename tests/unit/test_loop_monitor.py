@@ -0,0 +1,110 @@
+"""
+Testes unitários para app/services/loop_monitor.py (atraso e bloqueios do event loop)
+"""
+
+import asyncio
+import sys
+import time
+
+from prometheus_client import REGISTRY
+
+from app.services.loop_monitor import LoopMonitor, request_from_stack
+
+
+class _Route:
+    path = "/api/v1/auth/login"
+
+
+def _handler_blocking(seconds: float):
+    """Simula um endpoint com chamada síncrona (scope local como no Starlette)"""
+    scope = {"type": "http", "method": "POST", "route": _Route(), "path": "/x", "state": {"request_id": "ab12cd34"}}
+    time.sleep(seconds)
+    return scope
+
+
+def _run(coro_factory):
+    # Loop próprio: o bloqueio proposital não conta para o monitor da suíte (LOOP_BLOCK_FAIL_MS)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro_factory())
+    finally:
+        loop.close()
+
+
+class TestRequestFromStack:
+    """Testes para a descoberta da requisição pela pilha"""
+
+    def test_finds_scope_in_outer_frame(self):
+        """Test rota do scope (template), método e request_id"""
+
+        def endpoint():
+            return sys._getframe()
+
+        def app(scope):
+            return endpoint()
+
+        frame = app({"type": "http", "method": "GET", "route": _Route(), "state": {"request_id": "ff00"}})
+
+        assert request_from_stack(frame) == ("GET", "/api/v1/auth/login", "ff00")
+
+    def test_without_request(self):
+        """Test fora de requisição (ex.: tarefa de fundo)"""
+        assert request_from_stack(sys._getframe()) == (None, None, None)
+
+
+class TestLoopMonitor:
+    """Testes para o tick e a thread de vigilância"""
+
+    def test_detects_blocking_call(self):
+        """Test bloqueio acima do limite registra a pilha e a rota em execução"""
+        monitor = LoopMonitor()
+        monitor.collect = True
+
+        async def scenario():
+            monitor.start(interval=0.01, threshold_ms=50)
+            await asyncio.sleep(0.05)
+            _handler_blocking(0.25)
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        _run(scenario)
+        [block] = monitor.drain()
+
+        assert block.method == "POST"
+        assert block.route == "/api/v1/auth/login"
+        assert block.request_id == "ab12cd34"
+        assert "_handler_blocking" in block.stack
+        assert block.duration_ms >= 200
+        assert monitor.drain() == []
+
+    def test_no_block_when_awaiting(self):
+        """Test espera assíncrona longa não é bloqueio e o atraso vai para o histograma"""
+        monitor = LoopMonitor()
+        monitor.collect = True
+        before = REGISTRY.get_sample_value("event_loop_lag_seconds_count") or 0
+
+        async def scenario():
+            monitor.start(interval=0.01, threshold_ms=50)
+            await asyncio.sleep(0.2)
+            await monitor.stop()
+
+        _run(scenario)
+
+        assert monitor.drain() == []
+        assert REGISTRY.get_sample_value("event_loop_lag_seconds_count") > before
+
+    def test_stopped_loop_is_not_lag(self):
+        """Test tempo com o loop parado (entre run_until_complete) não conta como bloqueio"""
+        monitor = LoopMonitor()
+        monitor.collect = True
+        loop = asyncio.new_event_loop()
+        try:
+            monitor.start(loop, interval=0.01, threshold_ms=50)
+            loop.run_until_complete(asyncio.sleep(0.03))
+            time.sleep(0.2)
+            loop.run_until_complete(asyncio.sleep(0.05))
+            loop.run_until_complete(monitor.stop())
+        finally:
+            loop.close()
+
+        assert monitor.drain() == []
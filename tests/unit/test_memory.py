@@ -0,0 +1,152 @@
+"""
+Testes unitários para a observabilidade de memória (app/services/memory.py e benchmarks/soak.py)
+"""
+
+import os
+import tracemalloc
+
+import pytest
+
+from app.services.memory import MemoryCollector, MemoryService
+from benchmarks.soak import Sample, Slice, linear_slope, render_html, summarize
+
+_retained = []
+
+
+def _allocate_leak():
+    """Alocação identificável no diff"""
+    _retained.append([bytearray(1024) for _ in range(2000)])
+
+
+class TestMemoryService:
+    """Testes para estatísticas e snapshots do tracemalloc"""
+
+    @pytest.fixture(autouse=True)
+    def _stop_tracing(self):
+        was_tracing = tracemalloc.is_tracing()
+        yield
+        _retained.clear()
+        if not was_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_stats(self):
+        """Test RSS e blocos do Python do processo atual"""
+        stats = MemoryService().stats()
+
+        assert stats["pid"] == os.getpid()
+        assert stats["rss_bytes"] > 0
+        assert stats["python_allocated_blocks"] > 0
+        assert stats["tracemalloc"]["snapshots"] == 0
+
+    def test_snapshot_requires_tracing(self):
+        """Test snapshot com o tracemalloc desligado"""
+        if tracemalloc.is_tracing():
+            pytest.skip("tracemalloc ligado pelo ambiente (PYTHONTRACEMALLOC)")
+        with pytest.raises(RuntimeError):
+            MemoryService().take_snapshot()
+
+    def test_diff_points_to_allocation_site(self):
+        """Test o local que mais cresceu entre dois snapshots é a alocação do teste"""
+        service = MemoryService(max_snapshots=5)
+        service.start_tracing(frames=1)
+        base = service.take_snapshot()
+        _allocate_leak()
+        current = service.take_snapshot()
+
+        diff = service.diff(base, current, limit=3)
+
+        assert diff["base"] == base.id and diff["current"] == current.id
+        assert diff["size_diff_bytes"] >= 2000 * 1024
+        assert "test_memory.py" in diff["top"][0]["location"][0]
+        assert diff["top"][0]["count_diff"] >= 2000
+
+    def test_keeps_most_recent_snapshots(self):
+        """Test limite de snapshots por worker e descarte ao desligar"""
+        service = MemoryService(max_snapshots=2)
+        service.start_tracing(frames=1)
+        ids = [service.take_snapshot().id for _ in range(3)]
+
+        assert [item["id"] for item in service.list_snapshots()] == ids[1:]
+        assert service.get_snapshot(ids[0]) is None
+        assert all(snapshot_id.startswith(f"{os.getpid()}-") for snapshot_id in ids)
+
+        service.stop_tracing()
+        assert service.list_snapshots() == []
+
+    def test_collector_metrics(self):
+        """Test métricas do worker com o pid como label"""
+        families = {family.name: family for family in MemoryCollector(MemoryService()).collect()}
+
+        assert {"worker_resident_memory_bytes", "python_heap_allocated_blocks"} <= set(families)
+        [sample] = families["worker_resident_memory_bytes"].samples
+        assert sample.labels == {"pid": str(os.getpid())}
+
+
+def _slice(endpoint, cycle, rss_start, rss_end, requests=100):
+    return Slice(
+        endpoint=endpoint,
+        cycle=cycle,
+        started=cycle * 10.0,
+        ended=cycle * 10.0 + 5,
+        requests=requests,
+        errors=0,
+        rss_start=rss_start,
+        rss_end=rss_end,
+        blocks_start=0,
+        blocks_end=10,
+    )
+
+
+class TestSoakSummary:
+    """Testes para o resumo do soak test"""
+
+    def test_linear_slope(self):
+        """Test inclinação por mínimos quadrados"""
+        assert linear_slope([(0, 10), (1, 12), (2, 14)]) == pytest.approx(2.0)
+        assert linear_slope([(5, 1)]) == 0.0
+
+    def test_growth_per_endpoint_skips_warmup(self):
+        """Test crescimento atribuído por endpoint sem a volta de aquecimento"""
+        slices = [
+            _slice("a", 0, 100, 5_000),  # aquecimento
+            _slice("b", 0, 5_000, 5_100),
+            _slice("a", 1, 5_100, 6_100),
+            _slice("b", 1, 6_100, 6_000),
+            _slice("a", 2, 6_000, 7_000),
+            _slice("b", 2, 7_000, 7_000),
+        ]
+        samples = [
+            Sample(t=t, pid=1, rss_bytes=1000 + 100 * t, allocated_blocks=0, traced_bytes=0, endpoint="a")
+            for t in range(30)
+        ]
+
+        summary = summarize(samples, slices, warmup_cycles=1)
+
+        assert list(summary["endpoints"]) == ["a", "b"]
+        assert summary["endpoints"]["a"]["rss_growth_bytes"] == 2_000
+        assert summary["endpoints"]["a"]["bytes_per_request"] == 10.0
+        assert summary["endpoints"]["a"]["cycles_growing"] == 2
+        assert summary["endpoints"]["b"]["rss_growth_bytes"] == -100
+        assert summary["rss_slope_bytes_per_hour"] == 360_000
+        assert summary["pids"] == [1]
+
+    def test_render_html(self):
+        """Test relatório HTML com o gráfico e a tabela"""
+        slices = [_slice("a", 0, 0, 1024 * 1024)]
+        samples = [
+            Sample(t=t, pid=1, rss_bytes=t * 1024 * 1024, allocated_blocks=0, traced_bytes=0, endpoint="a")
+            for t in range(5)
+        ]
+        report = {
+            "duration_s": 60,
+            "slice_s": 5,
+            "concurrency": 4,
+            "samples": [sample.__dict__ for sample in samples],
+            "slices": [item.__dict__ for item in slices],
+            "summary": summarize(samples, slices, warmup_cycles=0),
+        }
+
+        html = render_html(report)
+
+        assert "<svg" in html and "<polyline" in html
+        assert "<td>a</td>" in html
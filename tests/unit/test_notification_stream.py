@@ -0,0 +1,226 @@
+"""
+Testes unitários para app/services/notification_stream.py
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from app.services.cache import cache
+from app.services.notification_stream import NotificationStreamService, counter_key, stream_key
+
+
+def _notificacao(nid: int, user_id: int = 925, tenant_id: int = 2):
+    """Linha do RETURNING de NotificationService (actions ainda como texto JSON)"""
+    return {
+        "id": nid,
+        "tenant_id": tenant_id,
+        "user_id": user_id,
+        "type": "delivery",
+        "category": "info",
+        "priority": 3,
+        "title": f"Notificação {nid}",
+        "message": "Retire na portaria",
+        "icon": "package",
+        "color": "#22c55e",
+        "reference_type": "package",
+        "reference_id": nid,
+        "actions": '[{"label": "Confirmar retirada", "action": "confirm"}]',
+        "created_at": datetime(2026, 3, 1, 8, 0),
+    }
+
+
+def _db(total: int):
+    result = MagicMock()
+    result.scalar.return_value = total
+    db = AsyncMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+def _parse(chunk: str):
+    """Campos de um evento SSE"""
+    campos = {}
+    for linha in chunk.strip().splitlines():
+        nome, _, valor = linha.partition(": ")
+        campos[nome] = valor
+    return campos
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+@pytest.fixture
+def redis(monkeypatch, server):
+    client = FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(cache, "_client", client)
+    return client
+
+
+@pytest.fixture
+def service(server, redis, monkeypatch):
+    """Serviço novo por teste; quem abre conexões chama _stop() no próprio loop do teste"""
+    monkeypatch.setattr("app.services.notification_stream.settings.NOTIFICATION_SSE_BLOCK_MS", 20)
+    return NotificationStreamService(reader_factory=lambda: FakeRedis(server=server, decode_responses=True))
+
+
+async def _stop(service: NotificationStreamService):
+    """Encerra o leitor depois que o XREAD BLOCK em andamento termina (o fakeredis não cancela o bloqueio)"""
+    for conexao in [c for conexoes in service._conexoes.values() for c in conexoes]:
+        service._unsubscribe(conexao)
+    await asyncio.sleep(0.05)
+    await service.stop()
+
+
+class TestUnreadCounter:
+    """Testes para o contador de não lidas"""
+
+    @pytest.mark.asyncio
+    async def test_counts_once_then_increments(self, redis, service):
+        """Test só a primeira leitura consulta o banco; criações e leituras ajustam o contador"""
+        db = _db(4)
+        assert await service.unread(db, 2, 925) == 4
+
+        await service.notify_created([_notificacao(1), _notificacao(2)])
+        await service.adjust(2, 925, -3, [1, 2, 3])
+
+        assert await service.unread(db, 2, 925) == 3
+        assert db.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_increment_without_count_is_not_trusted(self, redis, service):
+        """Test HINCRBY sobre contador expirado não vale: a próxima leitura reconta no banco"""
+        await service.notify_created([_notificacao(1)])
+        assert await redis.hget(counter_key(2, 925), "unread") == "1"
+
+        db = _db(7)
+        assert await service.unread(db, 2, 925) == 7
+        db.execute.assert_awaited_once()
+
+        await service.invalidate(2)
+        assert await redis.exists(counter_key(2, 925)) == 0
+
+    @pytest.mark.asyncio
+    async def test_increment_during_recount_is_not_lost(self, redis, service):
+        """Test notificação somada entre o COUNT e o HSET: o total recontado é descartado e a próxima leitura reconta"""
+        result = MagicMock()
+        result.scalar.return_value = 4
+
+        async def count_racing_with_notification(statement, params):
+            await service.notify_created([_notificacao(9)])
+            return result
+
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=count_racing_with_notification)
+        assert await service.unread(db, 2, 925) == 4
+        assert await redis.hget(counter_key(2, 925), "ok") is None
+
+        assert await service.unread(_db(5), 2, 925) == 5
+        assert await redis.hmget(counter_key(2, 925), ["ok", "unread"]) == ["1", "5"]
+
+    @pytest.mark.asyncio
+    async def test_without_redis(self, monkeypatch):
+        """Test sem Redis o total vem do banco e os eventos são ignorados"""
+        monkeypatch.setattr(cache, "_client", None)
+        service = NotificationStreamService()
+
+        assert await service.unread(_db(5), 2, 925) == 5
+        await service.notify_created([_notificacao(1)])
+        await service.adjust(2, 925, -1, [1])
+
+
+class TestEvents:
+    """Testes para o stream de eventos e a reposição por Last-Event-ID"""
+
+    @pytest.mark.asyncio
+    async def test_events_carry_notification_and_total(self, redis, service):
+        """Test nova notificação e leitura viram eventos com o total atualizado"""
+        await service.unread(_db(0), 2, 925)
+        await service.notify_created([_notificacao(1), _notificacao(2, user_id=926)])
+        await service.adjust(2, 925, -1, [1])
+
+        entries = await redis.xrange(stream_key(2, 925))
+        assert [fields["event"] for _, fields in entries] == ["notification", "read"]
+        criada = json.loads(entries[0][1]["data"])
+        assert criada["unread"] == 1
+        assert criada["notification"]["id"] == 1
+        assert criada["notification"]["actions"] == [{"label": "Confirmar retirada", "action": "confirm"}]
+        assert json.loads(entries[1][1]["data"]) == {"ids": [1], "unread": 0}
+        assert await redis.xlen(stream_key(2, 926)) == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_after_last_event_id(self, redis, service):
+        """Test reposição devolve só o que veio depois do id; id que saiu do stream indica lacuna"""
+        await service.notify_created([_notificacao(i) for i in range(1, 4)])
+        ids = [entry_id for entry_id, _ in await redis.xrange(stream_key(2, 925))]
+
+        entries, posicao, lacuna = await service.replay(2, 925, ids[0])
+        assert [entry_id for entry_id, _ in entries] == ids[1:]
+        assert posicao == ids[-1]
+        assert not lacuna
+
+        await redis.xdel(stream_key(2, 925), ids[0])
+        entries, _, lacuna = await service.replay(2, 925, ids[0])
+        assert len(entries) == 2
+        assert lacuna
+
+        assert await service.replay(2, 925, None) == ([], ids[-1], False)
+
+    @pytest.mark.asyncio
+    async def test_sse_connection_resumes_and_receives_live_events(self, redis, service):
+        """Test conexão envia retry, total, eventos perdidos e depois os novos, entregues pelo leitor do worker"""
+        await service.notify_created([_notificacao(1), _notificacao(2)])
+        primeiro = (await redis.xrange(stream_key(2, 925)))[0][0]
+
+        stream = service.events(2, 925, 5, primeiro)
+        try:
+            assert await stream.__anext__() == "retry: 3000\n\n"
+            assert _parse(await stream.__anext__()) == {"event": "unread", "data": '{"unread": 5}'}
+            perdido = _parse(await stream.__anext__())
+            assert json.loads(perdido["data"])["notification"]["id"] == 2
+            assert service.connections == 1
+
+            await service.notify_created([_notificacao(3)])
+            novo = _parse(await asyncio.wait_for(stream.__anext__(), timeout=2))
+            assert novo["event"] == "notification"
+            assert novo["id"] == (await redis.xrange(stream_key(2, 925)))[-1][0]
+            assert json.loads(novo["data"])["notification"]["id"] == 3
+
+            await stream.aclose()
+            assert service.connections == 0
+        finally:
+            await _stop(service)
+
+    @pytest.mark.asyncio
+    async def test_gap_sends_reset(self, redis, service):
+        """Test Last-Event-ID fora do stream: evento reset para o cliente recarregar a lista"""
+        await service.notify_created([_notificacao(1)])
+
+        stream = service.events(2, 925, 1, "1-0")
+        try:
+            await stream.__anext__()
+            assert _parse(await stream.__anext__()) == {"event": "reset", "data": "{}"}
+            await stream.aclose()
+        finally:
+            await _stop(service)
+
+    @pytest.mark.asyncio
+    async def test_slow_client_is_disconnected(self, redis, service, monkeypatch):
+        """Test fila cheia encerra a conexão (o EventSource reconecta e repõe pelo Last-Event-ID)"""
+        monkeypatch.setattr("app.services.notification_stream.settings.NOTIFICATION_SSE_QUEUE_SIZE", 1)
+        conexao = service._subscribe(stream_key(2, 925), "0-0")
+        try:
+            service._deliver(stream_key(2, 925), [("1-0", {}), ("2-0", {})])
+
+            assert not conexao.ativa
+            assert conexao.queue.qsize() == 1
+            assert service.connections == 0
+        finally:
+            await _stop(service)
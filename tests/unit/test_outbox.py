@@ -0,0 +1,325 @@
+"""
+Testes unitários para app/services/outbox.py
+"""
+
+import asyncio
+import json
+import smtplib
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.services.outbox import (
+    CANAL_EMAIL,
+    CANAL_NOTIFICACAO,
+    CANAL_WEBHOOK,
+    Canal,
+    EmailCanal,
+    Falha,
+    Mensagem,
+    NotificacaoCanal,
+    OutboxService,
+    WebhookCanal,
+    backoff_seconds,
+)
+
+
+def _mensagem(id, canal=CANAL_WEBHOOK, tentativas=1, **payload):
+    return Mensagem(id, canal, 2, payload, tentativas, datetime.now())
+
+
+def _session():
+    """Sessão falsa com begin_nested() (savepoint que não engole exceções)"""
+    db = AsyncMock()
+    db.info = {}
+    savepoint = MagicMock()
+    savepoint.__aenter__ = AsyncMock()
+    savepoint.__aexit__ = AsyncMock(return_value=False)
+    db.begin_nested = MagicMock(return_value=savepoint)
+    return db
+
+
+class FakeSMTP:
+    """Servidor SMTP falso: registra as mensagens e recusa destinatários marcados"""
+
+    def __init__(self, recusados=(), cair_em=None):
+        self.enviadas = []
+        self.recusados = set(recusados)
+        self.cair_em = cair_em
+        self.fechada = False
+
+    def noop(self):
+        if self.fechada:
+            raise smtplib.SMTPServerDisconnected("fechada")
+        return (250, b"OK")
+
+    def send_message(self, email):
+        if email["To"] == self.cair_em:
+            self.fechada = True
+            raise smtplib.SMTPServerDisconnected("conexão perdida")
+        if email["To"] in self.recusados:
+            raise smtplib.SMTPRecipientsRefused({email["To"]: (550, b"no such user")})
+        self.enviadas.append(email)
+
+    def quit(self):
+        self.fechada = True
+
+
+class TestBackoff:
+    """Testes para o atraso entre tentativas"""
+
+    def test_exponential_with_jitter_and_cap(self, monkeypatch):
+        """Test dobra a cada tentativa, entre 50% e 100% do valor, limitado ao máximo"""
+        monkeypatch.setattr(settings, "OUTBOX_BACKOFF_SECONDS", 10.0)
+        monkeypatch.setattr(settings, "OUTBOX_BACKOFF_MAX_SECONDS", 60.0)
+
+        assert 5.0 <= backoff_seconds(1) <= 10.0
+        assert 20.0 <= backoff_seconds(3) <= 40.0
+        assert 30.0 <= backoff_seconds(10) <= 60.0
+
+
+class TestFinish:
+    """Testes para a gravação do resultado de um lote"""
+
+    @pytest.mark.asyncio
+    async def test_sent_retry_and_dead_letter(self, monkeypatch):
+        """Test enviada, falha temporária, falha definitiva e limite de tentativas"""
+        monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 3)
+        mensagens = [_mensagem(1), _mensagem(2), _mensagem(3), _mensagem(4, tentativas=3)]
+        falhas = {2: Falha("HTTP 503"), 3: Falha("HTTP 404", definitiva=True), 4: Falha("HTTP 503")}
+        db = AsyncMock()
+
+        totais = await OutboxService(canais=[]).finish(db, mensagens, falhas)
+
+        assert totais == {"enviado": 1, "retentativa": 1, "morta": 2}
+        enviado, retentativa, morta = db.execute.await_args_list
+        assert "status = 'enviado'" in str(enviado.args[0])
+        assert enviado.args[1] == {"ids": [1]}
+        assert [p["id"] for p in retentativa.args[1]] == [2]
+        assert [(p["id"], p["erro"]) for p in morta.args[1]] == [(3, "HTTP 404"), (4, "HTTP 503")]
+
+
+class TestNotificacaoCanal:
+    """Testes para o canal de notificações"""
+
+    @pytest.mark.asyncio
+    async def test_one_insert_for_the_batch(self):
+        """Test linhas de todos os destinatários do lote em uma única execução; payload inválido é definitivo"""
+        base = {"notification_type": "delivery_arrived", "title": "Encomenda", "message": "Retire na portaria"}
+        mensagens = [
+            _mensagem(1, CANAL_NOTIFICACAO, user_ids=[10, 11], **base),
+            _mensagem(2, CANAL_NOTIFICACAO, user_ids=[12], **base),
+            _mensagem(3, CANAL_NOTIFICACAO, user_ids=[13]),
+        ]
+        db = _session()
+        db.execute.return_value = MagicMock()
+
+        falhas = await NotificacaoCanal().entregar(db, mensagens)
+
+        assert list(falhas) == [3]
+        assert falhas[3].definitiva
+        db.execute.assert_awaited_once()
+        rows = json.loads(db.execute.await_args.args[1]["rows"])
+        assert [row["user_id"] for row in rows] == [10, 11, 12]
+        assert rows[0]["type"] == "delivery"
+        assert rows[0]["tenant_id"] == 2
+
+    @pytest.mark.asyncio
+    async def test_confirm_publishes_inserted_rows(self, monkeypatch):
+        """Test linhas devolvidas pelo INSERT só vão para o stream em confirmar(), após o commit"""
+        inseridas = [MagicMock(id=1), MagicMock(id=2)]
+        result = MagicMock()
+        result.fetchall.return_value = inseridas
+        db = _session()
+        db.execute.return_value = result
+        notify = AsyncMock()
+        monkeypatch.setattr("app.services.outbox.notification_stream.notify_created", notify)
+        canal = NotificacaoCanal()
+
+        mensagem = _mensagem(1, CANAL_NOTIFICACAO, user_ids=[10, 11], notification_type="info", title="T", message="M")
+        await canal.entregar(db, [mensagem])
+        notify.assert_not_awaited()
+        await canal.confirmar(db)
+
+        notify.assert_awaited_once_with(inseridas)
+        assert db.info == {}
+
+    @pytest.mark.asyncio
+    async def test_rejected_row_fails_only_its_message(self):
+        """Test INSERT do lote recusado (FK): refaz por mensagem em savepoints e só a mensagem inválida falha"""
+        base = {"notification_type": "info", "title": "T", "message": "M"}
+        mensagens = [_mensagem(i, CANAL_NOTIFICACAO, user_ids=[10 * i], **base) for i in (1, 2, 3)]
+        fk = IntegrityError("INSERT INTO notifications", {}, Exception("violates foreign key constraint"))
+
+        def inserted(*ids):
+            result = MagicMock()
+            result.fetchall.return_value = [MagicMock(id=id) for id in ids]
+            return result
+
+        db = _session()
+        db.execute.side_effect = [fk, inserted(1), fk, inserted(3)]
+
+        falhas = await NotificacaoCanal().entregar(db, mensagens)
+
+        assert list(falhas) == [2]
+        assert falhas[2].definitiva
+        assert "foreign key" in falhas[2].erro
+        assert [row.id for row in db.info["notificacoes"]] == [1, 3]
+        assert db.begin_nested.call_count == 4
+        por_mensagem = [json.loads(call.args[1]["rows"]) for call in db.execute.await_args_list[1:]]
+        assert [[row["user_id"] for row in rows] for rows in por_mensagem] == [[10], [20], [30]]
+
+
+class TestEmailCanal:
+    """Testes para o canal de e-mail"""
+
+    @pytest.mark.asyncio
+    async def test_connection_reused_between_batches(self):
+        """Test uma única conexão SMTP para vários lotes; Message-ID estável por mensagem"""
+        servers = []
+
+        def factory():
+            servers.append(FakeSMTP())
+            return servers[-1]
+
+        canal = EmailCanal(smtp_factory=factory)
+        for id in (1, 2):
+            falhas = await canal.entregar(None, [_mensagem(id, CANAL_EMAIL, to="a@x.com", subject="Oi", body="...")])
+            assert falhas == {}
+
+        assert len(servers) == 1
+        assert [email["Message-ID"] for email in servers[0].enviadas] == [
+            "<outbox-1@conectaplus.com.br>",
+            "<outbox-2@conectaplus.com.br>",
+        ]
+        await canal.close()
+        assert servers[0].fechada
+
+    @pytest.mark.asyncio
+    async def test_refused_is_final_and_disconnect_retries_rest(self):
+        """Test destinatário recusado é definitivo; queda da conexão devolve o resto do lote e reconecta"""
+        servers = [FakeSMTP(recusados={"b@x.com"}, cair_em="c@x.com"), FakeSMTP()]
+        canal = EmailCanal(smtp_factory=lambda: servers.pop(0))
+        mensagens = [
+            _mensagem(i, CANAL_EMAIL, to=to, subject="Oi")
+            for i, to in enumerate(["a@x.com", "b@x.com", "c@x.com", "d@x.com"], 1)
+        ]
+
+        falhas = await canal.entregar(None, mensagens)
+
+        assert falhas[2].definitiva
+        assert not falhas[3].definitiva and not falhas[4].definitiva
+        assert 1 not in falhas
+        assert await canal.entregar(None, mensagens[2:]) == {}
+        assert servers == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_workers_do_not_interleave_on_connection(self):
+        """Test dois workers entregando ao mesmo tempo: a conexão compartilhada atende um lote por vez"""
+
+        class SessaoUnica(FakeSMTP):
+            ativos = 0
+            sobreposicoes = 0
+
+            def send_message(self, email):
+                SessaoUnica.ativos += 1
+                SessaoUnica.sobreposicoes += SessaoUnica.ativos > 1
+                time.sleep(0.005)
+                super().send_message(email)
+                SessaoUnica.ativos -= 1
+
+        server = SessaoUnica()
+        canal = EmailCanal(smtp_factory=lambda: server)
+        lotes = [[_mensagem(i * 10 + j, CANAL_EMAIL, to="a@x.com", subject="Oi") for j in range(5)] for i in (1, 2)]
+
+        assert await asyncio.gather(*(canal.entregar(None, lote) for lote in lotes)) == [{}, {}]
+        assert SessaoUnica.sobreposicoes == 0
+        assert len(server.enviadas) == 10
+
+
+class TestWebhookCanal:
+    """Testes para o canal de webhooks"""
+
+    @pytest.mark.asyncio
+    async def test_status_classification_and_idempotency_key(self):
+        """Test 2xx enviado, 503 temporário, 400 definitivo, chave derivada do id da mensagem"""
+        keys = {}
+
+        def handler(request):
+            keys[request.url.path] = request.headers["Idempotency-Key"]
+            assert json.loads(request.content) == {"tenant": 2}
+            return httpx.Response({"/ok": 204, "/busy": 503, "/bad": 400}[request.url.path])
+
+        canal = WebhookCanal(transport=httpx.MockTransport(handler))
+        mensagens = [
+            _mensagem(i, url=f"http://app{path}", body={"tenant": 2})
+            for i, path in enumerate(["/ok", "/busy", "/bad"], 1)
+        ]
+
+        falhas = await canal.entregar(None, mensagens)
+        await canal.close()
+
+        assert list(falhas) == [2, 3]
+        assert not falhas[2].definitiva
+        assert falhas[3].definitiva
+        assert keys == {"/ok": "outbox-1", "/busy": "outbox-2", "/bad": "outbox-3"}
+
+
+class TestDispatch:
+    """Testes para o ciclo reivindicar -> entregar -> finalizar"""
+
+    @staticmethod
+    def _service(canal, rows):
+        sessions = []
+
+        @asynccontextmanager
+        async def factory():
+            db = AsyncMock()
+            db.info = {}
+            claim = MagicMock()
+            claim.fetchall.return_value = rows if not sessions else []
+            db.execute.return_value = claim
+            sessions.append(db)
+            yield db
+
+        return OutboxService(canais=[canal], session_factory=factory), sessions
+
+    @pytest.mark.asyncio
+    async def test_handler_exception_retries_whole_batch(self):
+        """Test exceção do canal: rollback e o lote inteiro volta para a fila"""
+
+        class Quebrado(Canal):
+            nome = CANAL_WEBHOOK
+
+            async def entregar(self, db, mensagens):
+                raise RuntimeError("fora do ar")
+
+        rows = [
+            MagicMock(id=i, tenant_id=2, canal=CANAL_WEBHOOK, payload={}, tentativas=1, created_at=datetime.now())
+            for i in (1, 2)
+        ]
+        service, sessions = self._service(Quebrado(), rows)
+
+        assert await service.dispatch(CANAL_WEBHOOK) == 2
+
+        claim_db, deliver_db = sessions
+        assert "FOR UPDATE SKIP LOCKED" in str(claim_db.execute.await_args.args[0])
+        claim_db.commit.assert_awaited_once()
+        deliver_db.rollback.assert_awaited_once()
+        retry = deliver_db.execute.await_args
+        assert [p["id"] for p in retry.args[1]] == [1, 2]
+        assert retry.args[1][0]["erro"] == "RuntimeError: fora do ar"
+
+    @pytest.mark.asyncio
+    async def test_empty_queue_opens_no_delivery_session(self):
+        """Test sem mensagens prontas: só a transação de reivindicação"""
+        service, sessions = self._service(WebhookCanal(), [])
+
+        assert await service.dispatch(CANAL_WEBHOOK) == 0
+        assert len(sessions) == 1
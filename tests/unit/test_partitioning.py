@@ -0,0 +1,145 @@
+"""
+Testes unitários para app/services/partitioning.py
+"""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.partitioning import (
+    PartitionInfo,
+    PartitionManager,
+    add_months,
+    month_start,
+    parse_partition_month,
+    partition_name,
+)
+
+
+class TestMonthHelpers:
+    """Testes para as funções de aritmética de meses"""
+
+    def test_month_start(self):
+        """Test primeiro dia do mês"""
+        assert month_start(date(2025, 3, 17)) == date(2025, 3, 1)
+
+    def test_add_months_forward(self):
+        """Test soma de meses dentro do ano"""
+        assert add_months(date(2025, 3, 1), 2) == date(2025, 5, 1)
+
+    def test_add_months_year_rollover(self):
+        """Test soma de meses virando o ano"""
+        assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+
+    def test_add_months_backward(self):
+        """Test subtração de meses voltando o ano"""
+        assert add_months(date(2025, 2, 1), -3) == date(2024, 11, 1)
+
+    def test_add_months_normalizes_day(self):
+        """Test que o resultado é sempre o dia 1"""
+        assert add_months(date(2025, 1, 31), 1) == date(2025, 2, 1)
+
+
+class TestPartitionNames:
+    """Testes para nomes de partição"""
+
+    def test_partition_name(self):
+        """Test nome da partição mensal"""
+        assert partition_name("access_logs", date(2025, 3, 1)) == "access_logs_p202503"
+
+    def test_parse_partition_month(self):
+        """Test extração do mês a partir do nome"""
+        assert parse_partition_month("access_logs", "access_logs_p202503") == date(2025, 3, 1)
+
+    def test_parse_default_partition(self):
+        """Test que a partição DEFAULT não tem mês"""
+        assert parse_partition_month("access_logs", "access_logs_default") is None
+
+    def test_parse_other_table(self):
+        """Test que partições de outra tabela não são reconhecidas"""
+        assert parse_partition_month("access_logs", "audit_logs_p202503") is None
+
+    def test_parse_invalid_month(self):
+        """Test mês inválido no nome"""
+        assert parse_partition_month("access_logs", "access_logs_p202513") is None
+
+
+def _mock_db():
+    db = AsyncMock()
+    db.execute = AsyncMock(return_value=MagicMock())
+    return db
+
+
+class TestEnsurePartitions:
+    """Testes para criação de partições futuras"""
+
+    @pytest.mark.asyncio
+    async def test_creates_current_and_future_months(self):
+        """Test que cria do mês corrente até months_ahead"""
+        manager = PartitionManager({"access_logs": "registered_at"})
+        manager.is_partitioned = AsyncMock(return_value=True)
+        manager.create_partition = AsyncMock(return_value=True)
+
+        created = await manager.ensure_partitions(_mock_db(), months_ahead=2, today=date(2025, 12, 10))
+
+        assert created == ["access_logs_p202512", "access_logs_p202601", "access_logs_p202602"]
+
+    @pytest.mark.asyncio
+    async def test_skips_existing_partitions(self):
+        """Test que partições existentes não são reportadas"""
+        manager = PartitionManager({"access_logs": "registered_at"})
+        manager.is_partitioned = AsyncMock(return_value=True)
+        manager.create_partition = AsyncMock(side_effect=[False, True])
+
+        created = await manager.ensure_partitions(_mock_db(), months_ahead=1, today=date(2025, 1, 1))
+
+        assert created == ["access_logs_p202502"]
+
+    @pytest.mark.asyncio
+    async def test_skips_non_partitioned_tables(self):
+        """Test que tabelas ainda não migradas são ignoradas"""
+        manager = PartitionManager({"access_logs": "registered_at"})
+        manager.is_partitioned = AsyncMock(return_value=False)
+        manager.create_partition = AsyncMock()
+
+        created = await manager.ensure_partitions(_mock_db(), months_ahead=3)
+
+        assert created == []
+        manager.create_partition.assert_not_called()
+
+
+class TestDetachOldPartitions:
+    """Testes para desanexação de partições antigas"""
+
+    @pytest.mark.asyncio
+    async def test_detaches_only_expired_months(self):
+        """Test que só partições inteiramente fora da retenção são desanexadas"""
+        manager = PartitionManager({"access_logs": "registered_at"})
+        manager.is_partitioned = AsyncMock(return_value=True)
+        manager.list_partitions = AsyncMock(
+            return_value=[
+                PartitionInfo("access_logs_default", None),
+                PartitionInfo("access_logs_p202501", date(2025, 1, 1)),
+                PartitionInfo("access_logs_p202502", date(2025, 2, 1)),
+                PartitionInfo("access_logs_p202503", date(2025, 3, 1)),
+            ]
+        )
+        db = _mock_db()
+
+        detached = await manager.detach_old_partitions(db, retention_months=2, today=date(2025, 4, 15))
+
+        assert detached == ["access_logs_p202501"]
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert "ALTER TABLE access_logs DETACH PARTITION access_logs_p202501" in statements
+
+    @pytest.mark.asyncio
+    async def test_zero_retention_never_detaches(self):
+        """Test que retenção 0 desabilita a desanexação"""
+        manager = PartitionManager({"access_logs": "registered_at"})
+        manager.list_partitions = AsyncMock()
+
+        detached = await manager.detach_old_partitions(_mock_db(), retention_months=0)
+
+        assert detached == []
+        manager.list_partitions.assert_not_called()
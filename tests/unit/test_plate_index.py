@@ -0,0 +1,175 @@
+"""
+Testes unitários para app/services/plate_index.py
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.plate_index import (
+    PlateEntry,
+    PlateIndexService,
+    TenantPlateIndex,
+    edit_distance,
+    mercosul_twin,
+    plate_skeleton,
+)
+
+
+def _entry(vehicle_id, plate, kind="resident", owner_id=1):
+    return PlateEntry(
+        kind=kind, vehicle_id=vehicle_id, plate=plate, model=None, color=None, owner_id=owner_id, owner_name="Ana"
+    )
+
+
+def _rows(*rows):
+    result = MagicMock()
+    result.fetchall.return_value = list(rows)
+    result.fetchone.return_value = rows[0] if rows else None
+    return result
+
+
+def _resident_row(id, plate, is_active=True):
+    return SimpleNamespace(
+        id=id,
+        plate=plate,
+        model="Onix",
+        color="Prata",
+        owner_id=10,
+        owner_name="Carlos",
+        unit_id=5,
+        block="B",
+        unit_number="204",
+        spot="G1-12",
+        is_active=is_active,
+    )
+
+
+class TestPlateNormalization:
+    """Testes para esqueleto OCR e conversão Mercosul"""
+
+    def test_mercosul_twin(self):
+        """Test conversão nos dois sentidos"""
+        assert mercosul_twin("ABC1234") == "ABC1C34"
+        assert mercosul_twin("ABC1C34") == "ABC1234"
+        assert mercosul_twin("AB12") is None
+
+    def test_skeleton_collapses_confusions(self):
+        """Test que O/0, I/1 e B/8 têm o mesmo esqueleto"""
+        assert plate_skeleton("OBC1I34") == plate_skeleton("08C1134")
+
+    def test_edit_distance(self):
+        """Test troca, falta e sobra de caractere"""
+        assert edit_distance("ABC1234", "ABC1294") == 1
+        assert edit_distance("ABC1234", "ABC234") == 1
+        assert edit_distance("ABC1234", "ABC1234") == 0
+
+
+class TestTenantPlateIndex:
+    """Testes para a consulta tolerante a OCR"""
+
+    def test_exact_match_first(self):
+        """Test que o match exato vem antes do confundível"""
+        index = TenantPlateIndex([_entry(1, "ABC1234"), _entry(2, "A8C1234")])
+
+        matches = index.lookup("abc-1234")
+
+        assert [(item.entry.vehicle_id, item.match) for item in matches] == [(1, "exact"), (2, "ocr")]
+
+    def test_ocr_confusions(self):
+        """Test leitura com O/0, I/1 e B/8 trocados"""
+        index = TenantPlateIndex([_entry(1, "BRA2E19")])
+
+        matches = index.lookup("8RA2EI9")
+
+        assert matches[0].entry.vehicle_id == 1
+        assert (matches[0].match, matches[0].distance) == ("ocr", 0)
+
+    def test_mercosul_conversion(self):
+        """Test placa antiga cadastrada lida no padrão Mercosul"""
+        index = TenantPlateIndex([_entry(1, "ABC1234")])
+
+        assert index.lookup("ABC1C34")[0].match == "mercosul"
+
+    def test_fuzzy_single_error(self):
+        """Test um caractere trocado ou faltando (não confundível)"""
+        index = TenantPlateIndex([_entry(1, "ABC1234")])
+
+        assert index.lookup("ABC1294")[0].distance == 1
+        assert index.lookup("ABC234")[0].match == "fuzzy"
+        assert index.lookup("ABC1294", max_distance=0) == []
+        assert index.lookup("XYZ9876") == []
+
+    def test_remove_and_replace(self):
+        """Test atualização incremental: troca de placa e remoção"""
+        index = TenantPlateIndex([_entry(1, "ABC1234")])
+
+        index.add(_entry(1, "DEF5678"))
+        assert index.lookup("ABC1234") == []
+        assert index.lookup("DEF5678")[0].match == "exact"
+
+        index.remove(("resident", 1))
+        assert index.lookup("DEF5678") == []
+        assert len(index) == 0
+
+    def test_shared_skeleton_survives_removal(self):
+        """Test que remover um veículo não tira do índice outro com o mesmo esqueleto"""
+        index = TenantPlateIndex([_entry(1, "ABC1234"), _entry(2, "A8C1234")])
+
+        index.remove(("resident", 1))
+
+        assert [item.entry.vehicle_id for item in index.lookup("ABC1294")] == [2]
+
+    def test_resident_vehicle_for_spot(self):
+        """Test placa exata de morador vence visitante e confundíveis; leitura OCR só com um único candidato"""
+        index = TenantPlateIndex(
+            [_entry(1, "ABC1234"), _entry(7, "ABC1234", kind="visitor"), _entry(2, "A8C1234"), _entry(3, "BRA2E19")]
+        )
+
+        assert index.resident_vehicle("abc-1234").vehicle_id == 1
+        assert index.resident_vehicle("8RA2EI9").vehicle_id == 3
+        assert index.resident_vehicle("A8C1Z34") is None  # ABC1234 e A8C1234: ambígua
+
+        index.remove(("resident", 1))
+        assert index.resident_vehicle("ABC1234") is None  # visitante e A8C1234 empatados
+
+
+class TestPlateIndexService:
+    """Testes para carga e atualização por condomínio"""
+
+    @pytest.mark.asyncio
+    async def test_loads_once_within_ttl(self):
+        """Test que o índice é carregado na primeira consulta e reutilizado"""
+        service = PlateIndexService(ttl_seconds=300)
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_rows(_resident_row(1, "abc-1234")), _rows()])
+
+        first = await service.lookup(db, 1, "ABC1234")
+        second = await service.lookup(db, 1, "ABC1234")
+
+        assert db.execute.await_count == 2
+        assert first[0].entry.unit == "B-204"
+        assert first[0].entry.spot == "G1-12"
+        assert second[0].entry.plate == "ABC1234"
+
+    @pytest.mark.asyncio
+    async def test_refresh_removes_inactive_vehicle(self):
+        """Test que veículo desativado sai do índice"""
+        service = PlateIndexService()
+        service._indexes[1] = TenantPlateIndex([_entry(1, "ABC1234")])
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_rows(_resident_row(1, "ABC1234", is_active=False)))
+
+        await service.refresh_vehicle(db, 1, 1)
+
+        assert len(service._indexes[1]) == 0
+
+    @pytest.mark.asyncio
+    async def test_refresh_skips_unloaded_tenant(self):
+        """Test que condomínio sem índice não consulta o banco"""
+        db = AsyncMock()
+
+        await PlateIndexService().refresh_vehicle(db, 1, 1)
+
+        db.execute.assert_not_called()
@@ -0,0 +1,138 @@
+"""
+Testes unitários para o profiling por requisição (serviço e middleware)
+"""
+
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware.profiling import ProfilingMiddleware
+from app.services.profiling import PROFILE_HEADER, ProfileInfo, ProfilingService
+
+
+def _info(request_id: str) -> ProfileInfo:
+    return ProfileInfo(
+        request_id=request_id,
+        method="GET",
+        path="/api/v1/portaria/dashboard",
+        status_code=200,
+        duration_ms=12.5,
+        reason="token",
+        created_at=time.time(),
+    )
+
+
+class TestProfileToken:
+    """Testes para o header assinado"""
+
+    def test_issue_and_verify(self):
+        """Test token emitido é aceito"""
+        service = ProfilingService()
+
+        assert service.verify_token(service.issue_token(60))
+
+    def test_rejects_tampered_expired_and_malformed(self):
+        """Test assinatura alterada, token expirado e formatos inválidos"""
+        service = ProfilingService()
+        expires, signature = service.issue_token(60).split(".")
+
+        assert not service.verify_token(f"{int(expires) + 3600}.{signature}")
+        assert not service.verify_token(f"{int(time.time()) - 1}.{service._signature(int(time.time()) - 1)}")
+        assert not service.verify_token("abc.def")
+        assert not service.verify_token("")
+        assert not service.verify_token(None)
+
+
+class TestProfileStore:
+    """Testes para o armazenamento em disco"""
+
+    def test_save_and_list(self, tmp_path):
+        """Test perfil e metadados gravados e listados (mais recente primeiro)"""
+        service = ProfilingService(str(tmp_path))
+        service.save(_info("aaaa0001"), '{"shared": {}}')
+        os.utime(tmp_path / "aaaa0001.meta.json", (1, 1))
+        service.save(_info("aaaa0002"), '{"shared": {}}')
+
+        profiles = service.list()
+
+        assert [p.request_id for p in profiles] == ["aaaa0002", "aaaa0001"]
+        assert profiles[0].size_bytes == len('{"shared": {}}')
+        assert service.profile_path("aaaa0001") == str(tmp_path / "aaaa0001.speedscope.json")
+
+    def test_prune_keeps_most_recent(self, tmp_path, monkeypatch):
+        """Test remoção dos mais antigos além de PROFILING_MAX_FILES"""
+        monkeypatch.setattr("app.services.profiling.settings.PROFILING_MAX_FILES", 2)
+        service = ProfilingService(str(tmp_path))
+        for index in range(3):
+            service.save(_info(f"bbbb000{index}"), "{}")
+            os.utime(tmp_path / f"bbbb000{index}.meta.json", (index + 1, index + 1))
+        service.prune()
+
+        assert sorted(os.listdir(tmp_path)) == [
+            "bbbb0001.meta.json",
+            "bbbb0001.speedscope.json",
+            "bbbb0002.meta.json",
+            "bbbb0002.speedscope.json",
+        ]
+
+    def test_profile_path_rejects_traversal(self, tmp_path):
+        """Test ids fora do formato do request_id não viram caminho"""
+        service = ProfilingService(str(tmp_path))
+
+        assert service.profile_path("../../etc/passwd") is None
+        assert service.profile_path("cccc0001") is None
+
+
+class TestProfilingMiddleware:
+    """Testes para a decisão de perfilar no middleware"""
+
+    def _client(self, tmp_path, monkeypatch, sample_rate=0.0):
+        service = ProfilingService(str(tmp_path))
+        monkeypatch.setattr("app.middleware.profiling.profiling_service", service)
+        monkeypatch.setattr("app.middleware.profiling.settings.PROFILING_SAMPLE_RATE", sample_rate)
+
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware)
+
+        @app.middleware("http")
+        async def request_id(request: Request, call_next):
+            # Papel do LoggingMiddleware
+            request.state.request_id = "dddd0001"
+            return await call_next(request)
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        return TestClient(app), service
+
+    def test_valid_token_profiles_request(self, tmp_path, monkeypatch):
+        """Test header assinado gera o perfil com o request_id"""
+        client, service = self._client(tmp_path, monkeypatch)
+
+        response = client.get("/ping", headers={PROFILE_HEADER: service.issue_token(60)})
+
+        assert response.headers["X-Profile-ID"] == "dddd0001"
+        for _ in range(50):
+            if service.list():
+                break
+            time.sleep(0.02)
+        [info] = service.list()
+        assert info.reason == "token"
+        assert info.path == "/ping"
+        assert service.profile_path("dddd0001")
+
+    def test_invalid_token_and_no_sampling(self, tmp_path, monkeypatch):
+        """Test sem token válido e amostragem zero nada é perfilado"""
+        client, _ = self._client(tmp_path, monkeypatch)
+
+        assert "X-Profile-ID" not in client.get("/ping").headers
+        assert "X-Profile-ID" not in client.get("/ping", headers={PROFILE_HEADER: "1.forjado"}).headers
+
+    def test_sampling(self, tmp_path, monkeypatch):
+        """Test amostragem de 100% perfila sem header"""
+        client, _ = self._client(tmp_path, monkeypatch, sample_rate=1.0)
+
+        assert client.get("/ping").headers["X-Profile-ID"] == "dddd0001"
@@ -0,0 +1,173 @@
+"""
+Testes unitários para app/services/reservations.py
+"""
+
+from datetime import date, time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.exceptions import BusinessError, NotFoundError
+from app.services.reservations import (
+    FULL_DAY_MASK,
+    ReservationService,
+    free_intervals,
+    month_bounds,
+    parse_time,
+    slot_masks,
+    window_mask,
+)
+
+
+def _result(row=None, scalar=None, rows=None):
+    result = MagicMock()
+    result.fetchone.return_value = row
+    result.fetchall.return_value = rows or []
+    result.scalar.return_value = scalar
+    return result
+
+
+class TestSlots:
+    """Testes para o bitmap de slots de 30 minutos"""
+
+    def test_parse_time(self):
+        """Test formatos aceitos e rejeitados"""
+        assert parse_time("08:30") == time(8, 30)
+        assert parse_time("23:59:59") == time(23, 59, 59)
+        with pytest.raises(BusinessError):
+            parse_time("25:00")
+
+    def test_slot_masks_same_day(self):
+        """Test 10:00-11:00 ocupa os slots 20 e 21; slot parcial conta como ocupado"""
+        assert slot_masks(time(10), time(11)) == (0b11 << 20, 0)
+        assert slot_masks(time(10, 15), time(10, 45)) == (0b11 << 20, 0)
+
+    def test_slot_masks_overnight(self):
+        """Test 23:00-01:00 ocupa o fim do dia e o início do dia seguinte"""
+        assert slot_masks(time(23), time(1)) == (0b11 << 46, 0b11)
+        assert slot_masks(time(0), time(0)) == (FULL_DAY_MASK, 0)
+
+    def test_free_intervals(self):
+        """Test intervalos livres dentro do horário da área"""
+        window = window_mask(time(8), time(22))
+        occupied, _ = slot_masks(time(12), time(14, 30))
+
+        assert free_intervals(occupied, window) == [
+            {"start_time": "08:00", "end_time": "12:00"},
+            {"start_time": "14:30", "end_time": "22:00"},
+        ]
+
+    def test_month_bounds_december(self):
+        """Test virada de ano"""
+        assert month_bounds(2025, 12) == (date(2025, 12, 1), date(2026, 1, 1))
+
+
+class TestCreateReservation:
+    """Testes para criação com conflito garantido pelo banco"""
+
+    @pytest.mark.asyncio
+    async def test_creates_and_invalidates_calendar(self, monkeypatch):
+        """Test reserva criada, calendário do mês descartado e atividade publicada no feed"""
+        delete = AsyncMock()
+        publish = AsyncMock()
+        monkeypatch.setattr("app.services.reservations.cache.delete", delete)
+        monkeypatch.setattr("app.services.reservations.activity_feed.publish", publish)
+        db = AsyncMock()
+        row = SimpleNamespace(id=42, created_at=None, area_name="Salão de Festas")
+        db.execute = AsyncMock(side_effect=[_result(), _result(), _result(row=row)])
+
+        reserva_id = await ReservationService().create(db, 1, 7, 3, 5, date(2025, 3, 10), "18:00", "22:00")
+
+        assert reserva_id == 42
+        assert "pg_advisory_xact_lock" in str(db.execute.call_args_list[0].args[0])
+        assert db.execute.call_args_list[1].args[1]["month_start"] == date(2025, 3, 1)
+        db.commit.assert_awaited_once()
+        delete.assert_awaited_once()
+        publish.assert_awaited_once_with(1, "reserva", 42, "Reserva: Salão de Festas", None)
+
+    @pytest.mark.asyncio
+    async def test_monthly_rule(self):
+        """Test segunda reserva do usuário na mesma área e mês"""
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_result(), _result(row=(1,))])
+
+        with pytest.raises(BusinessError, match="este mês"):
+            await ReservationService().create(db, 1, 7, 3, 5, date(2025, 3, 10), "18:00", "22:00")
+        db.rollback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_exclusion_violation_becomes_business_error(self):
+        """Test que a sobreposição rejeitada pelo banco vira erro de negócio"""
+        orig = Exception('conflicting key value violates exclusion constraint "ex_reservations_area_period"')
+        orig.sqlstate = "23P01"
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_result(), _result(), IntegrityError("INSERT", {}, orig)])
+
+        with pytest.raises(BusinessError, match="já está reservado"):
+            await ReservationService().create(db, 1, 7, 3, 5, date(2025, 3, 10), "18:00", "22:00")
+        db.rollback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_cancel_not_found(self):
+        """Test cancelamento de reserva de outro usuário"""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_result())
+
+        with pytest.raises(NotFoundError):
+            await ReservationService().cancel(db, 1, 7, 99)
+
+
+class TestCalendar:
+    """Testes para o calendário do mês"""
+
+    @pytest.mark.asyncio
+    async def test_served_from_cache(self, monkeypatch):
+        """Test que o calendário em cache não consulta o banco"""
+        cached = {"dias_ocupados": {}, "ocupacao": {"2025-03-10": 3}, "janela": FULL_DAY_MASK}
+        monkeypatch.setattr("app.services.reservations.cache.get", AsyncMock(return_value=cached))
+        db = AsyncMock()
+
+        slots = await ReservationService().free_slots(db, 1, 5, date(2025, 3, 10))
+
+        assert slots == [{"start_time": "01:00", "end_time": "00:00"}]
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_builds_bitmap_with_overnight_spill(self, monkeypatch):
+        """Test que a reserva do último dia do mês anterior ocupa o início do mês"""
+        monkeypatch.setattr("app.services.reservations.cache.get", AsyncMock(return_value=None))
+        monkeypatch.setattr("app.services.reservations.cache.set", AsyncMock())
+        rows = [
+            SimpleNamespace(
+                id=1,
+                date=date(2025, 2, 28),
+                start_time=time(22),
+                end_time=time(2),
+                status="confirmed",
+                event_name=None,
+                user_name="Ana",
+                block="A",
+                unit_number="101",
+            ),
+            SimpleNamespace(
+                id=2,
+                date=date(2025, 3, 5),
+                start_time=time(10),
+                end_time=time(12),
+                status="confirmed",
+                event_name="Aniversário",
+                user_name="Bruno",
+                block=None,
+                unit_number="202",
+            ),
+        ]
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_result(rows=rows), _result(row=None)])
+
+        data = await ReservationService().calendar(db, 1, 5, 2025, 3)
+
+        assert list(data["dias_ocupados"]) == ["2025-03-05"]
+        assert data["dias_ocupados"]["2025-03-05"][0]["unit"] == "202"
+        assert data["ocupacao"] == {"2025-03-01": 0b1111, "2025-03-05": 0b1111 << 20}
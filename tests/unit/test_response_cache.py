@@ -0,0 +1,164 @@
+"""
+Testes unitários para as respostas pré-comprimidas com ETag
+(app/services/response_cache.py e @cached_response em app/core/cache_decorator.py)
+"""
+
+import gzip
+from unittest.mock import AsyncMock
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import Depends, FastAPI, Query
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.core.cache_decorator import cached_response, invalidate_cache
+from app.services.cache import cache
+from app.services.data_versions import data_version_service
+from app.services.response_cache import accepted_encodings, compress, etag_matches, make_etag
+
+
+class TestNegotiation:
+    """Testes para Accept-Encoding e If-None-Match"""
+
+    def test_accepted_encodings_in_server_order(self):
+        """Test ordem de preferência do servidor e q=0 recusando"""
+        assert accepted_encodings("gzip, deflate, zstd") == ["zstd", "gzip"]
+        assert accepted_encodings("gzip;q=0.5, zstd;q=0") == ["gzip"]
+        assert accepted_encodings("") == []
+        assert "gzip" in accepted_encodings("*")
+        assert accepted_encodings("*, gzip;q=0") == [name for name in accepted_encodings("*") if name != "gzip"]
+
+    def test_etag_matches(self):
+        """Test lista de ETags, prefixo W/ e curinga"""
+        etag = make_etag(b"{}")
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"outro", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"outro"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestCachedResponse:
+    """Testes para o decorator @cached_response"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        server = FakeServer()
+        monkeypatch.setattr(cache, "_client", FakeRedis(server=server, decode_responses=True))
+        monkeypatch.setattr(cache, "_binary", FakeRedis(server=server))
+
+        calls = []
+        app = FastAPI()
+
+        @app.get("/itens")
+        @cached_response("itens", ttl=60)
+        async def listar(tenant_id: int = Query(1), tamanho: int = Query(200)):
+            calls.append(tenant_id)
+            return {"items": [{"id": i, "nome": f"item {i}"} for i in range(tamanho)]}
+
+        @app.get("/csv")
+        @cached_response("itens", ttl=60)
+        async def exportar(tenant_id: int = Query(1)):
+            calls.append(tenant_id)
+            return PlainTextResponse("a,b")
+
+        @app.get("/versionado")
+        @cached_response("itens", ttl=60, domains=["visitas"])
+        async def versionado(tenant_id: int = Query(1), db: str = Depends(lambda: "sessao")):
+            calls.append(tenant_id)
+            return {"ok": True}
+
+        @app.post("/invalidar")
+        async def invalidar(tenant_id: int):
+            return {"removidas": await invalidate_cache("itens", tenant_id)}
+
+        return TestClient(app), calls
+
+    def test_miss_then_hit_without_recompressing(self, client):
+        """Test segundo GET servido do cache na codificação aceita, sem executar o endpoint"""
+        http, calls = client
+
+        first = http.get("/itens", headers={"Accept-Encoding": "gzip"})
+        second = http.get("/itens", headers={"Accept-Encoding": "zstd"})
+
+        assert calls == [1]
+        assert first.headers["content-encoding"] == "gzip"
+        assert second.headers["content-encoding"] == "zstd"
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.headers["vary"] == "Accept-Encoding"
+        assert second.content == first.content  # httpx descomprime gzip e zstd
+        assert len(first.json()["items"]) == 200
+
+    def test_if_none_match_returns_304(self, client):
+        """Test ETag igual responde 304 sem corpo e sem executar o endpoint"""
+        http, calls = client
+        etag = http.get("/itens").headers["etag"]
+
+        response = http.get("/itens", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert calls == [1]
+
+    def test_small_body_is_not_compressed(self, client):
+        """Test corpo abaixo do mínimo sai sem Content-Encoding, também no acerto"""
+        http, calls = client
+
+        responses = [http.get("/itens?tamanho=1", headers={"Accept-Encoding": "gzip"}) for _ in range(2)]
+
+        assert calls == [1]
+        assert all("content-encoding" not in response.headers for response in responses)
+        assert responses[1].json() == {"items": [{"id": 0, "nome": "item 0"}]}
+
+    def test_key_per_tenant_and_query(self, client):
+        """Test tenants e parâmetros diferentes não compartilham a resposta"""
+        http, calls = client
+
+        http.get("/itens?tenant_id=1")
+        http.get("/itens?tenant_id=2")
+        http.get("/itens?tenant_id=2&tamanho=3")
+        http.get("/itens?tamanho=3&tenant_id=2")
+
+        assert calls == [1, 2, 2]
+
+    def test_invalidate_cache_drops_response(self, client):
+        """Test invalidate_cache(prefix, tenant_id) descarta as respostas do tenant"""
+        http, calls = client
+        http.get("/itens?tenant_id=7")
+
+        http.post("/invalidar?tenant_id=7")
+        http.get("/itens?tenant_id=7")
+
+        assert calls == [7, 7]
+
+    def test_domain_version_in_key(self, client, monkeypatch):
+        """Test escrita no domínio (nova versão) gera outra chave sem invalidar"""
+        http, calls = client
+        stamps = iter(["visitas:1", "visitas:1", "visitas:2"])
+        monkeypatch.setattr(data_version_service, "stamp", AsyncMock(side_effect=lambda *args: next(stamps)))
+
+        for _ in range(3):
+            http.get("/versionado")
+
+        assert calls == [1, 1]
+        assert data_version_service.stamp.call_args.args == ("sessao", 1, ["visitas"])
+
+    def test_response_results_pass_through(self, client):
+        """Test Response retornada pelo endpoint (ex.: CSV) não é cacheada"""
+        http, calls = client
+
+        responses = [http.get("/csv") for _ in range(2)]
+
+        assert calls == [1, 1]
+        assert responses[0].text == "a,b"
+        assert "etag" not in responses[0].headers
+
+    def test_gzip_variant_is_deterministic(self):
+        """Test gzip sem mtime: mesmo corpo, mesmos bytes entre workers"""
+        assert compress(b"x" * 2000, "gzip") == compress(b"x" * 2000, "gzip")
+        assert gzip.decompress(compress(b"x" * 2000, "gzip")) == b"x" * 2000
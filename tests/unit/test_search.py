@@ -0,0 +1,149 @@
+"""
+Testes unitários para app/services/search.py
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.search import (
+    SearchQuery,
+    SearchResult,
+    SearchService,
+    canonical_code,
+    escape_like,
+    normalize_text,
+    only_digits,
+    search_digits_pattern,
+)
+
+
+def _rows(*rows):
+    result = MagicMock()
+    result.fetchall.return_value = list(rows)
+    return result
+
+
+def _person(id, name, score=1.0):
+    return SimpleNamespace(id=id, name=name, cpf=None, phone=None, score=score)
+
+
+class TestNormalization:
+    """Testes para as funções de normalização (espelho das funções SQL)"""
+
+    def test_normalize_text_strips_accents(self):
+        """Test minúsculas e sem acento"""
+        assert normalize_text("  JOÃO  Conceição ") == "joao conceicao"
+
+    def test_only_digits(self):
+        """Test CPF/telefone só com dígitos"""
+        assert only_digits("123.456.789-00") == "12345678900"
+        assert only_digits("(11) 98765-4321") == "11987654321"
+
+    def test_canonical_code(self):
+        """Test placa e unidade sem pontuação, maiúsculas"""
+        assert canonical_code("abc-1d34") == "ABC1D34"
+        assert canonical_code("A - 101") == "A101"
+
+    def test_escape_like(self):
+        """Test que curingas digitados não viram curingas do LIKE"""
+        assert escape_like("100%_x") == "100\\%\\_x"
+
+
+class TestSearchQuery:
+    """Testes para classificação do termo de busca"""
+
+    def test_numeric_query(self):
+        """Test CPF/telefone formatados são numéricos"""
+        assert SearchQuery.parse("123.456").is_numeric
+        assert SearchQuery.parse("(11) 9876").is_numeric
+
+    def test_text_query_is_not_numeric(self):
+        """Test nome com número não é tratado como documento"""
+        assert not SearchQuery.parse("maria 2").is_numeric
+
+    def test_plate_detection(self):
+        """Test placas antiga e Mercosul, completas ou parciais"""
+        assert SearchQuery.parse("abc-1234").looks_like_plate
+        assert SearchQuery.parse("BRA2E19").looks_like_plate
+        assert SearchQuery.parse("abc1").looks_like_plate
+        assert not SearchQuery.parse("maria").looks_like_plate
+
+    def test_short_query_skips_trigram(self):
+        """Test menos de 3 caracteres usa só prefixo"""
+        assert not SearchQuery.parse("jo").use_trigram
+        assert SearchQuery.parse("joã").use_trigram
+
+    def test_digits_pattern_only_for_numeric_terms(self):
+        """Test padrão de documento só para termos numéricos"""
+        assert search_digits_pattern("123.456") == "%123456%"
+        assert search_digits_pattern("conceição 1001") is None
+
+
+class TestSearchService:
+    """Testes para a busca unificada"""
+
+    @pytest.mark.asyncio
+    async def test_merges_and_ranks_results(self):
+        """Test que prefixo vem antes de similaridade, entre todos os tipos"""
+        service = SearchService()
+        service._search_users = AsyncMock(return_value=[SearchResult("user", 1, "Silvana", None, 0.4)])
+        service._search_visitors = AsyncMock(return_value=[SearchResult("visitor", 2, "Silva Ltda", None, 1.0)])
+
+        results = await service.search(AsyncMock(), 1, "silva", types=["users", "visitors"])
+
+        assert [(item.type, item.id) for item in results] == [("visitor", 2), ("user", 1)]
+
+    @pytest.mark.asyncio
+    async def test_empty_term_returns_nothing(self):
+        """Test termo só com pontuação não consulta o banco"""
+        db = AsyncMock()
+
+        assert await SearchService().search(db, 1, " -. ") == []
+        db.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_prefix_fast_path_skips_trigram(self):
+        """Test que o trigram não roda quando o prefixo preenche o limite"""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_rows(_person(1, "João Silva"), _person(2, "João Souza")))
+
+        results = await SearchService().search(db, 1, "joão", types=["visitors"], limit=2)
+
+        assert len(results) == 2
+        assert db.execute.await_count == 1
+        assert db.execute.call_args.args[1]["prefix"] == "joao%"
+
+    @pytest.mark.asyncio
+    async def test_trigram_fills_remaining_slots(self):
+        """Test que o trigram complementa o prefixo sem repetir ids"""
+        db = AsyncMock()
+        db.execute = AsyncMock(side_effect=[_rows(_person(1, "Silva Ltda")), _rows(_person(7, "Ana Silva", score=0.8))])
+
+        results = await SearchService().search(db, 1, "silva", types=["visitors"], limit=5)
+
+        assert [item.id for item in results] == [1, 7]
+        trigram_params = db.execute.call_args_list[1].args[1]
+        assert trigram_params["q"] == "silva"
+        assert trigram_params["exclude"] == [1]
+
+    @pytest.mark.asyncio
+    async def test_numeric_term_searches_documents(self):
+        """Test CPF parcial consulta só as colunas de dígitos"""
+        db = AsyncMock()
+        db.execute = AsyncMock(return_value=_rows())
+
+        await SearchService().search(db, 1, "123.456", types=["users"])
+
+        sql = str(db.execute.call_args.args[0])
+        assert "search_cpf" in sql and "search_name COLLATE" not in sql
+        assert db.execute.call_args.args[1]["digits"] == "123456%"
+
+    @pytest.mark.asyncio
+    async def test_numeric_term_skips_vehicles(self):
+        """Test que termos numéricos não consultam placas"""
+        db = AsyncMock()
+
+        assert await SearchService().search(db, 1, "101", types=["vehicles"]) == []
+        db.execute.assert_not_called()
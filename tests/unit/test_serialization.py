@@ -0,0 +1,145 @@
+"""
+Testes unitários para app/core/serialization.py
+"""
+
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.core import serialization
+from app.core.serialization import FastJSONResponse, RowEncoder, dumps, paginated
+from app.schemas.classificados import AnuncioResponse
+from app.schemas.portaria import LivroPortariaResponse, PreAutorizacaoResponse, VisitaListResponse, VisitaResponse
+from benchmarks.micro import visita_rows
+
+
+def pydantic_json(model, **data) -> dict:
+    """Saída do caminho antigo: modelo validado e serializado pelo pydantic"""
+    return json.loads(model(**data).model_dump_json())
+
+
+class TestRowEncoder:
+    """Testes de equivalência com a serialização do pydantic"""
+
+    def test_visitas_page_matches_response_model(self):
+        """Test página de visitas idêntica à do VisitaListResponse; colunas extras ignoradas"""
+        rows = visita_rows(30)
+        rows[0]["created_at"] = datetime(2025, 3, 14, 9, 30, 15, 123456, tzinfo=timezone.utc)
+        items = RowEncoder(VisitaResponse).encode_many(rows)
+
+        fast = json.loads(dumps(paginated(items, total=95, skip=30, limit=30)))
+        slow = json.loads(
+            VisitaListResponse(
+                items=[VisitaResponse(**row) for row in rows],
+                total=95,
+                page=2,
+                page_size=30,
+                total_pages=4,
+                has_next=True,
+                has_prev=True,
+            ).model_dump_json()
+        )
+
+        assert fast == slow
+        assert fast["items"][0]["created_at"] == "2025-03-14T09:30:15.123456Z"
+        assert "visitante_telefone" not in fast["items"][0]
+
+    def test_dates_times_lists_and_renamed_columns(self):
+        """Test date, time e arrays; columns mapeia campo -> coluna com nome diferente"""
+        row = {
+            "id": 1,
+            "tenant_id": 2,
+            "unit_id": 3,
+            "morador_id": 4,
+            "visitante_nome": "Ana",
+            "data_inicio": date(2026, 1, 10),
+            "data_fim": date(2026, 1, 12),
+            "horario_inicio": time(8, 30),
+            "dias_semana": [1, 3, 5],
+            "qr_code": "ABC",
+            "status": "ativa",
+            "created_at": datetime(2026, 1, 9, 18, 0),
+        }
+        assert json.loads(dumps(RowEncoder(PreAutorizacaoResponse).encode(row))) == pydantic_json(
+            PreAutorizacaoResponse, **row
+        )
+
+        livro = SimpleNamespace(
+            _mapping={
+                "id": 9,
+                "tenant_id": 2,
+                "user_id": 5,
+                "title": "Troca de turno",
+                "content": "Sem ocorrências",
+                "category": None,
+                "registered_at": datetime(2026, 1, 9, 6, 0),
+                "created_at": datetime(2026, 1, 9, 6, 0),
+            }
+        )
+        item = RowEncoder(LivroPortariaResponse, columns={"titulo": "title", "conteudo": "content"}).encode(livro)
+        assert (item["titulo"], item["conteudo"], item["user_nome"]) == ("Troca de turno", "Sem ocorrências", None)
+
+    def test_orm_objects_decimal_nested_and_overrides(self):
+        """Test objetos por atributo, Decimal como texto, imagens aninhadas e campo calculado"""
+        criado = datetime(2026, 2, 1, 12, 0)
+        imagem = SimpleNamespace(id=7, url="/uploads/classificados/x.jpg", ordem=0, created_at=criado, anuncio_id=3)
+        anuncio = SimpleNamespace(
+            id=3,
+            morador_id=1,
+            titulo="Bicicleta",
+            descricao=None,
+            preco=Decimal("350.00"),
+            categoria="esportes",
+            condicao="usado",
+            status="disponivel",
+            visualizacoes=12,
+            created_at=criado,
+            updated_at=None,
+            imagens=[imagem],
+            deleted_at=None,
+        )
+
+        fast = json.loads(dumps(RowEncoder(AnuncioResponse).encode(anuncio, is_favorito=True)))
+
+        assert fast == pydantic_json(AnuncioResponse, **{**vars(anuncio), "is_favorito": True})
+        assert fast["preco"] == "350.00"
+        assert fast["imagens"] == [{"url": imagem.url, "ordem": 0, "id": 7, "created_at": "2026-02-01T12:00:00"}]
+
+    def test_float_fields_defaults_and_aliases(self):
+        """Test Decimal em campo float vira número; default do modelo; alias de serialização"""
+
+        class Medicao(BaseModel):
+            valor: Optional[float] = None
+            unidade: str = "kWh"
+            leitura_em: datetime = Field(serialization_alias="leituraEm")
+
+        encoded = RowEncoder(Medicao).encode({"valor": Decimal("12.5"), "leitura_em": datetime(2026, 1, 1)})
+
+        assert encoded == {"valor": 12.5, "unidade": "kWh", "leituraEm": datetime(2026, 1, 1)}
+
+
+class TestFastJSONResponse:
+    """Testes para a resposta"""
+
+    def test_bytes_passthrough_and_models(self):
+        """Test bytes saem como estão; modelos e tipos desconhecidos passam pelo pydantic"""
+        assert FastJSONResponse(b'{"a":1}').body == b'{"a":1}'
+
+        stats = SimpleNamespace(total=Decimal("2"))
+        body = json.loads(FastJSONResponse({"stats": VisitaResponse(**visita_rows(1)[0]), "x": [stats.total]}).body)
+        assert body["stats"]["id"] == 100_000
+        assert body["x"] == ["2"]
+
+    def test_fallback_without_orjson(self, monkeypatch):
+        """Test sem orjson o json da biblioteca padrão produz o mesmo conteúdo"""
+        content = paginated(RowEncoder(VisitaResponse).encode_many(visita_rows(3)), total=3, skip=0, limit=50)
+        com_orjson = json.loads(dumps(content))
+
+        monkeypatch.setattr(serialization, "orjson", None)
+
+        assert json.loads(dumps(content)) == com_orjson
+        assert "Visitante Benchmark 0" in dumps(content).decode()
@@ -0,0 +1,96 @@
+"""
+Testes unitários para tests/stress/scenarios/slo.py (SLOs dos cenários de carga)
+"""
+
+import json
+
+from tests.stress.scenarios.slo import SLO, EndpointStats, evaluate, load_slos, match_slo, render, write_report
+
+
+def _stats(name="/portaria/dashboard", requests=100, failures=0, p50=50.0, p95=100.0, p99=200.0):
+    return EndpointStats(name=name, method="GET", requests=requests, failures=failures, p50=p50, p95=p95, p99=p99)
+
+
+class TestMatchSLO:
+    """Testes para a escolha do SLO de cada endpoint"""
+
+    def test_most_specific_pattern_wins(self):
+        """Test padrão mais longo vence o genérico"""
+        slos = load_slos()
+
+        assert match_slo("/portaria/dashboard", slos) == "/portaria/dashboard"
+        assert match_slo("/portaria/visitas/em-andamento", slos) == "/portaria/visitas*"
+        assert match_slo("/units", slos) == "*"
+
+    def test_brackets_are_literal(self):
+        """Test "[csv]" casa literalmente (não como classe de caracteres)"""
+        slos = load_slos()
+
+        assert match_slo("/reports/acessos [csv]", slos) == "/reports/* [csv]"
+        assert match_slo("/reports/acessos", slos) == "/reports/*"
+
+    def test_falls_back_to_default(self):
+        """Test sem padrão que case usa "*" """
+        assert match_slo("/qualquer", {"/outro": SLO(1, 2, 3)}) == "*"
+
+
+class TestEvaluate:
+    """Testes para a avaliação das estatísticas contra os SLOs"""
+
+    def test_within_slo(self):
+        """Test endpoint dentro dos limites não tem violações"""
+        [result] = evaluate([_stats()], load_slos())
+
+        assert result.ok
+        assert result.pattern == "/portaria/dashboard"
+
+    def test_latency_violations(self):
+        """Test cada percentil acima do limite vira uma violação"""
+        [result] = evaluate([_stats(p50=10, p95=900, p99=5000)], {"*": SLO(p50=100, p95=500, p99=1000)})
+
+        assert not result.ok
+        assert [v.split()[0] for v in result.violations] == ["p95", "p99"]
+
+    def test_error_rate_violation(self):
+        """Test taxa de erro acima do limite"""
+        [result] = evaluate([_stats(requests=50, failures=2)], {"*": SLO(p50=100, p95=500, p99=1000)})
+
+        assert result.stats.error_rate == 0.04
+        assert result.violations == ["erros 4.0% > 1.0%"]
+
+    def test_render_lists_violations_first(self):
+        """Test tabela com violações no topo"""
+        slos = {"*": SLO(p50=100, p95=500, p99=1000)}
+        results = evaluate([_stats(name="/ok", requests=500), _stats(name="/lento", p50=300)], slos)
+
+        lines = render(results).splitlines()
+
+        assert "/lento" in lines[1] and lines[1].startswith("❌")
+        assert "p50 300ms > 100ms" in lines[2]
+        assert "/ok" in lines[3]
+
+
+class TestLoadSLOs:
+    """Testes para as sobrescritas por arquivo"""
+
+    def test_override_merges_with_default(self, tmp_path):
+        """Test campos ausentes herdam do padrão de mesmo nome ou de "*" """
+        path = tmp_path / "slo.json"
+        path.write_text(json.dumps({"/portaria/dashboard": {"p95": 400}, "/novo": {"error_rate": 0.5}}))
+
+        slos = load_slos(str(path))
+
+        assert slos["/portaria/dashboard"] == SLO(p50=150, p95=400, p99=1000)
+        assert slos["/novo"] == SLO(p50=200, p95=800, p99=1500, error_rate=0.5)
+
+    def test_write_report(self, tmp_path):
+        """Test relatório JSON com resultado geral e violações"""
+        path = tmp_path / "reports" / "troca_turno.json"
+        results = evaluate([_stats(p99=5000)], load_slos())
+
+        write_report(str(path), "troca_turno", results)
+        document = json.loads(path.read_text())
+
+        assert document["scenario"] == "troca_turno"
+        assert document["passed"] is False
+        assert document["endpoints"][0]["violations"] == ["p99 5000ms > 1000ms"]
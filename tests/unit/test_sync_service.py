@@ -0,0 +1,275 @@
+"""
+Testes unitários para backend/conecta_plus/services/sync_service.py
+
+O App Simples é um httpx.MockTransport e o Redis é o fakeredis. O módulo de
+configuração do backend não faz parte desta árvore: os testes instalam um
+conecta_plus.config mínimo antes de importar o serviço.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import types
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from app.config import settings as app_settings
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+if "conecta_plus.config" not in sys.modules:
+    _config = types.ModuleType("conecta_plus.config")
+    # Mesmo nível de log e modo da API: o logger do backend reconfigura o structlog na importação
+    _config.settings = SimpleNamespace(
+        LOG_LEVEL=app_settings.LOG_LEVEL,
+        is_development=app_settings.is_development,
+        REDIS_URL="redis://localhost:6379/0",
+        REDIS_MAX_CONNECTIONS=5,
+        CACHE_TTL_SECONDS=60,
+    )
+    sys.modules["conecta_plus.config"] = _config
+
+from conecta_plus.services import sync_service as sync_module  # noqa: E402
+from conecta_plus.services.cache import cache  # noqa: E402
+from conecta_plus.services.sync_service import (  # noqa: E402
+    DEAD_LETTER_KEY,
+    RETRY_QUEUE_KEY,
+    SyncService,
+    merge_actions,
+    retry_entry_key,
+)
+
+
+def _tenant(tenant_id=1, nome="Residencial Aurora"):
+    return SimpleNamespace(
+        id=tenant_id,
+        nome=nome,
+        endereco="Rua A, 10",
+        bairro="Centro",
+        cidade="São Paulo",
+        estado="SP",
+        cep="01000-000",
+        telefone=None,
+        email=None,
+        logo_url=None,
+        tipo_estrutura="apartamentos",
+        nomenclatura={},
+        agrupadores=[],
+        areas_comuns=[],
+        funcionalidades={},
+        config_seguranca={},
+        ativo=True,
+        plano="basico",
+        created_at=datetime(2026, 1, 1),
+        updated_at=None,
+    )
+
+
+class StubReceiver:
+    """App Simples falso: responde com os status da fila e guarda os payloads recebidos"""
+
+    def __init__(self, *status_codes, on_request=None):
+        self.status_codes = list(status_codes) or [200]
+        self.on_request = on_request
+        self.payloads = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.payloads.append(json.loads(request.content))
+        if self.on_request is not None:
+            await self.on_request()
+        status_code = self.status_codes.pop(0) if len(self.status_codes) > 1 else self.status_codes[0]
+        # Corpo como stream não lido, igual a um transporte real: o httpx só preenche elapsed ao fechá-lo
+        body = json.dumps({"success": status_code < 300}).encode()
+        return httpx.Response(status_code, headers={"Content-Type": "application/json"}, stream=httpx.ByteStream(body))
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "_client", client)
+    return client
+
+
+@pytest.fixture
+def service(monkeypatch, redis):
+    """Serviço com janela curta e worker ocioso; cada teste chama close() no próprio loop"""
+    for name, value in {
+        "SYNC_COALESCE_WINDOW_SECONDS": 0.05,
+        "SYNC_RETRY_POLL_SECONDS": 60,
+        "SYNC_RETRY_DELAY_SECONDS": 1.0,
+        "SYNC_RETRY_MAX_ATTEMPTS": 3,
+    }.items():
+        monkeypatch.setattr(sync_module.settings, name, value, raising=False)
+    return SyncService()
+
+
+def _use(service: SyncService, receiver: StubReceiver):
+    service._client = httpx.AsyncClient(base_url="http://app-simples", transport=httpx.MockTransport(receiver))
+
+
+async def _due(redis, tenant_id="1"):
+    """Antecipa o próximo retry do tenant para agora"""
+    await redis.zadd(RETRY_QUEUE_KEY, {tenant_id: 0})
+
+
+class TestMergeActions:
+    """Testes para a ação resultante da coalescência"""
+
+    @pytest.mark.parametrize(
+        "anterior, nova, resultado",
+        [
+            ("create", "update", "create"),
+            ("update", "update", "update"),
+            ("create", "delete", "delete"),
+            ("update", "delete", "delete"),
+            ("delete", "update", "update"),
+            ("delete", "create", "create"),
+        ],
+    )
+    def test_merge(self, anterior, nova, resultado):
+        """Test create + update continua create; delete prevalece; ação depois de delete reativa"""
+        assert merge_actions(anterior, nova) == resultado
+
+
+class TestCoalescing:
+    """Testes para o envio coalescido por tenant"""
+
+    @pytest.mark.asyncio
+    async def test_calls_in_window_share_one_send_with_latest_state(self, service):
+        """Test três chamadas na janela: um POST, ação create e o nome mais recente; todas recebem o resultado"""
+        receiver = StubReceiver(200)
+        _use(service, receiver)
+        try:
+            resultados = await asyncio.gather(
+                service.sync_tenant_to_app(_tenant(), "create"),
+                service.sync_tenant_to_app(_tenant(nome="Aurora II"), "update"),
+                service.sync_tenant_to_app(_tenant(nome="Aurora III"), "update"),
+                service.sync_tenant_to_app(_tenant(2, "Outro"), "update"),
+            )
+        finally:
+            await service.close()
+
+        assert resultados == [True, True, True, True]
+        enviados = {payload["tenant"]["id"]: payload for payload in receiver.payloads}
+        assert len(receiver.payloads) == 2
+        assert enviados[1]["action"] == "create"
+        assert enviados[1]["tenant"]["nome"] == "Aurora III"
+        assert service._pending == {}
+        assert service._flush_tasks == set()
+
+    @pytest.mark.asyncio
+    async def test_flush_task_is_referenced_during_window(self, service):
+        """Test a tarefa de flush fica referenciada pelo serviço até terminar"""
+        _use(service, StubReceiver(200))
+        try:
+            chamada = asyncio.create_task(service.sync_tenant_to_app(_tenant(), "update"))
+            await asyncio.sleep(0.01)
+            assert len(service._flush_tasks) == 1
+            assert await chamada is True
+            await asyncio.sleep(0)
+            assert service._flush_tasks == set()
+        finally:
+            await service.close()
+
+
+class TestRetryQueue:
+    """Testes para a fila de retry durável no Redis"""
+
+    @pytest.mark.asyncio
+    async def test_temporary_failure_is_queued_then_delivered(self, service, redis):
+        """Test 503 vai para a fila sem esperar; o worker reenvia e limpa a fila"""
+        receiver = StubReceiver(503, 200)
+        _use(service, receiver)
+        try:
+            assert await service.sync_tenant_to_app(_tenant(), "update") is False
+            entry = json.loads(await redis.get(retry_entry_key("1")))
+            assert (entry["attempts"], entry["last_error"]) == (1, "HTTP 503")
+            assert await redis.zscore(RETRY_QUEUE_KEY, "1") > time.time()
+
+            await _due(redis)
+            assert await service.process_retry_queue() == 1
+        finally:
+            await service.close()
+
+        assert len(receiver.payloads) == 2
+        assert await redis.exists(retry_entry_key("1")) == 0
+        assert await redis.zcard(RETRY_QUEUE_KEY) == 0
+        stats = await service.get_sync_stats()
+        assert (stats["failed_syncs_today"], stats["successful_syncs_today"], stats["queued_syncs_today"]) == (1, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_permanent_rejection_is_not_queued(self, service, redis):
+        """Test 422 não entra na fila de retry"""
+        _use(service, StubReceiver(422))
+        try:
+            assert await service.sync_tenant_to_app(_tenant(), "update") is False
+        finally:
+            await service.close()
+
+        assert await redis.zcard(RETRY_QUEUE_KEY) == 0
+        assert await redis.exists(retry_entry_key("1")) == 0
+
+    @pytest.mark.asyncio
+    async def test_newer_failure_supersedes_retry_in_flight(self, service, redis):
+        """Test falha mais nova gravada durante o reenvio: o resultado do reenvio antigo é descartado (WATCH)"""
+        novo = {"action": "delete", "tenant": {"id": 1, "nome": "Aurora", "ativo": False}}
+
+        async def falha_mais_nova():
+            # Outro processo registra uma falha nova enquanto o reenvio está em andamento
+            await service._add_to_retry_queue("1", "/api/sync/tenant", novo, "HTTP 503")
+
+        _use(service, StubReceiver(503))
+        try:
+            await service.sync_tenant_to_app(_tenant(), "update")
+            _use(service, StubReceiver(200, on_request=falha_mais_nova))
+            await _due(redis)
+            await service.process_retry_queue()
+        finally:
+            await service.close()
+
+        entry = json.loads(await redis.get(retry_entry_key("1")))
+        assert entry["payload"] == novo
+        assert entry["attempts"] == 1
+        assert await redis.zscore(RETRY_QUEUE_KEY, "1") is not None
+        assert (await service.get_sync_stats())["successful_syncs_today"] == 0
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_after_max_attempts_and_requeue(self, service, redis):
+        """Test esgotadas as tentativas o payload vai para a dead-letter; requeue devolve à fila"""
+        _use(service, StubReceiver(503))
+        try:
+            await service.sync_tenant_to_app(_tenant(), "update")
+            for _ in range(2):
+                await _due(redis)
+                await service.process_retry_queue()
+        finally:
+            await service.close()
+
+        assert await redis.exists(retry_entry_key("1")) == 0
+        dead = json.loads(await redis.hget(DEAD_LETTER_KEY, "1"))
+        assert (dead["attempts"], dead["last_error"]) == (3, "HTTP 503")
+        assert (await service.get_sync_stats())["dead_letter_size"] == 1
+
+        assert await service.requeue_dead_letters() == 1
+        assert json.loads(await redis.get(retry_entry_key("1")))["attempts"] == 0
+        assert await redis.zscore(RETRY_QUEUE_KEY, "1") is not None
+        assert await redis.hlen(DEAD_LETTER_KEY) == 0
+
+    @pytest.mark.asyncio
+    async def test_orphan_entries_rescheduled_on_start(self, service, redis):
+        """Test item gravado sem entrada no ZSET (processo caiu no meio do reenvio) volta para a fila"""
+        await redis.set(retry_entry_key("7"), json.dumps({"attempts": 2}))
+        await redis.set(retry_entry_key("8"), json.dumps({"attempts": 1}))
+        await redis.zadd(RETRY_QUEUE_KEY, {"8": 12345})
+
+        await service._recover_orphans()
+
+        assert await redis.zscore(RETRY_QUEUE_KEY, "7") is not None
+        assert await redis.zscore(RETRY_QUEUE_KEY, "8") == 12345